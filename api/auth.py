@@ -34,6 +34,7 @@ from pydantic import BaseModel
 from secret_helper import read_secret
 
 from db_pool import get_connection
+from permission_cache import PermissionCache
 from request_helpers import get_request_ip
 
 # Configuration from environment
@@ -118,6 +119,18 @@ class LoginRequest(BaseModel):
     username: str
     password: str
 
+class AuthContext(BaseModel):
+    """Authentication result for one token, resolved once per request."""
+    token: str
+    username: str
+    role: Optional[str] = None
+    token_role: Optional[str] = None
+    mfa_restricted: bool = False
+
+    @property
+    def token_data(self) -> "TokenData":
+        return TokenData(username=self.username, role=self.token_role)
+
 class UserRole(BaseModel):
     username: str
     role: str
@@ -665,17 +678,11 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
     return encoded_jwt
 
-def verify_token(token: str) -> Optional[TokenData]:
-    """Verify JWT token and confirm the session has not been revoked (e.g. after logout).
-
-    Revocation order:
-      1. Redis jti blocklist (fast, O(1)) — populated on logout for tokens with jti.
-      2. DB user_sessions table — fallback for tokens without jti and extra assurance.
-    """
+def _verify_token_payload(token: str) -> Optional[Dict[str, Any]]:
+    """Decode ``token`` and run the revocation checks; the JWT payload or None."""
     try:
         payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
         username: str = payload.get("sub")
-        role: str = payload.get("role")
         if username is None:
             return None
         # Fast path: Redis jti revocation check
@@ -702,31 +709,110 @@ def verify_token(token: str) -> Optional[TokenData]:
         except Exception:
             # DB unavailable — JWT signature + expiry + Redis check still apply.
             pass
-        return TokenData(username=username, role=role)
+        return payload
     except PyJWTError:
         return None
 
+def verify_token(token: str) -> Optional[TokenData]:
+    """Verify JWT token and confirm the session has not been revoked (e.g. after logout).
+
+    Revocation order:
+      1. Redis jti blocklist (fast, O(1)) — populated on logout for tokens with jti.
+      2. DB user_sessions table — fallback for tokens without jti and extra assurance.
+    """
+    payload = _verify_token_payload(token)
+    if payload is None:
+        return None
+    return TokenData(username=payload["sub"], role=payload.get("role"))
+
+def resolve_auth_context(request: Optional[Request], token: str) -> Optional[AuthContext]:
+    """Verify ``token`` and resolve the caller's role at most once per request.
+
+    rbac_middleware and get_current_user both authenticate the same request;
+    the result (including a rejection) is memoised on ``request.state`` keyed
+    by the token, so the JWT decode, revocation checks and role lookup run once.
+    """
+    memo = None
+    if request is not None:
+        memo = getattr(request.state, "auth_contexts", None)
+        if memo is None:
+            memo = {}
+            request.state.auth_contexts = memo
+        if token in memo:
+            return memo[token]
+    ctx = None
+    payload = _verify_token_payload(token)
+    if payload is not None:
+        username = payload["sub"]
+        ctx = AuthContext(
+            token=token,
+            username=username,
+            role=_cached_user_role(username),
+            token_role=payload.get("role"),
+            # Tokens marked mfa_pending or mfa_enrollment_required are scoped only
+            # to the /auth/mfa/* endpoints — not accepted as general sessions.
+            mfa_restricted=bool(payload.get("mfa_pending") or payload.get("mfa_enrollment_required")),
+        )
+    if memo is not None:
+        memo[token] = ctx
+    return ctx
+
 # User Management
+def _query_user_role(username: str) -> Optional[str]:
+    """Role from user_roles (with the admin/viewer defaults); DB errors propagate."""
+    with get_connection() as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("""
+                SELECT role FROM user_roles 
+                WHERE username = %s AND is_active = true
+            """, (username,))
+            result = cur.fetchone()
+            if result:
+                return result['role']
+
+            # If no role found, assign default role for known admin
+            if username == DEFAULT_ADMIN_USER:
+                return "superadmin"
+
+            # Default role for new users
+            return "viewer"
+
+def _load_permission_matrix() -> Dict[str, set]:
+    """Whole role_permissions table as ``{role: {(resource, action), ...}}``."""
+    matrix: Dict[str, set] = {}
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT role, resource, action FROM role_permissions")
+            for role, resource, action in cur.fetchall():
+                matrix.setdefault(role, set()).add((resource, action))
+    return matrix
+
+_permission_cache = PermissionCache(
+    _load_permission_matrix, _query_user_role, redis_getter=_get_revocation_client,
+)
+
+def invalidate_permission_cache(username: Optional[str] = None) -> None:
+    """Flush cached RBAC data in every API worker.
+
+    Call after writing role_permissions (no ``username``) or a user's row in
+    user_roles (pass ``username``).
+    """
+    if username is None:
+        _permission_cache.publish_invalidation("permissions")
+    else:
+        _permission_cache.publish_invalidation("user", username)
+
+def _cached_user_role(username: str) -> Optional[str]:
+    try:
+        return _permission_cache.user_role(username)
+    except Exception as e:
+        logger.error("Error getting user role for %s: %s", username, e)
+        return "viewer"
+
 def get_user_role(username: str) -> Optional[str]:
     """Get user role from database"""
     try:
-        with get_connection() as conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute("""
-                    SELECT role FROM user_roles 
-                    WHERE username = %s AND is_active = true
-                """, (username,))
-                result = cur.fetchone()
-                if result:
-                    return result['role']
-                
-                # If no role found, assign default role for known admin
-                if username == DEFAULT_ADMIN_USER:
-                    return "superadmin"
-                
-                # Default role for new users
-                return "viewer"
-            
+        return _query_user_role(username)
     except Exception as e:
         logger.error("Error getting user role for %s: %s", username, e)
         return "viewer"
@@ -754,62 +840,28 @@ def set_user_role(username: str, role: str, granted_by: str = "system") -> bool:
                         VALUES (%s, %s, %s, now(), true)
                     """, (username, role, granted_by))
             # auto-commit via context manager
-            return True
+        invalidate_permission_cache(username)
+        return True
     except Exception as e:
         logger.error("Error setting user role for %s: %s", username, e)
         return False
 
 def has_permission(username: str, resource: str, permission: str) -> bool:
-    """Check if user has permission for resource"""
+    """Check if user has permission for resource.
+
+    write implies read, admin implies both; a ``*`` resource grants every
+    resource.  Roles and the role_permissions matrix come from the in-process
+    cache (see permission_cache.py).
+    """
     if not ENABLE_AUTHENTICATION:
         return True
         
-    role = get_user_role(username)
+    role = _cached_user_role(username)
     if not role:
         return False
         
     try:
-        with get_connection() as conn:
-            with conn.cursor() as cur:
-                # Check for specific action (read, write, admin)
-                # write implies read, admin implies both read and write
-                if permission == 'read':
-                    action_clause = "action IN ('read', 'write', 'admin')"
-                elif permission == 'write':
-                    action_clause = "action IN ('write', 'admin')"
-                else:
-                    action_clause = "(action = %s OR action = 'admin')"
-                
-                if permission in ('read', 'write'):
-                    cur.execute(f"""
-                        SELECT 1 FROM role_permissions 
-                        WHERE role = %s AND resource = %s 
-                        AND {action_clause}
-                    """, (role, resource))
-                else:
-                    cur.execute("""
-                        SELECT 1 FROM role_permissions 
-                        WHERE role = %s AND resource = %s 
-                        AND (action = %s OR action = 'admin')
-                    """, (role, resource, permission))
-                result = cur.fetchone()
-                if result:
-                    return True
-                
-                # Also check for wildcard resource
-                if permission in ('read', 'write'):
-                    cur.execute(f"""
-                        SELECT 1 FROM role_permissions 
-                        WHERE role = %s AND resource = '*'
-                        AND {action_clause}
-                    """, (role,))
-                else:
-                    cur.execute("""
-                        SELECT 1 FROM role_permissions 
-                        WHERE role = %s AND resource = '*'
-                        AND (action = %s OR action = 'admin')
-                    """, (role, permission))
-                return cur.fetchone() is not None
+        return _permission_cache.role_has_permission(role, resource, permission)
     except Exception as e:
         logger.error("Error checking permissions for %s/%s/%s: %s", username, resource, permission, e)
         return False
@@ -899,21 +951,10 @@ async def get_current_user(
     if not token:
         return None
 
-    token_data = verify_token(token)
-    if not token_data:
+    ctx = resolve_auth_context(request, token)
+    if ctx is None or ctx.mfa_restricted:
         return None
-
-    # Tokens marked mfa_pending or mfa_enrollment_required are scoped only to
-    # the /auth/mfa/* endpoints — they must not be accepted as general sessions.
-    try:
-        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        if payload.get("mfa_pending") or payload.get("mfa_enrollment_required"):
-            return None
-    except Exception:
-        return None
-
-    role = get_user_role(token_data.username)
-    return User(username=token_data.username, role=role)
+    return User(username=ctx.username, role=ctx.role)
 
 async def require_authentication(user: User = Depends(get_current_user)) -> User:
     """Require authenticated user"""
@@ -12,7 +12,6 @@ RBAC:
 from __future__ import annotations
 
 import logging
-import hashlib
 import os
 from datetime import datetime, timezone
 from typing import Optional
@@ -23,6 +22,7 @@ from psycopg2.extras import RealDictCursor
 
 from auth import require_permission, get_current_user, User
 from db_pool import get_connection
+from shared import backup_artifacts
 
 logger = logging.getLogger("pf9.backup")
 
@@ -395,18 +395,20 @@ async def trigger_restore(
             # H7: verify SHA-256 integrity hash before allowing restore
             stored_hash = source.get("integrity_hash")
             if stored_hash:
-                if not os.path.isfile(source_path):
+                if not backup_artifacts.artifact_exists(source_path):
                     raise HTTPException(
                         status_code=400, detail="Backup file not found on disk"
                     )
-                sha256 = hashlib.sha256()
-                with open(source_path, "rb") as fh:
-                    for chunk in iter(lambda: fh.read(65536), b""):
-                        sha256.update(chunk)
-                if sha256.hexdigest() != stored_hash:
+                # Directory dumps: every file is checked against SHA256SUMS
+                # and the manifest's hash is compared with the stored one.
+                try:
+                    computed = backup_artifacts.artifact_sha256(source_path)
+                except ValueError as exc:
+                    computed = f"manifest mismatch: {exc}"
+                if computed != stored_hash:
                     logger.warning(
                         "Integrity check failed for backup %s: stored=%s computed=%s",
-                        backup_id, stored_hash, sha256.hexdigest(),
+                        backup_id, stored_hash, computed,
                     )
                     raise HTTPException(
                         status_code=409,
@@ -462,15 +464,15 @@ async def delete_backup(
             if fpath:
                 _allowed_base = os.path.abspath(NFS_BACKUP_PATH)
                 _abs_fpath = os.path.abspath(fpath)
-                if not _abs_fpath.startswith(_allowed_base + os.sep) and _abs_fpath != _allowed_base:
-                    logger.error(
-                        "Refusing to delete file outside backup directory (allowed=%s, got=%s)",
-                        _allowed_base, _abs_fpath,
-                    )
-                elif os.path.isfile(_abs_fpath):
+                if backup_artifacts.artifact_exists(_abs_fpath):
                     try:
-                        os.remove(_abs_fpath)
+                        backup_artifacts.remove_artifact(_abs_fpath, _allowed_base)
                         logger.info("Deleted backup file %s", _abs_fpath)
+                    except ValueError as exc:
+                        logger.error(
+                            "Refusing to delete path outside the backup layout (allowed=%s): %s",
+                            _allowed_base, exc,
+                        )
                     except OSError as exc:
                         logger.warning("Could not delete file %s: %s", _abs_fpath, exc)
 
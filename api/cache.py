@@ -1,11 +1,25 @@
 """
-api/cache.py — Simple Redis-backed TTL cache for expensive Platform9 API calls.
+api/cache.py — Two-tier (in-process LRU + Redis) TTL cache for expensive
+Platform9 API calls.
 
 Design goals:
 - Transparent: callers don't change; cache miss falls through to the real call.
 - Safe: any Redis failure falls back to a direct call — never raises.
 - Configurable: TTL and enable/disable controlled by env vars.
 
+Lookup order for a ``@cached`` call:
+  1. L1 — per-process LRU (``CACHE_L1_MAX_ENTRIES``, entries live at most
+     ``CACHE_L1_TTL_SECONDS`` so other workers' invalidations are picked up).
+  2. L2 — Redis, shared by all Gunicorn workers.
+  3. The wrapped function.  Only one caller per key refreshes it: threads in
+     this process wait for the leader, other workers see the Redis
+     ``<key>:lock`` and wait for the value to appear.
+Expired entries are kept for ``CACHE_STALE_SECONDS`` more; while one caller
+refreshes, everyone else is served the stale value (stale-while-revalidate).
+
+Values are stored JSON-encoded in both tiers, so every hit returns a fresh
+copy that the caller may mutate — the same contract as the Redis-only cache.
+
 Usage:
     from cache import cached
 
@@ -19,6 +33,9 @@ import hashlib
 import json
 import logging
 import os
+import threading
+import time
+from collections import OrderedDict
 from functools import wraps
 
 logger = logging.getLogger(__name__)
@@ -26,102 +43,367 @@ logger = logging.getLogger(__name__)
 REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
 DEFAULT_TTL = int(os.getenv("CACHE_TTL_SECONDS", "60"))
 CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+L1_MAX_ENTRIES = int(os.getenv("CACHE_L1_MAX_ENTRIES", "512"))
+L1_MAX_TTL = int(os.getenv("CACHE_L1_TTL_SECONDS", "15"))
+STALE_SECONDS = int(os.getenv("CACHE_STALE_SECONDS", "30"))
+FLIGHT_WAIT_SECONDS = float(os.getenv("CACHE_FLIGHT_WAIT_SECONDS", "15"))
+
+# A live client is re-checked at most this often; after a failed connect the
+# next attempt waits the same interval instead of blocking every call.
+_PING_INTERVAL = 30.0
+_RECONNECT_INTERVAL = 10.0
 
 _client = None
+_client_checked_at = 0.0
+_client_lock = threading.Lock()
 
 
 def _get_client():
     """Return a live Redis client, or None if unavailable."""
-    global _client
+    global _client, _client_checked_at
     if not CACHE_ENABLED:
         return None
-    if _client is not None:
+    now = time.monotonic()
+    if _client is not None and now - _client_checked_at < _PING_INTERVAL:
+        return _client
+    if _client is None and _client_checked_at and now - _client_checked_at < _RECONNECT_INTERVAL:
+        return None
+    with _client_lock:
+        if _client is not None:
+            if now - _client_checked_at < _PING_INTERVAL:
+                return _client
+            try:
+                _client.ping()
+                _client_checked_at = now
+                return _client
+            except Exception:
+                logger.warning("Redis connection dropped \u2014 reconnecting")
+                _client = None
+        elif _client_checked_at and now - _client_checked_at < _RECONNECT_INTERVAL:
+            return None
         try:
-            _client.ping()
-            return _client
-        except Exception:
-            logger.warning("Redis connection dropped \u2014 reconnecting")
+            import redis  # imported lazily so missing package doesn't break startup
+
+            c = redis.from_url(
+                REDIS_URL,
+                socket_connect_timeout=2,
+                socket_timeout=2,
+                decode_responses=True,
+            )
+            c.ping()
+            _client = c
+            logger.info("Redis cache connected at %s", REDIS_URL)
+        except Exception as exc:
+            logger.warning("Redis cache unavailable (%s) — running without cache", exc)
             _client = None
+        _client_checked_at = time.monotonic()
+    return _client
+
+
+def _drop_client() -> None:
+    """Forget the Redis client after an operation failed; reconnect later."""
+    global _client, _client_checked_at
+    with _client_lock:
+        _client = None
+        _client_checked_at = time.monotonic()
+
+
+# ── Counters ─────────────────────────────────────────────────────────────────
+
+_stats_lock = threading.Lock()
+_stats = {
+    "l1_hits": 0,
+    "l2_hits": 0,
+    "misses": 0,
+    "stale_served": 0,
+    "coalesced": 0,
+    "refreshes": 0,
+    "redis_errors": 0,
+}
+
+
+def _count(name: str) -> None:
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def cache_stats() -> dict:
+    """Per-process cache counters (reported under ``cache`` on /metrics)."""
+    with _stats_lock:
+        counters = dict(_stats)
+    lookups = counters["l1_hits"] + counters["l2_hits"] + counters["misses"]
+    hits = counters["l1_hits"] + counters["l2_hits"]
+    return {
+        "pid": os.getpid(),
+        **counters,
+        "hit_ratio": round(hits / lookups, 4) if lookups else None,
+        "l1_entries": len(_l1),
+        "l1_max_entries": L1_MAX_ENTRIES,
+        "redis_connected": _client is not None,
+    }
+
+
+# ── L1: per-process LRU ──────────────────────────────────────────────────────
+
+class _LocalLRU:
+    """Thread-safe LRU of ``key -> (raw_json, fresh_until, stale_until)``."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max(1, max_entries)
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[2] <= now:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry
+
+    def put(self, key: str, raw: str, fresh_for: float, stale_for: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._data[key] = (raw, now + fresh_for, now + fresh_for + stale_for)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def pop(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_l1 = _LocalLRU(L1_MAX_ENTRIES)
+
+
+# ── Single-flight ────────────────────────────────────────────────────────────
+
+class _Flight:
+    __slots__ = ("done", "raw")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.raw = None
+
+
+_flights: dict = {}
+_flights_lock = threading.Lock()
+
+
+def _join_flight(key: str):
+    """Return ``(flight, is_leader)`` for ``key``."""
+    with _flights_lock:
+        flight = _flights.get(key)
+        if flight is not None:
+            return flight, False
+        flight = _flights[key] = _Flight()
+        return flight, True
+
+
+def _finish_flight(key: str, flight: _Flight, raw) -> None:
+    flight.raw = raw
+    with _flights_lock:
+        _flights.pop(key, None)
+    flight.done.set()
+
+
+# ── Redis (L2) helpers ───────────────────────────────────────────────────────
+# L2 values are envelopes ``{"__pf9c": 1, "exp": <epoch>, "v": <value>}``
+# stored with a TTL of ttl + STALE_SECONDS, so an expired value can still be
+# served while it is refreshed.  Plain values written by older releases are
+# treated as fresh.
+
+def _l2_get(client, cache_key: str):
+    """Return ``(raw_value_json, is_fresh)`` or ``(None, False)``."""
     try:
-        import redis  # imported lazily so missing package doesn't break startup
-
-        c = redis.from_url(
-            REDIS_URL,
-            socket_connect_timeout=2,
-            socket_timeout=2,
-            decode_responses=True,
-        )
-        c.ping()
-        _client = c
-        logger.info("Redis cache connected at %s", REDIS_URL)
+        raw = client.get(cache_key)
     except Exception as exc:
-        logger.warning("Redis cache unavailable (%s) — running without cache", exc)
-        _client = None
-    return _client
+        logger.debug("Cache read error for %s: %s", cache_key, exc)
+        _count("redis_errors")
+        _drop_client()
+        return None, False
+    if raw is None:
+        return None, False
+    try:
+        doc = json.loads(raw)
+    except ValueError:
+        return None, False
+    if isinstance(doc, dict) and doc.get("__pf9c") == 1:
+        return json.dumps(doc.get("v")), doc.get("exp", 0) > time.time()
+    return raw, True
+
+
+def _l2_put(client, cache_key: str, raw: str, ttl: int) -> None:
+    envelope = '{"__pf9c": 1, "exp": %f, "v": %s}' % (time.time() + ttl, raw)
+    try:
+        client.setex(cache_key, ttl + STALE_SECONDS, envelope)
+    except Exception as exc:
+        logger.debug("Cache write error for %s: %s", cache_key, exc)
+        _count("redis_errors")
+        _drop_client()
+
+
+def _l2_try_lock(client, cache_key: str) -> bool:
+    """Cross-worker refresh lock; True when this process should refresh."""
+    if client is None:
+        return True
+    try:
+        return bool(client.set(f"{cache_key}:lock", os.getpid(), nx=True,
+                               px=int(FLIGHT_WAIT_SECONDS * 1000)))
+    except Exception:
+        return True
+
+
+def _l2_unlock(client, cache_key: str) -> None:
+    if client is None:
+        return
+    try:
+        client.delete(f"{cache_key}:lock")
+    except Exception:
+        pass
+
+
+def _l2_wait(client, cache_key: str):
+    """Poll Redis while another worker refreshes ``cache_key``."""
+    deadline = time.monotonic() + FLIGHT_WAIT_SECONDS
+    delay = 0.02
+    while time.monotonic() < deadline:
+        time.sleep(delay)
+        raw, fresh = _l2_get(client, cache_key)
+        if raw is not None and fresh:
+            return raw
+        try:
+            if not client.exists(f"{cache_key}:lock"):
+                return raw
+        except Exception:
+            return None
+        delay = min(delay * 2, 0.25)
+    return None
+
+
+def _cache_key(prefix: str, args: tuple, kwargs: dict) -> str:
+    # Key: prefix + region_id + hash of (positional args[1:] + kwargs)
+    region_segment = getattr(args[0], "region_id", "default") if args else "default"
+    key_data = json.dumps(
+        {"a": list(args[1:]), "k": kwargs}, sort_keys=True, default=str
+    )
+    # SHA-256 used for cache key sharding (non-security; truncated to 32 chars for brevity)
+    key_hash = hashlib.sha256(key_data.encode()).hexdigest()[:32]
+    return f"{prefix}:{region_segment}:{key_hash}"
 
 
 def cached(ttl: int = DEFAULT_TTL, key_prefix: str = ""):
     """
-    Decorator: cache the return value of a method in Redis.
+    Decorator: cache the return value of a method in L1 + Redis.
 
     - Key is derived from ``key_prefix`` (or the qualified function name) plus
       a hash of the positional arguments *after* ``self``.
     - Falls back to a direct call on any Redis error.
     - Instance-method safe: ``self`` is excluded from the cache key.
+    - Concurrent misses for one key are coalesced into a single call.
     """
 
     def decorator(fn):
         prefix = key_prefix or fn.__qualname__
+        l1_ttl = min(ttl, L1_MAX_TTL)
+
+        def _refresh(client, cache_key, args, kwargs):
+            result = fn(*args, **kwargs)
+            _count("refreshes")
+            try:
+                raw = json.dumps(result, default=str)
+            except (TypeError, ValueError):
+                return result, None
+            _l1.put(cache_key, raw, l1_ttl, STALE_SECONDS)
+            if client is not None:
+                _l2_put(client, cache_key, raw, ttl)
+            return result, raw
 
         @wraps(fn)
         def wrapper(*args, **kwargs):
-            client = _get_client()
-            if client is None:
+            if not CACHE_ENABLED:
                 return fn(*args, **kwargs)
-
-            # Build cache key: prefix + region_id + hash of (positional args[1:] + kwargs)
             try:
-                region_segment = getattr(args[0], "region_id", "default") if args else "default"
-                key_data = json.dumps(
-                    {"a": list(args[1:]), "k": kwargs}, sort_keys=True, default=str
-                )
-                # SHA-256 used for cache key sharding (non-security; truncated to 32 chars for brevity)
-                key_hash = hashlib.sha256(key_data.encode()).hexdigest()[:32]
-                cache_key = f"{prefix}:{region_segment}:{key_hash}"
+                cache_key = _cache_key(prefix, args, kwargs)
             except Exception:
                 return fn(*args, **kwargs)
 
-            # Try cache read
-            try:
-                raw = client.get(cache_key)
-                if raw is not None:
+            stale = None
+            entry = _l1.get(cache_key)
+            if entry is not None:
+                if entry[1] > time.monotonic():
+                    _count("l1_hits")
+                    return json.loads(entry[0])
+                stale = entry[0]
+
+            client = _get_client()
+            if client is not None:
+                raw, fresh = _l2_get(client, cache_key)
+                if raw is not None and fresh:
+                    _count("l2_hits")
+                    _l1.put(cache_key, raw, l1_ttl, STALE_SECONDS)
                     return json.loads(raw)
-            except Exception as exc:
-                logger.debug("Cache read error for %s: %s", cache_key, exc)
+                stale = raw if raw is not None else stale
 
-            # Cache miss — call through and store result
-            result = fn(*args, **kwargs)
-            try:
-                client.setex(cache_key, ttl, json.dumps(result, default=str))
-            except Exception as exc:
-                logger.debug("Cache write error for %s: %s", cache_key, exc)
+            _count("misses")
+            flight, leader = _join_flight(cache_key)
+            if not leader:
+                if stale is not None:
+                    _count("stale_served")
+                    return json.loads(stale)
+                if flight.done.wait(FLIGHT_WAIT_SECONDS) and flight.raw is not None:
+                    _count("coalesced")
+                    return json.loads(flight.raw)
+                return fn(*args, **kwargs)
 
-            return result
+            raw = None
+            try:
+                if _l2_try_lock(client, cache_key):
+                    try:
+                        result, raw = _refresh(client, cache_key, args, kwargs)
+                        return result
+                    finally:
+                        _l2_unlock(client, cache_key)
+                # Another worker is refreshing this key.
+                if stale is not None:
+                    _count("stale_served")
+                    raw = stale
+                    return json.loads(stale)
+                raw = _l2_wait(client, cache_key)
+                if raw is not None:
+                    _count("coalesced")
+                    _l1.put(cache_key, raw, l1_ttl, STALE_SECONDS)
+                    return json.loads(raw)
+                result, raw = _refresh(client, cache_key, args, kwargs)
+                return result
+            finally:
+                _finish_flight(cache_key, flight, raw)
 
         # Allow callers to bypass/invalidate manually
         def invalidate(*args, **kwargs):
+            try:
+                # Key must mirror wrapper() exactly: prefix + region_segment + hash of args[1:]
+                cache_key = _cache_key(prefix, args, kwargs)
+            except Exception as exc:
+                logger.debug("Cache invalidation error for %s: %s", prefix, exc)
+                return
+            _l1.pop(cache_key)
             client = _get_client()
             if client is None:
                 return
             try:
-                # Key must mirror wrapper() exactly: prefix + region_segment + hash of args[1:]
-                region_segment = getattr(args[0], "region_id", "default") if args else "default"
-                key_data = json.dumps(
-                    {"a": list(args[1:]), "k": kwargs}, sort_keys=True, default=str
-                )
-                # SHA-256 used for cache key sharding (non-security; truncated to 32 chars for brevity)
-                key_hash = hashlib.sha256(key_data.encode()).hexdigest()[:32]
-                cache_key = f"{prefix}:{region_segment}:{key_hash}"
                 client.delete(cache_key)
             except Exception as exc:
                 logger.debug("Cache invalidation error for %s: %s", prefix, exc)
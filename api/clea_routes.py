@@ -530,17 +530,17 @@ def _process_policy(policy: dict, event_id: Optional[int], metadata: dict) -> No
 
 
 def _trigger_runbook_for_clea(exec_id: int, runbook_name: str, actor: str) -> None:
-    """Create a runbook execution record and run the engine. Updates clea_executions on completion."""
+    """Queue a dry-run runbook execution for the worker pool and link it to the clea execution."""
     try:
-        from runbook_routes import _execute_runbook  # lazy — avoids circular import at module load
+        from runbook_routes import runbook_pool  # lazy — avoids circular import at module load
 
         with get_connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
                 cur.execute(
                     """
                     INSERT INTO runbook_executions
-                        (runbook_name, status, dry_run, parameters, triggered_by)
-                    VALUES (%s, 'approved', true, %s, %s)
+                        (runbook_name, status, dry_run, parameters, triggered_by, queued_at)
+                    VALUES (%s, 'queued', true, %s, %s, now())
                     RETURNING execution_id
                     """,
                     (runbook_name, json.dumps({}), actor),
@@ -556,8 +556,8 @@ def _trigger_runbook_for_clea(exec_id: int, runbook_name: str, actor: str) -> No
                     (rb_exec_id, exec_id),
                 )
 
-        # Run the engine (already in a background thread when called from event_bus)
-        _execute_runbook(rb_exec_id, runbook_name, {}, True, actor)
+        # Queued like any other trigger, so per-runbook limits and cancel apply
+        runbook_pool.wake()
 
     except Exception:
         logger.warning(
@@ -25,7 +25,7 @@ from pydantic import BaseModel, Field
 from psycopg2.extras import RealDictCursor
 
 from db_pool import get_connection
-from copilot_intents import match_intent, get_suggestion_chips, _extract_scope
+from copilot_intents import match_intent, explain_intent, get_suggestion_chips, _extract_scope
 from copilot_context import build_infra_context
 from copilot_llm import ask_llm, test_ollama, test_openai, test_anthropic
 from crypto_helper import fernet_encrypt, fernet_decrypt
@@ -99,6 +99,8 @@ class AskResponse(BaseModel):
     runbook_name: str | None = None
     risk_level: str | None = None
     supports_dry_run: bool = False
+    # Built-in matcher signals behind `intent` (keywords, pattern, overlap, scope, boost)
+    intent_signals: dict | None = None
 
 
 class FeedbackRequest(BaseModel):
@@ -442,6 +444,7 @@ async def ask(body: AskRequest, request: Request):
         runbook_name=intent_match.runbook_name if intent_match else None,
         risk_level=intent_match.risk_level if (intent_match and intent_match.runbook_name) else None,
         supports_dry_run=intent_match.supports_dry_run if intent_match else False,
+        intent_signals=intent_match.signals if (intent_match and intent_key) else None,
     )
 
 
@@ -451,6 +454,15 @@ async def suggestions():
     return {"suggestions": get_suggestion_chips()}
 
 
+@router.get("/explain")
+async def explain(question: str, limit: int = 5):
+    """Rank the built-in intents for a question and show why each scored."""
+    question = question.strip()
+    if not question or len(question) > 1000:
+        raise HTTPException(status_code=400, detail="question must be 1-1000 characters")
+    return {"question": question, "candidates": explain_intent(question, max(1, min(limit, 20)))}
+
+
 @router.get("/history")
 async def history(request: Request, limit: int = 50):
     """Return conversation history for the current user."""
@@ -40,6 +40,7 @@ class IntentMatch:
     runbook_name: Optional[str] = None     # runbook the Copilot can offer to run
     risk_level: str = "low"                # low | medium | high
     supports_dry_run: bool = False         # whether the runbook supports dry_run
+    signals: dict = field(default_factory=dict)  # what produced the score (see explain_intent)
 
 
 @dataclass
@@ -88,11 +89,16 @@ _HOST_PATTERNS = [
 ]
 
 
+_SCOPE_RES = [re.compile(p) for p in _SCOPE_PATTERNS]
+_HOST_RES = [re.compile(p) for p in _HOST_PATTERNS]
+_QUALIFIER_RES = [re.compile(p, re.IGNORECASE) for p in _SCOPE_PATTERNS + _HOST_PATTERNS]
+
+
 def _extract_scope(question: str) -> Optional[str]:
     """Extract tenant/project name from question."""
     q = question.lower().strip()
-    for pat in _SCOPE_PATTERNS:
-        m = re.search(pat, q)
+    for rx in _SCOPE_RES:
+        m = rx.search(q)
         if m:
             return m.group(1)
     return None
@@ -101,8 +107,8 @@ def _extract_scope(question: str) -> Optional[str]:
 def _extract_host(question: str) -> Optional[str]:
     """Extract host name from question."""
     q = question.lower().strip()
-    for pat in _HOST_PATTERNS:
-        m = re.search(pat, q)
+    for rx in _HOST_RES:
+        m = rx.search(q)
         if m:
             return m.group(1)
     return None
@@ -111,8 +117,8 @@ def _extract_host(question: str) -> Optional[str]:
 def _strip_scope_from_question(question: str) -> str:
     """Remove scope qualifier from question for cleaner matching."""
     q = question
-    for pat in _SCOPE_PATTERNS + _HOST_PATTERNS:
-        q = re.sub(pat, "", q, flags=re.IGNORECASE)
+    for rx in _QUALIFIER_RES:
+        q = rx.sub("", q)
     return q.strip()
 
 
@@ -1628,9 +1634,14 @@ INTENTS: List[IntentDef] = [
 # Matching engine
 # ---------------------------------------------------------------------------
 
+_CONFIDENCE_THRESHOLD = 0.35
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
 def _normalize(text: str) -> str:
     """Lowercase + collapse whitespace."""
-    return re.sub(r"\s+", " ", text.lower().strip())
+    return _WHITESPACE_RE.sub(" ", text.lower().strip())
 
 
 # Common synonyms for fuzzy matching
@@ -1655,23 +1666,188 @@ _SYNONYMS = {
     "stopped": "shutoff",
 }
 
+# Alternation order follows _SYNONYMS, so where two entries overlap the
+# earlier one wins ("org" before "organisation"), as with chained replace().
+_SYNONYM_RE = re.compile("|".join(re.escape(syn) for syn in _SYNONYMS))
+
 
 def _expand_synonyms(text: str) -> str:
     """Expand common synonyms to canonical form for better matching."""
-    t = text
-    for syn, canon in _SYNONYMS.items():
-        t = t.replace(syn, f"{syn} {canon}")
-    return t
+    return _SYNONYM_RE.sub(lambda m: f"{m.group(0)} {_SYNONYMS[m.group(0)]}", text)
 
 
-def match_intent(question: str) -> Optional[IntentMatch]:
+def _required_literal(pattern: str) -> Optional[str]:
     """
-    Score every intent against `question` and return the best match
-    above the confidence threshold (0.35), or None.
+    Longest run of literal text every match of `pattern` must contain, or
+    None.  Conservative: group and class contents are ignored, a character
+    made optional by ?, * or {…} is dropped, and a top-level | gives None.
+    """
+    runs, buf, depth, i = [], "", 0, 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\":
+            runs.append(buf)
+            buf = ""
+            i += 2
+            continue
+        if c == "[":
+            runs.append(buf)
+            buf = ""
+            i = pattern.index("]", i + 2) + 1
+            continue
+        if c == "(":
+            if depth == 0:
+                runs.append(buf)
+                buf = ""
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif depth:
+            pass
+        elif c == "|":
+            return None
+        elif c in "?*{":
+            runs.append(buf[:-1])
+            buf = ""
+        elif c in "+.^$":
+            runs.append(buf)
+            buf = ""
+        else:
+            buf += c
+        i += 1
+    runs.append(buf)
+    best = max(runs, key=len)
+    return best if len(best.strip()) >= 3 else None
 
-    Supports tenant/project scoping: "how many VMs on tenant <name>"
-     → will match count_vms intent with scoped SQL.
+
+@dataclass
+class _CompiledIntent:
+    """An IntentDef with its keyword words split."""
+    intent: IntentDef
+    words: frozenset
+
+
+class _IntentIndex:
+    """
+    Everything match_intent needs that does not depend on the question,
+    built once at import.
+
+    Keywords are found through a trigram → (intent, keyword) map: each
+    keyword is filed under one of its trigrams, so only keywords whose
+    trigram occurs in the question are tested with `in`.  Keyword words
+    map to the intents that use them for the word-overlap score.  Regexes
+    are grouped by required literal and a group only runs when its literal
+    is in the question.
+    Intents with none of these signals cannot score above the threshold
+    unless their boost alone does, so they are never looked at.
     """
+
+    def __init__(self, intents: List[IntentDef]):
+        self.entries: List[_CompiledIntent] = []
+        self.by_trigram: dict = {}
+        self.by_word: dict = {}
+        self.always: List[int] = []
+        # required literal → [(position, pattern index, regex)]; None = always run
+        self.patterns: dict = {}
+        trigram_use: dict = {}
+        for intent in intents:
+            for kw in intent.keywords:
+                for gram in {kw[j:j + 3] for j in range(len(kw) - 2)}:
+                    trigram_use[gram] = trigram_use.get(gram, 0) + 1
+        self.short_keywords: List[Tuple[int, str]] = []
+        for pos, intent in enumerate(intents):
+            words = set()
+            for kw in intent.keywords:
+                words.update(kw.split())
+                grams = [kw[j:j + 3] for j in range(len(kw) - 2)]
+                if grams:
+                    rarest = min(grams, key=trigram_use.__getitem__)
+                    self.by_trigram.setdefault(rarest, []).append((pos, kw))
+                else:
+                    self.short_keywords.append((pos, kw))
+            for word in words:
+                self.by_word.setdefault(word, []).append(pos)
+            for n, pattern in enumerate(intent.patterns):
+                self.patterns.setdefault(_required_literal(pattern), []).append(
+                    (pos, n, re.compile(pattern)))
+            self.entries.append(_CompiledIntent(intent=intent, words=frozenset(words)))
+            if min(intent.boost, 1.0) > _CONFIDENCE_THRESHOLD:
+                self.always.append(pos)
+
+    def _keyword_hits(self, q: str) -> dict:
+        """{intent position: [keywords found in q]} in keyword-list order."""
+        hits: dict = {}
+        for gram in {q[j:j + 3] for j in range(len(q) - 2)}:
+            for pos, kw in self.by_trigram.get(gram, ()):
+                if kw in q:
+                    hits.setdefault(pos, []).append(kw)
+        for pos, kw in self.short_keywords:
+            if kw in q:
+                hits.setdefault(pos, []).append(kw)
+        return hits
+
+    def rank(self, variants: List[str], q_words: set, scoped: bool) -> List[Tuple[float, int, dict]]:
+        """
+        (score, intent position, signals) for every intent scoring above
+        the threshold, best first; ties keep INTENTS order.
+        """
+        keyword_hits = [self._keyword_hits(q) for q in variants]
+        pattern_hits: dict = {}
+        joined = "\n".join(variants)  # one `in` test per literal for all variants
+        for literal, compiled in self.patterns.items():
+            if literal is None:
+                texts = variants
+            elif literal in joined:
+                texts = [q for q in variants if literal in q]
+            else:
+                continue
+            for pos, n, rx in compiled:
+                if (pos not in pattern_hits or n < pattern_hits[pos][0]) \
+                        and any(rx.search(q) for q in texts):
+                    pattern_hits[pos] = (n, rx.pattern)
+        overlap: dict = {}
+        for word in q_words:
+            for pos in self.by_word.get(word, ()):
+                overlap.setdefault(pos, []).append(word)
+
+        candidates = set(pattern_hits).union(self.always, *keyword_hits)
+        candidates.update(pos for pos, words in overlap.items() if len(words) >= 2)
+
+        ranked = []
+        for pos in sorted(candidates):
+            intent = self.entries[pos].intent
+            signals: dict = {}
+            score = 0.0
+            n_keywords = max(len(intent.keywords), 1)
+            for hits in keyword_hits:
+                found = hits.get(pos)
+                if found:
+                    score = max(score, min(len(found) / n_keywords + 0.3, 0.95))
+                    signals.setdefault("keywords", [])
+                    signals["keywords"] += [kw for kw in found if kw not in signals["keywords"]]
+            if pos in pattern_hits:
+                score = max(score, 0.85)
+                signals["pattern"] = pattern_hits[pos][1]
+            shared = overlap.get(pos, ())
+            if len(shared) >= 2:
+                words = self.entries[pos].words
+                score = max(score, min(len(shared) / max(len(words), 1) * 0.6 + 0.25, 0.75))
+                signals["overlap"] = sorted(shared)
+            if scoped and intent.supports_scope and score > 0.3:
+                score = min(score + 0.15, 1.0)
+                signals["scope"] = True
+            if intent.boost:
+                signals["boost"] = intent.boost
+            score += intent.boost
+            score = min(score, 1.0)
+            if score > _CONFIDENCE_THRESHOLD:
+                ranked.append((score, pos, signals))
+        ranked.sort(key=lambda item: (-item[0], item[1]))
+        return ranked
+
+
+def _rank(question: str):
+    """Ranked (score, IntentDef, signals) for `question`, plus its scope and host."""
     raw_q = _normalize(question)
     # Strip scope qualifiers for cleaner intent matching
     q_clean = _normalize(_strip_scope_from_question(question))
@@ -1681,49 +1857,38 @@ def match_intent(question: str) -> Optional[IntentMatch]:
     scope = _extract_scope(raw_q)
     host = _extract_host(raw_q)
 
-    best: Optional[Tuple[float, IntentDef]] = None
-
-    for intent in INTENTS:
-        score = 0.0
-
-        # Try matching against both clean and expanded versions
-        for q in (q_clean, q_expanded, raw_q):
-            # Keyword matching — partial keyword hit gives partial score
-            kw_hits = sum(1 for kw in intent.keywords if kw in q)
-            if kw_hits:
-                kw_score = min(kw_hits / max(len(intent.keywords), 1) + 0.3, 0.95)
-                score = max(score, kw_score)
-
-            # Regex matching — a hit gives a strong score
-            for pat in intent.patterns:
-                if re.search(pat, q):
-                    score = max(score, 0.85)
-                    break
-
-        # Word overlap scoring — catch natural language variations
-        intent_words = set()
-        for kw in intent.keywords:
-            intent_words.update(kw.split())
-        q_words = set(q_expanded.split())
-        overlap = intent_words & q_words
-        if len(overlap) >= 2:
-            word_score = min(len(overlap) / max(len(intent_words), 1) * 0.6 + 0.25, 0.75)
-            score = max(score, word_score)
-
-        # Boost if the question mentions a scope and the intent supports it
-        if (scope or host) and intent.supports_scope and score > 0.3:
-            score = min(score + 0.15, 1.0)
-
-        score += intent.boost
-        score = min(score, 1.0)
-
-        if score > 0.35 and (best is None or score > best[0]):
-            best = (score, intent)
-
-    if best is None:
+    variants = list(dict.fromkeys((q_clean, q_expanded, raw_q)))
+    ranked = _INDEX.rank(variants, set(q_expanded.split()), bool(scope or host))
+    return [(score, _INDEX.entries[pos].intent, signals) for score, pos, signals in ranked], scope, host
+
+
+def explain_intent(question: str, limit: int = 5) -> List[dict]:
+    """
+    The best-scoring intents for `question` and the signals behind each
+    score: keywords found, the regex that matched, overlapping words,
+    the scope bonus and the intent's boost.
+    """
+    ranked, _scope, _host = _rank(question)
+    return [
+        {"intent_key": intent.key, "display_name": intent.display_name,
+         "confidence": round(score, 3), "signals": signals}
+        for score, intent, signals in ranked[:limit]
+    ]
+
+
+def match_intent(question: str) -> Optional[IntentMatch]:
+    """
+    Score every intent against `question` and return the best match
+    above the confidence threshold (0.35), or None.
+
+    Supports tenant/project scoping: "how many VMs on tenant <name>"
+     → will match count_vms intent with scoped SQL.
+    """
+    ranked, scope, host = _rank(question)
+    if not ranked:
         return None
 
-    score, intent = best
+    score, intent, signals = ranked[0]
 
     # Build scoped SQL if applicable
     final_sql = intent.sql
@@ -1779,9 +1944,13 @@ def match_intent(question: str) -> Optional[IntentMatch]:
         runbook_name=intent.runbook_name,
         risk_level=intent.risk_level,
         supports_dry_run=intent.supports_dry_run,
+        signals=signals,
     )
 
 
+_INDEX = _IntentIndex(INTENTS)
+
+
 def get_suggestion_chips() -> List[dict]:
     """
     Return a list of categorized quick-suggestion chips for the UI,
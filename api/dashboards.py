@@ -10,6 +10,7 @@ Provides 4 main endpoints:
 4. GET /dashboard/recent-changes - Changes in last N hours
 """
 
+import asyncio
 import os
 import json
 import logging
@@ -22,7 +23,7 @@ import psycopg2
 from psycopg2.extras import RealDictCursor
 import glob
 from auth import require_permission, get_effective_region_filter
-from db_pool import get_connection
+from db_pool import get_connection, fetch_all, fetch_one, off_loop, run_db
 
 
 
@@ -32,7 +33,8 @@ router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
 
 @router.get("/rvtools-last-run", dependencies=[Depends(require_permission("dashboard", "read"))])
-async def get_rvtools_last_run():
+@off_loop
+def get_rvtools_last_run():
     """Return the timestamp and details of the last inventory / RVTools data collection."""
     try:
         with get_connection() as conn:
@@ -69,20 +71,18 @@ async def get_rvtools_last_run():
     return {"last_run": last_run}
 
 
-def _get_alert_counts(conn) -> Dict[str, int]:
+async def _get_alert_counts_async() -> Dict[str, int]:
     """Return real critical/warnings/alerts counts from the DB for the last 24 hours."""
     try:
-        with conn.cursor() as _ac:
-            _ac.execute(
-                "SELECT COUNT(*) FROM runbook_executions "
-                "WHERE status = 'failed' AND created_at > NOW() - INTERVAL '24 hours'"
-            )
-            critical_count = (_ac.fetchone() or [0])[0]
-            _ac.execute(
-                "SELECT COUNT(*) FROM snapshot_runs "
-                "WHERE status = 'failed' AND started_at > NOW() - INTERVAL '24 hours'"
-            )
-            warnings_count = (_ac.fetchone() or [0])[0]
+        row = await fetch_one(
+            "SELECT "
+            "(SELECT COUNT(*) FROM runbook_executions "
+            " WHERE status = 'failed' AND created_at > NOW() - INTERVAL '24 hours') AS critical_count, "
+            "(SELECT COUNT(*) FROM snapshot_runs "
+            " WHERE status = 'failed' AND started_at > NOW() - INTERVAL '24 hours') AS warnings_count"
+        ) or {}
+        critical_count = row.get("critical_count") or 0
+        warnings_count = row.get("warnings_count") or 0
         return {
             "critical_count": int(critical_count),
             "warnings_count": int(warnings_count),
@@ -553,101 +553,60 @@ async def get_health_summary(
     - Alert/warning/critical counts
     """
     try:
-        with get_connection() as conn:
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-            region_where  = "WHERE region_id = %s" if region_id else ""
-            region_and    = "AND region_id = %s"   if region_id else ""
-            region_params = (region_id,) if region_id else ()
-        
-            # Get resource counts (separate queries to avoid cartesian products)
-            cursor.execute("SELECT COUNT(*) as total_tenants FROM projects")
-            total_tenants = (cursor.fetchone() or {}).get("total_tenants", 0)
-
-            cursor.execute(f"SELECT COUNT(*) as total_vms FROM servers {region_where}", region_params)
-            total_vms_count = (cursor.fetchone() or {}).get("total_vms", 0)
-
-            cursor.execute(f"SELECT COUNT(*) as total_volumes FROM volumes {region_where}", region_params)
-            total_volumes_count = (cursor.fetchone() or {}).get("total_volumes", 0)
-
-            cursor.execute(f"SELECT COUNT(*) as total_networks FROM networks {region_where}", region_params)
-            total_networks_count = (cursor.fetchone() or {}).get("total_networks", 0)
-
-            counts = {
-                "total_tenants": total_tenants,
-                "total_vms": total_vms_count,
-                "total_volumes": total_volumes_count,
-                "total_networks": total_networks_count,
-            }
-        
-            # Get running VM count
-            if region_id:
-                cursor.execute("SELECT COUNT(*) as running_vms FROM servers WHERE status = 'ACTIVE' AND region_id = %s", (region_id,))
-            else:
-                cursor.execute("SELECT COUNT(*) as running_vms FROM servers WHERE status = 'ACTIVE'")
-            running = dict(cursor.fetchone() or {})
-
-            # Get total hosts (hypervisors)
-            cursor.execute(f"SELECT COUNT(*) as total_hosts FROM hypervisors {region_where}", region_params)
-            hosts_count = dict(cursor.fetchone() or {})
-
-            # Snapshot coverage and freshness
-            cursor.execute(f"SELECT COUNT(*) as total_snapshots FROM snapshots {region_where}", region_params)
-            snapshots_count = dict(cursor.fetchone() or {})
-
-            if region_id:
-                cursor.execute("SELECT COUNT(*) as snapshots_last_24h FROM snapshots WHERE created_at > now() - interval '24 hours' AND region_id = %s", (region_id,))
-            else:
-                cursor.execute("SELECT COUNT(*) as snapshots_last_24h FROM snapshots WHERE created_at > now() - interval '24 hours'")
-            snapshots_last_24h = dict(cursor.fetchone() or {})
+        region_where = "WHERE region_id = %(region_id)s" if region_id else ""
+        region_and   = "AND region_id = %(region_id)s"   if region_id else ""
+        v_region_and = "AND v.region_id = %(region_id)s" if region_id else ""
+
+        # One round-trip for every count (each a separate scalar subquery, so
+        # there are no cartesian products)
+        counts_query = fetch_one(
+            f"""
+            SELECT
+                (SELECT COUNT(*) FROM projects) AS total_tenants,
+                (SELECT COUNT(*) FROM servers {region_where}) AS total_vms,
+                (SELECT COUNT(*) FROM volumes {region_where}) AS total_volumes,
+                (SELECT COUNT(*) FROM networks {region_where}) AS total_networks,
+                (SELECT COUNT(*) FROM servers WHERE status = 'ACTIVE' {region_and}) AS running_vms,
+                (SELECT COUNT(*) FROM hypervisors {region_where}) AS total_hosts,
+                (SELECT COUNT(*) FROM snapshots {region_where}) AS total_snapshots,
+                (SELECT COUNT(*) FROM snapshots
+                  WHERE created_at > now() - interval '24 hours' {region_and}) AS snapshots_last_24h,
+                (SELECT COUNT(*)
+                   FROM volumes v
+                   LEFT JOIN snapshots s ON s.volume_id = v.id
+                  WHERE s.id IS NULL {v_region_and}) AS volumes_without_snapshots
+            """,
+            {"region_id": region_id},
+        )
+        # The metrics cache is a file read or an HTTP call to the monitoring
+        # service; it runs alongside the count queries.
+        counts, metrics_summary, _alert_counts = await asyncio.gather(
+            counts_query,
+            run_db(lambda: _calculate_metrics_summary(_load_metrics_cache())),
+            _get_alert_counts_async(),
+        )
+        counts = counts or {}
 
-            if region_id:
-                cursor.execute(
-                    """
-                    SELECT COUNT(*) as volumes_without_snapshots
-                    FROM volumes v
-                    LEFT JOIN snapshots s ON s.volume_id = v.id
-                    WHERE s.id IS NULL AND v.region_id = %s
-                    """, (region_id,)
-                )
-            else:
-                cursor.execute(
-                    """
-                    SELECT COUNT(*) as volumes_without_snapshots
-                    FROM volumes v
-                    LEFT JOIN snapshots s ON s.volume_id = v.id
-                    WHERE s.id IS NULL
-                    """
-                )
-            volumes_without_snapshots = dict(cursor.fetchone() or {})
-        
-            cursor.close()
-        
-            # Try to load metrics from cache for utilization data
-            metrics_data = _load_metrics_cache()
-            metrics_summary = _calculate_metrics_summary(metrics_data)
-            _alert_counts = _get_alert_counts(conn)
-        
-            return {
-                "total_tenants": counts.get("total_tenants", 0),
-                "total_vms": counts.get("total_vms", 0),
-                "running_vms": running.get("running_vms", 0),
-                "total_volumes": counts.get("total_volumes", 0),
-                "total_networks": counts.get("total_networks", 0),
-                "avg_cpu_utilization": round(metrics_summary["avg_cpu"], 1),
-                "avg_memory_utilization": round(metrics_summary["avg_memory"], 1),
-                "total_hosts": hosts_count.get("total_hosts", 0),
-                "total_snapshots": snapshots_count.get("total_snapshots", 0),
-                "snapshots_last_24h": snapshots_last_24h.get("snapshots_last_24h", 0),
-                "volumes_without_snapshots": volumes_without_snapshots.get("volumes_without_snapshots", 0),
-                "metrics_host_count": metrics_summary["metrics_host_count"],
-                "metrics_last_update": metrics_summary["metrics_last_update"],
-                "alerts_count": _alert_counts["alerts_count"],
-                "critical_count": _alert_counts["critical_count"],
-                "warnings_count": _alert_counts["warnings_count"],
-                "region_id": region_id,
-                "timestamp": datetime.now(timezone.utc).isoformat()
-            }
+        return {
+            "total_tenants": counts.get("total_tenants", 0),
+            "total_vms": counts.get("total_vms", 0),
+            "running_vms": counts.get("running_vms", 0),
+            "total_volumes": counts.get("total_volumes", 0),
+            "total_networks": counts.get("total_networks", 0),
+            "avg_cpu_utilization": round(metrics_summary["avg_cpu"], 1),
+            "avg_memory_utilization": round(metrics_summary["avg_memory"], 1),
+            "total_hosts": counts.get("total_hosts", 0),
+            "total_snapshots": counts.get("total_snapshots", 0),
+            "snapshots_last_24h": counts.get("snapshots_last_24h", 0),
+            "volumes_without_snapshots": counts.get("volumes_without_snapshots", 0),
+            "metrics_host_count": metrics_summary["metrics_host_count"],
+            "metrics_last_update": metrics_summary["metrics_last_update"],
+            "alerts_count": _alert_counts["alerts_count"],
+            "critical_count": _alert_counts["critical_count"],
+            "warnings_count": _alert_counts["warnings_count"],
+            "region_id": region_id,
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        }
     except Exception as e:
         logger.error("Error in get_health_summary: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -667,18 +626,15 @@ async def get_health_trend(
     Snapshots are written once daily by the scheduler worker.
     """
     try:
-        with get_connection() as conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute(
-                    """
-                    SELECT snapshot_date, total_vms, running_vms, total_hosts, critical_count
-                    FROM dashboard_health_snapshots
-                    ORDER BY snapshot_date ASC
-                    LIMIT %s
-                    """,
-                    (days,),
-                )
-                rows = cur.fetchall()
+        rows = await fetch_all(
+            """
+            SELECT snapshot_date, total_vms, running_vms, total_hosts, critical_count
+            FROM dashboard_health_snapshots
+            ORDER BY snapshot_date ASC
+            LIMIT %s
+            """,
+            (days,),
+        )
         return [dict(r) for r in rows]
     except Exception as e:
         logger.error("Error in get_health_trend: %s", e)
@@ -689,7 +645,8 @@ async def get_health_trend(
 # ENDPOINT 2: Snapshot SLA Compliance
 # =========================================================================
 @router.get("/snapshot-sla-compliance")
-async def get_snapshot_sla_compliance():
+@off_loop
+def get_snapshot_sla_compliance():
     """
     Get snapshot SLA compliance status by tenant.
     
@@ -840,7 +797,8 @@ async def get_snapshot_sla_compliance():
 # ENDPOINT 3: Top Hosts Utilization
 # =========================================================================
 @router.get("/top-hosts-utilization")
-async def get_top_hosts_utilization(limit: int = Query(5, ge=1, le=20), sort: str = Query("cpu")):
+@off_loop
+def get_top_hosts_utilization(limit: int = Query(5, ge=1, le=20), sort: str = Query("cpu")):
     """
     Get top hosts by CPU or memory utilization.
     
@@ -1021,7 +979,8 @@ async def get_top_hosts_utilization(limit: int = Query(5, ge=1, le=20), sort: st
 # ENDPOINT 4: Recent Changes
 # =========================================================================
 @router.get("/recent-changes")
-async def get_recent_changes(hours: int = Query(24, ge=1, le=720)):
+@off_loop
+def get_recent_changes(hours: int = Query(24, ge=1, le=720)):
     """
     Get recent infrastructure changes (last N hours).
     
@@ -1160,7 +1119,8 @@ async def get_recent_changes(hours: int = Query(24, ge=1, le=720)):
 # ENDPOINT 5: Snapshot Coverage and Risk Summary
 # =========================================================================
 @router.get("/coverage-risks")
-async def get_coverage_risks():
+@off_loop
+def get_coverage_risks():
     """Return snapshot coverage risk metrics and lowest coverage tenants."""
     try:
         with get_connection() as conn:
@@ -1270,7 +1230,8 @@ async def get_coverage_risks():
 # ENDPOINT 6: Capacity Pressure Summary
 # =========================================================================
 @router.get("/capacity-pressure")
-async def get_capacity_pressure():
+@off_loop
+def get_capacity_pressure():
     """Return top tenants by resource pressure and active VM counts."""
     try:
         with get_connection() as conn:
@@ -1337,7 +1298,8 @@ async def get_capacity_pressure():
 # ENDPOINT 7: VM Hotspots from Monitoring
 # =========================================================================
 @router.get("/vm-hotspots")
-async def get_vm_hotspots(limit: int = Query(5, ge=1, le=20), sort: str = Query("cpu")):
+@off_loop
+def get_vm_hotspots(limit: int = Query(5, ge=1, le=20), sort: str = Query("cpu")):
     """Return top VMs by CPU, memory, or storage usage."""
     try:
         metrics_data = _load_metrics_cache()
@@ -1434,7 +1396,8 @@ async def get_vm_hotspots(limit: int = Query(5, ge=1, le=20), sort: str = Query(
 # ENDPOINT 8: Change and Compliance Summary
 # =========================================================================
 @router.get("/change-compliance")
-async def get_change_compliance(hours: int = Query(24, ge=1, le=720)):
+@off_loop
+def get_change_compliance(hours: int = Query(24, ge=1, le=720)):
     """Return change and compliance summary for the last N hours."""
     try:
         with get_connection() as conn:
@@ -1480,7 +1443,8 @@ async def get_change_compliance(hours: int = Query(24, ge=1, le=720)):
 # ENDPOINT 9: Tenant Risk Scores
 # =========================================================================
 @router.get("/tenant-risk-scores")
-async def get_tenant_risk_scores():
+@off_loop
+def get_tenant_risk_scores():
     """Return tenant snapshot risk scores based on coverage and staleness."""
     try:
         return {
@@ -1496,7 +1460,8 @@ async def get_tenant_risk_scores():
 # ENDPOINT 11: Tenant Risk Heatmap
 # =========================================================================
 @router.get("/tenant-risk-heatmap")
-async def get_tenant_risk_heatmap():
+@off_loop
+def get_tenant_risk_heatmap():
     """Return tenant risk scores formatted for heatmap display."""
     try:
         tenants = _calculate_tenant_risk_scores()
@@ -1513,7 +1478,8 @@ async def get_tenant_risk_heatmap():
 # ENDPOINT 10: Trendlines
 # =========================================================================
 @router.get("/trendlines")
-async def get_trendlines(days: int = Query(14, ge=7, le=90)):
+@off_loop
+def get_trendlines(days: int = Query(14, ge=7, le=90)):
     """Return daily trendlines for key activity signals."""
     try:
         with get_connection() as conn:
@@ -1604,7 +1570,8 @@ async def get_trendlines(days: int = Query(14, ge=7, le=90)):
 # ENDPOINT 12: Capacity Trends
 # =========================================================================
 @router.get("/capacity-trends")
-async def get_capacity_trends(days: int = Query(30, ge=7, le=180)):
+@off_loop
+def get_capacity_trends(days: int = Query(30, ge=7, le=180)):
     """Return capacity trends for VMs and volumes."""
     try:
         with get_connection() as conn:
@@ -1662,7 +1629,8 @@ async def get_capacity_trends(days: int = Query(30, ge=7, le=180)):
 # ENDPOINT 13: Compliance Drift Signals
 # =========================================================================
 @router.get("/compliance-drift")
-async def get_compliance_drift():
+@off_loop
+def get_compliance_drift():
     """Return compliance drift signals and top risk tenants."""
     try:
         tenant_compliance = _compute_snapshot_compliance_by_tenant()
@@ -1730,7 +1698,8 @@ async def get_compliance_drift():
 # BONUS: Tenant Summary (for quick reference)
 # =========================================================================
 @router.get("/tenant-summary")
-async def get_tenant_summary():
+@off_loop
+def get_tenant_summary():
     """
     Get quick summary for all tenants.
     
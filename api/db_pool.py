@@ -14,12 +14,30 @@ Usage:
             rows = cur.fetchall()
         # conn auto-commits on success, auto-rollbacks on exception
         # conn is returned to pool automatically
+
+``async def`` handlers must not call ``get_connection()`` directly — every
+query would block the event loop.  Use ``fetch_all`` / ``fetch_one`` for
+simple reads, ``run_db`` for a blocking call, or ``@off_loop`` on a handler
+that stays synchronous:
+
+    @router.get("/x")
+    @off_loop
+    def get_x(...):
+        with get_connection() as conn:
+            ...
+
+    rows = await fetch_all("SELECT ... WHERE id = %(id)s", {"id": 7})
 """
 
+import asyncio
+import contextvars
+import functools
+import inspect
 import os
 import logging
 import threading
-from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
 
 import psycopg2
 from psycopg2 import pool
@@ -37,6 +55,16 @@ _pool_lock = threading.Lock()
 # Pool sizing (per worker process)
 POOL_MIN_CONN = int(os.getenv("DB_POOL_MIN_CONN", "2"))
 POOL_MAX_CONN = int(os.getenv("DB_POOL_MAX_CONN", "10"))
+# How long a caller waits for a free connection before PoolError.  psycopg2's
+# ThreadedConnectionPool raises immediately when exhausted; callers now queue.
+POOL_WAIT_SECONDS = float(os.getenv("DB_POOL_WAIT_SECONDS", "30"))
+# Threads that run blocking DB work for async handlers (run_db / off_loop)
+DB_EXECUTOR_THREADS = int(os.getenv("DB_EXECUTOR_THREADS", str(POOL_MAX_CONN)))
+# "threads": fetch_* run psycopg2 on the DB threads.  "psycopg": fetch_* and
+# get_async_connection() use a native psycopg 3 AsyncConnectionPool.
+DB_ASYNC_DRIVER = os.getenv("DB_ASYNC_DRIVER", "threads").strip().lower()
+
+_slots = threading.BoundedSemaphore(POOL_MAX_CONN)  # resized by init_pool()
 
 
 def _db_params() -> dict:
@@ -56,7 +84,7 @@ def init_pool(minconn: int = None, maxconn: int = None):
     Initialize the connection pool.  Called lazily on first `get_connection()`.
     Safe to call multiple times (idempotent via double-check lock).
     """
-    global _pool
+    global _pool, _slots
     if minconn is None:
         minconn = POOL_MIN_CONN
     if maxconn is None:
@@ -64,6 +92,7 @@ def init_pool(minconn: int = None, maxconn: int = None):
 
     params = _db_params()
     _pool = pool.ThreadedConnectionPool(minconn, maxconn, **params)
+    _slots = threading.BoundedSemaphore(maxconn)
     logger.info(
         "Database connection pool initialized  min=%d  max=%d  host=%s  db=%s",
         minconn, maxconn, params["host"], params["dbname"],
@@ -95,7 +124,8 @@ def get_connection():
                 cur.execute("SELECT 1")
     """
     p = get_pool()
-    conn = p.getconn()
+    slots = _slots
+    conn = _checkout(p, slots)
     try:
         yield conn
     except Exception:
@@ -105,6 +135,20 @@ def get_connection():
         conn.commit()
     finally:
         p.putconn(conn)
+        slots.release()
+
+
+def _checkout(p: pool.ThreadedConnectionPool, slots: threading.BoundedSemaphore):
+    """Take a connection, waiting up to POOL_WAIT_SECONDS for one to be returned."""
+    if not slots.acquire(timeout=POOL_WAIT_SECONDS):
+        raise pool.PoolError(
+            f"connection pool exhausted (no connection free after {POOL_WAIT_SECONDS:g}s)"
+        )
+    try:
+        return p.getconn()
+    except Exception:
+        slots.release()
+        raise
 
 
 def close_pool():
@@ -130,6 +174,20 @@ _DB_READ_REPLICA_URL: str = os.getenv("DB_READ_REPLICA_URL", "")
 
 _read_pool: pool.ThreadedConnectionPool | None = None
 _read_pool_lock = threading.Lock()
+_read_slots = threading.BoundedSemaphore(POOL_MAX_CONN)
+
+
+def _replica_params() -> dict:
+    import urllib.parse
+    parsed = urllib.parse.urlparse(_DB_READ_REPLICA_URL)
+    return dict(
+        host=parsed.hostname,
+        port=parsed.port or 5432,
+        dbname=(parsed.path or "/pf9_mgmt").lstrip("/"),
+        user=parsed.username,
+        password=parsed.password,
+        connect_timeout=10,
+    )
 
 
 def _init_read_pool() -> None:
@@ -143,20 +201,11 @@ def _init_read_pool() -> None:
         if _read_pool is not None:
             return
         try:
-            import urllib.parse
-            parsed = urllib.parse.urlparse(_DB_READ_REPLICA_URL)
-            params = dict(
-                host=parsed.hostname,
-                port=parsed.port or 5432,
-                dbname=(parsed.path or "/pf9_mgmt").lstrip("/"),
-                user=parsed.username,
-                password=parsed.password,
-                connect_timeout=10,
-            )
+            params = _replica_params()
             _read_pool = pool.ThreadedConnectionPool(POOL_MIN_CONN, POOL_MAX_CONN, **params)
             logger.info(
                 "Read replica pool initialised  min=%d  max=%d  host=%s",
-                POOL_MIN_CONN, POOL_MAX_CONN, parsed.hostname,
+                POOL_MIN_CONN, POOL_MAX_CONN, params["host"],
             )
         except Exception as exc:
             logger.warning(
@@ -191,7 +240,7 @@ def get_read_connection():
         if _read_pool is None:
             _init_read_pool()
         if _read_pool is not None:
-            conn = _read_pool.getconn()
+            conn = _checkout(_read_pool, _read_slots)
             try:
                 yield conn
                 conn.commit()
@@ -200,8 +249,159 @@ def get_read_connection():
                 raise
             finally:
                 _read_pool.putconn(conn)
+                _read_slots.release()
             return
 
     # Fallback: use primary pool
     with get_connection() as conn:
         yield conn
+
+
+# ---------------------------------------------------------------------------
+# Async access — keeps blocking DB work off the event loop
+# ---------------------------------------------------------------------------
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=DB_EXECUTOR_THREADS, thread_name_prefix="db"
+                )
+    return _executor
+
+
+async def run_db(fn, *args, **kwargs):
+    """Run blocking ``fn(*args, **kwargs)`` on the DB thread pool and await its result."""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(
+        _get_executor(), functools.partial(ctx.run, fn, *args, **kwargs)
+    )
+
+
+def off_loop(fn):
+    """
+    Decorator for a synchronous route handler: FastAPI sees an ``async``
+    endpoint with the same parameters, and the body runs on the DB thread
+    pool instead of blocking the event loop.  Place it under ``@router.get``.
+    """
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await run_db(fn, *args, **kwargs)
+
+    # Resolve string annotations (``from __future__ import annotations``)
+    # against the handler's module; FastAPI would use this module's globals.
+    wrapper.__signature__ = inspect.signature(fn, eval_str=True)
+    return wrapper
+
+
+def _fetch(sql: str, params, one: bool, read: bool):
+    from psycopg2.extras import RealDictCursor
+    with (get_read_connection() if read else get_connection()) as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(sql, params)
+            return cur.fetchone() if one else cur.fetchall()
+
+
+async def fetch_all(sql: str, params=None, *, read: bool = False) -> list:
+    """Rows of ``sql`` as dicts, without blocking the event loop."""
+    if DB_ASYNC_DRIVER == "psycopg":
+        async with get_async_connection(read=read) as conn:
+            cur = await conn.execute(sql, params)
+            return await cur.fetchall()
+    return await run_db(_fetch, sql, params, False, read)
+
+
+async def fetch_one(sql: str, params=None, *, read: bool = False):
+    """First row of ``sql`` as a dict (None when empty), without blocking the event loop."""
+    if DB_ASYNC_DRIVER == "psycopg":
+        async with get_async_connection(read=read) as conn:
+            cur = await conn.execute(sql, params)
+            return await cur.fetchone()
+    return await run_db(_fetch, sql, params, True, read)
+
+
+# Native async pools (DB_ASYNC_DRIVER=psycopg), one per event loop and target
+_async_pools: dict = {}
+_async_open_locks: dict = {}
+_async_pools_lock = threading.Lock()
+
+
+async def _get_async_pool(read: bool):
+    try:
+        from psycopg import AsyncClientCursor
+        from psycopg.conninfo import make_conninfo
+        from psycopg.rows import dict_row
+        from psycopg_pool import AsyncConnectionPool
+    except ImportError as exc:
+        raise RuntimeError(
+            "DB_ASYNC_DRIVER=psycopg requires the 'psycopg[pool]' package"
+        ) from exc
+
+    use_replica = read and _ENABLE_MULTI_REGION and bool(_DB_READ_REPLICA_URL)
+    key = (id(asyncio.get_running_loop()), use_replica)
+    apool = _async_pools.get(key)
+    if apool is None:
+        params = _replica_params() if use_replica else _db_params()
+        with _async_pools_lock:
+            apool = _async_pools.get(key)
+            if apool is None:
+                # Client-side binding keeps psycopg2's %s / %(name)s semantics
+                apool = AsyncConnectionPool(
+                    make_conninfo(**{k: v for k, v in params.items() if v is not None}),
+                    min_size=POOL_MIN_CONN, max_size=POOL_MAX_CONN,
+                    timeout=POOL_WAIT_SECONDS, open=False,
+                    kwargs={"row_factory": dict_row, "cursor_factory": AsyncClientCursor},
+                    name="pf9-replica" if use_replica else "pf9-primary",
+                )
+                _async_pools[key] = apool
+                _async_open_locks[key] = asyncio.Lock()
+    if apool.closed:
+        async with _async_open_locks[key]:
+            if apool.closed:
+                await apool.open()
+                logger.info(
+                    "Async database pool opened  min=%d  max=%d  name=%s",
+                    POOL_MIN_CONN, POOL_MAX_CONN, apool.name,
+                )
+    return apool
+
+
+@asynccontextmanager
+async def get_async_connection(read: bool = False):
+    """
+    Borrow a psycopg 3 ``AsyncConnection`` (requires ``DB_ASYNC_DRIVER=psycopg``).
+    Commits on clean exit and rolls back on exception, like ``get_connection()``.
+    Rows come back as dicts.
+
+    Usage::
+
+        async with get_async_connection() as conn:
+            cur = await conn.execute("SELECT ... WHERE id = %s", (7,))
+            rows = await cur.fetchall()
+    """
+    if DB_ASYNC_DRIVER != "psycopg":
+        raise RuntimeError("get_async_connection() requires DB_ASYNC_DRIVER=psycopg")
+    apool = await _get_async_pool(read)
+    async with apool.connection() as conn:
+        yield conn
+
+
+async def close_async_pools() -> None:
+    """Close the native async pools and the DB thread pool (application exit)."""
+    global _executor
+    for key, apool in list(_async_pools.items()):
+        try:
+            await apool.close()
+        except Exception as exc:
+            logger.warning("Async pool close failed: %s", exc)
+        _async_pools.pop(key, None)
+        _async_open_locks.pop(key, None)
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
@@ -9,7 +9,7 @@ Endpoint:
     ?root_type = vm | volume | network | tenant | snapshot |
                  security_group | floating_ip | subnet | port | host | image | domain
     &root_id   = <uuid>
-    &depth     = 1 | 2 | 3   (default: 2)
+    &depth     = 1 … 5   (default: 2)
     &domain    = <domain_id>  (optional — restrict expansion to nodes in this domain)
     &mode      = topology | blast_radius | delete_impact  (default: topology)
 
@@ -48,12 +48,18 @@ Badge types:
   restore_source     Snapshot referenced by a restore job
   orphan             Resource exists but is not in use
 
+Traversal runs over the in-memory topology index (topology_index.py) and
+badges come from one batched lookup per request.  If the index is disabled
+or cannot be built, the original per-node queries are used with the old
+150-node / depth-3 caps.
+
 RBAC: requires resources:read (viewer and above)
 """
 
 from __future__ import annotations
 
 import logging
+import os
 import re
 from collections import deque
 from typing import Optional, List, Dict, Any, Tuple
@@ -62,7 +68,8 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Body
 from psycopg2.extras import RealDictCursor
 
 from auth import require_permission, User, get_current_user
-from db_pool import get_connection
+from db_pool import get_connection, off_loop
+import topology_index
 
 logger = logging.getLogger("pf9.graph")
 
@@ -72,8 +79,12 @@ router = APIRouter(prefix="/api/graph", tags=["graph"])
 # Constants
 # ---------------------------------------------------------------------------
 
-MAX_NODES = 150      # hard cap; BFS stops and sets truncated=True
-MAX_DEPTH = 3
+MAX_NODES = int(os.getenv("GRAPH_MAX_NODES", "600"))   # hard cap; BFS stops and sets truncated=True
+MAX_DEPTH = 5
+
+# Caps for the per-node SQL fallback (no topology index)
+LEGACY_MAX_NODES = 150
+LEGACY_MAX_DEPTH = 3
 
 # Root-type aliases: user-facing name → internal ntype key
 ROOT_TYPE_ALIAS: Dict[str, str] = {
@@ -230,28 +241,31 @@ def _fetch_tenant(cur, db_id: str) -> Optional[Dict]:
     return dict(r) if r else None
 
 
+# Host row columns, shared by every query that yields a host node
+_HOST_SELECT = (
+    "SELECT id, "
+    "       COALESCE(raw_json->>'hypervisor_hostname', hostname) AS hostname, "
+    "       state, status, "
+    "       raw_json->>'host_ip'                                  AS ip_address, "
+    "       raw_json->'service'->>'host'                         AS resmgr_id, "
+    "       COALESCE((raw_json->>'vcpus')::integer, vcpus, 0)          AS vcpus, "
+    "       COALESCE((raw_json->>'vcpus_used')::integer, 0)            AS vcpus_used, "
+    "       COALESCE((raw_json->>'memory_mb')::bigint, memory_mb, 0)   AS memory_mb, "
+    "       COALESCE((raw_json->>'memory_mb_used')::bigint, 0)         AS memory_mb_used, "
+    "       COALESCE((raw_json->>'local_gb')::integer, local_gb, 0)    AS local_gb, "
+    "       CASE "
+    "         WHEN COALESCE((raw_json->>'local_gb')::integer, local_gb, 0) > 0 "
+    "              AND (raw_json->>'disk_available_least') IS NOT NULL "
+    "         THEN COALESCE((raw_json->>'local_gb')::integer, local_gb, 0) "
+    "              - GREATEST(0, (raw_json->>'disk_available_least')::integer) "
+    "         ELSE COALESCE((raw_json->>'local_gb_used')::integer, 0) "
+    "       END AS local_gb_used_calc "
+    "FROM hypervisors "
+)
+
+
 def _fetch_host(cur, db_id: str) -> Optional[Dict]:
-    cur.execute(
-        "SELECT id, "
-        "       COALESCE(raw_json->>'hypervisor_hostname', hostname) AS hostname, "
-        "       state, status, "
-        "       raw_json->>'host_ip'                                  AS ip_address, "
-        "       raw_json->'service'->>'host'                         AS resmgr_id, "
-        "       COALESCE((raw_json->>'vcpus')::integer, vcpus, 0)          AS vcpus, "
-        "       COALESCE((raw_json->>'vcpus_used')::integer, 0)            AS vcpus_used, "
-        "       COALESCE((raw_json->>'memory_mb')::bigint, memory_mb, 0)   AS memory_mb, "
-        "       COALESCE((raw_json->>'memory_mb_used')::bigint, 0)         AS memory_mb_used, "
-        "       COALESCE((raw_json->>'local_gb')::integer, local_gb, 0)    AS local_gb, "
-        "       CASE "
-        "         WHEN COALESCE((raw_json->>'local_gb')::integer, local_gb, 0) > 0 "
-        "              AND (raw_json->>'disk_available_least') IS NOT NULL "
-        "         THEN COALESCE((raw_json->>'local_gb')::integer, local_gb, 0) "
-        "              - GREATEST(0, (raw_json->>'disk_available_least')::integer) "
-        "         ELSE COALESCE((raw_json->>'local_gb_used')::integer, 0) "
-        "       END AS local_gb_used_calc "
-        "FROM hypervisors WHERE id = %s",
-        (db_id,),
-    )
+    cur.execute(_HOST_SELECT + "WHERE id = %s", (db_id,))
     r = cur.fetchone()
     return dict(r) if r else None
 
@@ -459,8 +473,7 @@ def _expand_vm(
     # VM → Hypervisor/Host
     if row.get("hypervisor_hostname"):
         cur.execute(
-            "SELECT id, hostname, state, status FROM hypervisors "
-            "WHERE hostname = %s LIMIT 1",
+            _HOST_SELECT + "WHERE hostname = %s LIMIT 1",
             (row["hypervisor_hostname"],),
         )
         r = cur.fetchone()
@@ -730,18 +743,7 @@ def _expand_aggregate(
     # Expand to every host in this aggregate
     for resmgr_uuid in (raw.get("hosts") or []):
         cur.execute(
-            "SELECT id, "
-            "       COALESCE(raw_json->>'hypervisor_hostname', hostname) AS hostname, "
-            "       state, status, "
-            "       raw_json->>'host_ip'                                  AS ip_address, "
-            "       raw_json->'service'->>'host'                         AS resmgr_id, "
-            "       COALESCE((raw_json->>'vcpus')::integer, vcpus, 0)   AS vcpus, "
-            "       COALESCE((raw_json->>'vcpus_used')::integer, 0)     AS vcpus_used, "
-            "       COALESCE((raw_json->>'memory_mb')::bigint, memory_mb, 0) AS memory_mb, "
-            "       COALESCE((raw_json->>'memory_mb_used')::bigint, 0)  AS memory_mb_used, "
-            "       COALESCE((raw_json->>'local_gb')::integer, local_gb, 0) AS local_gb, "
-            "       COALESCE((raw_json->>'local_gb_used')::integer, 0)  AS local_gb_used_calc "
-            "FROM hypervisors WHERE raw_json->'service'->>'host' = %s",
+            _HOST_SELECT + "WHERE raw_json->'service'->>'host' = %s",
             (resmgr_uuid,),
         )
         r = cur.fetchone()
@@ -1067,17 +1069,19 @@ def _compute_delete_impact(cur, root_ntype: str, root_db_id: str, nodes_by_id: D
                 stranded_ids.append(node["id"])
         # VMs with compute ports on this network BLOCK the delete.
         # OpenStack returns 409 if active ports with device_owner='compute:nova' exist.
-        for node in nodes_by_id.values():
-            if node["type"] != "vm":
-                continue
-            vm_id = node["db_id"]
+        vm_nodes = [n for n in nodes_by_id.values() if n["type"] == "vm"]
+        nic_counts: Dict[str, int] = {}
+        if vm_nodes:
             cur.execute(
-                "SELECT COUNT(*) AS nic_count FROM ports "
-                "WHERE device_id = %s AND network_id = %s AND device_owner LIKE 'compute:%%'",
-                (vm_id, root_db_id),
+                "SELECT device_id, COUNT(*) AS nic_count FROM ports "
+                "WHERE network_id = %s AND device_owner LIKE 'compute:%%' "
+                "  AND device_id = ANY(%s) "
+                "GROUP BY device_id",
+                (root_db_id, [str(n["db_id"]) for n in vm_nodes]),
             )
-            r = cur.fetchone()
-            nic_count = (r.get("nic_count", 0) if isinstance(r, dict) else (r[0] if r else 0)) or 0
+            nic_counts = {r["device_id"]: r["nic_count"] for r in cur.fetchall()}
+        for node in vm_nodes:
+            nic_count = nic_counts.get(str(node["db_id"]), 0)
             if nic_count > 0:
                 blockers.append(
                     f"VM \"{node['label']}\" has {nic_count} NIC(s) on this network — "
@@ -1139,6 +1143,39 @@ def _compute_delete_impact(cur, root_ntype: str, root_db_id: str, nodes_by_id: D
 # BFS graph builder
 # ---------------------------------------------------------------------------
 
+def _node_extra(row: Dict) -> Dict:
+    """Raw row fields needed for the health score, stored in node["extra"]."""
+    return {k: row.get(k) for k in (
+        "vcpus", "vcpus_used", "memory_mb", "memory_mb_used",
+        "local_gb", "local_gb_used_calc", "server_id", "ip_address",
+    ) if row.get(k) is not None}
+
+
+def _finish_graph(
+    nodes_by_id: Dict[str, Dict],
+    edges_list: List[Dict],
+    root_node_id: str,
+    max_depth: int,
+    truncated: bool,
+) -> Dict:
+    # Apply health scores + capacity pressure in-place after BFS is complete
+    _apply_health_scores(nodes_by_id)
+    _trigger_health_auto_tickets(nodes_by_id)
+
+    summary = _build_graph_summary(nodes_by_id)
+
+    return {
+        "nodes":      list(nodes_by_id.values()),
+        "edges":      edges_list,
+        "root":       root_node_id,
+        "depth":      max_depth,
+        "node_count": len(nodes_by_id),
+        "edge_count": len(edges_list),
+        "truncated":  truncated,
+        **summary,
+    }
+
+
 def _build_graph(
     cur,
     root_ntype: str,
@@ -1149,7 +1186,173 @@ def _build_graph(
     """
     BFS from (root_ntype, root_db_id) up to max_depth hops.
     Returns the complete graph dict, or None if the root resource is not found.
+
+    Uses the topology index when it is available and contains the root;
+    otherwise (index disabled, or a resource newer than the last inventory
+    run) falls back to per-node queries within the legacy caps.
+    """
+    index = topology_index.get_index(cur)
+    if index is not None and index.slot(root_ntype, root_db_id) is not None:
+        return _build_graph_from_index(cur, index, root_ntype, root_db_id, max_depth, domain_filter)
+    return _build_graph_sql(
+        cur, root_ntype, root_db_id, min(max_depth, LEGACY_MAX_DEPTH), domain_filter,
+    )
+
+
+def _fetch_badge_flags(cur, nodes: List[Tuple[str, Dict]]) -> Tuple[set, set]:
     """
+    Drift and restore-source flags for every node in one query.
+    Returns ({(drift resource_type, id)}, {snapshot ids used as restore points}).
+    """
+    drift_ids = sorted({str(row["id"]) for ntype, row in nodes if ntype in _DRIFT_TYPE_MAP})
+    snapshot_ids = [str(row["id"]) for ntype, row in nodes if ntype == "snapshot"]
+    if not drift_ids and not snapshot_ids:
+        return set(), set()
+    cur.execute(
+        "SELECT 'drift' AS kind, resource_type, resource_id FROM drift_events "
+        "WHERE acknowledged = false AND resource_id = ANY(%s) "
+        "UNION "
+        "SELECT 'restore', NULL, restore_point_id FROM restore_jobs "
+        "WHERE restore_point_id = ANY(%s)",
+        (drift_ids, snapshot_ids),
+    )
+    drift: set = set()
+    restore: set = set()
+    for r in cur.fetchall():
+        if r["kind"] == "drift":
+            drift.add((r["resource_type"], r["resource_id"]))
+        else:
+            restore.add(r["resource_id"])
+    return drift, restore
+
+
+def _index_badges(
+    index: "topology_index.TopologyIndex", ntype: str, row: Dict,
+    drift: set, restore: set,
+) -> List[str]:
+    """_compute_badges from the index and the batched drift / restore flags."""
+    badges: List[str] = []
+    db_id = str(row["id"])
+
+    s = (row.get("status") or "").upper()
+    if s in ("ERROR", "ERROR_RESTORING", "ERROR_DELETING", "ERROR_EXTENDING"):
+        badges.append("error_state")
+
+    if ntype == "vm" and s == "SHUTOFF":
+        badges.append("power_off")
+
+    if ntype == "volume":
+        latest = index.latest_snapshot.get(db_id)
+        if latest is None:
+            badges.append("snapshot_missing")
+        else:
+            import datetime
+            age_days = (datetime.datetime.utcnow() - latest.replace(tzinfo=None)).days
+            if age_days > 7:
+                badges.append("snapshot_stale")
+            else:
+                badges.append("snapshot_protected")
+
+        if not row.get("server_id"):
+            vs = (row.get("status") or "").lower()
+            if vs == "available":
+                badges.append("orphan")
+
+    if ntype == "fip" and not row.get("port_id"):
+        badges.append("orphan")
+
+    if ntype == "sg":
+        sg_name = (row.get("name") or "").lower()
+        if sg_name != "default" and db_id not in index.sgs_in_use:
+            badges.append("orphan")
+
+    if ntype == "snapshot":
+        vol_id = row.get("volume_id")
+        if vol_id and index.slot("volume", vol_id) is None:
+            badges.append("orphan")
+
+    drift_rtype = _DRIFT_TYPE_MAP.get(ntype)
+    if drift_rtype and (drift_rtype, db_id) in drift:
+        badges.append("drift")
+
+    if ntype == "snapshot" and db_id in restore:
+        badges.append("restore_source")
+
+    return badges
+
+
+def _build_graph_from_index(
+    cur,
+    index: "topology_index.TopologyIndex",
+    root_ntype: str,
+    root_db_id: str,
+    max_depth: int,
+    domain_filter: Optional[str],
+) -> Dict:
+    """The BFS of _build_graph_sql over the in-memory index."""
+    root = index.slot(root_ntype, root_db_id)
+    node_rows: Dict[int, Dict] = {}     # slot → row, in discovery order
+    edges_set: set = set()
+    edges_list: List[Dict] = []
+    truncated = False
+
+    def add_node(i: int, extra: Optional[Dict]) -> None:
+        if i not in node_rows:
+            node_rows[i] = {**index.rows[i], **extra} if extra else index.rows[i]
+
+    add_node(root, None)
+    root_node_id = f"{root_ntype}-{root_db_id}"
+
+    queue: deque = deque([(root, 0)])
+    visited: set = {root}
+
+    while queue:
+        i, depth = queue.popleft()
+        if depth >= max_depth:
+            continue
+        ntype = index.ntypes[i]
+        src_id = index.rows[i]["id"]
+
+        for j, edge_label, extra in index.neighbors(i):
+            neighbor_ntype = index.ntypes[j]
+            if (domain_filter and neighbor_ntype == "tenant" and edge_label == "belongs to"
+                    and not _in_domain(index.rows[j], domain_filter)):
+                continue
+            if len(node_rows) >= MAX_NODES:
+                truncated = True
+                break
+
+            add_node(j, extra)
+            tgt_id = index.rows[j]["id"]
+            key = (f"{ntype}-{src_id}", f"{neighbor_ntype}-{tgt_id}", edge_label)
+            if key not in edges_set:
+                edges_set.add(key)
+                edges_list.append(_make_edge(ntype, src_id, neighbor_ntype, tgt_id, edge_label))
+
+            if j not in visited:
+                visited.add(j)
+                queue.append((j, depth + 1))
+
+        if truncated:
+            break
+
+    found = [(index.ntypes[i], row) for i, row in node_rows.items()]
+    drift, restore = _fetch_badge_flags(cur, found)
+    nodes_by_id: Dict[str, Dict] = {}
+    for ntype, row in found:
+        badges = _index_badges(index, ntype, row, drift, restore)
+        nodes_by_id[f"{ntype}-{row['id']}"] = _make_node(row, ntype, badges, _node_extra(row))
+    return _finish_graph(nodes_by_id, edges_list, root_node_id, max_depth, truncated)
+
+
+def _build_graph_sql(
+    cur,
+    root_ntype: str,
+    root_db_id: str,
+    max_depth: int,
+    domain_filter: Optional[str],
+) -> Optional[Dict]:
+    """BFS issuing the per-type fetch / expand / badge queries for every node."""
     root_row = FETCHERS[root_ntype](cur, root_db_id)
     if root_row is None:
         return None
@@ -1163,12 +1366,7 @@ def _build_graph(
         nid = f"{ntype}-{row['id']}"
         if nid not in nodes_by_id:
             badges = _compute_badges(cur, ntype, row["id"], row)
-            # Store raw row fields needed for health score in extra
-            extra = {k: row.get(k) for k in (
-                "vcpus", "vcpus_used", "memory_mb", "memory_mb_used",
-                "local_gb", "local_gb_used_calc", "server_id", "ip_address",
-            ) if row.get(k) is not None}
-            nodes_by_id[nid] = _make_node(row, ntype, badges, extra)
+            nodes_by_id[nid] = _make_node(row, ntype, badges, _node_extra(row))
         return nid
 
     def add_edge(
@@ -1199,7 +1397,7 @@ def _build_graph(
             continue
 
         for neighbor_ntype, neighbor_row, edge_label in expander(cur, row, domain_filter):
-            if len(nodes_by_id) >= MAX_NODES:
+            if len(nodes_by_id) >= LEGACY_MAX_NODES:
                 truncated = True
                 break
 
@@ -1214,22 +1412,7 @@ def _build_graph(
         if truncated:
             break
 
-    # Apply health scores + capacity pressure in-place after BFS is complete
-    _apply_health_scores(nodes_by_id)
-    _trigger_health_auto_tickets(nodes_by_id)
-
-    summary = _build_graph_summary(nodes_by_id)
-
-    return {
-        "nodes":      list(nodes_by_id.values()),
-        "edges":      edges_list,
-        "root":       root_node_id,
-        "depth":      max_depth,
-        "node_count": len(nodes_by_id),
-        "edge_count": len(edges_list),
-        "truncated":  truncated,
-        **summary,
-    }
+    return _finish_graph(nodes_by_id, edges_list, root_node_id, max_depth, truncated)
 
 
 # ---------------------------------------------------------------------------
@@ -1258,10 +1441,11 @@ def _is_valid_id(value: str) -> bool:
 # ---------------------------------------------------------------------------
 
 @router.get("")
-async def get_dependency_graph(
+@off_loop
+def get_dependency_graph(
     root_type: str = Query(..., description="Resource type to start from"),
     root_id: str = Query(..., description="ID of the root resource"),
-    depth: int = Query(2, ge=1, le=MAX_DEPTH, description="Number of hops to traverse (1–3)"),
+    depth: int = Query(2, ge=1, le=MAX_DEPTH, description="Number of hops to traverse (1–5)"),
     domain: Optional[str] = Query(None, description="Restrict expansion to nodes in this domain"),
     mode: str = Query("topology", description="Graph mode: topology | blast_radius | delete_impact"),
     migration_project_id: Optional[int] = Query(None, description="Migration project ID — enriches nodes with migration status overlay"),
@@ -1271,8 +1455,10 @@ async def get_dependency_graph(
     Return a dependency graph starting from the specified resource.
 
     Traverses up to `depth` hops using BFS, collecting all connected nodes and
-    the relationships between them.  Stops at MAX_NODES (150) to prevent
-    hairball graphs; sets `truncated: true` in the response when capped.
+    the relationships between them.  Stops at MAX_NODES (GRAPH_MAX_NODES,
+    default 600) to prevent hairball graphs; sets `truncated: true` in the
+    response when capped.  Without the topology index the caps are 150 nodes
+    and depth 3.
 
     mode=blast_radius   adds 'blast_radius' key showing failure impact.
     mode=delete_impact  adds 'delete_impact' key showing cascade/stranded nodes.
@@ -1334,7 +1520,8 @@ async def get_dependency_graph(
 # ---------------------------------------------------------------------------
 
 @router.post("/request-delete", status_code=202)
-async def request_delete_ticket(
+@off_loop
+def request_delete_ticket(
     root_type: str = Body(..., description="Resource type, e.g. 'vm', 'network'"),
     root_id:   str = Body(..., description="Resource ID (UUID or integer)"),
     reason:    str = Body("", description="Optional reason for delete request"),
@@ -626,6 +626,11 @@ async def delete_config(
             cur.execute("DELETE FROM ldap_sync_config WHERE id = %s", (config_id,))
         conn.commit()
 
+    if affected_users:
+        from auth import invalidate_permission_cache
+        for username in affected_users:
+            invalidate_permission_cache(username)
+
     log_auth_event(
         "ldap_sync_config_deleted",
         current_user.username,
@@ -859,7 +864,7 @@ async def list_logs(
 
             cur.execute(
                 "SELECT id, config_id, config_name, started_at, finished_at, status, "
-                "       users_found, users_created, users_updated, users_deactivated, "
+                "       sync_mode, users_found, users_created, users_updated, users_deactivated, "
                 "       error_message "
                 "FROM ldap_sync_log WHERE config_id = %s "
                 "ORDER BY started_at DESC LIMIT %s OFFSET %s",
@@ -0,0 +1,384 @@
+"""
+api/log_query.py — Tail-first reader for the JSON log files behind ``/api/logs``.
+
+``get_system_logs`` used to ``readlines()`` every configured log file and
+JSON-decode every line to return the newest ``limit`` entries.  The API log
+reaches hundreds of MB between rotations, and the System Logs tab polls the
+endpoint every five seconds.  This module reads instead:
+
+  * backwards, ``LOG_QUERY_BLOCK_BYTES`` (default 64 KiB) at a time, from the
+    end of the live file into its rotated predecessors (``<file>.1``,
+    ``<file>.2``, …, and ``.N.gz`` copies left by logrotate).  The per-file
+    readers are merged lazily by timestamp, so a query stops reading once
+    ``limit`` entries match.
+  * with a cheap byte test before ``json.loads``: a line cannot match
+    ``level=ERROR`` unless it contains ``"ERROR"``.
+  * through a sidecar offset index when the query has a time range or a
+    level filter.  Every ``LOG_INDEX_CHUNK_BYTES`` (default 1 MiB) of a file
+    gets its byte range, its first/last timestamp (to the second) and the
+    levels it contains, so chunks outside ``since``/``until`` or without the
+    requested level are never read.  The index lives next to the logs in
+    ``.<file>.idx``, is keyed by inode (a rotated file keeps its entries)
+    and is extended incrementally as the file grows; if the directory is
+    not writable it is kept in memory only.
+
+``query_logs`` returns a list for the JSON endpoint; ``iter_logs`` yields
+entries one by one for the NDJSON export.
+"""
+
+import gzip
+import heapq
+import json
+import logging
+import os
+import re
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BLOCK_BYTES = int(os.getenv("LOG_QUERY_BLOCK_BYTES", str(64 * 1024)))
+INDEX_CHUNK_BYTES = int(os.getenv("LOG_INDEX_CHUNK_BYTES", str(1024 * 1024)))
+MAX_ROTATIONS = 20
+_INDEX_VERSION = 1
+
+# "timestamp": "2026-06-01T12:00:00.123456Z", "level": "INFO" — the layout of
+# structured_logging.JSONFormatter and the snapshot worker's file formatter.
+_TS_LEVEL_RE = re.compile(
+    rb'"timestamp": "(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d)[^"]*", "level": "([A-Z]+)"'
+)
+
+_MIN_KEY = float("-inf")
+
+
+@dataclass(frozen=True)
+class LogFilter:
+    level: Optional[str] = None
+    source: Optional[str] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+
+    @property
+    def indexed(self) -> bool:
+        """Whether the chunk index can narrow the search."""
+        return bool(self.level or self.since or self.until)
+
+    def prefilter(self, line: bytes) -> bool:
+        """False when the raw line cannot match; avoids decoding most of them."""
+        if self.level and b'"%s"' % self.level.upper().encode() not in line:
+            return False
+        if self.source and b'"%s"' % self.source.encode() not in line:
+            return False
+        return True
+
+    def matches(self, entry: dict, ts: Optional[datetime]) -> bool:
+        if self.level and entry.get("level") != self.level.upper():
+            return False
+        if self.source and entry.get("logger") != self.source:
+            return False
+        if self.since or self.until:
+            if ts is None:
+                return False
+            if self.since and ts < self.since:
+                return False
+            if self.until and ts > self.until:
+                return False
+        return True
+
+    def chunk_matches(self, chunk: list) -> bool:
+        _start, _end, first_ts, last_ts, levels = chunk
+        if self.level and levels is not None and self.level.upper() not in levels:
+            return False
+        if first_ts is None:
+            return True  # no structured lines in this chunk
+        if self.since and last_ts < _second(self.since):
+            return False
+        if self.until and first_ts > _second(self.until):
+            return False
+        return True
+
+
+def parse_timestamp(ts: Optional[str]) -> Optional[datetime]:
+    if not ts:
+        return None
+    try:
+        parsed = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+        if parsed.tzinfo is None:
+            return parsed.replace(tzinfo=timezone.utc)
+        return parsed
+    except Exception:
+        return None
+
+
+def _second(dt: datetime) -> str:
+    """*dt* as the index's UTC 'YYYY-MM-DDTHH:MM:SS' key."""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc)
+    return dt.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def rotated_files(path: str) -> List[str]:
+    """*path* followed by its existing rotations, newest first."""
+    files = [path] if os.path.exists(path) else []
+    for n in range(1, MAX_ROTATIONS + 1):
+        for candidate in (f"{path}.{n}", f"{path}.{n}.gz"):
+            if os.path.exists(candidate):
+                files.append(candidate)
+                break
+        else:
+            break
+    return files
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+def _reverse_lines(fh, start: int, end: int, block_size: int = BLOCK_BYTES) -> Iterator[bytes]:
+    """Lines of fh[start:end], last first.  *start* must be a line start."""
+    pos = end
+    tail = b""
+    while pos > start:
+        size = min(block_size, pos - start)
+        pos -= size
+        fh.seek(pos)
+        lines = (fh.read(size) + tail).split(b"\n")
+        tail = lines[0]  # may continue in the previous block
+        for line in reversed(lines[1:]):
+            if line:
+                yield line
+    if tail:
+        yield tail
+
+
+def _complete_size(fh, size: int) -> int:
+    """Offset just past the last newline, so a line being written is skipped."""
+    pos = size
+    while pos > 0:
+        step = min(BLOCK_BYTES, pos)
+        fh.seek(pos - step)
+        block = fh.read(step)
+        idx = block.rfind(b"\n")
+        if idx >= 0:
+            return pos - step + idx + 1
+        pos -= step
+    return 0
+
+
+class _ChunkIndex:
+    """Sidecar offset index for one log file family (``.<name>.idx``)."""
+
+    _locks_guard = threading.Lock()
+    _locks: Dict[str, threading.Lock] = {}
+    _memory: Dict[str, dict] = {}
+
+    def __init__(self, path: str):
+        directory, name = os.path.split(path)
+        self.path = os.path.join(directory, f".{name}.idx")
+        # One lock per sidecar, so building the index of a large file does
+        # not hold up queries against the other log families.
+        with self._locks_guard:
+            self._lock = self._locks.setdefault(self.path, threading.Lock())
+
+    def _load(self) -> dict:
+        cached = self._memory.get(self.path)
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            mtime = None
+        if cached is not None and (mtime is None or cached.get("_mtime") == mtime):
+            return cached
+        data = {"version": _INDEX_VERSION, "files": {}}
+        if mtime is not None:
+            try:
+                with open(self.path, "r") as fh:
+                    loaded = json.load(fh)
+                if loaded.get("version") == _INDEX_VERSION:
+                    data = loaded
+            except (OSError, ValueError):
+                pass
+        data["_mtime"] = mtime
+        self._memory[self.path] = data
+        return data
+
+    def _save(self, data: dict, live_keys: set) -> None:
+        data["files"] = {k: v for k, v in data["files"].items() if k in live_keys}
+        payload = {k: v for k, v in data.items() if k != "_mtime"}
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w") as fh:
+                json.dump(payload, fh, separators=(",", ":"))
+            os.replace(tmp, self.path)
+            data["_mtime"] = os.path.getmtime(self.path)
+        except OSError as exc:
+            logger.debug("Log index %s not persisted: %s", self.path, exc)
+
+    def chunks(self, files: List[str]) -> Dict[str, List[list]]:
+        """{file: [[start, end, first_ts, last_ts, levels], ...]}, brought up to date."""
+        with self._lock:
+            data = self._load()
+            result = {}
+            live_keys = set()
+            changed = False
+            for path in files:
+                if path.endswith(".gz"):
+                    continue
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                with open(path, "rb") as fh:
+                    head = fh.read(64).hex()
+                    key = f"{st.st_dev}:{st.st_ino}"
+                    live_keys.add(key)
+                    entry = data["files"].get(key)
+                    if entry is None or entry["head"] != head or entry["size"] > st.st_size:
+                        entry = {"head": head, "size": 0, "chunks": []}
+                        data["files"][key] = entry
+                    if entry["size"] < st.st_size:
+                        end = _complete_size(fh, st.st_size)
+                        if end > entry["size"]:
+                            entry["chunks"].extend(_build_chunks(fh, entry["size"], end))
+                            entry["size"] = end
+                            changed = True
+                result[path] = entry["chunks"]
+            if changed:
+                self._save(data, live_keys)
+            return result
+
+
+def _build_chunks(fh, start: int, end: int) -> List[list]:
+    chunks = []
+    pos = start
+    fh.seek(pos)
+    carry = b""
+    while pos < end:
+        want = min(INDEX_CHUNK_BYTES, end - pos - len(carry))
+        data = carry + fh.read(want) if want > 0 else carry
+        if pos + len(data) >= end:
+            cut = len(data)
+        else:
+            cut = data.rfind(b"\n") + 1
+            if cut == 0:  # a line longer than a chunk: keep reading
+                carry = data
+                continue
+        body, carry = data[:cut], data[cut:]
+        stamps = _TS_LEVEL_RE.findall(body)
+        if stamps:
+            ts = [s[0] for s in stamps]
+            chunk = [pos, pos + cut, min(ts).decode(), max(ts).decode(),
+                     sorted({s[1].decode() for s in stamps})]
+        else:
+            chunk = [pos, pos + cut, None, None, None]
+        chunks.append(chunk)
+        pos += cut
+    return chunks
+
+
+def _decode(line: bytes, source_file: str, flt: LogFilter) -> Tuple[Optional[dict], Optional[datetime]]:
+    try:
+        entry = json.loads(line)
+        if not isinstance(entry, dict):
+            raise ValueError
+    except ValueError:
+        if flt.level or flt.source or flt.since or flt.until:
+            return None, None
+        return {
+            "raw": line.decode("utf-8", "replace").strip(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "source_file": source_file,
+        }, None
+    ts = parse_timestamp(entry.get("timestamp"))
+    if not flt.matches(entry, ts):
+        return None, None
+    entry["source_file"] = source_file
+    return entry, ts
+
+
+def _file_entries(path: str, source_file: str, flt: LogFilter,
+                  chunks: Optional[List[list]]) -> Iterator[Tuple[float, dict]]:
+    """(sort key, entry) for one file, newest first.
+
+    Lines that are not JSON sort with the entry written just after them.
+    """
+    last_key = float("inf")
+
+    def emit(lines):
+        nonlocal last_key
+        for line in lines:
+            entry, ts = _decode(line, source_file, flt)
+            if entry is None:
+                continue
+            if ts is not None:
+                last_key = ts.timestamp()
+            yield last_key, entry
+
+    if path.endswith(".gz"):
+        # gzip only reads forwards: stream it line by line and keep just the
+        # lines that pass the byte prefilter, then decode those newest first.
+        kept = []
+        with gzip.open(path, "rb") as fh:
+            for line in fh:
+                line = line.rstrip(b"\n")
+                if line and flt.prefilter(line):
+                    kept.append(line)
+        yield from emit(reversed(kept))
+        return
+
+    with open(path, "rb") as fh:
+        if chunks is None:
+            end = _complete_size(fh, os.fstat(fh.fileno()).st_size)
+            yield from emit(line for line in _reverse_lines(fh, 0, end)
+                            if flt.prefilter(line))
+            return
+        for chunk in reversed(chunks):
+            if flt.chunk_matches(chunk):
+                yield from emit(line for line in _reverse_lines(fh, chunk[0], chunk[1])
+                                if flt.prefilter(line))
+
+
+def iter_logs(files: Dict[str, str], flt: LogFilter,
+              read_errors: Optional[List[dict]] = None) -> Iterator[dict]:
+    """Matching entries of all *files* ({source_file: path}), newest first.
+
+    Files that cannot be read are skipped and reported in *read_errors*.
+    """
+    streams = []
+    for source_file, path in files.items():
+        paths = rotated_files(path) if path else []
+        if not paths:
+            continue
+        try:
+            chunks = _ChunkIndex(path).chunks(paths) if flt.indexed else {}
+        except Exception as exc:  # the index is an optimisation only
+            logger.warning("Log index for %s unavailable: %s", path, exc)
+            chunks = {}
+        streams.append(_guarded(source_file, paths, flt, chunks, read_errors))
+
+    merged = heapq.merge(*streams, key=lambda item: item[0], reverse=True)
+    for _key, entry in merged:
+        yield entry
+
+
+def _guarded(source_file: str, paths: List[str], flt: LogFilter,
+             chunks: Dict[str, List[list]], read_errors: Optional[List[dict]]):
+    for path in paths:
+        try:
+            yield from _file_entries(path, source_file, flt, chunks.get(path) if chunks else None)
+        except Exception as exc:
+            if read_errors is not None:
+                read_errors.append({"file": source_file, "error": str(exc)})
+            return
+
+
+def query_logs(files: Dict[str, str], flt: LogFilter, limit: int) -> Tuple[List[dict], List[dict]]:
+    """The newest *limit* entries matching *flt*, and any read errors."""
+    read_errors: List[dict] = []
+    logs = []
+    for entry in iter_logs(files, flt, read_errors):
+        logs.append(entry)
+        if len(logs) >= limit:
+            break
+    return logs, read_errors
@@ -29,23 +29,26 @@ from pf9_control import get_client
 from cluster_registry import get_registry
 
 # Database connection pool
-from db_pool import get_connection, close_pool
+from db_pool import get_connection, close_pool, close_async_pools
 
 # Authentication imports
 from auth import (
     ldap_auth, create_access_token, get_current_user, require_authentication,
     require_permission, set_user_role, get_user_role, log_auth_event,
+    resolve_auth_context, invalidate_permission_cache,
     create_user_session, invalidate_user_session, initialize_default_admin,
     ENABLE_AUTHENTICATION, JWT_ACCESS_TOKEN_EXPIRE_MINUTES,
     DEFAULT_ADMIN_USER, DEFAULT_ADMIN_PASSWORD,
     Token, LoginRequest, User, UserRole
 )
-from auth import has_permission, verify_token
+from auth import has_permission
 
 # Config validation and monitoring
 from config_validator import ConfigValidator
 from performance_metrics import PerformanceMetrics, PerformanceMiddleware
+from cache import cache_stats
 from structured_logging import setup_logging
+from log_query import LogFilter, iter_logs, query_logs
 
 # Dashboard endpoints
 from dashboards import router as dashboard_router
@@ -98,6 +101,7 @@ from onboarding_routes import router as onboarding_router
 
 # Cloud Dependency Graph endpoints
 from graph_routes import router as graph_router
+import topology_index
 
 # Support Ticket system (T1+T2)
 from ticket_routes import router as ticket_router, run_sla_checks as _run_sla_checks
@@ -403,11 +407,17 @@ async def shutdown_event():
             await _sla_task
         except asyncio.CancelledError:
             pass
+    try:
+        from runbook_routes import runbook_pool
+        runbook_pool.stop()
+    except Exception as _exc:
+        logger.warning("Runbook worker pool shutdown error: %s", _exc)
     # Close all Pf9Client sessions managed by the registry
     try:
         get_registry().shutdown()
     except Exception as _exc:
         logger.warning("ClusterRegistry shutdown error: %s", _exc)
+    await close_async_pools()
     close_pool()
 
 # Include routers
@@ -577,10 +587,12 @@ async def rbac_middleware(request: Request, call_next):
             response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS, PATCH"
             response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization"
         return response
-    token_data = verify_token(token)
+    # Resolved once and memoised on request.state; get_current_user reuses it.
+    auth_ctx = resolve_auth_context(request, token)
     # Bearer token present but invalid (non-JWT session indicator) — fall through to cookie
-    if not token_data and cookie_token and token != cookie_token:
-        token_data = verify_token(cookie_token)
+    if not auth_ctx and cookie_token and token != cookie_token:
+        auth_ctx = resolve_auth_context(request, cookie_token)
+    token_data = auth_ctx.token_data if auth_ctx else None
     if not token_data:
         response = JSONResponse(status_code=401, content={"detail": "Invalid token"})
         origin = request.headers.get("origin", "")
@@ -1251,6 +1263,13 @@ async def startup_event():
     global _sla_task
     _sla_task = asyncio.create_task(_sla_daemon())
 
+    # Runbook worker pool: drains queued executions off the request path
+    try:
+        from runbook_routes import runbook_pool
+        runbook_pool.start()
+    except Exception as _exc:
+        logger.warning("Runbook worker pool failed to start: %s", _exc)
+
 # =====================================================================
 # AUTHENTICATION ENDPOINTS
 # =====================================================================
@@ -1738,6 +1757,7 @@ async def update_permission(
                         DELETE FROM role_permissions
                         WHERE role = %s AND resource = %s AND action = %s
                     """, (body.role, body.resource, body.action))
+        invalidate_permission_cache()
 
         log_auth_event(
             username=current_user.username,
@@ -2107,7 +2127,9 @@ def get_metrics(request: Request):
         key = request.headers.get("X-Metrics-Key", "")
         if not secrets.compare_digest(key, METRICS_API_KEY):
             raise HTTPException(status_code=401, detail="Invalid or missing X-Metrics-Key header")
-    return performance_metrics.get_stats()
+    stats = performance_metrics.get_stats()
+    stats["cache"] = cache_stats()
+    return stats
 
 
 @app.get("/worker-metrics")
@@ -2118,7 +2140,7 @@ def get_worker_metrics(request: Request):
         key = request.headers.get("X-Metrics-Key", "")
         if not secrets.compare_digest(key, METRICS_API_KEY):
             raise HTTPException(status_code=401, detail="Invalid or missing X-Metrics-Key header")
-    import time as _t
+    from shared.worker_telemetry import render_prometheus
     try:
         import redis as _redis
         _redis_host = os.getenv("REDIS_HOST", "redis")
@@ -2127,53 +2149,13 @@ def get_worker_metrics(request: Request):
         _rc = _redis.Redis(host=_redis_host, port=_redis_port, password=_redis_pw, db=0,
                            socket_connect_timeout=2, socket_timeout=2,
                            decode_responses=True)
-        _keys = _rc.keys("pf9:worker:*")
+        content = render_prometheus(_rc)
     except Exception:
-        _keys = []
-        _rc = None
-
-    _now = _t.time()
-    lines = [
-        "# HELP worker_runs_total Total number of completed worker loop iterations",
-        "# TYPE worker_runs_total counter",
-    ]
-    runs_lines, errs_lines, up_lines, dur_lines = [], [], [], []
-
-    for _key in sorted(_keys):
-        if _rc is None:
-            break
-        try:
-            h = _rc.hgetall(_key)
-        except Exception:
-            continue
-        name = h.get("label") or _key.split(":")[-1]
-        runs = int(h.get("runs_total") or 0)
-        errs = int(h.get("errors_total") or 0)
-        last_ts = float(h.get("last_run_ts") or 0)
-        dur = float(h.get("last_run_duration_s") or 0)
-        freq = float(h.get("frequency_s") or 60)
-        up = 0 if (last_ts > 0 and (_now - last_ts) > 2 * freq) else (1 if last_ts > 0 else 0)
-        lbl = f'worker="{name}"'
-        runs_lines.append(f"worker_runs_total{{{lbl}}} {runs}")
-        errs_lines.append(f"worker_errors_total{{{lbl}}} {errs}")
-        up_lines.append(f"worker_up{{{lbl}}} {up}")
-        dur_lines.append(f"worker_last_run_duration_seconds{{{lbl}}} {dur:.3f}")
-
-    lines.extend(runs_lines)
-    lines.append("# HELP worker_errors_total Total number of worker loop iterations with errors")
-    lines.append("# TYPE worker_errors_total counter")
-    lines.extend(errs_lines)
-    lines.append("# HELP worker_up 1 if worker ran recently, 0 if stale or never run")
-    lines.append("# TYPE worker_up gauge")
-    lines.extend(up_lines)
-    lines.append("# HELP worker_last_run_duration_seconds Duration of last worker loop iteration")
-    lines.append("# TYPE worker_last_run_duration_seconds gauge")
-    lines.extend(dur_lines)
-    lines.append("")
+        content = render_prometheus(None)
 
     from fastapi.responses import PlainTextResponse
     return PlainTextResponse(
-        content="\n".join(lines),
+        content=content,
         media_type="text/plain; version=0.0.4; charset=utf-8",
     )
 
@@ -2194,7 +2176,8 @@ def get_api_metrics_authenticated(request: Request):
         if not token:
             raise HTTPException(status_code=401, detail="Not authenticated")
 
-        token_data = verify_token(token)
+        auth_ctx = resolve_auth_context(request, token)
+        token_data = auth_ctx.token_data if auth_ctx else None
         if not token_data:
             raise HTTPException(status_code=401, detail="Invalid token")
 
@@ -2207,7 +2190,9 @@ def get_api_metrics_authenticated(request: Request):
             "API metrics accessed",
             extra={"context": {"username": username, "endpoint": "/api/metrics"}}
         )
-        return performance_metrics.get_stats()
+        stats = performance_metrics.get_stats()
+        stats["cache"] = cache_stats()
+        return stats
 
     except HTTPException:
         raise
@@ -2216,6 +2201,47 @@ def get_api_metrics_authenticated(request: Request):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+def _system_log_reader(request: Request) -> str:
+    """Authenticate a /api/logs caller and check system_logs:read; returns the username."""
+    # Cookie-first auth: httpOnly cookie is primary in K8s/browser deployments.
+    # Bearer header is kept for backward compat (CI / direct API calls).
+    token = request.cookies.get("access_token")
+    if not token:
+        auth_header = request.headers.get("Authorization", "")
+        if auth_header.startswith("Bearer "):
+            token = auth_header[7:]
+
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    auth_ctx = resolve_auth_context(request, token)
+    token_data = auth_ctx.token_data if auth_ctx else None
+    if not token_data:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    username = token_data.username
+
+    if not has_permission(username, "system_logs", "read"):
+        raise HTTPException(status_code=403, detail="Only admins can view system logs")
+    return username
+
+
+def _system_log_files() -> Dict[str, str]:
+    configured_log_file = os.getenv("LOG_FILE", "/app/logs/pf9_api.log")
+    log_dir = os.path.dirname(configured_log_file) or "/app/logs"
+    return {
+        "pf9_api": os.path.join(log_dir, "pf9_api.log"),
+        "pf9_monitoring": os.path.join(log_dir, "pf9_monitoring.log"),
+        "snapshot_worker": os.path.join(log_dir, "snapshot_worker.log"),
+    }
+
+
+def _selected_log_files(available_files: Dict[str, str], log_file: Optional[str]) -> Dict[str, str]:
+    if log_file and log_file != "all":
+        return {log_file: available_files.get(log_file, "")}
+    return available_files
+
+
 @app.get("/api/logs")
 @limiter.limit("30/minute")
 def get_system_logs(
@@ -2223,7 +2249,9 @@ def get_system_logs(
     limit: int = Query(100, ge=1, le=1000),
     level: Optional[str] = Query(None),
     source: Optional[str] = Query(None),
-    log_file: Optional[str] = Query("all")
+    log_file: Optional[str] = Query("all"),
+    since: Optional[datetime] = Query(None),
+    until: Optional[datetime] = Query(None),
 ):
     """
     Get system logs (authenticated, Superadmin/Admin only)
@@ -2233,99 +2261,23 @@ def get_system_logs(
     - level: Filter by log level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
     - source: Filter by source module
     - log_file: Filter by log file (pf9_api, pf9_monitoring, all)
+    - since / until: ISO-8601 time range (UTC when no offset is given)
+
+    Files are read from the end (including rotated files) and reading stops
+    once `limit` entries match; see log_query.py.
     """
     try:
-        # Cookie-first auth: httpOnly cookie is primary in K8s/browser deployments.
-        # Bearer header is kept for backward compat (CI / direct API calls).
-        token = request.cookies.get("access_token")
-        if not token:
-            auth_header = request.headers.get("Authorization", "")
-            if auth_header.startswith("Bearer "):
-                token = auth_header[7:]
-
-        if not token:
-            raise HTTPException(status_code=401, detail="Not authenticated")
-
-        token_data = verify_token(token)
-        if not token_data:
-            raise HTTPException(status_code=401, detail="Invalid token")
-
-        username = token_data.username
-
-        if not has_permission(username, "system_logs", "read"):
-            raise HTTPException(status_code=403, detail="Only admins can view system logs")
+        username = _system_log_reader(request)
 
         logger.info(
             "System logs accessed",
             extra={"context": {"username": username, "limit": limit, "level": level}}
         )
 
-        configured_log_file = os.getenv("LOG_FILE", "/app/logs/pf9_api.log")
-        log_dir = os.path.dirname(configured_log_file) or "/app/logs"
-
-        available_files = {
-            "pf9_api": os.path.join(log_dir, "pf9_api.log"),
-            "pf9_monitoring": os.path.join(log_dir, "pf9_monitoring.log"),
-            "snapshot_worker": os.path.join(log_dir, "snapshot_worker.log"),
-        }
-
-        logs = []
-        read_errors = []
-
-        def parse_timestamp(ts: Optional[str]):
-            if not ts:
-                return None
-            try:
-                parsed = datetime.fromisoformat(ts.replace("Z", "+00:00"))
-                if parsed.tzinfo is None:
-                    return parsed.replace(tzinfo=timezone.utc)
-                return parsed
-            except Exception:
-                return None
-
-        selected_files = available_files
-        if log_file and log_file != "all":
-            selected_files = {log_file: available_files.get(log_file, "")}
-
-        for source_file, file_path in selected_files.items():
-            if not file_path or not os.path.exists(file_path):
-                continue
-
-            try:
-                with open(file_path, 'r') as f:
-                    lines = f.readlines()
-
-                for line in lines:
-                    try:
-                        log_entry = json.loads(line.strip())
-                        log_entry["source_file"] = source_file
-
-                        if level and log_entry.get("level") != level.upper():
-                            continue
-                        if source and log_entry.get("logger") != source:
-                            continue
-
-                        logs.append(log_entry)
-                    except json.JSONDecodeError:
-                        if level or source:
-                            continue
-                        logs.append({
-                            "raw": line.strip(),
-                            "timestamp": datetime.now(timezone.utc).isoformat(),
-                            "source_file": source_file
-                        })
-            except Exception as e:
-                read_errors.append({
-                    "file": source_file,
-                    "error": str(e)
-                })
-
-        logs.sort(
-            key=lambda entry: parse_timestamp(entry.get("timestamp"))
-            or datetime.min.replace(tzinfo=timezone.utc),
-            reverse=True
-        )
-        logs = logs[:limit]
+        available_files = _system_log_files()
+        flt = LogFilter(level=level, source=source,
+                        since=_as_utc(since), until=_as_utc(until))
+        logs, read_errors = query_logs(_selected_log_files(available_files, log_file), flt, limit)
 
         return {
             "logs": logs,
@@ -2346,6 +2298,54 @@ def get_system_logs(
         raise HTTPException(status_code=500, detail="Failed to read system logs")
 
 
+@app.get("/api/logs/export")
+@limiter.limit("5/minute")
+def export_system_logs(
+    request: Request,
+    limit: int = Query(100000, ge=1, le=1000000),
+    level: Optional[str] = Query(None),
+    source: Optional[str] = Query(None),
+    log_file: Optional[str] = Query("all"),
+    since: Optional[datetime] = Query(None),
+    until: Optional[datetime] = Query(None),
+):
+    """
+    Stream matching log entries as NDJSON (one JSON object per line, newest
+    first).  Same filters as /api/logs; up to 1,000,000 entries.
+    """
+    username = _system_log_reader(request)
+    logger.info(
+        "System logs exported",
+        extra={"context": {"username": username, "limit": limit, "level": level,
+                           "since": since.isoformat() if since else None,
+                           "until": until.isoformat() if until else None}}
+    )
+    flt = LogFilter(level=level, source=source, since=_as_utc(since), until=_as_utc(until))
+    files = _selected_log_files(_system_log_files(), log_file)
+
+    def _lines():
+        read_errors: List[dict] = []
+        for n, entry in enumerate(iter_logs(files, flt, read_errors)):
+            if n >= limit:
+                break
+            yield json.dumps(entry, default=str) + "\n"
+        for err in read_errors:
+            yield json.dumps({"read_error": err}) + "\n"
+
+    filename = f"pf9_logs_{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}.ndjson"
+    return StreamingResponse(
+        _lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _as_utc(dt: Optional[datetime]) -> Optional[datetime]:
+    if dt is None:
+        return None
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt
+
+
 @app.get("/volumes-with-metadata") 
 def volumes_with_metadata():
     """Get all volumes with their metadata in a simple format"""
@@ -3716,6 +3716,7 @@ async def refresh_inventory(
         except Exception as e:
             summary["inventory_snapshot"] = {"error": str(e)}
 
+    topology_index.invalidate()
     return {"detail": "Inventory refresh complete", "summary": summary}
 
 
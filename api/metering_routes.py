@@ -41,7 +41,7 @@ except ImportError:
     _PDF_AVAILABLE = False
 
 from auth import require_permission, get_current_user, User, get_effective_region_filter
-from db_pool import get_connection
+from db_pool import get_connection, off_loop
 from smtp_helper import (
     SMTP_ENABLED, SMTP_HOST, SMTP_PORT, SMTP_USE_TLS,
     SMTP_USERNAME, SMTP_PASSWORD, SMTP_FROM_ADDRESS, SMTP_FROM_NAME,
@@ -123,7 +123,8 @@ class EfficiencyRecord(BaseModel):
 # ---------------------------------------------------------------------------
 
 @router.get("/config", response_model=MeteringConfigResponse)
-async def get_metering_config(user: User = Depends(require_permission("metering", "read"))):
+@off_loop
+def get_metering_config(user: User = Depends(require_permission("metering", "read"))):
     """Return current metering configuration."""
     with get_connection() as conn:
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
@@ -140,7 +141,8 @@ async def get_metering_config(user: User = Depends(require_permission("metering"
 
 
 @router.put("/config", response_model=MeteringConfigResponse)
-async def update_metering_config(
+@off_loop
+def update_metering_config(
     body: MeteringConfigUpdate,
     user: User = Depends(require_permission("metering", "write")),
 ):
@@ -177,7 +179,8 @@ async def update_metering_config(
 # ---------------------------------------------------------------------------
 
 @router.get("/resources")
-async def get_resource_metering(
+@off_loop
+def get_resource_metering(
     project: Optional[str] = Query(None, description="Filter by project name"),
     domain: Optional[str] = Query(None, description="Filter by domain"),
     vm_id: Optional[str] = Query(None, description="Filter by VM ID"),
@@ -260,7 +263,8 @@ async def get_resource_metering(
 # ---------------------------------------------------------------------------
 
 @router.get("/snapshots")
-async def get_snapshot_metering(
+@off_loop
+def get_snapshot_metering(
     project: Optional[str] = Query(None),
     domain: Optional[str] = Query(None),
     hours: int = Query(24, ge=1, le=2160),
@@ -311,7 +315,8 @@ async def get_snapshot_metering(
 # ---------------------------------------------------------------------------
 
 @router.get("/restores")
-async def get_restore_metering(
+@off_loop
+def get_restore_metering(
     project: Optional[str] = Query(None),
     domain: Optional[str] = Query(None),
     hours: int = Query(168, ge=1, le=2160),
@@ -362,7 +367,8 @@ async def get_restore_metering(
 # ---------------------------------------------------------------------------
 
 @router.get("/api-usage")
-async def get_api_usage_metering(
+@off_loop
+def get_api_usage_metering(
     endpoint: Optional[str] = Query(None),
     hours: int = Query(24, ge=1, le=2160),
     limit: int = Query(500, ge=1, le=10000),
@@ -402,7 +408,8 @@ async def get_api_usage_metering(
 # ---------------------------------------------------------------------------
 
 @router.get("/efficiency")
-async def get_efficiency_scores(
+@off_loop
+def get_efficiency_scores(
     project: Optional[str] = Query(None),
     domain: Optional[str] = Query(None),
     classification: Optional[str] = Query(None, description="Filter: excellent|good|fair|poor|idle"),
@@ -460,7 +467,8 @@ async def get_efficiency_scores(
 # ---------------------------------------------------------------------------
 
 @router.get("/filters")
-async def get_metering_filters(
+@off_loop
+def get_metering_filters(
     user: User = Depends(require_permission("metering", "read")),
 ):
     """Return available projects, domains, and flavors for filter dropdowns."""
@@ -512,7 +520,8 @@ async def get_metering_filters(
 # ---------------------------------------------------------------------------
 
 @router.get("/overview")
-async def get_metering_overview(
+@off_loop
+def get_metering_overview(
     project: Optional[str] = Query(None),
     domain: Optional[str] = Query(None),
     region_id: Optional[str] = Query(None, description="Filter by region ID"),
@@ -697,7 +706,8 @@ def _rows_to_csv(rows: list, filename: str) -> StreamingResponse:
 
 
 @router.get("/export/resources")
-async def export_resources(
+@off_loop
+def export_resources(
     project: Optional[str] = Query(None),
     domain: Optional[str] = Query(None),
     hours: int = Query(24, ge=1, le=2160),
@@ -723,7 +733,8 @@ async def export_resources(
 
 
 @router.get("/export/snapshots")
-async def export_snapshots(
+@off_loop
+def export_snapshots(
     project: Optional[str] = Query(None),
     domain: Optional[str] = Query(None),
     hours: int = Query(24, ge=1, le=2160),
@@ -749,7 +760,8 @@ async def export_snapshots(
 
 
 @router.get("/export/restores")
-async def export_restores(
+@off_loop
+def export_restores(
     project: Optional[str] = Query(None),
     domain: Optional[str] = Query(None),
     hours: int = Query(168, ge=1, le=2160),
@@ -775,7 +787,8 @@ async def export_restores(
 
 
 @router.get("/export/api-usage")
-async def export_api_usage(
+@off_loop
+def export_api_usage(
     hours: int = Query(24, ge=1, le=2160),
     user: User = Depends(require_permission("metering", "read")),
 ):
@@ -793,7 +806,8 @@ async def export_api_usage(
 
 
 @router.get("/export/efficiency")
-async def export_efficiency(
+@off_loop
+def export_efficiency(
     project: Optional[str] = Query(None),
     domain: Optional[str] = Query(None),
     hours: int = Query(24, ge=1, le=2160),
@@ -819,7 +833,8 @@ async def export_efficiency(
 
 
 @router.get("/export/chargeback")
-async def export_chargeback(
+@off_loop
+def export_chargeback(
     project: Optional[str] = Query(None),
     domain: Optional[str] = Query(None),
     hours: int = Query(720, ge=1, le=8760, description="Lookback hours (default 30 days)"),
@@ -1213,7 +1228,8 @@ async def export_chargeback(
 # ---------------------------------------------------------------------------
 
 @router.get("/chargeback-summary")
-async def get_chargeback_summary(
+@off_loop
+def get_chargeback_summary(
     hours: int = Query(720, ge=1, le=8760, description="Lookback hours (default 30 days)"),
     start_date: Optional[str] = Query(None, description="Custom start date (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="Custom end date (YYYY-MM-DD)"),
@@ -1555,7 +1571,8 @@ async def get_chargeback_summary(
 # ---------------------------------------------------------------------------
 
 @router.get("/chargeback-details")
-async def get_chargeback_details(
+@off_loop
+def get_chargeback_details(
     hours: int = Query(720, ge=1, le=8760, description="Lookback hours (default 30 days)"),
     currency: Optional[str] = Query(None, description="Override display currency"),
     domain: Optional[str] = Query(None, description="Filter by domain"),
@@ -1726,7 +1743,8 @@ async def get_chargeback_details(
 # ---------------------------------------------------------------------------
 
 @router.get("/tenant-growth")
-async def get_tenant_growth(
+@off_loop
+def get_tenant_growth(
     months: int = Query(6, ge=1, le=24, description="Number of months to look back"),
     domain: Optional[str] = Query(None),
     user: User = Depends(require_permission("metering", "read")),
@@ -1890,7 +1908,8 @@ def _build_chargeback_xlsx(rows: list, currency: str, summary: dict) -> bytes:
 
 
 @router.get("/export/chargeback-excel")
-async def export_chargeback_excel(
+@off_loop
+def export_chargeback_excel(
     project: Optional[str] = Query(None),
     domain: Optional[str] = Query(None),
     hours: int = Query(720, ge=1, le=8760),
@@ -1901,7 +1920,7 @@ async def export_chargeback_excel(
     if not _XLSX_AVAILABLE:
         raise HTTPException(status_code=501, detail="openpyxl not installed")
 
-    rows, resolved_currency = await _collect_vm_rows_for_export(project, domain, hours, currency)
+    rows, resolved_currency = _collect_vm_rows_for_export(project, domain, hours, currency)
     xlsx_bytes = _build_chargeback_xlsx(rows, resolved_currency, {})
     ts = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M")
     filename = f"chargeback_vm_{ts}.xlsx"
@@ -1912,7 +1931,7 @@ async def export_chargeback_excel(
     )
 
 
-async def _collect_vm_rows_for_export(
+def _collect_vm_rows_for_export(
     project: Optional[str],
     domain: Optional[str],
     hours: int,
@@ -1983,7 +2002,8 @@ async def _collect_vm_rows_for_export(
 # ---------------------------------------------------------------------------
 
 @router.get("/export/chargeback-pdf")
-async def export_chargeback_pdf(
+@off_loop
+def export_chargeback_pdf(
     project: Optional[str] = Query(None),
     domain: Optional[str] = Query(None),
     hours: int = Query(720, ge=1, le=8760),
@@ -1994,7 +2014,7 @@ async def export_chargeback_pdf(
     if not _PDF_AVAILABLE:
         raise HTTPException(status_code=501, detail="reportlab not installed")
 
-    rows, resolved_currency = await _collect_vm_rows_for_export(project, domain, hours, currency)
+    rows, resolved_currency = _collect_vm_rows_for_export(project, domain, hours, currency)
 
     # Aggregate by tenant
     from collections import defaultdict
@@ -2073,7 +2093,8 @@ class ExportEmailRequest(BaseModel):
 
 
 @router.post("/export/send-email")
-async def send_chargeback_email(
+@off_loop
+def send_chargeback_email(
     req: ExportEmailRequest,
     user: User = Depends(require_permission("metering", "read")),
 ):
@@ -2087,7 +2108,7 @@ async def send_chargeback_email(
     if not SMTP_ENABLED or not SMTP_HOST:
         raise HTTPException(status_code=503, detail="SMTP is not configured on this server")
 
-    rows, resolved_currency = await _collect_vm_rows_for_export(
+    rows, resolved_currency = _collect_vm_rows_for_export(
         req.project, req.domain, req.hours, req.currency
     )
     ts = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M")
@@ -2234,7 +2255,8 @@ class PricingItemUpdate(BaseModel):
 
 
 @router.get("/pricing")
-async def list_pricing(
+@off_loop
+def list_pricing(
     user: User = Depends(require_permission("metering", "read")),
 ):
     """List all pricing entries grouped by category."""
@@ -2255,7 +2277,8 @@ async def list_pricing(
 
 
 @router.post("/pricing", status_code=201)
-async def create_pricing(
+@off_loop
+def create_pricing(
     body: PricingItemCreate,
     user: User = Depends(require_permission("metering", "write")),
 ):
@@ -2299,7 +2322,8 @@ async def create_pricing(
 
 
 @router.put("/pricing/{pricing_id}")
-async def update_pricing(
+@off_loop
+def update_pricing(
     pricing_id: int,
     body: PricingItemUpdate,
     user: User = Depends(require_permission("metering", "write")),
@@ -2334,7 +2358,8 @@ async def update_pricing(
 
 
 @router.delete("/pricing/{pricing_id}")
-async def delete_pricing(
+@off_loop
+def delete_pricing(
     pricing_id: int,
     user: User = Depends(require_permission("metering", "write")),
 ):
@@ -2348,7 +2373,8 @@ async def delete_pricing(
 
 
 @router.post("/pricing/sync-flavors")
-async def sync_flavors_to_pricing(
+@off_loop
+def sync_flavors_to_pricing(
     user: User = Depends(require_permission("metering", "write")),
 ):
     """
@@ -2442,7 +2468,8 @@ async def sync_flavors_to_pricing(
 
 # Legacy compatibility endpoint (redirects to new pricing)
 @router.get("/flavor-pricing")
-async def list_flavor_pricing_legacy(
+@off_loop
+def list_flavor_pricing_legacy(
     user: User = Depends(require_permission("metering", "read")),
 ):
     """Legacy: list flavor pricing entries. Use /pricing instead."""
@@ -0,0 +1,200 @@
+"""
+api/permission_cache.py — In-process cache of RBAC data for auth.py.
+
+Every authenticated request used to resolve the caller's role and then run up
+to two ``role_permissions`` queries, once in ``rbac_middleware`` and again in
+the ``require_permission`` dependency.  This module keeps:
+
+  * the full role → {(resource, action)} matrix (``role_permissions`` is a few
+    hundred rows at most), loaded with one query;
+  * ``username → role`` lookups from ``user_roles``.
+
+Both are invalidated across every Gunicorn worker through Redis pub/sub on
+``pf9:auth:invalidate`` — published by ``PUT /auth/permissions``,
+``set_user_role`` and the LDAP sync paths.  A TTL (``AUTH_CACHE_TTL_SECONDS``,
+default 60) bounds staleness when Redis is unavailable or a writer does not
+publish.
+
+Each invalidation bumps a generation counter; a load that started before an
+invalidation is not stored, so a concurrent change can never be overwritten
+with the data it replaced.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, FrozenSet, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "pf9:auth:invalidate"
+CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+
+_ROLE_USER_CACHE_MAX = 4096
+
+# Actions that satisfy a request for the key action (write implies read,
+# admin implies both).
+_IMPLIED_ACTIONS = {
+    "read": ("read", "write", "admin"),
+    "write": ("write", "admin"),
+}
+
+
+class PermissionCache:
+    """Role/permission matrix + user-role cache with pub/sub invalidation."""
+
+    def __init__(
+        self,
+        load_matrix: Callable[[], Dict[str, Set[Tuple[str, str]]]],
+        load_user_role: Callable[[str], Optional[str]],
+        redis_getter: Optional[Callable[[], object]] = None,
+        ttl: float = CACHE_TTL,
+    ) -> None:
+        self._load_matrix = load_matrix
+        self._load_user_role = load_user_role
+        self._redis_getter = redis_getter
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._matrix: Optional[Dict[str, FrozenSet[Tuple[str, str]]]] = None
+        self._matrix_loaded_at = 0.0
+        self._user_roles: Dict[str, Tuple[Optional[str], float]] = {}
+        self._listener: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # ── Lookups ──────────────────────────────────────────────────────────
+
+    def role_has_permission(self, role: str, resource: str, permission: str) -> bool:
+        """True when ``role`` grants ``permission`` on ``resource`` (or on ``*``)."""
+        grants = self._get_matrix().get(role)
+        if not grants:
+            return False
+        actions = _IMPLIED_ACTIONS.get(permission, (permission, "admin"))
+        return any((res, act) in grants for res in (resource, "*") for act in actions)
+
+    def user_role(self, username: str) -> Optional[str]:
+        """Cached ``user_roles`` lookup; the loader's exceptions propagate."""
+        self._ensure_listener()
+        now = time.monotonic()
+        entry = self._user_roles.get(username)
+        if entry is not None and entry[1] > now:
+            return entry[0]
+        generation = self._generation
+        role = self._load_user_role(username)
+        with self._lock:
+            if generation == self._generation:
+                if len(self._user_roles) >= _ROLE_USER_CACHE_MAX:
+                    self._user_roles.clear()
+                self._user_roles[username] = (role, now + self.ttl)
+        return role
+
+    def _get_matrix(self) -> Dict[str, FrozenSet[Tuple[str, str]]]:
+        self._ensure_listener()
+        matrix = self._matrix
+        if matrix is not None and time.monotonic() - self._matrix_loaded_at < self.ttl:
+            return matrix
+        generation = self._generation
+        try:
+            loaded = {role: frozenset(grants) for role, grants in self._load_matrix().items()}
+        except Exception as exc:
+            if matrix is not None:
+                logger.warning("role_permissions reload failed (%s) — keeping previous matrix", exc)
+                return matrix
+            raise
+        with self._lock:
+            if generation == self._generation:
+                self._matrix = loaded
+                self._matrix_loaded_at = time.monotonic()
+        return loaded
+
+    # ── Invalidation ─────────────────────────────────────────────────────
+
+    def invalidate_local(self, username: Optional[str] = None) -> None:
+        """Drop cached data in this process (all users when ``username`` is None)."""
+        with self._lock:
+            self._generation += 1
+            if username is None:
+                self._matrix = None
+                self._user_roles.clear()
+            else:
+                self._user_roles.pop(username, None)
+
+    def publish_invalidation(self, scope: str, username: Optional[str] = None) -> None:
+        """Invalidate locally and tell every other worker to do the same.
+
+        ``scope`` is ``"permissions"`` (matrix + all users) or ``"user"``.
+        """
+        self.invalidate_local(username if scope == "user" else None)
+        client = self._redis()
+        if client is None:
+            return
+        try:
+            client.publish(INVALIDATION_CHANNEL, json.dumps({
+                "scope": scope, "username": username, "pid": os.getpid(),
+            }))
+        except Exception as exc:
+            logger.debug("Auth cache invalidation publish failed: %s", exc)
+
+    def handle_message(self, data) -> None:
+        """Apply one pub/sub payload (malformed payloads flush everything)."""
+        try:
+            msg = json.loads(data)
+            scope, username = msg.get("scope"), msg.get("username")
+        except Exception:
+            scope, username = None, None
+        if scope == "user" and username:
+            self.invalidate_local(username)
+        else:
+            self.invalidate_local()
+
+    # ── Pub/sub listener ─────────────────────────────────────────────────
+
+    def _redis(self):
+        if self._redis_getter is None:
+            return None
+        try:
+            return self._redis_getter()
+        except Exception:
+            return None
+
+    def _ensure_listener(self) -> None:
+        if self._listener is not None or self._redis_getter is None:
+            return
+        with self._lock:
+            if self._listener is not None:
+                return
+            self._listener = threading.Thread(
+                target=self._listen, name="pf9-auth-invalidate", daemon=True
+            )
+            self._listener.start()
+
+    def _listen(self) -> None:
+        while not self._stop.is_set():
+            client = self._redis()
+            if client is None:
+                self._stop.wait(5)
+                continue
+            pubsub = None
+            try:
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Anything published while we were not subscribed is lost.
+                self.invalidate_local()
+                while not self._stop.is_set():
+                    msg = pubsub.get_message(timeout=1.0)
+                    if msg and msg.get("type") == "message":
+                        self.handle_message(msg.get("data"))
+            except Exception as exc:
+                logger.debug("Auth cache listener reconnecting after: %s", exc)
+                self._stop.wait(5)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    def stop(self) -> None:
+        self._stop.set()
@@ -11,6 +11,10 @@ import requests
 
 from cache import cached, _get_client as _get_redis
 from secret_helper import read_secret
+from shared.circuit_breaker import (  # noqa: F401 — re-exported for callers
+    CircuitBreakerOpenError,
+    RegionCircuitBreaker as _SharedRegionCircuitBreaker,
+)
 
 log = logging.getLogger(__name__)
 
@@ -19,189 +23,14 @@ log = logging.getLogger(__name__)
 # Redis-backed per-region circuit breaker
 # ---------------------------------------------------------------------------
 
-class CircuitBreakerOpenError(Exception):
-    """Raised when the circuit breaker is OPEN and calls are being fast-failed."""
-
-
-class RegionCircuitBreaker:
+class RegionCircuitBreaker(_SharedRegionCircuitBreaker):
     """
-    A Redis-backed circuit breaker for outbound Platform9 API calls.
-
-    States:
-      CLOSED    — normal operation; failures are counted.
-      OPEN      — calls are rejected immediately with CircuitBreakerOpenError
-                  for RECOVERY_TIMEOUT seconds.
-      HALF_OPEN — one probe request is allowed through after the recovery
-                  timeout expires; success → CLOSED, failure → OPEN again.
-
-    All state is stored in Redis so it is shared across multiple API worker
-    processes.  If Redis is unavailable the circuit breaker degrades
-    gracefully (calls always pass through).
-
-    Configuration via env vars:
-      CB_FAILURE_THRESHOLD  — consecutive failures before opening  (default 5)
-      CB_RECOVERY_TIMEOUT   — seconds to stay OPEN before probing  (default 30)
+    API flavour of shared.circuit_breaker.RegionCircuitBreaker whose state
+    lives in the api/cache Redis client, shared by every Gunicorn worker.
     """
 
-    FAILURE_THRESHOLD: int = int(os.getenv("CB_FAILURE_THRESHOLD", "5"))
-    RECOVERY_TIMEOUT: int  = int(os.getenv("CB_RECOVERY_TIMEOUT", "30"))
-
-    _STATE_CLOSED    = "closed"
-    _STATE_OPEN      = "open"
-    _STATE_HALF_OPEN = "half_open"
-
     def __init__(self, region_id: str) -> None:
-        self._region_id = region_id
-        self._key_state  = f"cb:pf9:{region_id}:state"
-        self._key_fails  = f"cb:pf9:{region_id}:failures"
-        self._key_until  = f"cb:pf9:{region_id}:open_until"
-        # Local fallback counters when Redis is absent
-        self._local_lock    = threading.Lock()
-        self._local_fails   = 0
-        self._local_state   = self._STATE_CLOSED
-        self._local_until   = 0.0
-
-    # ── Public interface ──────────────────────────────────────────────────
-
-    def allow_request(self) -> bool:
-        """Return True if a request should be allowed through.
-
-        Raises CircuitBreakerOpenError when the circuit is OPEN and the
-        recovery timeout has not elapsed yet.
-        """
-        state = self._get_state()
-        if state == self._STATE_CLOSED:
-            return True
-        if state == self._STATE_OPEN:
-            # Check if recovery window has elapsed
-            if self._recovery_elapsed():
-                self._set_state(self._STATE_HALF_OPEN)
-                log.info("Circuit breaker [%s]: HALF_OPEN — probing", self._region_id)
-                return True
-            raise CircuitBreakerOpenError(
-                f"Circuit breaker for region '{self._region_id}' is OPEN. "
-                "Platform9 API calls are being fast-failed."
-            )
-        # HALF_OPEN — allow the single probe
-        return True
-
-    def record_success(self) -> None:
-        """Record a successful call; reset failure counter and close the circuit."""
-        self._set_failures(0)
-        self._set_state(self._STATE_CLOSED)
-        log.info("Circuit breaker [%s]: CLOSED (success)", self._region_id)
-
-    def record_failure(self) -> None:
-        """Record a failed call; open the circuit if threshold is reached."""
-        fails = self._increment_failures()
-        if fails >= self.FAILURE_THRESHOLD:
-            self._open_circuit()
-
-    def get_status(self) -> dict:
-        """Return a snapshot of circuit breaker state for observability endpoints."""
-        state = self._get_state()
-        failures = self._get_failures()
-        remaining: Optional[int] = None
-        if state == self._STATE_OPEN:
-            rc = _get_redis()
-            if rc is not None:
-                try:
-                    v = rc.get(self._key_until)
-                    if v:
-                        remaining = max(0, int(float(v) - time.time()))
-                except Exception:
-                    pass
-            else:
-                remaining = max(0, int(self._local_until - time.monotonic()))
-        return {
-            "state": state,
-            "failure_count": failures,
-            "open_for_seconds_remaining": remaining,
-        }
-
-    # ── Redis helpers (with local fallback) ───────────────────────────────
-
-    def _get_state(self) -> str:
-        rc = _get_redis()
-        if rc is None:
-            return self._local_state
-        try:
-            return rc.get(self._key_state) or self._STATE_CLOSED
-        except Exception:
-            return self._local_state
-
-    def _set_state(self, state: str) -> None:
-        rc = _get_redis()
-        with self._local_lock:
-            self._local_state = state
-        if rc is None:
-            return
-        try:
-            rc.set(self._key_state, state, ex=self.RECOVERY_TIMEOUT * 10)
-        except Exception:
-            pass
-
-    def _get_failures(self) -> int:
-        rc = _get_redis()
-        if rc is None:
-            return self._local_fails
-        try:
-            v = rc.get(self._key_fails)
-            return int(v) if v else 0
-        except Exception:
-            return self._local_fails
-
-    def _set_failures(self, n: int) -> None:
-        rc = _get_redis()
-        with self._local_lock:
-            self._local_fails = n
-        if rc is None:
-            return
-        try:
-            rc.set(self._key_fails, n, ex=self.RECOVERY_TIMEOUT * 10)
-        except Exception:
-            pass
-
-    def _increment_failures(self) -> int:
-        rc = _get_redis()
-        with self._local_lock:
-            self._local_fails += 1
-            local = self._local_fails
-        if rc is None:
-            return local
-        try:
-            return rc.incr(self._key_fails)
-        except Exception:
-            return local
-
-    def _recovery_elapsed(self) -> bool:
-        rc = _get_redis()
-        if rc is None:
-            return time.monotonic() >= self._local_until
-        try:
-            v = rc.get(self._key_until)
-            if v is None:
-                return True
-            return time.time() >= float(v)
-        except Exception:
-            return time.monotonic() >= self._local_until
-
-    def _open_circuit(self) -> None:
-        until = time.time() + self.RECOVERY_TIMEOUT
-        rc = _get_redis()
-        with self._local_lock:
-            self._local_state = self._STATE_OPEN
-            self._local_until = time.monotonic() + self.RECOVERY_TIMEOUT
-        if rc is not None:
-            try:
-                rc.set(self._key_state, self._STATE_OPEN, ex=self.RECOVERY_TIMEOUT * 10)
-                rc.set(self._key_until, until, ex=self.RECOVERY_TIMEOUT * 10)
-            except Exception:
-                pass
-        log.warning(
-            "Circuit breaker [%s]: OPEN — %d failures, recovery in %ds",
-            self._region_id, self.FAILURE_THRESHOLD, self.RECOVERY_TIMEOUT,
-        )
+        super().__init__(region_id, redis_getter=lambda: _get_redis())
 
 
 # ---------------------------------------------------------------------------
@@ -36,7 +36,7 @@ from psycopg2.extras import RealDictCursor
 
 from auth import require_permission, get_current_user, User, get_effective_region_filter
 from cluster_registry import get_registry
-from db_pool import get_connection
+from db_pool import get_connection, off_loop
 from pf9_control import get_client
 
 REPORTS_DIR = os.getenv("PF9_OUTPUT_DIR", "/mnt/reports")
@@ -246,7 +246,8 @@ REPORT_CATALOG = [
 
 
 @router.get("/catalog")
-async def get_report_catalog(
+@off_loop
+def get_report_catalog(
     user: User = Depends(require_permission("reports", "read")),
 ):
     """Return the list of all available report types."""
@@ -258,7 +259,8 @@ async def get_report_catalog(
 # ---------------------------------------------------------------------------
 
 @router.get("/tenant-quota-usage")
-async def report_tenant_quota_usage(
+@off_loop
+def report_tenant_quota_usage(
     domain_id: Optional[str] = Query(None, description="Filter by domain ID"),
     format: str = Query("json", description="json or csv"),
     page: int = Query(1, ge=1, description="Page number (JSON only)"),
@@ -446,7 +448,8 @@ async def report_tenant_quota_usage(
 # ---------------------------------------------------------------------------
 
 @router.get("/domain-overview")
-async def report_domain_overview(
+@off_loop
+def report_domain_overview(
     format: str = Query("json", description="json or csv"),
     page: int = Query(1, ge=1, description="Page number (JSON only)"),
     page_size: int = Query(50, ge=1, le=500, description="Rows per page; CSV always returns all"),
@@ -642,7 +645,8 @@ async def report_domain_overview(
 # ---------------------------------------------------------------------------
 
 @router.get("/snapshot-compliance")
-async def report_snapshot_compliance(
+@off_loop
+def report_snapshot_compliance(
     domain_id: Optional[str] = Query(None),
     region_id: Optional[str] = Query(None, description="Filter by region ID"),
     format: str = Query("json", description="json or csv"),
@@ -763,7 +767,8 @@ async def report_snapshot_compliance(
 # ---------------------------------------------------------------------------
 
 @router.get("/flavor-usage")
-async def report_flavor_usage(
+@off_loop
+def report_flavor_usage(
     format: str = Query("json", description="json or csv"),
     region_id: Optional[str] = Query(None, description="Filter by region ID"),
     user: User = Depends(require_permission("reports", "read")),
@@ -865,7 +870,8 @@ async def report_flavor_usage(
 # ---------------------------------------------------------------------------
 
 @router.get("/metering-summary")
-async def report_metering_summary(
+@off_loop
+def report_metering_summary(
     domain_id: Optional[str] = Query(None),
     hours: int = Query(720, ge=1, le=8760, description="Lookback hours (default 30 days)"),
     format: str = Query("json", description="json or csv"),
@@ -959,7 +965,8 @@ async def report_metering_summary(
 # ---------------------------------------------------------------------------
 
 @router.get("/resource-inventory")
-async def report_resource_inventory(
+@off_loop
+def report_resource_inventory(
     domain_id: Optional[str] = Query(None),
     project_id: Optional[str] = Query(None),
     format: str = Query("json", description="json or csv"),
@@ -1029,7 +1036,8 @@ async def report_resource_inventory(
 # ---------------------------------------------------------------------------
 
 @router.get("/user-role-audit")
-async def report_user_role_audit(
+@off_loop
+def report_user_role_audit(
     domain_id: Optional[str] = Query(None),
     format: str = Query("json", description="json or csv"),
     region_id: Optional[str] = Query(None, description="Filter by region ID"),
@@ -1117,7 +1125,8 @@ async def report_user_role_audit(
 # ---------------------------------------------------------------------------
 
 @router.get("/idle-resources")
-async def report_idle_resources(
+@off_loop
+def report_idle_resources(
     domain_id: Optional[str] = Query(None),
     format: str = Query("json", description="json or csv"),
     region_id: Optional[str] = Query(None, description="Filter by region ID"),
@@ -1203,7 +1212,8 @@ async def report_idle_resources(
 # ---------------------------------------------------------------------------
 
 @router.get("/security-group-audit")
-async def report_security_group_audit(
+@off_loop
+def report_security_group_audit(
     project_id: Optional[str] = Query(None),
     format: str = Query("json", description="json or csv"),
     region_id: Optional[str] = Query(None, description="Filter by region ID"),
@@ -1274,7 +1284,8 @@ async def report_security_group_audit(
 # ---------------------------------------------------------------------------
 
 @router.get("/capacity-planning")
-async def report_capacity_planning(
+@off_loop
+def report_capacity_planning(
     format: str = Query("json", description="json or csv"),
     region_id: Optional[str] = Query(None, description="Filter by region ID"),
     user: User = Depends(require_permission("reports", "read")),
@@ -1409,7 +1420,8 @@ async def report_capacity_planning(
 # ---------------------------------------------------------------------------
 
 @router.get("/backup-status")
-async def report_backup_status(
+@off_loop
+def report_backup_status(
     format: str = Query("json", description="json or csv"),
     region_id: Optional[str] = Query(None, description="Filter by region ID"),
     user: User = Depends(require_permission("reports", "read")),
@@ -1476,7 +1488,8 @@ async def report_backup_status(
 # ---------------------------------------------------------------------------
 
 @router.get("/activity-log-export")
-async def report_activity_log(
+@off_loop
+def report_activity_log(
     days: int = Query(30, ge=1, le=365, description="Lookback in days"),
     action: Optional[str] = Query(None, description="Filter by action"),
     resource_type: Optional[str] = Query(None, description="Filter by resource type"),
@@ -1521,7 +1534,8 @@ async def report_activity_log(
 # ---------------------------------------------------------------------------
 
 @router.get("/network-topology")
-async def report_network_topology(
+@off_loop
+def report_network_topology(
     domain_id: Optional[str] = Query(None),
     format: str = Query("json", description="json or csv"),
     region_id: Optional[str] = Query(None, description="Filter by region ID"),
@@ -1617,7 +1631,8 @@ async def report_network_topology(
 # ---------------------------------------------------------------------------
 
 @router.get("/cost-allocation")
-async def report_cost_allocation(
+@off_loop
+def report_cost_allocation(
     hours: int = Query(720, ge=1, le=8760, description="Lookback hours (default 30 days)"),
     format: str = Query("json", description="json or csv"),
     region_id: Optional[str] = Query(None, description="Filter by region ID"),
@@ -1727,7 +1742,8 @@ async def report_cost_allocation(
 # ---------------------------------------------------------------------------
 
 @router.get("/drift-summary")
-async def report_drift_summary(
+@off_loop
+def report_drift_summary(
     format: str = Query("json", description="json or csv"),
     user: User = Depends(require_permission("reports", "read")),
 ):
@@ -1782,7 +1798,8 @@ async def report_drift_summary(
 # ---------------------------------------------------------------------------
 
 @router.get("/vm-report")
-async def report_vm_report(
+@off_loop
+def report_vm_report(
     domain_id: Optional[str] = Query(None, description="Filter by domain ID"),
     project_id: Optional[str] = Query(None, description="Filter by project ID"),
     format: str = Query("json", description="json or csv"),
@@ -1991,7 +2008,8 @@ async def report_vm_report(
 # ---------------------------------------------------------------------------
 
 @router.get("/image-usage")
-async def report_image_usage(
+@off_loop
+def report_image_usage(
     format: str = "json",
     region_id: Optional[str] = None,
     user: User = Depends(require_permission("reports", "read")),
@@ -2098,7 +2116,8 @@ async def report_image_usage(
 # ---------------------------------------------------------------------------
 
 @router.get("/flavor-by-tenant")
-async def report_flavor_by_tenant(
+@off_loop
+def report_flavor_by_tenant(
     format: str = "json",
     domain_id: Optional[str] = None,
     region_id: Optional[str] = None,
@@ -2210,7 +2229,8 @@ async def report_flavor_by_tenant(
 # ---------------------------------------------------------------------------
 
 @router.get("/rvtools/files")
-async def list_rvtools_files(
+@off_loop
+def list_rvtools_files(
     user: User = Depends(require_permission("reports", "read")),
 ):
     """List all RVTools Excel exports available for download."""
@@ -2234,7 +2254,8 @@ async def list_rvtools_files(
 
 
 @router.get("/rvtools/files/{filename}")
-async def download_rvtools_file(
+@off_loop
+def download_rvtools_file(
     filename: str,
     user: User = Depends(require_permission("reports", "read")),
 ):
@@ -2250,7 +2271,8 @@ async def download_rvtools_file(
 
 
 @router.get("/rvtools/runs")
-async def list_rvtools_runs(
+@off_loop
+def list_rvtools_runs(
     limit: int = Query(50, ge=1, le=500),
     user: User = Depends(require_permission("reports", "read")),
 ):
@@ -2288,7 +2310,8 @@ _DEFAULT_RETENTION_DAYS = int(os.getenv("RVTOOLS_RETENTION_DAYS", "30"))
 
 
 @router.get("/rvtools/retention")
-async def get_rvtools_retention(
+@off_loop
+def get_rvtools_retention(
     user: User = Depends(require_permission("reports", "read")),
 ):
     """Return the current RVTools file retention setting (in days)."""
@@ -2303,7 +2326,8 @@ async def get_rvtools_retention(
 
 
 @router.put("/rvtools/retention")
-async def set_rvtools_retention(
+@off_loop
+def set_rvtools_retention(
     body: dict,
     user: User = Depends(require_permission("reports", "admin")),
 ):
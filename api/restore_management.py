@@ -14,17 +14,27 @@ Supports:
   - NEW mode (side-by-side): create new VM alongside existing
   - REPLACE mode (destructive): delete existing VM then recreate from snapshot
   - IP strategies: NEW_IPS, TRY_SAME_IPS, SAME_IPS_OR_FAIL
+  - Batch execution of NEW-mode plans, at most RESTORE_PROJECT_CONCURRENCY
+    restores per project at a time
+
+The executor runs on the API event loop but never blocks it: OpenStack and DB
+calls go to a dedicated thread pool (RESTORE_IO_THREADS) and status polling
+sleeps with asyncio, backing off exponentially from RESTORE_POLL_INITIAL_SECONDS
+to RESTORE_POLL_MAX_SECONDS.
 """
 
 from __future__ import annotations
 
 import asyncio
+import functools
 import json
 import logging
 import os
 import secrets
 import time
 import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
@@ -45,6 +55,13 @@ logger = logging.getLogger("pf9.restore")
 RESTORE_ENABLED = os.getenv("RESTORE_ENABLED", "false").lower() in ("true", "1", "yes")
 RESTORE_DRY_RUN = os.getenv("RESTORE_DRY_RUN", "false").lower() in ("true", "1", "yes")
 
+# Executor concurrency / polling
+RESTORE_PROJECT_CONCURRENCY = max(1, int(os.getenv("RESTORE_PROJECT_CONCURRENCY", "4")))
+RESTORE_IO_THREADS = max(1, int(os.getenv("RESTORE_IO_THREADS", "32")))
+RESTORE_POLL_INITIAL_SECONDS = float(os.getenv("RESTORE_POLL_INITIAL_SECONDS", "2"))
+RESTORE_POLL_MAX_SECONDS = float(os.getenv("RESTORE_POLL_MAX_SECONDS", "30"))
+RESTORE_BATCH_MAX = 100
+
 # Pre-shared secret for internal service-to-service calls (tenant portal → admin API).
 # Must be the same in both services.  Empty string disables the internal endpoints.
 INTERNAL_SERVICE_SECRET = os.getenv("INTERNAL_SERVICE_SECRET", "")
@@ -115,6 +132,11 @@ class RestoreExecuteRequest(BaseModel):
     confirm_destructive: Optional[str] = None  # Required for REPLACE mode: "DELETE AND RESTORE <vm_name>"
 
 
+class RestoreBatchExecuteRequest(BaseModel):
+    """Request to execute several NEW-mode restore plans concurrently"""
+    plan_ids: List[str] = Field(min_length=1, max_length=RESTORE_BATCH_MAX)
+
+
 class RestoreCancelRequest(BaseModel):
     """Request to cancel a running restore job"""
     reason: Optional[str] = None
@@ -131,6 +153,23 @@ class RestoreRetryRequest(BaseModel):
     ip_strategy_override: Optional[str] = Field(default=None, pattern="^(NEW_IPS|TRY_SAME_IPS|SAME_IPS_OR_FAIL|MANUAL_IP)$")
 
 
+def _poll_delays(
+    timeout_secs: float,
+    initial: float = RESTORE_POLL_INITIAL_SECONDS,
+    maximum: float = RESTORE_POLL_MAX_SECONDS,
+):
+    """Sleep durations for a status poll: doubling from ``initial`` up to
+    ``maximum``, and stopping once ``timeout_secs`` would be exceeded."""
+    deadline = time.monotonic() + timeout_secs
+    delay = initial
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        yield min(delay, remaining)
+        delay = min(delay * 2, maximum)
+
+
 # ============================================================================
 # OpenStack Client for Restore Operations
 # ============================================================================
@@ -319,20 +358,12 @@ class RestoreOpenStackClient:
         r.raise_for_status()
         return r.json().get("volume", {})
 
-    def wait_volume_available(
-        self, session: http_requests.Session, project_id: str,
-        volume_id: str, timeout_secs: int = 600, poll_interval: int = 5
-    ) -> dict:
-        deadline = time.time() + timeout_secs
-        while time.time() < deadline:
-            vol = self.get_volume(session, project_id, volume_id)
-            st = vol.get("status", "")
-            if st == "available":
-                return vol
-            if st == "error":
-                raise RuntimeError(f"Volume {volume_id} entered error state")
-            time.sleep(poll_interval)
-        raise RuntimeError(f"Volume {volume_id} not available after {timeout_secs}s")
+    @staticmethod
+    def volume_ready(vol: dict, volume_id: str) -> bool:
+        st = vol.get("status", "")
+        if st == "error":
+            raise RuntimeError(f"Volume {volume_id} entered error state")
+        return st == "available"
 
     # --- Neutron operations ---
 
@@ -463,21 +494,13 @@ class RestoreOpenStackClient:
             logger.warning(f"Could not retrieve user_data for {server_id}: {e}")
             return None
 
-    def wait_server_active(
-        self, session: http_requests.Session, server_id: str,
-        timeout_secs: int = 600, poll_interval: int = 5
-    ) -> dict:
-        deadline = time.time() + timeout_secs
-        while time.time() < deadline:
-            server = self.get_server(session, server_id)
-            st = server.get("status", "").upper()
-            if st == "ACTIVE":
-                return server
-            if st == "ERROR":
-                fault = server.get("fault", {}).get("message", "Unknown error")
-                raise RuntimeError(f"Server entered ERROR state: {fault}")
-            time.sleep(poll_interval)
-        raise RuntimeError(f"Server {server_id} not ACTIVE after {timeout_secs}s")
+    @staticmethod
+    def server_ready(server: dict) -> bool:
+        st = server.get("status", "").upper()
+        if st == "ERROR":
+            fault = server.get("fault", {}).get("message", "Unknown error")
+            raise RuntimeError(f"Server entered ERROR state: {fault}")
+        return st == "ACTIVE"
 
     def delete_server(self, session: http_requests.Session, server_id: str):
         if not self.nova_endpoint:
@@ -487,21 +510,13 @@ class RestoreOpenStackClient:
         if r.status_code not in (200, 204, 404):
             r.raise_for_status()
 
-    def wait_server_deleted(
-        self, session: http_requests.Session, server_id: str,
-        timeout_secs: int = 300, poll_interval: int = 5
-    ) -> None:
-        deadline = time.time() + timeout_secs
-        while time.time() < deadline:
-            try:
-                server = self.get_server(session, server_id)
-                st = server.get("status", "").upper()
-                if st == "DELETED":
-                    return
-            except Exception:
-                return  # 404 means deleted
-            time.sleep(poll_interval)
-        raise RuntimeError(f"Server {server_id} not deleted after {timeout_secs}s")
+    def server_gone(self, session: http_requests.Session, server_id: str) -> bool:
+        """True once the server is DELETED or no longer found."""
+        try:
+            server = self.get_server(session, server_id)
+        except Exception:
+            return True  # 404 means deleted
+        return server.get("status", "").upper() == "DELETED"
 
     # --- Nova quota ---
 
@@ -545,21 +560,12 @@ class RestoreOpenStackClient:
         r.raise_for_status()
         return r.json().get("snapshot", {})
 
-    def wait_snapshot_available(
-        self, session: http_requests.Session, project_id: str,
-        snapshot_id: str, timeout_secs: int = 600, poll_interval: int = 5,
-    ) -> dict:
-        """Wait for a snapshot to reach 'available' status."""
-        deadline = time.time() + timeout_secs
-        while time.time() < deadline:
-            snap = self.get_snapshot_detail(session, project_id, snapshot_id)
-            st = snap.get("status", "")
-            if st == "available":
-                return snap
-            if st == "error":
-                raise RuntimeError(f"Snapshot {snapshot_id} entered error state")
-            time.sleep(poll_interval)
-        raise RuntimeError(f"Snapshot {snapshot_id} not available after {timeout_secs}s")
+    @staticmethod
+    def snapshot_ready(snap: dict, snapshot_id: str) -> bool:
+        st = snap.get("status", "")
+        if st == "error":
+            raise RuntimeError(f"Snapshot {snapshot_id} entered error state")
+        return st == "available"
 
     def get_snapshot_detail(self, session: http_requests.Session, project_id: str, snapshot_id: str) -> dict:
         """Get details of a specific Cinder snapshot."""
@@ -1158,92 +1164,152 @@ class RestoreExecutor:
     """
     Executes a restore job step-by-step, updating the DB as it goes.
     Designed to run as a background asyncio task inside the API process.
+
+    Blocking OpenStack/DB calls run on a dedicated thread pool and waits are
+    asyncio sleeps, so many jobs can be in flight without stalling the event
+    loop. At most RESTORE_PROJECT_CONCURRENCY jobs run per project; the rest
+    stay PENDING until a slot frees up.
     """
 
     def __init__(self, os_client: RestoreOpenStackClient):
         self.os_client = os_client
+        self._io_pool = ThreadPoolExecutor(
+            max_workers=RESTORE_IO_THREADS, thread_name_prefix="restore-io"
+        )
+        self._project_slots: Dict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(RESTORE_PROJECT_CONCURRENCY)
+        )
+        self._tasks: set = set()
+
+    def spawn(self, coro) -> asyncio.Task:
+        """Run a coroutine in the background, keeping a reference until it finishes."""
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _io(self, fn, *args, **kwargs):
+        """Run a blocking call on the restore I/O pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._io_pool, functools.partial(fn, *args, **kwargs))
+
+    async def _db(self, fn):
+        """Run ``fn(conn)`` with a fresh DB connection on the restore I/O pool."""
+        return await self._io(self._with_conn, fn)
+
+    async def _poll(self, fetch, ready, timeout_secs: int, timeout_message: str):
+        """Call ``fetch`` until ``ready(result)`` holds, backing off between polls."""
+        for delay in _poll_delays(timeout_secs):
+            result = await self._io(fetch)
+            if ready(result):
+                return result
+            await asyncio.sleep(delay)
+        raise RuntimeError(f"{timeout_message} after {timeout_secs}s")
+
+    async def execute_batch(self, job_ids: List[str]):
+        """Run several PENDING jobs concurrently (still capped per project)."""
+        results = await asyncio.gather(
+            *(self.execute_job(job_id) for job_id in job_ids), return_exceptions=True
+        )
+        for job_id, res in zip(job_ids, results):
+            if isinstance(res, BaseException):
+                logger.error("Batch restore job %s crashed: %s", job_id, res)
 
     async def execute_job(self, job_id: str):
         """Main entry: run all steps for a job."""
-        # Each DB operation uses its own connection for thread-safety
-        with get_connection() as conn:
-            # Load the job
-            job = self._load_job(conn, job_id)
-            if not job:
-                logger.error(f"Job {job_id} not found")
-                return
-            if job["status"] not in ("PENDING",):
-                logger.error(f"Job {job_id} in unexpected status: {job['status']}")
-                return
-
-            plan = job["plan_json"]
-            if isinstance(plan, str):
-                plan = json.loads(plan)
-
-            project_id = job["project_id"]
-
-            # Mark job as RUNNING
-            self._update_job_status(conn, job_id, "RUNNING")
-
-        # Authenticate service user for this project
-        try:
-            session = self.os_client.authenticate_service_user(project_id)
-        except Exception as e:
-            _err = str(e)
-            self._with_conn(lambda c: self._fail_job(c, job_id, f"Authentication failed: {_err}"))
+        job = await self._db(lambda c: self._load_job(c, job_id))
+        if not job:
+            logger.error(f"Job {job_id} not found")
             return
+        if job["status"] not in ("PENDING",):
+            logger.error(f"Job {job_id} in unexpected status: {job['status']}")
+            return
+
+        plan = job["plan_json"]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
 
-        # Track created resources for rollback
         created_resources = {
             "volume_id": None,
             "port_ids": [],
             "server_id": None,
         }
+        await self._run_job(
+            job_id, job, plan, created_resources,
+            notify_tenant=job.get("created_by", "").startswith("tenant:"),
+        )
 
-        # Load steps (fresh conn)
-        steps = self._with_conn(lambda c: self._load_steps(c, job_id))
+    async def retry_job(self, job_id: str, job: dict, plan: dict, existing_resources: dict):
+        """Run a retry job, starting from resources the original job already created."""
+        created_resources = {
+            "volume_id": existing_resources["volume_id"],
+            "port_ids": list(existing_resources["port_ids"]),
+            "server_id": existing_resources["server_id"],
+        }
+        await self._run_job(job_id, job, plan, created_resources, notify_tenant=False)
 
-        # Execute each step
-        for step in steps:
-            # Check for cancellation (fresh conn)
-            job_refresh = self._with_conn(lambda c: self._load_job(c, job_id))
-            if job_refresh and job_refresh["status"] == "CANCELED":
-                logger.info(f"Job {job_id} was canceled, stopping execution")
-                await self._cleanup_resources(session, project_id, created_resources)
+    async def _run_job(
+        self, job_id: str, job: dict, plan: dict, created_resources: dict,
+        notify_tenant: bool,
+    ):
+        """Claim a project slot, mark the job RUNNING and execute its steps."""
+        project_id = job["project_id"]
+        async with self._project_slots[project_id]:
+            # The job may have been canceled while it waited for a slot
+            if not await self._db(lambda c: self._claim_job(c, job_id)):
+                logger.info(f"Job {job_id} is no longer PENDING, not starting it")
                 return
 
-            step_name = step["step_name"]
-            step_id = step["id"]
-
-            self._with_conn(lambda c: self._update_step_status(c, job_id, step_id, "RUNNING"))
-            self._with_conn(lambda c: self._heartbeat(c, job_id))
-
+            # Authenticate service user for this project
             try:
-                result = await self._execute_step(
-                    session, project_id, plan, step_name, created_resources, job
-                )
-                self._with_conn(
-                    lambda c: self._update_step_status(c, job_id, step_id, "SUCCEEDED", details=result)
-                )
+                session = await self._io(self.os_client.authenticate_service_user, project_id)
             except Exception as e:
                 _err = str(e)
-                logger.error(f"Step {step_name} failed for job {job_id}: {_err}")
-                self._with_conn(
-                    lambda c: self._update_step_status(c, job_id, step_id, "FAILED", error=_err)
-                )
-                # Attempt cleanup
-                await self._cleanup_resources(session, project_id, created_resources)
-                self._with_conn(lambda c: self._fail_job(c, job_id, f"Step {step_name} failed: {_err}"))
-                # Notify tenant by email on failure (P4c)
-                if job.get("created_by", "").startswith("tenant:"):
-                    self._notify_tenant_result(job, "failed", _err)
+                await self._db(lambda c: self._fail_job(c, job_id, f"Authentication failed: {_err}"))
                 return
 
-        # All steps succeeded
-        self._with_conn(lambda c: self._complete_job(c, job_id, created_resources))
-        # Notify tenant by email if this was a tenant-initiated restore (P4c)
-        if job.get("created_by", "").startswith("tenant:"):
-            self._notify_tenant_result(job, "succeeded")
+            steps = await self._db(lambda c: self._load_steps(c, job_id))
+
+            for step in steps:
+                # Check for cancellation
+                job_refresh = await self._db(lambda c: self._load_job(c, job_id))
+                if job_refresh and job_refresh["status"] == "CANCELED":
+                    logger.info(f"Job {job_id} was canceled, stopping execution")
+                    await self._cleanup_resources(session, project_id, created_resources)
+                    return
+
+                step_name = step["step_name"]
+                step_id = step["id"]
+
+                await self._db(lambda c: self._update_step_status(c, job_id, step_id, "RUNNING"))
+                await self._db(lambda c: self._heartbeat(c, job_id))
+
+                try:
+                    result = await self._execute_step(
+                        session, project_id, plan, step_name, created_resources, job
+                    )
+                    await self._db(
+                        lambda c: self._update_step_status(c, job_id, step_id, "SUCCEEDED", details=result)
+                    )
+                except Exception as e:
+                    _err = str(e)
+                    logger.error(f"Step {step_name} failed for job {job_id}: {_err}")
+                    await self._db(
+                        lambda c: self._update_step_status(c, job_id, step_id, "FAILED", error=_err)
+                    )
+                    # Attempt cleanup
+                    await self._cleanup_resources(session, project_id, created_resources)
+                    await self._db(lambda c: self._fail_job(c, job_id, f"Step {step_name} failed: {_err}"))
+                    # Notify tenant by email on failure (P4c)
+                    if notify_tenant:
+                        await self._io(self._notify_tenant_result, job, "failed", _err)
+                    return
+
+            # All steps succeeded
+            await self._db(lambda c: self._complete_job(c, job_id, created_resources))
+            # Notify tenant by email if this was a tenant-initiated restore (P4c)
+            if notify_tenant:
+                await self._io(self._notify_tenant_result, job, "succeeded")
 
     def _notify_tenant_result(self, job: dict, outcome: str, reason: str = "") -> None:
         """Send a result email to the tenant user whose restore just completed/failed.
@@ -1301,7 +1367,7 @@ class RestoreExecutor:
         """Execute a single step and return result details."""
 
         if step_name == "VALIDATE_LIVE_STATE":
-            return await asyncio.to_thread(
+            return await self._io(
                 self._step_validate, session, project_id, plan
             )
 
@@ -1310,73 +1376,69 @@ class RestoreExecutor:
             return {"message": "Service user authenticated and scoped to project"}
 
         elif step_name == "QUOTA_CHECK":
-            return await asyncio.to_thread(
+            return await self._io(
                 self._step_quota_check, session, project_id, plan
             )
 
         elif step_name == "DELETE_EXISTING_VM":
-            return await asyncio.to_thread(
+            return await self._io(
                 self._step_delete_vm, session, plan["vm"]["id"]
             )
 
         elif step_name == "SAFETY_SNAPSHOT":
-            result = await asyncio.to_thread(
+            result = await self._io(
                 self._step_safety_snapshot, session, project_id, plan
             )
             resources["safety_snapshot_id"] = result.get("snapshot_id")
             return result
 
         elif step_name == "WAIT_SAFETY_SNAPSHOT":
-            return await asyncio.to_thread(
-                self._step_wait_safety_snapshot, session, project_id, resources.get("safety_snapshot_id")
+            return await self._step_wait_safety_snapshot(
+                session, project_id, resources.get("safety_snapshot_id")
             )
 
         elif step_name == "WAIT_VM_DELETED":
-            return await asyncio.to_thread(
-                self._step_wait_vm_deleted, session, plan["vm"]["id"]
-            )
+            return await self._step_wait_vm_deleted(session, plan["vm"]["id"])
 
         elif step_name == "CLEANUP_OLD_PORTS":
-            return await asyncio.to_thread(
-                self._step_cleanup_old_ports, session, plan
-            )
+            result = await self._io(self._step_cleanup_old_ports, session, plan)
+            # Brief pause to let Neutron fully release the IPs
+            if result["cleaned_ports"] or result["force_cleaned_ports"]:
+                await asyncio.sleep(3)
+            return result
 
         elif step_name == "CREATE_VOLUME_FROM_SNAPSHOT":
-            result = await asyncio.to_thread(
+            result = await self._io(
                 self._step_create_volume, session, project_id, plan
             )
             resources["volume_id"] = result.get("volume_id")
             return result
 
         elif step_name == "WAIT_VOLUME_AVAILABLE":
-            return await asyncio.to_thread(
-                self._step_wait_volume, session, project_id, resources["volume_id"]
-            )
+            return await self._step_wait_volume(session, project_id, resources["volume_id"])
 
         elif step_name == "CREATE_PORTS":
-            result = await asyncio.to_thread(
+            result = await self._io(
                 self._step_create_ports, session, project_id, plan
             )
             resources["port_ids"] = result.get("port_ids", [])
             return result
 
         elif step_name == "CREATE_SERVER":
-            result = await asyncio.to_thread(
+            result = await self._io(
                 self._step_create_server, session, plan, resources
             )
             resources["server_id"] = result.get("server_id")
             return result
 
         elif step_name == "WAIT_SERVER_ACTIVE":
-            return await asyncio.to_thread(
-                self._step_wait_server, session, resources["server_id"]
-            )
+            return await self._step_wait_server(session, resources["server_id"])
 
         elif step_name == "FINALIZE":
             return {"message": "Restore completed successfully", "resources": resources}
 
         elif step_name == "CLEANUP_OLD_STORAGE":
-            return await asyncio.to_thread(
+            return await self._io(
                 self._step_cleanup_old_storage, session, project_id, plan
             )
 
@@ -1424,15 +1486,22 @@ class RestoreExecutor:
         logger.info(f"Created safety snapshot {snap_id} for volume {source_vol_id} before REPLACE")
         return {"snapshot_id": snap_id, "volume_id": source_vol_id, "snapshot_name": snap.get("name")}
 
-    def _step_wait_safety_snapshot(self, session, project_id, snapshot_id) -> dict:
+    async def _step_wait_safety_snapshot(self, session, project_id, snapshot_id) -> dict:
         """Wait for the safety snapshot to become available."""
         if RESTORE_DRY_RUN or not snapshot_id:
             return {"snapshot_status": "available", "dry_run": True}
-        snap = self.os_client.wait_snapshot_available(session, project_id, snapshot_id)
+        snap = await self._poll(
+            lambda: self.os_client.get_snapshot_detail(session, project_id, snapshot_id),
+            lambda snap: self.os_client.snapshot_ready(snap, snapshot_id),
+            600, f"Snapshot {snapshot_id} not available",
+        )
         return {"snapshot_status": snap.get("status"), "snapshot_id": snapshot_id}
 
-    def _step_wait_vm_deleted(self, session, vm_id) -> dict:
-        self.os_client.wait_server_deleted(session, vm_id)
+    async def _step_wait_vm_deleted(self, session, vm_id) -> dict:
+        await self._poll(
+            lambda: self.os_client.server_gone(session, vm_id),
+            bool, 300, f"Server {vm_id} not deleted",
+        )
         return {"vm_deleted": True}
 
     def _step_cleanup_old_ports(self, session, plan) -> dict:
@@ -1505,10 +1574,6 @@ class RestoreExecutor:
                 except Exception as e:
                     logger.debug(f"Could not check ports for IP {ip_addr}: {e}")
 
-        # Brief pause to let Neutron fully release the IPs
-        if cleaned or force_cleaned:
-            time.sleep(3)
-
         return {
             "cleaned_ports": cleaned,
             "force_cleaned_ports": force_cleaned,
@@ -1599,10 +1664,14 @@ class RestoreExecutor:
         )
         return {"volume_id": vol.get("id"), "volume_name": vol_name, "size_gb": size_gb}
 
-    def _step_wait_volume(self, session, project_id, volume_id) -> dict:
+    async def _step_wait_volume(self, session, project_id, volume_id) -> dict:
         if RESTORE_DRY_RUN:
             return {"volume_status": "available", "dry_run": True}
-        vol = self.os_client.wait_volume_available(session, project_id, volume_id)
+        vol = await self._poll(
+            lambda: self.os_client.get_volume(session, project_id, volume_id),
+            lambda vol: self.os_client.volume_ready(vol, volume_id),
+            600, f"Volume {volume_id} not available",
+        )
         return {"volume_status": vol.get("status"), "volume_id": volume_id}
 
     def _step_create_ports(self, session, project_id, plan) -> dict:
@@ -1704,10 +1773,14 @@ class RestoreExecutor:
             "user_data_preserved": bool(user_data),
         }
 
-    def _step_wait_server(self, session, server_id) -> dict:
+    async def _step_wait_server(self, session, server_id) -> dict:
         if RESTORE_DRY_RUN:
             return {"server_status": "ACTIVE", "dry_run": True}
-        server = self.os_client.wait_server_active(session, server_id)
+        server = await self._poll(
+            lambda: self.os_client.get_server(session, server_id),
+            self.os_client.server_ready,
+            600, f"Server {server_id} not ACTIVE",
+        )
         # Extract final IPs
         addresses = server.get("addresses", {})
         final_ips = []
@@ -1732,7 +1805,7 @@ class RestoreExecutor:
         # Delete server first (if created)
         if resources.get("server_id") and not RESTORE_DRY_RUN:
             try:
-                self.os_client.delete_server(session, resources["server_id"])
+                await self._io(self.os_client.delete_server, session, resources["server_id"])
                 logger.info(f"Cleaned up server {resources['server_id']}")
             except Exception as e:
                 logger.warning("Failed to cleanup server: %s", e)
@@ -1742,7 +1815,7 @@ class RestoreExecutor:
             if RESTORE_DRY_RUN:
                 continue
             try:
-                self.os_client.delete_port(session, port_id)
+                await self._io(self.os_client.delete_port, session, port_id)
                 logger.info("Cleaned up port %s", port_id)
             except Exception as e:
                 logger.warning(f"Failed to cleanup port {port_id}: {e}")
@@ -1754,7 +1827,7 @@ class RestoreExecutor:
             if cleanup_volumes:
                 try:
                     url = self.os_client._cinder_url(project_id, f"/volumes/{resources['volume_id']}")
-                    session.delete(url, timeout=60)
+                    await self._io(session.delete, url, timeout=60)
                     logger.info(f"Cleaned up volume {resources['volume_id']}")
                 except Exception as e:
                     logger.warning(f"Failed to cleanup volume {resources['volume_id']}: {e}")
@@ -1792,6 +1865,16 @@ class RestoreExecutor:
                     (status, job_id),
                 )
 
+    def _claim_job(self, conn, job_id: str) -> bool:
+        """Move a PENDING job to RUNNING; False if it was canceled meanwhile."""
+        with conn.cursor() as cur:
+            cur.execute(
+                """UPDATE restore_jobs SET status='RUNNING', started_at=now(), last_heartbeat=now()
+                   WHERE id=%s AND status='PENDING'""",
+                (job_id,),
+            )
+            return cur.rowcount == 1
+
     def _heartbeat(self, conn, job_id: str):
         with conn.cursor() as cur:
             cur.execute(
@@ -2296,7 +2379,7 @@ def setup_restore_routes(app):
                 )
 
         # Launch execution as background task
-        asyncio.create_task(executor.execute_job(req.plan_id))
+        executor.spawn(executor.execute_job(req.plan_id))
 
         return {
             "job_id": req.plan_id,
@@ -2304,6 +2387,68 @@ def setup_restore_routes(app):
             "message": "Restore execution started. Poll /restore/jobs/{job_id} for progress.",
         }
 
+    # ------------------------------------------------------------------
+    # POST /restore/execute-batch  — execute several NEW-mode plans at once
+    # ------------------------------------------------------------------
+    @app.post("/restore/execute-batch", tags=["Snapshot Restore"])
+    async def execute_restore_batch(
+        req: RestoreBatchExecuteRequest,
+        current_user: User = Depends(get_current_user),
+        _perm: bool = Depends(require_permission("restore", "admin")),
+    ):
+        """
+        Execute several PLANNED restore plans concurrently (e.g. every VM of a
+        tenant). Runs at most RESTORE_PROJECT_CONCURRENCY restores per project
+        at a time; the others wait in PENDING. Only NEW-mode plans are accepted —
+        REPLACE restores need a per-VM confirmation via /restore/execute.
+        """
+        if not RESTORE_ENABLED:
+            raise HTTPException(503, "Restore feature is not enabled")
+
+        try:
+            plan_ids = list(dict.fromkeys(str(uuid.UUID(pid)) for pid in req.plan_ids))
+        except ValueError:
+            raise HTTPException(400, "plan_ids must be restore plan UUIDs")
+        with get_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(
+                    "SELECT id, status, mode FROM restore_jobs WHERE id = ANY(%s::uuid[])",
+                    (plan_ids,),
+                )
+                jobs = {str(r["id"]): r for r in cur.fetchall()}
+
+            missing = [pid for pid in plan_ids if pid not in jobs]
+            if missing:
+                raise HTTPException(404, f"Restore plan(s) not found: {', '.join(missing)}")
+            not_planned = [pid for pid in plan_ids if jobs[pid]["status"] != "PLANNED"]
+            if not_planned:
+                raise HTTPException(
+                    400,
+                    f"Only PLANNED jobs can be executed; not PLANNED: {', '.join(not_planned)}"
+                )
+            replace = [pid for pid in plan_ids if jobs[pid]["mode"] == "REPLACE"]
+            if replace:
+                raise HTTPException(
+                    400,
+                    f"REPLACE mode plans cannot be batch-executed: {', '.join(replace)}"
+                )
+
+            with conn.cursor() as cur:
+                cur.execute(
+                    """UPDATE restore_jobs SET status='PENDING', executed_by=%s
+                       WHERE id = ANY(%s::uuid[]) AND status='PLANNED'""",
+                    (current_user.username, plan_ids),
+                )
+
+        executor.spawn(executor.execute_batch(plan_ids))
+
+        return {
+            "job_ids": plan_ids,
+            "status": "PENDING",
+            "max_concurrent_per_project": RESTORE_PROJECT_CONCURRENCY,
+            "message": "Batch restore started. Poll /restore/jobs/{job_id} for progress.",
+        }
+
     # ------------------------------------------------------------------
     # GET /restore/jobs  — list restore jobs
     # ------------------------------------------------------------------
@@ -2843,56 +2988,7 @@ def setup_restore_routes(app):
                 )
 
         # Launch execution with pre-existing resources
-        async def retry_with_resources():
-            """Custom execution that pre-populates resources from the original job."""
-            with get_connection() as conn3:
-                executor._update_job_status(conn3, new_job_id, "RUNNING")
-
-            try:
-                session = os_client.authenticate_service_user(job["project_id"])
-            except Exception as e:
-                _err = str(e)
-                executor._with_conn(lambda c: executor._fail_job(c, new_job_id, f"Authentication failed: {_err}"))
-                return
-
-            # Start with existing resources
-            created_resources = {
-                "volume_id": existing_resources["volume_id"],
-                "port_ids": list(existing_resources["port_ids"]),
-                "server_id": existing_resources["server_id"],
-            }
-
-            retry_steps = executor._with_conn(lambda c: executor._load_steps(c, new_job_id))
-
-            for step in retry_steps:
-                step_name = step["step_name"]
-                step_id = step["id"]
-
-                executor._with_conn(lambda c: executor._update_step_status(c, new_job_id, step_id, "RUNNING"))
-                executor._with_conn(lambda c: executor._heartbeat(c, new_job_id))
-
-                try:
-                    result = await executor._execute_step(
-                        session, job["project_id"], plan, step_name, created_resources, job
-                    )
-                    executor._with_conn(
-                        lambda c: executor._update_step_status(c, new_job_id, step_id, "SUCCEEDED", details=result)
-                    )
-                except Exception as e:
-                    _err = str(e)
-                    logger.error(f"Retry step {step_name} failed for job {new_job_id}: {_err}")
-                    executor._with_conn(
-                        lambda c: executor._update_step_status(c, new_job_id, step_id, "FAILED", error=_err)
-                    )
-                    await executor._cleanup_resources(session, job["project_id"], created_resources)
-                    executor._with_conn(
-                        lambda c: executor._fail_job(c, new_job_id, f"Step {step_name} failed: {_err}")
-                    )
-                    return
-
-            executor._with_conn(lambda c: executor._complete_job(c, new_job_id, created_resources))
-
-        asyncio.create_task(retry_with_resources())
+        executor.spawn(executor.retry_job(new_job_id, job, plan, existing_resources))
 
         return {
             "job_id": new_job_id,
@@ -3012,7 +3108,7 @@ def setup_restore_routes(app):
                     (req.created_by, req.plan_id),
                 )
 
-        asyncio.create_task(executor.execute_job(req.plan_id))
+        executor.spawn(executor.execute_job(req.plan_id))
         return {
             "job_id": req.plan_id,
             "status": "PENDING",
@@ -3327,7 +3423,7 @@ def setup_restore_routes(app):
             raise HTTPException(403, "Forbidden")
 
         # Import runbook engine machinery
-        from runbook_routes import RUNBOOK_ENGINES, _execute_runbook
+        from runbook_routes import RUNBOOK_ENGINES, runbook_pool
 
         with get_connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
@@ -3353,8 +3449,8 @@ def setup_restore_routes(app):
                 cur.execute(
                     """
                     INSERT INTO runbook_executions
-                        (runbook_name, status, dry_run, parameters, triggered_by)
-                    VALUES (%s, 'approved', %s, %s, %s)
+                        (runbook_name, status, dry_run, parameters, triggered_by, queued_at)
+                    VALUES (%s, 'queued', %s, %s, %s, now())
                     RETURNING execution_id
                     """,
                     (body.runbook_name, body.dry_run, _json.dumps(params), body.triggered_by),
@@ -3374,8 +3470,9 @@ def setup_restore_routes(app):
                 )
                 conn.commit()
 
-        # Execute synchronously (outside transaction)
-        _execute_runbook(execution_id, body.runbook_name, params, body.dry_run, body.triggered_by)
+        # The worker pool runs it under the per-runbook limits; the tenant
+        # portal polls the execution for the result
+        runbook_pool.wake()
 
         with get_connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
@@ -0,0 +1,356 @@
+"""
+api/runbook_queue.py — Durable runbook execution queue and worker pool.
+
+``trigger_runbook`` and ``approve_reject_execution`` used to run the engine
+inline inside their ``async def`` handlers, so a runbook making blocking
+OpenStack calls for minutes stalled every request on that Uvicorn worker.
+They now only set the execution to ``queued`` and return; the queue lives in
+``runbook_executions`` itself and is drained by ``RunbookWorkerPool``:
+
+  * ``RUNBOOK_QUEUE_WORKERS`` threads per API process (default 2; 0 disables
+    the pool in that process) claim queued rows.  A claim holds a
+    transaction-level advisory lock, so every process sees the same running
+    counts and the per-engine limits hold across all Gunicorn workers.
+  * ``RUNBOOK_ENGINE_CONCURRENCY`` — per-engine caps, e.g.
+    ``orphan_resource_cleanup=1,vm_rightsizing=2``; other engines use
+    ``RUNBOOK_ENGINE_CONCURRENCY_DEFAULT`` (default 2).
+  * a heartbeat thread writes ``heartbeat_at`` and the latest progress of
+    the executions this process runs every ``RUNBOOK_HEARTBEAT_SECONDS``
+    (default 10) and picks up ``cancel_requested``.  Executions whose
+    heartbeat is older than ``RUNBOOK_STALE_SECONDS`` (default 600) — their
+    process died — are marked failed rather than re-run, since engines are
+    not idempotent.
+  * ``report_progress()`` lets an engine publish step-level progress to the
+    ``pf9:runbook_progress`` Redis channel, which ``/api/events/stream``
+    forwards as ``event: runbook_progress``.  It is also the cancellation
+    point: once a cancel is requested it raises ``RunbookCancelled``.
+
+Polling is used instead of LISTEN/NOTIFY because the API reaches Postgres
+through PgBouncer in transaction mode; a trigger in the same process wakes
+the pool immediately via ``wake()``.
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+from psycopg2.extras import RealDictCursor
+
+from db_pool import get_connection
+
+logger = logging.getLogger("pf9_runbooks.queue")
+
+PROGRESS_CHANNEL = "pf9:runbook_progress"
+
+QUEUE_WORKERS = int(os.getenv("RUNBOOK_QUEUE_WORKERS", "2"))
+POLL_SECONDS = float(os.getenv("RUNBOOK_QUEUE_POLL_SECONDS", "2"))
+HEARTBEAT_SECONDS = float(os.getenv("RUNBOOK_HEARTBEAT_SECONDS", "10"))
+STALE_SECONDS = int(os.getenv("RUNBOOK_STALE_SECONDS", "600"))
+DEFAULT_ENGINE_LIMIT = max(1, int(os.getenv("RUNBOOK_ENGINE_CONCURRENCY_DEFAULT", "2")))
+
+# Engines that sweep or modify the whole cloud run one at a time by default.
+DEFAULT_ENGINE_LIMITS: Dict[str, int] = {
+    "orphan_resource_cleanup": 1,
+    "hypervisor_maintenance_evacuate": 1,
+    "tenant_offboarding": 1,
+}
+
+# Minimum gap between two progress publishes for the same step.
+_PUBLISH_INTERVAL = 0.5
+
+_CLAIM_LOCK_SQL = "SELECT pg_advisory_xact_lock(hashtext('pf9_runbook_queue'))"
+
+
+def _parse_engine_limits(raw: str) -> Dict[str, int]:
+    """Parse ``engine=N,engine=N`` into a dict; malformed entries are ignored."""
+    limits = dict(DEFAULT_ENGINE_LIMITS)
+    for part in (raw or "").split(","):
+        name, sep, value = part.partition("=")
+        if not sep:
+            continue
+        try:
+            limits[name.strip()] = max(1, int(value))
+        except ValueError:
+            continue
+    return limits
+
+
+class RunbookCancelled(Exception):
+    """Raised inside an engine at its next progress report after a cancel."""
+
+
+class _Job:
+    """In-process state of one claimed execution."""
+
+    def __init__(self, execution_id: str, runbook_name: str) -> None:
+        self.execution_id = execution_id
+        self.runbook_name = runbook_name
+        self.cancel = threading.Event()
+        self.progress: Dict[str, Any] = {}
+        self.lock = threading.Lock()
+        self.last_publish = 0.0
+
+
+_local = threading.local()
+
+
+def current_execution_id() -> Optional[str]:
+    """Execution id of the queued run on this thread, if any."""
+    job = getattr(_local, "job", None)
+    return job.execution_id if job else None
+
+
+def _publish(payload: dict) -> None:
+    try:
+        from cache import _get_client as _redis_client  # lazy import
+        rc = _redis_client()
+        if rc is not None:
+            rc.publish(PROGRESS_CHANNEL, json.dumps(payload, default=str))
+    except Exception:
+        logger.debug("runbook progress publish failed", exc_info=True)
+
+
+def _event(job: _Job, state: str, **extra) -> dict:
+    return {
+        "type": "runbook.progress",
+        "execution_id": job.execution_id,
+        "runbook_name": job.runbook_name,
+        "state": state,
+        "occurred_at": datetime.now(timezone.utc).isoformat(),
+        **extra,
+    }
+
+
+def check_cancelled() -> None:
+    """Raise ``RunbookCancelled`` if the current execution was cancelled."""
+    job = getattr(_local, "job", None)
+    if job is not None and job.cancel.is_set():
+        raise RunbookCancelled(f"Execution {job.execution_id} cancelled")
+
+
+def report_progress(step: str, done: Optional[int] = None,
+                    total: Optional[int] = None, message: str = "") -> None:
+    """Record and publish the current step of the running execution.
+
+    A no-op outside the worker pool (e.g. an engine called directly from a
+    test or script); every API path, tenant and CLEA included, queues its
+    executions on the pool.  Raises ``RunbookCancelled`` when a cancel has been
+    requested, so calling it between steps makes an engine cancellable.
+    """
+    job = getattr(_local, "job", None)
+    if job is None:
+        return
+    check_cancelled()
+    progress = {"step": step, "done": done, "total": total, "message": message,
+                "updated_at": datetime.now(timezone.utc).isoformat()}
+    now = time.monotonic()
+    with job.lock:
+        step_changed = job.progress.get("step") != step
+        job.progress = progress
+        if not step_changed and now - job.last_publish < _PUBLISH_INTERVAL:
+            return
+        job.last_publish = now
+    _publish(_event(job, "executing", **progress))
+
+
+class RunbookWorkerPool:
+    """Threads that claim ``queued`` executions and run them via ``execute``."""
+
+    def __init__(
+        self,
+        execute: Callable[[str, str, dict, bool, str], None],
+        workers: int = QUEUE_WORKERS,
+        engine_limits: Optional[Dict[str, int]] = None,
+        poll_seconds: float = POLL_SECONDS,
+        heartbeat_seconds: float = HEARTBEAT_SECONDS,
+        stale_seconds: int = STALE_SECONDS,
+        connection_factory: Callable = get_connection,
+    ) -> None:
+        self._execute = execute
+        self.workers = workers
+        self.engine_limits = (
+            engine_limits if engine_limits is not None
+            else _parse_engine_limits(os.getenv("RUNBOOK_ENGINE_CONCURRENCY", ""))
+        )
+        self.poll_seconds = poll_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.stale_seconds = stale_seconds
+        self._connect = connection_factory
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._jobs: Dict[str, _Job] = {}
+        self._jobs_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: list = []
+
+    def limit_for(self, runbook_name: str) -> int:
+        return self.engine_limits.get(runbook_name, DEFAULT_ENGINE_LIMIT)
+
+    # ── Lifecycle ────────────────────────────────────────────────────────
+
+    def start(self) -> None:
+        if self._threads or self.workers <= 0:
+            return
+        # The pid is only final after Gunicorn forks, i.e. at start().
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop.clear()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker_loop, name=f"runbook-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        t = threading.Thread(target=self._heartbeat_loop, name="runbook-heartbeat", daemon=True)
+        t.start()
+        self._threads.append(t)
+        logger.info("Runbook worker pool started: %d worker(s), limits %s",
+                    self.workers, self.engine_limits)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop claiming; running engines finish in their daemon threads."""
+        self._stop.set()
+        self._wake.set()
+        deadline = time.monotonic() + timeout
+        for t in self._threads:
+            t.join(max(0.0, deadline - time.monotonic()))
+        self._threads = [t for t in self._threads if t.is_alive()]
+
+    def wake(self) -> None:
+        """Make idle workers poll now (call after queueing an execution)."""
+        self._wake.set()
+
+    def request_cancel(self, execution_id: str) -> bool:
+        """Signal a cancel to an execution running in this process."""
+        with self._jobs_lock:
+            job = self._jobs.get(execution_id)
+        if job is None:
+            return False
+        job.cancel.set()
+        return True
+
+    # ── Claiming ─────────────────────────────────────────────────────────
+
+    def claim(self) -> Optional[dict]:
+        """Move the oldest runnable ``queued`` execution to ``executing``."""
+        with self._connect() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(_CLAIM_LOCK_SQL)
+                cur.execute("""
+                    SELECT runbook_name, COUNT(*) AS running
+                    FROM runbook_executions
+                    WHERE status = 'executing' AND worker_id IS NOT NULL
+                    GROUP BY runbook_name
+                """)
+                saturated = [r["runbook_name"] for r in cur.fetchall()
+                             if r["running"] >= self.limit_for(r["runbook_name"])]
+                cur.execute("""
+                    SELECT execution_id, runbook_name, parameters, dry_run, triggered_by
+                    FROM runbook_executions
+                    WHERE status = 'queued'
+                      AND runbook_name <> ALL(%s)
+                    ORDER BY id
+                    LIMIT 1
+                    FOR UPDATE SKIP LOCKED
+                """, (saturated,))
+                row = cur.fetchone()
+                if not row:
+                    return None
+                cur.execute("""
+                    UPDATE runbook_executions
+                    SET status = 'executing', started_at = now(),
+                        heartbeat_at = now(), worker_id = %s
+                    WHERE execution_id = %s
+                """, (self.worker_id, row["execution_id"]))
+        return dict(row)
+
+    def _worker_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                row = self.claim()
+            except Exception as exc:
+                logger.warning("Runbook queue claim failed: %s", exc)
+                row = None
+            if row is None:
+                self._wake.wait(self.poll_seconds)
+                self._wake.clear()
+                continue
+            self._run(row)
+
+    def _run(self, row: dict) -> None:
+        job = _Job(row["execution_id"], row["runbook_name"])
+        with self._jobs_lock:
+            self._jobs[job.execution_id] = job
+        _local.job = job
+        _publish(_event(job, "started"))
+        try:
+            params = row["parameters"]
+            if isinstance(params, str):
+                params = json.loads(params)
+            self._execute(job.execution_id, job.runbook_name, params or {},
+                          row["dry_run"], row["triggered_by"])
+        except Exception:
+            logger.exception("Runbook execution %s raised outside its engine", job.execution_id)
+        finally:
+            _local.job = None
+            with self._jobs_lock:
+                self._jobs.pop(job.execution_id, None)
+            self._finish(job)
+
+    def _finish(self, job: _Job) -> None:
+        """Persist the last progress and publish the final state."""
+        state = "unknown"
+        try:
+            with self._connect() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        UPDATE runbook_executions
+                        SET progress = %s, heartbeat_at = now()
+                        WHERE execution_id = %s
+                        RETURNING status
+                    """, (json.dumps(job.progress), job.execution_id))
+                    row = cur.fetchone()
+                    state = row[0] if row else state
+        except Exception as exc:
+            logger.debug("Runbook finish update failed for %s: %s", job.execution_id, exc)
+        _publish(_event(job, state))
+
+    # ── Heartbeat / cancellation / stale reaping ─────────────────────────
+
+    def _heartbeat_loop(self) -> None:
+        while not self._stop.wait(self.heartbeat_seconds):
+            try:
+                self.heartbeat()
+            except Exception as exc:
+                logger.warning("Runbook heartbeat failed: %s", exc)
+
+    def heartbeat(self) -> None:
+        with self._jobs_lock:
+            jobs = list(self._jobs.values())
+        with self._connect() as conn:
+            with conn.cursor() as cur:
+                for job in jobs:
+                    with job.lock:
+                        progress = json.dumps(job.progress)
+                    cur.execute("""
+                        UPDATE runbook_executions
+                        SET heartbeat_at = now(), progress = %s
+                        WHERE execution_id = %s AND status = 'executing'
+                        RETURNING cancel_requested
+                    """, (progress, job.execution_id))
+                    row = cur.fetchone()
+                    if row and row[0]:
+                        job.cancel.set()
+                cur.execute("""
+                    UPDATE runbook_executions
+                    SET status = 'failed', completed_at = now(),
+                        error_message = 'Runbook worker stopped responding (' || worker_id || ')'
+                    WHERE status = 'executing'
+                      AND worker_id IS NOT NULL
+                      AND heartbeat_at < now() - make_interval(secs => %s)
+                    RETURNING execution_id
+                """, (self.stale_seconds,))
+                for (execution_id,) in cur.fetchall():
+                    logger.warning("Runbook execution %s marked failed: stale heartbeat", execution_id)
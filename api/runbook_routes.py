@@ -22,6 +22,7 @@ from psycopg2.extras import RealDictCursor
 from db_pool import get_connection
 from auth import require_permission, get_current_user
 from crypto_helper import fernet_decrypt as _fernet_decrypt
+from runbook_queue import RunbookCancelled, RunbookWorkerPool, report_progress
 
 logger = logging.getLogger("pf9_runbooks")
 
@@ -530,8 +531,11 @@ def _engine_orphan_cleanup(params: dict, dry_run: bool, actor: str) -> dict:
     total_found = 0
     total_actioned = 0
 
+    steps = [t for t in ("ports", "volumes", "floating_ips", "networks") if t in resource_types]
+
     # --- Orphan Ports ---
     if "ports" in resource_types:
+        report_progress("ports", steps.index("ports"), len(steps), "Scanning ports")
         url = f"{client.neutron_endpoint}/v2.0/ports?all_tenants=1"
         resp = client.session.get(url, headers=priv_headers)
         resp.raise_for_status()
@@ -590,6 +594,7 @@ def _engine_orphan_cleanup(params: dict, dry_run: bool, actor: str) -> dict:
 
     # --- Orphan Volumes ---
     if "volumes" in resource_types:
+        report_progress("volumes", steps.index("volumes"), len(steps), "Scanning volumes")
         url = f"{client.cinder_endpoint}/volumes/detail?all_tenants=true"
         # Cinder endpoint URL is project-scoped (contains service project_id),
         # so we must use the service token (headers), not priv_headers.
@@ -659,6 +664,7 @@ def _engine_orphan_cleanup(params: dict, dry_run: bool, actor: str) -> dict:
 
     # --- Orphan Floating IPs ---
     if "floating_ips" in resource_types:
+        report_progress("floating_ips", steps.index("floating_ips"), len(steps), "Scanning floating IPs")
         url = f"{client.neutron_endpoint}/v2.0/floatingips?all_tenants=1"
         resp = client.session.get(url, headers=priv_headers)
         resp.raise_for_status()
@@ -712,6 +718,7 @@ def _engine_orphan_cleanup(params: dict, dry_run: bool, actor: str) -> dict:
 
     # --- Orphan Networks ---
     if "networks" in resource_types:
+        report_progress("networks", steps.index("networks"), len(steps), "Scanning networks")
         url = f"{client.neutron_endpoint}/v2.0/networks?all_tenants=1"
         resp = client.session.get(url, headers=priv_headers)
         resp.raise_for_status()
@@ -2934,6 +2941,7 @@ def _engine_vm_rightsizing(params: dict, dry_run: bool, actor: str) -> dict:
     currency = pricing.get("cost_currency", "USD")
 
     # ── 1. Pull average usage from metering_resources ──────────────────────
+    report_progress("usage", 0, 5, "Loading VM usage from metering")
     usage_map: Dict[str, dict] = {}
     try:
         with get_connection() as conn:
@@ -2963,6 +2971,7 @@ def _engine_vm_rightsizing(params: dict, dry_run: bool, actor: str) -> dict:
         raise HTTPException(500, f"Metering data query failed: {e}")
 
     # ── 2. Fetch Nova flavor catalog ────────────────────────────────────────
+    report_progress("flavors", 1, 5, "Fetching flavor catalog")
     client = get_client()
     client.authenticate()
     headers = {"X-Auth-Token": client.token}
@@ -3015,6 +3024,7 @@ def _engine_vm_rightsizing(params: dict, dry_run: bool, actor: str) -> dict:
         return round(vcpus * price_vcpu + ram_gb * price_gb_ram, 2)
 
     # ── 3. Fetch VMs from Nova ──────────────────────────────────────────────
+    report_progress("servers", 2, 5, "Fetching VMs")
     url = f"{client.nova_endpoint}/servers/detail?all_tenants=true&limit=1000"
     if target_project:
         url += f"&project_id={target_project}"
@@ -3026,6 +3036,7 @@ def _engine_vm_rightsizing(params: dict, dry_run: bool, actor: str) -> dict:
         raise HTTPException(500, f"Could not fetch server list: {e}")
 
     # ── 4. Find candidates ─────────────────────────────────────────────────
+    report_progress("candidates", 3, 5, "Selecting rightsizing candidates")
     candidates = []
     skipped = []
 
@@ -3172,7 +3183,8 @@ def _engine_vm_rightsizing(params: dict, dry_run: bool, actor: str) -> dict:
             time.sleep(10)
         return False
 
-    for c in candidates:
+    for idx, c in enumerate(candidates):
+        report_progress("resize", idx, len(candidates), f"Resizing {c.get('vm_name') or c['vm_id']}")
         sid = c["vm_id"]
         new_flavor_id = c["suggested_flavor"]["id"]
         was_active = c["status"].upper() == "ACTIVE"
@@ -4754,10 +4766,12 @@ def _execute_runbook(execution_id: str, runbook_name: str, params: dict,
                 """, (f"No engine registered for runbook '{runbook_name}'", execution_id))
         return
 
+    # Queued executions were already moved to 'executing' by the worker pool.
     with get_connection() as conn:
         with conn.cursor() as cur:
             cur.execute("""
-                UPDATE runbook_executions SET status = 'executing', started_at = now()
+                UPDATE runbook_executions
+                SET status = 'executing', started_at = COALESCE(started_at, now())
                 WHERE execution_id = %s
             """, (execution_id,))
 
@@ -4786,6 +4800,24 @@ def _execute_runbook(execution_id: str, runbook_name: str, params: dict,
             actor=actor,
         )
 
+    except RunbookCancelled:
+        logger.info("Runbook execution %s cancelled", execution_id)
+        with get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    UPDATE runbook_executions
+                    SET status = 'cancelled', error_message = 'Cancelled while executing',
+                        completed_at = now()
+                    WHERE execution_id = %s
+                """, (execution_id,))
+        _notify(
+            event_type="runbook_cancelled",
+            summary=f"Runbook '{runbook_name}' cancelled while executing",
+            severity="warning",
+            resource_name=runbook_name,
+            actor=actor,
+        )
+
     except Exception as e:
         logger.error(f"Runbook execution {execution_id} failed: {e}\n{traceback.format_exc()}")
         with get_connection() as conn:
@@ -4822,6 +4854,10 @@ def _execute_runbook(execution_id: str, runbook_name: str, params: dict,
             logger.warning("Auto-ticket for runbook failure failed: %s", ticket_err)
 
 
+# Drains 'queued' executions off the request path; started/stopped by main.py.
+runbook_pool = RunbookWorkerPool(_execute_runbook)
+
+
 # ===== Engine: cluster_capacity_planner ===================================
 
 @register_engine("cluster_capacity_planner")
@@ -4858,6 +4894,7 @@ def _engine_cluster_capacity_planner(params: dict, dry_run: bool, actor: str) ->
     include_flavors     = bool(params.get("include_flavor_breakdown", True))
 
     # ── 1. Fetch live hypervisor stats from Nova ──────────────────────────
+    report_progress("hypervisors", 0, 3, "Fetching hypervisor stats")
     try:
         client = get_client()
         client.authenticate()
@@ -4943,6 +4980,7 @@ def _engine_cluster_capacity_planner(params: dict, dry_run: bool, actor: str) ->
     above_safe_threshold = (headroom_vcpus < 0 or headroom_ram_mb < 0)
 
     # ── 4. Growth rate from hypervisors_history (rolling window) ─────────
+    report_progress("growth", 1, 3, "Computing growth rate")
     slope_vcpu = 0.0
     slope_ram  = 0.0
     trend_rows = []
@@ -5020,6 +5058,7 @@ def _engine_cluster_capacity_planner(params: dict, dry_run: bool, actor: str) ->
     rec_ram_gb = math.ceil(rec_ram_gb / 32) * 32 if rec_ram_gb else 0
 
     # ── 7. Per-flavor VM slots remaining ─────────────────────────────────
+    report_progress("flavors", 2, 3, "Computing per-flavor slots")
     flavor_slots = []
     if include_flavors:
         try:
@@ -5373,14 +5412,15 @@ async def get_runbook(
 
 
 # ── Trigger runbook ──────────────────────────────────────────────
-@router.post("/trigger")
+@router.post("/trigger", status_code=202)
 async def trigger_runbook(
     body: TriggerRunbookRequest,
     request: Request,
     current_user=Depends(require_permission("runbooks", "write")),
 ):
-    """Trigger a runbook execution. Depending on approval policy, it may
-    execute immediately (auto_approve) or wait for approval."""
+    """Trigger a runbook execution. Depending on approval policy, it is
+    queued for the worker pool (auto_approve) or waits for approval.
+    Returns 202 with the execution record without waiting for the engine."""
     user = current_user
     if isinstance(user, dict):
         username = user.get("username", str(user))
@@ -5425,7 +5465,7 @@ async def trigger_runbook(
             if approval_mode == "auto_approve":
                 cur.execute("""
                     SELECT COUNT(*) FROM runbook_executions
-                    WHERE runbook_name = %s AND status IN ('completed', 'executing')
+                    WHERE runbook_name = %s AND status IN ('completed', 'executing', 'queued')
                       AND triggered_at >= now() - interval '24 hours'
                 """, (body.runbook_name,))
                 daily_count = cur.fetchone()["count"]
@@ -5433,17 +5473,18 @@ async def trigger_runbook(
                     raise HTTPException(429, f"Daily auto-execution limit ({policy['max_auto_executions_per_day']}) reached for '{body.runbook_name}'")
 
             # Create execution record
-            initial_status = "approved" if approval_mode == "auto_approve" else "pending_approval"
+            initial_status = "queued" if approval_mode == "auto_approve" else "pending_approval"
             cur.execute("""
                 INSERT INTO runbook_executions
-                    (runbook_name, status, dry_run, parameters, triggered_by)
-                VALUES (%s, %s, %s, %s, %s)
+                    (runbook_name, status, dry_run, parameters, triggered_by, queued_at)
+                VALUES (%s, %s, %s, %s, %s,
+                        CASE WHEN %s = 'queued' THEN now() END)
                 RETURNING execution_id
             """, (body.runbook_name, initial_status, body.dry_run,
-                  json.dumps(body.parameters), username))
+                  json.dumps(body.parameters), username, initial_status))
             execution_id = cur.fetchone()["execution_id"]
 
-            # If auto-approved, record approval and execute immediately
+            # If auto-approved, record approval; the worker pool picks it up
             if approval_mode == "auto_approve":
                 cur.execute("""
                     INSERT INTO runbook_approvals (execution_id, approver, decision, comment)
@@ -5455,9 +5496,9 @@ async def trigger_runbook(
                     WHERE execution_id = %s
                 """, (execution_id,))
 
-    # Execute if auto-approved (outside DB transaction)
+    # Wake the local pool once the queued row is committed
     if approval_mode == "auto_approve":
-        _execute_runbook(execution_id, body.runbook_name, body.parameters, body.dry_run, username)
+        runbook_pool.wake()
     else:
         # Notify admins about pending approval
         _notify(
@@ -5509,22 +5550,19 @@ async def approve_reject_execution(
                 VALUES (%s, %s, %s, %s)
             """, (execution_id, username, body.decision, body.comment))
 
-            new_status = "approved" if body.decision == "approved" else "rejected"
+            new_status = "queued" if body.decision == "approved" else "rejected"
             cur.execute("""
                 UPDATE runbook_executions
-                SET status = %s, approved_by = %s, approved_at = now()
+                SET status = %s, approved_by = %s, approved_at = now(),
+                    queued_at = CASE WHEN %s = 'queued' THEN now() END
                 WHERE execution_id = %s
-            """, (new_status, username, execution_id))
+            """, (new_status, username, new_status, execution_id))
 
     if body.decision == "approved":
-        _execute_runbook(
-            execution_id, execution["runbook_name"],
-            execution["parameters"], execution["dry_run"],
-            execution["triggered_by"]
-        )
+        runbook_pool.wake()
         _notify(
             event_type="runbook_approval_granted",
-            summary=f"Runbook '{execution['runbook_name']}' approved by {username} — executing now",
+            summary=f"Runbook '{execution['runbook_name']}' approved by {username} — queued for execution",
             severity="info",
             resource_name=execution["runbook_name"],
             actor=username,
@@ -5553,18 +5591,32 @@ async def cancel_execution(
     execution_id: str,
     current_user=Depends(require_permission("runbooks", "write")),
 ):
-    """Cancel a pending execution."""
+    """Cancel a pending or queued execution, or ask a running one to stop.
+
+    A running engine stops at its next progress report; until then the
+    execution stays 'executing' with ``cancel_requested`` set.
+    """
     with get_connection() as conn:
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute("""
                 UPDATE runbook_executions
                 SET status = 'cancelled', completed_at = now()
-                WHERE execution_id = %s AND status = 'pending_approval'
+                WHERE execution_id = %s AND status IN ('pending_approval', 'queued')
                 RETURNING *
             """, (execution_id,))
             row = cur.fetchone()
             if not row:
-                raise HTTPException(404, "Execution not found or not in pending_approval state")
+                cur.execute("""
+                    UPDATE runbook_executions
+                    SET cancel_requested = true
+                    WHERE execution_id = %s AND status = 'executing'
+                    RETURNING *
+                """, (execution_id,))
+                row = cur.fetchone()
+            if not row:
+                raise HTTPException(404, "Execution not found or already finished")
+    if row["status"] == "executing":
+        runbook_pool.request_cancel(execution_id)
     return dict(row)
 
 
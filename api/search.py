@@ -31,7 +31,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from psycopg2.extras import RealDictCursor
 
 from auth import require_permission, get_current_user, User, get_effective_region_filter
-from db_pool import get_connection
+from db_pool import get_connection, off_loop
 from smart_queries import execute_smart_query, list_smart_queries
 
 logger = logging.getLogger("pf9.search")
@@ -55,7 +55,8 @@ def _clean(rows: List[Dict]) -> List[Dict]:
 # ── 1. Full-text search ─────────────────────────────────────
 
 @router.get("")
-async def search(
+@off_loop
+def search(
     q: str = Query(..., min_length=1, max_length=500, description="Search query"),
     types: Optional[str] = Query(None, description="Comma-separated doc types to filter"),
     tenant_id: Optional[str] = Query(None),
@@ -175,7 +176,8 @@ async def search(
 # ── 2. Similarity search ────────────────────────────────────
 
 @router.get("/similar/{doc_id}")
-async def find_similar(
+@off_loop
+def find_similar(
     doc_id: str,
     threshold: float = Query(0.15, ge=0.0, le=1.0),
     limit: int = Query(10, ge=1, le=50),
@@ -207,7 +209,8 @@ async def find_similar(
 # ── 3. Indexer stats ─────────────────────────────────────────
 
 @router.get("/stats")
-async def indexer_stats(
+@off_loop
+def indexer_stats(
     _user: User = Depends(require_permission("search", "read")),
 ):
     """Return per-doc-type indexing status and document counts."""
@@ -219,6 +222,9 @@ async def indexer_stats(
                        s.docs_count,
                        s.last_run_at,
                        s.last_run_duration_ms,
+                       s.full_reindex_at,
+                       s.full_reindex_duration_ms,
+                       s.full_reindex_docs,
                        COALESCE(c.actual, 0) AS actual_count
                 FROM search_indexer_state s
                 LEFT JOIN (
@@ -242,7 +248,8 @@ async def indexer_stats(
 # ── 4. Manual re-index trigger ───────────────────────────────
 
 @router.post("/reindex")
-async def trigger_reindex(
+@off_loop
+def trigger_reindex(
     _user: User = Depends(require_permission("search", "admin")),
 ):
     """
@@ -393,7 +400,8 @@ def _extract_tenant_hint(query: str) -> Optional[str]:
 
 
 @router.get("/intent")
-async def detect_intent(
+@off_loop
+def detect_intent(
     q: str = Query(..., min_length=1, max_length=500, description="Natural-language query"),
     _user: User = Depends(require_permission("search", "read")),
 ):
@@ -420,7 +428,8 @@ async def detect_intent(
 # ── 6. Smart Query Templates (v3) ────────────────────────────
 
 @router.get("/smart")
-async def smart_query(
+@off_loop
+def smart_query(
     q: str = Query(..., min_length=1, max_length=500, description="Natural-language question"),
     scope_tenant: Optional[str] = Query(None, description="Filter results to this project/tenant"),
     scope_domain: Optional[str] = Query(None, description="Filter results to this domain"),
@@ -451,7 +460,8 @@ async def smart_query(
 
 
 @router.get("/smart/help")
-async def smart_query_help(
+@off_loop
+def smart_query_help(
     _user: User = Depends(require_permission("search", "read")),
 ):
     """
@@ -15,6 +15,11 @@ Event payload  (JSON):
     "category": <str>, "entity_type": <str>, "entity_id": <str>,
     "occurred_at": <iso8601> }
 
+Runbook executions run by the worker pool publish step-level progress to
+``pf9:runbook_progress`` (see ``runbook_queue.report_progress``); those are
+sent as ``event: runbook_progress`` so the default ``message`` listener (the
+notification feed) does not receive them.
+
 Keepalive: an SSE comment ``: keepalive`` is emitted every 25 s so the
 browser ``EventSource`` does not time out the connection.
 
@@ -45,7 +50,7 @@ logger = logging.getLogger("pf9.sse")
 router = APIRouter(prefix="/api", tags=["events"])
 
 _REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
-_CHANNELS = ("pf9:live_events", "pf9:incident_briefs")
+_CHANNELS = ("pf9:live_events", "pf9:incident_briefs", "pf9:runbook_progress")
 _HEARTBEAT_S = 25  # seconds between keepalive comments
 
 
@@ -56,7 +61,8 @@ _HEARTBEAT_S = 25  # seconds between keepalive comments
 async def _sse_generator(request: Request) -> AsyncGenerator[str, None]:
     """
     Async generator that:
-    1. Opens a Redis pub/sub subscription on live-events + incident-brief channels.
+    1. Opens a Redis pub/sub subscription on live-events, incident-brief and
+       runbook-progress channels.
       2. Yields SSE ``data:`` lines for every message received.
       3. Yields ``: keepalive`` comments every 25 s to prevent proxy timeouts.
       4. Exits cleanly when the client disconnects or an error occurs.
@@ -98,6 +104,8 @@ async def _sse_generator(request: Request) -> AsyncGenerator[str, None]:
                 channel = msg.get("channel")
                 if channel == "pf9:incident_briefs":
                     yield f"event: incident_brief\ndata: {msg['data']}\n\n"
+                elif channel == "pf9:runbook_progress":
+                    yield f"event: runbook_progress\ndata: {msg['data']}\n\n"
                 else:
                     yield f"data: {msg['data']}\n\n"
             else:
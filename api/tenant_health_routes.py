@@ -32,7 +32,12 @@ from psycopg2.extras import RealDictCursor
 
 from auth import require_permission, User
 from db_pool import get_connection
-from shared.health_scoring import compute_security_posture_component
+from shared.health_scoring import (
+    DEFAULT_WEIGHTS,
+    compute_tenant_health_scores,
+    load_health_score_weights,
+    scale_component,
+)
 
 logger = logging.getLogger("pf9.tenant_health")
 
@@ -84,14 +89,7 @@ class HealthScoreToggleIn(BaseModel):
 # Helpers
 # ---------------------------------------------------------------------------
 
-_DEFAULT_WEIGHTS = {
-    "snapshot_compliance": 22,
-    "quota_headroom": 18,
-    "drift": 18,
-    "sla_tier": 17,
-    "tickets": 10,
-    "security_posture": 15,
-}
+_DEFAULT_WEIGHTS = DEFAULT_WEIGHTS
 
 
 def _grade(score: int) -> str:
@@ -111,245 +109,20 @@ def _compute_score(conn, project_id: str, weights: Optional[dict] = None) -> dic
     Compute a fresh health score for *project_id* using the live DB data.
     Optionally accepts *weights* dict; if None, falls back to _DEFAULT_WEIGHTS.
     Returns a dict suitable for inserting into tenant_health_scores.
+
+    Same engine as the scheduler worker's batch run, for a batch of one.
     """
     if weights is None:
         weights = dict(_DEFAULT_WEIGHTS)
-    scores: dict = {}
-    details: dict = {}
-
-    with conn.cursor(cursor_factory=RealDictCursor) as cur:
-
-        # 1. Snapshot compliance (0-25) ─────────────────────────────────────
-        cur.execute(
-            """
-            SELECT COUNT(*) AS cnt
-            FROM   snapshot_records sr
-            JOIN   snapshot_runs    ru ON ru.id = sr.snapshot_run_id
-            WHERE  sr.project_id = %s
-              AND  sr.status     = 'success'
-              AND  ru.started_at >= NOW() - INTERVAL '7 days'
-            """,
-            (project_id,),
-        )
-        snap_cnt = (cur.fetchone() or {}).get("cnt", 0) or 0
-        snap_score = 25 if snap_cnt > 0 else 0
-        scores["snapshot_compliance"] = snap_score
-        details["snapshot_compliance"] = {
-            "recent_successes": int(snap_cnt),
-            "window_days": 7,
-        }
-
-        # 2. Quota headroom (0-20) ───────────────────────────────────────────
-        cur.execute(
-            """
-            SELECT vcpus_used, vcpus_quota, ram_used_mb, ram_quota_mb
-            FROM   metering_quotas
-            WHERE  project_id = %s
-            ORDER BY collected_at DESC
-            LIMIT 1
-            """,
-            (project_id,),
-        )
-        row = cur.fetchone()
-        if row and row["vcpus_quota"] and row["ram_quota_mb"]:
-            cpu_pct = (row["vcpus_used"] or 0) / row["vcpus_quota"] * 100
-            ram_pct = (row["ram_used_mb"] or 0) / row["ram_quota_mb"] * 100
-            max_pct = max(cpu_pct, ram_pct)
-            if max_pct < 60:
-                quota_score = 20
-            elif max_pct < 80:
-                quota_score = 15
-            elif max_pct < 90:
-                quota_score = 8
-            else:
-                quota_score = 0
-            details["quota_headroom"] = {
-                "cpu_utilization_pct": round(cpu_pct, 1),
-                "ram_utilization_pct": round(ram_pct, 1),
-            }
-        else:
-            quota_score = 10  # no data → neutral score
-            details["quota_headroom"] = {"note": "no_quota_data"}
-        scores["quota_headroom"] = quota_score
-
-        # 3. Drift (0-20) ────────────────────────────────────────────────────
-        cur.execute(
-            """
-            SELECT COUNT(*) AS cnt
-            FROM   drift_events
-            WHERE  project_id = %s
-              AND  detected_at >= NOW() - INTERVAL '30 days'
-            """,
-            (project_id,),
-        )
-        drift_cnt = (cur.fetchone() or {}).get("cnt", 0) or 0
-        if drift_cnt == 0:
-            drift_score = 20
-        elif drift_cnt <= 2:
-            drift_score = 15
-        elif drift_cnt <= 5:
-            drift_score = 8
-        else:
-            drift_score = 0
-        scores["drift"] = drift_score
-        details["drift"] = {"events_30d": int(drift_cnt)}
-
-        # 4. SLA tier (0-20) ─────────────────────────────────────────────────
-        cur.execute(
-            """
-            SELECT tier
-            FROM   sla_commitments
-            WHERE  tenant_id  = %s
-              AND  effective_to IS NULL
-            ORDER BY effective_from DESC
-            LIMIT 1
-            """,
-            (project_id,),
-        )
-        sla_row = cur.fetchone()
-        tier = (sla_row or {}).get("tier", None)
-        sla_map = {"gold": 20, "silver": 15, "bronze": 10}
-        sla_score = sla_map.get((tier or "").lower(), 5)
-        scores["sla_tier"] = sla_score
-        details["sla_tier"] = {"tier": tier or "none"}
-
-        # 5. Tickets (0-15) ──────────────────────────────────────────────────
-        cur.execute(
-            """
-            SELECT priority, COUNT(*) AS cnt
-            FROM   support_tickets
-            WHERE  project_id = %s
-              AND  status NOT IN ('closed', 'resolved')
-            GROUP BY priority
-            """,
-            (project_id,),
-        )
-        open_tickets = {r["priority"]: int(r["cnt"]) for r in cur.fetchall()}
-        total_open = sum(open_tickets.values())
-        has_critical = open_tickets.get("critical", 0) > 0
-        has_high = open_tickets.get("high", 0) > 0
-        if total_open == 0:
-            ticket_score = 15
-        elif has_critical or has_high:
-            ticket_score = 0
-        elif total_open <= 2:
-            ticket_score = 8
-        else:
-            ticket_score = 4
-        scores["tickets"] = ticket_score
-        details["tickets"] = {"open_by_priority": open_tickets}
-
-        # 6. Security posture (0-15) ───────────────────────────────────────
-        cur.execute(
-            """
-            SELECT
-                COUNT(DISTINCT u.id) AS total_users,
-                COUNT(DISTINCT u.id) FILTER (WHERE um.is_enabled IS TRUE) AS mfa_enabled_users
-            FROM role_assignments ra
-            JOIN users u ON u.id = ra.user_id
-            LEFT JOIN user_mfa um ON um.username = u.name
-            WHERE ra.project_id = %s
-              AND ra.user_id IS NOT NULL
-            """,
-            (project_id,),
-        )
-        mfa_row = cur.fetchone() or {}
-
-        cur.execute(
-            """
-            SELECT COUNT(DISTINCT s.id) AS exposed_vm_count
-            FROM servers s
-            JOIN ports p ON p.device_id = s.id
-            JOIN security_group_rules sgr
-              ON p.raw_json::jsonb->'security_groups' ? sgr.security_group_id
-            WHERE s.project_id = %s
-              AND sgr.direction = 'ingress'
-              AND COALESCE(sgr.remote_ip_prefix, '0.0.0.0/0') IN ('0.0.0.0/0', '::/0')
-              AND (
-                    sgr.protocol IS NULL OR LOWER(sgr.protocol) = 'tcp'
-                  )
-              AND (
-                    (COALESCE(sgr.port_range_min, 22) <= 22 AND COALESCE(sgr.port_range_max, 22) >= 22)
-                    OR
-                    (COALESCE(sgr.port_range_min, 3389) <= 3389 AND COALESCE(sgr.port_range_max, 3389) >= 3389)
-                  )
-            """,
-            (project_id,),
-        )
-        exposed_row = cur.fetchone() or {}
-
-        cur.execute(
-            """
-            SELECT
-                COUNT(*) AS total_vm_count,
-                COUNT(*) FILTER (
-                    WHERE COALESCE(i.updated_at, i.created_at) < NOW() - INTERVAL '180 days'
-                ) AS stale_vm_count
-            FROM servers s
-            LEFT JOIN images i ON i.id = s.image_id
-            WHERE s.project_id = %s
-            """,
-            (project_id,),
-        )
-        image_row = cur.fetchone() or {}
-
-        security_component = compute_security_posture_component(
-            mfa_enabled_users=(mfa_row.get("mfa_enabled_users") or 0),
-            mfa_total_users=(mfa_row.get("total_users") or 0),
-            exposed_vm_count=(exposed_row.get("exposed_vm_count") or 0),
-            stale_vm_count=(image_row.get("stale_vm_count") or 0),
-            total_vm_count=(image_row.get("total_vm_count") or 0),
-        )
-        scores["security_posture"] = security_component["score"]
-        details["security_posture"] = security_component["details"]
-
-    # Apply configured weights (scale proportionally to each component's default max)
-    scaled = {
-        "snapshot_compliance": _scale_component(scores["snapshot_compliance"], _DEFAULT_WEIGHTS["snapshot_compliance"], weights["snapshot_compliance"]),
-        "quota_headroom":      _scale_component(scores["quota_headroom"],      _DEFAULT_WEIGHTS["quota_headroom"],      weights["quota_headroom"]),
-        "drift":               _scale_component(scores["drift"],               _DEFAULT_WEIGHTS["drift"],               weights["drift"]),
-        "sla_tier":            _scale_component(scores["sla_tier"],            _DEFAULT_WEIGHTS["sla_tier"],            weights["sla_tier"]),
-        "tickets":             _scale_component(scores["tickets"],             _DEFAULT_WEIGHTS["tickets"],             weights["tickets"]),
-        "security_posture":    _scale_component(scores["security_posture"],    _DEFAULT_WEIGHTS["security_posture"],    weights["security_posture"]),
-    }
-    total = sum(scaled.values())
-    return {
-        "score": total,
-        "snapshot_compliance": scaled["snapshot_compliance"],
-        "quota_headroom":      scaled["quota_headroom"],
-        "drift":               scaled["drift"],
-        "sla_tier":            scaled["sla_tier"],
-        "tickets":             scaled["tickets"],
-        "security_posture":    scaled["security_posture"],
-        "details": details,
-    }
+    return compute_tenant_health_scores(conn, [project_id], weights)[project_id]
 
 
 def _get_health_score_weights(conn) -> dict:
     """Load health score component weights from system_settings (falls back to defaults)."""
-    weights = dict(_DEFAULT_WEIGHTS)
-    try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(
-                "SELECT key, value FROM system_settings WHERE key LIKE 'health_score.weight.%'"
-            )
-            for row in cur.fetchall():
-                component = row["key"].replace("health_score.weight.", "")
-                if component in weights:
-                    try:
-                        weights[component] = max(0, int(row["value"]))
-                    except (ValueError, TypeError):
-                        pass
-    except Exception:
-        pass  # always fall back to defaults
-    return weights
-
-
-def _scale_component(raw_score: int, default_max: int, configured_weight: int) -> int:
-    """Scale a component's raw score proportionally to its configured weight."""
-    if default_max == 0:
-        return 0
-    return round(raw_score / default_max * configured_weight)
+    return load_health_score_weights(conn)
+
+
+_scale_component = scale_component
 
 
 def _store_score(conn, project_id: str, result: dict) -> None:
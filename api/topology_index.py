@@ -0,0 +1,394 @@
+"""
+api/topology_index.py — In-memory adjacency index behind ``GET /api/graph``.
+
+The dependency graph used to be built by a BFS in which every expanded node
+ran its own neighbour queries (six for a VM), and every node added ran
+``_compute_badges`` queries on top.  A depth-3 graph around a tenant cost
+hundreds of round-trips, which is why MAX_NODES / MAX_DEPTH were kept low.
+
+This module loads the inventory tables the graph walks (servers, volumes,
+snapshots, networks, subnets, ports, floating IPs, security groups,
+projects, hypervisors, host aggregates, images, domains) with one query
+each, and stores:
+
+  * one slot per resource: its type, its row (the same columns the per-type
+    fetchers in graph_routes return), and ``(type, id) → slot``;
+  * the relationships in CSR form.  The neighbours of slot ``i`` are
+    ``targets[offsets[i]:offsets[i + 1]]``, with the edge label in
+    ``labels``.  Neighbours are listed in the order the SQL expanders
+    produced them.  A network → VM edge keeps the VM's first IP on that
+    network in ``edge_extra``;
+  * the inventory-derived badge inputs: the newest snapshot per volume and
+    the security groups referenced by any port.
+
+A traversal is then pure in-memory work.  Drift and restore badges change
+between inventory runs, so graph_routes looks them up for the whole result
+in one query.
+
+The index is stamped with the id of the newest finished ``inventory_runs``
+row.  ``get_index`` compares that with the database (one indexed query per
+request) and rebuilds when a sync has finished since, when
+``TOPOLOGY_INDEX_MAX_AGE_SECONDS`` (default 900) have passed, or after
+``invalidate()``; this catches writes outside inventory runs, such as the
+stale-resource cleanup.  While one request rebuilds, the others keep
+reading the previous index.  Set ``TOPOLOGY_INDEX_ENABLED=false`` to go
+back to per-node SQL.
+"""
+
+import logging
+import os
+import threading
+import time
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("pf9.graph")
+
+ENABLED = os.getenv("TOPOLOGY_INDEX_ENABLED", "true").lower() in ("1", "true", "yes")
+MAX_AGE_SECONDS = float(os.getenv("TOPOLOGY_INDEX_MAX_AGE_SECONDS", "900"))
+
+# Edge labels, stored as an index into this tuple
+EDGE_LABELS: Tuple[str, ...] = (
+    "belongs to", "has volume", "connected to", "member of", "has floating IP",
+    "runs on", "uses image", "has snapshot", "attached to VM", "snapshot of",
+    "has subnet", "hosts VM", "part of", "on network", "belongs to VM",
+    "assigned to VM", "protects VM", "in domain", "owns VM", "owns network",
+    "owns volume", "runs VM", "member", "used by VM", "has tenant",
+)
+_LABEL_CODE = {label: i for i, label in enumerate(EDGE_LABELS)}
+
+# (ntype, SELECT) — columns match the graph_routes fetchers for each type
+_NODE_QUERIES: Tuple[Tuple[str, str], ...] = (
+    ("domain", "SELECT id, name FROM domains"),
+    ("tenant", "SELECT id, name, domain_id FROM projects"),
+    ("host",
+     "SELECT id, "
+     "       COALESCE(raw_json->>'hypervisor_hostname', hostname) AS hostname, "
+     "       hostname AS db_hostname, "
+     "       state, status, "
+     "       raw_json->>'host_ip'                                  AS ip_address, "
+     "       raw_json->'service'->>'host'                         AS resmgr_id, "
+     "       COALESCE((raw_json->>'vcpus')::integer, vcpus, 0)          AS vcpus, "
+     "       COALESCE((raw_json->>'vcpus_used')::integer, 0)            AS vcpus_used, "
+     "       COALESCE((raw_json->>'memory_mb')::bigint, memory_mb, 0)   AS memory_mb, "
+     "       COALESCE((raw_json->>'memory_mb_used')::bigint, 0)         AS memory_mb_used, "
+     "       COALESCE((raw_json->>'local_gb')::integer, local_gb, 0)    AS local_gb, "
+     "       CASE "
+     "         WHEN COALESCE((raw_json->>'local_gb')::integer, local_gb, 0) > 0 "
+     "              AND (raw_json->>'disk_available_least') IS NOT NULL "
+     "         THEN COALESCE((raw_json->>'local_gb')::integer, local_gb, 0) "
+     "              - GREATEST(0, (raw_json->>'disk_available_least')::integer) "
+     "         ELSE COALESCE((raw_json->>'local_gb_used')::integer, 0) "
+     "       END AS local_gb_used_calc "
+     "FROM hypervisors"),
+    ("aggregate",
+     "SELECT id, name, availability_zone, host_count, raw_json FROM host_aggregates"),
+    ("image", "SELECT id, name, status FROM images"),
+    ("vm",
+     "SELECT id, name, status, project_id, hypervisor_hostname, image_id FROM servers"),
+    ("volume", "SELECT id, name, status, project_id, server_id FROM volumes"),
+    ("snapshot",
+     "SELECT id, name, status, volume_id, project_id, created_at FROM snapshots"),
+    ("network", "SELECT id, name, status, project_id FROM networks"),
+    ("subnet", "SELECT id, name, network_id FROM subnets"),
+    ("port",
+     "SELECT id, name, status, network_id, device_id, device_owner, "
+     "       ip_addresses->0->>'ip_address' AS first_ip, "
+     "       raw_json->'security_groups'    AS security_groups "
+     "FROM ports"),
+    ("fip",
+     "SELECT id, floating_ip AS name, floating_ip, status, project_id, port_id "
+     "FROM floating_ips"),
+    ("sg", "SELECT id, name, project_id FROM security_groups"),
+)
+
+# Columns loaded for building edges / badges but not part of the node row
+_PRIVATE_COLUMNS = {
+    "host": ("db_hostname",),
+    "snapshot": ("created_at",),
+    "port": ("first_ip", "security_groups"),
+}
+
+
+def _is_compute(port: Dict) -> bool:
+    return (port.get("device_owner") or "").startswith("compute:")
+
+
+class TopologyIndex:
+    """Resources and their relationships for one inventory generation."""
+
+    def __init__(self, generation: int):
+        self.generation = generation
+        self.built_at = time.monotonic()
+        self.ntypes: List[str] = []
+        self.rows: List[Dict] = []
+        self.slots: Dict[Tuple[str, str], int] = {}
+        self.offsets = array("l", [0])
+        self.targets = array("l")
+        self.labels = array("B")
+        self.edge_extra: Dict[int, Dict] = {}
+        self.latest_snapshot: Dict[str, object] = {}   # volume id → newest created_at
+        self.sgs_in_use: set = set()
+
+    # -- lookup -----------------------------------------------------------
+
+    def slot(self, ntype: str, db_id) -> Optional[int]:
+        return self.slots.get((ntype, str(db_id)))
+
+    def neighbors(self, i: int) -> Iterator[Tuple[int, str, Optional[Dict]]]:
+        """Yield ``(slot, edge_label, extra_row_fields)`` for each edge out of ``i``."""
+        for e in range(self.offsets[i], self.offsets[i + 1]):
+            yield self.targets[e], EDGE_LABELS[self.labels[e]], self.edge_extra.get(e)
+
+    @property
+    def node_count(self) -> int:
+        return len(self.rows)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.targets)
+
+    # -- build ------------------------------------------------------------
+
+    @classmethod
+    def load(cls, cur, generation: int) -> "TopologyIndex":
+        """Read the inventory tables through ``cur`` (a RealDictCursor)."""
+        index = cls(generation)
+        private: List[Dict] = []   # per slot: the _PRIVATE_COLUMNS values
+        for ntype, sql in _NODE_QUERIES:
+            hidden = _PRIVATE_COLUMNS.get(ntype, ())
+            cur.execute(sql)
+            for r in cur.fetchall():
+                row = dict(r)
+                private.append({k: row.pop(k, None) for k in hidden})
+                index.slots[(ntype, str(row["id"]))] = len(index.rows)
+                index.ntypes.append(ntype)
+                index.rows.append(row)
+        index._link(private)
+        return index
+
+    def _link(self, private: List[Dict]) -> None:
+        """Build the CSR edge arrays from the loaded rows."""
+        n = len(self.rows)
+        adj: List[List[Tuple[int, int, Optional[Dict]]]] = [[] for _ in range(n)]
+        by_type: Dict[str, List[int]] = {}
+        for i, ntype in enumerate(self.ntypes):
+            by_type.setdefault(ntype, []).append(i)
+
+        def add(i: int, j: Optional[int], label: str, extra: Optional[Dict] = None) -> None:
+            if j is not None:
+                adj[i].append((j, _LABEL_CODE[label], extra))
+
+        def group(ntype: str, key: str) -> Dict[str, List[int]]:
+            out: Dict[str, List[int]] = {}
+            for i in by_type.get(ntype, ()):
+                value = self.rows[i].get(key)
+                if value:
+                    out.setdefault(str(value), []).append(i)
+            return out
+
+        vms_by_tenant = group("vm", "project_id")
+        vms_by_host = group("vm", "hypervisor_hostname")
+        vms_by_image = group("vm", "image_id")
+        vols_by_vm = group("volume", "server_id")
+        vols_by_tenant = group("volume", "project_id")
+        snaps_by_vol = group("snapshot", "volume_id")
+        nets_by_tenant = group("network", "project_id")
+        subnets_by_net = group("subnet", "network_id")
+        fips_by_port = group("fip", "port_id")
+        tenants_by_domain = group("tenant", "domain_id")
+        hosts_by_db_name: Dict[str, int] = {}
+        hosts_by_resmgr: Dict[str, int] = {}
+        for i in by_type.get("host", ()):
+            name = private[i]["db_hostname"]
+            if name and name not in hosts_by_db_name:
+                hosts_by_db_name[name] = i
+            resmgr = self.rows[i].get("resmgr_id")
+            if resmgr and resmgr not in hosts_by_resmgr:
+                hosts_by_resmgr[resmgr] = i
+        aggs_by_resmgr: Dict[str, List[int]] = {}
+        for i in by_type.get("aggregate", ()):
+            for resmgr in ((self.rows[i].get("raw_json") or {}).get("hosts") or []):
+                aggs_by_resmgr.setdefault(resmgr, []).append(i)
+
+        # Compute ports link VMs to networks, security groups and floating IPs
+        vm_nets: Dict[int, List[int]] = {}
+        vm_sgs: Dict[int, List[int]] = {}
+        vm_fips: Dict[int, List[int]] = {}
+        net_vms: Dict[int, Dict[int, Optional[str]]] = {}
+        sg_vms: Dict[int, List[int]] = {}
+        for p in by_type.get("port", ()):
+            port = self.rows[p]
+            pext = private[p]
+            for sg_id in pext["security_groups"] or ():
+                self.sgs_in_use.add(str(sg_id))
+            if not _is_compute(port):
+                continue
+            vm = self.slot("vm", port.get("device_id"))
+            net = self.slot("network", port.get("network_id"))
+            if net is not None:
+                if vm is not None and net not in vm_nets.setdefault(vm, []):
+                    vm_nets[vm].append(net)
+                if vm is not None:
+                    net_vms.setdefault(net, {}).setdefault(vm, pext["first_ip"])
+            for sg_id in pext["security_groups"] or ():
+                sg = self.slot("sg", sg_id)
+                if sg is None:
+                    continue
+                if vm is not None and sg not in vm_sgs.setdefault(vm, []):
+                    vm_sgs[vm].append(sg)
+                if vm is not None and vm not in sg_vms.setdefault(sg, []):
+                    sg_vms[sg].append(vm)
+            if vm is not None:
+                vm_fips.setdefault(vm, []).extend(fips_by_port.get(str(port["id"]), ()))
+
+        for i in by_type.get("snapshot", ()):
+            vol_id = self.rows[i].get("volume_id")
+            created = private[i]["created_at"]
+            if vol_id and created is not None:
+                prev = self.latest_snapshot.get(str(vol_id))
+                if prev is None or created > prev:
+                    self.latest_snapshot[str(vol_id)] = created
+
+        for i, ntype in enumerate(self.ntypes):
+            row = self.rows[i]
+            rid = str(row["id"])
+            if ntype == "vm":
+                add(i, self.slot("tenant", row.get("project_id")), "belongs to")
+                for j in vols_by_vm.get(rid, ()):
+                    add(i, j, "has volume")
+                for j in vm_nets.get(i, ()):
+                    add(i, j, "connected to")
+                for j in vm_sgs.get(i, ()):
+                    add(i, j, "member of")
+                for j in vm_fips.get(i, ()):
+                    add(i, j, "has floating IP")
+                add(i, hosts_by_db_name.get(row.get("hypervisor_hostname") or ""), "runs on")
+                add(i, self.slot("image", row.get("image_id")), "uses image")
+            elif ntype == "volume":
+                add(i, self.slot("tenant", row.get("project_id")), "belongs to")
+                for j in snaps_by_vol.get(rid, ()):
+                    add(i, j, "has snapshot")
+                add(i, self.slot("vm", row.get("server_id")), "attached to VM")
+            elif ntype == "snapshot":
+                add(i, self.slot("volume", row.get("volume_id")), "snapshot of")
+            elif ntype == "network":
+                add(i, self.slot("tenant", row.get("project_id")), "belongs to")
+                for j in subnets_by_net.get(rid, ()):
+                    add(i, j, "has subnet")
+                vms = net_vms.get(i, {})
+                for j in sorted(vms, key=lambda v: str(self.rows[v]["id"])):
+                    add(i, j, "hosts VM", {"ip_address": vms[j]})
+            elif ntype == "subnet":
+                add(i, self.slot("network", row.get("network_id")), "part of")
+            elif ntype == "port":
+                add(i, self.slot("network", row.get("network_id")), "on network")
+                for j in fips_by_port.get(rid, ()):
+                    add(i, j, "has floating IP")
+                if _is_compute(row):
+                    add(i, self.slot("vm", row.get("device_id")), "belongs to VM")
+            elif ntype == "fip":
+                port = self.slot("port", row.get("port_id"))
+                if port is not None and _is_compute(self.rows[port]):
+                    add(i, self.slot("vm", self.rows[port].get("device_id")), "assigned to VM")
+            elif ntype == "sg":
+                add(i, self.slot("tenant", row.get("project_id")), "belongs to")
+                for j in sg_vms.get(i, ()):
+                    add(i, j, "protects VM")
+            elif ntype == "tenant":
+                add(i, self.slot("domain", row.get("domain_id")), "in domain")
+                for j in vms_by_tenant.get(rid, ()):
+                    add(i, j, "owns VM")
+                for j in nets_by_tenant.get(rid, ()):
+                    add(i, j, "owns network")
+                for j in vols_by_tenant.get(rid, ()):
+                    add(i, j, "owns volume")
+            elif ntype == "host":
+                for j in vms_by_host.get(row.get("hostname") or "", ()):
+                    add(i, j, "runs VM")
+                for j in aggs_by_resmgr.get(row.get("resmgr_id") or "", ()):
+                    add(i, j, "member of")
+            elif ntype == "aggregate":
+                for resmgr in ((row.get("raw_json") or {}).get("hosts") or []):
+                    add(i, hosts_by_resmgr.get(resmgr), "member")
+            elif ntype == "image":
+                for j in vms_by_image.get(rid, ()):
+                    add(i, j, "used by VM")
+            elif ntype == "domain":
+                for j in tenants_by_domain.get(rid, ()):
+                    add(i, j, "has tenant")
+
+        for i, edges in enumerate(adj):
+            for j, code, extra in edges:
+                if extra:
+                    self.edge_extra[len(self.targets)] = extra
+                self.targets.append(j)
+                self.labels.append(code)
+            self.offsets.append(len(self.targets))
+
+
+# ---------------------------------------------------------------------------
+# Per-process singleton
+# ---------------------------------------------------------------------------
+
+_index: Optional[TopologyIndex] = None
+_invalidated = False
+_build_lock = threading.Lock()
+
+
+def _current_generation(cur) -> int:
+    cur.execute(
+        "SELECT COALESCE(MAX(id), 0) AS run_id FROM inventory_runs "
+        "WHERE finished_at IS NOT NULL"
+    )
+    row = cur.fetchone()
+    return int(row["run_id"] or 0) if row else 0
+
+
+def invalidate() -> None:
+    """Force a rebuild on the next ``get_index`` (call after out-of-band inventory writes)."""
+    global _invalidated
+    _invalidated = True
+
+
+def get_index(cur) -> Optional[TopologyIndex]:
+    """
+    The index for the current inventory generation, building it if needed.
+
+    Returns None when the index is disabled or cannot be built; the caller
+    falls back to per-node SQL.
+    """
+    global _index, _invalidated
+    if not ENABLED:
+        return None
+    current = _index
+    generation = _current_generation(cur)
+    if (current is not None and not _invalidated
+            and current.generation == generation
+            and time.monotonic() - current.built_at < MAX_AGE_SECONDS):
+        return current
+    # Only one request rebuilds; the rest keep serving the old index
+    if not _build_lock.acquire(blocking=current is None):
+        return current
+    try:
+        if _index is not current:
+            return _index
+        _invalidated = False
+        started = time.monotonic()
+        cur.execute("SAVEPOINT topology_index")
+        _index = TopologyIndex.load(cur, generation)
+        cur.execute("RELEASE SAVEPOINT topology_index")
+        logger.info(
+            "Topology index built  generation=%d  nodes=%d  edges=%d  in %.2fs",
+            generation, _index.node_count, _index.edge_count, time.monotonic() - started,
+        )
+        return _index
+    except Exception as exc:
+        logger.warning("Topology index build failed, using per-node queries: %s", exc)
+        try:
+            cur.execute("ROLLBACK TO SAVEPOINT topology_index")
+        except Exception:
+            pass
+        return current
+    finally:
+        _build_lock.release()
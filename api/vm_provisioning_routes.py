@@ -34,7 +34,7 @@ from auth import require_permission, get_current_user, ldap_auth, get_effective_
 from pf9_control import get_client
 from cluster_registry import get_registry
 from smtp_helper import send_email as smtp_send_email
-from db_pool import get_connection, get_pool
+from db_pool import get_connection
 
 logger = logging.getLogger("vm_provisioning")
 
@@ -542,7 +542,13 @@ def _build_completion_email(batch: dict, vm_rows: list, activity_steps: list = N
 # Background execution
 # ---------------------------------------------------------------------------
 def _execute_batch_thread(batch_id: int, operator_email: Optional[str]):
-    conn = get_pool().getconn()
+    # Checked out like any request, so a long batch holds one of the pool's
+    # slots and other callers queue instead of finding the pool exhausted.
+    with get_connection() as conn:
+        _execute_batch(conn, batch_id, operator_email)
+
+
+def _execute_batch(conn, batch_id: int, operator_email: Optional[str]):
     try:
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute("SELECT * FROM vm_provisioning_batches WHERE id=%s", (batch_id,))
@@ -996,14 +1002,6 @@ def _execute_batch_thread(batch_id: int, operator_email: Optional[str]):
             conn.commit()
         except Exception:
             pass
-    finally:
-        try:
-            get_pool().putconn(conn)
-        except Exception:
-            try:
-                conn.close()
-            except Exception:
-                pass
 
 
 def _update_vm_status(conn, vm_id: int, status: str, error_msg: Optional[str] = None):
@@ -5,7 +5,8 @@ Runs as a long-lived container.  Responsibilities:
   1.  Poll backup_config every 60 s to pick up schedule changes.
   2.  Execute pg_dump at the configured time (daily / weekly) or when a
       manual job row is inserted by the API (status = 'pending').
-  3.  Write compressed SQL dumps to the NFS-mounted backup directory.
+  3.  Write compressed SQL dumps (or parallel pg_dump directory dumps) to
+      the NFS-mounted backup directory, verified while they are written.
   4.  Enforce retention (by count and by age) after each successful backup.
   5.  Execute pg_restore when a restore job is requested.
 """
@@ -16,46 +17,22 @@ import glob
 import hashlib
 import logging
 import os
+import shutil
 import signal
 import subprocess
 import sys
 import tempfile
+import threading
 import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 
 import psycopg2
 import psycopg2.extras
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
-# ---------------------------------------------------------------------------
-# Worker observability — Redis metrics (B10.1)
-# ---------------------------------------------------------------------------
-_REDIS_HOST = os.getenv("REDIS_HOST", "redis")
-_REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
-_REDIS_PASSWORD = os.getenv("REDIS_PASSWORD") or None
-_WORKER_NAME = "backup_worker"
-_worker_runs_total   = 0
-_worker_errors_total = 0
-
-def _report_worker_metrics(duration_s: float, had_error: bool, frequency_s: int) -> None:
-    """Write run counters to Redis so /worker-metrics can aggregate them.
-    Silently no-ops when Redis is unreachable — metrics are best-effort."""
-    global _worker_runs_total, _worker_errors_total
-    _worker_runs_total += 1
-    if had_error:
-        _worker_errors_total += 1
-    try:
-        import redis as _redis
-        r = _redis.Redis(host=_REDIS_HOST, port=_REDIS_PORT, password=_REDIS_PASSWORD, socket_connect_timeout=2)
-        r.hset(f"pf9:worker:{_WORKER_NAME}", mapping={
-            "runs_total":        _worker_runs_total,
-            "errors_total":      _worker_errors_total,
-            "last_run_ts":       time.time(),
-            "last_run_duration_s": round(duration_s, 2),
-            "frequency_s":       frequency_s,
-            "label":             _WORKER_NAME,
-        })
-    except Exception:
-        pass  # Redis unavailable — continue without metrics
+from shared import backup_artifacts
+from shared.worker_telemetry import WorkerTelemetry
 
 # ---------------------------------------------------------------------------
 # Secret helper — same pattern as ldap_sync_worker
@@ -85,13 +62,24 @@ BACKUP_PATH = os.getenv("BACKUP_PATH", "/backups")
 POLL_INTERVAL = int(os.getenv("POLL_INTERVAL", "3600"))      # schedule check interval
 JOB_POLL_INTERVAL = int(os.getenv("JOB_POLL_INTERVAL", "30"))  # pending job check interval
 
+# Job timings, pending-job lag and heartbeat for GET /worker-metrics
+_telemetry = WorkerTelemetry("backup_worker", frequency_s=JOB_POLL_INTERVAL)
+
 # M10: Configurable process timeouts (previously hardcoded)
 BACKUP_DUMP_TIMEOUT_SEC    = int(os.getenv("PF9_BACKUP_DUMP_TIMEOUT_SEC",    "3600"))  # pg_dump → gzip
 RESTORE_TIMEOUT_SEC        = int(os.getenv("PF9_RESTORE_TIMEOUT_SEC",        "7200"))  # gunzip → psql
-BACKUP_VALIDATE_TIMEOUT_SEC = int(os.getenv("PF9_BACKUP_VALIDATE_TIMEOUT_SEC", "300"))  # gunzip -t integrity check
+BACKUP_VALIDATE_TIMEOUT_SEC = int(os.getenv("PF9_BACKUP_VALIDATE_TIMEOUT_SEC", "300"))  # per-file check of a directory dump
 LDAP_EXPORT_TIMEOUT_SEC    = int(os.getenv("PF9_LDAP_EXPORT_TIMEOUT_SEC",    "600"))   # ldapsearch → gzip
 LDAP_RESTORE_TIMEOUT_SEC   = int(os.getenv("PF9_LDAP_RESTORE_TIMEOUT_SEC",   "600"))   # gunzip → ldapadd
 
+# Dump layout: "plain" streams one SQL script through the compressor into
+# pf9_mgmt_<stamp>.sql.gz; "directory" runs pg_dump -Fd with BACKUP_JOBS
+# parallel workers into pf9_mgmt_<stamp>.dump/.  BACKUP_JOBS is also the
+# pigz thread count and the pg_restore -j for directory dumps.
+BACKUP_FORMAT = os.getenv("PF9_BACKUP_FORMAT", "plain").strip().lower()
+BACKUP_JOBS = max(1, int(os.getenv("PF9_BACKUP_JOBS", "4")))
+_STREAM_CHUNK = 1 << 20
+
 # Stable advisory lock ID for coordinating scheduled backups across replicas
 _BACKUP_SCHED_LOCK_ID = 9876543
 
@@ -179,6 +167,7 @@ def _get_conn():
     return psycopg2.connect(
         host=DB_HOST, port=DB_PORT, dbname=DB_NAME,
         user=DB_USER, password=DB_PASS,
+        connection_factory=_telemetry.connection_factory,
     )
 
 
@@ -235,6 +224,16 @@ def _fetch_pending_ldap_jobs(conn):
         return cur.fetchall()
 
 
+def _oldest_pending_age(jobs) -> float:
+    """Seconds since the oldest of *jobs* was queued (0 when there are none)."""
+    created = [j["created_at"] for j in jobs if j.get("created_at")]
+    if not created:
+        return 0.0
+    oldest = min(created)
+    now = datetime.datetime.now(oldest.tzinfo) if oldest.tzinfo else datetime.datetime.utcnow()
+    return max(0.0, (now - oldest).total_seconds())
+
+
 _ALLOWED_JOB_FIELDS = frozenset({
     "status", "started_at", "completed_at", "file_name", "file_path",
     "file_size_bytes", "duration_seconds", "error_message", "notes",
@@ -279,7 +278,8 @@ def _update_config_last_backup(conn, target="database"):
 def _run_backup(conn, job_id: int, backup_type: str = "manual", initiated_by: str = "system"):
     """Execute pg_dump and record result in backup_history."""
     stamp = datetime.datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    filename = f"pf9_mgmt_{stamp}.sql.gz"
+    directory = BACKUP_FORMAT == "directory"
+    filename = f"pf9_mgmt_{stamp}.dump" if directory else f"pf9_mgmt_{stamp}.sql.gz"
     filepath = os.path.join(BACKUP_PATH, filename)
 
     log.info("Starting backup job %s  →  %s", job_id, filepath)
@@ -289,34 +289,25 @@ def _run_backup(conn, job_id: int, backup_type: str = "manual", initiated_by: st
     env = os.environ.copy()
     env["PGPASSWORD"] = DB_PASS
 
+    dump_cmd = [
+        "pg_dump",
+        "-h", DB_HOST,
+        "-p", DB_PORT,
+        "-U", DB_USER,
+        "-d", DB_NAME,
+        "--no-owner",
+        "--no-privileges",
+    ]
+
     start = time.time()
     try:
-        # pg_dump piped through gzip
-        dump_cmd = [
-            "pg_dump",
-            "-h", DB_HOST,
-            "-p", DB_PORT,
-            "-U", DB_USER,
-            "-d", DB_NAME,
-            "--no-owner",
-            "--no-privileges",
-        ]
-        with open(filepath, "wb") as outf:
-            dump = subprocess.Popen(dump_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
-            gzip = subprocess.Popen(["gzip"], stdin=dump.stdout, stdout=outf, stderr=subprocess.PIPE)
-            dump.stdout.close()
-            _, gzip_err = gzip.communicate(timeout=BACKUP_DUMP_TIMEOUT_SEC)
-            dump.wait(timeout=10)
-
-        os.chmod(filepath, 0o600)  # M17: restrict backup file permissions
-
-        if dump.returncode != 0 or gzip.returncode != 0:
-            raise RuntimeError(
-                f"pg_dump rc={dump.returncode}, gzip rc={gzip.returncode}"
-            )
+        if directory:
+            _dump_directory(dump_cmd, env, filepath)
+        else:
+            integrity_hash, integrity = _dump_plain(dump_cmd, env, filepath)
 
         duration = time.time() - start
-        size = os.path.getsize(filepath)
+        size = backup_artifacts.artifact_size(filepath)
 
         # Guard against silently empty/truncated output (pg_dump can exit 0 on some errors)
         if size < 1024:
@@ -335,14 +326,13 @@ def _run_backup(conn, job_id: int, backup_type: str = "manual", initiated_by: st
         )
         _update_config_last_backup(conn, "database")
         log.info("Backup job %s completed – %s bytes in %.1f s", job_id, size, duration)
-        # Compute SHA-256 integrity hash (H7)
-        sha256 = hashlib.sha256()
-        with open(filepath, "rb") as fh:
-            for chunk in iter(lambda: fh.read(65536), b""):
-                sha256.update(chunk)
-        _update_job(conn, job_id, integrity_hash=sha256.hexdigest())
-        # Validate backup integrity: gzip check + pg_dump header
-        _validate_backup(conn, job_id, filepath)
+        if directory:
+            # pg_dump writes the table files itself, so hash and test them in
+            # one read-back pass and record the hashes in a manifest
+            integrity_hash, integrity = _verify_directory_dump(filepath)
+        # SHA-256 integrity hash (H7) and gzip / pg_dump header validation
+        _update_job(conn, job_id, integrity_hash=integrity_hash)
+        _record_integrity(conn, job_id, *integrity)
         return True
 
     except Exception as exc:
@@ -357,70 +347,176 @@ def _run_backup(conn, job_id: int, backup_type: str = "manual", initiated_by: st
         )
         # Cleanup partial file
         try:
-            if os.path.exists(filepath):
-                os.remove(filepath)
-        except OSError:
+            if backup_artifacts.artifact_exists(filepath):
+                backup_artifacts.remove_artifact(filepath, BACKUP_PATH)
+        except (OSError, ValueError):
             pass
         return False
 
 
+def _compressor_cmd() -> list:
+    """pigz with BACKUP_JOBS threads when installed, else single-threaded gzip."""
+    if shutil.which("pigz"):
+        return ["pigz", "-p", str(BACKUP_JOBS)]
+    return ["gzip"]
+
 
-def _validate_backup(conn, job_id: int, filepath: str) -> None:
-    """Verify a .sql.gz backup file is intact.
+def _dump_plain(dump_cmd: list, env: dict, filepath: str):
+    """pg_dump → compressor → *filepath*, verified while it is written.
 
-    Two checks:
-    1. gzip integrity (gunzip -t) — catches truncated or corrupt archives.
-    2. Header check — peek at the first 4 KiB and confirm the decompressed
-       content looks like a pg_dump SQL script.
+    The compressed stream is hashed and test-inflated as it passes through,
+    so the file is never read back.  Returns (sha256, (status, notes)) for
+    _record_integrity.
     """
-    log.info("Validating backup job %s: %s", job_id, filepath)
-    status = "invalid"
-    notes = ""
-    try:
-        # Step 1: gzip integrity (fast, reads entire file)
-        r = subprocess.run(
-            ["gunzip", "-t", filepath],
-            capture_output=True,
-            timeout=BACKUP_VALIDATE_TIMEOUT_SEC,
+    timed_out = threading.Event()
+    with open(filepath, "wb") as outf:
+        os.chmod(filepath, 0o600)  # M17: restrict backup file permissions
+        dump = subprocess.Popen(dump_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
+        gzip = subprocess.Popen(_compressor_cmd(), stdin=dump.stdout, stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE)
+        dump.stdout.close()
+
+        def _kill():
+            timed_out.set()
+            dump.kill()
+            gzip.kill()
+
+        timer = threading.Timer(BACKUP_DUMP_TIMEOUT_SEC, _kill)
+        timer.start()
+        try:
+            sha256 = hashlib.sha256()
+            check = _GzipCheck()
+            error = None
+            for chunk in iter(lambda: gzip.stdout.read(_STREAM_CHUNK), b""):
+                outf.write(chunk)
+                sha256.update(chunk)
+                if error is None:
+                    try:
+                        check.feed(chunk)
+                    except zlib.error as exc:
+                        error = f"gzip integrity check failed: {exc}"
+            gzip.wait()
+            dump.wait(timeout=10)
+        finally:
+            timer.cancel()
+
+    if timed_out.is_set():
+        raise RuntimeError(f"pg_dump timed out after {BACKUP_DUMP_TIMEOUT_SEC} s")
+    if dump.returncode != 0 or gzip.returncode != 0:
+        raise RuntimeError(
+            f"pg_dump rc={dump.returncode}, gzip rc={gzip.returncode}"
         )
-        if r.returncode != 0:
-            raise RuntimeError(
-                f"gzip integrity check failed (rc={r.returncode}): "
-                f"{r.stderr.decode('utf-8', 'replace')[:200]}"
-            )
+    if error is None and not check.complete:
+        error = "gzip integrity check failed: stream is truncated"
+    if error:
+        return sha256.hexdigest(), ("invalid", error)
+    return sha256.hexdigest(), _check_sql_header(check.head)
+
 
-        # Step 2: peek at first 4 KiB and verify pg_dump header
-        gunzip_proc = subprocess.Popen(
-            ["gunzip", "-c", filepath],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
+class _GzipCheck:
+    """Incremental ``gunzip -t`` for a gzip stream fed in chunks.
+
+    zlib verifies each member's deflate data and CRC-32 / length trailer;
+    only the first 4 KiB of output is kept, for the pg_dump header check.
+    """
+
+    def __init__(self):
+        self._inflate = zlib.decompressobj(wbits=31)
+        self.head = b""
+
+    def feed(self, chunk: bytes) -> None:
+        while chunk:
+            data = self._inflate.decompress(chunk, _STREAM_CHUNK)
+            if len(self.head) < 4096:
+                self.head += data[:4096 - len(self.head)]
+            chunk = self._inflate.unconsumed_tail
+            if self._inflate.eof and self._inflate.unused_data:
+                # concatenated members, as gunzip accepts
+                chunk = self._inflate.unused_data
+                self._inflate = zlib.decompressobj(wbits=31)
+
+    @property
+    def complete(self) -> bool:
+        return self._inflate.eof
+
+
+def _check_sql_header(head_bytes: bytes):
+    """(status, notes) for the first decompressed bytes of a plain dump."""
+    head_text = head_bytes.decode("utf-8", "replace")
+    if not (
+        head_text.startswith("--")
+        or "PostgreSQL database dump" in head_text
+        or head_text.lstrip().startswith("SET ")
+    ):
+        return ("invalid", "Decompressed content does not look like a pg_dump output "
+                           f"(first 60 chars: {head_text[:60]!r})")
+    return "valid", f"gzip OK; header: {head_text[:80].strip()!r}"
+
+
+def _dump_directory(dump_cmd: list, env: dict, dump_dir: str) -> None:
+    """pg_dump directory format with BACKUP_JOBS parallel workers into *dump_dir*.
+
+    Each worker dumps and gzip-compresses its own tables, so both the dump
+    and the compression run in parallel.
+    """
+    r = subprocess.run(
+        dump_cmd + ["-Fd", "-j", str(BACKUP_JOBS), "-f", dump_dir],
+        capture_output=True, env=env, timeout=BACKUP_DUMP_TIMEOUT_SEC,
+    )
+    if r.returncode != 0:
+        raise RuntimeError(
+            f"pg_dump rc={r.returncode}: {r.stderr.decode('utf-8', 'replace')[:500]}"
         )
-        try:
-            head_bytes = gunzip_proc.stdout.read(4096)
-        finally:
-            gunzip_proc.stdout.close()
-            gunzip_proc.wait(timeout=30)
-
-        head_text = head_bytes.decode("utf-8", "replace")
-        if not (
-            head_text.startswith("--")
-            or "PostgreSQL database dump" in head_text
-            or head_text.lstrip().startswith("SET ")
-        ):
-            raise RuntimeError(
-                "Decompressed content does not look like a pg_dump output "
-                f"(first 60 chars: {head_text[:60]!r})"
-            )
+    os.chmod(dump_dir, 0o700)  # M17: restrict backup file permissions
 
-        status = "valid"
-        notes = f"gzip OK; header: {head_text[:80].strip()!r}"
-        log.info("Backup job %s integrity: valid", job_id)
 
-    except Exception as exc:
-        status = "invalid"
-        notes = str(exc)[:500]
-        log.error("Backup validation job %s: %s", job_id, exc)
+def _scan_dump_file(path: str) -> str:
+    """Hash one file of a directory dump, test-inflating it if compressed."""
+    sha256 = hashlib.sha256()
+    check = _GzipCheck() if path.endswith(".gz") else None
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(_STREAM_CHUNK), b""):
+            sha256.update(chunk)
+            if check is not None:
+                check.feed(chunk)
+    if check is not None and not check.complete:
+        raise zlib.error("stream is truncated")
+    os.chmod(path, 0o600)
+    return sha256.hexdigest()
+
+
+def _verify_directory_dump(dump_dir: str):
+    """Hash and test every file of *dump_dir* in parallel and write its manifest.
 
+    Returns (manifest sha256, (status, notes)) for _record_integrity.
+    """
+    log.info("Validating directory dump %s", dump_dir)
+    names = sorted(os.listdir(dump_dir))
+    with ThreadPoolExecutor(max_workers=BACKUP_JOBS, thread_name_prefix="backup_verify") as pool:
+        futures = {name: pool.submit(_scan_dump_file, os.path.join(dump_dir, name)) for name in names}
+        hashes, errors = {}, []
+        for name, future in futures.items():
+            try:
+                hashes[name] = future.result(timeout=BACKUP_VALIDATE_TIMEOUT_SEC)
+            except Exception as exc:
+                errors.append(f"{name}: {exc or type(exc).__name__}")
+    manifest_hash = backup_artifacts.write_manifest(dump_dir, hashes)
+
+    with open(os.path.join(dump_dir, "toc.dat"), "rb") as fh:
+        magic = fh.read(5)
+    if magic != b"PGDMP":
+        errors.append(f"toc.dat is not a pg_dump archive (starts with {magic!r})")
+    if errors:
+        return manifest_hash, ("invalid", ("gzip integrity check failed: " + "; ".join(errors))[:500])
+    return manifest_hash, ("valid", f"{len(names)} files OK; toc.dat header PGDMP")
+
+
+def _record_integrity(conn, job_id: int, status: str, notes: str) -> None:
+    """Store the backup validation result on the backup_history row."""
+    if status == "valid":
+        log.info("Backup job %s integrity: valid", job_id)
+    else:
+        log.error("Backup validation job %s: %s", job_id, notes)
     with conn.cursor() as cur:
         cur.execute(
             "UPDATE backup_history "
@@ -432,9 +528,9 @@ def _validate_backup(conn, job_id: int, filepath: str) -> None:
 
 
 def _run_restore(conn, job_id: int, source_path: str):
-    """Restore a backup into the database."""
+    """Restore a backup (.sql.gz file or directory dump) into the database."""
 
-    if not os.path.isfile(source_path):
+    if not backup_artifacts.artifact_exists(source_path):
         _update_job(conn, job_id, status="failed", error_message="Source file not found",
                      completed_at=datetime.datetime.utcnow())
         return False
@@ -446,21 +542,13 @@ def _run_restore(conn, job_id: int, source_path: str):
 
     start = time.time()
     try:
-        # gunzip | psql
-        gunzip = subprocess.Popen(["gunzip", "-c", source_path], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        psql = subprocess.Popen(
-            ["psql", "-h", DB_HOST, "-p", DB_PORT, "-U", DB_USER, "-d", DB_NAME, "-v", "ON_ERROR_STOP=0"],
-            stdin=gunzip.stdout, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env,
-        )
-        gunzip.stdout.close()
-        psql_out, psql_err = psql.communicate(timeout=RESTORE_TIMEOUT_SEC)
-        gunzip.wait(timeout=10)
+        if backup_artifacts.is_directory_dump(source_path):
+            _restore_directory(source_path, env)
+        else:
+            _restore_plain(source_path, env)
 
         duration = time.time() - start
 
-        if psql.returncode != 0:
-            raise RuntimeError(f"psql rc={psql.returncode}: {psql_err.decode('utf-8', 'replace')[:500]}")
-
         _update_job(
             conn, job_id,
             status="completed",
@@ -483,6 +571,46 @@ def _run_restore(conn, job_id: int, source_path: str):
         return False
 
 
+def _restore_plain(source_path: str, env: dict) -> None:
+    """gunzip | psql a .sql.gz dump."""
+    gunzip = subprocess.Popen(["gunzip", "-c", source_path], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    psql = subprocess.Popen(
+        ["psql", "-h", DB_HOST, "-p", DB_PORT, "-U", DB_USER, "-d", DB_NAME, "-v", "ON_ERROR_STOP=0"],
+        stdin=gunzip.stdout, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env,
+    )
+    gunzip.stdout.close()
+    psql_out, psql_err = psql.communicate(timeout=RESTORE_TIMEOUT_SEC)
+    gunzip.wait(timeout=10)
+
+    if psql.returncode != 0:
+        raise RuntimeError(f"psql rc={psql.returncode}: {psql_err.decode('utf-8', 'replace')[:500]}")
+
+
+def _restore_directory(source_path: str, env: dict) -> None:
+    """pg_restore a directory dump with BACKUP_JOBS parallel workers."""
+    r = subprocess.run(
+        [
+            "pg_restore",
+            "-h", DB_HOST,
+            "-p", DB_PORT,
+            "-U", DB_USER,
+            "-d", DB_NAME,
+            "-j", str(BACKUP_JOBS),
+            "--no-owner",
+            "--no-privileges",
+            source_path,
+        ],
+        capture_output=True, env=env, timeout=RESTORE_TIMEOUT_SEC,
+    )
+    err = r.stderr.decode("utf-8", "replace")
+    if r.returncode != 0:
+        # Like psql with ON_ERROR_STOP=0, carry on past statement errors
+        # (e.g. objects that already exist); anything else is fatal.
+        if "errors ignored on restore" not in err:
+            raise RuntimeError(f"pg_restore rc={r.returncode}: {err[:500]}")
+        log.warning("pg_restore reported ignored errors: %s", err[-300:])
+
+
 # ---------------------------------------------------------------------------
 # Retention enforcement
 # ---------------------------------------------------------------------------
@@ -518,10 +646,12 @@ def _enforce_retention(conn, target="database"):
 
     for row in to_delete:
         fpath = row.get("file_path")
-        if fpath and os.path.isfile(fpath):
+        if fpath and backup_artifacts.artifact_exists(fpath):
             try:
-                os.remove(fpath)
+                backup_artifacts.remove_artifact(fpath, BACKUP_PATH)
                 log.info("Retention (%s): removed %s", target, fpath)
+            except ValueError as e:
+                log.error("Retention (%s): refusing to remove %s: %s", target, fpath, e)
             except OSError as e:
                 log.warning("Retention (%s): could not remove %s: %s", target, fpath, e)
         # Mark row
@@ -766,10 +896,14 @@ def _create_scheduled_job(conn, target="database", region_id: str = None):
 
 def main():
     log.info(
-        "Backup worker starting  (poll every %d s, NFS → %s)",
+        "Backup worker starting  (poll every %d s, NFS → %s, %s dumps, %d jobs)",
         JOB_POLL_INTERVAL,
         BACKUP_PATH,
+        BACKUP_FORMAT,
+        BACKUP_JOBS,
     )
+    if BACKUP_FORMAT not in ("plain", "directory"):
+        log.warning("Unknown PF9_BACKUP_FORMAT %r – writing plain dumps", BACKUP_FORMAT)
 
     # Verify storage is accessible; warn but don't abort so the worker can
     # still process pending DB/LDAP jobs once connectivity recovers.
@@ -785,86 +919,89 @@ def main():
 
     while _running:
         conn = None
-        _loop_start = time.time()
-        _loop_error = False
-        try:
-            # Re-verify storage before processing any jobs this cycle
-            if not _check_storage_health():
-                log.warning("Backup storage unreachable – skipping this poll cycle.")
-                for _ in range(JOB_POLL_INTERVAL):
-                    if not _running:
-                        break
-                    time.sleep(1)
-                continue
-
-            conn = _get_conn_with_cb()
-
-            # 1. Process any pending DATABASE manual / restore jobs
-            pending = _fetch_pending_jobs(conn)
-            for job in pending:
-                target = job.get("backup_target", "database")
-                jtype = job.get("backup_type", "manual")
-                if target == "ldap":
-                    # Handled separately below
+        with _telemetry.cycle():
+            try:
+                # Re-verify storage before processing any jobs this cycle
+                if not _check_storage_health():
+                    log.warning("Backup storage unreachable – skipping this poll cycle.")
+                    _telemetry.fail()
+                    for _ in range(JOB_POLL_INTERVAL):
+                        if not _running:
+                            break
+                        time.sleep(1)
                     continue
-                if jtype == "restore":
-                    _run_restore(conn, job["id"], job.get("file_path", ""))
-                else:
-                    _run_backup(conn, job["id"], jtype, job.get("initiated_by", "manual"))
-                _enforce_retention(conn, "database")
-
-            # 2. Process any pending LDAP backup / restore jobs
-            pending_ldap = _fetch_pending_ldap_jobs(conn)
-            for job in pending_ldap:
-                jtype = job.get("backup_type", "manual")
-                if jtype == "restore":
-                    _run_ldap_restore(conn, job["id"], job.get("file_path", ""))
-                else:
-                    _run_ldap_backup(conn, job["id"], jtype, job.get("initiated_by", "manual"))
-                _enforce_retention(conn, "ldap")
-
-            # 3. Check scheduled backups — only every POLL_INTERVAL seconds
-            now_ts = time.time()
-            if now_ts - _last_schedule_check >= POLL_INTERVAL:
-                _last_schedule_check = now_ts
-                # Acquire a non-blocking advisory lock so that only one worker
-                # replica fires the scheduled backup when multiple are running.
-                with conn.cursor() as _lc:
-                    _lc.execute("SELECT pg_try_advisory_lock(%s)", (_BACKUP_SCHED_LOCK_ID,))
-                    locked = _lc.fetchone()[0]
-
-                if locked:
+
+                conn = _get_conn_with_cb()
+
+                # 1. Process any pending DATABASE manual / restore jobs
+                pending = _fetch_pending_jobs(conn)
+                _telemetry.set_lag("backup_jobs", _oldest_pending_age(pending))
+                for job in pending:
+                    target = job.get("backup_target", "database")
+                    jtype = job.get("backup_type", "manual")
+                    if target == "ldap":
+                        # Handled separately below
+                        continue
+                    with _telemetry.stage("restore" if jtype == "restore" else "backup", component="database"):
+                        if jtype == "restore":
+                            _run_restore(conn, job["id"], job.get("file_path", ""))
+                        else:
+                            _run_backup(conn, job["id"], jtype, job.get("initiated_by", "manual"))
+                    _enforce_retention(conn, "database")
+
+                # 2. Process any pending LDAP backup / restore jobs
+                pending_ldap = _fetch_pending_ldap_jobs(conn)
+                for job in pending_ldap:
+                    jtype = job.get("backup_type", "manual")
+                    with _telemetry.stage("restore" if jtype == "restore" else "backup", component="ldap"):
+                        if jtype == "restore":
+                            _run_ldap_restore(conn, job["id"], job.get("file_path", ""))
+                        else:
+                            _run_ldap_backup(conn, job["id"], jtype, job.get("initiated_by", "manual"))
+                    _enforce_retention(conn, "ldap")
+
+                # 3. Check scheduled backups — only every POLL_INTERVAL seconds
+                now_ts = time.time()
+                if now_ts - _last_schedule_check >= POLL_INTERVAL:
+                    _last_schedule_check = now_ts
+                    # Acquire a non-blocking advisory lock so that only one worker
+                    # replica fires the scheduled backup when multiple are running.
+                    with conn.cursor() as _lc:
+                        _lc.execute("SELECT pg_try_advisory_lock(%s)", (_BACKUP_SCHED_LOCK_ID,))
+                        locked = _lc.fetchone()[0]
+
+                    if locked:
+                        try:
+                            cfg = _fetch_config(conn)
+
+                            # Database scheduled backup
+                            if _should_run_scheduled(cfg, "database"):
+                                job_id = _create_scheduled_job(conn, "database")
+                                with _telemetry.stage("backup", component="database"):
+                                    _run_backup(conn, job_id, "scheduled", "scheduler")
+                                _enforce_retention(conn, "database")
+
+                            # LDAP scheduled backup
+                            if _should_run_scheduled(cfg, "ldap"):
+                                job_id = _create_scheduled_job(conn, "ldap")
+                                with _telemetry.stage("backup", component="ldap"):
+                                    _run_ldap_backup(conn, job_id, "scheduled", "scheduler")
+                                _enforce_retention(conn, "ldap")
+                        finally:
+                            with conn.cursor() as _uc:
+                                _uc.execute("SELECT pg_advisory_unlock(%s)", (_BACKUP_SCHED_LOCK_ID,))
+                    else:
+                        log.debug("Another worker holds the schedule lock; skipping this cycle.")
+
+            except Exception as exc:
+                log.error("Worker loop error: %s", exc)
+                _telemetry.fail()
+            finally:
+                if conn:
                     try:
-                        cfg = _fetch_config(conn)
-
-                        # Database scheduled backup
-                        if _should_run_scheduled(cfg, "database"):
-                            job_id = _create_scheduled_job(conn, "database")
-                            _run_backup(conn, job_id, "scheduled", "scheduler")
-                            _enforce_retention(conn, "database")
-
-                        # LDAP scheduled backup
-                        if _should_run_scheduled(cfg, "ldap"):
-                            job_id = _create_scheduled_job(conn, "ldap")
-                            _run_ldap_backup(conn, job_id, "scheduled", "scheduler")
-                            _enforce_retention(conn, "ldap")
-                    finally:
-                        with conn.cursor() as _uc:
-                            _uc.execute("SELECT pg_advisory_unlock(%s)", (_BACKUP_SCHED_LOCK_ID,))
-                else:
-                    log.debug("Another worker holds the schedule lock; skipping this cycle.")
-
-            _report_worker_metrics(time.time() - _loop_start, _loop_error, JOB_POLL_INTERVAL)
-
-        except Exception as exc:
-            log.error("Worker loop error: %s", exc)
-            _report_worker_metrics(0.0, True, JOB_POLL_INTERVAL)
-        finally:
-            if conn:
-                try:
-                    conn.close()
-                except Exception:
-                    pass
+                        conn.close()
+                    except Exception:
+                        pass
 
         # Sleep in short increments so SIGTERM is responsive
         _touch_alive()  # heartbeat — liveness probe checks /tmp/alive mtime
@@ -0,0 +1,211 @@
+"""
+bench_capacity_forecast.py — CapacityEngine (batched NumPy fits, one query
+per series family) on a synthetic fleet, optionally against the engine of an
+earlier revision.
+
+Shadows ``metering_quotas``, ``hypervisors`` and ``servers_history`` with
+session TEMP tables holding a synthetic fleet: ``--projects`` projects
+sampled every ``--interval-min`` minutes for 14 days (some with gaps in the
+storage columns, too few points or no quota) and ``--hosts`` hypervisors
+with hourly snapshots.  Insight writes are recorded instead of executed.
+
+``--baseline REV`` also runs intelligence_worker/engines/capacity.py as of
+git revision REV (loaded with ``git show``) on the same data, reports its
+time and write count, and checks that the linear fit raises the same
+insights.
+
+Run against any database with the pf9 schema (PF9_DB_* variables):
+    python benchmarks/bench_capacity_forecast.py --projects 2000
+    python benchmarks/bench_capacity_forecast.py --baseline <rev>
+"""
+import argparse
+import math
+import os
+import subprocess
+import sys
+import time
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "intelligence_worker"))
+
+import psycopg2  # noqa: E402
+
+from engines.capacity import CapacityEngine  # noqa: E402
+from engines.forecast import FITTERS  # noqa: E402
+
+# Metadata keys only the batched engine writes
+_NEW_KEYS = {"method", "trend_ci_95", "days_to_90_range"}
+
+
+def _connect():
+    return psycopg2.connect(
+        host=os.getenv("PF9_DB_HOST", "localhost"),
+        port=int(os.getenv("PF9_DB_PORT", "5432")),
+        dbname=os.getenv("PF9_DB_NAME", "pf9_mgmt"),
+        user=os.getenv("PF9_DB_USER", "pf9"),
+        password=os.getenv("PF9_DB_PASSWORD", ""),
+    )
+
+
+def _seed(conn, projects: int, interval_min: int, hosts: int) -> int:
+    steps = 14 * 24 * 60 // interval_min
+    with conn.cursor() as cur:
+        cur.execute("""
+            CREATE TEMP TABLE metering_quotas (
+                collected_at TIMESTAMPTZ NOT NULL, project_id TEXT NOT NULL, project_name TEXT,
+                vcpus_quota INTEGER, vcpus_used INTEGER, ram_quota_mb INTEGER, ram_used_mb INTEGER,
+                instances_quota INTEGER, instances_used INTEGER,
+                storage_quota_gb INTEGER, storage_used_gb INTEGER,
+                floating_ips_quota INTEGER, floating_ips_used INTEGER
+            )
+        """)
+        # Growth rates vary by project so every severity (and no insight) occurs;
+        # (p*31 + k*17) % 11 is deterministic noise.
+        cur.execute("""
+            INSERT INTO metering_quotas
+            SELECT NOW() - ((%(steps)s - 1 - k) * %(interval)s * INTERVAL '1 minute') + INTERVAL '1 minute',
+                   'proj-' || p, 'Project ' || p,
+                   CASE WHEN p %% 19 = 0 THEN 0 ELSE 200 END,
+                   LEAST(200, 80 + p %% 90 + (k * (p %% 7)) / 40),
+                   409600, 100000 + (p %% 50) * 4000 + k * (p %% 5) * 8 + ((p * 31 + k * 17) %% 11) * 100,
+                   100, 30 + p %% 60 + (k * (p %% 3)) / 100,
+                   CASE WHEN p %% 50 = 0 THEN NULL ELSE 2000 END,
+                   CASE WHEN (p + k) %% 97 = 0 THEN NULL
+                        ELSE 600 + p %% 900 + (k * (p %% 13)) / 20 + (p * 31 + k * 17) %% 11 END,
+                   20, 5 + (k * (p %% 4)) / 200
+            FROM generate_series(1, %(projects)s) p, generate_series(0, %(steps)s - 1) k
+            WHERE NOT (p %% 37 = 0 AND k > 4)
+        """, {"steps": steps, "interval": interval_min, "projects": projects})
+        rows = cur.rowcount
+        cur.execute("CREATE INDEX ON metering_quotas (project_id, collected_at DESC)")
+        cur.execute("""
+            CREATE TEMP TABLE hypervisors (
+                id TEXT, hostname TEXT, region_id TEXT, vcpus INTEGER, memory_mb INTEGER,
+                running_vms INTEGER, state TEXT
+            )
+        """)
+        cur.execute("""
+            INSERT INTO hypervisors
+            SELECT 'hv-' || h, 'bench-hv-' || h, 'region-' || (h %% 3), 64, 262144, 0, 'up'
+            FROM generate_series(1, %s) h
+        """, (hosts,))
+        cur.execute("""
+            CREATE TEMP TABLE servers_history (
+                hypervisor_hostname TEXT, status TEXT, recorded_at TIMESTAMPTZ
+            )
+        """)
+        # Host h grows by (h % 5) VMs a day from 10 VMs.
+        cur.execute("""
+            INSERT INTO servers_history
+            SELECT 'bench-hv-' || h, 'ACTIVE', date_trunc('hour', NOW()) - (k * INTERVAL '1 hour')
+            FROM generate_series(1, %s) h, generate_series(0, 335) k,
+                 LATERAL generate_series(1, 10 + ((335 - k) * (h %% 5)) / 24) v
+        """, (hosts,))
+        cur.execute("CREATE INDEX ON servers_history (hypervisor_hostname, recorded_at)")
+        cur.execute("ANALYZE metering_quotas")
+        cur.execute("ANALYZE servers_history")
+    conn.commit()
+    return rows
+
+
+def _baseline_engine(rev: str):
+    """CapacityEngine class from engines/capacity.py at git revision *rev*."""
+    path = "intelligence_worker/engines/capacity.py"
+    source = subprocess.run(["git", "-C", ROOT, "show", f"{rev}:{path}"],
+                            check=True, capture_output=True, text=True).stdout
+    module = types.ModuleType("engines._capacity_baseline")
+    module.__package__ = "engines"  # resolves ``from .base import BaseEngine``
+    exec(compile(source, f"{rev}:{path}", "exec"), module.__dict__)
+    return module.CapacityEngine
+
+
+def _recording(base):
+    """Engine subclass that records insight writes instead of executing them."""
+    class Recording(base):
+        def __init__(self, conn, **kw):
+            super().__init__(conn, **kw)
+            self.upserts, self.resolved, self.writes = {}, set(), 0
+
+        def upsert_insight(self, **kw):
+            self.writes += 1
+            self.upserts[(kw["type"], kw["entity_id"])] = kw
+
+        def suppress_resolved(self, type, entity_type, entity_id):
+            self.writes += 1
+            self.resolved.add((type, entity_id))
+
+        def suppress_resolved_many(self, type, entity_type, entity_ids):
+            self.writes += 1
+            self.resolved.update((type, e) for e in entity_ids)
+    return Recording
+
+
+def _close(a, b):
+    if isinstance(a, float) or isinstance(b, float):
+        return math.isclose(float(a), float(b), rel_tol=1e-6, abs_tol=1e-6)
+    return a == b
+
+
+def _compare(old, new):
+    problems = []
+    if set(old.upserts) != set(new.upserts):
+        problems.append(("insight keys", sorted(set(old.upserts) ^ set(new.upserts))[:5]))
+    if old.resolved != new.resolved:
+        problems.append(("resolved", sorted(old.resolved ^ new.resolved)[:5]))
+    for key in set(old.upserts) & set(new.upserts):
+        a, b = old.upserts[key], new.upserts[key]
+        for field in ("severity", "title", "message", "entity_name"):
+            if a[field] != b[field]:
+                problems.append((key, field, a[field], b[field]))
+        meta_b = {k: v for k, v in b["metadata"].items() if k not in _NEW_KEYS}
+        if set(a["metadata"]) != set(meta_b) or not all(
+                _close(a["metadata"][k], meta_b[k]) for k in meta_b):
+            problems.append((key, "metadata", a["metadata"], meta_b))
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--projects", type=int, default=2000)
+    parser.add_argument("--interval-min", type=int, default=15,
+                        help="metering_config.collection_interval_min")
+    parser.add_argument("--hosts", type=int, default=200)
+    parser.add_argument("--baseline", metavar="REV",
+                        help="also run the capacity engine of this git revision")
+    args = parser.parse_args()
+
+    conn = _connect()
+    started = time.perf_counter()
+    rows = _seed(conn, args.projects, args.interval_min, args.hosts)
+    print(f"seeded {rows} metering_quotas rows ({args.projects} projects), "
+          f"{args.hosts} hypervisors in {time.perf_counter() - started:.1f}s")
+
+    print(f"{'engine':<22} {'seconds':>8} {'speedup':>8} {'insights':>9} {'resolved':>9} {'writes':>7}")
+    baseline, t_baseline = None, None
+    if args.baseline:
+        baseline = _recording(_baseline_engine(args.baseline))(conn)
+        started = time.perf_counter()
+        baseline.run()
+        t_baseline = time.perf_counter() - started
+        print(f"{args.baseline[:22]:<22} {t_baseline:>8.2f} {'':>8} {len(baseline.upserts):>9} "
+              f"{len(baseline.resolved):>9} {baseline.writes:>7}")
+
+    for method in FITTERS:
+        engine = _recording(CapacityEngine)(conn, method=method)
+        started = time.perf_counter()
+        engine.run()
+        elapsed = time.perf_counter() - started
+        speedup = f"{t_baseline / elapsed:>7.1f}x" if baseline else f"{'':>8}"
+        print(f"{'batched ' + method:<22} {elapsed:>8.2f} {speedup} "
+              f"{len(engine.upserts):>9} {len(engine.resolved):>9} {engine.writes:>7}")
+        if baseline and method == "linear":
+            problems = _compare(baseline, engine)
+            if problems:
+                raise SystemExit(f"linear fit differs from {args.baseline}: {problems[:5]}")
+    conn.rollback()
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
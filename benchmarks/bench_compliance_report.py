@@ -0,0 +1,114 @@
+"""
+bench_compliance_report.py — snapshot compliance report engine on a synthetic
+inventory.
+
+Builds ``--volumes`` volumes across 200 projects with ``--snapshots-per-volume``
+snapshots each (frames shaped like ``load_db_data`` returns them), then times:
+
+  legacy   the old per-volume loop: filter, copy, re-parse and sort the whole
+           snapshots frame once per volume (extrapolated from ``--legacy-sample``
+           volumes so the benchmark finishes in seconds)
+  engine   build_volume_compliance + the tenant, domain and policy summaries
+
+    python benchmarks/bench_compliance_report.py --volumes 30000
+"""
+import argparse
+import importlib.util
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_spec = importlib.util.spec_from_file_location(
+    "compliance_report", os.path.join(ROOT, "snapshots", "p9_snapshot_compliance_report.py")
+)
+report = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(report)
+
+NOW = datetime(2026, 6, 1, 12)
+
+
+def _inventory(n_volumes: int, per_volume: int) -> dict:
+    rng = random.Random(42)
+    policies = ["daily_5", "daily_5,monthly_1st", "weekly_4", ""]
+    volumes = pd.DataFrame({
+        "id": [f"vol-{i:06d}" for i in range(n_volumes)],
+        "name": [f"volume-{i}" for i in range(n_volumes)],
+        "size": [rng.choice((10, 50, 100)) for _ in range(n_volumes)],
+        "status": "in-use",
+        "bootable": False,
+        "os-vol-tenant-attr:tenant_id": [f"proj-{i % 200}" for i in range(n_volumes)],
+        "metadata": [
+            {"auto_snapshot": "true" if i % 10 else "false",
+             "snapshot_policies": policies[i % len(policies)]}
+            for i in range(n_volumes)
+        ],
+    })
+    n_snaps = n_volumes * per_volume
+    snapshots = pd.DataFrame({
+        "id": [f"snap-{j:07d}" for j in range(n_snaps)],
+        "volume_id": [f"vol-{j % n_volumes:06d}" for j in range(n_snaps)],
+        "created_at": [NOW - timedelta(hours=rng.randrange(24 * 14)) for _ in range(n_snaps)],
+        "metadata": [{"policy": "daily_5", "created_by": "p9_auto_snapshots"}] * n_snaps,
+    })
+    snapshots["created_at"] = pd.to_datetime(snapshots["created_at"], utc=True)
+    tenants = pd.DataFrame({
+        "id": [f"proj-{i}" for i in range(200)],
+        "name": [f"project-{i}" for i in range(200)],
+        "domain_id": [f"dom-{i % 20}" for i in range(200)],
+    })
+    domains = pd.DataFrame({"id": [f"dom-{i}" for i in range(20)],
+                            "name": [f"domain-{i}" for i in range(20)]})
+    return {"volumes": volumes, "snapshots": snapshots, "tenants": tenants, "domains": domains}
+
+
+def _legacy_latest(snapshots_df: pd.DataFrame, volume_id: str):
+    """The removed find_latest_snapshot_for_volume."""
+    snaps = snapshots_df[snapshots_df["volume_id"] == volume_id]
+    if snaps.empty:
+        return None, None, 0
+    snaps = snaps.copy()
+    snaps["created_at"] = pd.to_datetime(snaps["created_at"], utc=True, errors="coerce")
+    snaps = snaps.dropna(subset=["created_at"]).sort_values("created_at", ascending=False)
+    if snaps.empty:
+        return None, None, 0
+    last_row = snaps.iloc[0]
+    return last_row["created_at"].to_pydatetime().replace(tzinfo=None), last_row, len(snaps)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--volumes", type=int, default=30000)
+    parser.add_argument("--snapshots-per-volume", type=int, default=10)
+    parser.add_argument("--legacy-sample", type=int, default=200)
+    args = parser.parse_args()
+
+    data = _inventory(args.volumes, args.snapshots_per_volume)
+
+    sample = min(args.legacy_sample, args.volumes)
+    t0 = time.perf_counter()
+    for vol_id in data["volumes"]["id"].iloc[:sample]:
+        _legacy_latest(data["snapshots"], vol_id)
+    legacy = (time.perf_counter() - t0) * args.volumes / sample
+
+    t0 = time.perf_counter()
+    vol_comp = report.build_volume_compliance(data, now=NOW)
+    report.build_tenant_compliance_summary(vol_comp)
+    report.build_domain_compliance_summary(vol_comp)
+    report.build_policy_compliance_summary(vol_comp)
+    engine = time.perf_counter() - t0
+
+    print(f"{args.volumes} volumes, {len(data['snapshots'])} snapshots, "
+          f"{int(vol_comp['is_compliant'].sum())} compliant")
+    print(f"{'mode':<8} {'seconds':>9}")
+    print(f"{'legacy':<8} {legacy:>9.2f}  (latest-snapshot lookups only, extrapolated "
+          f"from {sample} volumes)")
+    print(f"{'engine':<8} {engine:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+bench_copilot_intents.py — Ops Copilot intent matching latency per question.
+
+Times ``copilot_intents.match_intent`` over every question in the corpus.
+``--baseline REV`` also loads api/copilot_intents.py as of git revision REV
+(with ``git show``), checks that both pick the same intent with the same
+confidence, SQL and parameters for every question, and times it alongside.
+
+    python benchmarks/bench_copilot_intents.py --repeat 50
+    python benchmarks/bench_copilot_intents.py --baseline <rev>
+
+The default corpus is tests/fixtures/copilot_questions.txt.  To replay real
+traffic, export the questions users asked and pass the file with --corpus:
+
+    psql -At -c "SELECT question FROM copilot_history" > questions.txt
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "api"))
+
+import copilot_intents  # noqa: E402
+
+CORPUS = os.path.join(ROOT, "tests", "fixtures", "copilot_questions.txt")
+
+
+def _baseline_module(rev: str):
+    """api/copilot_intents.py at git revision *rev*."""
+    path = "api/copilot_intents.py"
+    source = subprocess.run(["git", "-C", ROOT, "show", f"{rev}:{path}"],
+                            check=True, capture_output=True, text=True).stdout
+    module = types.ModuleType("_copilot_intents_baseline")
+    sys.modules[module.__name__] = module  # dataclasses resolve annotations through sys.modules
+    exec(compile(source, f"{rev}:{path}", "exec"), module.__dict__)
+    return module
+
+
+def _summary(match):
+    if match is None:
+        return None
+    return match.intent_key, match.confidence, match.sql, match.params
+
+
+def _per_question(fn, questions, repeat):
+    """Median microseconds per question over `repeat` passes."""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for q in questions:
+            fn(q)
+        samples.append((time.perf_counter() - t0) / len(questions) * 1e6)
+    return statistics.median(samples), max(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--corpus", default=CORPUS)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--baseline", metavar="REV",
+                        help="also run the matcher of this git revision")
+    args = parser.parse_args()
+
+    with open(args.corpus, encoding="utf-8") as fh:
+        questions = [line.strip() for line in fh if line.strip()]
+    matched = sum(1 for q in questions if copilot_intents.match_intent(q))
+    baseline = _baseline_module(args.baseline) if args.baseline else None
+
+    mismatches = 0
+    if baseline is not None:
+        for q in questions:
+            if _summary(copilot_intents.match_intent(q)) != _summary(baseline.match_intent(q)):
+                mismatches += 1
+                print(f"match differs from {args.baseline}: {q!r}")
+
+    print(f"{len(questions)} questions, {len(copilot_intents.INTENTS)} intents, {matched} matched")
+    print(f"{'matcher':<9} {'median us/q':>12} {'worst us/q':>11}")
+    indexed = _per_question(copilot_intents.match_intent, questions, args.repeat)
+    if baseline is not None:
+        old = _per_question(baseline.match_intent, questions, args.repeat)
+        print(f"{'baseline':<9} {old[0]:>12.1f} {old[1]:>11.1f}")
+    print(f"{'indexed':<9} {indexed[0]:>12.1f} {indexed[1]:>11.1f}")
+    if baseline is not None:
+        print(f"speed-up {old[0] / indexed[0]:.1f}x, {mismatches} differences")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+bench_dashboard_load.py — dashboard poll latency under concurrent load.
+
+Offline mode (default) runs ``--pollers`` concurrent clients against one
+event loop, the way a single uvicorn worker serves them.  Every query sleeps
+``--rtt`` seconds in a fake connection pool standing in for Postgres, and
+each poll issues ``--queries`` of them.  Two handler styles are timed:
+
+  blocking   ``async def`` calling get_connection() directly (the old
+             handlers: every query stalls the whole loop)
+  off_loop   the same body as a ``def`` under ``@off_loop``
+
+A ``/health``-style ping coroutine runs alongside to show how long the loop
+is unavailable to anything else.
+
+    python benchmarks/bench_dashboard_load.py --pollers 50 --polls 10 --rtt 0.005
+
+With ``--url`` the pollers instead hit a running API (``--token`` is sent as
+a bearer token) on the dashboard endpoints and report the same percentiles.
+
+    python benchmarks/bench_dashboard_load.py --url http://localhost:8000 --token $JWT
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)  # api/secret_helper imports shared.*
+sys.path.insert(0, os.path.join(ROOT, "api"))
+
+ENDPOINTS = (
+    "/dashboard/health-summary",
+    "/dashboard/tenant-risk-scores",
+    "/dashboard/recent-changes",
+    "/dashboard/health-trend",
+)
+
+
+class _Cursor:
+    def __init__(self, rtt):
+        self.rtt = rtt
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        time.sleep(self.rtt)
+
+    def fetchall(self):
+        return [{"n": 1}]
+
+
+class _Conn:
+    def __init__(self, rtt):
+        self.rtt = rtt
+
+    def cursor(self, cursor_factory=None):
+        return _Cursor(self.rtt)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class _FakePool:
+    def __init__(self, rtt):
+        self.rtt = rtt
+
+    def getconn(self):
+        return _Conn(self.rtt)
+
+    def putconn(self, conn):
+        pass
+
+    def closeall(self):
+        pass
+
+
+def _pct(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+
+def _row(name, latencies, wall, width=10):
+    ms = [v * 1000 for v in latencies]
+    return (f"{name:<{width}} {len(ms) / wall:>8.1f} {statistics.median(ms):>8.1f} "
+            f"{_pct(ms, 95):>8.1f} {_pct(ms, 99):>8.1f} {max(ms):>8.1f}")
+
+
+def _offline(args):
+    import db_pool
+    from db_pool import get_connection, off_loop
+
+    db_pool._pool = _FakePool(args.rtt)
+    db_pool._slots = threading.BoundedSemaphore(db_pool.POOL_MAX_CONN)
+
+    def body():
+        rows = []
+        with get_connection() as conn:
+            for _ in range(args.queries):
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1")
+                    rows.extend(cur.fetchall())
+        return rows
+
+    async def blocking():
+        return body()
+
+    handlers = {"blocking": blocking, "off_loop": off_loop(body)}
+
+    async def run(handler):
+        latencies, pings = [], []
+        done = asyncio.Event()
+
+        async def poller():
+            for _ in range(args.polls):
+                t = time.perf_counter()
+                await handler()
+                latencies.append(time.perf_counter() - t)
+
+        async def ping():
+            while not done.is_set():
+                t = time.perf_counter()
+                await asyncio.sleep(0)
+                pings.append(time.perf_counter() - t)
+                await asyncio.sleep(0.01)
+
+        pinger = asyncio.create_task(ping())
+        t0 = time.perf_counter()
+        await asyncio.gather(*(poller() for _ in range(args.pollers)))
+        wall = time.perf_counter() - t0
+        done.set()
+        await pinger
+        return latencies, pings, wall
+
+    print(f"{args.pollers} pollers x {args.polls} polls, {args.queries} queries/poll, "
+          f"rtt {args.rtt * 1000:g} ms, {db_pool.DB_EXECUTOR_THREADS} DB threads")
+    print(f"{'handler':<10} {'polls/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+          f" {'ping p99':>9}")
+    for name, handler in handlers.items():
+        latencies, pings, wall = asyncio.run(run(handler))
+        print(_row(name, latencies, wall) + f" {_pct([p * 1000 for p in pings], 99):>9.1f}")
+    asyncio.run(db_pool.close_async_pools())
+
+
+def _live(args):
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+
+    def get(path):
+        req = urllib.request.Request(args.url.rstrip("/") + path, headers=headers)
+        t = time.perf_counter()
+        with urllib.request.urlopen(req, timeout=60) as resp:
+            json.load(resp)
+        return time.perf_counter() - t
+
+    async def poller(path, latencies):
+        for _ in range(args.polls):
+            latencies.append(await asyncio.to_thread(get, path))
+
+    async def run():
+        per_path = {p: [] for p in ENDPOINTS}
+        t0 = time.perf_counter()
+        paths = [ENDPOINTS[i % len(ENDPOINTS)] for i in range(args.pollers)]
+        await asyncio.gather(*(poller(p, per_path[p]) for p in paths))
+        return per_path, time.perf_counter() - t0
+
+    per_path, wall = asyncio.run(run())
+    print(f"{args.url}: {args.pollers} pollers x {args.polls} polls")
+    print(f"{'endpoint':<30} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for path, latencies in per_path.items():
+        if latencies:
+            print(_row(path, latencies, wall, width=30))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--pollers", type=int, default=50)
+    parser.add_argument("--polls", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=4)
+    parser.add_argument("--rtt", type=float, default=0.005)
+    parser.add_argument("--url")
+    parser.add_argument("--token")
+    args = parser.parse_args()
+    if args.url:
+        _live(args)
+    else:
+        _offline(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+bench_graph_index.py — dependency-graph build time on the topology index.
+
+Generates a synthetic inventory of ``--tenants`` tenants with ``--vms`` VMs
+each (one volume, two snapshots, a port with a floating IP and a security
+group per VM, a network per tenant, hosts shared across tenants), then
+times:
+
+  load       TopologyIndex.load over the generated rows (the Python side of
+             a rebuild; the 13 bulk SELECTs are not included)
+  graph      _build_graph_from_index around a tenant and around a VM at
+             each depth, with ``--max-nodes`` as the cap
+
+Every graph request costs two queries against the index: the generation
+check and the batched drift/restore lookup.  The per-node SQL path issued
+three to eight queries for each node it expanded or added.
+
+    python benchmarks/bench_graph_index.py --tenants 200 --vms 100 --max-nodes 2000
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "api"))
+
+import graph_routes  # noqa: E402
+import topology_index  # noqa: E402
+
+
+def _inventory(tenants, vms, hosts):
+    now = datetime.utcnow()
+    t = {name: [] for name in (
+        "domains", "projects", "hypervisors", "host_aggregates", "images", "servers",
+        "volumes", "snapshots", "networks", "subnets", "ports", "floating_ips",
+        "security_groups")}
+    t["domains"].append({"id": "d0", "name": "default"})
+    t["images"].append({"id": "img0", "name": "ubuntu", "status": "active"})
+    for h in range(hosts):
+        t["hypervisors"].append({
+            "id": h, "hostname": f"hv-{h}", "db_hostname": f"hv-{h}", "state": "up",
+            "status": "enabled", "resmgr_id": f"rm-{h}", "vcpus": 64, "vcpus_used": h % 64,
+            "memory_mb": 262144, "memory_mb_used": 1024 * h})
+    t["host_aggregates"].append({"id": 1, "name": "all", "availability_zone": "az1",
+                                 "host_count": hosts,
+                                 "raw_json": {"hosts": [f"rm-{h}" for h in range(hosts)]}})
+    for p in range(tenants):
+        tid = f"t{p}"
+        t["projects"].append({"id": tid, "name": tid, "domain_id": "d0"})
+        t["networks"].append({"id": f"n{p}", "name": f"net{p}", "status": "ACTIVE", "project_id": tid})
+        t["subnets"].append({"id": f"sn{p}", "name": f"sub{p}", "network_id": f"n{p}"})
+        t["security_groups"].append({"id": f"sg{p}", "name": f"web{p}", "project_id": tid})
+        for v in range(vms):
+            vid = f"vm{p}-{v}"
+            t["servers"].append({"id": vid, "name": vid, "status": "ACTIVE", "project_id": tid,
+                                 "hypervisor_hostname": f"hv-{(p * vms + v) % hosts}",
+                                 "image_id": "img0"})
+            t["volumes"].append({"id": f"vol{p}-{v}", "name": vid, "status": "in-use",
+                                 "project_id": tid, "server_id": vid})
+            for s in range(2):
+                t["snapshots"].append({"id": f"s{p}-{v}-{s}", "name": "", "status": "available",
+                                       "volume_id": f"vol{p}-{v}", "project_id": tid,
+                                       "created_at": now - timedelta(days=s * 9)})
+            t["ports"].append({"id": f"p{p}-{v}", "name": "", "status": "ACTIVE",
+                               "network_id": f"n{p}", "device_id": vid,
+                               "device_owner": "compute:nova", "first_ip": f"10.{p % 250}.{v // 250}.{v % 250}",
+                               "security_groups": [f"sg{p}"]})
+            t["floating_ips"].append({"id": f"f{p}-{v}", "name": "", "floating_ip": "",
+                                      "status": "ACTIVE", "project_id": tid, "port_id": f"p{p}-{v}"})
+    return t
+
+
+class _Cursor:
+    def __init__(self, tables):
+        self.tables = tables
+        self.rows = []
+
+    def execute(self, sql, params=None):
+        if "drift_events" in sql or "SAVEPOINT" in sql:
+            self.rows = []
+        elif "inventory_runs" in sql:
+            self.rows = [{"run_id": 1}]
+        else:
+            self.rows = self.tables[sql.rsplit("FROM ", 1)[1].split()[0]]
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self):
+        return self.rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tenants", type=int, default=200)
+    parser.add_argument("--vms", type=int, default=100)
+    parser.add_argument("--hosts", type=int, default=100)
+    parser.add_argument("--max-nodes", type=int, default=graph_routes.MAX_NODES)
+    args = parser.parse_args()
+
+    graph_routes.MAX_NODES = args.max_nodes
+    graph_routes._trigger_health_auto_tickets = lambda nodes: None
+    cur = _Cursor(_inventory(args.tenants, args.vms, args.hosts))
+
+    t = time.perf_counter()
+    index = topology_index.TopologyIndex.load(cur, generation=1)
+    print(f"load: {index.node_count} nodes, {index.edge_count} edges "
+          f"in {time.perf_counter() - t:.2f} s")
+
+    print(f"{'root':<8} {'depth':>5} {'nodes':>6} {'edges':>6} {'trunc':>6} {'ms':>8}")
+    for ntype, db_id in (("tenant", "t0"), ("vm", "vm0-0")):
+        for depth in range(1, graph_routes.MAX_DEPTH + 1):
+            t = time.perf_counter()
+            g = graph_routes._build_graph_from_index(cur, index, ntype, db_id, depth, None)
+            ms = (time.perf_counter() - t) * 1000
+            print(f"{ntype:<8} {depth:>5} {g['node_count']:>6} {g['edge_count']:>6} "
+                  f"{str(g['truncated']):>6} {ms:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
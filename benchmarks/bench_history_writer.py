@@ -0,0 +1,152 @@
+"""
+bench_history_writer.py — compare the row-wise and set-based history paths
+of db_writer._upsert_with_history on a synthetic inventory.
+
+Creates scratch tables ``bench_items`` / ``bench_items_history`` plus one
+drift rule, then for each mode:
+
+  1. initial load of N rows         (every row produces a history row)
+  2. steady-state re-run            (no changes — pure hash checks)
+  3. churn run                      (5 % status changes, 1 % deletions)
+
+and checks that both modes wrote identical history rows and drift_events.
+
+Run against a scratch database (uses the PF9_DB_* variables like db_writer):
+    python benchmarks/bench_history_writer.py --rows 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db_writer  # noqa: E402
+
+TABLE = "bench_items"
+HISTORY = "bench_items_history"
+
+
+def _reset_schema(conn) -> None:
+    with conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS {HISTORY}")
+        cur.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        cur.execute(f"""
+            CREATE TABLE {TABLE} (
+                id           TEXT PRIMARY KEY,
+                name         TEXT,
+                project_id   TEXT,
+                status       TEXT,
+                size_gb      INTEGER,
+                created_at   TIMESTAMPTZ,
+                raw_json     JSONB,
+                last_seen_at TIMESTAMPTZ DEFAULT NOW()
+            )
+        """)
+        cur.execute(f"""
+            CREATE TABLE {HISTORY} (
+                id            BIGSERIAL PRIMARY KEY,
+                bench_item_id TEXT NOT NULL,
+                name          TEXT,
+                project_id    TEXT,
+                status        TEXT,
+                size_gb       INTEGER,
+                created_at    TIMESTAMPTZ,
+                raw_json      JSONB,
+                change_hash   TEXT NOT NULL,
+                recorded_at   TIMESTAMPTZ NOT NULL DEFAULT NOW()
+            )
+        """)
+        cur.execute(f"CREATE INDEX ON {HISTORY} (bench_item_id, change_hash)")
+        cur.execute("DELETE FROM drift_events WHERE resource_type = %s", (TABLE,))
+        # severity 'info' keeps the benchmark from opening auto-tickets
+        cur.execute("""
+            INSERT INTO drift_rules (resource_type, field_name, severity, description)
+            VALUES (%s, 'status', 'info', 'Benchmark status drift')
+            ON CONFLICT (resource_type, field_name) DO UPDATE SET severity = 'info', enabled = TRUE
+        """, (TABLE,))
+    conn.commit()
+
+
+def _records(n: int, generation: int):
+    """Synthetic rows; generation 2 flips 5 % of statuses and drops 1 %."""
+    rows = []
+    for i in range(n):
+        if generation > 1 and i % 100 == 0:
+            continue
+        status = "ACTIVE"
+        if generation > 1 and i % 20 == 1:
+            status = "SHUTOFF"
+        rows.append({
+            "id": f"item-{i:07d}",
+            "name": f"item-{i}",
+            "project_id": f"proj-{i % 600}",
+            "status": status,
+            "size_gb": 10 + i % 500,
+            "created_at": "2026-01-01T00:00:00+00:00",
+            "raw_json": '{"id": "item-%d", "status": "%s"}' % (i, status),
+        })
+    return rows
+
+
+def _snapshot(conn):
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT bench_item_id, change_hash FROM {HISTORY}")
+        history = sorted(cur.fetchall())
+        cur.execute("""
+            SELECT resource_id, field_changed, old_value, new_value
+            FROM drift_events WHERE resource_type = %s
+        """, (TABLE,))
+        drift = sorted(cur.fetchall())
+    return history, drift
+
+
+def run_mode(conn, mode: str, n: int):
+    _reset_schema(conn)
+    timings = []
+    for label, generation in (("initial load", 0), ("no-change rerun", 1), ("churn run", 2)):
+        records = _records(n, generation)
+        started = time.perf_counter()
+        db_writer._upsert_with_history(conn, TABLE, records, "id", mode=mode)
+        conn.commit()
+        timings.append((label, time.perf_counter() - started))
+    return timings, _snapshot(conn)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--modes", default="row,set")
+    args = parser.parse_args()
+
+    conn = db_writer.db_connect()
+    results = {}
+    try:
+        for mode in args.modes.split(","):
+            results[mode] = run_mode(conn, mode, args.rows)
+    finally:
+        with conn.cursor() as cur:
+            cur.execute(f"DROP TABLE IF EXISTS {HISTORY}")
+            cur.execute(f"DROP TABLE IF EXISTS {TABLE}")
+            cur.execute("DELETE FROM drift_events WHERE resource_type = %s", (TABLE,))
+            cur.execute("DELETE FROM drift_rules WHERE resource_type = %s", (TABLE,))
+        conn.commit()
+        conn.close()
+
+    print(f"{'phase':<18}" + "".join(f"{m:>12}" for m in results))
+    phases = [label for label, _ in next(iter(results.values()))[0]]
+    for idx, label in enumerate(phases):
+        print(f"{label:<18}" + "".join(f"{results[m][0][idx][1]:>11.2f}s" for m in results))
+
+    snapshots = [snap for _, snap in results.values()]
+    history, drift = snapshots[0]
+    print(f"\nhistory rows: {len(history)}   drift events: {len(drift)}")
+    if any(snap != snapshots[0] for snap in snapshots[1:]):
+        print("MISMATCH: modes produced different history/drift output")
+        return 1
+    print("history and drift_events identical across modes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
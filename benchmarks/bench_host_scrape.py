@@ -0,0 +1,145 @@
+"""
+bench_host_scrape.py — cycle time of HostMetricsCollector.collect_all_metrics
+versus host count, against local fake exporters.
+
+Every fake host is a loopback address (127.0.0.N, Linux routes the whole
+127/8 block to lo) serving a node_exporter and a libvirt exporter payload
+after ``--latency`` seconds.  ``--slow`` hosts answer after ``--slow-latency``
+instead, to show the per-host deadline capping the cycle.
+
+For each host count the collector runs once with concurrency 1 (the old
+serial behaviour, apart from the two exporters of one host overlapping) and
+once with ``--concurrency``:
+
+    python benchmarks/bench_host_scrape.py --hosts 10,50,100,200 --latency 0.05
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import host_metrics_collector  # noqa: E402
+
+VMS_PER_HOST = 20
+
+NODE_TEXT = "".join(
+    f'node_cpu_seconds_total{{cpu="{c}",mode="{m}"}} {v}\n'
+    for c in range(32) for m, v in (("idle", 9000), ("user", 700), ("system", 300))
+) + (
+    "node_memory_MemTotal_bytes 274877906944\n"
+    "node_memory_MemAvailable_bytes 137438953472\n"
+    'node_filesystem_size_bytes{device="/dev/sda1",mountpoint="/"} 1099511627776\n'
+    'node_filesystem_avail_bytes{device="/dev/sda1",mountpoint="/"} 549755813888\n'
+    'node_network_receive_bytes_total{device="bond0"} 123456789\n'
+    'node_network_transmit_bytes_total{device="bond0"} 987654321\n'
+)
+
+
+def _libvirt_text(host):
+    lines = []
+    for i in range(VMS_PER_HOST):
+        dom = f"{host}-{i:04d}"
+        lines.append(
+            f'libvirt_domain_info_meta{{domain="{dom}",instance_name="vm-{i}",'
+            f'project_name="bench",user_name="admin@default",flavor="m1.large"}} 1'
+        )
+        lines.append(f'libvirt_domain_info_virtual_cpus{{domain="{dom}"}} 4')
+        lines.append(f'libvirt_domain_vcpu_time_seconds_total{{domain="{dom}",vcpu="0"}} {1000 + i}')
+        lines.append(f'libvirt_domain_info_maximum_memory_bytes{{domain="{dom}"}} 8589934592')
+        lines.append(f'libvirt_domain_info_memory_usage_bytes{{domain="{dom}"}} 4294967296')
+        lines.append(f'libvirt_domain_block_stats_capacity_bytes{{domain="{dom}",target_device="vda"}} 42949672960')
+        lines.append(f'libvirt_domain_block_stats_allocation{{domain="{dom}",target_device="vda"}} 10737418240')
+    return "\n".join(lines) + "\n"
+
+
+async def _start_exporters(hosts, latency, slow, slow_latency, base_port):
+    node_port, libvirt_port = base_port, base_port + 1
+    libvirt_payloads = {h: _libvirt_text(h) for h in hosts}
+
+    async def handle(request):
+        host, _, port = request.host.partition(":")
+        await asyncio.sleep(slow_latency if host in slow else latency)
+        if int(port) == node_port:
+            return web.Response(text=NODE_TEXT)
+        return web.Response(text=libvirt_payloads[host])
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    for host in hosts:
+        for port in (node_port, libvirt_port):
+            await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+async def _cycle(hosts, concurrency, deadline, base_port):
+    os.environ.update({
+        "PF9_HOSTS": ",".join(hosts),
+        "PF9_HOST_MAP": ",".join(f"{h}:bench-{n}" for n, h in enumerate(hosts)),
+        "PF9_NODE_EXPORTER_PORT": str(base_port),
+        "PF9_LIBVIRT_EXPORTER_PORT": str(base_port + 1),
+        "PF9_SCRAPE_CONCURRENCY": str(concurrency),
+        "PF9_HOST_DEADLINE_SECONDS": str(deadline),
+    })
+    os.environ.pop("PF9_REGION_ID", None)
+    os.environ.pop("PF9_DU_FQDN", None)
+    # The collector logs every host and VM; keep the benchmark output readable.
+    with contextlib.redirect_stdout(io.StringIO()):
+        collector = host_metrics_collector.HostMetricsCollector()
+        started = time.perf_counter()
+        host_data, vm_data = await collector.collect_all_metrics()
+        elapsed = time.perf_counter() - started
+    return elapsed, len(host_data), len(vm_data), collector.last_cycle
+
+
+async def _bench(args):
+    counts = [int(n) for n in args.hosts.split(",")]
+    all_hosts = [f"127.0.{1 + i // 250}.{2 + i % 250}" for i in range(max(counts))]
+    slow = set(all_hosts[:args.slow])
+    runner = await _start_exporters(all_hosts, args.latency, slow, args.slow_latency, args.base_port)
+    print(f"latency {args.latency * 1000:.0f} ms/exporter, {len(slow)} slow host(s) at "
+          f"{args.slow_latency:g}s, deadline {args.deadline:g}s, {VMS_PER_HOST} VMs/host")
+    print(f"{'hosts':>6} {'serial s':>10} {'conc=' + str(args.concurrency) + ' s':>10} "
+          f"{'speedup':>8} {'timeouts':>9} {'p50 host s':>11} {'max host s':>11}")
+    try:
+        for n in counts:
+            hosts = all_hosts[:n]
+            serial, *_ = await _cycle(hosts, 1, args.deadline, args.base_port)
+            fast, n_hosts, n_vms, cycle = await _cycle(hosts, args.concurrency, args.deadline, args.base_port)
+            per_host = sorted(t["seconds"] for t in cycle["hosts"].values())
+            print(f"{n:>6} {serial:>10.2f} {fast:>10.2f} {serial / fast:>7.1f}x "
+                  f"{len(cycle['timed_out_hosts']):>9} {per_host[len(per_host) // 2]:>11.3f} "
+                  f"{per_host[-1]:>11.3f}")
+            assert n_hosts == n - len(cycle["timed_out_hosts"]), (n, n_hosts)
+            assert n_vms == n_hosts * VMS_PER_HOST, (n, n_vms)
+    finally:
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--hosts", default="10,50,100,200", help="comma-separated host counts")
+    parser.add_argument("--latency", type=float, default=0.05, help="per-exporter response delay (s)")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--deadline", type=float, default=2.0, help="per-host deadline (s)")
+    parser.add_argument("--slow", type=int, default=1, help="number of hosts that exceed the deadline")
+    parser.add_argument("--slow-latency", type=float, default=10.0)
+    parser.add_argument("--base-port", type=int, default=19388,
+                        help="node exporter port; libvirt exporter uses base + 1")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)  # the collector keeps its cache/CPU state under ./monitoring/cache
+        asyncio.run(_bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""
+bench_ldap_sync.py — ldap_sync_worker run time for a large directory.
+
+Runs ``_run_sync_inner`` against in-memory fakes of the external directory,
+the internal OpenLDAP and Postgres.  Every LDAP operation and SQL statement
+sleeps ``--rtt`` seconds to stand in for a network round-trip, since that,
+not Python, is what a sync spends its time on.  Three runs are timed:
+
+  legacy   the old per-user loop (an internal exists search, an attribute
+           search and a role UPDATE per user)
+  full     the paged, preloaded, diffed sync with nothing to change
+  delta    the same after 1% of the users were modified
+
+    python benchmarks/bench_ldap_sync.py --users 50000 --rtt 0.0005
+
+The legacy loop is extrapolated from ``--legacy-sample`` users so the
+benchmark itself finishes in seconds.
+"""
+import argparse
+import importlib.util
+import os
+import signal
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from ldap.controls import SimplePagedResultsControl
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)  # the worker imports shared.worker_telemetry
+
+_spec = importlib.util.spec_from_file_location(
+    "ldap_sync_worker_main", os.path.join(ROOT, "ldap_sync_worker", "main.py")
+)
+ldap_sync = importlib.util.module_from_spec(_spec)
+_handlers = {sig: signal.getsignal(sig) for sig in (signal.SIGINT, signal.SIGTERM)}
+_spec.loader.exec_module(ldap_sync)
+for _sig, _handler in _handlers.items():
+    signal.signal(_sig, _handler)
+
+CONFIG_ID = 1
+GROUPS = {"CN=pf9-admins,dc=corp": "admin", "CN=pf9-ops,dc=corp": "operator"}
+DC_SERVICE_NAME = "CN=NTDS Settings,CN=DC1,CN=Servers,CN=Default-First-Site-Name,CN=Sites,CN=Configuration,dc=corp"
+
+
+class _Counter:
+    def __init__(self, rtt):
+        self.rtt = rtt
+        self.trips = 0
+
+    def trip(self):
+        self.trips += 1
+        if self.rtt:
+            time.sleep(self.rtt)
+
+
+class FakeDirectory:
+    """External AD: users with uSNChanged, paged searches, a rootDSE."""
+
+    def __init__(self, counter, users):
+        self.counter = counter
+        self.usn = users
+        self.entries = {}
+        for i in range(users):
+            self.entries[f"user{i:06d}"] = {
+                "usn": i + 1, "mail": f"user{i}@corp.example", "cn": f"User {i}",
+                "groups": [list(GROUPS)[i % 2]],
+            }
+        self._pending = {}
+        self._results = {}
+
+    def modify(self, uids):
+        for uid in uids:
+            self.usn += 1
+            self.entries[uid].update(usn=self.usn, cn=self.entries[uid]["cn"] + " (moved)")
+
+    def _attrs(self, uid, e, attrlist):
+        attrs = {"sAMAccountName": [uid.encode()]}
+        if "mail" in attrlist:
+            attrs.update(mail=[e["mail"].encode()], displayName=[e["cn"].encode()],
+                         memberOf=[g.encode() for g in e["groups"]])
+        return attrs
+
+    def _match(self, filterstr):
+        if "uSNChanged>=" in filterstr:
+            floor = int(filterstr.split("uSNChanged>=")[1].split(")")[0])
+            return [(u, e) for u, e in self.entries.items() if e["usn"] >= floor]
+        if "(|(" in filterstr:
+            wanted = {c.split("=")[1] for c in filterstr.split("(|")[1].strip("()").split(")(")}
+            return [(u, e) for u, e in self.entries.items() if u in wanted]
+        return list(self.entries.items())
+
+    def simple_bind_s(self, *args):
+        self.counter.trip()
+
+    def unbind_s(self):
+        pass
+
+    def search_s(self, base, scope, filterstr, attrlist):
+        self.counter.trip()
+        if base == "":
+            return [("", {"highestCommittedUSN": [str(self.usn).encode()],
+                          "dsServiceName": [DC_SERVICE_NAME.encode()]})]
+        return []  # mapped groups unchanged; no invocationId on the NTDS Settings entry
+
+    def search_ext(self, base, scope, filterstr, attrlist, serverctrls):
+        self.counter.trip()
+        ctrl = serverctrls[0]
+        offset = int(ctrl.cookie or 0)
+        if not offset:
+            self._results[filterstr] = self._match(filterstr)
+        rows = self._results[filterstr]
+        msgid = len(self._pending)
+        self._pending[msgid] = (rows[offset:offset + ctrl.size], attrlist,
+                                offset + ctrl.size if offset + ctrl.size < len(rows) else None)
+        return msgid
+
+    def result3(self, msgid):
+        rows, attrlist, next_offset = self._pending.pop(msgid)
+        cookie = str(next_offset).encode() if next_offset else b""
+        data = [(f"CN={u},dc=corp", self._attrs(u, e, attrlist)) for u, e in rows]
+        return None, data, msgid, [SimplePagedResultsControl(True, size=0, cookie=cookie)]
+
+
+class FakeInternal(FakeDirectory):
+    """Internal OpenLDAP pre-populated with the same users."""
+
+    def __init__(self, counter, directory):
+        self.counter = counter
+        self._pending = {}
+        self._results = {}
+        self.entries = {u: dict(e) for u, e in directory.entries.items()}
+
+    def _attrs(self, uid, e, attrlist):
+        return {"uid": [uid.encode()], "cn": [e["cn"].encode()], "mail": [e["mail"].encode()]}
+
+    def search_s(self, base, scope, filterstr, attrlist):
+        self.counter.trip()
+        uid = filterstr[len("(uid="):-1]
+        e = self.entries.get(uid)
+        return [(f"uid={uid},ou=users", self._attrs(uid, e, attrlist))] if e else []
+
+    def modify_s(self, dn, mods):
+        self.counter.trip()
+
+    def add_s(self, dn, modlist):
+        self.counter.trip()
+
+
+class _Cursor:
+    def __init__(self, db):
+        self.db = db
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.db.counter.trip()
+        self.rows = self.db.respond(" ".join(sql.split()))
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self):
+        return list(self.rows)
+
+
+class FakeDB:
+    def __init__(self, counter, directory, cfg):
+        self.counter = counter
+        self.cfg = cfg
+        self.roles = [
+            {"username": u, "role": GROUPS[e["groups"][0]], "sync_config_id": CONFIG_ID,
+             "locally_overridden": False, "is_active": True, "department_id": None}
+            for u, e in directory.entries.items()
+        ]
+
+    def cursor(self, cursor_factory=None):
+        return _Cursor(self)
+
+    def commit(self):
+        pass
+
+    def respond(self, sql):
+        if sql.startswith("SELECT name, host"):
+            return [dict(self.cfg)]
+        if sql.startswith("INSERT INTO ldap_sync_log"):
+            return [{"id": 1}]
+        if sql.startswith("SELECT external_group_dn, pf9_role"):
+            return [{"external_group_dn": g, "pf9_role": r} for g, r in GROUPS.items()]
+        if sql.startswith("SELECT username, role"):
+            return self.roles
+        if sql.startswith("SELECT locally_overridden"):
+            return [{"locally_overridden": False}]
+        return []
+
+
+def _execute_values(cur, sql, argslist, template=None, page_size=100):
+    cur.execute(sql)
+
+
+def _legacy_user(int_conn, db, uid, role):
+    """Round-trips the old loop made for an existing user."""
+    int_conn.search_s("ou=users", 2, f"(uid={uid})", ["dn"])          # _user_exists_internal
+    int_conn.search_s("ou=users", 2, f"(uid={uid})", ["cn", "mail"])  # _update_user_internal
+    with db.cursor() as cur:
+        cur.execute("UPDATE user_roles SET role = %s", (role, uid, CONFIG_ID))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--rtt", type=float, default=0.0005, help="seconds per round-trip")
+    parser.add_argument("--changed", type=float, default=0.01, help="fraction modified before delta")
+    parser.add_argument("--legacy-sample", type=int, default=2000)
+    args = parser.parse_args()
+
+    ldap_sync.log.disabled = True
+    ldap_sync.psycopg2.extras.execute_values = _execute_values
+    ldap_sync._host_allowed = lambda host, allow: True
+    ldap_sync._fernet_decrypt = lambda stored: "secret"
+    ldap_sync._publish_auth_invalidation = lambda: None
+
+    counter = _Counter(args.rtt)
+    directory = FakeDirectory(counter, args.users)
+    internal = FakeInternal(counter, directory)
+    cfg = {
+        "name": "bench", "host": "ad.corp", "port": 636, "bind_dn": "svc",
+        "bind_password_enc": "fernet:x", "base_dn": "dc=corp",
+        "user_search_filter": "(objectClass=user)", "user_attr_uid": "sAMAccountName",
+        "user_attr_mail": "mail", "user_attr_fullname": "displayName",
+        "use_tls": True, "use_starttls": False, "verify_tls_cert": True, "ca_cert_pem": None,
+        "allow_private_network": True, "conflict_strategy": "ldap_wins",
+        "last_sync_at": None, "sync_watermark": None, "sync_watermark_kind": None,
+        "sync_watermark_source": None, "sync_fingerprint": None, "last_full_sync_at": None,
+    }
+    db = FakeDB(counter, directory, cfg)
+    ldap_sync._open_external_conn = lambda c: directory
+    ldap_sync._internal_ldap_conn = lambda: internal
+
+    sample = min(args.legacy_sample, args.users)
+    counter.trips = 0
+    t0 = time.perf_counter()
+    for i in range(sample):
+        _legacy_user(internal, db, f"user{i:06d}", "viewer")
+    legacy = (time.perf_counter() - t0) * args.users / sample
+    legacy_trips = counter.trips * args.users // sample
+
+    now = datetime.now(timezone.utc)
+    counter.trips = 0
+    t0 = time.perf_counter()
+    ldap_sync._run_sync_inner(db, CONFIG_ID, now)
+    full = time.perf_counter() - t0
+    full_trips = counter.trips
+
+    # What the full run stored on the config
+    cfg.update(
+        last_sync_at=now, sync_watermark=str(directory.usn), sync_watermark_kind="usn",
+        sync_watermark_source=DC_SERVICE_NAME,
+        sync_fingerprint=ldap_sync._config_fingerprint(cfg, GROUPS, {}),
+        last_full_sync_at=now - timedelta(minutes=5),
+    )
+    directory.modify([f"user{i:06d}" for i in range(0, args.users, max(1, int(1 / args.changed)))])
+    counter.trips = 0
+    t0 = time.perf_counter()
+    ldap_sync._run_sync_inner(db, CONFIG_ID, now)
+    delta = time.perf_counter() - t0
+    delta_trips = counter.trips
+
+    print(f"{args.users} users, {args.rtt * 1000:.1f} ms per round-trip, page size {ldap_sync.PAGE_SIZE}")
+    print(f"{'mode':<8} {'seconds':>9} {'round-trips':>12}")
+    print(f"{'legacy':<8} {legacy:>9.2f} {legacy_trips:>12}  (extrapolated from {sample} users)")
+    print(f"{'full':<8} {full:>9.2f} {full_trips:>12}")
+    print(f"{'delta':<8} {delta:>9.2f} {delta_trips:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+bench_log_query.py — /api/logs latency on a large log file.
+
+Writes ``--mb`` megabytes of JSONFormatter lines to a temp dir and times
+three queries the way the old handler answered them (readlines, json.loads
+every line, filter, sort) and through ``log_query.query_logs``:
+
+  tail     the latest ``--limit`` entries, no filters (the UI's 5 s poll)
+  level    the latest ERROR entries (sparse: 1 line in 200)
+  window   a 10-minute window near the start of the file
+
+    python benchmarks/bench_log_query.py --mb 200 --limit 100
+
+Each query is run twice through query_logs; the second run shows the cost
+once the sidecar index exists.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "api"))
+
+import log_query  # noqa: E402
+from log_query import LogFilter, query_logs  # noqa: E402
+
+T0 = datetime(2026, 6, 1)
+
+
+def _write(path, mb):
+    target = mb * 1024 * 1024
+    i = 0
+    with open(path, "w") as fh:
+        while fh.tell() < target:
+            block = []
+            for _ in range(10000):
+                level = "ERROR" if i % 200 == 0 else "INFO"
+                ts = (T0 + timedelta(milliseconds=50 * i)).isoformat() + "Z"
+                block.append(json.dumps({
+                    "timestamp": ts, "level": level, "logger": "pf9_api",
+                    "message": f"GET /api/servers 200 request {i}", "module": "main",
+                    "function": "list_servers", "line": 1200,
+                }) + "\n")
+                i += 1
+            fh.writelines(block)
+    return i
+
+
+def _legacy(path, flt, limit):
+    entries = []
+    with open(path) as fh:
+        for line in fh.readlines():
+            entry = json.loads(line)
+            ts = log_query.parse_timestamp(entry["timestamp"])
+            if flt.matches(entry, ts):
+                entries.append((ts, entry))
+    entries.sort(key=lambda pair: pair[0], reverse=True)
+    return [entry for _, entry in entries[:limit]]
+
+
+def _timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - t0, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--mb", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "pf9_api.log")
+        lines = _write(path, args.mb)
+        start = (T0 + timedelta(hours=1)).replace(tzinfo=timezone.utc)
+        queries = {
+            "tail": LogFilter(),
+            "level": LogFilter(level="ERROR"),
+            "window": LogFilter(since=start, until=start + timedelta(minutes=10)),
+        }
+        print(f"{args.mb} MB, {lines} lines, limit {args.limit}")
+        print(f"{'query':<8} {'legacy s':>9} {'cold s':>8} {'warm s':>8}")
+        for name, flt in queries.items():
+            legacy, expected = _timed(_legacy, path, flt, args.limit)
+            cold, (got, _) = _timed(query_logs, {"pf9_api": path}, flt, args.limit)
+            warm, _ = _timed(query_logs, {"pf9_api": path}, flt, args.limit)
+            assert [e["message"] for e in got] == [e["message"] for e in expected], name
+            print(f"{name:<8} {legacy:>9.2f} {cold:>8.3f} {warm:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
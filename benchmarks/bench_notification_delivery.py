@@ -0,0 +1,128 @@
+"""
+bench_notification_delivery.py — notification worker email throughput against
+a local aiosmtpd server.
+
+``--emails`` messages are sent twice: once the way the worker used to do it
+(a new SMTP connection, EHLO and login per message, one after another) and
+once through the worker's OutboundQueue (``--workers`` threads, each reusing
+one pooled session).  On loopback a handshake costs almost nothing, so the
+server sleeps ``--handshake-latency`` seconds per EHLO to stand in for the
+TCP + STARTTLS + AUTH round-trips to a real relay:
+
+    pip install aiosmtpd
+    python benchmarks/bench_notification_delivery.py --emails 500 --workers 4
+
+The rate limit is off unless ``--rate`` is given.
+"""
+import argparse
+import asyncio
+import importlib.util
+import os
+import smtplib
+import socket
+import time
+from email.mime.text import MIMEText
+
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_spec = importlib.util.spec_from_file_location(
+    "notifications_main", os.path.join(ROOT, "notifications", "main.py")
+)
+notif_main = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(notif_main)
+
+
+class _Handler:
+    def __init__(self, handshake_latency: float):
+        self.handshake_latency = handshake_latency
+        self.received = 0
+        self.sessions = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        await asyncio.sleep(self.handshake_latency)
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 OK"
+
+
+def _authenticator(server, session, envelope, mechanism, auth_data):
+    return AuthResult(success=True)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _legacy_send(cfg: dict, to_address: str, body: str) -> None:
+    msg = MIMEText(body, "html")
+    msg["From"] = cfg["from_address"]
+    msg["To"] = to_address
+    msg["Subject"] = "bench"
+    with smtplib.SMTP(cfg["host"], cfg["port"], timeout=30) as server:
+        server.ehlo()
+        if cfg["username"]:
+            server.login(cfg["username"], cfg["password"])
+        server.sendmail(cfg["from_address"], [to_address], msg.as_string())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--emails", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=notif_main.SMTP_SEND_WORKERS)
+    parser.add_argument("--rate", type=float, default=0.0, help="messages/s, 0 = unlimited")
+    parser.add_argument("--handshake-latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    handler = _Handler(args.handshake_latency)
+    controller = Controller(
+        handler, hostname="127.0.0.1", port=_free_port(),
+        authenticator=_authenticator, auth_require_tls=False,
+    )
+    controller.start()
+    try:
+        cfg = {
+            "enabled": True, "host": "127.0.0.1", "port": controller.port,
+            "use_tls": False, "username": "bench", "password": "bench",
+            "from_address": "pf9@example.com", "from_name": "PF9",
+        }
+        notif_main.get_smtp_config = lambda conn=None: cfg
+        notif_main.logger.disabled = True
+        body = "\n".join(f"<p>line {i}: " + "x" * 60 + "</p>" for i in range(40))
+        recipients = [f"user{i % 30}@example.com" for i in range(args.emails)]
+
+        t0 = time.perf_counter()
+        for to in recipients:
+            _legacy_send(cfg, to, body)
+        legacy = time.perf_counter() - t0
+        legacy_sessions = handler.sessions
+
+        handler.sessions = 0
+        queue = notif_main.OutboundQueue(workers=args.workers, per_second=args.rate)
+        t0 = time.perf_counter()
+        futures = [queue.submit(to, "bench", body) for to in recipients]
+        ok = sum(f.result() for f in futures)
+        pooled = time.perf_counter() - t0
+        notif_main._smtp_sessions.close_all()
+
+        assert ok == args.emails, f"{args.emails - ok} pooled sends failed"
+        print(f"{args.emails} emails, {args.handshake_latency * 1000:.0f} ms per handshake, "
+              f"{args.workers} workers")
+        print(f"{'mode':<10} {'seconds':>8} {'msgs/s':>8} {'sessions':>9}")
+        print(f"{'legacy':<10} {legacy:>8.2f} {args.emails / legacy:>8.0f} {legacy_sessions:>9}")
+        print(f"{'pooled':<10} {pooled:>8.2f} {args.emails / pooled:>8.0f} {handler.sessions:>9}")
+        print(f"speed-up {legacy / pooled:.1f}x, server received {handler.received} messages")
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main()
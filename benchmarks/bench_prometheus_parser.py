@@ -0,0 +1,207 @@
+"""
+bench_prometheus_parser.py — the collector and monitoring exporter parsers
+(built on shared/prometheus_text.py) on the recorded fixtures in
+tests/fixtures/, optionally against an earlier revision.
+
+The libvirt fixture (6 domains) is scaled to ``--domains`` by cloning every
+per-domain sample with a new domain id, which keeps the family layout, label
+widths and HELP/TYPE comments of a real libvirt exporter; the node_exporter
+fixture is scaled to ``--cpus``.  Each parser runs two cycles per repeat so
+the CPU delta paths are exercised too.
+
+``--baseline REV`` also loads host_metrics_collector.py and
+monitoring/prometheus_client.py as of git revision REV (with ``git show``),
+checks that both produce the same output, and times them side by side.
+
+    python benchmarks/bench_prometheus_parser.py --domains 400 --repeat 5
+    python benchmarks/bench_prometheus_parser.py --baseline <rev>
+"""
+import argparse
+import contextlib
+import io
+import os
+import re
+import subprocess
+import sys
+import time
+import tracemalloc
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "monitoring"))  # models, prometheus_client
+
+import host_metrics_collector  # noqa: E402
+import prometheus_client  # noqa: E402  (monitoring/prometheus_client.py)
+from shared.prometheus_text import parse_libvirt_exporter, parse_node_exporter  # noqa: E402
+
+FIXTURES = os.path.join(ROOT, "tests", "fixtures")
+HOST = "10.0.0.1"
+_DOMAIN_RE = re.compile(r'domain="([^"]*)"')
+
+
+def _read(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def scale_libvirt(text, domains):
+    """Clone the fixture's per-domain samples until ``domains`` domains exist."""
+    recorded = len({m.group(1) for m in _DOMAIN_RE.finditer(text)})
+    copies = max(1, -(-domains // recorded))
+    out = []
+    for line in text.splitlines():
+        if line.startswith("#") or 'domain="' not in line:
+            out.append(line)
+            continue
+        for k in range(copies):
+            out.append(_DOMAIN_RE.sub(lambda m: f'domain="{m.group(1)}-{k:04d}"', line, count=1))
+    return "\n".join(out) + "\n"
+
+
+def scale_node(text, cpus):
+    """Replace the fixture's per-CPU samples with ``cpus`` CPUs (cpu 0 cloned)."""
+    out = []
+    for line in text.splitlines():
+        if line.startswith('node_cpu_seconds_total{cpu="0",'):
+            out.extend(line.replace('cpu="0"', f'cpu="{c}"', 1) for c in range(cpus))
+        elif not line.startswith("node_cpu_seconds_total{"):
+            out.append(line)
+    return "\n".join(out) + "\n"
+
+
+def _baseline_module(rev, path):
+    """*path* (relative to the repo root) as of git revision *rev*, as a module."""
+    source = subprocess.run(["git", "-C", ROOT, "show", f"{rev}:{path}"],
+                            check=True, capture_output=True, text=True).stdout
+    module = types.ModuleType(f"_baseline_{os.path.basename(path)[:-3]}")
+    module.__file__ = os.path.join(ROOT, path)
+    exec(compile(source, f"{rev}:{path}", "exec"), module.__dict__)
+    return module
+
+
+def _collector_factory(module):
+    def make():
+        c = object.__new__(module.HostMetricsCollector)
+        c.ip_to_hostname = {HOST: "hv-01"}
+        c._prev_cpu_totals = {}
+        c._prev_vm_cpu_totals = {}
+        return c
+    return make
+
+
+def _monitoring_factory(module):
+    def make():
+        c = object.__new__(module.PrometheusClient)
+        c._prev_cpu_totals = {}
+        return c
+    return make
+
+
+def _normalize(obj):
+    if hasattr(obj, "model_dump"):
+        obj = obj.model_dump()
+    elif hasattr(obj, "dict") and not isinstance(obj, dict):
+        obj = obj.dict()
+    if isinstance(obj, dict):
+        return {k: _normalize(v) for k, v in obj.items() if k != "timestamp"}
+    if isinstance(obj, list):
+        return [_normalize(v) for v in obj]
+    return obj
+
+
+def _diff(old, new):
+    """Mismatching fields, ignoring names the old parser cut at an escaped quote."""
+    old, new = _normalize(old), _normalize(new)
+    if isinstance(old, dict):
+        old, new = [old], [new]
+    if len(old) != len(new):
+        return [("len", len(old), len(new))]
+    out = []
+    for a, b in zip(old, new):
+        for key in set(a) | set(b):
+            if a.get(key) == b.get(key):
+                continue
+            if key == "vm_name" and str(a.get(key)).endswith("\\"):
+                continue  # old parsers cut 'db \"primary\"' to 'db \'
+            out.append((key, a.get(key), b.get(key)))
+    return out
+
+
+def _time(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _peak_kib(fn):
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def _two_cycles(factory, method, text):
+    def run():
+        obj = factory()
+        with contextlib.redirect_stdout(io.StringIO()):
+            getattr(obj, method)(text, HOST)
+            return getattr(obj, method)(text, HOST)
+    return run
+
+
+def _cases(collector, monitoring, libvirt, node):
+    return [
+        ("collector VMs", _two_cycles(collector, "parse_vm_metrics", libvirt)),
+        ("monitoring VMs", _two_cycles(monitoring, "_parse_vm_metrics_libvirt", libvirt)),
+        ("collector host", _two_cycles(collector, "parse_host_metrics", node)),
+        ("monitoring host", _two_cycles(monitoring, "_parse_host_metrics_node", node)),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--domains", type=int, default=400, help="libvirt domains per payload")
+    parser.add_argument("--cpus", type=int, default=128, help="CPUs in the node_exporter payload")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", metavar="REV",
+                        help="also run the parsers of this git revision")
+    args = parser.parse_args()
+
+    libvirt = scale_libvirt(_read("libvirt_exporter.prom"), args.domains)
+    node = scale_node(_read("node_exporter.prom"), args.cpus)
+    current = _cases(_collector_factory(host_metrics_collector),
+                     _monitoring_factory(prometheus_client), libvirt, node)
+    baseline = [None] * len(current)
+    if args.baseline:
+        baseline = [fn for _, fn in _cases(
+            _collector_factory(_baseline_module(args.baseline, "host_metrics_collector.py")),
+            _monitoring_factory(_baseline_module(args.baseline, "monitoring/prometheus_client.py")),
+            libvirt, node)]
+        for (label, new), old in zip(current, baseline):
+            mismatches = _diff(old(), new())
+            if mismatches:
+                raise SystemExit(f"{label}: outputs differ from {args.baseline}: {mismatches[:5]}")
+
+    print(f"libvirt payload {len(libvirt) / 1e6:.2f} MB ({args.domains} domains), "
+          f"node payload {len(node) / 1e3:.0f} kB ({args.cpus} CPUs); best of {args.repeat}, 2 cycles each")
+    print(f"{'case':<18} {'baseline ms':>12} {'ms':>8} {'speedup':>8} {'baseline KiB':>13} {'peak KiB':>9}")
+    for (label, new), old in zip(current, baseline):
+        t_new = _time(new, args.repeat)
+        if old is None:
+            print(f"{label:<18} {'':>12} {t_new * 1000:>8.1f} {'':>8} {'':>13} {_peak_kib(new):>9.0f}")
+            continue
+        t_old = _time(old, args.repeat)
+        print(f"{label:<18} {t_old * 1000:>12.1f} {t_new * 1000:>8.1f} {t_old / t_new:>7.1f}x "
+              f"{_peak_kib(old):>13.0f} {_peak_kib(new):>9.0f}")
+    raw_vm = _time(lambda: parse_libvirt_exporter(libvirt), args.repeat)
+    raw_node = _time(lambda: parse_node_exporter(node), args.repeat)
+    print(f"shared parser alone: libvirt {raw_vm * 1000:.1f} ms, node {raw_node * 1000:.2f} ms (one cycle)")
+
+
+if __name__ == "__main__":
+    main()
@@ -190,7 +190,8 @@ CREATE TABLE IF NOT EXISTS snapshots (
     created_at    TIMESTAMPTZ,
     updated_at    TIMESTAMPTZ,
     raw_json      JSONB,
-    last_seen_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+    last_seen_at  TIMESTAMPTZ NOT NULL DEFAULT now(),
+    changed_at    TIMESTAMPTZ               -- DB clock; set by trg_snapshots_set_changed_at
 );
 -- B9.1: project-scoped listing and volume lookup
 CREATE INDEX IF NOT EXISTS idx_snapshots_project_created ON snapshots(project_id, created_at DESC);
@@ -2521,10 +2522,16 @@ CREATE TABLE IF NOT EXISTS runbook_executions (
     error_message   TEXT,
     items_found     INTEGER     NOT NULL DEFAULT 0,
     items_actioned  INTEGER     NOT NULL DEFAULT 0,
-    created_at      TIMESTAMPTZ NOT NULL DEFAULT now()
+    created_at      TIMESTAMPTZ NOT NULL DEFAULT now(),
+    queued_at       TIMESTAMPTZ,
+    worker_id       TEXT,
+    heartbeat_at    TIMESTAMPTZ,
+    cancel_requested BOOLEAN    NOT NULL DEFAULT false,
+    progress        JSONB       NOT NULL DEFAULT '{}'
 );
 
 CREATE INDEX IF NOT EXISTS idx_rbe_runbook   ON runbook_executions(runbook_name);
+CREATE INDEX IF NOT EXISTS idx_rbe_queued    ON runbook_executions(id) WHERE status = 'queued';
 CREATE INDEX IF NOT EXISTS idx_rbe_status    ON runbook_executions(status);
 CREATE INDEX IF NOT EXISTS idx_rbe_trigger   ON runbook_executions(triggered_by);
 CREATE INDEX IF NOT EXISTS idx_rbe_created   ON runbook_executions(created_at DESC);
@@ -3095,7 +3102,10 @@ CREATE TABLE IF NOT EXISTS search_indexer_state (
     last_indexed_at TIMESTAMPTZ NOT NULL DEFAULT '1970-01-01T00:00:00Z',
     docs_count      INTEGER NOT NULL DEFAULT 0,
     last_run_at     TIMESTAMPTZ,
-    last_run_duration_ms INTEGER
+    last_run_duration_ms INTEGER,
+    full_reindex_at TIMESTAMPTZ,
+    full_reindex_duration_ms INTEGER,
+    full_reindex_docs INTEGER
 );
 
 INSERT INTO search_indexer_state (doc_type) VALUES
@@ -4017,6 +4027,65 @@ CREATE TABLE IF NOT EXISTS sla_compliance_monthly (
 CREATE INDEX IF NOT EXISTS idx_sla_compliance_tenant
     ON sla_compliance_monthly(tenant_id, month DESC);
 
+-- ---------------------------------------------------------------------------
+-- sla_kpi_daily — month-to-date partial aggregates per tenant per day
+-- Written by sla_worker; sla_compliance_monthly is rolled up from these rows.
+-- Days follow the same attribution as the monthly KPIs: snapshot and ticket
+-- created_at, restore started_at.
+-- ---------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS sla_kpi_daily (
+    tenant_id       TEXT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    day             DATE NOT NULL,
+    rto_max_hours   DOUBLE PRECISION,          -- worst succeeded restore started that day
+    rpo_max_hours   DOUBLE PRECISION,          -- worst gap ending at a snapshot that day
+    mtta_sum_hours  DOUBLE PRECISION,
+    mtta_count      INTEGER NOT NULL DEFAULT 0,
+    mttr_sum_hours  DOUBLE PRECISION,
+    mttr_count      INTEGER NOT NULL DEFAULT 0,
+    backups_good    INTEGER NOT NULL DEFAULT 0,
+    backups_total   INTEGER NOT NULL DEFAULT 0,
+    computed_at     TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (tenant_id, day)
+);
+
+-- ---------------------------------------------------------------------------
+-- sla_kpi_watermarks — per tenant and month, the time up to which source-row
+-- changes are already folded into sla_kpi_daily.  finalized = TRUE once the
+-- month has closed and been rebuilt from the source tables.
+-- ---------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS sla_kpi_watermarks (
+    tenant_id   TEXT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    month       DATE NOT NULL,
+    watermark   TIMESTAMPTZ NOT NULL,
+    finalized   BOOLEAN NOT NULL DEFAULT FALSE,
+    updated_at  TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (tenant_id, month)
+);
+
+-- ---------------------------------------------------------------------------
+-- snapshots.changed_at — DB-clock change time the SLA worker compares with
+-- its watermark (snapshots.updated_at is OpenStack's clock).  Set on insert
+-- and when a field the SLA KPIs read changes.
+-- ---------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION snapshots_set_changed_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT'
+       OR (NEW.status, NEW.created_at, NEW.volume_id, NEW.project_id)
+          IS DISTINCT FROM (OLD.status, OLD.created_at, OLD.volume_id, OLD.project_id) THEN
+        NEW.changed_at := clock_timestamp();
+    ELSE
+        NEW.changed_at := OLD.changed_at;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_snapshots_set_changed_at ON snapshots;
+CREATE TRIGGER trg_snapshots_set_changed_at
+    BEFORE INSERT OR UPDATE ON snapshots
+    FOR EACH ROW EXECUTE FUNCTION snapshots_set_changed_at();
+
 -- -------------------------------------------------------------------------
 -- SLA Defense Alerts (v2.16.0)
 -- Proactive SLA-risk alerts derived from SLA commitments + open insights.
@@ -4926,6 +4995,36 @@ CREATE INDEX IF NOT EXISTS idx_pmm_tenant_month
 CREATE INDEX IF NOT EXISTS idx_pmm_month
     ON portfolio_metering_monthly(month DESC);
 
+-- ---------------------------------------------------------------------------
+-- portfolio_metering_hourly — one row per project, flavor and hour of the
+-- open month(s), with one reading per VM per hour.  Written by
+-- metering_worker; portfolio_metering_monthly is rolled up from these rows.
+-- Rows are deleted once their month is finalized.
+-- ---------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS portfolio_metering_hourly (
+    hour            TIMESTAMPTZ NOT NULL,
+    project_name    TEXT        NOT NULL,
+    flavor          TEXT        NOT NULL DEFAULT '',   -- '' when the VM had no flavor
+    vm_count        INTEGER     NOT NULL,
+    vcpus           BIGINT      NOT NULL,
+    ram_mb          BIGINT      NOT NULL,
+    disk_gb         BIGINT      NOT NULL,
+    computed_at     TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (hour, project_name, flavor)
+);
+
+-- ---------------------------------------------------------------------------
+-- portfolio_metering_watermarks — per month, the collected_at up to which
+-- metering_resources rows are folded into portfolio_metering_hourly.
+-- finalized = TRUE once the month has closed; its monthly rows are frozen.
+-- ---------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS portfolio_metering_watermarks (
+    month       DATE        PRIMARY KEY,          -- first day of month
+    watermark   TIMESTAMPTZ NOT NULL,
+    finalized   BOOLEAN     NOT NULL DEFAULT FALSE,
+    updated_at  TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
 -- ─────────────────────────────────────────────────────────────────────────────
 -- v1.99.0: Tenant composite health scores
 -- ─────────────────────────────────────────────────────────────────────────────
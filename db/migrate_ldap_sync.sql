@@ -39,6 +39,13 @@ CREATE TABLE IF NOT EXISTS ldap_sync_config (
     last_sync_status        VARCHAR(50)
                             CHECK (last_sync_status IN ('success','partial','failed')),
     last_sync_users_found   INTEGER,
+    -- Delta sync high-water mark (see migrate_ldap_sync_delta.sql).
+    sync_watermark          TEXT,
+    sync_watermark_kind     VARCHAR(20)
+                            CHECK (sync_watermark_kind IN ('usn','timestamp')),
+    sync_watermark_source   TEXT,
+    sync_fingerprint        TEXT,
+    last_full_sync_at       TIMESTAMPTZ,
     created_at              TIMESTAMPTZ NOT NULL DEFAULT NOW(),
     updated_at              TIMESTAMPTZ NOT NULL DEFAULT NOW(),
     created_by              VARCHAR(255)
@@ -74,12 +81,13 @@ CREATE TABLE IF NOT EXISTS ldap_sync_log (
     finished_at         TIMESTAMPTZ,
     status              VARCHAR(50)
                         CHECK (status IN ('success','partial','failed')),
+    sync_mode           VARCHAR(10) CHECK (sync_mode IN ('full','delta')),
     users_found         INTEGER NOT NULL DEFAULT 0,
     users_created       INTEGER NOT NULL DEFAULT 0,
     users_updated       INTEGER NOT NULL DEFAULT 0,
     users_deactivated   INTEGER NOT NULL DEFAULT 0,
     error_message       TEXT,
-    -- Per-user results array for debugging (only populated on partial/failed runs).
+    -- Per-user results for users that were created, updated, deactivated or failed.
     details             JSONB
 );
 
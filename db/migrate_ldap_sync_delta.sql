@@ -0,0 +1,26 @@
+-- Incremental LDAP sync.
+-- The ldap_sync_worker stores a per-config high-water mark after each run and
+-- on the next run reads only entries changed since then.  sync_watermark holds
+-- AD's highestCommittedUSN (sync_watermark_kind = 'usn') or the newest
+-- modifyTimestamp seen ('timestamp').  USNs are local to each domain
+-- controller, so sync_watermark_source records the DC that issued a 'usn'
+-- watermark (dsServiceName#invocationId); a different DC forces a full sync.
+-- sync_fingerprint hashes the search settings and group/department mappings;
+-- the watermark is only reused while it matches.  last_full_sync_at drives the periodic full resync, and
+-- ldap_sync_log.sync_mode records which kind of run produced a log row.
+
+ALTER TABLE ldap_sync_config
+    ADD COLUMN IF NOT EXISTS sync_watermark      TEXT,
+    ADD COLUMN IF NOT EXISTS sync_watermark_kind VARCHAR(20)
+        CHECK (sync_watermark_kind IN ('usn','timestamp')),
+    ADD COLUMN IF NOT EXISTS sync_watermark_source TEXT,
+    ADD COLUMN IF NOT EXISTS sync_fingerprint    TEXT,
+    ADD COLUMN IF NOT EXISTS last_full_sync_at   TIMESTAMPTZ;
+
+ALTER TABLE ldap_sync_log
+    ADD COLUMN IF NOT EXISTS sync_mode VARCHAR(10)
+        CHECK (sync_mode IN ('full','delta'));
+
+INSERT INTO schema_migrations (filename, applied_at)
+VALUES ('migrate_ldap_sync_delta.sql', NOW())
+ON CONFLICT (filename) DO NOTHING;
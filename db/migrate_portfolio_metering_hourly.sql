@@ -0,0 +1,37 @@
+-- Incremental portfolio metering rollup.
+-- metering_worker keeps hourly partial aggregates for the open month and only
+-- rebuilds hours that received metering_resources rows since the last cycle.
+
+-- ---------------------------------------------------------------------------
+-- portfolio_metering_hourly — one row per project, flavor and hour of the
+-- open month(s), with one reading per VM per hour.  Written by
+-- metering_worker; portfolio_metering_monthly is rolled up from these rows.
+-- Rows are deleted once their month is finalized.
+-- ---------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS portfolio_metering_hourly (
+    hour            TIMESTAMPTZ NOT NULL,
+    project_name    TEXT        NOT NULL,
+    flavor          TEXT        NOT NULL DEFAULT '',   -- '' when the VM had no flavor
+    vm_count        INTEGER     NOT NULL,
+    vcpus           BIGINT      NOT NULL,
+    ram_mb          BIGINT      NOT NULL,
+    disk_gb         BIGINT      NOT NULL,
+    computed_at     TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (hour, project_name, flavor)
+);
+
+-- ---------------------------------------------------------------------------
+-- portfolio_metering_watermarks — per month, the collected_at up to which
+-- metering_resources rows are folded into portfolio_metering_hourly.
+-- finalized = TRUE once the month has closed; its monthly rows are frozen.
+-- ---------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS portfolio_metering_watermarks (
+    month       DATE        PRIMARY KEY,          -- first day of month
+    watermark   TIMESTAMPTZ NOT NULL,
+    finalized   BOOLEAN     NOT NULL DEFAULT FALSE,
+    updated_at  TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+INSERT INTO schema_migrations (filename, applied_at)
+VALUES ('migrate_portfolio_metering_hourly.sql', NOW())
+ON CONFLICT (filename) DO NOTHING;
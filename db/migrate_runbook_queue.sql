@@ -0,0 +1,19 @@
+-- Runbook execution queue.
+-- Triggered and approved executions are set to status 'queued' and run by the
+-- API's runbook worker pool (api/runbook_queue.py) instead of inside the
+-- request handler.  worker_id / heartbeat_at identify the process running an
+-- execution so a dead one can be detected; cancel_requested asks a running
+-- engine to stop; progress holds its last reported step.
+
+ALTER TABLE runbook_executions
+    ADD COLUMN IF NOT EXISTS queued_at        TIMESTAMPTZ,
+    ADD COLUMN IF NOT EXISTS worker_id        TEXT,
+    ADD COLUMN IF NOT EXISTS heartbeat_at     TIMESTAMPTZ,
+    ADD COLUMN IF NOT EXISTS cancel_requested BOOLEAN NOT NULL DEFAULT false,
+    ADD COLUMN IF NOT EXISTS progress         JSONB   NOT NULL DEFAULT '{}';
+
+CREATE INDEX IF NOT EXISTS idx_rbe_queued ON runbook_executions(id) WHERE status = 'queued';
+
+INSERT INTO schema_migrations (filename, applied_at)
+VALUES ('migrate_runbook_queue.sql', NOW())
+ON CONFLICT (filename) DO NOTHING;
@@ -89,7 +89,10 @@ CREATE TABLE IF NOT EXISTS search_indexer_state (
     last_indexed_at TIMESTAMPTZ NOT NULL DEFAULT '1970-01-01T00:00:00Z',
     docs_count      INTEGER NOT NULL DEFAULT 0,
     last_run_at     TIMESTAMPTZ,
-    last_run_duration_ms INTEGER
+    last_run_duration_ms INTEGER,
+    full_reindex_at TIMESTAMPTZ,
+    full_reindex_duration_ms INTEGER,
+    full_reindex_docs INTEGER
 );
 
 -- Seed initial state for each doc type
@@ -0,0 +1,13 @@
+-- Search indexer: full-reindex stats.
+-- The worker streams each doc type in committed chunks; these columns record
+-- the duration and document count of the last run that started from the
+-- epoch watermark.
+
+ALTER TABLE search_indexer_state
+    ADD COLUMN IF NOT EXISTS full_reindex_at TIMESTAMPTZ,
+    ADD COLUMN IF NOT EXISTS full_reindex_duration_ms INTEGER,
+    ADD COLUMN IF NOT EXISTS full_reindex_docs INTEGER;
+
+INSERT INTO schema_migrations (filename, applied_at)
+VALUES ('migrate_search_indexer_stats.sql', NOW())
+ON CONFLICT (filename) DO NOTHING;
@@ -0,0 +1,42 @@
+-- Set-based SLA KPI engine.
+-- sla_worker keeps month-to-date partial aggregates per tenant and day and
+-- only recomputes days whose source rows changed since the last cycle.
+
+-- ---------------------------------------------------------------------------
+-- sla_kpi_daily — month-to-date partial aggregates per tenant per day
+-- Written by sla_worker; sla_compliance_monthly is rolled up from these rows.
+-- Days follow the same attribution as the monthly KPIs: snapshot and ticket
+-- created_at, restore started_at.
+-- ---------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS sla_kpi_daily (
+    tenant_id       TEXT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    day             DATE NOT NULL,
+    rto_max_hours   DOUBLE PRECISION,          -- worst succeeded restore started that day
+    rpo_max_hours   DOUBLE PRECISION,          -- worst gap ending at a snapshot that day
+    mtta_sum_hours  DOUBLE PRECISION,
+    mtta_count      INTEGER NOT NULL DEFAULT 0,
+    mttr_sum_hours  DOUBLE PRECISION,
+    mttr_count      INTEGER NOT NULL DEFAULT 0,
+    backups_good    INTEGER NOT NULL DEFAULT 0,
+    backups_total   INTEGER NOT NULL DEFAULT 0,
+    computed_at     TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (tenant_id, day)
+);
+
+-- ---------------------------------------------------------------------------
+-- sla_kpi_watermarks — per tenant and month, the time up to which source-row
+-- changes are already folded into sla_kpi_daily.  finalized = TRUE once the
+-- month has closed and been rebuilt from the source tables.
+-- ---------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS sla_kpi_watermarks (
+    tenant_id   TEXT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    month       DATE NOT NULL,
+    watermark   TIMESTAMPTZ NOT NULL,
+    finalized   BOOLEAN NOT NULL DEFAULT FALSE,
+    updated_at  TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (tenant_id, month)
+);
+
+INSERT INTO schema_migrations (filename, applied_at)
+VALUES ('migrate_sla_kpi_partials.sql', NOW())
+ON CONFLICT (filename) DO NOTHING;
@@ -0,0 +1,30 @@
+-- snapshots.changed_at — DB-side change time for the SLA worker.
+-- snapshots.updated_at is OpenStack's timestamp, copied in by the collector
+-- possibly hours later, so it cannot be compared with the sla_worker
+-- watermark (DB clock).  changed_at is set by a trigger when a row is
+-- inserted or a field the SLA KPIs read changes.
+
+ALTER TABLE snapshots ADD COLUMN IF NOT EXISTS changed_at TIMESTAMPTZ;
+
+CREATE OR REPLACE FUNCTION snapshots_set_changed_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT'
+       OR (NEW.status, NEW.created_at, NEW.volume_id, NEW.project_id)
+          IS DISTINCT FROM (OLD.status, OLD.created_at, OLD.volume_id, OLD.project_id) THEN
+        NEW.changed_at := clock_timestamp();
+    ELSE
+        NEW.changed_at := OLD.changed_at;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_snapshots_set_changed_at ON snapshots;
+CREATE TRIGGER trg_snapshots_set_changed_at
+    BEFORE INSERT OR UPDATE ON snapshots
+    FOR EACH ROW EXECUTE FUNCTION snapshots_set_changed_at();
+
+INSERT INTO schema_migrations (filename, applied_at)
+VALUES ('migrate_sla_snapshot_changed_at.sql', NOW())
+ON CONFLICT (filename) DO NOTHING;
@@ -28,6 +28,12 @@ DB_NAME = os.getenv("PF9_DB_NAME", os.getenv("POSTGRES_DB", "pf9_mgmt"))
 DB_USER = os.getenv("PF9_DB_USER", os.getenv("POSTGRES_USER", "pf9"))
 DB_PASSWORD = os.getenv("PF9_DB_PASSWORD", os.getenv("POSTGRES_PASSWORD", ""))
 
+# History/drift write strategy used by _upsert_with_history:
+#   "set" — stage each batch in a temp table and compute new history rows,
+#           drift and deletions with a handful of bulk statements (default)
+#   "row" — legacy per-record SELECT + INSERT loop
+HISTORY_WRITE_MODE = os.getenv("PF9_HISTORY_WRITE_MODE", "set").strip().lower()
+
 
 def db_connect():
     """Create and return a database connection"""
@@ -509,11 +515,20 @@ def _auto_ticket_for_drift(
         logger.warning("Auto-ticket for drift failed: %s", exc)
 
 
-def _detect_drift(cur, table_name: str, record_id: str, old_row: Dict[str, Any],
-                   new_record: Dict[str, Any], rules: List[Dict[str, Any]]):
-    """Compare old vs new fields and insert drift_events for any matching rules."""
+_DRIFT_EVENT_COLUMNS = (
+    "rule_id", "resource_type", "resource_id", "resource_name",
+    "project_id", "project_name", "domain_id", "domain_name",
+    "severity", "field_changed", "old_value", "new_value", "description",
+)
+
+
+def _collect_drift_changes(table_name: str, record_id: str, old_row: Dict[str, Any],
+                           new_record: Dict[str, Any],
+                           rules: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Return one drift event (keyed by _DRIFT_EVENT_COLUMNS) per rule whose field changed."""
+    events: List[Dict[str, Any]] = []
     if not rules or not old_row:
-        return
+        return events
     for rule in rules:
         field = rule["field_name"]
         old_val = str(old_row.get(field, "")) if old_row.get(field) is not None else None
@@ -527,34 +542,117 @@ def _detect_drift(cur, table_name: str, record_id: str, old_row: Dict[str, Any],
         if old_val is None:
             continue
         # Field changed between two known states — emit drift event.
+        events.append({
+            "rule_id": rule["id"],
+            "resource_type": table_name,
+            "resource_id": record_id,
+            "resource_name": new_record.get("name") or new_record.get("hostname") or str(record_id),
+            "project_id": new_record.get("project_id") or old_row.get("project_id"),
+            "project_name": new_record.get("project_name") or old_row.get("project_name"),
+            "domain_id": new_record.get("domain_id") or old_row.get("domain_id"),
+            "domain_name": new_record.get("domain_name") or old_row.get("domain_name"),
+            "severity": rule["severity"],
+            "field_changed": field,
+            "old_value": old_val,
+            "new_value": new_val,
+            "description": rule["description"],
+        })
+    return events
+
+
+def _deletion_drift_event(table_name: str, missing_id: str, missing_row: Dict[str, Any],
+                          deletion_rule: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the drift event emitted for a resource that vanished from OpenStack."""
+    return {
+        "rule_id": deletion_rule["id"],
+        "resource_type": table_name,
+        "resource_id": missing_id,
+        "resource_name": missing_row.get("name") or missing_row.get("hostname") or missing_id,
+        "project_id": missing_row.get("project_id"),
+        "project_name": missing_row.get("project_name"),
+        "domain_id": missing_row.get("domain_id"),
+        "domain_name": missing_row.get("domain_name"),
+        "severity": deletion_rule["severity"],
+        "field_changed": "status",
+        "old_value": "active",
+        "new_value": "deleted",
+        "description": f"{table_name[:-1]} '{missing_row.get('name') or missing_id}' was deleted from OpenStack",
+    }
+
+
+def _auto_ticket_for_drift_event(conn, event: Dict[str, Any]) -> None:
+    """Open (or dedup against) an auto-incident ticket for a written drift event."""
+    _auto_ticket_for_drift(
+        conn,
+        severity=event["severity"],
+        resource_type=event["resource_type"],
+        resource_id=str(event["resource_id"]),
+        resource_name=event["resource_name"],
+        project_id=event["project_id"],
+        project_name=event["project_name"],
+        field_changed=event["field_changed"],
+        old_value=event["old_value"],
+        new_value=event["new_value"],
+        description=event["description"],
+    )
+
+
+def _insert_drift_events(cur, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Insert drift events with a single multi-row INSERT.
+
+    If the batch fails, fall back to one savepoint per event so a single bad
+    row never drops the others.  Returns the events that were written.
+    """
+    if not events:
+        return []
+    rows = [[e[col] for col in _DRIFT_EVENT_COLUMNS] for e in events]
+    insert_sql = f"INSERT INTO drift_events ({', '.join(_DRIFT_EVENT_COLUMNS)}) VALUES %s"
+    try:
+        cur.execute("SAVEPOINT before_drift_batch")
+        execute_values(cur, insert_sql, rows, page_size=1000)
+        cur.execute("RELEASE SAVEPOINT before_drift_batch")
+        return events
+    except Exception as batch_err:
+        try:
+            cur.execute("ROLLBACK TO SAVEPOINT before_drift_batch")
+        except Exception:
+            pass
+        logger.warning("Bulk drift event insert failed (%s) — retrying row by row", batch_err)
+
+    written: List[Dict[str, Any]] = []
+    for event, row in zip(events, rows):
+        try:
+            cur.execute("SAVEPOINT before_drift_event")
+            execute_values(cur, insert_sql, [row])
+            cur.execute("RELEASE SAVEPOINT before_drift_event")
+        except Exception as drift_err:
+            try:
+                cur.execute("ROLLBACK TO SAVEPOINT before_drift_event")
+            except Exception:
+                pass
+            logger.warning(
+                "Drift event insert failed for %s/%s field %s: %s",
+                event["resource_type"], event["resource_id"], event["field_changed"], drift_err,
+            )
+            continue
+        written.append(event)
+    return written
+
+
+def _detect_drift(cur, table_name: str, record_id: str, old_row: Dict[str, Any],
+                   new_record: Dict[str, Any], rules: List[Dict[str, Any]]):
+    """Compare old vs new fields and insert drift_events for any matching rules."""
+    for event in _collect_drift_changes(table_name, record_id, old_row, new_record, rules):
         # Use a per-event savepoint so that a failed INSERT does NOT leave the
         # PostgreSQL transaction in an aborted state, which would propagate as
         # "current transaction is aborted" errors on all subsequent queries.
         try:
             cur.execute("SAVEPOINT before_drift_event")
-            cur.execute("""
-                INSERT INTO drift_events
-                    (rule_id, resource_type, resource_id, resource_name,
-                     project_id, project_name, domain_id, domain_name,
-                     severity, field_changed, old_value, new_value, description)
-                VALUES (%s, %s, %s, %s,
-                        %s, %s, %s, %s,
-                        %s, %s, %s, %s, %s)
-            """, (
-                rule["id"],
-                table_name,
-                record_id,
-                new_record.get("name") or new_record.get("hostname") or str(record_id),
-                new_record.get("project_id") or old_row.get("project_id"),
-                new_record.get("project_name") or old_row.get("project_name"),
-                new_record.get("domain_id") or old_row.get("domain_id"),
-                new_record.get("domain_name") or old_row.get("domain_name"),
-                rule["severity"],
-                field,
-                old_val,
-                new_val,
-                rule["description"],
-            ))
+            cur.execute(f"""
+                INSERT INTO drift_events ({", ".join(_DRIFT_EVENT_COLUMNS)})
+                VALUES ({", ".join(["%s"] * len(_DRIFT_EVENT_COLUMNS))})
+            """, [event[col] for col in _DRIFT_EVENT_COLUMNS])
             cur.execute("RELEASE SAVEPOINT before_drift_event")
 
         except Exception as drift_err:
@@ -564,10 +662,9 @@ def _detect_drift(cur, table_name: str, record_id: str, old_row: Dict[str, Any],
                 cur.execute("ROLLBACK TO SAVEPOINT before_drift_event")
             except Exception:
                 pass
-            import logging
-            logging.getLogger("db_writer").warning(
+            logger.warning(
                 "Drift event insert failed for %s/%s field %s: %s",
-                table_name, record_id, field, drift_err,
+                table_name, record_id, event["field_changed"], drift_err,
             )
             continue
 
@@ -575,19 +672,7 @@ def _detect_drift(cur, table_name: str, record_id: str, old_row: Dict[str, Any],
         # Called OUTSIDE the savepoint try/except so that any failure here
         # cannot trigger a ROLLBACK TO on an already-released savepoint,
         # which would leave the PG transaction in a hard-aborted state.
-        _auto_ticket_for_drift(
-            cur.connection,
-            severity=rule["severity"],
-            resource_type=table_name,
-            resource_id=str(record_id),
-            resource_name=new_record.get("name") or new_record.get("hostname") or str(record_id),
-            project_id=new_record.get("project_id") or old_row.get("project_id"),
-            project_name=new_record.get("project_name") or old_row.get("project_name"),
-            field_changed=field,
-            old_value=old_val,
-            new_value=new_val,
-            description=rule["description"],
-        )
+        _auto_ticket_for_drift_event(cur.connection, event)
 
 
 def _infer_os_from_image_name(name: str) -> Optional[str]:
@@ -621,31 +706,188 @@ def _upsert_with_history(
     table_name: str,
     records: List[Dict[str, Any]],
     id_field: str = "id",
-    run_id: Optional[int] = None
+    run_id: Optional[int] = None,
+    mode: Optional[str] = None,
 ) -> int:
     """
     Generic upsert function with history tracking and drift detection.
     Updates the main table, inserts into history table if changed,
     and emits drift events for field-level changes matching enabled rules.
+
+    ``mode`` selects the history strategy ("set" or "row"); it defaults to
+    HISTORY_WRITE_MODE.  Both strategies write the same history rows,
+    drift_events and auto-tickets.
     """
     if not records:
         return 0
+    if (mode or HISTORY_WRITE_MODE) == "row":
+        return _upsert_with_history_rowwise(conn, table_name, records, id_field, run_id)
+    return _upsert_with_history_set_based(conn, table_name, records, id_field, run_id)
 
-    # Get the column names from the first record
-    columns = list(records[0].keys())
-    
-    # Build upsert query
-    placeholders = ", ".join(["%s"] * len(columns))
+
+def _build_upsert_query(table_name: str, columns: List[str], id_field: str) -> str:
+    """Build the INSERT … ON CONFLICT statement shared by both history strategies."""
     update_set = ", ".join([f"{col} = EXCLUDED.{col}" for col in columns if col != id_field])
-    
-    insert_query = f"""
+    return f"""
         INSERT INTO {table_name} ({", ".join(columns)})
         VALUES %s
         ON CONFLICT ({id_field}) DO UPDATE SET
             {update_set},
             last_seen_at = NOW()
     """
-    
+
+
+def _upsert_with_history_set_based(
+    conn,
+    table_name: str,
+    records: List[Dict[str, Any]],
+    id_field: str = "id",
+    run_id: Optional[int] = None
+) -> int:
+    """
+    Set-based variant of _upsert_with_history.
+
+    The batch is staged in a temp table shaped like the history table, then a
+    single INSERT … SELECT … WHERE NOT EXISTS writes only the rows whose
+    change_hash is new.  Drift is computed for the returned IDs only, drift
+    events are written with one multi-row INSERT, and deletions come from a
+    single anti-join instead of reading the whole ID column into Python.
+    """
+    columns = list(records[0].keys())
+    insert_query = _build_upsert_query(table_name, columns, id_field)
+    history_table = f"{table_name}_history"
+    history_id_col = f"{table_name[:-1]}_id"
+    stage_table = f"_stage_{history_table}"
+
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        drift_rules = _load_drift_rules(cur, table_name)
+
+        # ---- Snapshot old rows BEFORE the upsert (for drift detection) ----
+        old_rows: Dict[str, Dict] = {}
+        if drift_rules:
+            record_ids = [r[id_field] for r in records if r.get(id_field)]
+            if record_ids:
+                cur.execute(
+                    f"SELECT * FROM {table_name} WHERE {id_field} = ANY(%s)",
+                    (record_ids,),
+                )
+                for row in cur.fetchall():
+                    old_rows[str(row[id_field])] = dict(row)
+
+        # ---- Perform the upsert ----
+        values = [[record.get(col) for col in columns] for record in records]
+        execute_values(cur, insert_query, values)
+
+        # ---- History tracking + drift detection ----
+        # Same savepoint contract as the row-wise path: a missing/broken
+        # history table must never roll back the main upsert.
+        cur.execute("SAVEPOINT before_history")
+        try:
+            hist_cols = [
+                history_id_col if col == id_field else col
+                for col in columns if col != "last_seen_at"
+            ] + ["change_hash", "recorded_at"]
+            col_list = ", ".join(hist_cols)
+            recorded_at = datetime.now(timezone.utc)
+            stage_rows = []
+            for record in records:
+                row = [record.get(col) for col in columns if col != "last_seen_at"]
+                row.append(_compute_change_hash(record))
+                row.append(recorded_at)
+                stage_rows.append(row)
+
+            # Temp table with the history table's column types so staged
+            # literals coerce exactly as they would on a direct INSERT.
+            cur.execute(f"DROP TABLE IF EXISTS pg_temp.{stage_table}")
+            cur.execute(
+                f"CREATE TEMP TABLE {stage_table} ON COMMIT DROP AS "
+                f"SELECT {col_list} FROM {history_table} WITH NO DATA"
+            )
+            execute_values(
+                cur, f"INSERT INTO {stage_table} ({col_list}) VALUES %s",
+                stage_rows, page_size=1000,
+            )
+            cur.execute(f"""
+                INSERT INTO {history_table} ({col_list})
+                SELECT {col_list} FROM {stage_table} s
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM {history_table} h
+                    WHERE h.{history_id_col} = s.{history_id_col}
+                      AND h.change_hash = s.change_hash
+                )
+                RETURNING {history_id_col}
+            """)
+            changed_ids = {str(row[history_id_col]) for row in cur.fetchall()}
+            cur.execute(f"DROP TABLE IF EXISTS pg_temp.{stage_table}")
+
+            # ---- Drift detection (only for records that produced history) ----
+            drift_events: List[Dict[str, Any]] = []
+            if drift_rules and changed_ids:
+                for record in records:
+                    rid = str(record[id_field])
+                    if rid in changed_ids and rid in old_rows:
+                        drift_events.extend(_collect_drift_changes(
+                            table_name, rid, old_rows[rid], record, drift_rules,
+                        ))
+            for event in _insert_drift_events(cur, drift_events):
+                _auto_ticket_for_drift_event(conn, event)
+
+        except Exception as e:
+            try:
+                cur.execute("ROLLBACK TO SAVEPOINT before_history")
+            except Exception:
+                pass
+            logger.warning(
+                "History/drift tracking skipped for table '%s' — %s: %s. "
+                "Run the corresponding migration against the database to fix this.",
+                table_name, type(e).__name__, e
+            )
+
+        # ---- Deletion drift detection ----
+        # Rows present in the table but absent from this collection.  Every
+        # incoming record was just upserted, so an anti-join against the
+        # incoming IDs yields exactly the pre-existing rows that disappeared.
+        if drift_rules:
+            incoming_ids = [str(r[id_field]) for r in records if r.get(id_field)]
+            cur.execute(f"""
+                SELECT t.* FROM {table_name} t
+                LEFT JOIN unnest(%s::text[]) AS inc(id) ON inc.id = t.{id_field}::text
+                WHERE inc.id IS NULL
+            """, (incoming_ids,))
+            deleted_rows = {str(row[id_field]): dict(row) for row in cur.fetchall()}
+            if deleted_rows:
+                deletion_rule = next(
+                    (ru for ru in drift_rules if ru.get("field_name") == "status"),
+                    drift_rules[0],
+                )
+                deletion_events = [
+                    _deletion_drift_event(table_name, missing_id, missing_row, deletion_rule)
+                    for missing_id, missing_row in deleted_rows.items()
+                ]
+                for event in _insert_drift_events(cur, deletion_events):
+                    _auto_ticket_for_drift_event(conn, event)
+
+    return len(records)
+
+
+def _upsert_with_history_rowwise(
+    conn,
+    table_name: str,
+    records: List[Dict[str, Any]],
+    id_field: str = "id",
+    run_id: Optional[int] = None
+) -> int:
+    """
+    Row-wise variant of _upsert_with_history (PF9_HISTORY_WRITE_MODE=row).
+    One history lookup and one INSERT per record.
+    """
+    if not records:
+        return 0
+
+    # Get the column names from the first record
+    columns = list(records[0].keys())
+    insert_query = _build_upsert_query(table_name, columns, id_field)
+
     with conn.cursor(cursor_factory=RealDictCursor) as cur:
         # ---- Load drift rules for this resource type ----
         drift_rules = _load_drift_rules(cur, table_name)
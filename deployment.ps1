@@ -845,7 +845,13 @@ $provisioningMigrations = @(
     @{File="db\migrate_v2_17_0_maintenance_health.sql";  Desc="v2.17.0: ops maintenance windows + tenant health security_posture component"},
     @{File="db\migrate_v2_17_1_psa_inbound.sql";         Desc="v2.17.1: PSA inbound sync columns and intelligence role access"},
     @{File="db\migrate_v2_18_0_incident_briefs.sql";     Desc="v2.18.0: AI incident triage incident_briefs table + indexes"},
-    @{File="db\migrate_v2_18_0_copilot_triage_config.sql"; Desc="v2.18.0: Copilot AI triage config columns"}
+    @{File="db\migrate_v2_18_0_copilot_triage_config.sql"; Desc="v2.18.0: Copilot AI triage config columns"},
+    @{File="db\migrate_search_indexer_stats.sql";      Desc="Search indexer full-reindex stats on search_indexer_state"},
+    @{File="db\migrate_runbook_queue.sql";             Desc="Runbook execution queue columns (worker, heartbeat, cancel, progress)"},
+    @{File="db\migrate_ldap_sync_delta.sql";           Desc="LDAP sync delta watermark columns"},
+    @{File="db\migrate_sla_kpi_partials.sql";          Desc="SLA worker daily KPI partials + watermarks"},
+    @{File="db\migrate_sla_snapshot_changed_at.sql";   Desc="snapshots.changed_at trigger for SLA dirty-day detection"},
+    @{File="db\migrate_portfolio_metering_hourly.sql"; Desc="Metering worker hourly portfolio partials + watermarks"}
 )
 foreach ($mig in $provisioningMigrations) {
     Write-Info "Applying $($mig.Desc)..."
@@ -12,6 +12,8 @@ from typing import Dict
 import os
 import sys
 
+from shared.prometheus_text import parse_libvirt_exporter, parse_node_exporter
+
 # Load .env file when running on the host (outside Docker)
 try:
     from dotenv import load_dotenv
@@ -78,6 +80,13 @@ class HostMetricsCollector:
         # Store previous VM vcpu_time for delta-based VM CPU calculation
         self._prev_vm_cpu_totals: Dict[str, Dict] = {}  # domain_id -> {"vcpu_time": seconds, "wall_time": datetime}
         self._consecutive_empty_cycles = 0
+        # Exporter ports and scrape fan-out (one slow host must not stall the cycle)
+        self.node_exporter_port = int(os.getenv("PF9_NODE_EXPORTER_PORT", "9388"))
+        self.libvirt_exporter_port = int(os.getenv("PF9_LIBVIRT_EXPORTER_PORT", "9177"))
+        self.scrape_concurrency = max(1, int(os.getenv("PF9_SCRAPE_CONCURRENCY", "32")))
+        self.host_deadline_seconds = float(os.getenv("PF9_HOST_DEADLINE_SECONDS", "25"))
+        # Timing of the last collect_all_metrics() cycle, written into the cache summary
+        self.last_cycle = None
         # Load persisted CPU state from disk (so single-run / restart can compute deltas)
         self._load_cpu_state()
         
@@ -183,7 +192,7 @@ class HostMetricsCollector:
         """Collect metrics from a single host"""
         try:
             print(f"Collecting host metrics from {host}...")
-            async with session.get(f"http://{host}:9388/metrics", timeout=10) as response:
+            async with session.get(f"http://{host}:{self.node_exporter_port}/metrics", timeout=10) as response:
                 if response.status == 200:
                     text = await response.text()
                     return self.parse_host_metrics(text, host)
@@ -201,7 +210,7 @@ class HostMetricsCollector:
         """Collect VM metrics from libvirt exporter on a single host"""
         try:
             print(f"Collecting VM metrics from {host}...")
-            async with session.get(f"http://{host}:9177/metrics", timeout=10) as response:
+            async with session.get(f"http://{host}:{self.libvirt_exporter_port}/metrics", timeout=10) as response:
                 if response.status == 200:
                     text = await response.text()
                     vm_list = self.parse_vm_metrics(text, host)
@@ -209,7 +218,7 @@ class HostMetricsCollector:
                     await self.resolve_vm_ips(session, vm_list, host)
                     return vm_list
                 else:
-                    print(f"HTTP {response.status} from {host}:9177")
+                    print(f"HTTP {response.status} from {host}:{self.libvirt_exporter_port}")
                     return []
         except asyncio.TimeoutError:
             print(f"Failed to collect VM metrics from {host}: timeout after 10s")
@@ -256,49 +265,22 @@ class HostMetricsCollector:
                     vm['vm_ip'] = "Unknown"
 
     def parse_host_metrics(self, prometheus_text, hostname):
-        """Parse prometheus metrics text into host data"""
+        """Parse node_exporter text into host data"""
         try:
-            lines = prometheus_text.strip().split('\n')
-            metrics = {}
-            
-            # Collect per-mode CPU seconds for proper utilization calculation
-            cpu_mode_seconds: Dict[str, float] = {}  # mode -> total seconds across all CPUs
-            
-            for line in lines:
-                if line.startswith('#') or not line.strip():
-                    continue
-                
-                parts = line.split(' ')
-                if len(parts) >= 2:
-                    metric_name = parts[0].split('{')[0]
-                    try:
-                        value = float(parts[-1])
-                        metrics[metric_name] = value
-                    except:
-                        continue
-                
-                    # Accumulate node_cpu_seconds_total by mode (idle, user, system, etc.)
-                    if 'node_cpu_seconds_total{' in line:
-                        try:
-                            mode_start = line.find('mode="') + 6
-                            mode_end = line.find('"', mode_start)
-                            mode = line[mode_start:mode_end]
-                            cpu_mode_seconds[mode] = cpu_mode_seconds.get(mode, 0.0) + value
-                        except:
-                            pass
-            
+            node = parse_node_exporter(prometheus_text)
+
             host_data = {
                 'hostname': self.ip_to_hostname.get(hostname, hostname),
                 'ip_address': hostname,
                 'timestamp': datetime.now(timezone.utc).isoformat()
             }
-            
+
             # CPU utilization: use node_cpu_seconds_total delta between collection cycles
             # This mirrors how PF9 and standard monitoring tools compute CPU %.
             cpu_calculated = False
-            if cpu_mode_seconds:
-                cur_total = sum(cpu_mode_seconds.values())
-                cur_idle = cpu_mode_seconds.get('idle', 0.0)
+            if node.cpu_mode_seconds:
+                cur_total = node.cpu_total_seconds
+                cur_idle = node.cpu_idle_seconds
                 prev = self._prev_cpu_totals.get(hostname)
                 if prev is not None:
                     delta_total = cur_total - prev['total']
@@ -310,28 +292,24 @@ class HostMetricsCollector:
                         cpu_calculated = True
                 # Store current counters for next cycle
                 self._prev_cpu_totals[hostname] = {'idle': cur_idle, 'total': cur_total}
-            
+
             if not cpu_calculated:
                 # First collection cycle (no previous sample) – use instantaneous
                 # idle ratio as a rough approximation, or 0 if unavailable.
-                if cpu_mode_seconds:
-                    total = sum(cpu_mode_seconds.values())
-                    idle = cpu_mode_seconds.get('idle', 0.0)
-                    if total > 0:
-                        host_data['cpu_usage_percent'] = round(
-                            (1.0 - idle / total) * 100, 1
-                        )
-                    else:
-                        host_data['cpu_usage_percent'] = 0
+                total = node.cpu_total_seconds
+                if total > 0:
+                    host_data['cpu_usage_percent'] = round(
+                        (1.0 - node.cpu_idle_seconds / total) * 100, 1
+                    )
                 else:
                     host_data['cpu_usage_percent'] = 0
-            
+
             # Memory metrics
-            if 'node_memory_MemTotal_bytes' in metrics and 'node_memory_MemAvailable_bytes' in metrics:
-                total_mb = metrics['node_memory_MemTotal_bytes'] / (1024 * 1024)
-                available_mb = metrics['node_memory_MemAvailable_bytes'] / (1024 * 1024)
+            if node.mem_total_bytes and node.mem_available_bytes is not None:
+                total_mb = node.mem_total_bytes / (1024 * 1024)
+                available_mb = node.mem_available_bytes / (1024 * 1024)
                 used_mb = total_mb - available_mb
-                
+
                 host_data['memory_total_mb'] = round(total_mb, 2)
                 host_data['memory_used_mb'] = round(used_mb, 2)
                 host_data['memory_usage_percent'] = round((used_mb / total_mb) * 100, 1)
@@ -339,257 +317,78 @@ class HostMetricsCollector:
                 host_data['memory_total_mb'] = 0
                 host_data['memory_used_mb'] = 0
                 host_data['memory_usage_percent'] = 0
-            
-            # Storage metrics - parse directly from lines to get labels
-            storage_total = None
-            storage_avail = None
-            network_rx_bytes = 0
-            network_tx_bytes = 0
-
-            # Exclusion-based NIC filter: skip loopback, virtual bridges, tap/veth devices,
-            # Docker/OVS internals.  Everything else (physical NICs, bonds, team interfaces,
-            # SR-IOV VFs, etc.) is summed so the filter works regardless of naming convention.
-            _EXCL_NIC_PREFIXES = (
-                'lo', 'virbr', 'tap', 'vnet', 'veth', 'br-', 'docker',
-                'ovs', 'dummy', 'tunl', 'tun', 'sit', 'gre', 'flannel',
-                'cali', 'cilium', 'weave',
-            )
 
-            for line in lines:
-                if 'node_filesystem_size_bytes' in line and 'mountpoint="/"' in line:
-                    parts = line.split(' ')
-                    if len(parts) >= 2:
-                        try:
-                            storage_total = float(parts[-1])
-                            print(f"  Found size: {storage_total / (1024**3):.1f}GB")
-                        except:
-                            continue
-                elif 'node_filesystem_avail_bytes' in line and 'mountpoint="/"' in line:
-                    parts = line.split(' ')
-                    if len(parts) >= 2:
-                        try:
-                            storage_avail = float(parts[-1])
-                            print(f"  Found available: {storage_avail / (1024**3):.1f}GB")
-                        except:
-                            continue
-                elif 'node_network_receive_bytes_total' in line and 'device="' in line:
-                    dev_start = line.find('device="') + 8
-                    dev_end = line.find('"', dev_start)
-                    dev = line[dev_start:dev_end] if dev_start > 7 else ''
-                    if dev and not any(dev.startswith(p) for p in _EXCL_NIC_PREFIXES):
-                        parts = line.split(' ')
-                        if len(parts) >= 2:
-                            try:
-                                network_rx_bytes += float(parts[-1])
-                            except:
-                                continue
-                elif 'node_network_transmit_bytes_total' in line and 'device="' in line:
-                    dev_start = line.find('device="') + 8
-                    dev_end = line.find('"', dev_start)
-                    dev = line[dev_start:dev_end] if dev_start > 7 else ''
-                    if dev and not any(dev.startswith(p) for p in _EXCL_NIC_PREFIXES):
-                        parts = line.split(' ')
-                        if len(parts) >= 2:
-                            try:
-                                network_tx_bytes += float(parts[-1])
-                            except:
-                                continue
-            
-            if storage_total is not None and storage_avail is not None:
-                total_gb = storage_total / (1024 * 1024 * 1024)
-                avail_gb = storage_avail / (1024 * 1024 * 1024)
+            # Storage metrics (root filesystem)
+            if node.root_fs_size_bytes and node.root_fs_avail_bytes is not None:
+                total_gb = node.root_fs_size_bytes / (1024 * 1024 * 1024)
+                avail_gb = node.root_fs_avail_bytes / (1024 * 1024 * 1024)
                 used_gb = total_gb - avail_gb
-                
+
                 host_data['storage_total_gb'] = round(total_gb, 2)
                 host_data['storage_used_gb'] = round(used_gb, 2)
                 host_data['storage_usage_percent'] = round((used_gb / total_gb) * 100, 1)
             else:
-                print(f"  Storage metrics missing - total: {storage_total is not None}, avail: {storage_avail is not None}")
+                print(f"  Storage metrics missing - total: {node.root_fs_size_bytes is not None}, "
+                      f"avail: {node.root_fs_avail_bytes is not None}")
                 host_data['storage_total_gb'] = 0
                 host_data['storage_used_gb'] = 0
                 host_data['storage_usage_percent'] = 0
-            
-            # Add network throughput metrics
+
+            # Network throughput: physical NICs only (see EXCLUDED_NIC_PREFIXES)
+            network_rx_bytes = node.network_rx_bytes
+            network_tx_bytes = node.network_tx_bytes
             host_data['network_rx_bytes'] = network_rx_bytes
             host_data['network_tx_bytes'] = network_tx_bytes
             host_data['network_rx_mb'] = round(network_rx_bytes / (1024 * 1024), 1)
             host_data['network_tx_mb'] = round(network_tx_bytes / (1024 * 1024), 1)
-            
+
             print(f"+ {hostname}: CPU {host_data.get('cpu_usage_percent', 0):.1f}%, "
                   f"RAM {host_data.get('memory_usage_percent', 0):.1f}%, "
                   f"Disk {host_data.get('storage_usage_percent', 0):.1f}%, "
                   f"Net RX/TX {host_data.get('network_rx_mb', 0):.0f}/{host_data.get('network_tx_mb', 0):.0f}MB")
-            
+
             return host_data
-            
+
         except Exception as e:
             print(f"Error parsing metrics for {hostname}: {e}")
             return None
 
     def parse_vm_metrics(self, prometheus_text, host):
-        """Parse libvirt prometheus metrics into VM data"""
+        """Parse libvirt exporter text into VM data (active domains only)"""
         try:
-            lines = prometheus_text.strip().split('\n')
-            vms = {}
-            
-            # First pass: collect all VM metadata
-            for line in lines:
-                if line.startswith('#') or not line.strip():
-                    continue
-                    
-                if 'libvirt_domain_info_meta{' in line:
-                    parts = line.split(' ')
-                    if len(parts) >= 2:
-                        try:
-                            value = float(parts[-1])
-                            if value == 1:  # Active VM
-                                # Parse domain ID from line
-                                domain_start = line.find('domain="') + 8
-                                domain_end = line.find('"', domain_start)
-                                domain_id = line[domain_start:domain_end]
-                                
-                                # Extract VM name
-                                name_start = line.find('instance_name="') + 15
-                                name_end = line.find('"', name_start)
-                                vm_name = line[name_start:name_end] if name_start > 14 else domain_id[:8]
-                                
-                                # Extract project name
-                                project_start = line.find('project_name="') + 14
-                                project_end = line.find('"', project_start)
-                                project_name = line[project_start:project_end] if project_start > 13 else "Unknown"
-                                
-                                # Extract user name (domain)
-                                user_start = line.find('user_name="') + 11
-                                user_end = line.find('"', user_start)
-                                user_name = line[user_start:user_end] if user_start > 10 else "Unknown"
-                                domain = user_name.split('@')[1] if '@' in user_name else "Unknown"
-                                
-                                # Extract flavor
-                                flavor_start = line.find('flavor="') + 8
-                                flavor_end = line.find('"', flavor_start)
-                                flavor = line[flavor_start:flavor_end] if flavor_start > 7 else "Unknown"
-                                
-                                vms[domain_id] = {
-                                    'vm_id': domain_id,
-                                    'vm_name': vm_name,
-                                    'vm_ip': 'Unknown',  # Will try to resolve later
-                                    'project_name': project_name,
-                                    'domain': domain,
-                                    'user_name': user_name,
-                                    'flavor': flavor,
-                                    'host': self.ip_to_hostname.get(host, host),
-                                    'timestamp': datetime.now(timezone.utc).isoformat(),
-                                    'cpu_usage_percent': 0,
-                                    'memory_usage_mb': 0,
-                                    'memory_total_mb': 0,
-                                    'memory_usage_percent': 0,
-                                    'network_rx_bytes': 0,
-                                    'network_tx_bytes': 0,
-                                    'storage_read_bytes': 0,
-                                    'storage_write_bytes': 0,
-                                    'storage_total_gb': 0,
-                                    'storage_used_gb': 0,
-                                    'storage_usage_percent': 0,
-                                    '_vcpu_time_total': 0.0,  # sum of per-vcpu time for delta calc
-                                    '_vcpu_count': 0,
-                                    '_block_capacity': {},    # target_device -> bytes
-                                    '_block_allocation': {},  # target_device -> bytes
-                                    '_block_physical': {},    # target_device -> bytes
-                                }
-                        except:
-                            continue
-            
-            # Second pass: collect all metrics for the discovered VMs
-            for line in lines:
-                if line.startswith('#') or not line.strip():
-                    continue
-                
-                # Extract domain ID from any libvirt metric line
-                if 'domain="' in line:
-                    domain_start = line.find('domain="') + 8
-                    domain_end = line.find('"', domain_start)
-                    domain_id = line[domain_start:domain_end]
-                    
-                    if domain_id not in vms:
-                        continue
-                        
-                    parts = line.split(' ')
-                    if len(parts) < 2:
-                        continue
-                        
-                    try:
-                        value = float(parts[-1])
-                    except:
-                        continue
-                
-                    # Collect per-vCPU time for delta-based CPU calculation
-                    if 'libvirt_domain_vcpu_time_seconds_total{' in line:
-                        vms[domain_id]['_vcpu_time_total'] += value
-                    
-                    # Collect vCPU count
-                    elif 'libvirt_domain_info_virtual_cpus{' in line:
-                        vms[domain_id]['_vcpu_count'] = int(value)
-                    
-                    # Fallback: total CPU time (used only if vcpu_time not available)
-                    elif 'libvirt_domain_info_cpu_time_seconds_total{' in line:
-                        if vms[domain_id]['_vcpu_time_total'] == 0:
-                            vms[domain_id]['_vcpu_time_total'] = value
-                    
-                    # Collect memory usage
-                    elif 'libvirt_domain_info_memory_usage_bytes{' in line:
-                        vms[domain_id]['memory_usage_mb'] = value / (1024 * 1024)
-                    
-                    # Collect max memory
-                    elif 'libvirt_domain_info_maximum_memory_bytes{' in line:
-                        vms[domain_id]['memory_total_mb'] = value / (1024 * 1024)
-                    
-                    # Use the better memory percentage metric if available
-                    elif 'libvirt_domain_memory_stats_used_percent{' in line:
-                        vms[domain_id]['memory_usage_percent'] = round(value, 1)
-                    
-                    # Network stats
-                    elif 'libvirt_domain_interface_stats_receive_bytes_total{' in line:
-                        vms[domain_id]['network_rx_bytes'] += value
-                    
-                    elif 'libvirt_domain_interface_stats_transmit_bytes_total{' in line:
-                        vms[domain_id]['network_tx_bytes'] += value
-                    
-                    # Storage stats
-                    elif 'libvirt_domain_block_stats_read_bytes_total{' in line:
-                        vms[domain_id]['storage_read_bytes'] += value
-                    
-                    elif 'libvirt_domain_block_stats_write_bytes_total{' in line:
-                        vms[domain_id]['storage_write_bytes'] += value
-                    
-                    # Per-device storage capacity
-                    elif 'libvirt_domain_block_stats_capacity_bytes{' in line:
-                        dev_start = line.find('target_device="') + 15
-                        dev_end = line.find('"', dev_start)
-                        dev = line[dev_start:dev_end] if dev_start > 14 else 'unknown'
-                        vms[domain_id]['_block_capacity'][dev] = value
-                    
-                    # Per-device storage allocation (used)
-                    elif 'libvirt_domain_block_stats_allocation{' in line:
-                        dev_start = line.find('target_device="') + 15
-                        dev_end = line.find('"', dev_start)
-                        dev = line[dev_start:dev_end] if dev_start > 14 else 'unknown'
-                        vms[domain_id]['_block_allocation'][dev] = value
-                    
-                    # Per-device storage physical size
-                    elif 'libvirt_domain_block_stats_physicalsize_bytes{' in line:
-                        dev_start = line.find('target_device="') + 15
-                        dev_end = line.find('"', dev_start)
-                        dev = line[dev_start:dev_end] if dev_start > 14 else 'unknown'
-                        vms[domain_id]['_block_physical'][dev] = value
-            
-            # Calculate CPU and storage from collected raw data
+            domains = parse_libvirt_exporter(prometheus_text)
+            host_name = self.ip_to_hostname.get(host, host)
             vm_list = []
-            for vm_data in vms.values():
-                domain_id = vm_data['vm_id']
-                
+
+            for domain_id, dom in domains.items():
+                meta = dom.meta
+                user_name = meta.get('user_name') or "Unknown"
+                vm_data = {
+                    'vm_id': domain_id,
+                    'vm_name': meta.get('instance_name') or domain_id[:8],
+                    'vm_ip': 'Unknown',  # Will try to resolve later
+                    'project_name': meta.get('project_name') or "Unknown",
+                    'domain': user_name.split('@')[1] if '@' in user_name else "Unknown",
+                    'user_name': user_name,
+                    'flavor': meta.get('flavor') or "Unknown",
+                    'host': host_name,
+                    'timestamp': datetime.now(timezone.utc).isoformat(),
+                    'cpu_usage_percent': 0,
+                    'memory_usage_mb': round((dom.memory_usage_bytes or 0) / (1024 * 1024), 1),
+                    'memory_total_mb': round((dom.memory_max_bytes or 0) / (1024 * 1024), 1),
+                    'memory_usage_percent': round(dom.memory_used_percent or 0, 1),
+                    'network_rx_bytes': dom.network_rx_bytes,
+                    'network_tx_bytes': dom.network_tx_bytes,
+                    'storage_read_bytes': dom.block_read_bytes,
+                    'storage_write_bytes': dom.block_write_bytes,
+                    'storage_total_gb': 0,
+                    'storage_used_gb': 0,
+                    'storage_usage_percent': 0,
+                }
+
                 # --- VM CPU: delta-based calculation using vcpu_time ---
-                cur_vcpu_time = vm_data.pop('_vcpu_time_total', 0.0)
-                vcpu_count = vm_data.pop('_vcpu_count', 1) or 1
+                cur_vcpu_time = dom.cpu_seconds
+                vcpu_count = dom.vcpu_count or 1
                 prev_vm = self._prev_vm_cpu_totals.get(domain_id)
                 if prev_vm is not None and cur_vcpu_time > 0:
                     delta_time = cur_vcpu_time - prev_vm['vcpu_time']
@@ -602,28 +401,19 @@ class HostMetricsCollector:
                         vm_data['cpu_usage_percent'] = round(
                             min((delta_time / (delta_wall * vcpu_count)) * 100, 100), 1
                         )
-                    else:
-                        vm_data['cpu_usage_percent'] = 0
-                else:
-                    # First cycle: no delta available, report 0
-                    vm_data['cpu_usage_percent'] = 0
                 # Store for next cycle
                 if cur_vcpu_time > 0:
                     self._prev_vm_cpu_totals[domain_id] = {
                         'vcpu_time': cur_vcpu_time,
                         'wall_time': datetime.now(timezone.utc)
                     }
-                
+
                 # --- Storage: smart capacity vs allocation ---
-                block_cap = vm_data.pop('_block_capacity', {})
-                block_alloc = vm_data.pop('_block_allocation', {})
-                block_phys = vm_data.pop('_block_physical', {})
                 total_bytes = 0
                 used_bytes = 0
-                for dev in block_cap:
-                    cap = block_cap.get(dev, 0)
-                    alloc = block_alloc.get(dev, 0)
-                    phys = block_phys.get(dev, 0)
+                for dev, cap in dom.block_capacity.items():
+                    alloc = dom.block_allocation.get(dev, 0)
+                    phys = dom.block_physical.get(dev, 0)
                     total_bytes += cap
                     if cap > 0 and alloc > 0:
                         # For raw/thick disks allocation == capacity == physical;
@@ -641,53 +431,102 @@ class HostMetricsCollector:
                             used_bytes += alloc
                     elif alloc > 0:
                         used_bytes += alloc
-                
+
                 vm_data['storage_total_gb'] = round(total_bytes / (1024**3), 1)
                 vm_data['storage_used_gb'] = round(used_bytes / (1024**3), 1)
                 if total_bytes > 0:
                     vm_data['storage_usage_percent'] = round((used_bytes / total_bytes) * 100, 1)
-                else:
-                    vm_data['storage_usage_percent'] = 0
-                
-                # Memory
-                vm_data['memory_usage_mb'] = round(vm_data['memory_usage_mb'], 1)
-                vm_data['memory_total_mb'] = round(vm_data['memory_total_mb'], 1)
-                
+
                 # Use the libvirt calculated percentage if available, otherwise calculate it
-                if 'memory_usage_percent' not in vm_data or vm_data['memory_usage_percent'] == 0:
+                if vm_data['memory_usage_percent'] == 0 and vm_data['memory_total_mb'] > 0:
                     vm_data['memory_usage_percent'] = round(
                         (vm_data['memory_usage_mb'] / max(vm_data['memory_total_mb'], 1)) * 100, 1
-                    ) if vm_data['memory_total_mb'] > 0 else 0
-                
+                    )
+
                 vm_list.append(vm_data)
-            
+
             if vm_list:
                 print(f"+ {host}: Found {len(vm_list)} VMs")
                 for vm in vm_list:
                     print(f"  - {vm['vm_name']} (CPU: {vm['cpu_usage_percent']}%, RAM: {vm['memory_usage_percent']}%)")
-            
+
             return vm_list
-            
+
         except Exception as e:
             print(f"Error parsing VM metrics for {host}: {e}")
             return []
 
+    async def _scrape_host(self, session, sem, host):
+        """Scrape both exporters of one host under ``sem`` and the per-host deadline.
+
+        Returns ``(host_data, vm_list, timing)``.  Whatever finished before the
+        deadline is kept; the rest is cancelled and counted as a timeout.
+        """
+        async with sem:
+            started = time.monotonic()
+            timing = {"host_seconds": None, "vm_seconds": None}
+
+            async def timed(key, coro):
+                t0 = time.monotonic()
+                try:
+                    return await coro
+                finally:
+                    timing[key] = round(time.monotonic() - t0, 3)
+
+            host_task = asyncio.ensure_future(
+                timed("host_seconds", self.collect_host_metrics(session, host)))
+            vm_task = asyncio.ensure_future(
+                timed("vm_seconds", self.collect_vm_metrics(session, host)))
+            done, pending = await asyncio.wait(
+                {host_task, vm_task}, timeout=self.host_deadline_seconds)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+                print(f"Failed to collect metrics from {host}: "
+                      f"deadline of {self.host_deadline_seconds:g}s exceeded")
+
+            host_data = host_task.result() if host_task in done else None
+            vm_list = vm_task.result() if vm_task in done else []
+            timing.update({
+                "seconds": round(time.monotonic() - started, 3),
+                "host_ok": host_data is not None,
+                "vms": len(vm_list),
+                "timed_out": bool(pending),
+            })
+            return host_data, vm_list, timing
+
     async def collect_all_metrics(self):
-        """Collect metrics from all hosts"""
+        """Collect metrics from all hosts, at most ``scrape_concurrency`` at a time"""
         all_hosts = []
         all_vms = []
-        
-        async with aiohttp.ClientSession() as session:
-            for host in self.hosts:
-                # Collect host metrics
-                host_data = await self.collect_host_metrics(session, host)
-                if host_data:
-                    all_hosts.append(host_data)
-                
-                # Collect VM metrics
-                vm_data_list = await self.collect_vm_metrics(session, host)
-                all_vms.extend(vm_data_list)
-        
+        timings = {}
+
+        started = time.monotonic()
+        sem = asyncio.Semaphore(self.scrape_concurrency)
+        # Two exporters per host are scraped in parallel
+        connector = aiohttp.TCPConnector(limit=self.scrape_concurrency * 2)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            results = await asyncio.gather(
+                *(self._scrape_host(session, sem, host) for host in self.hosts))
+
+        # gather() keeps self.hosts order, so the cache layout is unchanged
+        for host, (host_data, vm_data_list, timing) in zip(self.hosts, results):
+            if host_data:
+                all_hosts.append(host_data)
+            all_vms.extend(vm_data_list)
+            timings[host] = timing
+
+        cycle_seconds = round(time.monotonic() - started, 3)
+        self.last_cycle = {
+            "cycle_seconds": cycle_seconds,
+            "concurrency": self.scrape_concurrency,
+            "host_deadline_seconds": self.host_deadline_seconds,
+            "timed_out_hosts": sorted(h for h, t in timings.items() if t["timed_out"]),
+            "hosts": timings,
+        }
+        print(f"Scraped {len(self.hosts)} hosts in {cycle_seconds:.2f}s "
+              f"(concurrency {self.scrape_concurrency})")
         return all_hosts, all_vms
 
     def save_cache(self, hosts_data, vms_data):
@@ -762,8 +601,14 @@ class HostMetricsCollector:
                     f"({len(prev_hosts)} hosts, {len(prev_vms)} VMs)"
                 )
         
-        with open(self.cache_file, 'w') as f:
+        if self.last_cycle is not None:
+            cache_data["summary"]["collection"] = self.last_cycle
+
+        # Write-then-rename so readers never see a half-written file
+        tmp_file = f"{self.cache_file}.tmp"
+        with open(tmp_file, 'w') as f:
             json.dump(cache_data, f, indent=2)
+        os.replace(tmp_file, self.cache_file)
         
         # Persist CPU state for delta calculations across restarts
         self._save_cpu_state()
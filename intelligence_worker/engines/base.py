@@ -283,6 +283,29 @@ class BaseEngine:
             except Exception:
                 pass
 
+    def suppress_resolved_many(self, type: str, entity_type: str, entity_ids) -> None:
+        """``suppress_resolved`` for many entities in one statement."""
+        entity_ids = list(entity_ids)
+        if not entity_ids:
+            return
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute("""
+                    UPDATE operational_insights
+                    SET status = 'resolved', resolved_at = NOW()
+                    WHERE type = %s
+                      AND entity_type = %s
+                      AND entity_id   = ANY(%s)
+                      AND status IN ('open','acknowledged','snoozed')
+                """, (type, entity_type, entity_ids))
+            self.conn.commit()
+        except Exception as exc:
+            log.debug("suppress_resolved_many failed: %s", exc)
+            try:
+                self.conn.rollback()
+            except Exception:
+                pass
+
     def upsert_recommendation(
         self,
         *,
@@ -1,7 +1,11 @@
 """
 Capacity Engine — storage, compute, and quota growth forecasting.
-For each project, fits a linear trend to the last 14 days of metering_quotas
+For each project, fits a trend to the last 14 days of metering_quotas
 and projects how many days until each resource hits 90 % of quota.
+All projects (and all hypervisors) are loaded in one query each and fitted
+together with the batched NumPy fitters in engines/forecast.py; the fitter
+is chosen with CAPACITY_FORECAST_METHOD (linear | theil_sen | holt,
+default linear).
 Insight types fired:
   capacity_storage  — storage GiB growth (Phase 1, extended with confidence)
   capacity_compute  — per-hypervisor vCPU / RAM allocation trend (Phase 3)
@@ -15,88 +19,82 @@ Severity thresholds:
 Confidence score (0–1) stored in metadata:
   Based on number of data points (saturates at 30) and trend linearity (R²).
   confidence = min(1.0, data_points/30) * max(0, R²)
+  metadata also carries the fit method, the 95 % interval of the trend
+  (trend_ci_95) and the matching days-to-90 % range (days_to_90_range,
+  earliest first; null when the slower bound never reaches 90 %).
 """
 from __future__ import annotations
 import logging
+import math
+import os
 from typing import Dict, List, Optional, Tuple
+import numpy as np
 import psycopg2.extras
 from .base import BaseEngine
+from .forecast import FITTERS, TrendFit, confidence, days_to_pct, last_valid, pack_series
 log = logging.getLogger("intelligence.capacity")
 _TYPE_STORAGE = "capacity_storage"
 _TYPE_COMPUTE = "capacity_compute"
 _TYPE_QUOTA   = "capacity_quota"
+FORECAST_METHOD = os.getenv("CAPACITY_FORECAST_METHOD", "linear").strip().lower()
 # ---------------------------------------------------------------------------
-# Math helpers
+# Helpers
 # ---------------------------------------------------------------------------
-def _linear_regression(xs: List[float], ys: List[float]) -> Tuple[float, float]:
-    """
-    Simple least-squares linear regression.
-    Returns (slope, intercept) where y ≈ slope * x + intercept.
-    """
-    n = len(xs)
-    if n < 2:
-        return 0.0, ys[0] if ys else 0.0
-    sx  = sum(xs)
-    sy  = sum(ys)
-    sxy = sum(x * y for x, y in zip(xs, ys))
-    sxx = sum(x * x for x in xs)
-    denom = n * sxx - sx * sx
-    if denom == 0:
-        return 0.0, sy / n
-    slope     = (n * sxy - sx * sy) / denom
-    intercept = (sy - slope * sx) / n
-    return slope, intercept
-def _r_squared(xs: List[float], ys: List[float], slope: float, intercept: float) -> float:
-    """Coefficient of determination — measures trend linearity."""
-    if len(ys) < 2:
-        return 0.0
-    y_mean = sum(ys) / len(ys)
-    ss_tot = sum((y - y_mean) ** 2 for y in ys)
-    if ss_tot == 0:
-        return 1.0
-    ss_res = sum((y - (slope * x + intercept)) ** 2 for x, y in zip(xs, ys))
-    return max(0.0, 1.0 - ss_res / ss_tot)
-def _confidence(data_points: int, r2: float) -> float:
-    """
-    Confidence score in [0, 1].
-    Saturates at 30 data points; scaled by R² (linearity of the trend).
-    """
-    saturation = min(1.0, data_points / 30.0)
-    return round(saturation * max(0.0, r2), 3)
-def _days_to_pct(
-        current_used: float, quota: float,
-        trend_per_day: float, target_pct: float = 90.0) -> Optional[float]:
-    """
-    How many days at current trend until resource reaches target_pct of quota?
-    Returns None if quota is unknown/zero or trend is flat/negative.
-    """
-    if not quota or quota <= 0 or trend_per_day <= 0:
-        return None
-    target = quota * target_pct / 100.0
-    gap    = target - current_used
-    if gap <= 0:
-        return 0.0
-    return gap / trend_per_day
 def _severity_from_days(days: float) -> str:
     if days <= 7:
         return "critical"
     if days <= 14:
         return "high"
     return "medium"
+def _num(value: float, digits: int) -> Optional[float]:
+    """Round for metadata; NaN/inf become None (JSON null)."""
+    value = float(value)
+    return round(value, digits) if math.isfinite(value) else None
+def _interval_meta(fit: TrendFit, i: int, early: np.ndarray, late: np.ndarray,
+                   digits: int) -> dict:
+    """trend_ci_95 / days_to_90_range metadata of series ``i``."""
+    return {
+        "trend_ci_95":      [_num(fit.slope_lo[i], digits), _num(fit.slope_hi[i], digits)],
+        "days_to_90_range": [_num(early[i], 1), _num(late[i], 1)],
+    }
 # ---------------------------------------------------------------------------
 # Engine
 # ---------------------------------------------------------------------------
 class CapacityEngine(BaseEngine):
+    # metering_quotas columns loaded per project, as arrays ordered by time
+    _SERIES_COLUMNS = (
+        "storage_quota_gb",  "storage_used_gb",
+        "vcpus_used",        "vcpus_quota",
+        "ram_used_mb",       "ram_quota_mb",
+        "instances_used",    "instances_quota",
+        "floating_ips_used", "floating_ips_quota",
+    )
+    def __init__(self, conn, method: Optional[str] = None) -> None:
+        super().__init__(conn)
+        method = (method or FORECAST_METHOD).strip().lower()
+        if method not in FITTERS:
+            log.warning("CapacityEngine: unknown forecast method %r, using linear", method)
+            method = "linear"
+        self.method = method
+        self._fit = FITTERS[method]
     def run(self) -> None:
-        projects = self._load_projects()
-        log.info("CapacityEngine: evaluating %d project(s)", len(projects))
-        for proj in projects:
-            try:
-                self._evaluate_storage(proj)
-                self._evaluate_project_quotas(proj)
-            except Exception as exc:
-                log.warning("CapacityEngine: error on project %s: %s",
-                            proj.get("project_id"), exc)
+        try:
+            projects = self._load_project_series()
+        except Exception as exc:
+            log.warning("CapacityEngine: loading metering series failed: %s", exc)
+            self.conn.rollback()
+            projects = []
+        log.info("CapacityEngine: evaluating %d project(s) (%s fit)", len(projects), self.method)
+        if projects:
+            for evaluate in (self._evaluate_storage, self._evaluate_project_quotas):
+                try:
+                    evaluate(projects)
+                except Exception as exc:
+                    log.warning("CapacityEngine: %s failed: %s", evaluate.__name__, exc)
+                    try:
+                        self.conn.rollback()
+                    except Exception:
+                        pass
         # Compute / hypervisor-level forecasting
         try:
             self._evaluate_hypervisors()
@@ -107,85 +105,93 @@ class CapacityEngine(BaseEngine):
                 self.conn.rollback()
             except Exception:
                 pass
-    def _load_projects(self) -> list:
+    def _load_project_series(self) -> List[dict]:
+        """Last 14 days of metering_quotas, one row per project with array columns."""
+        columns = ",\n".join(
+            f"array_agg({c} ORDER BY collected_at) AS {c}" for c in self._SERIES_COLUMNS
+        )
         with self.conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-            cur.execute("""
-                SELECT DISTINCT project_id, project_name
+            cur.execute(f"""
+                SELECT
+                    project_id,
+                    (array_agg(project_name ORDER BY collected_at DESC))[1] AS project_name,
+                    array_agg(EXTRACT(EPOCH FROM collected_at)::float8 ORDER BY collected_at) AS ts,
+                    {columns}
                 FROM metering_quotas
                 WHERE collected_at >= NOW() - INTERVAL '14 days'
                   AND project_id IS NOT NULL
+                GROUP BY project_id
+                ORDER BY project_id
             """)
             return [dict(r) for r in cur.fetchall()]
     # ------------------------------------------------------------------
     # Storage forecast (original Phase 1 detector, with confidence)
     # ------------------------------------------------------------------
-    def _evaluate_storage(self, proj: dict) -> None:
-        project_id   = proj["project_id"]
-        project_name = proj["project_name"] or project_id
-        with self.conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-            cur.execute("""
-                SELECT
-                    EXTRACT(EPOCH FROM collected_at) AS ts,
-                    storage_quota_gb,
-                    storage_used_gb
-                FROM metering_quotas
-                WHERE project_id = %s
-                  AND collected_at >= NOW() - INTERVAL '14 days'
-                  AND storage_quota_gb IS NOT NULL
-                  AND storage_used_gb  IS NOT NULL
-                ORDER BY collected_at ASC
-            """, (project_id,))
-            rows = cur.fetchall()
-        if len(rows) < 7:
-            self.suppress_resolved(_TYPE_STORAGE, "project", project_id)
-            return
-        quota     = float(rows[-1]["storage_quota_gb"])
-        used_now  = float(rows[-1]["storage_used_gb"])
-        current_pct = (used_now / quota * 100) if quota else 0
-        if quota <= 0:
-            return
-        t0    = float(rows[0]["ts"])
-        xs    = [(float(r["ts"]) - t0) / 86400.0 for r in rows]
-        ys    = [float(r["storage_used_gb"]) for r in rows]
-        slope, intercept = _linear_regression(xs, ys)
-        r2    = _r_squared(xs, ys, slope, intercept)
-        conf  = _confidence(len(rows), r2)
-        days = _days_to_pct(used_now, quota, slope)
-        if days is None or days > 30:
-            self.suppress_resolved(_TYPE_STORAGE, "project", project_id)
-            return
-        days_int = max(0, int(days))
-        severity = _severity_from_days(days)
-        title = (
-            f"Storage critical: {project_name} hits 90% capacity in {days_int} day(s)"
-            if severity == "critical"
-            else f"Storage {'warning' if severity == 'high' else 'trend'}: "
-                 f"{project_name} projected to hit 90% in {days_int} day(s)"
-        )
-        message = (
-            f"Project {project_name!r} is using {used_now:.0f} GB of {quota:.0f} GB quota "
-            f"({current_pct:.1f}%). At the current growth rate of {slope:.1f} GB/day, "
-            f"storage will reach 90% capacity in approximately {days_int} day(s)."
-        )
-        self.upsert_insight(
-            type=_TYPE_STORAGE,
-            severity=severity,
-            entity_type="project",
-            entity_id=project_id,
-            entity_name=project_name,
-            title=title,
-            message=message,
-            metadata={
-                "current_pct":      round(current_pct, 1),
-                "days_to_90":       days_int,
-                "trend_gb_per_day": round(slope, 2),
-                "data_points":      len(rows),
-                "quota_gb":         quota,
-                "used_gb":          used_now,
-                "confidence":       conf,
-                "r_squared":        round(r2, 3),
-            },
-        )
+    def _evaluate_storage(self, projects: List[dict]) -> None:
+        # Only samples where both storage columns are set count as points.
+        used_series, quota_series = [], []
+        for p in projects:
+            pairs = list(zip(p["storage_quota_gb"], p["storage_used_gb"]))
+            used_series.append((p["ts"], [u if q is not None else None for q, u in pairs]))
+            quota_series.append((p["ts"], [q if u is not None else None for q, u in pairs]))
+        X, Y = pack_series(used_series)
+        _, Q = pack_series(quota_series)
+        fit = self._fit(X, Y)
+        used_now = last_valid(Y)
+        quota = last_valid(Q)
+        conf = confidence(fit.n, fit.r2)
+        days = days_to_pct(used_now, quota, fit.slope)
+        early = days_to_pct(used_now, quota, fit.slope_hi)
+        late = days_to_pct(used_now, quota, fit.slope_lo)
+        resolved = []
+        for i, proj in enumerate(projects):
+            project_id   = proj["project_id"]
+            project_name = proj["project_name"] or project_id
+            if fit.n[i] < 7:
+                resolved.append(project_id)
+                continue
+            if quota[i] <= 0:
+                continue
+            if not days[i] <= 30:  # NaN: no growth toward the quota
+                resolved.append(project_id)
+                continue
+            slope = float(fit.slope[i])
+            current_pct = float(used_now[i] / quota[i] * 100)
+            days_int = max(0, int(days[i]))
+            severity = _severity_from_days(days[i])
+            title = (
+                f"Storage critical: {project_name} hits 90% capacity in {days_int} day(s)"
+                if severity == "critical"
+                else f"Storage {'warning' if severity == 'high' else 'trend'}: "
+                     f"{project_name} projected to hit 90% in {days_int} day(s)"
+            )
+            message = (
+                f"Project {project_name!r} is using {used_now[i]:.0f} GB of {quota[i]:.0f} GB quota "
+                f"({current_pct:.1f}%). At the current growth rate of {slope:.1f} GB/day, "
+                f"storage will reach 90% capacity in approximately {days_int} day(s)."
+            )
+            self.upsert_insight(
+                type=_TYPE_STORAGE,
+                severity=severity,
+                entity_type="project",
+                entity_id=project_id,
+                entity_name=project_name,
+                title=title,
+                message=message,
+                metadata={
+                    "current_pct":      round(current_pct, 1),
+                    "days_to_90":       days_int,
+                    "trend_gb_per_day": round(slope, 2),
+                    "data_points":      int(fit.n[i]),
+                    "quota_gb":         float(quota[i]),
+                    "used_gb":          float(used_now[i]),
+                    "confidence":       float(conf[i]),
+                    "r_squared":        round(float(fit.r2[i]), 3),
+                    "method":           self.method,
+                    **_interval_meta(fit, i, early, late, 2),
+                },
+            )
+        self.suppress_resolved_many(_TYPE_STORAGE, "project", resolved)
     # ------------------------------------------------------------------
     # Quota saturation forecast — Phase 3
     # vCPUs, RAM, instances, floating IPs per project
@@ -197,59 +203,34 @@ class CapacityEngine(BaseEngine):
         "instances":   ("instances_used",     "instances_quota",    "Instances"),
         "floating_ip": ("floating_ips_used",  "floating_ips_quota", "Floating IPs"),
     }
-    def _evaluate_project_quotas(self, proj: dict) -> None:
-        project_id   = proj["project_id"]
-        project_name = proj["project_name"] or project_id
-        with self.conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-            cur.execute("""
-                SELECT
-                    EXTRACT(EPOCH FROM collected_at) AS ts,
-                    vcpus_used,        vcpus_quota,
-                    ram_used_mb,       ram_quota_mb,
-                    instances_used,    instances_quota,
-                    floating_ips_used, floating_ips_quota
-                FROM metering_quotas
-                WHERE project_id = %s
-                  AND collected_at >= NOW() - INTERVAL '14 days'
-                ORDER BY collected_at ASC
-            """, (project_id,))
-            rows = cur.fetchall()
-        if len(rows) < 7:
-            for key in self._QUOTA_RESOURCES:
-                self.suppress_resolved(f"{_TYPE_QUOTA}_{key}", "project", project_id)
-            return
-        t0 = float(rows[0]["ts"])
-        xs = [(float(r["ts"]) - t0) / 86400.0 for r in rows]
-        fired_any = False
-        meta_by_resource: Dict[str, dict] = {}
+    def _evaluate_project_quotas(self, projects: List[dict]) -> None:
+        # Every sample counts; a missing usage value is treated as 0.
+        too_short = [p["project_id"] for p in projects if len(p["ts"]) < 7]
+        projects = [p for p in projects if len(p["ts"]) >= 7]
         for key, (used_col, quota_col, label) in self._QUOTA_RESOURCES.items():
             insight_type = f"{_TYPE_QUOTA}_{key}"
-            try:
-                ys    = [float(r[used_col] or 0) for r in rows]
-                quota = float(rows[-1][quota_col] or 0)
-                if quota <= 0:
-                    self.suppress_resolved(insight_type, "project", project_id)
+            resolved = list(too_short)
+            if not projects:
+                self.suppress_resolved_many(insight_type, "project", resolved)
+                continue
+            X, Y = pack_series([(p["ts"], p[used_col]) for p in projects], fill=0.0)
+            quota = np.array([float(p[quota_col][-1] or 0) for p in projects])
+            fit = self._fit(X, Y)
+            used_now = last_valid(Y)
+            conf = confidence(fit.n, fit.r2)
+            days = days_to_pct(used_now, quota, fit.slope)
+            early = days_to_pct(used_now, quota, fit.slope_hi)
+            late = days_to_pct(used_now, quota, fit.slope_lo)
+            for i, proj in enumerate(projects):
+                project_id   = proj["project_id"]
+                project_name = proj["project_name"] or project_id
+                if quota[i] <= 0 or not days[i] <= 30:
+                    resolved.append(project_id)
                     continue
-                used_now    = ys[-1]
-                current_pct = used_now / quota * 100
-                slope, intercept = _linear_regression(xs, ys)
-                r2   = _r_squared(xs, ys, slope, intercept)
-                conf = _confidence(len(rows), r2)
-                days = _days_to_pct(used_now, quota, slope)
-                meta_by_resource[key] = {
-                    "used":         used_now,
-                    "quota":        quota,
-                    "used_pct":     round(current_pct, 1),
-                    "days_to_90":   int(days) if days is not None else None,
-                    "trend_per_day": round(slope, 3),
-                    "confidence":   conf,
-                }
-                if days is None or days > 30:
-                    self.suppress_resolved(insight_type, "project", project_id)
-                    continue
-                days_int = max(0, int(days))
-                severity = _severity_from_days(days)
-                fired_any = True
+                slope = float(fit.slope[i])
+                current_pct = float(used_now[i] / quota[i] * 100)
+                days_int = max(0, int(days[i]))
+                severity = _severity_from_days(days[i])
                 self.upsert_insight(
                     type=insight_type,
                     severity=severity,
@@ -258,28 +239,27 @@ class CapacityEngine(BaseEngine):
                     entity_name=project_name,
                     title=f"Quota saturation: {project_name} — {label} reaches 90% in {days_int} day(s)",
                     message=(
-                        f"Project {project_name!r} is using {used_now:.0f} of "
-                        f"{quota:.0f} {label} ({current_pct:.1f}%). "
+                        f"Project {project_name!r} is using {used_now[i]:.0f} of "
+                        f"{quota[i]:.0f} {label} ({current_pct:.1f}%). "
                         f"At the current growth rate of {slope:.2f}/day, "
                         f"this quota will reach 90% in approximately {days_int} day(s)."
                     ),
                     metadata={
                         "resource":     label,
-                        "used":         used_now,
-                        "quota":        quota,
+                        "used":         float(used_now[i]),
+                        "quota":        float(quota[i]),
                         "used_pct":     round(current_pct, 1),
                         "days_to_90":   days_int,
                         "trend_per_day": round(slope, 3),
-                        "data_points":  len(rows),
-                        "confidence":   conf,
-                        "r_squared":    round(r2, 3),
+                        "data_points":  int(fit.n[i]),
+                        "confidence":   float(conf[i]),
+                        "r_squared":    round(float(fit.r2[i]), 3),
                         "project":      project_name,
+                        "method":       self.method,
+                        **_interval_meta(fit, i, early, late, 3),
                     },
                 )
-            except Exception as exc:
-                log.debug("quota forecast for %s/%s failed: %s", project_id, key, exc)
-        if not fired_any and not meta_by_resource:
-            pass  # nothing to do
+            self.suppress_resolved_many(insight_type, "project", resolved)
     # ------------------------------------------------------------------
     # Compute / hypervisor-level forecast — Phase 3
     # ------------------------------------------------------------------
@@ -315,57 +295,69 @@ class CapacityEngine(BaseEngine):
                 FROM hypervisors h
                 WHERE h.state = 'up'
             """)
-            hosts = cur.fetchall()
+            hosts = [dict(r) for r in cur.fetchall()]
+        hosts = [h for h in hosts if float(h["total_vcpus"] or 0) > 0]
         if not hosts:
             return
         log.info("CapacityEngine: evaluating %d hypervisor(s) for compute forecast", len(hosts))
-        for host in hosts:
+        names = [h["hostname"] or str(h["hypervisor_id"]) for h in hosts]
+        # Active-VM count per servers_history snapshot, all hosts in one query
+        with self.conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+            cur.execute("""
+                SELECT hypervisor_hostname,
+                       array_agg(ts ORDER BY ts)         AS ts,
+                       array_agg(active_vms ORDER BY ts) AS active_vms
+                FROM (
+                    SELECT
+                        h.hypervisor_hostname,
+                        EXTRACT(EPOCH FROM h.recorded_at)::float8 AS ts,
+                        COUNT(*)                                  AS active_vms
+                    FROM servers_history h
+                    WHERE h.hypervisor_hostname = ANY(%s)
+                      AND h.status              = 'ACTIVE'
+                      AND h.recorded_at        >= NOW() - INTERVAL '14 days'
+                    GROUP BY h.hypervisor_hostname, h.recorded_at
+                ) snap
+                GROUP BY hypervisor_hostname
+            """, (names,))
+            series = {r["hypervisor_hostname"]: r for r in cur.fetchall()}
+        empty = {"ts": [], "active_vms": []}
+        X, Y = pack_series([
+            (series.get(n, empty)["ts"], series.get(n, empty)["active_vms"]) for n in names
+        ])
+        fit = self._fit(X, Y)
+        conf = confidence(fit.n, fit.r2)
+        last_active = last_valid(Y)
+        resolved = []
+        for i, host in enumerate(hosts):
             try:
-                self._forecast_hypervisor(dict(host))
+                if not self._forecast_hypervisor(host, names[i], fit, i, float(conf[i]),
+                                                 float(last_active[i])):
+                    resolved.append(str(host["hypervisor_id"]))
             except Exception as exc:
                 log.debug("hypervisor forecast error for %s: %s",
                           host.get("hostname"), exc)
-    def _forecast_hypervisor(self, host: dict) -> None:
+        self.suppress_resolved_many(_TYPE_COMPUTE, "hypervisor", resolved)
+    def _forecast_hypervisor(self, host: dict, hostname: str, fit: TrendFit, i: int,
+                             conf: float, active_now: float) -> bool:
+        """Fire the compute insight for ``host``; False if it should be resolved."""
         hv_id      = host["hypervisor_id"]
-        hostname   = host["hostname"] or str(hv_id)
         total_vcpu = float(host["total_vcpus"] or 0)
         total_ram  = float(host["total_ram_mb"] or 0)
         alloc_vcpu = float(host["allocated_vcpus"] or 0)
         alloc_ram  = float(host["allocated_ram_mb"] or 0)
         region     = host.get("region_id") or "default"
-        if total_vcpu <= 0:
-            return
-        # Derive utilization from live snapshots in servers_history
-        with self.conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-            cur.execute("""
-                SELECT
-                    EXTRACT(EPOCH FROM h.recorded_at) AS ts,
-                    COUNT(*)                          AS active_vms
-                FROM servers_history h
-                WHERE h.hypervisor_hostname = %s
-                  AND h.status              = 'ACTIVE'
-                  AND h.recorded_at        >= NOW() - INTERVAL '14 days'
-                GROUP BY h.recorded_at
-                ORDER BY h.recorded_at ASC
-            """, (hostname,))
-            rows = cur.fetchall()
         # Fallback: need at least 5 data points for a meaningful trend
-        if len(rows) < 5:
-            self.suppress_resolved(_TYPE_COMPUTE, "hypervisor", str(hv_id))
-            return
-        t0    = float(rows[0]["ts"])
-        xs    = [(float(r["ts"]) - t0) / 86400.0 for r in rows]
-        ys    = [float(r["active_vms"]) for r in rows]
-        slope, intercept = _linear_regression(xs, ys)
-        r2    = _r_squared(xs, ys, slope, intercept)
-        conf  = _confidence(len(rows), r2)
+        if fit.n[i] < 5:
+            return False
+        slope = float(fit.slope[i])
         # Capacity headroom in VMs (approximation: avg 2 vCPUs per VM)
-        avg_vcpus_per_vm = (alloc_vcpu / max(1, rows[-1]["active_vms"]))
+        avg_vcpus_per_vm = (alloc_vcpu / max(1, active_now))
         if avg_vcpus_per_vm < 1:
             avg_vcpus_per_vm = 2.0
         headroom_vms     = max(0, (total_vcpu * 0.9 - alloc_vcpu) / avg_vcpus_per_vm)
         headroom_ram_vms = max(0, (total_ram * 0.9 - alloc_ram) / max(
-            1, (alloc_ram / max(1, rows[-1]["active_vms"]))))
+            1, (alloc_ram / max(1, active_now))))
         # Days to 90% vCPU utilisation (using VM-growth proxy)
         days_vcpu = (headroom_vms / slope) if slope > 0 else None
         days_ram  = (headroom_ram_vms / slope) if slope > 0 else None
@@ -373,8 +365,13 @@ class CapacityEngine(BaseEngine):
             d for d in [days_vcpu, days_ram] if d is not None
         ) if any(d is not None for d in [days_vcpu, days_ram]) else None
         if days is None or days > 30:
-            self.suppress_resolved(_TYPE_COMPUTE, "hypervisor", str(hv_id))
-            return
+            return False
+        headroom = min(headroom_vms, headroom_ram_vms)
+        slope_lo, slope_hi = float(fit.slope_lo[i]), float(fit.slope_hi[i])
+        days_range = [
+            _num(headroom / slope_hi, 1) if slope_hi > 0 else None,
+            _num(headroom / slope_lo, 1) if slope_lo > 0 else None,
+        ]
         days_int  = max(0, int(days))
         severity  = _severity_from_days(days)
         vcpu_pct  = round(alloc_vcpu / total_vcpu * 100, 1) if total_vcpu else 0
@@ -391,7 +388,7 @@ class CapacityEngine(BaseEngine):
             message=(
                 f"Hypervisor {hostname!r} in region {region!r} is currently at "
                 f"{vcpu_pct}% vCPU and {ram_pct}% RAM allocation "
-                f"({rows[-1]['active_vms']:.0f} active VMs). "
+                f"({active_now:.0f} active VMs). "
                 f"At the current growth rate of {slope:.2f} VMs/day, "
                 f"compute capacity will reach 90% in approximately {days_int} day(s)."
             ),
@@ -403,11 +400,15 @@ class CapacityEngine(BaseEngine):
                 "total_ram_mb":     int(total_ram),
                 "allocated_ram_mb": int(alloc_ram),
                 "ram_pct":          ram_pct,
-                "active_vms":       int(rows[-1]["active_vms"]),
+                "active_vms":       int(active_now),
                 "vm_growth_per_day": round(slope, 3),
                 "days_to_90":       days_int,
-                "data_points":      len(rows),
+                "data_points":      int(fit.n[i]),
                 "confidence":       conf,
-                "r_squared":        round(r2, 3),
+                "r_squared":        round(float(fit.r2[i]), 3),
+                "method":           self.method,
+                "trend_ci_95":      [_num(slope_lo, 3), _num(slope_hi, 3)],
+                "days_to_90_range": days_range,
             },
         )
+        return True
@@ -0,0 +1,247 @@
+"""
+Batched trend fitting for the intelligence engines.
+
+Series are packed into NaN-padded ``(n_series, n_points)`` arrays so every
+series is fitted in the same NumPy operations instead of one Python loop per
+project or hypervisor.  ``x`` is in days since each series' first point.
+
+Fitters (``FITTERS``), all returning a ``TrendFit`` of per-series arrays:
+  linear    — ordinary least squares; the engines' default.
+  theil_sen — median of pairwise slopes; robust to spikes and quota resets.
+              Series longer than ``max_points`` are evenly subsampled.
+  holt      — Holt's linear exponential smoothing (level + trend), adapted to
+              irregular sampling; follows recent growth rather than the
+              14-day average.
+
+``slope_lo``/``slope_hi`` bound the trend at 95 %: the t-interval of the
+least-squares slope for ``linear`` and ``holt`` (around the Holt line), and
+Sen's rank-based interval for ``theil_sen``.  They are NaN when a series has
+fewer than three points.
+"""
+from __future__ import annotations
+
+from typing import NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Two-sided 95 % Student-t quantiles for 1..30 degrees of freedom.
+_T95 = np.array([
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+])
+_Z95 = 1.959964
+
+
+class TrendFit(NamedTuple):
+    slope: np.ndarray       # units per day
+    intercept: np.ndarray   # value at x = 0
+    r2: np.ndarray          # of the fitted line, clipped to [0, 1]
+    n: np.ndarray           # points used per series
+    slope_lo: np.ndarray
+    slope_hi: np.ndarray
+
+
+def _t95(df: np.ndarray) -> np.ndarray:
+    """Student-t 0.975 quantile; Cornish-Fisher expansion beyond the table."""
+    df = np.asarray(df, dtype=float)
+    out = np.full(df.shape, np.nan)
+    small = (df >= 1) & (df <= 30)
+    out[small] = _T95[df[small].astype(int) - 1]
+    big = df > 30
+    d = df[big]
+    out[big] = _Z95 + (_Z95 ** 3 + _Z95) / (4 * d) + (5 * _Z95 ** 5 + 16 * _Z95 ** 3 + 3 * _Z95) / (96 * d ** 2)
+    return out
+
+
+def pack_series(series: Sequence[Tuple[Sequence[float], Sequence[Optional[float]]]],
+                fill: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Pack ``(timestamps_s, values)`` pairs into ``(X, Y)`` arrays.
+
+    Points whose value is None are dropped (or set to ``fill`` when given),
+    the rest are left-aligned and padded with NaN.  ``X`` is days since the
+    series' first kept point, like the per-series fits it replaces.
+    """
+    width = max((len(ts) for ts, _ in series), default=0)
+    X = np.full((len(series), max(width, 1)), np.nan)
+    Y = np.full_like(X, np.nan)
+    for i, (ts, ys) in enumerate(series):
+        if not len(ts):
+            continue
+        t = np.asarray(ts, dtype=float)
+        y = np.array(ys, dtype=float)  # None → NaN
+        if fill is not None:
+            y[np.isnan(y)] = fill
+        else:
+            keep = ~np.isnan(y)
+            if not keep.all():
+                t, y = t[keep], y[keep]
+            if not len(t):
+                continue
+        X[i, :len(t)] = (t - t[0]) / 86400.0
+        Y[i, :len(y)] = y
+    return X, Y
+
+
+def last_valid(Y: np.ndarray) -> np.ndarray:
+    """Last non-NaN value of every row (NaN for empty rows)."""
+    n = np.isfinite(Y).sum(axis=1)
+    out = np.full(Y.shape[0], np.nan)
+    has = n > 0
+    out[has] = Y[has, n[has] - 1]
+    return out
+
+
+def _r2(X, Y, mask, slope, intercept, n) -> np.ndarray:
+    y_mean = np.where(n > 0, np.where(mask, Y, 0.0).sum(axis=1) / np.maximum(n, 1), 0.0)
+    ss_tot = np.where(mask, (Y - y_mean[:, None]) ** 2, 0.0).sum(axis=1)
+    resid = Y - (slope[:, None] * X + intercept[:, None])
+    ss_res = np.where(mask, resid ** 2, 0.0).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r2 = np.where(ss_tot == 0, 1.0, np.maximum(0.0, 1.0 - ss_res / ss_tot))
+    return np.where(n < 2, 0.0, r2), ss_res
+
+
+def _t_interval(X, mask, slope, ss_res, n) -> Tuple[np.ndarray, np.ndarray]:
+    """95 % t-interval of a slope from its residuals around the fitted line."""
+    x_mean = np.where(mask, X, 0.0).sum(axis=1) / np.maximum(n, 1)
+    sxx = np.where(mask, (X - x_mean[:, None]) ** 2, 0.0).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        se = np.sqrt(ss_res / (n - 2) / sxx)
+    half = _t95(n - 2) * se
+    half = np.where((n > 2) & (sxx > 0), half, np.nan)
+    return slope - half, slope + half
+
+
+def fit_linear(X: np.ndarray, Y: np.ndarray) -> TrendFit:
+    """Least-squares line per row (closed form over the valid points)."""
+    mask = np.isfinite(X) & np.isfinite(Y)
+    Xz, Yz = np.where(mask, X, 0.0), np.where(mask, Y, 0.0)
+    n = mask.sum(axis=1)
+    sx, sy = Xz.sum(axis=1), Yz.sum(axis=1)
+    sxy, sxx = (Xz * Yz).sum(axis=1), (Xz * Xz).sum(axis=1)
+    denom = n * sxx - sx * sx
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = np.where((n >= 2) & (denom != 0), (n * sxy - sx * sy) / denom, 0.0)
+        intercept = np.where(n > 0, (sy - slope * sx) / n, 0.0)
+    r2, ss_res = _r2(X, Y, mask, slope, intercept, n)
+    lo, hi = _t_interval(X, mask, slope, ss_res, n)
+    return TrendFit(slope, intercept, r2, n, lo, hi)
+
+
+def fit_theil_sen(X: np.ndarray, Y: np.ndarray, max_points: int = 64) -> TrendFit:
+    """Theil–Sen slope (median pairwise slope) per row.
+
+    Rows must be left-aligned (see ``pack_series``).  Rows with more than
+    ``max_points`` points are evenly subsampled, keeping the pair count per
+    row at ``max_points²/2``.
+    """
+    rows, width = X.shape
+    n_all = (np.isfinite(X) & np.isfinite(Y)).sum(axis=1)
+    m = max(2, min(max_points, width))
+    j = np.arange(m)
+    idx = np.where(
+        (n_all > m)[:, None],
+        (j[None, :] * (np.maximum(n_all, 1)[:, None] - 1)) // (m - 1),
+        np.minimum(j[None, :], width - 1),
+    )
+    sub_valid = j[None, :] < np.minimum(n_all, m)[:, None]
+    Xs = np.where(sub_valid, np.take_along_axis(X, idx, axis=1), np.nan)
+    Ys = np.where(sub_valid, np.take_along_axis(Y, idx, axis=1), np.nan)
+
+    a, b = np.triu_indices(m, k=1)
+    dx = Xs[:, b] - Xs[:, a]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pair = np.where(dx != 0, (Ys[:, b] - Ys[:, a]) / dx, np.nan)
+    pair = np.sort(pair, axis=1)  # NaN sorts last
+    n_pairs = np.isfinite(pair).sum(axis=1)
+
+    def _rank(k):
+        k = np.clip(k, 0, np.maximum(n_pairs - 1, 0)).astype(int)
+        return np.take_along_axis(pair, k[:, None], axis=1)[:, 0] if pair.shape[1] else np.full(rows, np.nan)
+
+    has = n_pairs > 0
+    slope = np.where(has, 0.5 * (_rank((n_pairs - 1) // 2) + _rank(n_pairs // 2)), 0.0)
+
+    mask = np.isfinite(X) & np.isfinite(Y)
+    with np.errstate(all="ignore"):
+        resid0 = np.where(mask, Y - slope[:, None] * X, np.nan)
+        intercept = np.where(n_all > 0, np.nanmedian(np.where(n_all[:, None] > 0, resid0, 0.0), axis=1), 0.0)
+    r2, _ = _r2(X, Y, mask, slope, intercept, n_all)
+
+    # Sen (1968): the interval's ranks are (N ∓ z·sqrt(Var S)) / 2.
+    ns = np.minimum(n_all, m).astype(float)
+    c = _Z95 * np.sqrt(ns * (ns - 1) * (2 * ns + 5) / 18.0)
+    lo = _rank(np.floor((n_pairs - c) / 2.0))
+    hi = _rank(np.ceil((n_pairs + c) / 2.0))
+    ok = has & (ns > 2)
+    return TrendFit(slope, intercept, r2, n_all,
+                    np.where(ok, lo, np.nan), np.where(ok, hi, np.nan))
+
+
+def fit_holt(X: np.ndarray, Y: np.ndarray, alpha: float = 0.5, beta: float = 0.3) -> TrendFit:
+    """Holt's linear trend per row, for irregularly spaced points.
+
+    Each step forecasts ``level + trend·dt``, blends it with the observation
+    (``alpha``) and updates the per-day trend from the level change
+    (``beta``).  The returned line passes through the final level with the
+    final trend as slope.
+    """
+    rows, width = X.shape
+    mask = np.isfinite(X) & np.isfinite(Y)
+    n = mask.sum(axis=1)
+    level = np.where(mask[:, 0], Y[:, 0], 0.0)
+    last_x = np.where(mask[:, 0], X[:, 0], 0.0)
+    trend = np.zeros(rows)
+    seeded = np.zeros(rows, dtype=bool)
+    for t in range(1, width):
+        valid = mask[:, t]
+        if not valid.any():
+            break
+        x, y = X[:, t], Y[:, t]
+        dt = np.where(valid, x - last_x, 0.0)
+        step = valid & (dt > 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            first = step & ~seeded
+            # Seed the trend from the first two points.
+            trend = np.where(first, (y - level) / dt, trend)
+            level = np.where(first, y, level)
+            seeded |= first
+            rest = step & ~first
+            pred = level + trend * dt
+            new_level = alpha * y + (1 - alpha) * pred
+            new_trend = beta * (new_level - level) / dt + (1 - beta) * trend
+            level = np.where(rest, new_level, level)
+            trend = np.where(rest, new_trend, trend)
+        last_x = np.where(step, x, last_x)
+    slope = np.where(n >= 2, trend, 0.0)
+    intercept = level - slope * last_x
+    r2, ss_res = _r2(X, Y, mask, slope, intercept, n)
+    lo, hi = _t_interval(X, mask, slope, ss_res, n)
+    return TrendFit(slope, intercept, r2, n, lo, hi)
+
+
+FITTERS = {
+    "linear": fit_linear,
+    "theil_sen": fit_theil_sen,
+    "holt": fit_holt,
+}
+
+
+def confidence(n: np.ndarray, r2: np.ndarray) -> np.ndarray:
+    """Confidence in [0, 1]: saturates at 30 points, scaled by R²."""
+    return np.round(np.minimum(1.0, n / 30.0) * np.maximum(0.0, r2), 3)
+
+
+def days_to_pct(used: np.ndarray, quota: np.ndarray, trend_per_day: np.ndarray,
+                target_pct: float = 90.0) -> np.ndarray:
+    """Days until ``used`` reaches ``target_pct`` of ``quota`` at ``trend_per_day``.
+
+    NaN where the quota is unknown/zero or the trend is flat, negative or
+    NaN; 0 where the target is already reached.
+    """
+    used, quota, trend = (np.asarray(a, dtype=float) for a in (used, quota, trend_per_day))
+    gap = quota * target_pct / 100.0 - used
+    with np.errstate(divide="ignore", invalid="ignore"):
+        days = np.where(gap <= 0, 0.0, gap / trend)
+    return np.where((quota > 0) & (trend > 0), days, np.nan)
@@ -38,37 +38,7 @@ from engines.leakage import LeakageEngine
 from engines.rightsizing import RightsizingEngine
 from engines.sla_defense import SlaDefenseEngine
 from engines.timeline_harvester import TimelineHarvester
-
-# ---------------------------------------------------------------------------
-# Worker observability — Redis metrics
-# ---------------------------------------------------------------------------
-_REDIS_HOST  = os.getenv("REDIS_HOST", "redis")
-_REDIS_PORT  = int(os.getenv("REDIS_PORT", "6379"))
-_REDIS_PASSWORD = os.getenv("REDIS_PASSWORD") or None
-_WORKER_NAME = "intelligence_worker"
-_worker_runs_total   = 0
-_worker_errors_total = 0
-
-
-def _report_worker_metrics(duration_s: float, had_error: bool, frequency_s: int) -> None:
-    global _worker_runs_total, _worker_errors_total
-    _worker_runs_total += 1
-    if had_error:
-        _worker_errors_total += 1
-    try:
-        import redis as _redis
-        r = _redis.Redis(host=_REDIS_HOST, port=_REDIS_PORT, password=_REDIS_PASSWORD, socket_connect_timeout=2)
-        r.hset(f"pf9:worker:{_WORKER_NAME}", mapping={
-            "runs_total":          _worker_runs_total,
-            "errors_total":        _worker_errors_total,
-            "last_run_ts":         time.time(),
-            "last_run_duration_s": round(duration_s, 2),
-            "frequency_s":         frequency_s,
-            "label":               _WORKER_NAME,
-        })
-    except Exception:
-        pass
-
+from shared.worker_telemetry import WorkerTelemetry
 
 # ---------------------------------------------------------------------------
 # Secret helper
@@ -96,6 +66,9 @@ DB_USER       = os.getenv("DB_USER", "pf9")
 DB_PASS       = _read_secret("db_password", "DB_PASS") or os.getenv("POSTGRES_PASSWORD", "")
 POLL_INTERVAL = int(os.getenv("INTELLIGENCE_INTERVAL_SECONDS", "900"))
 
+# Per-engine timings, DB statement counts and heartbeat for GET /worker-metrics
+_telemetry = WorkerTelemetry("intelligence_worker", frequency_s=POLL_INTERVAL)
+
 # ---------------------------------------------------------------------------
 # Logging
 # ---------------------------------------------------------------------------
@@ -135,6 +108,7 @@ def get_conn():
     return psycopg2.connect(
         host=DB_HOST, port=DB_PORT, dbname=DB_NAME,
         user=DB_USER, password=DB_PASS,
+        connection_factory=_telemetry.connection_factory,
     )
 
 
@@ -187,7 +161,8 @@ def run_once(conn) -> None:
     for engine_cls in ENGINES:
         engine = engine_cls(conn)
         try:
-            engine.run()
+            with _telemetry.stage("engine", component=engine_cls.__name__):
+                engine.run()
         except Exception as exc:
             log.warning("Engine %s failed: %s", engine_cls.__name__, exc)
             try:
@@ -210,24 +185,23 @@ def main():
     while not _shutdown:
         conn = None
         t0 = time.time()
-        had_error = False
-        try:
-            conn = get_conn_with_cb()
-            run_once(conn)
-            with open("/tmp/alive", "w") as fh:
-                fh.write(str(time.time()))
-        except Exception as exc:
-            had_error = True
-            log.error("Intelligence worker cycle failed: %s", exc)
-        finally:
-            if conn:
-                try:
-                    conn.close()
-                except Exception:
-                    pass
+        with _telemetry.cycle():
+            try:
+                conn = get_conn_with_cb()
+                run_once(conn)
+                with open("/tmp/alive", "w") as fh:
+                    fh.write(str(time.time()))
+            except Exception as exc:
+                _telemetry.fail()
+                log.error("Intelligence worker cycle failed: %s", exc)
+            finally:
+                if conn:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
 
         duration = time.time() - t0
-        _report_worker_metrics(duration, had_error, POLL_INTERVAL)
         log.info("Cycle complete in %.1fs — sleeping %ds", duration, POLL_INTERVAL)
 
         slept = 0
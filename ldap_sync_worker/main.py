@@ -7,13 +7,23 @@ Runs as a long-lived container.  Responsibilities:
      or when last_sync_at is NULL (manual trigger from the API).
   3. For each config run:
      a. Acquire a pg_try_advisory_lock(config_id) — skip if already locked.
-     b. Fetch users from the external LDAP.
-     c. Create/update users in the internal OpenLDAP.
+     b. Fetch users from the external LDAP with paged-results searches (RFC 2696).
+        A full run reads every user; a delta run reads only entries changed since
+        the stored high-water mark (uSNChanged on AD, modifyTimestamp elsewhere)
+        plus a uid-only listing used for deactivation.
+     c. Preload the internal OpenLDAP users and user_roles in one bulk read each,
+        diff them against the directory, and apply only the differences.
      d. Deactivate users that are no longer in the external directory.
      e. Invalidate active sessions for deactivated users.
-     f. Write a row to ldap_sync_log.
+     f. Write a row to ldap_sync_log and advance the config's watermark.
   4. After 3 consecutive failures for a config, write a system notification.
 
+A run falls back to a full sync when there is no watermark yet, after a manual
+trigger, when an AD USN watermark came from another domain controller (USNs are
+per DC), when the config or its group/department mappings changed, when a
+mapped group entry changed (memberOf is a back-link and does not touch the user
+entry), or when the last full sync is older than LDAP_SYNC_FULL_RESYNC_HOURS.
+
 Security notes:
   - Bind passwords are decrypted via Fernet(SHA-256(ldap_sync_key secret)).
   - SSRF: RFC-1918 / loopback ranges are rejected unless allow_private_network=TRUE.
@@ -25,6 +35,7 @@ Security notes:
 import base64
 import hashlib
 import ipaddress
+import itertools
 import json
 import logging
 import os
@@ -32,42 +43,35 @@ import signal
 import socket
 import sys
 import time
-from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
 import ldap
+import ldap.dn
 import ldap.filter
 import ldap.modlist
+from ldap.controls import SimplePagedResultsControl
 import psycopg2
 import psycopg2.extras
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
+from shared.worker_telemetry import WorkerTelemetry
+
 # ---------------------------------------------------------------------------
-# Worker observability — Redis metrics (B10.1)
+# Redis — permission cache invalidation (metrics: shared/worker_telemetry.py)
 # ---------------------------------------------------------------------------
 _REDIS_HOST = os.getenv("REDIS_HOST", "redis")
 _REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
 _REDIS_PASSWORD = os.getenv("REDIS_PASSWORD") or None
 _WORKER_NAME = "ldap_sync_worker"
-_worker_runs_total   = 0
-_worker_errors_total = 0
-
-def _report_worker_metrics(duration_s: float, had_error: bool, frequency_s: int) -> None:
-    global _worker_runs_total, _worker_errors_total
-    _worker_runs_total += 1
-    if had_error:
-        _worker_errors_total += 1
+
+def _publish_auth_invalidation() -> None:
+    """Tell API workers to drop cached user roles (see api/permission_cache.py)."""
     try:
         import redis as _redis
         r = _redis.Redis(host=_REDIS_HOST, port=_REDIS_PORT, password=_REDIS_PASSWORD, socket_connect_timeout=2)
-        r.hset(f"pf9:worker:{_WORKER_NAME}", mapping={
-            "runs_total":          _worker_runs_total,
-            "errors_total":        _worker_errors_total,
-            "last_run_ts":         time.time(),
-            "last_run_duration_s": round(duration_s, 2),
-            "frequency_s":         frequency_s,
-            "label":               _WORKER_NAME,
-        })
+        r.publish("pf9:auth:invalidate", json.dumps({"scope": "permissions", "source": _WORKER_NAME}))
     except Exception:
         pass
 
@@ -106,8 +110,16 @@ LDAP_SYNC_KEY = _read_secret("ldap_sync_key", "LDAP_SYNC_KEY")
 
 # How often to check for configs that need a sync (inner loop interval in seconds)
 POLL_INTERVAL = int(os.getenv("LDAP_SYNC_POLL_INTERVAL", "30"))
+# Sync phase timings, DB statement counts and heartbeat for GET /worker-metrics
+_telemetry = WorkerTelemetry("ldap_sync_worker", frequency_s=POLL_INTERVAL)
 # Number of consecutive failures before a notification is sent
 FAILURE_THRESHOLD = 3
+# Entries per page for paged-results searches (external and internal directory)
+PAGE_SIZE = int(os.getenv("LDAP_SYNC_PAGE_SIZE", "500"))
+# Force a full sync at least this often even when a delta sync is possible
+FULL_RESYNC_HOURS = int(os.getenv("LDAP_SYNC_FULL_RESYNC_HOURS", "24"))
+# Max uids per OR-filter when fetching individual entries during a delta sync
+_UID_FILTER_CHUNK = 100
 
 # ---------------------------------------------------------------------------
 # Logging
@@ -197,6 +209,7 @@ def _get_db() -> psycopg2.extensions.connection:
         user=DB_USER, password=DB_PASS,
         connect_timeout=10,
         cursor_factory=psycopg2.extras.RealDictCursor,
+        connection_factory=_telemetry.connection_factory,
     )
 
 
@@ -293,41 +306,77 @@ def _determine_departments(attrs: dict, dept_mappings: Dict[str, str]) -> List[s
     return dept_names
 
 
-def _sync_user_departments(db_conn, username: str, dept_names: List[str]) -> None:
-    """
-    Assign the first matching department (by sort_order) to user_roles.department_id.
-    No-op if dept_names is empty or no matching department found.
-    """
+def _load_departments(conn) -> Dict[str, int]:
+    """Return {department_name: id} in sort_order (lowest = highest priority)."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT id, name FROM departments ORDER BY sort_order ASC, id ASC")
+        return {r["name"]: r["id"] for r in cur.fetchall()}
+
+
+def _pick_department(dept_names: List[str], departments: Dict[str, int]) -> Optional[int]:
+    """Return the id of the first matching department by sort_order, or None."""
     if not dept_names:
-        return
-    with db_conn.cursor() as cur:
-        # Fetch matching departments ordered by sort_order (lowest = highest priority)
-        cur.execute(
-            "SELECT id FROM departments WHERE name = ANY(%s) ORDER BY sort_order ASC LIMIT 1",
-            (dept_names,),
-        )
-        row = cur.fetchone()
-    if not row:
-        return
-    dept_id = row["id"]
-    with db_conn.cursor() as cur:
+        return None
+    wanted = set(dept_names)
+    for name, dept_id in departments.items():
+        if name in wanted:
+            return dept_id
+    return None
+
+
+def _load_user_roles(conn) -> Dict[str, dict]:
+    """Return every user_roles row keyed by username (one bulk read per run)."""
+    with conn.cursor() as cur:
         cur.execute(
-            "UPDATE user_roles SET department_id = %s WHERE username = %s",
-            (dept_id, username),
+            "SELECT username, role, sync_config_id, locally_overridden, is_active, "
+            "       department_id "
+            "FROM user_roles"
         )
+        return {r["username"]: dict(r) for r in cur.fetchall()}
 
 
-def _invalidate_sessions(conn, username: str) -> None:
-    """Mark all active sessions for *username* as expired."""
+def _invalidate_sessions(conn, usernames: List[str]) -> None:
+    """Mark all active sessions for *usernames* as expired."""
     now = datetime.now(timezone.utc)
     with conn.cursor() as cur:
         cur.execute(
             "UPDATE user_sessions SET expires_at = %s "
-            "WHERE username = %s AND expires_at > %s",
-            (now, username, now),
+            "WHERE username = ANY(%s) AND expires_at > %s",
+            (now, usernames, now),
         )
 
 
+# ---------------------------------------------------------------------------
+# Paged search (RFC 2696)
+# ---------------------------------------------------------------------------
+
+def _paged_search(conn: ldap.ldapobject.LDAPObject, base_dn: str, filterstr: str,
+                  attrlist: List[str], page_size: Optional[int] = None,
+                  ) -> Iterator[Tuple[str, dict]]:
+    """Yield (dn, attrs) for a subtree search, one server page at a time.
+
+    Keeps memory flat on large trees and stays under server-side size limits
+    (AD's MaxPageSize is 1000).  Search references are skipped.
+    """
+    ctrl = SimplePagedResultsControl(True, size=page_size or PAGE_SIZE, cookie="")
+    while True:
+        msgid = conn.search_ext(
+            base_dn, ldap.SCOPE_SUBTREE, filterstr, attrlist, serverctrls=[ctrl],
+        )
+        _rtype, rdata, _rmsgid, serverctrls = conn.result3(msgid)
+        for dn, attrs in rdata:
+            if dn is not None:
+                yield dn, attrs
+        cookie = next(
+            (c.cookie for c in serverctrls
+             if c.controlType == SimplePagedResultsControl.controlType),
+            None,
+        )
+        if not cookie:
+            return
+        ctrl.cookie = cookie
+
+
 # ---------------------------------------------------------------------------
 # Internal LDAP helpers
 # ---------------------------------------------------------------------------
@@ -343,12 +392,17 @@ def _internal_ldap_conn() -> ldap.ldapobject.LDAPObject:
     return conn
 
 
-def _user_exists_internal(conn_int: ldap.ldapobject.LDAPObject, uid: str) -> bool:
-    safe = ldap.filter.escape_filter_chars(uid)
-    results = conn_int.search_s(
-        INT_LDAP_USER_DN, ldap.SCOPE_SUBTREE, f"(uid={safe})", ["dn"],
-    )
-    return bool(results)
+def _load_internal_users(conn_int: ldap.ldapobject.LDAPObject) -> Dict[str, Tuple[str, dict]]:
+    """Return {uid.lower(): (dn, {"cn": [...], "mail": [...]})} for every internal user.
+
+    Keys are lower-cased because uid uses caseIgnoreMatch in the directory.
+    """
+    users: Dict[str, Tuple[str, dict]] = {}
+    for dn, attrs in _paged_search(conn_int, INT_LDAP_USER_DN, "(uid=*)", ["uid", "cn", "mail"]):
+        uid = _attr(attrs, "uid")
+        if uid:
+            users[uid.lower()] = (dn, {k: attrs[k] for k in ("cn", "mail") if k in attrs})
+    return users
 
 
 def _add_user_internal(conn_int: ldap.ldapobject.LDAPObject,
@@ -366,24 +420,14 @@ def _add_user_internal(conn_int: ldap.ldapobject.LDAPObject,
     conn_int.add_s(dn, ldap.modlist.addModlist(attrs))
 
 
-def _update_user_internal(conn_int: ldap.ldapobject.LDAPObject,
-                           uid: str, mail: str, cn: str) -> None:
-    """Update mail and cn on an existing internal LDAP user entry."""
-    safe = ldap.filter.escape_filter_chars(uid)
-    results = conn_int.search_s(
-        INT_LDAP_USER_DN, ldap.SCOPE_SUBTREE, f"(uid={safe})", ["cn", "mail"],
-    )
-    if not results:
-        return
-    dn, old_attrs = results[0]
+def _internal_modlist(old_attrs: dict, mail: str, cn: str) -> list:
+    """Return the modlist that brings an internal entry's cn/mail up to date (may be empty)."""
     new_attrs = dict(old_attrs)
     if cn:
         new_attrs["cn"] = [cn.encode()]
     if mail:
         new_attrs["mail"] = [mail.encode()]
-    mods = ldap.modlist.modifyModlist(old_attrs, new_attrs)
-    if mods:
-        conn_int.modify_s(dn, mods)
+    return ldap.modlist.modifyModlist(old_attrs, new_attrs)
 
 
 # ---------------------------------------------------------------------------
@@ -439,12 +483,129 @@ def _determine_role(attrs: dict, group_mappings: Dict[str, str]) -> Optional[str
     return best_role
 
 
+def _and_filter(base_filter: str, extra: str) -> str:
+    """AND an extra clause onto the configured user search filter."""
+    if not base_filter.startswith("("):
+        base_filter = f"({base_filter})"
+    return f"(&{base_filter}{extra})"
+
+
+def _directory_usn(ext_conn: ldap.ldapobject.LDAPObject) -> Tuple[Optional[int], Optional[str]]:
+    """Return AD's highestCommittedUSN and the domain controller it belongs to.
+
+    USNs are local to each DC, so a USN watermark is only valid against the DC
+    that issued it.  The DC is identified by its dsServiceName plus the
+    invocationId of that NTDS Settings object, which also changes when the DC
+    is restored from backup.  Returns (None, None) for non-AD servers.
+    """
+    try:
+        rootdse = ext_conn.search_s("", ldap.SCOPE_BASE, "(objectClass=*)",
+                                    ["highestCommittedUSN", "dsServiceName"])
+    except ldap.LDAPError:
+        return None, None
+    for _dn, attrs in rootdse:
+        value = _attr(attrs or {}, "highestCommittedUSN")
+        if value.isdigit():
+            return int(value), _dc_identity(ext_conn, _attr(attrs, "dsServiceName"))
+    return None, None
+
+
+def _dc_identity(ext_conn: ldap.ldapobject.LDAPObject, service_dn: str) -> Optional[str]:
+    """dsServiceName, suffixed with the DC's invocationId when it can be read."""
+    if not service_dn:
+        return None
+    try:
+        found = ext_conn.search_s(service_dn, ldap.SCOPE_BASE, "(objectClass=*)", ["invocationId"])
+    except ldap.LDAPError:
+        found = []
+    for _dn, attrs in found:
+        values = (attrs or {}).get("invocationId") or []
+        if values:
+            raw = values[0]
+            return f"{service_dn}#{raw.hex() if isinstance(raw, bytes) else raw}"
+    return service_dn
+
+
+def _watermark_filter(kind: str, watermark: str) -> str:
+    """Filter clause matching entries changed since *watermark*."""
+    if kind == "usn":
+        return f"(uSNChanged>={int(watermark) + 1})"
+    return f"(modifyTimestamp>={ldap.filter.escape_filter_chars(watermark)})"
+
+
+def _config_fingerprint(cfg: dict, group_mappings: Dict[str, str],
+                        dept_mappings: Dict[str, str]) -> str:
+    """Hash of everything that changes which users match or how they map.
+
+    A stored watermark is only reused while this is unchanged.
+    """
+    material = json.dumps([
+        cfg["host"], cfg["port"], cfg["base_dn"], cfg["user_search_filter"],
+        cfg["user_attr_uid"], cfg["user_attr_mail"], cfg["user_attr_fullname"],
+        cfg.get("conflict_strategy") or "ldap_wins",
+        sorted(group_mappings.items()), sorted(dept_mappings.items()),
+    ])
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+def _choose_mode(cfg: dict, fingerprint: str, watermark_kind: str,
+                 watermark_source: Optional[str], now: datetime) -> Tuple[str, str]:
+    """Return ("full" | "delta", reason) for this run."""
+    if cfg.get("last_sync_at") is None:
+        return "full", "first run or manual trigger"
+    if not cfg.get("sync_watermark"):
+        return "full", "no watermark"
+    if cfg.get("sync_watermark_kind") != watermark_kind:
+        return "full", "directory watermark type changed"
+    if watermark_kind == "usn" and cfg.get("sync_watermark_source") != watermark_source:
+        return "full", "domain controller changed"
+    if cfg.get("sync_fingerprint") != fingerprint:
+        return "full", "config or mappings changed"
+    last_full = cfg.get("last_full_sync_at")
+    if last_full is None or now - last_full >= timedelta(hours=FULL_RESYNC_HOURS):
+        return "full", "periodic full resync"
+    return "delta", "changes since watermark"
+
+
+def _groups_changed(ext_conn: ldap.ldapobject.LDAPObject, group_dns: Set[str],
+                    watermark_clause: str) -> bool:
+    """True if any mapped group entry changed (or vanished) since the watermark.
+
+    Group membership lives on the group entry; memberOf on the user is a
+    back-link, so adding a user to a group does not bump the user's
+    uSNChanged / modifyTimestamp.
+    """
+    for group_dn in group_dns:
+        try:
+            if ext_conn.search_s(group_dn, ldap.SCOPE_BASE, watermark_clause, ["1.1"]):
+                return True
+        except ldap.NO_SUCH_OBJECT:
+            return True
+    return False
+
+
+def _fetch_entries_by_uid(ext_conn: ldap.ldapobject.LDAPObject, cfg: dict,
+                          uids: List[str], attrlist: List[str],
+                          ) -> Iterator[Tuple[str, dict]]:
+    """Yield the full entries for *uids*, _UID_FILTER_CHUNK uids per search."""
+    uid_attr = cfg["user_attr_uid"]
+    for i in range(0, len(uids), _UID_FILTER_CHUNK):
+        clauses = "".join(
+            f"({uid_attr}={ldap.filter.escape_filter_chars(uid)})"
+            for uid in uids[i:i + _UID_FILTER_CHUNK]
+        )
+        yield from _paged_search(
+            ext_conn, cfg["base_dn"], _and_filter(cfg["user_search_filter"], f"(|{clauses})"),
+            attrlist,
+        )
+
+
 # ---------------------------------------------------------------------------
 # Core sync algorithm
 # ---------------------------------------------------------------------------
 
 def _run_sync(db_conn, config_id: int) -> None:
-    """Run a full sync for a single config.  Uses pg_try_advisory_lock to prevent
+    """Run a sync for a single config.  Uses pg_try_advisory_lock to prevent
     concurrent runs (e.g. scheduled + manual trigger arriving simultaneously)."""
 
     # Acquire advisory lock — skip if another process is already syncing this config
@@ -465,6 +626,159 @@ def _run_sync(db_conn, config_id: int) -> None:
         db_conn.commit()
 
 
+@dataclass
+class _SyncPlan:
+    """Differences between the external directory and the local state."""
+    creates: List[Tuple[str, str, str, str]] = field(default_factory=list)  # uid, mail, cn, role
+    ldap_updates: List[Tuple[str, str, list]] = field(default_factory=list)  # uid, dn, modlist
+    role_updates: List[Tuple[str, str]] = field(default_factory=list)       # uid, role
+    dept_updates: List[Tuple[str, int]] = field(default_factory=list)       # uid, department_id
+    updated: Set[str] = field(default_factory=set)
+    seen_uids: Set[str] = field(default_factory=set)
+    max_modified: str = ""
+
+
+def _plan_sync(entries, cfg: dict, config_id: int,
+               internal: Dict[str, Tuple[str, dict]], roles: Dict[str, dict],
+               departments: Dict[str, int], group_mappings: Dict[str, str],
+               dept_mappings: Dict[str, str]) -> _SyncPlan:
+    """Compare directory *entries* with the preloaded internal users and user_roles."""
+    plan = _SyncPlan()
+    local_wins = (cfg.get("conflict_strategy") or "ldap_wins") == "local_wins"
+    planned: Set[str] = set()
+    for _dn, attrs in entries:
+        uid  = _attr(attrs, cfg["user_attr_uid"])
+        mail = _attr(attrs, cfg["user_attr_mail"])
+        cn   = _attr(attrs, cfg["user_attr_fullname"])
+        modified = _attr(attrs, "modifyTimestamp")
+        if modified > plan.max_modified:
+            plan.max_modified = modified
+        if not uid or uid.lower() in planned:
+            continue
+        planned.add(uid.lower())
+        plan.seen_uids.add(uid)
+
+        role = _determine_role(attrs, group_mappings)
+        dept_id = _pick_department(_determine_departments(attrs, dept_mappings), departments)
+        row = roles.get(uid)
+        existing = internal.get(uid.lower())
+
+        if existing is None:
+            plan.creates.append((uid, mail, cn, role or "viewer"))
+            if dept_id is not None:
+                plan.dept_updates.append((uid, dept_id))
+            continue
+
+        overridden = bool(row and row["sync_config_id"] == config_id and row["locally_overridden"])
+        # If local_wins and user is locally overridden, skip LDAP attribute update
+        if not (local_wins and overridden):
+            dn, old_attrs = existing
+            mods = _internal_modlist(old_attrs, mail, cn)
+            if mods:
+                plan.ldap_updates.append((uid, dn, mods))
+        # Only update DB role if not locally overridden
+        if role and row and row["sync_config_id"] == config_id \
+                and not row["locally_overridden"] and row["role"] != role:
+            plan.role_updates.append((uid, role))
+            plan.updated.add(uid)
+        if dept_id is not None and row and row["department_id"] != dept_id:
+            plan.dept_updates.append((uid, dept_id))
+            plan.updated.add(uid)
+    return plan
+
+
+def _apply_plan(db_conn, int_conn: ldap.ldapobject.LDAPObject, config_id: int,
+                plan: _SyncPlan, details: List[dict]) -> Tuple[int, int]:
+    """Write *plan* to the internal LDAP and user_roles.  Returns (created, updated).
+
+    Directory writes are per entry (LDAP has no bulk write); a failure is
+    recorded in *details* and the user is left for the next run.  The
+    user_roles changes go out as one statement per kind.
+    """
+    failed: Set[str] = set()
+    created: List[Tuple[str, str]] = []
+    for uid, mail, cn, role in plan.creates:
+        try:
+            _add_user_internal(int_conn, uid, mail, cn)
+            created.append((uid, role))
+        except ldap.LDAPError as exc:
+            failed.add(uid)
+            details.append({"uid": uid, "action": None, "error": str(exc)})
+            log.warning("[config=%d] Error processing user '%s': %s", config_id, uid, exc)
+
+    updated = set(plan.updated)
+    for uid, dn, mods in plan.ldap_updates:
+        try:
+            int_conn.modify_s(dn, mods)
+            updated.add(uid)
+        except ldap.LDAPError as exc:
+            failed.add(uid)
+            details.append({"uid": uid, "action": None, "error": str(exc)})
+            log.warning("[config=%d] Error processing user '%s': %s", config_id, uid, exc)
+
+    with db_conn.cursor() as cur:
+        if created:
+            psycopg2.extras.execute_values(
+                cur,
+                """
+                INSERT INTO user_roles
+                    (username, role, sync_source, sync_config_id,
+                     locally_overridden, granted_by, is_active)
+                VALUES %s
+                ON CONFLICT (username) DO UPDATE SET
+                    role = EXCLUDED.role,
+                    sync_source = 'external_ldap',
+                    sync_config_id = EXCLUDED.sync_config_id,
+                    is_active = TRUE
+                """,
+                [(uid, role, config_id) for uid, role in created],
+                template="(%s, %s, 'external_ldap', %s, FALSE, 'ldap_sync', TRUE)",
+                page_size=1000,
+            )
+        role_updates = [(u, r) for u, r in plan.role_updates if u not in failed]
+        if role_updates:
+            cur.execute(
+                "UPDATE user_roles AS ur SET role = v.role, last_modified = NOW() "
+                "FROM unnest(%s::text[], %s::text[]) AS v(username, role) "
+                "WHERE ur.username = v.username AND ur.sync_config_id = %s "
+                "AND ur.locally_overridden = FALSE",
+                ([u for u, _ in role_updates], [r for _, r in role_updates], config_id),
+            )
+        dept_updates = [(u, d) for u, d in plan.dept_updates if u not in failed]
+        if dept_updates:
+            cur.execute(
+                "UPDATE user_roles AS ur SET department_id = v.department_id "
+                "FROM unnest(%s::text[], %s::int[]) AS v(username, department_id) "
+                "WHERE ur.username = v.username",
+                ([u for u, _ in dept_updates], [d for _, d in dept_updates]),
+            )
+
+    created_uids = {uid for uid, _ in created}
+    updated -= created_uids | failed
+    details.extend({"uid": uid, "action": "created", "error": None} for uid in sorted(created_uids))
+    details.extend({"uid": uid, "action": "updated", "error": None} for uid in sorted(updated))
+    return len(created_uids), len(updated)
+
+
+def _deactivate_missing(db_conn, config_id: int, roles: Dict[str, dict],
+                        directory_uids: Set[str]) -> List[str]:
+    """Deactivate users previously synced from this config who are no longer returned."""
+    gone = sorted(
+        username for username, row in roles.items()
+        if row["sync_config_id"] == config_id and row["is_active"]
+        and username not in directory_uids
+    )
+    if gone:
+        with db_conn.cursor() as cur:
+            cur.execute(
+                "UPDATE user_roles SET is_active = FALSE "
+                "WHERE username = ANY(%s) AND sync_config_id = %s",
+                (gone, config_id),
+            )
+        _invalidate_sessions(db_conn, gone)
+    return gone
+
+
 def _run_sync_inner(db_conn, config_id: int, started_at: datetime) -> None:
     # Insert a running log row
     with db_conn.cursor() as cur:
@@ -472,7 +786,9 @@ def _run_sync_inner(db_conn, config_id: int, started_at: datetime) -> None:
             "SELECT name, host, port, bind_dn, bind_password_enc, base_dn, "
             "       user_search_filter, user_attr_uid, user_attr_mail, user_attr_fullname, "
             "       use_tls, use_starttls, verify_tls_cert, ca_cert_pem, "
-            "       allow_private_network "
+            "       allow_private_network, conflict_strategy, last_sync_at, "
+            "       sync_watermark, sync_watermark_kind, sync_watermark_source, "
+            "       sync_fingerprint, last_full_sync_at "
             "FROM ldap_sync_config WHERE id = %s",
             (config_id,),
         )
@@ -493,6 +809,8 @@ def _run_sync_inner(db_conn, config_id: int, started_at: datetime) -> None:
 
     status = "failed"
     error_msg = None
+    mode = None
+    watermark = watermark_kind = watermark_source = fingerprint = None
     users_found = users_created = users_updated = users_deactivated = 0
     details: List[dict] = []
 
@@ -509,117 +827,96 @@ def _run_sync_inner(db_conn, config_id: int, started_at: datetime) -> None:
 
         group_mappings = _fetch_group_mappings(db_conn, config_id)
         dept_mappings = _fetch_dept_mappings_worker(db_conn, config_id)
+        departments = _load_departments(db_conn) if dept_mappings else {}
+        roles = _load_user_roles(db_conn)
 
-        # Open external LDAP connection
-        ext_conn = _open_external_conn(cfg)
-        ext_conn.simple_bind_s(cfg["bind_dn"], svc_password)
-
-        search_attrs = [
-            cfg["user_attr_uid"], cfg["user_attr_mail"], cfg["user_attr_fullname"],
-            "memberOf",
-        ]
-        results = ext_conn.search_s(
-            cfg["base_dn"], ldap.SCOPE_SUBTREE, cfg["user_search_filter"], search_attrs,
-        )
-        ext_conn.unbind_s()
-
-        users_found = len(results)
-        log.info("[config=%d] Found %d users in external directory", config_id, users_found)
-
-        # Open internal LDAP connection
         int_conn = _internal_ldap_conn()
+        try:
+            with _telemetry.stage("load_internal"):
+                internal = _load_internal_users(int_conn)
 
-        seen_uids = set()
-        for dn, attrs in results:
-            uid  = _attr(attrs, cfg["user_attr_uid"])
-            mail = _attr(attrs, cfg["user_attr_mail"])
-            cn   = _attr(attrs, cfg["user_attr_fullname"])
-            if not uid:
-                continue
-            seen_uids.add(uid)
-
-            role = _determine_role(attrs, group_mappings)
-            dept_names = _determine_departments(attrs, dept_mappings)
-
-            entry_result = {"uid": uid, "action": None, "error": None}
+            # Open external LDAP connection
+            ext_conn = _open_external_conn(cfg)
             try:
-                if _user_exists_internal(int_conn, uid):
-                    conflict_strategy = cfg.get("conflict_strategy", "ldap_wins")
-                    # If local_wins and user is locally overridden, skip LDAP attribute update
-                    _skip_update = False
-                    if conflict_strategy == "local_wins":
-                        with db_conn.cursor() as _chk:
-                            _chk.execute(
-                                "SELECT locally_overridden FROM user_roles "
-                                "WHERE username = %s AND sync_config_id = %s",
-                                (uid, config_id),
-                            )
-                            _row = _chk.fetchone()
-                            _skip_update = bool(_row and _row[0])
-                    if not _skip_update:
-                        _update_user_internal(int_conn, uid, mail, cn)
-                    entry_result["action"] = "updated"
-                    # Only update DB role if not locally overridden
-                    if role:
-                        with db_conn.cursor() as cur:
-                            cur.execute(
-                                "UPDATE user_roles SET role = %s, last_modified = NOW() "
-                                "WHERE username = %s AND sync_config_id = %s "
-                                "AND locally_overridden = FALSE",
-                                (role, uid, config_id),
-                            )
-                    users_updated += 1
-                else:
-                    _add_user_internal(int_conn, uid, mail, cn)
-                    effective_role = role or "viewer"
-                    with db_conn.cursor() as cur:
-                        cur.execute(
-                            """
-                            INSERT INTO user_roles
-                                (username, role, sync_source, sync_config_id,
-                                 locally_overridden, granted_by, is_active)
-                            VALUES (%s, %s, 'external_ldap', %s, FALSE, 'ldap_sync', TRUE)
-                            ON CONFLICT (username) DO UPDATE SET
-                                role = EXCLUDED.role,
-                                sync_source = 'external_ldap',
-                                sync_config_id = EXCLUDED.sync_config_id,
-                                is_active = TRUE
-                            """,
-                            (uid, effective_role, config_id),
+                ext_conn.simple_bind_s(cfg["bind_dn"], svc_password)
+
+                # Read the USN before searching so changes made mid-run are picked
+                # up by the next delta rather than lost.
+                usn, watermark_source = _directory_usn(ext_conn)
+                watermark_kind = "usn" if usn is not None else "timestamp"
+                fingerprint = _config_fingerprint(cfg, group_mappings, dept_mappings)
+                mode, reason = _choose_mode(cfg, fingerprint, watermark_kind, watermark_source,
+                                            started_at)
+                if mode == "delta":
+                    changed_clause = _watermark_filter(watermark_kind, cfg["sync_watermark"])
+                    if _groups_changed(ext_conn, set(group_mappings) | set(dept_mappings),
+                                       changed_clause):
+                        mode, reason = "full", "a mapped group changed"
+                log.info("[config=%d] %s sync (%s)", config_id, mode.capitalize(), reason)
+
+                search_attrs = [
+                    cfg["user_attr_uid"], cfg["user_attr_mail"], cfg["user_attr_fullname"],
+                    "memberOf",
+                ]
+                if watermark_kind == "timestamp":
+                    search_attrs.append("modifyTimestamp")
+
+                # Searching and planning interleave (entries is a generator)
+                with _telemetry.stage("search_plan", component=mode):
+                    if mode == "full":
+                        entries = _paged_search(
+                            ext_conn, cfg["base_dn"], cfg["user_search_filter"], search_attrs,
                         )
-                    entry_result["action"] = "created"
-                    users_created += 1
-                # Sync department assignment after create/update
-                _sync_user_departments(db_conn, uid, dept_names)
-            except Exception as exc:
-                entry_result["error"] = str(exc)
-                log.warning("[config=%d] Error processing user '%s': %s", config_id, uid, exc)
-
-            details.append(entry_result)
-
-        int_conn.unbind_s()
-
-        # Deactivate users previously synced from this config who are no longer returned
-        with db_conn.cursor() as cur:
-            cur.execute(
-                "SELECT username FROM user_roles "
-                "WHERE sync_config_id = %s AND is_active = TRUE",
-                (config_id,),
-            )
-            active_synced = [r["username"] for r in cur.fetchall()]
-
-        for uid in active_synced:
-            if uid not in seen_uids:
-                with db_conn.cursor() as cur:
-                    cur.execute(
-                        "UPDATE user_roles SET is_active = FALSE WHERE username = %s "
-                        "AND sync_config_id = %s",
-                        (uid, config_id),
-                    )
-                _invalidate_sessions(db_conn, uid)
-                users_deactivated += 1
-                details.append({"uid": uid, "action": "deactivated", "error": None})
-                log.info("[config=%d] Deactivated user '%s' (no longer in external directory)", config_id, uid)
+                        plan = _plan_sync(entries, cfg, config_id, internal, roles,
+                                          departments, group_mappings, dept_mappings)
+                        directory_uids = plan.seen_uids
+                    else:
+                        # uid-only listing: cheap, and the only way to notice deletions
+                        directory_uids = {
+                            uid for uid in (
+                                _attr(attrs, cfg["user_attr_uid"])
+                                for _dn, attrs in _paged_search(
+                                    ext_conn, cfg["base_dn"], cfg["user_search_filter"],
+                                    [cfg["user_attr_uid"]],
+                                )
+                            ) if uid
+                        }
+                        # Unchanged users missing from the internal directory (e.g. a
+                        # previously failed create) are fetched individually.
+                        missing = sorted(u for u in directory_uids if u.lower() not in internal)
+                        entries = _paged_search(
+                            ext_conn, cfg["base_dn"],
+                            _and_filter(cfg["user_search_filter"], changed_clause), search_attrs,
+                        )
+                        plan = _plan_sync(
+                            itertools.chain(entries, _fetch_entries_by_uid(
+                                ext_conn, cfg, missing, search_attrs)),
+                            cfg, config_id, internal, roles, departments,
+                            group_mappings, dept_mappings,
+                        )
+            finally:
+                ext_conn.unbind_s()
+
+            users_found = len(directory_uids)
+            log.info("[config=%d] Found %d users in external directory, %d to create, "
+                     "%d to update", config_id, users_found, len(plan.creates),
+                     len(plan.ldap_updates) + len(plan.updated))
+
+            with _telemetry.stage("apply", component=mode):
+                users_created, users_updated = _apply_plan(db_conn, int_conn, config_id, plan, details)
+        finally:
+            int_conn.unbind_s()
+
+        deactivated = _deactivate_missing(db_conn, config_id, roles, directory_uids)
+        users_deactivated = len(deactivated)
+        for uid in deactivated:
+            details.append({"uid": uid, "action": "deactivated", "error": None})
+            log.info("[config=%d] Deactivated user '%s' (no longer in external directory)", config_id, uid)
+
+        if watermark_kind == "usn":
+            watermark = str(usn)
+        else:
+            watermark = plan.max_modified or (cfg["sync_watermark"] if mode == "delta" else None)
 
         any_errors = any(d["error"] for d in details)
         status = "partial" if any_errors else "success"
@@ -633,10 +930,10 @@ def _run_sync_inner(db_conn, config_id: int, started_at: datetime) -> None:
     # Update log row
     with db_conn.cursor() as cur:
         cur.execute(
-            "UPDATE ldap_sync_log SET finished_at=%s, status=%s, users_found=%s, "
+            "UPDATE ldap_sync_log SET finished_at=%s, status=%s, sync_mode=%s, users_found=%s, "
             "users_created=%s, users_updated=%s, users_deactivated=%s, "
             "error_message=%s, details=%s WHERE id=%s",
-            (finished_at, status, users_found, users_created, users_updated,
+            (finished_at, status, mode, users_found, users_created, users_updated,
              users_deactivated, error_msg,
              psycopg2.extras.Json(details) if details else None,
              log_id),
@@ -646,15 +943,30 @@ def _run_sync_inner(db_conn, config_id: int, started_at: datetime) -> None:
             "last_sync_users_found=%s WHERE id=%s",
             (finished_at, status, users_found, config_id),
         )
+        # A partial run still advances the watermark: failed creates are picked up
+        # again because the user is missing internally, failed updates by the next
+        # periodic full sync.
+        if status != "failed":
+            cur.execute(
+                "UPDATE ldap_sync_config SET sync_watermark=%s, sync_watermark_kind=%s, "
+                "sync_watermark_source=%s, sync_fingerprint=%s, "
+                "last_full_sync_at = CASE WHEN %s THEN %s ELSE last_full_sync_at END "
+                "WHERE id=%s",
+                (watermark, watermark_kind, watermark_source, fingerprint, mode == "full",
+                 started_at, config_id),
+            )
     db_conn.commit()
 
+    if users_created or users_updated or users_deactivated:
+        _publish_auth_invalidation()
+
     # Consecutive failure notification
     if status == "failed":
         _check_consecutive_failures(db_conn, config_id, config_name)
     else:
         log.info(
-            "[config=%d] Sync complete: %s — created=%d updated=%d deactivated=%d",
-            config_id, status, users_created, users_updated, users_deactivated,
+            "[config=%d] Sync complete: %s (%s) — created=%d updated=%d deactivated=%d",
+            config_id, status, mode, users_created, users_updated, users_deactivated,
         )
 
 
@@ -713,7 +1025,8 @@ def main() -> None:
         configs = _fetch_enabled_configs(conn)
         for cfg in configs:
             try:
-                _run_sync(conn, cfg["id"])
+                with _telemetry.stage("sync", component=cfg["name"]):
+                    _run_sync(conn, cfg["id"])
             except Exception as exc:
                 log.error("[config=%d] Startup sync error: %s", cfg["id"], exc)
         conn.close()
@@ -724,26 +1037,25 @@ def main() -> None:
 
     # ── Schedule loop ──────────────────────────────────────────────────────
     while _running:
-        _loop_start = time.time()
-        _loop_error = False
-        try:
-            conn = _get_db_with_cb()
-            configs = _fetch_enabled_configs(conn)
-            for cfg in configs:
-                if not _running:
-                    break
-                if _needs_sync(cfg):
-                    log.info("[config=%d] '%s' is due for sync", cfg["id"], cfg["name"])
-                    try:
-                        _run_sync(conn, cfg["id"])
-                    except Exception as exc:
-                        log.error("[config=%d] Sync error: %s", cfg["id"], exc)
-                        _loop_error = True
-            conn.close()
-            _report_worker_metrics(time.time() - _loop_start, _loop_error, POLL_INTERVAL)
-        except Exception as exc:
-            log.error("Sync loop iteration error: %s", exc)
-            _report_worker_metrics(time.time() - _loop_start, True, POLL_INTERVAL)
+        with _telemetry.cycle():
+            try:
+                conn = _get_db_with_cb()
+                configs = _fetch_enabled_configs(conn)
+                for cfg in configs:
+                    if not _running:
+                        break
+                    if _needs_sync(cfg):
+                        log.info("[config=%d] '%s' is due for sync", cfg["id"], cfg["name"])
+                        try:
+                            with _telemetry.stage("sync", component=cfg["name"]):
+                                _run_sync(conn, cfg["id"])
+                        except Exception as exc:
+                            log.error("[config=%d] Sync error: %s", cfg["id"], exc)
+                            _telemetry.fail()
+                conn.close()
+            except Exception as exc:
+                log.error("Sync loop iteration error: %s", exc)
+                _telemetry.fail()
 
         # Sleep in small increments so SIGTERM is handled promptly
         for _ in range(POLL_INTERVAL):
@@ -15,9 +15,20 @@ Data sources
     → snapshots, restores, quotas from existing tables
 
 Collection cadence is governed by `metering_config.collection_interval_min`
-(default 15 min).  Retention pruning runs after each collection cycle.
+(default 15 min).  Regions are collected concurrently
+(METERING_REGION_WORKERS), each under its own advisory lock.  Retention
+pruning runs after each collection cycle.
+
+portfolio_metering_monthly is rolled up from hourly partials
+(portfolio_metering_hourly); each cycle only rebuilds the hours that received
+samples since the month's watermark, and closed months are frozen.
+
+    python main.py backfill --months 6         # recompute closed months
+    python main.py backfill --month 2026-03    # specific months (repeatable)
+    python main.py verify                      # partials vs full recompute
 """
 
+import argparse
 import datetime
 import json
 import logging
@@ -26,6 +37,7 @@ import signal
 import sys
 import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor, wait
 from typing import Any, Dict, List, Optional
 
 import psycopg2
@@ -33,34 +45,7 @@ import psycopg2.extras
 import requests
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
-# ---------------------------------------------------------------------------
-# Worker observability — Redis metrics (B10.1)
-# ---------------------------------------------------------------------------
-_REDIS_HOST = os.getenv("REDIS_HOST", "redis")
-_REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
-_REDIS_PASSWORD = os.getenv("REDIS_PASSWORD") or None
-_WORKER_NAME = "metering_worker"
-_worker_runs_total   = 0
-_worker_errors_total = 0
-
-def _report_worker_metrics(duration_s: float, had_error: bool, frequency_s: int) -> None:
-    global _worker_runs_total, _worker_errors_total
-    _worker_runs_total += 1
-    if had_error:
-        _worker_errors_total += 1
-    try:
-        import redis as _redis
-        r = _redis.Redis(host=_REDIS_HOST, port=_REDIS_PORT, password=_REDIS_PASSWORD, socket_connect_timeout=2)
-        r.hset(f"pf9:worker:{_WORKER_NAME}", mapping={
-            "runs_total":          _worker_runs_total,
-            "errors_total":        _worker_errors_total,
-            "last_run_ts":         time.time(),
-            "last_run_duration_s": round(duration_s, 2),
-            "frequency_s":         frequency_s,
-            "label":               _WORKER_NAME,
-        })
-    except Exception:
-        pass
+from shared.worker_telemetry import WorkerTelemetry
 
 # ---------------------------------------------------------------------------
 # Secret helper — same pattern as ldap_sync_worker
@@ -90,6 +75,17 @@ MONITORING_URL = os.getenv("MONITORING_URL", "http://pf9_monitoring:8001")
 API_URL = os.getenv("API_URL", "http://pf9_api:8000")
 INTERNAL_SERVICE_SECRET = os.getenv("INTERNAL_SERVICE_SECRET", "")
 POLL_INTERVAL = int(os.getenv("METERING_POLL_INTERVAL", "60"))  # seconds
+# The portfolio rollup watermark trails the DB clock by this much so rows
+# committed by transactions still open when a cycle starts are not skipped.
+ROLLUP_LAG_SECONDS = int(os.getenv("METERING_ROLLUP_LAG_SECONDS", "300"))
+# Regions are collected concurrently, each on its own connection.
+REGION_WORKERS = max(1, int(os.getenv("METERING_REGION_WORKERS", "4")))
+# How long a cycle waits for its regions before pruning and rolling up
+# without the ones still running; those finish in the background.
+REGION_TIMEOUT_SECONDS = int(os.getenv("METERING_REGION_TIMEOUT_SECONDS", "600"))
+
+# Per-collector timings, DB statement counts and heartbeat for GET /worker-metrics
+_telemetry = WorkerTelemetry("metering_worker", frequency_s=POLL_INTERVAL)
 
 # ---------------------------------------------------------------------------
 # Logging
@@ -128,6 +124,7 @@ def get_conn():
     return psycopg2.connect(
         host=DB_HOST, port=DB_PORT, dbname=DB_NAME,
         user=DB_USER, password=DB_PASS,
+        connection_factory=_telemetry.connection_factory,
     )
 
 
@@ -940,6 +937,260 @@ def prune_old_records(conn, retention_days: int):
 # ---------------------------------------------------------------------------
 # Portfolio metering monthly aggregation
 # ---------------------------------------------------------------------------
+#
+# The current month is rolled up from hourly partials in
+# portfolio_metering_hourly (one row per project, flavor and hour).  Each cycle
+# only rebuilds the hours that received metering_resources rows since the
+# month's watermark in portfolio_metering_watermarks, then sums the partials.
+# Once a month has closed its partials are folded one last time, the month is
+# marked finalized and the partials are dropped; finalized months are frozen.
+#
+# The full recompute straight from metering_resources is kept for the startup
+# backfill of months that were never rolled up and for verify_portfolio_month.
+
+# hourly CTE — full recompute from metering_resources.
+#
+# vm_snap  — DISTINCT ON (vm_id, hour): one reading per VM per hour,
+#   avoiding 60× inflation from 1-min polling. Includes flavor for
+#   pricing lookup.
+# vm_priced — joins metering_pricing by flavor name. Each vm_snap
+#   row = VM ran for 1 hour, so cost_per_hour is the cost incurred.
+# hourly   — sums resources + cost per project per hour.
+_HOURLY_FROM_RESOURCES = """
+    vm_snap AS (
+        -- One canonical reading per VM per hour (latest poll)
+        SELECT DISTINCT ON (mr.vm_id, date_trunc('hour', mr.collected_at))
+            mr.project_name,
+            mr.vm_id,
+            mr.flavor,
+            date_trunc('hour', mr.collected_at)  AS hour,
+            COALESCE(mr.vcpus_allocated,  0)     AS vcpus,
+            COALESCE(mr.ram_allocated_mb, 0)     AS ram_mb,
+            COALESCE(mr.disk_allocated_gb,0)     AS disk_gb
+        FROM metering_resources mr
+        WHERE mr.collected_at >= %(start)s
+          AND mr.collected_at <  %(end)s
+          AND mr.project_name IS NOT NULL
+          AND mr.project_name != ''
+        ORDER BY mr.vm_id,
+                 date_trunc('hour', mr.collected_at),
+                 mr.collected_at DESC
+    ),
+    vm_priced AS (
+        -- Join flavor pricing: each row = VM ran 1 hour at cost_per_hour
+        SELECT
+            vs.project_name,
+            vs.vm_id,
+            vs.hour,
+            vs.vcpus,
+            vs.ram_mb,
+            vs.disk_gb,
+            COALESCE(mp.cost_per_hour, 0)  AS cost_per_hour,
+            mp.currency                    AS price_currency
+        FROM vm_snap vs
+        LEFT JOIN metering_pricing mp ON mp.item_name = vs.flavor
+    ),
+    hourly AS (
+        -- Sum resources and cost per project per hour
+        SELECT
+            project_name,
+            hour,
+            SUM(vcpus)             AS h_vcpus,
+            SUM(ram_mb) / 1024.0   AS h_ram_gb,
+            SUM(disk_gb)           AS h_disk_gb,
+            COUNT(DISTINCT vm_id)  AS h_vm_count,
+            SUM(cost_per_hour)     AS h_cost,
+            MAX(price_currency)    AS price_currency
+        FROM vm_priced
+        GROUP BY project_name, hour
+    )"""
+
+# hourly CTE — from the partials.  Pricing is joined here rather than stored
+# so rate changes apply to the whole open month, as in the full recompute.
+# VMs are counted before the join because an item_name may carry several
+# prices.
+_HOURLY_FROM_PARTIALS = """
+    vm_counts AS (
+        SELECT project_name, hour, SUM(vm_count)::bigint AS h_vm_count
+        FROM portfolio_metering_hourly
+        WHERE hour >= %(start)s AND hour < %(end)s
+        GROUP BY project_name, hour
+    ),
+    hourly AS (
+        SELECT
+            ph.project_name,
+            ph.hour,
+            SUM(ph.vcpus)                                     AS h_vcpus,
+            SUM(ph.ram_mb) / 1024.0                           AS h_ram_gb,
+            SUM(ph.disk_gb)                                   AS h_disk_gb,
+            MAX(vc.h_vm_count)                                AS h_vm_count,
+            SUM(ph.vm_count * COALESCE(mp.cost_per_hour, 0))  AS h_cost,
+            MAX(mp.currency)                                  AS price_currency
+        FROM portfolio_metering_hourly ph
+        JOIN vm_counts vc USING (project_name, hour)
+        LEFT JOIN metering_pricing mp ON mp.item_name = NULLIF(ph.flavor, '')
+        WHERE ph.hour >= %(start)s AND ph.hour < %(end)s
+        GROUP BY ph.project_name, ph.hour
+    )"""
+
+# monthly — avg/peak resource totals + SUM of all hourly costs, then quotas.
+# Currency comes from metering_pricing (where the rates live).
+# Falls back to metering_config.cost_currency or 'USD'.
+_MONTHLY_ROLLUP = """
+    WITH {hourly},
+    monthly AS (
+        SELECT
+            project_name,
+            ROUND(AVG(h_vcpus)::numeric,    2)               AS avg_vcpus,
+            ROUND(AVG(h_ram_gb)::numeric,   2)               AS avg_ram_gb,
+            ROUND(AVG(h_disk_gb)::numeric,  2)               AS avg_disk_gb,
+            CAST(ROUND(MAX(h_vcpus)::numeric, 0) AS integer) AS peak_vcpus,
+            ROUND(MAX(h_ram_gb)::numeric,   2)               AS peak_ram_gb,
+            MAX(h_vm_count)                                  AS vm_count,
+            ROUND(SUM(h_cost)::numeric,     4)               AS total_cost,
+            MAX(price_currency)                              AS price_currency
+        FROM hourly
+        GROUP BY project_name
+    )
+    SELECT
+        p.id                                   AS tenant_id,
+        m.avg_vcpus,
+        m.avg_ram_gb,
+        m.avg_disk_gb,
+        m.peak_vcpus,
+        m.peak_ram_gb,
+        m.vm_count,
+        -- Quota limits (from project_quotas, OpenStack-synced)
+        pq_cpu.quota_limit                     AS quota_vcpu_limit,
+        pq_cpu.in_use                          AS quota_vcpu_used,
+        pq_ram.quota_limit                     AS quota_ram_limit_mb,
+        pq_ram.in_use                          AS quota_ram_used_mb,
+        pq_stor.quota_limit                    AS quota_storage_limit_gb,
+        pq_stor.in_use                         AS quota_storage_used_gb,
+        COALESCE(m.total_cost, 0)              AS estimated_cost,
+        -- Currency from pricing table; falls back to metering_config or USD
+        COALESCE(
+            m.price_currency,
+            (SELECT cost_currency FROM metering_config LIMIT 1),
+            'USD'
+        )                                      AS currency
+    FROM monthly m
+    JOIN projects p ON p.name = m.project_name
+    -- Quota limits (nova: cores = vCPU, ram = MB)
+    LEFT JOIN project_quotas pq_cpu
+        ON pq_cpu.project_id = p.id
+       AND pq_cpu.service = 'nova' AND pq_cpu.resource = 'cores'
+    LEFT JOIN project_quotas pq_ram
+        ON pq_ram.project_id = p.id
+       AND pq_ram.service = 'nova' AND pq_ram.resource = 'ram'
+    LEFT JOIN project_quotas pq_stor
+        ON pq_stor.project_id = p.id
+       AND pq_stor.service = 'cinder' AND pq_stor.resource = 'gigabytes'
+"""
+
+_PORTFOLIO_UPSERT = """
+    INSERT INTO portfolio_metering_monthly (
+        tenant_id, month,
+        avg_vcpus, avg_ram_gb, avg_disk_gb,
+        peak_vcpus, peak_ram_gb,
+        quota_vcpu_limit,    quota_vcpu_used,
+        quota_ram_limit_mb,  quota_ram_used_mb,
+        quota_storage_limit_gb, quota_storage_used_gb,
+        estimated_cost, currency,
+        vm_count, computed_at
+    ) VALUES (
+        %(tenant_id)s, %(month)s,
+        %(avg_vcpus)s, %(avg_ram_gb)s, %(avg_disk_gb)s,
+        %(peak_vcpus)s, %(peak_ram_gb)s,
+        %(quota_vcpu_limit)s,    %(quota_vcpu_used)s,
+        %(quota_ram_limit_mb)s,  %(quota_ram_used_mb)s,
+        %(quota_storage_limit_gb)s, %(quota_storage_used_gb)s,
+        %(estimated_cost)s, %(currency)s,
+        %(vm_count)s, now()
+    )
+    ON CONFLICT (tenant_id, month) DO UPDATE SET
+        avg_vcpus              = EXCLUDED.avg_vcpus,
+        avg_ram_gb             = EXCLUDED.avg_ram_gb,
+        avg_disk_gb            = EXCLUDED.avg_disk_gb,
+        peak_vcpus             = EXCLUDED.peak_vcpus,
+        peak_ram_gb            = EXCLUDED.peak_ram_gb,
+        quota_vcpu_limit       = EXCLUDED.quota_vcpu_limit,
+        quota_vcpu_used        = EXCLUDED.quota_vcpu_used,
+        quota_ram_limit_mb     = EXCLUDED.quota_ram_limit_mb,
+        quota_ram_used_mb      = EXCLUDED.quota_ram_used_mb,
+        quota_storage_limit_gb = EXCLUDED.quota_storage_limit_gb,
+        quota_storage_used_gb  = EXCLUDED.quota_storage_used_gb,
+        estimated_cost         = EXCLUDED.estimated_cost,
+        currency               = EXCLUDED.currency,
+        vm_count               = EXCLUDED.vm_count,
+        computed_at            = now()
+"""
+
+# Rebuilds the partials of the given hours from metering_resources, with the
+# same one-reading-per-VM-per-hour rule as vm_snap.  NULL flavors are stored
+# as '' so they can be part of the primary key.
+_REFRESH_HOURS = """
+    DELETE FROM portfolio_metering_hourly WHERE hour = ANY(%(hours)s);
+    INSERT INTO portfolio_metering_hourly
+        (hour, project_name, flavor, vm_count, vcpus, ram_mb, disk_gb)
+    SELECT hour, project_name, flavor, COUNT(*), SUM(vcpus), SUM(ram_mb), SUM(disk_gb)
+    FROM (
+        SELECT DISTINCT ON (mr.vm_id, h.hour)
+            h.hour,
+            mr.project_name,
+            COALESCE(mr.flavor, '')              AS flavor,
+            COALESCE(mr.vcpus_allocated,  0)     AS vcpus,
+            COALESCE(mr.ram_allocated_mb, 0)     AS ram_mb,
+            COALESCE(mr.disk_allocated_gb,0)     AS disk_gb
+        FROM unnest(%(hours)s::timestamptz[]) AS h(hour)
+        JOIN metering_resources mr
+          ON mr.collected_at >= h.hour
+         AND mr.collected_at <  h.hour + interval '1 hour'
+        WHERE mr.project_name IS NOT NULL
+          AND mr.project_name != ''
+        ORDER BY mr.vm_id, h.hour, mr.collected_at DESC
+    ) vm_snap
+    GROUP BY hour, project_name, flavor
+"""
+
+
+def _month_bounds(day: datetime.date):
+    """(first day, first day of the next month) as UTC datetimes."""
+    start = day.replace(day=1)
+    nxt = (start + datetime.timedelta(days=32)).replace(day=1)
+    return (datetime.datetime(start.year, start.month, 1, tzinfo=datetime.timezone.utc),
+            datetime.datetime(nxt.year, nxt.month, 1, tzinfo=datetime.timezone.utc))
+
+
+def _portfolio_rows(cur, target_month: datetime.date, from_partials: bool) -> List[Dict[str, Any]]:
+    start, end = _month_bounds(target_month)
+    hourly = _HOURLY_FROM_PARTIALS if from_partials else _HOURLY_FROM_RESOURCES
+    cur.execute(_MONTHLY_ROLLUP.format(hourly=hourly), {"start": start, "end": end})
+    return cur.fetchall()
+
+
+def _upsert_portfolio_rows(cur, target_month: datetime.date, agg_rows) -> int:
+    batch = [dict(row, month=target_month, estimated_cost=row["estimated_cost"] or 0)
+             for row in agg_rows]
+    psycopg2.extras.execute_batch(cur, _PORTFOLIO_UPSERT, batch, page_size=100)
+    return len(batch)
+
+
+def _refresh_hourly_partials(cur, target_month: datetime.date,
+                             since: Optional[datetime.datetime]) -> int:
+    """Rebuild the partials of every hour of the month with rows collected after *since*."""
+    start, end = _month_bounds(target_month)
+    cur.execute("""
+        SELECT DISTINCT date_trunc('hour', collected_at) AS hour
+        FROM metering_resources
+        WHERE collected_at >= %(start)s AND collected_at < %(end)s
+          AND (%(since)s::timestamptz IS NULL OR collected_at > %(since)s)
+    """, {"start": start, "end": end, "since": since})
+    hours = [row["hour"] for row in cur.fetchall()]
+    if hours:
+        cur.execute(_REFRESH_HOURS, {"hours": hours})
+    return len(hours)
+
 
 def compute_portfolio_metering_monthly(conn, target_month: Optional[datetime.date] = None) -> int:
     """
@@ -949,218 +1200,60 @@ def compute_portfolio_metering_monthly(conn, target_month: Optional[datetime.dat
     Logic:
       1. For each project, bucket metering_resources readings by hour so that
          VMs counted once per hour avoid inflating counts from 60-s polls.
+         Hours with rows collected since the month's watermark are rebuilt in
+         portfolio_metering_hourly; the other hours are reused as they are.
       2. Average the hourly totals across the month → avg_vcpus / avg_ram_gb / avg_disk_gb.
       3. Peak = max hourly total in the month.
       4. VM count = max distinct VMs seen in any single hour.
       5. Join with project_quotas for live quota limits/used.
-      6. Estimate cost from msp_contract_entitlements.unit_price (vcpu × hours × price).
-         Falls back to NULL when no pricing is configured (shown as "—" in the UI).
+      6. Estimate cost from metering_pricing.cost_per_hour per VM-hour of each flavor.
       7. Upsert (INSERT … ON CONFLICT DO UPDATE) so the current month row stays fresh.
 
-    Called every collection cycle for the current month and once at startup for
-    the previous 6 months (backfill).
+    The watermark trails the DB clock by METERING_ROLLUP_LAG_SECONDS.  Once
+    it passes the end of the month the month is finalized: its partials are
+    dropped and later calls return 0 without touching it.
+
+    Called every collection cycle for the current and the previous month.
     """
     if target_month is None:
-        today = datetime.date.today()
-        target_month = today.replace(day=1)
-
-    # Compute next month boundary
-    if target_month.month == 12:
-        next_month = target_month.replace(year=target_month.year + 1, month=1)
-    else:
-        next_month = target_month.replace(month=target_month.month + 1)
-
-    month_ts     = datetime.datetime(target_month.year, target_month.month, 1,
-                                     tzinfo=datetime.timezone.utc)
-    next_month_ts = datetime.datetime(next_month.year, next_month.month, 1,
-                                      tzinfo=datetime.timezone.utc)
-
-    # Hours in the month (for cost = avg_vcpus × hours × unit_price)
-    hours_in_month = int((next_month_ts - month_ts).total_seconds() / 3600)
+        target_month = datetime.date.today()
+    target_month = target_month.replace(day=1)
+    _, next_month_ts = _month_bounds(target_month)
 
     try:
         with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-            # -------------------------------------------------------------------
-            # Aggregate per-tenant metering for the target month.
-            #
-            # vm_snap  — DISTINCT ON (vm_id, hour): one reading per VM per hour,
-            #   avoiding 60× inflation from 1-min polling. Includes flavor for
-            #   pricing lookup.
-            # vm_priced — joins metering_pricing by flavor name. Each vm_snap
-            #   row = VM ran for 1 hour, so cost_per_hour is the cost incurred.
-            # hourly   — sums resources + cost per project per hour.
-            # monthly  — avg/peak resource totals + SUM of all hourly costs.
-            #
-            # Currency comes from metering_pricing (where the rates live).
-            # Falls back to metering_config.cost_currency or 'USD'.
-            # -------------------------------------------------------------------
             cur.execute("""
-                WITH vm_snap AS (
-                    -- One canonical reading per VM per hour (latest poll)
-                    SELECT DISTINCT ON (mr.vm_id, date_trunc('hour', mr.collected_at))
-                        mr.project_name,
-                        mr.vm_id,
-                        mr.flavor,
-                        date_trunc('hour', mr.collected_at)  AS hour,
-                        COALESCE(mr.vcpus_allocated,  0)     AS vcpus,
-                        COALESCE(mr.ram_allocated_mb, 0)     AS ram_mb,
-                        COALESCE(mr.disk_allocated_gb,0)     AS disk_gb
-                    FROM metering_resources mr
-                    WHERE mr.collected_at >= %s
-                      AND mr.collected_at <  %s
-                      AND mr.project_name IS NOT NULL
-                      AND mr.project_name != ''
-                    ORDER BY mr.vm_id,
-                             date_trunc('hour', mr.collected_at),
-                             mr.collected_at DESC
-                ),
-                vm_priced AS (
-                    -- Join flavor pricing: each row = VM ran 1 hour at cost_per_hour
-                    SELECT
-                        vs.project_name,
-                        vs.vm_id,
-                        vs.hour,
-                        vs.vcpus,
-                        vs.ram_mb,
-                        vs.disk_gb,
-                        COALESCE(mp.cost_per_hour, 0)  AS cost_per_hour,
-                        mp.currency                    AS price_currency
-                    FROM vm_snap vs
-                    LEFT JOIN metering_pricing mp ON mp.item_name = vs.flavor
-                ),
-                hourly AS (
-                    -- Sum resources and cost per project per hour
-                    SELECT
-                        project_name,
-                        hour,
-                        SUM(vcpus)             AS h_vcpus,
-                        SUM(ram_mb) / 1024.0   AS h_ram_gb,
-                        SUM(disk_gb)           AS h_disk_gb,
-                        COUNT(DISTINCT vm_id)  AS h_vm_count,
-                        SUM(cost_per_hour)     AS h_cost,
-                        MAX(price_currency)    AS price_currency
-                    FROM vm_priced
-                    GROUP BY project_name, hour
-                ),
-                monthly AS (
-                    SELECT
-                        project_name,
-                        ROUND(AVG(h_vcpus)::numeric,    2)               AS avg_vcpus,
-                        ROUND(AVG(h_ram_gb)::numeric,   2)               AS avg_ram_gb,
-                        ROUND(AVG(h_disk_gb)::numeric,  2)               AS avg_disk_gb,
-                        CAST(ROUND(MAX(h_vcpus)::numeric, 0) AS integer) AS peak_vcpus,
-                        ROUND(MAX(h_ram_gb)::numeric,   2)               AS peak_ram_gb,
-                        MAX(h_vm_count)                                  AS vm_count,
-                        ROUND(SUM(h_cost)::numeric,     4)               AS total_cost,
-                        MAX(price_currency)                              AS price_currency
-                    FROM hourly
-                    GROUP BY project_name
-                )
-                SELECT
-                    p.id                                   AS tenant_id,
-                    m.avg_vcpus,
-                    m.avg_ram_gb,
-                    m.avg_disk_gb,
-                    m.peak_vcpus,
-                    m.peak_ram_gb,
-                    m.vm_count,
-                    -- Quota limits (from project_quotas, OpenStack-synced)
-                    pq_cpu.quota_limit                     AS quota_vcpu_limit,
-                    pq_cpu.in_use                          AS quota_vcpu_used,
-                    pq_ram.quota_limit                     AS quota_ram_limit_mb,
-                    pq_ram.in_use                          AS quota_ram_used_mb,
-                    pq_stor.quota_limit                    AS quota_storage_limit_gb,
-                    pq_stor.in_use                         AS quota_storage_used_gb,
-                    COALESCE(m.total_cost, 0)              AS estimated_cost,
-                    -- Currency from pricing table; falls back to metering_config or USD
-                    COALESCE(
-                        m.price_currency,
-                        (SELECT cost_currency FROM metering_config LIMIT 1),
-                        'USD'
-                    )                                      AS currency
-                FROM monthly m
-                JOIN projects p ON p.name = m.project_name
-                -- Quota limits (nova: cores = vCPU, ram = MB)
-                LEFT JOIN project_quotas pq_cpu
-                    ON pq_cpu.project_id = p.id
-                   AND pq_cpu.service = 'nova' AND pq_cpu.resource = 'cores'
-                LEFT JOIN project_quotas pq_ram
-                    ON pq_ram.project_id = p.id
-                   AND pq_ram.service = 'nova' AND pq_ram.resource = 'ram'
-                LEFT JOIN project_quotas pq_stor
-                    ON pq_stor.project_id = p.id
-                   AND pq_stor.service = 'cinder' AND pq_stor.resource = 'gigabytes'
-            """, (month_ts, next_month_ts))
-            agg_rows = cur.fetchall()
-
-        if not agg_rows:
-            log.debug("Portfolio monthly aggregation for %s: no metering_resources data yet", target_month)
-            return 0
-
-        upsert_sql = """
-            INSERT INTO portfolio_metering_monthly (
-                tenant_id, month,
-                avg_vcpus, avg_ram_gb, avg_disk_gb,
-                peak_vcpus, peak_ram_gb,
-                quota_vcpu_limit,    quota_vcpu_used,
-                quota_ram_limit_mb,  quota_ram_used_mb,
-                quota_storage_limit_gb, quota_storage_used_gb,
-                estimated_cost, currency,
-                vm_count, computed_at
-            ) VALUES (
-                %(tenant_id)s, %(month)s,
-                %(avg_vcpus)s, %(avg_ram_gb)s, %(avg_disk_gb)s,
-                %(peak_vcpus)s, %(peak_ram_gb)s,
-                %(quota_vcpu_limit)s,    %(quota_vcpu_used)s,
-                %(quota_ram_limit_mb)s,  %(quota_ram_used_mb)s,
-                %(quota_storage_limit_gb)s, %(quota_storage_used_gb)s,
-                %(estimated_cost)s, %(currency)s,
-                %(vm_count)s, now()
-            )
-            ON CONFLICT (tenant_id, month) DO UPDATE SET
-                avg_vcpus              = EXCLUDED.avg_vcpus,
-                avg_ram_gb             = EXCLUDED.avg_ram_gb,
-                avg_disk_gb            = EXCLUDED.avg_disk_gb,
-                peak_vcpus             = EXCLUDED.peak_vcpus,
-                peak_ram_gb            = EXCLUDED.peak_ram_gb,
-                quota_vcpu_limit       = EXCLUDED.quota_vcpu_limit,
-                quota_vcpu_used        = EXCLUDED.quota_vcpu_used,
-                quota_ram_limit_mb     = EXCLUDED.quota_ram_limit_mb,
-                quota_ram_used_mb      = EXCLUDED.quota_ram_used_mb,
-                quota_storage_limit_gb = EXCLUDED.quota_storage_limit_gb,
-                quota_storage_used_gb  = EXCLUDED.quota_storage_used_gb,
-                estimated_cost         = EXCLUDED.estimated_cost,
-                currency               = EXCLUDED.currency,
-                vm_count               = EXCLUDED.vm_count,
-                computed_at            = now()
-        """
-
-        batch = []
-        for row in agg_rows:
-            batch.append({
-                "tenant_id":              row["tenant_id"],
-                "month":                  target_month,
-                "avg_vcpus":              row["avg_vcpus"],
-                "avg_ram_gb":             row["avg_ram_gb"],
-                "avg_disk_gb":            row["avg_disk_gb"],
-                "peak_vcpus":             row["peak_vcpus"],
-                "peak_ram_gb":            row["peak_ram_gb"],
-                "quota_vcpu_limit":       row["quota_vcpu_limit"],
-                "quota_vcpu_used":        row["quota_vcpu_used"],
-                "quota_ram_limit_mb":     row["quota_ram_limit_mb"],
-                "quota_ram_used_mb":      row["quota_ram_used_mb"],
-                "quota_storage_limit_gb": row["quota_storage_limit_gb"],
-                "quota_storage_used_gb":  row["quota_storage_used_gb"],
-                "estimated_cost":         row["estimated_cost"] or 0,
-                "currency":               row["currency"],
-                "vm_count":               row["vm_count"],
-            })
-
-        with conn.cursor() as cur:
-            psycopg2.extras.execute_batch(cur, upsert_sql, batch, page_size=100)
+                SELECT watermark, finalized FROM portfolio_metering_watermarks
+                WHERE month = %s FOR UPDATE
+            """, (target_month,))
+            state = cur.fetchone()
+            if state and state["finalized"]:
+                conn.rollback()
+                return 0
+            # Rows committed while this runs are picked up again next time.
+            cur.execute("SELECT NOW() - make_interval(secs => %s) AS watermark",
+                        (ROLLUP_LAG_SECONDS,))
+            new_watermark = min(cur.fetchone()["watermark"], next_month_ts)
+            finalized = new_watermark >= next_month_ts
+
+            hours = _refresh_hourly_partials(cur, target_month, state and state["watermark"])
+            agg_rows = _portfolio_rows(cur, target_month, from_partials=True)
+            n = _upsert_portfolio_rows(cur, target_month, agg_rows)
+            cur.execute("""
+                INSERT INTO portfolio_metering_watermarks (month, watermark, finalized)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (month) DO UPDATE SET
+                    watermark  = EXCLUDED.watermark,
+                    finalized  = EXCLUDED.finalized,
+                    updated_at = NOW()
+            """, (target_month, new_watermark, finalized))
+            if finalized:
+                cur.execute("DELETE FROM portfolio_metering_hourly WHERE hour >= %s AND hour < %s",
+                            _month_bounds(target_month))
         conn.commit()
-        log.info("Portfolio monthly aggregation for %s: upserted %d tenant rows", target_month, len(batch))
-        return len(batch)
+        log.info("Portfolio monthly aggregation for %s: %d hour(s) refreshed, %d tenant rows upserted%s",
+                 target_month, hours, n, " — month finalized" if finalized else "")
+        return n
 
     except Exception as exc:
         log.error("compute_portfolio_metering_monthly(%s) failed: %s", target_month, exc)
@@ -1171,28 +1264,94 @@ def compute_portfolio_metering_monthly(conn, target_month: Optional[datetime.dat
         return 0
 
 
+def recompute_portfolio_month(conn, target_month: datetime.date) -> int:
+    """Rebuild a closed month straight from metering_resources and finalize it."""
+    target_month = target_month.replace(day=1)
+    _, next_month_ts = _month_bounds(target_month)
+    with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+        n = _upsert_portfolio_rows(cur, target_month,
+                                   _portfolio_rows(cur, target_month, from_partials=False))
+        cur.execute("""
+            INSERT INTO portfolio_metering_watermarks (month, watermark, finalized)
+            VALUES (%s, %s, TRUE)
+            ON CONFLICT (month) DO UPDATE SET
+                watermark = EXCLUDED.watermark, finalized = TRUE, updated_at = NOW()
+        """, (target_month, next_month_ts))
+        cur.execute("DELETE FROM portfolio_metering_hourly WHERE hour >= %s AND hour < %s",
+                    _month_bounds(target_month))
+    conn.commit()
+    return n
+
+
 def backfill_portfolio_metering_monthly(conn, months: int = 6) -> None:
     """
-    Compute portfolio_metering_monthly for the past N calendar months.
-    Safe to call repeatedly; each month is an upsert.
+    Compute portfolio_metering_monthly for the past N calendar months that
+    have not been finalized yet; finalized months are left as they are.
     Skips the current month (handled by run_collection_cycle every cycle).
     """
-    today = datetime.date.today()
-    for i in range(1, months + 1):
-        # Walk back month by month
-        m = today.month - i
-        y = today.year
-        while m <= 0:
-            m += 12
-            y -= 1
-        target = datetime.date(y, m, 1)
-        n = compute_portfolio_metering_monthly(conn, target_month=target)
+    current = datetime.date.today().replace(day=1)
+    targets = []
+    m = current
+    for _ in range(months):
+        m = (m - datetime.timedelta(days=1)).replace(day=1)
+        targets.append(m)
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT month FROM portfolio_metering_watermarks
+            WHERE month = ANY(%s) AND finalized
+        """, (targets,))
+        done = {row[0] for row in cur.fetchall()}
+    for target in targets:
+        if target in done:
+            continue
+        try:
+            n = recompute_portfolio_month(conn, target)
+        except Exception as exc:
+            log.error("Portfolio monthly backfill for %s failed: %s", target, exc)
+            conn.rollback()
+            continue
         if n:
             log.info("Backfilled %d tenant rows for %s", n, target)
         else:
             log.debug("No data to backfill for %s", target)
 
 
+def verify_portfolio_month(conn, target_month: Optional[datetime.date] = None) -> List[str]:
+    """Compare the partials rollup of an open month with a full recompute.
+
+    The month is rolled up first, as a cycle would, so both sides see the
+    same rows.  Returns one line per tenant whose rows differ (empty when
+    they match).  Hours pruned from
+    metering_resources by retention stay in the partials, so a retention
+    shorter than the month shows up here as a difference.
+    """
+    if target_month is None:
+        target_month = datetime.date.today()
+    target_month = target_month.replace(day=1)
+    compute_portfolio_metering_monthly(conn, target_month)
+    with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+        cur.execute("SELECT finalized FROM portfolio_metering_watermarks WHERE month = %s",
+                    (target_month,))
+        state = cur.fetchone()
+        if state and state["finalized"]:
+            raise ValueError(f"{target_month:%Y-%m} is finalized; its hourly partials are gone")
+        incremental = {r["tenant_id"]: r for r in _portfolio_rows(cur, target_month, from_partials=True)}
+        full = {r["tenant_id"]: r for r in _portfolio_rows(cur, target_month, from_partials=False)}
+    conn.rollback()
+
+    diffs = []
+    for tenant in sorted(set(incremental) | set(full)):
+        a, b = incremental.get(tenant), full.get(tenant)
+        if a is None or b is None:
+            diffs.append(f"{tenant}: only in the {'full recompute' if a is None else 'partials'}")
+            continue
+        fields = [k for k in b if a[k] != b[k]]
+        if fields:
+            diffs.append(f"{tenant}: " + ", ".join(
+                f"{k} partials={a[k]} full={b[k]}" for k in fields))
+    return diffs
+
+
 _ALIVE_FILE = "/tmp/alive"
 
 
@@ -1205,6 +1364,102 @@ def _touch_alive() -> None:
         pass
 
 
+# ---------------------------------------------------------------------------
+# Per-region collection
+# ---------------------------------------------------------------------------
+# Lock ID 8765432 is arbitrary and unique to the metering worker.  The cycle
+# holds it alone; each region is locked as (8765432, hashtext(region_id)).
+_LOCK_ID = 8765432
+
+_region_pool: Optional[ThreadPoolExecutor] = None
+
+
+def collect_region(region: Dict[str, Any]) -> bool:
+    """
+    Collect every per-region metric for one region on its own connection and
+    record the run in cluster_sync_metrics.
+
+    Returns False without collecting when the region's advisory lock is held,
+    e.g. by a collection from an earlier cycle that is still running.
+    """
+    region_id = region["region_id"] or ""
+    region_name = region.get("region_name") or region_id or "default"
+    conn = get_conn_with_cb()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_try_advisory_lock(%s, hashtext(%s))", (_LOCK_ID, region_id))
+            if not cur.fetchone()[0]:
+                log.warning("[%s] Region is still being collected – skipping it this cycle", region_name)
+                return False
+
+        started_at = datetime.datetime.now(datetime.timezone.utc)
+        total_resources = 0
+        total_errors = 0
+
+        log.info("--- Collecting metrics for region: %s (%s) ---", region_name, region_id)
+        with _telemetry.stage("region", component=region_name):
+            try:
+                with _telemetry.stage("collector", component="resources"):
+                    n = collect_resource_metrics(conn, region_id)
+                log.info("[%s] Resources: %d VM records collected", region_name, n)
+                total_resources += n
+
+                with _telemetry.stage("collector", component="snapshots"):
+                    n = collect_snapshot_metrics(conn, region_id)
+                log.info("[%s] Snapshots: %d records collected", region_name, n)
+
+                with _telemetry.stage("collector", component="restores"):
+                    n = collect_restore_metrics(conn, region_id)
+                log.info("[%s] Restores:  %d records collected", region_name, n)
+
+                with _telemetry.stage("collector", component="quotas"):
+                    n = collect_quota_usage(conn, region_id)
+                log.info("[%s] Quotas:    %d project usage records", region_name, n)
+
+                with _telemetry.stage("collector", component="efficiency"):
+                    n = collect_efficiency_scores(conn, region_id)
+                log.info("[%s] Efficiency: %d VM scores computed", region_name, n)
+
+            except Exception as exc:
+                total_errors += 1
+                _telemetry.fail()
+                log.error("[%s] Collection failed: %s\n%s", region_name, exc, traceback.format_exc())
+
+        finished_at = datetime.datetime.now(datetime.timezone.utc)
+        record_metering_sync(conn, region_id, started_at, finished_at, total_resources, total_errors)
+        return True
+    finally:
+        try:
+            conn.close()  # also releases the region lock
+        except Exception:
+            pass
+
+
+def collect_regions(regions: List[Dict[str, Any]]) -> None:
+    """
+    Collect all regions on a pool of METERING_REGION_WORKERS threads.
+
+    Waits up to METERING_REGION_TIMEOUT_SECONDS; regions still running after
+    that keep going in the background and hold their lock, so the next cycle
+    skips them instead of collecting them twice.
+    """
+    global _region_pool
+    if _region_pool is None:
+        _region_pool = ThreadPoolExecutor(max_workers=REGION_WORKERS,
+                                          thread_name_prefix="metering-region")
+    futures = {_region_pool.submit(collect_region, region): region for region in regions}
+    _, pending = wait(futures, timeout=REGION_TIMEOUT_SECONDS)
+    for future, region in futures.items():
+        region_name = region.get("region_name") or region["region_id"] or "default"
+        if future in pending:
+            _telemetry.fail()
+            log.warning("[%s] Still collecting after %ds – continuing the cycle without it",
+                        region_name, REGION_TIMEOUT_SECONDS)
+        elif future.exception() is not None:
+            _telemetry.fail()
+            log.error("[%s] Collection failed: %s", region_name, future.exception())
+
+
 # ---------------------------------------------------------------------------
 # Main loop
 # ---------------------------------------------------------------------------
@@ -1214,10 +1469,9 @@ def run_collection_cycle():
     try:
         conn = get_conn_with_cb()
 
-        # Distributed lock: prevent two replicas from collecting simultaneously.
-        # Lock ID 8765432 is arbitrary and unique to the metering worker.
+        # Distributed lock: prevent two replicas from running a cycle simultaneously.
         with conn.cursor() as _cur:
-            _cur.execute("SELECT pg_try_advisory_lock(8765432)")
+            _cur.execute("SELECT pg_try_advisory_lock(%s)", (_LOCK_ID,))
             got_lock = _cur.fetchone()[0]
         if not got_lock:
             log.info("Another metering worker holds the lock – skipping this cycle")
@@ -1238,53 +1492,31 @@ def run_collection_cycle():
             default_rid = load_default_region_id(conn)
             regions = [{"region_id": default_rid, "region_name": default_rid or "default"}]
 
-        log.info("=== Metering collection cycle start (regions: %d) ===", len(regions))
+        log.info("=== Metering collection cycle start (regions: %d, workers: %d) ===",
+                 len(regions), min(REGION_WORKERS, len(regions)))
 
         # API usage is global (not per-region) – collect once per cycle
-        n = collect_api_usage(conn)
+        with _telemetry.stage("collector", component="api_usage"):
+            n = collect_api_usage(conn)
         log.info("API usage: %d endpoint records collected", n)
 
-        for region in regions:
-            region_id = region["region_id"] or ""
-            region_name = region.get("region_name") or region_id or "default"
-            started_at = datetime.datetime.now(datetime.timezone.utc)
-            total_resources = 0
-            total_errors = 0
+        collect_regions(regions)
 
-            log.info("--- Collecting metrics for region: %s (%s) ---", region_name, region_id)
-            try:
-                n = collect_resource_metrics(conn, region_id)
-                log.info("[%s] Resources: %d VM records collected", region_name, n)
-                total_resources += n
-
-                n = collect_snapshot_metrics(conn, region_id)
-                log.info("[%s] Snapshots: %d records collected", region_name, n)
-
-                n = collect_restore_metrics(conn, region_id)
-                log.info("[%s] Restores:  %d records collected", region_name, n)
-
-                n = collect_quota_usage(conn, region_id)
-                log.info("[%s] Quotas:    %d project usage records", region_name, n)
-
-                n = collect_efficiency_scores(conn, region_id)
-                log.info("[%s] Efficiency: %d VM scores computed", region_name, n)
-
-            except Exception as exc:
-                total_errors += 1
-                log.error("[%s] Collection failed: %s\n%s", region_name, exc, traceback.format_exc())
-
-            finished_at = datetime.datetime.now(datetime.timezone.utc)
-            record_metering_sync(conn, region_id, started_at, finished_at, total_resources, total_errors)
-
-        prune_old_records(conn, retention_days)
+        with _telemetry.stage("prune"):
+            prune_old_records(conn, retention_days)
 
-        # Aggregate current month into portfolio_metering_monthly (upsert — safe every cycle)
-        n = compute_portfolio_metering_monthly(conn)
+        # Fold new samples into portfolio_metering_monthly (upsert — safe every cycle).
+        # The previous month is a no-op once finalized.
+        with _telemetry.stage("portfolio_monthly"):
+            today = datetime.date.today().replace(day=1)
+            compute_portfolio_metering_monthly(conn, (today - datetime.timedelta(days=1)).replace(day=1))
+            n = compute_portfolio_metering_monthly(conn, today)
         log.info("Portfolio metering monthly (current month): %d tenant rows upserted", n)
 
         log.info("=== Metering collection cycle complete ===")
 
     except Exception as exc:
+        _telemetry.fail()
         log.error("Collection cycle failed: %s\n%s", exc, traceback.format_exc())
     finally:
         if conn:
@@ -1334,8 +1566,8 @@ def main():
         log.warning("Startup quota backfill failed (non-fatal): %s", exc)
 
     # Startup backfill: populate portfolio_metering_monthly for the past 6 months
-    # using existing metering_resources data. Safe if the table already has rows —
-    # each month is an upsert. Provides immediate data on first deploy / pod restart.
+    # using existing metering_resources data. Months already finalized are
+    # skipped, so a pod restart only recomputes months that were never rolled up.
     try:
         conn = get_conn()
         log.info("Running portfolio metering monthly backfill (last 6 months)…")
@@ -1354,17 +1586,74 @@ def main():
     while not _shutdown:
         now = time.time()
         if now - last_run >= effective_interval:
-            _cycle_start = time.time()
-            _cycle_error = False
-            try:
-                run_collection_cycle()
-            except Exception:
-                _cycle_error = True
-            _report_worker_metrics(time.time() - _cycle_start, _cycle_error, effective_interval)
+            with _telemetry.cycle(frequency_s=effective_interval):
+                try:
+                    run_collection_cycle()
+                except Exception:
+                    _telemetry.fail()
             last_run = time.time()
         _touch_alive()  # heartbeat — liveness probe checks /tmp/alive mtime
         time.sleep(min(30, effective_interval))  # wake up every 30s to check shutdown
 
 
+def _parse_month(value: str) -> datetime.date:
+    try:
+        return datetime.datetime.strptime(value, "%Y-%m").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM, got {value!r}")
+
+
+def _backfill_cli(args) -> None:
+    current = datetime.date.today().replace(day=1)
+    if args.month:
+        months = sorted(set(args.month))
+    else:
+        months = []
+        m = current
+        for _ in range(args.months):
+            m = (m - datetime.timedelta(days=1)).replace(day=1)
+            months.append(m)
+        months.reverse()
+    if current in months:
+        raise SystemExit("The current month is rolled up by the worker loop; backfill closed months only.")
+    conn = get_conn()
+    try:
+        for month in months:
+            n = recompute_portfolio_month(conn, month)
+            log.info("Recomputed portfolio metering for %s: %d tenant rows", month.strftime("%Y-%m"), n)
+    finally:
+        conn.close()
+
+
+def _verify_cli(args) -> None:
+    conn = get_conn()
+    try:
+        diffs = verify_portfolio_month(conn, args.month)
+    finally:
+        conn.close()
+    month = (args.month or datetime.date.today()).strftime("%Y-%m")
+    for line in diffs:
+        log.error("%s %s", month, line)
+    if diffs:
+        raise SystemExit(1)
+    log.info("Portfolio metering for %s: partials rollup matches the full recompute", month)
+
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="PF9 Metering Worker")
+    sub = parser.add_subparsers(dest="command")
+    bf = sub.add_parser("backfill", help="Recompute portfolio metering for closed months and exit")
+    bf.add_argument("--months", type=int, default=6,
+                    help="number of months before the current one (default: 6)")
+    bf.add_argument("--month", type=_parse_month, action="append",
+                    help="a specific month as YYYY-MM (repeatable; overrides --months)")
+    vf = sub.add_parser("verify", help="Compare the hourly rollup with a full recompute and exit")
+    vf.add_argument("--month", type=_parse_month,
+                    help="an open month as YYYY-MM (default: the current month)")
+    args = parser.parse_args()
+    if args.command == "backfill":
+        _backfill_cli(args)
+    elif args.command == "verify":
+        _verify_cli(args)
+    else:
+        main()
@@ -16,6 +16,7 @@ from slowapi.errors import RateLimitExceeded
 
 from prometheus_client import PrometheusClient
 from models import VMMetrics, HostMetrics, MetricsResponse
+from metrics_store import MetricsStore
 
 @asynccontextmanager
 async def _lifespan(app: FastAPI):
@@ -129,6 +130,12 @@ prometheus_client = PrometheusClient(
     cache_ttl=int(os.getenv("METRICS_CACHE_TTL", "60"))
 )
 
+# Parsed, indexed view of /tmp/cache/metrics_cache.json shared by all
+# endpoints.  The collector publishes each new cycle directly; writes by
+# other producers are picked up from the file's mtime.
+metrics_store = MetricsStore()
+prometheus_client.on_snapshot = metrics_store.publish
+
 async def _discover_hosts_with_retry(max_attempts: int = 5, delay_s: float = 5.0) -> list:
     """Attempt to fetch Prometheus targets from the admin API with retries.
 
@@ -272,14 +279,16 @@ async def _bootstrap_cache_from_api():
             for v in api_vms
         ]
 
-        cache = load_cache_data()
+        # Snapshot data is shared with readers — build a new dict, don't mutate it.
+        cache = dict(load_cache_data())
         cache["vms"] = cache_vms
         cache["timestamp"] = vm_data.get("timestamp")
         cache["source"] = "database"
-        cache["summary"]["total_vms"] = len(cache_vms)
+        cache["summary"] = {**cache.get("summary", {}), "total_vms": len(cache_vms)}
 
         with open("/tmp/cache/metrics_cache.json", "w") as f:  # nosec B108
             json.dump(cache, f)
+        metrics_store.publish(cache)
 
         logger.info(
             "Metrics cache bootstrapped from admin API DB: %d VMs (allocation-based estimates)",
@@ -299,27 +308,8 @@ async def shutdown_event():
 
 # Helper functions
 def load_cache_data() -> Dict[str, Any]:
-    """Load metrics from cache file"""
-    try:
-        with open("/tmp/cache/metrics_cache.json", "r") as f:  # nosec B108
-            return json.load(f)
-    except FileNotFoundError:
-        return {
-            "vms": [],
-            "hosts": [],
-            "alerts": [],
-            "summary": {"total_vms": 0, "total_hosts": 0, "last_update": None},
-            "timestamp": None
-        }
-    except Exception as e:
-        logger.error("Error loading cache", extra={"context": {"error": str(e)}})
-        return {
-            "vms": [],
-            "hosts": [],
-            "alerts": [],
-            "summary": {"total_vms": 0, "total_hosts": 0, "last_update": None},
-            "timestamp": None
-        }
+    """Current metrics cache (shared snapshot data — treat as read-only)."""
+    return metrics_store.current().data
 
 # API endpoints
 @app.get("/")
@@ -372,19 +362,9 @@ async def get_vm_metrics(
 ):
     """Get VM resource metrics"""
     try:
-        cache_data = load_cache_data()
-        vms = cache_data.get("vms", [])
-        
-        # Apply filters if provided
-        if tenant:
-            vms = [vm for vm in vms if vm.get("tenant") == tenant]
-        if project:
-            vms = [vm for vm in vms if vm.get("project") == project]
-        
-        # Apply limit
-        vms = vms[:limit] if limit else vms
-        
-        return {"data": vms, "timestamp": cache_data.get("timestamp"), "source": cache_data.get("source")}
+        snap = metrics_store.current()
+        vms = snap.filter_vms(tenant, project, limit)
+        return {"data": vms, "timestamp": snap.timestamp, "source": snap.source}
     except Exception as e:
         logger.error("Error fetching VM metrics", extra={"context": {"error": str(e)}})
         raise HTTPException(status_code=500, detail=f"Error fetching VM metrics: {str(e)}")
@@ -395,13 +375,9 @@ async def get_host_metrics(
 ):
     """Get host resource metrics"""
     try:
-        cache_data = load_cache_data()
-        hosts = cache_data.get("hosts", [])
-        
-        # Apply limit
-        hosts = hosts[:limit] if limit else hosts
-        
-        return {"data": hosts, "timestamp": cache_data.get("timestamp")}
+        snap = metrics_store.current()
+        hosts = snap.hosts[:limit] if limit else snap.hosts
+        return {"data": hosts, "timestamp": snap.timestamp}
     except Exception as e:
         logger.error("Error fetching host metrics", extra={"context": {"error": str(e)}})
         raise HTTPException(status_code=500, detail=f"Error fetching host metrics: {str(e)}")
@@ -410,8 +386,7 @@ async def get_host_metrics(
 async def get_alerts():
     """Get current alerts"""
     try:
-        cache_data = load_cache_data()
-        return {"alerts": cache_data.get("alerts", [])}
+        return {"alerts": metrics_store.current().alerts}
     except Exception as e:
         logger.error("Error fetching alerts", extra={"context": {"error": str(e)}})
         raise HTTPException(status_code=500, detail=f"Error fetching alerts: {str(e)}")
@@ -420,14 +395,16 @@ async def get_alerts():
 async def get_metrics_summary():
     """Get summary of all metrics"""
     try:
-        cache_data = load_cache_data()
-        return cache_data.get("summary", {
-            "total_vms": 0,
-            "total_hosts": 0,
-            "last_update": None,
-            "vm_stats": {},
-            "host_stats": {}
-        })
+        summary = metrics_store.current().summary
+        if summary is None:
+            return {
+                "total_vms": 0,
+                "total_hosts": 0,
+                "last_update": None,
+                "vm_stats": {},
+                "host_stats": {}
+            }
+        return summary
     except Exception as e:
         logger.error("Error fetching summary", extra={"context": {"error": str(e)}})
         raise HTTPException(status_code=500, detail=f"Error fetching summary: {str(e)}")
@@ -441,27 +418,13 @@ async def get_all_metrics(
 ):
     """Get all metrics in one response"""
     try:
-        cache_data = load_cache_data()
-        
-        vms = cache_data.get("vms", [])
-        hosts = cache_data.get("hosts", [])
-        
-        # Apply filters
-        if tenant:
-            vms = [vm for vm in vms if vm.get("tenant") == tenant]
-        if project:
-            vms = [vm for vm in vms if vm.get("project") == project]
-        
-        # Apply limits
-        vms = vms[:vm_limit] if vm_limit else vms
-        hosts = hosts[:host_limit] if host_limit else hosts
-        
+        snap = metrics_store.current()
         return {
-            "vms": vms,
-            "hosts": hosts,
-            "alerts": cache_data.get("alerts", []),
-            "summary": cache_data.get("summary", {}),
-            "timestamp": cache_data.get("timestamp")
+            "vms": snap.filter_vms(tenant, project, vm_limit),
+            "hosts": snap.hosts[:host_limit] if host_limit else snap.hosts,
+            "alerts": snap.alerts,
+            "summary": snap.summary if snap.summary is not None else {},
+            "timestamp": snap.timestamp
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching metrics: {str(e)}")
@@ -471,12 +434,13 @@ async def get_all_metrics(
 async def refresh_metrics():
     """Trigger metrics refresh (cache reload)"""
     try:
-        cache_data = load_cache_data()
+        snap = metrics_store.reload(force=True)
         return {
             "status": "refreshed",
             "timestamp": datetime.utcnow().isoformat(),
-            "hosts_count": len(cache_data.get("hosts", [])),
-            "vms_count": len(cache_data.get("vms", []))
+            "hosts_count": len(snap.hosts),
+            "vms_count": len(snap.vms),
+            "snapshot_version": snap.version,
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error refreshing metrics: {str(e)}")
@@ -0,0 +1,179 @@
+"""
+In-memory snapshot of the monitoring metrics cache.
+
+The endpoints in main.py used to re-read and JSON-parse the whole
+``metrics_cache.json`` on every request and then scan the VM list for the
+tenant/project filters.  ``MetricsStore`` keeps one parsed, indexed
+``MetricsSnapshot`` instead and swaps it atomically when new data arrives:
+
+  * ``publish(payload)`` — called by the in-process collector right after it
+    writes the cache file (no re-read needed);
+  * the file itself is also written by other producers (the host-side
+    ``host_metrics_collector.py`` via the shared volume, the DB bootstrap),
+    so ``current()`` stats the file at most every ``stat_interval`` seconds
+    and re-parses it only when its mtime/size/inode changed.
+
+Snapshots are never mutated after construction; readers grab a reference and
+keep using it even if a newer snapshot is swapped in meanwhile.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("pf9_monitoring")
+
+CACHE_PATH = "/tmp/cache/metrics_cache.json"  # nosec B108 — container-internal volume
+
+
+def empty_cache() -> Dict[str, Any]:
+    return {
+        "vms": [],
+        "hosts": [],
+        "alerts": [],
+        "summary": {"total_vms": 0, "total_hosts": 0, "last_update": None},
+        "timestamp": None
+    }
+
+
+def _index(items: List[Dict[str, Any]], field: str) -> Dict[Any, List[Dict[str, Any]]]:
+    """Group ``items`` by ``item[field]``, keeping the original order."""
+    out: Dict[Any, List[Dict[str, Any]]] = {}
+    for item in items:
+        key = item.get(field)
+        if key is not None:
+            out.setdefault(key, []).append(item)
+    return out
+
+
+def _stats(values: List[float]) -> Dict[str, float]:
+    return {
+        "avg": round(sum(values) / len(values), 1) if values else 0.0,
+        "max": round(max(values), 1) if values else 0.0,
+    }
+
+
+def summarize(vms: List[Dict[str, Any]], hosts: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """``vm_stats`` / ``host_stats`` blocks of the summary (frontend reads avg_cpu / avg_memory)."""
+    vm_cpu = _stats([d["cpu_usage_percent"] for d in vms if d.get("cpu_usage_percent") is not None])
+    vm_mem = _stats([d["memory_usage_percent"] for d in vms if d.get("memory_usage_percent") is not None])
+    h_cpu = _stats([d["cpu_usage_percent"] for d in hosts if d.get("cpu_usage_percent") is not None])
+    h_mem = _stats([
+        d["memory_used_mb"] / d["memory_total_mb"] * 100
+        for d in hosts
+        if d.get("memory_used_mb") is not None and d.get("memory_total_mb")
+    ])
+    return {
+        "vm_stats": {"avg_cpu": vm_cpu["avg"], "max_cpu": vm_cpu["max"],
+                     "avg_memory": vm_mem["avg"], "max_memory": vm_mem["max"]},
+        "host_stats": {"avg_cpu": h_cpu["avg"], "max_cpu": h_cpu["max"],
+                       "avg_memory": h_mem["avg"], "max_memory": h_mem["max"]},
+    }
+
+
+class MetricsSnapshot:
+    """One parsed metrics cache with lookup indexes."""
+
+    __slots__ = (
+        "version", "data", "vms", "hosts", "alerts", "summary", "timestamp", "source",
+        "vms_by_tenant", "vms_by_project", "vms_by_host", "hosts_by_name",
+    )
+
+    def __init__(self, data: Dict[str, Any], version: int) -> None:
+        self.version = version
+        self.data = data
+        self.vms: List[Dict[str, Any]] = data.get("vms", [])
+        self.hosts: List[Dict[str, Any]] = data.get("hosts", [])
+        self.alerts: List[Dict[str, Any]] = data.get("alerts", [])
+        self.summary: Optional[Dict[str, Any]] = data.get("summary")
+        if self.summary is not None and ("vm_stats" not in self.summary or "host_stats" not in self.summary):
+            # Producers other than the collector (DB bootstrap, host-side
+            # collector) write counts only; fill in the stats once here.
+            self.summary = {**summarize(self.vms, self.hosts), **self.summary}
+        self.timestamp = data.get("timestamp")
+        self.source = data.get("source")
+        self.vms_by_tenant = _index(self.vms, "tenant")
+        self.vms_by_project = _index(self.vms, "project")
+        self.vms_by_host = _index(self.vms, "host")
+        self.hosts_by_name = {h.get("hostname"): h for h in self.hosts if h.get("hostname")}
+
+    def filter_vms(
+        self,
+        tenant: Optional[str] = None,
+        project: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """VMs matching ``tenant``/``project`` (exact match), in cache order."""
+        if tenant and project:
+            vms = [vm for vm in self.vms_by_tenant.get(tenant, ()) if vm.get("project") == project]
+        elif tenant:
+            vms = self.vms_by_tenant.get(tenant, [])
+        elif project:
+            vms = self.vms_by_project.get(project, [])
+        else:
+            vms = self.vms
+        return vms[:limit] if limit else vms
+
+
+class MetricsStore:
+    """Holds the current MetricsSnapshot; see module docstring."""
+
+    def __init__(self, path: str = CACHE_PATH, stat_interval: float = 1.0) -> None:
+        self.path = path
+        self.stat_interval = stat_interval
+        self._lock = threading.Lock()
+        self._snapshot = MetricsSnapshot(empty_cache(), 0)
+        self._file_sig: Optional[Tuple[int, int, int]] = None
+        self._checked_at = 0.0
+
+    def _stat(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def current(self) -> MetricsSnapshot:
+        """Latest snapshot, reloading from disk if the file changed."""
+        now = time.monotonic()
+        if now - self._checked_at < self.stat_interval:
+            return self._snapshot
+        self._checked_at = now
+        if self._stat() != self._file_sig:
+            self.reload()
+        return self._snapshot
+
+    def reload(self, force: bool = False) -> MetricsSnapshot:
+        """Parse the cache file and swap it in (missing → empty).
+
+        An unreadable file (e.g. caught mid-write by a non-atomic writer)
+        keeps the previous snapshot and is retried on the next check.
+        """
+        with self._lock:
+            sig = self._stat()
+            if not force and sig is not None and sig == self._file_sig:
+                return self._snapshot
+            try:
+                with open(self.path, "r") as f:
+                    data = json.load(f)
+            except FileNotFoundError:
+                data = empty_cache()
+            except Exception as e:
+                logger.error("Error loading cache", extra={"context": {"error": str(e)}})
+                return self._snapshot
+            self._swap(data, sig)
+            return self._snapshot
+
+    def publish(self, data: Dict[str, Any]) -> MetricsSnapshot:
+        """Swap in ``data`` that was just written to the cache file."""
+        with self._lock:
+            self._swap(data, self._stat())
+            return self._snapshot
+
+    def _swap(self, data: Dict[str, Any], sig: Optional[Tuple[int, int, int]]) -> None:
+        self._snapshot = MetricsSnapshot(data, self._snapshot.version + 1)
+        self._file_sig = sig
+        self._checked_at = time.monotonic()
@@ -8,17 +8,11 @@ import logging
 from urllib.parse import urljoin
 
 from models import VMMetrics, HostMetrics
+from metrics_store import summarize
+from shared.prometheus_text import parse_libvirt_exporter, parse_node_exporter
 
 logger = logging.getLogger(__name__)
 
-# NIC prefixes to exclude when summing host network throughput.
-# Matches the exclusion list in host_metrics_collector.py.
-_EXCL_NIC_PREFIXES = (
-    'lo', 'virbr', 'tap', 'vnet', 'veth', 'br-', 'docker',
-    'ovs', 'dummy', 'tunl', 'tun', 'sit', 'gre', 'flannel',
-    'cali', 'cilium', 'weave',
-)
-
 
 class PrometheusClient:
     """Client for collecting metrics from PF9 KVM host Prometheus endpoints.
@@ -36,6 +30,9 @@ class PrometheusClient:
         self.last_update = None
         self.session = None
         self.collection_task = None
+        # Called with the decoded cache payload after each collection, even if
+        # the disk write failed (main.py points this at MetricsStore.publish).
+        self.on_snapshot = None
 
         # PCD metric endpoints
         self.libvirt_port = 9177
@@ -115,6 +112,7 @@ class PrometheusClient:
             logger.warning("No metrics collected this cycle; skipping cache update to preserve existing data")
             return
 
+        payload_json = None
         try:
             import os, json as _json
             # Serialize VM list; Pydantic .dict() omits @property values so we add them manually
@@ -137,15 +135,7 @@ class PrometheusClient:
                     return obj.isoformat()
                 raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
 
-            # Compute summary averages (frontend reads vm_stats.avg_cpu / avg_memory)
-            _vm_cpus = [d['cpu_usage_percent'] for d in vm_list if d.get('cpu_usage_percent') is not None]
-            _vm_mems = [d['memory_usage_percent'] for d in vm_list if d.get('memory_usage_percent') is not None]
-            _h_cpus  = [d['cpu_usage_percent'] for d in host_list if d.get('cpu_usage_percent') is not None]
-            _h_mem_pcts = [
-                d['memory_used_mb'] / d['memory_total_mb'] * 100
-                for d in host_list
-                if d.get('memory_used_mb') is not None and d.get('memory_total_mb')
-            ]
+            # Summary averages (frontend reads vm_stats.avg_cpu / avg_memory)
             cache_payload = {
                 "vms": vm_list,
                 "hosts": host_list,
@@ -153,31 +143,29 @@ class PrometheusClient:
                 "summary": {
                     "total_vms": len(vm_list),
                     "total_hosts": len(host_list),
-                    "vm_stats": {
-                        "avg_cpu":    round(sum(_vm_cpus) / len(_vm_cpus), 1) if _vm_cpus else 0.0,
-                        "max_cpu":    round(max(_vm_cpus), 1) if _vm_cpus else 0.0,
-                        "avg_memory": round(sum(_vm_mems) / len(_vm_mems), 1) if _vm_mems else 0.0,
-                        "max_memory": round(max(_vm_mems), 1) if _vm_mems else 0.0,
-                    },
-                    "host_stats": {
-                        "avg_cpu":    round(sum(_h_cpus) / len(_h_cpus), 1) if _h_cpus else 0.0,
-                        "max_cpu":    round(max(_h_cpus), 1) if _h_cpus else 0.0,
-                        "avg_memory": round(sum(_h_mem_pcts) / len(_h_mem_pcts), 1) if _h_mem_pcts else 0.0,
-                        "max_memory": round(max(_h_mem_pcts), 1) if _h_mem_pcts else 0.0,
-                    },
+                    **summarize(vm_list, host_list),
                     "last_update": self.last_update.isoformat(),
                 },
                 "timestamp": self.last_update.isoformat(),
                 "source": "monitoring",
             }
+            # Serialize once: the same bytes go to disk, to the API push and
+            # (decoded) to the in-memory snapshot, so all three agree exactly.
+            payload_json = _json.dumps(cache_payload, default=_default)
             os.makedirs("/tmp/cache", exist_ok=True)  # nosec B108 — fixed Docker volume path
             tmp_path = "/tmp/cache/metrics_cache.json.tmp"  # nosec B108
             with open(tmp_path, "w") as fh:
-                _json.dump(cache_payload, fh, default=_default)
+                fh.write(payload_json)
             os.replace(tmp_path, "/tmp/cache/metrics_cache.json")  # nosec B108
         except Exception as exc:
             logger.error(f"Failed to write metrics cache to disk: {exc}")
 
+        if self.on_snapshot is not None and payload_json is not None:
+            try:
+                self.on_snapshot(_json.loads(payload_json))
+            except Exception as exc:
+                logger.error(f"Failed to publish metrics snapshot to the in-memory store: {exc}")
+
         # Push cache to the API so it can serve live metrics even when the API pod cannot
         # reach this pod (asymmetric Flannel overlay: monitoring→API works; API→monitoring fails).
         _api_url = os.getenv("API_BASE_URL", "").rstrip("/")
@@ -185,7 +173,7 @@ class PrometheusClient:
         if _api_url:
             try:
                 import urllib.request as _ureq
-                _push_bytes = _json.dumps(cache_payload, default=_default).encode()
+                _push_bytes = payload_json.encode()
                 _push_req = _ureq.Request(
                     f"{_api_url}/internal/monitoring/push-cache",
                     data=_push_bytes,
@@ -464,16 +452,6 @@ class PrometheusClient:
                 raise Exception(f"HTTP {response.status} from {url}")
             return await response.text()
 
-    def _extract_label(self, line: str, key: str) -> Optional[str]:
-        """Extract a label value from a Prometheus metric line."""
-        search = f'{key}="'
-        idx = line.find(search)
-        if idx < 0:
-            return None
-        start = idx + len(search)
-        end = line.find('"', start)
-        return line[start:end] if end > start else None
-
     # ------------------------------------------------------------------ #
     # libvirt-exporter parser (port 9177)                                  #
     # ------------------------------------------------------------------ #
@@ -485,33 +463,16 @@ class PrometheusClient:
         libvirt-exporter.  Replaces the old stub that expected ``pcd:vm_*``
         metrics which never existed in this environment.
         """
-        lines = text.strip().split('\n')
-        vms: Dict[str, dict] = {}
         now = datetime.utcnow()
-
-        # ——— First pass: discover active VMs from metadata metric ———————
-        for line in lines:
-            if 'libvirt_domain_info_meta{' not in line:
-                continue
-            try:
-                val_str = line.rsplit(' ', 1)[-1]
-                if float(val_str) != 1:
-                    continue  # only active (value=1) domains
-            except (ValueError, IndexError):
-                continue
-
-            domain = self._extract_label(line, 'domain')
-            if not domain:
-                continue
-
-            vm_name = self._extract_label(line, 'instance_name') or domain[:12]
-            project_name = self._extract_label(line, 'project_name') or 'Unknown'
-            user_name = self._extract_label(line, 'user_name') or 'Unknown'
+        vms: Dict[str, dict] = {}
+        for domain, dom in parse_libvirt_exporter(text).items():
+            meta = dom.meta
+            user_name = meta.get('user_name') or 'Unknown'
             domain_name = user_name.split('@')[1] if '@' in user_name else 'Unknown'
-
+            project_name = meta.get('project_name') or 'Unknown'
             vms[domain] = {
                 'vm_id': domain,
-                'vm_name': vm_name,
+                'vm_name': meta.get('instance_name') or domain[:12],
                 'host': host,
                 'timestamp': now,
                 # OpenStack metadata extracted from libvirt exporter labels
@@ -519,64 +480,23 @@ class PrometheusClient:
                 'user_name': user_name if user_name != 'Unknown' else None,
                 'domain': domain_name if domain_name != 'Unknown' else None,
                 # raw accumulators (stripped before VMMetrics construction)
-                '_vcpu_time': 0.0,
-                '_vcpu_count': 1,
-                '_block_cap': {},
-                '_block_alloc': {},
-                '_block_phys': {},
-                # zero-initialised payload fields
-                'network_rx_bytes': 0.0,
-                'network_tx_bytes': 0.0,
-                'memory_total_mb': None,
-                'memory_used_mb': None,
-                'memory_usage_percent': None,
+                '_vcpu_time': dom.vcpu_time_seconds,
+                '_vcpu_count': dom.vcpu_count or 1,
+                '_block_cap': dom.block_capacity,
+                '_block_alloc': dom.block_allocation,
+                '_block_phys': dom.block_physical,
+                'network_rx_bytes': dom.network_rx_bytes,
+                'network_tx_bytes': dom.network_tx_bytes,
+                'memory_total_mb': (round(dom.memory_max_bytes / (1024 * 1024), 1)
+                                    if dom.memory_max_bytes is not None else None),
+                'memory_used_mb': (round(dom.memory_usage_bytes / (1024 * 1024), 1)
+                                   if dom.memory_usage_bytes is not None else None),
+                'memory_usage_percent': (round(dom.memory_used_percent, 1)
+                                         if dom.memory_used_percent is not None else None),
                 'cpu_usage_percent': 0.0,
                 'cpu_total': 1,
             }
 
-        if not vms:
-            return []
-
-        # ——— Second pass: populate metrics ——————————————————————————————
-        for line in lines:
-            if line.startswith('#') or not line.strip():
-                continue
-            if 'domain="' not in line:
-                continue
-
-            domain = self._extract_label(line, 'domain')
-            if not domain or domain not in vms:
-                continue
-
-            try:
-                value = float(line.rsplit(' ', 1)[-1])
-            except (ValueError, IndexError):
-                continue
-
-            if 'libvirt_domain_vcpu_time_seconds_total{' in line:
-                vms[domain]['_vcpu_time'] += value
-            elif 'libvirt_domain_info_virtual_cpus{' in line:
-                vms[domain]['_vcpu_count'] = int(value) or 1
-            elif 'libvirt_domain_info_memory_usage_bytes{' in line:
-                vms[domain]['memory_used_mb'] = round(value / (1024 * 1024), 1)
-            elif 'libvirt_domain_info_maximum_memory_bytes{' in line:
-                vms[domain]['memory_total_mb'] = round(value / (1024 * 1024), 1)
-            elif 'libvirt_domain_memory_stats_used_percent{' in line:
-                vms[domain]['memory_usage_percent'] = round(value, 1)
-            elif 'libvirt_domain_interface_stats_receive_bytes_total{' in line:
-                vms[domain]['network_rx_bytes'] += value
-            elif 'libvirt_domain_interface_stats_transmit_bytes_total{' in line:
-                vms[domain]['network_tx_bytes'] += value
-            elif 'libvirt_domain_block_stats_capacity_bytes{' in line:
-                dev = self._extract_label(line, 'target_device') or 'unknown'
-                vms[domain]['_block_cap'][dev] = value
-            elif 'libvirt_domain_block_stats_allocation{' in line:
-                dev = self._extract_label(line, 'target_device') or 'unknown'
-                vms[domain]['_block_alloc'][dev] = value
-            elif 'libvirt_domain_block_stats_physicalsize_bytes{' in line:
-                dev = self._extract_label(line, 'target_device') or 'unknown'
-                vms[domain]['_block_phys'][dev] = value
-
         # ——— Build VMMetrics list ————————————————————————————————————————
         vm_list: List[VMMetrics] = []
         for domain_id, d in vms.items():
@@ -638,46 +558,16 @@ class PrometheusClient:
         Handles the standard ``node_*`` metric family.  Replaces the old stub
         that expected ``pcd:hyp_*`` metrics which never existed.
         """
-        lines = text.strip().split('\n')
         now = datetime.utcnow()
-
-        cpu_idle = 0.0
-        cpu_total_s = 0.0
-        mem_total_bytes: Optional[float] = None
-        mem_avail_bytes: Optional[float] = None
-        storage_total_bytes: Optional[float] = None
-        storage_avail_bytes: Optional[float] = None
-        network_rx_bytes = 0.0
-        network_tx_bytes = 0.0
-
-        for line in lines:
-            if line.startswith('#') or not line.strip():
-                continue
-            try:
-                value = float(line.rsplit(' ', 1)[-1])
-            except (ValueError, IndexError):
-                continue
-
-            if 'node_cpu_seconds_total{' in line:
-                cpu_total_s += value
-                if 'mode="idle"' in line:
-                    cpu_idle += value
-            elif line.startswith('node_memory_MemTotal_bytes '):
-                mem_total_bytes = value
-            elif line.startswith('node_memory_MemAvailable_bytes '):
-                mem_avail_bytes = value
-            elif 'node_filesystem_size_bytes{' in line and 'mountpoint="/"' in line:
-                storage_total_bytes = value
-            elif 'node_filesystem_avail_bytes{' in line and 'mountpoint="/"' in line:
-                storage_avail_bytes = value
-            elif 'node_network_receive_bytes_total{' in line:
-                dev = self._extract_label(line, 'device') or ''
-                if dev and not any(dev.startswith(p) for p in _EXCL_NIC_PREFIXES):
-                    network_rx_bytes += value
-            elif 'node_network_transmit_bytes_total{' in line:
-                dev = self._extract_label(line, 'device') or ''
-                if dev and not any(dev.startswith(p) for p in _EXCL_NIC_PREFIXES):
-                    network_tx_bytes += value
+        node = parse_node_exporter(text)
+        cpu_idle = node.cpu_idle_seconds
+        cpu_total_s = node.cpu_total_seconds
+        mem_total_bytes = node.mem_total_bytes
+        mem_avail_bytes = node.mem_available_bytes
+        storage_total_bytes = node.root_fs_size_bytes
+        storage_avail_bytes = node.root_fs_avail_bytes
+        network_rx_bytes = node.network_rx_bytes
+        network_tx_bytes = node.network_tx_bytes
 
         host_data: dict = {'hostname': host, 'timestamp': now}
 
@@ -6,16 +6,24 @@ violations, health-score drops) and dispatches email notifications based
 on per-user preferences.
 
 Runs as a standalone container alongside the API and monitoring services.
+
+Each poll cycle collects all events first, loads subscriptions and sent
+dedup keys in one query each, and hands immediate emails to an outbound
+queue: NOTIFICATION_SMTP_WORKERS threads, each reusing one authenticated SMTP
+session, rate-limited to NOTIFICATION_SMTP_RATE_PER_SECOND messages.
 """
 
 import os
 import sys
 import json
+import functools
 import hashlib
 import logging
 import time
 import smtplib
 import ssl
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime, timezone, timedelta
@@ -100,6 +108,13 @@ LOOKBACK_SECONDS = int(os.getenv("NOTIFICATION_LOOKBACK_SECONDS", "300"))
 DLQ_MAX_ATTEMPTS = int(os.getenv("NOTIFICATION_MAX_RETRY_ATTEMPTS", "3"))
 _RETRY_BACKOFF_MINUTES: List[int] = [5, 15, 60]   # delay per attempt index
 
+# Outbound SMTP delivery
+SMTP_SEND_WORKERS = max(1, int(os.getenv("NOTIFICATION_SMTP_WORKERS", "4")))
+SMTP_RATE_PER_SECOND = float(os.getenv("NOTIFICATION_SMTP_RATE_PER_SECOND", "10"))  # 0 = unlimited
+SMTP_MAX_PER_CONNECTION = max(1, int(os.getenv("NOTIFICATION_SMTP_MAX_PER_CONNECTION", "100")))
+SMTP_CONFIG_TTL_SECONDS = int(os.getenv("NOTIFICATION_SMTP_CONFIG_TTL_SECONDS", "60"))
+SMTP_IDLE_SECONDS = 30  # reconnect rather than reuse a session idle this long
+
 # ---------------------------------------------------------------------------
 # SMTP config — DB overrides env vars (same pattern as api/smtp_helper.py)
 # ---------------------------------------------------------------------------
@@ -263,11 +278,145 @@ def render_template(template_name: str, context: Dict[str, Any]) -> str:
     return tpl.render(**context)
 
 
+class SmtpConfigCache:
+    """get_smtp_config() result reused for SMTP_CONFIG_TTL_SECONDS.
+
+    poll_cycle() refreshes it at the start of every cycle, so admin-UI
+    changes still apply from the next cycle without a pod restart.
+    """
+
+    def __init__(self, ttl: float = SMTP_CONFIG_TTL_SECONDS):
+        self.ttl = ttl
+        self._cfg: Optional[dict] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self, conn=None) -> dict:
+        cfg = get_smtp_config(conn)
+        with self._lock:
+            self._cfg, self._loaded_at = cfg, time.monotonic()
+        return cfg
+
+    def get(self, conn=None) -> dict:
+        with self._lock:
+            cfg = self._cfg
+            fresh = cfg is not None and time.monotonic() - self._loaded_at < self.ttl
+        return cfg if fresh else self.refresh(conn)
+
+
+def _smtp_signature(cfg: dict) -> tuple:
+    return (cfg["host"], cfg["port"], cfg["use_tls"], cfg["username"], cfg["password"])
+
+
+def _session_lost(exc: Exception) -> bool:
+    """True if the SMTP session is unusable (as opposed to the message being refused)."""
+    if isinstance(exc, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return exc.smtp_code == 421
+    return isinstance(exc, OSError) and not isinstance(exc, smtplib.SMTPException)
+
+
+class SmtpSessionPool:
+    """One persistent, authenticated SMTP session per sending thread.
+
+    A session is reopened when the SMTP config changes, after
+    SMTP_MAX_PER_CONNECTION messages, after SMTP_IDLE_SECONDS idle, or when
+    the server drops it (the message is then retried once on a new session).
+    """
+
+    def __init__(self, max_per_connection: int = SMTP_MAX_PER_CONNECTION,
+                 idle_seconds: float = SMTP_IDLE_SECONDS):
+        self.max_per_connection = max_per_connection
+        self.idle_seconds = idle_seconds
+        self._sessions: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    def _open(self, cfg: dict) -> smtplib.SMTP:
+        server = smtplib.SMTP(cfg["host"], cfg["port"], timeout=30)
+        try:
+            server.ehlo()
+            if cfg["use_tls"]:
+                ctx = ssl.create_default_context()
+                ctx.check_hostname = True
+                ctx.verify_mode = ssl.CERT_REQUIRED
+                server.starttls(context=ctx)
+                server.ehlo()
+            if cfg["username"]:
+                server.login(cfg["username"], cfg["password"])
+        except Exception:
+            self._quit(server)
+            raise
+        with self._lock:
+            self.connections_opened += 1
+        return server
+
+    @staticmethod
+    def _quit(server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    def _session(self, cfg: dict) -> Dict[str, Any]:
+        key = threading.get_ident()
+        with self._lock:
+            sess = self._sessions.get(key)
+        if sess is not None and (
+            sess["signature"] != _smtp_signature(cfg)
+            or sess["sent"] >= self.max_per_connection
+            or time.monotonic() - sess["used_at"] > self.idle_seconds
+        ):
+            self._drop(key)
+            sess = None
+        if sess is None:
+            sess = {"server": self._open(cfg), "signature": _smtp_signature(cfg),
+                    "sent": 0, "used_at": time.monotonic()}
+            with self._lock:
+                self._sessions[key] = sess
+        return sess
+
+    def _drop(self, key: int) -> None:
+        with self._lock:
+            sess = self._sessions.pop(key, None)
+        if sess is not None:
+            self._quit(sess["server"])
+
+    def send(self, cfg: dict, to_address: str, message: str) -> None:
+        for attempt in (1, 2):
+            sess = self._session(cfg)
+            try:
+                sess["server"].sendmail(cfg["from_address"], [to_address], message)
+            except Exception as exc:
+                if not _session_lost(exc):
+                    raise
+                self._drop(threading.get_ident())
+                if attempt == 2:
+                    raise
+                continue
+            sess["sent"] += 1
+            sess["used_at"] = time.monotonic()
+            return
+
+    def close_all(self) -> None:
+        with self._lock:
+            sessions, self._sessions = list(self._sessions.values()), {}
+        for sess in sessions:
+            self._quit(sess["server"])
+
+
+_smtp_config_cache = SmtpConfigCache()
+_smtp_sessions = SmtpSessionPool()
+
+
 def send_email(to_address: str, subject: str, html_body: str, conn=None) -> bool:
     """Send a single email via SMTP. Returns True on success.
-    Reads SMTP config fresh from DB on every call so admin-UI changes
-    take effect immediately without a pod restart."""
-    cfg = get_smtp_config(conn)
+    Uses the cached SMTP config and this thread's pooled SMTP session."""
+    cfg = _smtp_config_cache.get(conn)
 
     if not cfg["enabled"]:
         logger.info("SMTP disabled — would send to %s: %s", to_address, subject)
@@ -284,23 +433,7 @@ def send_email(to_address: str, subject: str, html_body: str, conn=None) -> bool
         msg["Subject"] = subject
         msg.attach(MIMEText(html_body, "html"))
 
-        if cfg["use_tls"]:
-            ctx = ssl.create_default_context()
-            ctx.check_hostname = True
-            ctx.verify_mode = ssl.CERT_REQUIRED
-            with smtplib.SMTP(cfg["host"], cfg["port"], timeout=30) as server:
-                server.ehlo()
-                server.starttls(context=ctx)
-                server.ehlo()
-                if cfg["username"]:
-                    server.login(cfg["username"], cfg["password"])
-                server.sendmail(cfg["from_address"], [to_address], msg.as_string())
-        else:
-            with smtplib.SMTP(cfg["host"], cfg["port"], timeout=30) as server:
-                server.ehlo()
-                if cfg["username"]:
-                    server.login(cfg["username"], cfg["password"])
-                server.sendmail(cfg["from_address"], [to_address], msg.as_string())
+        _smtp_sessions.send(cfg, to_address, msg.as_string())
 
         logger.info("Email sent to %s: %s", to_address, subject)
         return True
@@ -309,6 +442,45 @@ def send_email(to_address: str, subject: str, html_body: str, conn=None) -> bool
         logger.error("Failed to send email to %s: %s", to_address, e)
         return False
 
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across all threads."""
+
+    def __init__(self, per_second: float):
+        self.interval = 1.0 / per_second if per_second > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class OutboundQueue:
+    """Sends emails from SMTP_SEND_WORKERS threads, rate-limited."""
+
+    def __init__(self, workers: int = SMTP_SEND_WORKERS,
+                 per_second: float = SMTP_RATE_PER_SECOND):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="smtp-out")
+        self._limiter = RateLimiter(per_second)
+
+    def _send(self, to_address: str, subject: str, html_body: str) -> bool:
+        self._limiter.wait()
+        return send_email(to_address, subject, html_body)
+
+    def submit(self, to_address: str, subject: str, html_body: str) -> "Future[bool]":
+        return self._executor.submit(self._send, to_address, subject, html_body)
+
+
+_outbound = OutboundQueue()
+
+
 # ---------------------------------------------------------------------------
 # Event collectors — each returns a list of event dicts
 # ---------------------------------------------------------------------------
@@ -562,10 +734,15 @@ def collect_wave_completion_events(conn, since: datetime) -> List[Dict]:
 # Notification dispatcher
 # ---------------------------------------------------------------------------
 
+_SEVERITY_RANK = {"info": 0, "warning": 1, "critical": 2}
+
+
+def _severity_met(severity: str, severity_min: str) -> bool:
+    return _SEVERITY_RANK.get(severity, 0) >= _SEVERITY_RANK.get(severity_min, 0)
+
+
 def get_subscribed_users(conn, event_type: str, severity: str) -> List[Dict]:
     """Return users subscribed to this event_type whose min severity is met."""
-    severity_rank = {"info": 0, "warning": 1, "critical": 2}
-    event_rank = severity_rank.get(severity, 0)
 
     with conn.cursor(cursor_factory=RealDictCursor) as cur:
         cur.execute("""
@@ -573,24 +750,119 @@ def get_subscribed_users(conn, event_type: str, severity: str) -> List[Dict]:
             FROM notification_preferences
             WHERE event_type = %s AND enabled = true
         """, (event_type,))
-        users = []
-        for row in cur.fetchall():
-            min_rank = severity_rank.get(row["severity_min"], 0)
-            if event_rank >= min_rank:
-                users.append(dict(row))
-        return users
+        return [dict(row) for row in cur.fetchall() if _severity_met(severity, row["severity_min"])]
+
 
+def _event_dedup_key(event: Dict) -> str:
+    return dedup_key(event["event_type"], event.get("resource_id", ""), event.get("event_id", ""))
 
-def dispatch_event(conn, event: Dict):
-    """Match event to subscribers and send / queue notifications."""
+
+class DispatchBatch:
+    """Lookups and outbound sends shared by every event of one poll cycle.
+
+    load() fetches all enabled subscriptions and the already-sent dedup keys
+    of the cycle's events up front, instead of two queries per event.
+    send() hands an email to the outbound queue; flush() waits for the
+    results and runs the callbacks (notification_log / DLQ writes) on the
+    calling thread, which owns the DB connection.
+    """
+
+    def __init__(self, outbound: Optional[OutboundQueue] = None):
+        self.outbound = outbound
+        self.subscriptions: Dict[str, List[Dict]] = {}
+        self.tenant_prefs: Dict[tuple, List[Dict]] = {}
+        self.sent_keys: set = set()
+        self.tenant_sent_keys: set = set()
+        self._pending: List[tuple] = []
+
+    @classmethod
+    def load(cls, conn, events: List[Dict], tenant_events: List[Dict],
+             outbound: Optional[OutboundQueue] = None) -> "DispatchBatch":
+        batch = cls(outbound)
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("""
+                SELECT event_type, username, email, delivery_mode, severity_min
+                FROM notification_preferences
+                WHERE enabled = true
+            """)
+            for row in cur.fetchall():
+                batch.subscriptions.setdefault(row["event_type"], []).append(dict(row))
+
+            project_ids = sorted({e["project_id"] for e in tenant_events if e.get("project_id")})
+            if project_ids:
+                cur.execute("""
+                    SELECT id, project_id, event_type, keystone_user_id, channel, endpoint, enabled
+                    FROM   tenant_notification_prefs
+                    WHERE  project_id = ANY(%s)
+                      AND  enabled     = true
+                """, (project_ids,))
+                for row in cur.fetchall():
+                    batch.tenant_prefs.setdefault(
+                        (row["project_id"], row["event_type"]), []
+                    ).append(dict(row))
+
+            keys = sorted({_event_dedup_key(e) for e in events + tenant_events})
+            if keys:
+                cur.execute("""
+                    SELECT DISTINCT dedup_key, notification_target = 'tenant' AS tenant
+                    FROM notification_log
+                    WHERE dedup_key = ANY(%s) AND delivery_status = 'sent'
+                """, (keys,))
+                for row in cur.fetchall():
+                    batch.sent_keys.add(row["dedup_key"])
+                    if row["tenant"]:
+                        batch.tenant_sent_keys.add(row["dedup_key"])
+        return batch
+
+    def subscribers(self, event_type: str, severity: str) -> List[Dict]:
+        return [u for u in self.subscriptions.get(event_type, [])
+                if _severity_met(severity, u["severity_min"])]
+
+    def send(self, to_address: str, subject: str, html_body: str, on_result) -> None:
+        """Queue an email; ``on_result(success)`` runs in flush()."""
+        if self.outbound is None:
+            future: Future = Future()
+            future.set_result(send_email(to_address, subject, html_body))
+        else:
+            future = self.outbound.submit(to_address, subject, html_body)
+        self._pending.append((future, on_result, to_address))
+
+    def flush(self) -> int:
+        """Wait for queued emails and record their outcome. Returns the count."""
+        pending, self._pending = self._pending, []
+        for future, on_result, to_address in pending:
+            try:
+                success = future.result()
+            except Exception as exc:
+                logger.error("Failed to send email to %s: %s", to_address, exc)
+                success = False
+            try:
+                on_result(success)
+            except Exception as exc:
+                logger.error("Failed to record delivery to %s: %s", to_address, exc)
+        return len(pending)
+
+
+def dispatch_event(conn, event: Dict, batch: Optional[DispatchBatch] = None):
+    """Match event to subscribers and send / queue notifications.
+
+    With a ``batch`` the lookups come from the batch and immediate emails go
+    through its outbound queue (recorded on ``batch.flush()``); without one,
+    everything happens inline.
+    """
     event_type = event["event_type"]
     severity = event.get("severity", "info")
-    dkey = dedup_key(event_type, event.get("resource_id", ""), event.get("event_id", ""))
+    dkey = _event_dedup_key(event)
 
-    if already_sent(conn, dkey):
-        return
-
-    users = get_subscribed_users(conn, event_type, severity)
+    if batch is None:
+        if already_sent(conn, dkey):
+            return
+        users = get_subscribed_users(conn, event_type, severity)
+    else:
+        if dkey in batch.sent_keys:
+            return
+        batch.sent_keys.add(dkey)  # one dispatch per cycle
+        users = batch.subscribers(event_type, severity)
     if not users:
         return
 
@@ -632,17 +904,28 @@ def dispatch_event(conn, event: Dict):
                     "user": user,
                     "timestamp": datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC"),
                 })
-                success = send_email(user["email"], subject, html_body, conn=conn)
-                status = "sent" if success else "failed"
-                log_notification(conn, user, event, dkey, subject, status)
-                if not success:
-                    enqueue_retry(conn, user, event, dkey, subject, template_name)
+                if batch is None:
+                    success = send_email(user["email"], subject, html_body, conn=conn)
+                    _record_delivery(conn, user, event, dkey, subject, template_name, success)
+                else:
+                    batch.send(
+                        user["email"], subject, html_body,
+                        functools.partial(_record_delivery, conn, user, event, dkey,
+                                          subject, template_name),
+                    )
             except Exception as e:
                 logger.error(f"Error dispatching to {user['username']}: {e}")
                 log_notification(conn, user, event, dkey, subject, "failed", str(e))
                 enqueue_retry(conn, user, event, dkey, subject, template_name)
 
 
+def _record_delivery(conn, user: Dict, event: Dict, dkey: str, subject: str,
+                     template_name: str, success: bool) -> None:
+    log_notification(conn, user, event, dkey, subject, "sent" if success else "failed")
+    if not success:
+        enqueue_retry(conn, user, event, dkey, subject, template_name)
+
+
 def log_notification(conn, user: Dict, event: Dict, dkey: str, subject: str,
                      status: str, error: str = None):
     with conn.cursor() as cur:
@@ -1209,24 +1492,44 @@ def log_tenant_notification(
     conn.commit()
 
 
+def _record_tenant_delivery(conn, project_id: str, user_id: str, event_type: str,
+                            subject: str, dkey: str, success: bool) -> None:
+    log_tenant_notification(
+        conn, project_id, user_id, event_type, subject,
+        "sent" if success else "failed", dedup_key_val=dkey,
+    )
+
+
 def dispatch_tenant_notifications(
     conn,
     event: Dict,
+    batch: Optional[DispatchBatch] = None,
 ):
     """For a tenant event dict (must have project_id + event_type), look up
     tenant_notification_prefs and deliver via email or webhook.
+    With a ``batch``, lookups and email sends go through it (see dispatch_event).
     """
     event_type = event["event_type"]
     project_id = event.get("project_id")
     if not project_id:
         return
 
-    dkey = dedup_key(
-        event_type,
-        event.get("resource_id", ""),
-        event.get("event_id", ""),
-    )
+    dkey = _event_dedup_key(event)
+
+    if batch is not None:
+        if dkey in batch.tenant_sent_keys:
+            return
+        batch.tenant_sent_keys.add(dkey)
+        prefs = batch.tenant_prefs.get((project_id, event_type), [])
+    else:
+        prefs = _load_tenant_prefs(conn, project_id, event_type, dkey)
+    if not prefs:
+        return
+    _deliver_tenant_notifications(conn, event, prefs, dkey, batch)
 
+
+def _load_tenant_prefs(conn, project_id: str, event_type: str, dkey: str) -> List[Dict]:
+    """Per-event lookup: [] if already delivered, else the enabled prefs."""
     # Dedup: skip if we already delivered this exact event (tenant path)
     with conn.cursor() as cur:
         cur.execute(
@@ -1240,7 +1543,7 @@ def dispatch_tenant_notifications(
             (dkey,),
         )
         if cur.fetchone():
-            return
+            return []
 
     with conn.cursor(cursor_factory=RealDictCursor) as cur:
         cur.execute(
@@ -1253,10 +1556,14 @@ def dispatch_tenant_notifications(
             """,
             (project_id, event_type),
         )
-        prefs = cur.fetchall()
+        return cur.fetchall()
 
-    if not prefs:
-        return
+
+def _deliver_tenant_notifications(
+    conn, event: Dict, prefs: List[Dict], dkey: str, batch: Optional[DispatchBatch],
+):
+    event_type = event["event_type"]
+    project_id = event["project_id"]
 
     # Template mapping for email channel
     _template_map = {
@@ -1287,6 +1594,12 @@ def dispatch_tenant_notifications(
                         "timestamp": datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC"),
                     },
                 )
+                if batch is not None:
+                    batch.send(endpoint, subject, html_body, functools.partial(
+                        _record_tenant_delivery, conn, project_id, user_id, event_type,
+                        subject, dkey,
+                    ))
+                    continue
                 success = send_email(endpoint, subject, html_body, conn=conn)
                 status_val = "sent" if success else "failed"
 
@@ -1321,59 +1634,80 @@ def dispatch_tenant_notifications(
 # Main poll loop
 # ---------------------------------------------------------------------------
 
+def _collect(conn, collectors, since: datetime, label: str) -> List[Dict]:
+    events: List[Dict] = []
+    for collector in collectors:
+        try:
+            events.extend(collector(conn, since))
+        except Exception as e:
+            logger.error(f"Error in {label} {collector.__name__}: {e}")
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+    return events
+
+
 def poll_cycle(conn):
     """One poll cycle: collect events, dispatch notifications."""
     since = datetime.utcnow() - timedelta(seconds=LOOKBACK_SECONDS)
+    _smtp_config_cache.refresh(conn)
 
-    collectors = [
+    events = _collect(conn, [
         collect_drift_events,
         collect_snapshot_failures,
         collect_compliance_violations,
         collect_health_drops,
         collect_wave_completion_events,
-    ]
-
-    total_events = 0
-    for collector in collectors:
-        try:
-            events = collector(conn, since)
-            for event in events:
-                dispatch_event(conn, event)
-            total_events += len(events)
-        except Exception as e:
-            logger.error(f"Error in collector {collector.__name__}: {e}")
-            try:
-                conn.rollback()
-            except Exception:
-                pass
+    ], since, "collector")
 
     # Tenant-facing event collectors
-    tenant_collectors = [
+    tenant_events = _collect(conn, [
         collect_tenant_snapshot_events,
         collect_tenant_restore_events,
         collect_tenant_quota_warnings,
         collect_tenant_vm_provision_events,
-    ]
+    ], since, "tenant collector")
 
-    tenant_total = 0
-    for collector in tenant_collectors:
+    emails = 0
+    if events or tenant_events:
+        started = time.monotonic()
         try:
-            events = collector(conn, since)
-            for event in events:
-                dispatch_tenant_notifications(conn, event)
-            tenant_total += len(events)
+            batch = DispatchBatch.load(conn, events, tenant_events, _outbound)
         except Exception as e:
-            logger.error(f"Error in tenant collector {collector.__name__}: {e}")
+            logger.error(f"Error loading subscriptions: {e}")
             try:
                 conn.rollback()
             except Exception:
                 pass
+            batch = None
 
-    total_events += tenant_total
-    if total_events > 0:
+        if batch is not None:
+            for event in events:
+                try:
+                    dispatch_event(conn, event, batch)
+                except Exception as e:
+                    logger.error(f"Error dispatching {event.get('event_type')}: {e}")
+                    try:
+                        conn.rollback()
+                    except Exception:
+                        pass
+            for event in tenant_events:
+                try:
+                    dispatch_tenant_notifications(conn, event, batch)
+                except Exception as e:
+                    logger.error(f"Error dispatching tenant {event.get('event_type')}: {e}")
+                    try:
+                        conn.rollback()
+                    except Exception:
+                        pass
+            emails = batch.flush()
+
+        total_events = len(events) + len(tenant_events)
         logger.info(
             f"Poll cycle complete: {total_events} events processed "
-            f"({tenant_total} tenant)"
+            f"({len(tenant_events)} tenant), {emails} immediate emails "
+            f"in {time.monotonic() - started:.1f}s"
         )
 
     # Process DLQ retry queue on every cycle
@@ -1444,6 +1778,9 @@ def main():
                 send_digests(conn)
                 last_digest_date = today
 
+            # Don't hold SMTP sessions open across the poll interval
+            _smtp_sessions.close_all()
+
         except Exception as e:
             logger.error(f"Poll cycle error: {e}")
             try:
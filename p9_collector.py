@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Concurrent collection engine for Platform9/OpenStack inventory calls.
+
+pf9_rvtools used to call every Keystone/Nova/Cinder/Glance/Neutron list
+endpoint one after another and then make three quota calls per project in a
+serial loop.  The engine below fans those calls out over a bounded thread pool:
+
+  * ``PF9_COLLECT_WORKERS``  — total worker threads (default 16)
+  * ``PF9_COLLECT_LIMITS``   — per-service concurrency caps, e.g.
+                               ``keystone=4,nova=8,cinder=4,glance=2,neutron=8``
+  * every HTTP request goes through the region's RegionCircuitBreaker
+    (shared/circuit_breaker.py, same Redis keys as the API), so a region
+    that starts failing is fast-failed by the collector and the API alike
+  * each task is timed; ``timing_report()`` returns a per-endpoint breakdown
+
+Usage:
+    engine = CollectionEngine(session, region_id="default")
+    fut = engine.submit("servers", "nova", nova_servers_all)
+    servers = fut.result()
+    engine.shutdown()
+    print(engine.format_timing_report())
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+from shared.circuit_breaker import RegionCircuitBreaker
+
+DEFAULT_SERVICE_LIMITS: Dict[str, int] = {
+    "keystone": 4,
+    "nova": 8,
+    "cinder": 4,
+    "glance": 2,
+    "neutron": 8,
+}
+
+
+def _parse_service_limits(raw: str) -> Dict[str, int]:
+    """Parse ``svc=N,svc=N`` into a dict; malformed entries are ignored."""
+    limits = dict(DEFAULT_SERVICE_LIMITS)
+    for part in (raw or "").split(","):
+        name, sep, value = part.partition("=")
+        if not sep:
+            continue
+        try:
+            limits[name.strip().lower()] = max(1, int(value))
+        except ValueError:
+            continue
+    return limits
+
+
+_redis_client = None
+_redis_checked = False
+_redis_lock = threading.Lock()
+
+
+def _redis_from_env():
+    """Redis client for breaker state (same env vars as the workers), or None.
+
+    Resolved once per process; a collector run is short-lived, so a Redis
+    outage mid-run simply leaves the breaker on its in-process fallback.
+    """
+    global _redis_client, _redis_checked
+    if _redis_checked:
+        return _redis_client
+    with _redis_lock:
+        if _redis_checked:
+            return _redis_client
+        host = os.getenv("REDIS_HOST")
+        if host:
+            try:
+                import redis as _redis
+                client = _redis.Redis(
+                    host=host,
+                    port=int(os.getenv("REDIS_PORT", "6379")),
+                    password=os.getenv("REDIS_PASSWORD") or None,
+                    socket_connect_timeout=2,
+                    socket_timeout=2,
+                    decode_responses=True,
+                )
+                client.ping()
+                _redis_client = client
+            except Exception:
+                _redis_client = None
+        _redis_checked = True
+    return _redis_client
+
+
+class _BreakerSession(requests.Session):
+    """requests.Session that routes every request through a RegionCircuitBreaker.
+
+    Mirrors Pf9Client._cb_request in api/pf9_control.py: 5xx responses,
+    connection errors and timeouts count as failures; anything else closes
+    the circuit.
+    """
+
+    def __init__(self, breaker: Optional[RegionCircuitBreaker]) -> None:
+        super().__init__()
+        self._breaker = breaker
+
+    def request(self, method, url, *args, **kwargs):
+        if self._breaker is None:
+            return super().request(method, url, *args, **kwargs)
+        self._breaker.allow_request()   # raises CircuitBreakerOpenError if OPEN
+        try:
+            resp = super().request(method, url, *args, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            self._breaker.record_failure()
+            raise
+        if resp.status_code >= 500:
+            self._breaker.record_failure()
+        else:
+            self._breaker.record_success()
+        return resp
+
+
+class CollectionEngine:
+    """Bounded worker pool with per-service limits and per-endpoint timings."""
+
+    def __init__(
+        self,
+        session: requests.Session,
+        region_id: str = "default",
+        max_workers: Optional[int] = None,
+        service_limits: Optional[Dict[str, int]] = None,
+        breaker: Optional[RegionCircuitBreaker] = None,
+    ) -> None:
+        self._template = session
+        if max_workers is None:
+            max_workers = int(os.getenv("PF9_COLLECT_WORKERS", "16"))
+        self.max_workers = max(1, max_workers)
+        if service_limits is None:
+            service_limits = _parse_service_limits(os.getenv("PF9_COLLECT_LIMITS", ""))
+        self._service_sems = {
+            name: threading.BoundedSemaphore(limit) for name, limit in service_limits.items()
+        }
+        if breaker is None:
+            breaker = RegionCircuitBreaker(region_id, redis_getter=_redis_from_env)
+        self.breaker = breaker
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                        thread_name_prefix="pf9-collect")
+        self._local = threading.local()
+        self._timings_lock = threading.Lock()
+        self._timings: List[Dict[str, Any]] = []
+        self._started = time.monotonic()
+
+    # ── Sessions ─────────────────────────────────────────────────────────
+
+    def _thread_session(self) -> requests.Session:
+        """One breaker-aware session per worker thread, cloned from the template."""
+        sess = getattr(self._local, "session", None)
+        if sess is None:
+            sess = _BreakerSession(self.breaker)
+            sess.headers.update(self._template.headers)
+            sess.verify = self._template.verify
+            sess.is_admin = getattr(self._template, "is_admin", False)
+            self._local.session = sess
+        return sess
+
+    # ── Task submission ──────────────────────────────────────────────────
+
+    def submit(self, endpoint: str, service: str, fn: Callable[..., Any], *args: Any,
+               with_session: bool = True, **kwargs: Any) -> Future:
+        """
+        Schedule ``fn(session, *args, **kwargs)`` on the pool.
+
+        ``endpoint`` names the timing bucket (e.g. "nova_quotas"); ``service``
+        selects the concurrency cap.  Pass ``with_session=False`` for helpers
+        that authenticate on their own.
+        """
+        return self._pool.submit(self._run, endpoint, service, fn, args, kwargs, with_session)
+
+    def _run(self, endpoint: str, service: str, fn: Callable[..., Any],
+             args: tuple, kwargs: dict, with_session: bool) -> Any:
+        sem = self._service_sems.get(service)
+        waited_from = time.monotonic()
+        if sem is not None:
+            sem.acquire()
+        started = time.monotonic()
+        ok = False
+        try:
+            if with_session:
+                result = fn(self._thread_session(), *args, **kwargs)
+            else:
+                result = fn(*args, **kwargs)
+            ok = True
+            return result
+        finally:
+            finished = time.monotonic()
+            if sem is not None:
+                sem.release()
+            with self._timings_lock:
+                self._timings.append({
+                    "endpoint": endpoint,
+                    "service": service,
+                    "seconds": finished - started,
+                    "queued_seconds": started - waited_from,
+                    "ok": ok,
+                })
+
+    def shutdown(self, cancel_pending: bool = False) -> None:
+        """Wait for running tasks; with ``cancel_pending`` drop queued ones first."""
+        self._pool.shutdown(wait=True, cancel_futures=cancel_pending)
+
+    def __enter__(self) -> "CollectionEngine":
+        return self
+
+    def __exit__(self, exc_type: Any, *exc: Any) -> None:
+        self.shutdown(cancel_pending=exc_type is not None)
+
+    # ── Reporting ────────────────────────────────────────────────────────
+
+    def timing_report(self) -> Dict[str, Any]:
+        """Aggregate task timings per endpoint (calls, errors, total/max seconds)."""
+        with self._timings_lock:
+            samples = list(self._timings)
+        endpoints: Dict[str, Dict[str, Any]] = {}
+        for s in samples:
+            agg = endpoints.setdefault(s["endpoint"], {
+                "service": s["service"], "calls": 0, "errors": 0,
+                "total_seconds": 0.0, "max_seconds": 0.0, "queued_seconds": 0.0,
+            })
+            agg["calls"] += 1
+            agg["errors"] += 0 if s["ok"] else 1
+            agg["total_seconds"] += s["seconds"]
+            agg["max_seconds"] = max(agg["max_seconds"], s["seconds"])
+            agg["queued_seconds"] += s["queued_seconds"]
+        for agg in endpoints.values():
+            for key in ("total_seconds", "max_seconds", "queued_seconds"):
+                agg[key] = round(agg[key], 3)
+        return {
+            "wall_seconds": round(time.monotonic() - self._started, 3),
+            "max_workers": self.max_workers,
+            "circuit_breaker": self.breaker.get_status() if self.breaker else None,
+            "endpoints": dict(sorted(endpoints.items(),
+                                     key=lambda kv: kv[1]["total_seconds"], reverse=True)),
+        }
+
+    def format_timing_report(self, report: Optional[Dict[str, Any]] = None) -> str:
+        report = report or self.timing_report()
+        lines = [
+            f"    [TIMING] wall={report['wall_seconds']:.2f}s workers={report['max_workers']}",
+            f"    {'endpoint':<28}{'calls':>7}{'errors':>8}{'total_s':>10}{'max_s':>9}{'queued_s':>10}",
+        ]
+        for name, agg in report["endpoints"].items():
+            lines.append(
+                f"    {name:<28}{agg['calls']:>7}{agg['errors']:>8}"
+                f"{agg['total_seconds']:>10.2f}{agg['max_seconds']:>9.2f}{agg['queued_seconds']:>10.2f}"
+            )
+        return "\n".join(lines)
@@ -6,8 +6,9 @@ Common helpers for Platform9/OpenStack tools
 
 import os
 import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 import requests
 
@@ -38,6 +39,8 @@ CFG = {
     "REQUEST_TIMEOUT": int(os.getenv("PF9_REQUEST_TIMEOUT", "60")),
     "PAGE_LIMIT": int(os.getenv("PF9_PAGE_LIMIT", "500")),
     "GLANCE_LIMIT": int(os.getenv("PF9_GLANCE_LIMIT", "1000")),
+    # Threads shared by all paginated listings for next-page prefetch
+    "PREFETCH_WORKERS": int(os.getenv("PF9_PREFETCH_WORKERS", "8")),
 }
 
 ERRORS: List[Dict[str, Any]] = []
@@ -148,6 +151,93 @@ def http_json(session: requests.Session, method: str, url: str, **kwargs) -> Dic
         return resp.json()
 
 
+def _fetch_page(
+    session: requests.Session,
+    url: str,
+    params: Dict[str, Any],
+    debug_context: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """GET one page of a limit/marker listing and return the decoded body."""
+    try:
+        resp = session.get(url, params=params, timeout=CFG["REQUEST_TIMEOUT"])
+        resp.raise_for_status()
+    except requests.HTTPError as e:
+        print(f"[ERROR] HTTPError during paginate: {e}")
+        if hasattr(e, 'response') and e.response is not None:
+            print(f"[ERROR] Response status: {e.response.status_code}")
+            print(f"[ERROR] Response body: {e.response.text}")
+        if debug_context:
+            print(f"[ERROR] Debug context: {debug_context}")
+        raise
+    return resp.json() if resp.content else {}
+
+
+_prefetch_pool: Optional[ThreadPoolExecutor] = None
+_prefetch_pool_lock = threading.Lock()
+
+
+def _prefetch_executor() -> ThreadPoolExecutor:
+    """Process-wide executor for page prefetch, created on first use."""
+    global _prefetch_pool
+    if _prefetch_pool is None:
+        with _prefetch_pool_lock:
+            if _prefetch_pool is None:
+                _prefetch_pool = ThreadPoolExecutor(max_workers=CFG["PREFETCH_WORKERS"],
+                                                    thread_name_prefix="pf9-prefetch")
+    return _prefetch_pool
+
+
+def iter_pages(
+    session: requests.Session,
+    url: str,
+    key: str,
+    extra_params: Optional[Dict[str, Any]] = None,
+    debug_context: Optional[Dict[str, Any]] = None,
+    prefetch: bool = True,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Generator over limit/marker pages, yielding each page's item list.
+
+    The marker for page N+1 is known as soon as page N is decoded, so with
+    ``prefetch`` the next request is already in flight on a background
+    thread (from one executor shared by all listings) while the caller
+    processes the current page.  HTTP errors from a prefetched page surface
+    on the following iteration.
+    """
+    extra_params = dict(extra_params or {})
+    limit = CFG["PAGE_LIMIT"]
+
+    def _params(marker: Optional[str]) -> Dict[str, Any]:
+        params: Dict[str, Any] = {"limit": limit, **extra_params}
+        if marker:
+            params["marker"] = marker
+        return params
+
+    upcoming: Optional[Future] = None
+    try:
+        items = _fetch_page(session, url, _params(None), debug_context).get(key, [])
+        while True:
+            marker = items[-1].get("id") if len(items) >= limit else None
+            if marker and prefetch:
+                upcoming = _prefetch_executor().submit(
+                    _fetch_page, session, url, _params(marker), debug_context)
+            yield items
+            if not marker:
+                return
+            if upcoming is not None:
+                items, upcoming = upcoming.result().get(key, []), None
+            else:
+                items = _fetch_page(session, url, _params(marker), debug_context).get(key, [])
+    finally:
+        # Abandoned mid-listing: drop the prefetch if it has not started, or
+        # wait for it so the session is not used after the caller moves on.
+        if upcoming is not None and not upcoming.cancel():
+            try:
+                upcoming.result()
+            except Exception:
+                pass
+
+
 def paginate(
     session: requests.Session,
     url: str,
@@ -158,31 +248,11 @@ def paginate(
     """
     Generic helper for limit/marker style pagination.
     Assumes responses look like { key: [...], ... }.
+    Pages are prefetched (see iter_pages) and collected into one list.
     """
     out: List[Dict[str, Any]] = []
-    marker: Optional[str] = None
-    extra_params = dict(extra_params or {})
-    while True:
-        params: Dict[str, Any] = {"limit": CFG["PAGE_LIMIT"], **extra_params}
-        if marker:
-            params["marker"] = marker
-        try:
-            resp = session.get(url, params=params, timeout=CFG["REQUEST_TIMEOUT"])
-            resp.raise_for_status()
-        except requests.HTTPError as e:
-            print(f"[ERROR] HTTPError during paginate: {e}")
-            if hasattr(e, 'response') and e.response is not None:
-                print(f"[ERROR] Response status: {e.response.status_code}")
-                print(f"[ERROR] Response body: {e.response.text}")
-            if debug_context:
-                print(f"[ERROR] Debug context: {debug_context}")
-            raise
-        data = resp.json() if resp.content else {}
-        items = data.get(key, [])
-        out.extend(items)
-        if len(items) < CFG["PAGE_LIMIT"]:
-            break
-        marker = items[-1].get("id")
+    for page in iter_pages(session, url, key, extra_params, debug_context):
+        out.extend(page)
     return out
 
 
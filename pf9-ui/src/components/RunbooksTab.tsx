@@ -389,6 +389,8 @@ export default function RunbooksTab({ userRole = "" }: { userRole?: string }) {
           ? `✅ ${triggerModal.display_name} completed — ${result.items_found} found, ${result.items_actioned} actioned`
           : result.status === "pending_approval"
           ? `⏳ ${triggerModal.display_name} is awaiting approval`
+          : result.status === "queued"
+          ? `▶️ ${triggerModal.display_name} queued — results appear in the execution history`
           : `${triggerModal.display_name}: ${result.status}`,
         result.status === "completed" ? "success" : "info"
       );
@@ -804,7 +804,7 @@ export default function DependencyGraph({ rootType, rootId, rootLabel, onClose,
         {!graphUrl && (
           <div style={{ display: "flex", alignItems: "center", gap: 4 }}>
             <span style={{ fontSize: 11, color: "var(--color-text-secondary, #94a3b8)" }}>Depth</span>
-            {[1, 2, 3].map((d) => (
+            {[1, 2, 3, 4, 5].map((d) => (
               <button
                 key={d}
                 className={`graph-pill ${depth === d ? "graph-pill-active" : ""}`}
@@ -50,6 +50,7 @@ from p9_common import (
     neutron_list, neutron_quotas,
     infer_user_roles_from_data,
 )
+from p9_collector import CollectionEngine
 
 from db_writer import (
     db_connect,
@@ -82,6 +83,7 @@ from db_writer import (
 )
 
 STATE_FILE = os.path.join(os.getenv("PF9_OUTPUT_DIR", "/tmp"), "p9_rvtools_state.json")
+TIMINGS_FILE = os.path.join(os.getenv("PF9_OUTPUT_DIR", "/tmp"), "p9_rvtools_timings.json")
 
 ENABLE_DB = os.getenv("PF9_ENABLE_DB", "1") == "1"
 
@@ -185,6 +187,135 @@ def save_state(data):
         traceback.print_exc()
 
 
+def save_timings(report):
+    """Persist the last run's per-endpoint timing breakdown next to the state file."""
+    try:
+        with open(TIMINGS_FILE, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    except Exception:
+        traceback.print_exc()
+
+
+# ------------------------------------------------------------------
+# Inventory collection
+# ------------------------------------------------------------------
+
+QUOTA_FETCHERS = (("nova", nova_quotas), ("cinder", cinder_quotas), ("neutron", neutron_quotas))
+
+
+def _optional(future, label):
+    """Result of a non-critical collection task, or [] with a warning."""
+    try:
+        return future.result()
+    except Exception as e:
+        print(f"    [WARN] {label} collection failed (non-critical): {e}")
+        return []
+
+
+def collect_inventory(engine, project_id):
+    """
+    Collect the full inventory through *engine* (a p9_collector.CollectionEngine).
+
+    All list endpoints are submitted up front; per-project quota calls are
+    queued as soon as the project list arrives, so they overlap with the
+    remaining Nova/Neutron listings.  Critical lists re-raise on failure
+    exactly like the former serial code; auxiliary metadata degrades to [].
+    Returns a dict keyed by resource name, plus ``quotas`` mapping
+    (project_id, service) -> quota set.
+    """
+    f = {
+        "domains":              engine.submit("keystone_domains", "keystone", list_domains_all),
+        "projects":             engine.submit("keystone_projects", "keystone", list_projects_all),
+        "users":                engine.submit("keystone_users", "keystone", get_all_users_multi_domain,
+                                              with_session=False),
+        "roles":                engine.submit("keystone_roles", "keystone", list_roles_all),
+        "role_assignments":     engine.submit("keystone_role_assignments", "keystone", list_role_assignments_all),
+        "groups":               engine.submit("keystone_groups", "keystone", list_groups_all),
+        "servers":              engine.submit("nova_servers", "nova", nova_servers_all),
+        "hypervisors":          engine.submit("nova_hypervisors", "nova", nova_hypervisors_all),
+        "flavors":              engine.submit("nova_flavors", "nova", nova_flavors),
+        "keypairs":             engine.submit("nova_keypairs", "nova", nova_keypairs),
+        "server_groups":        engine.submit("nova_server_groups", "nova", nova_server_groups),
+        "aggregates":           engine.submit("nova_aggregates", "nova", nova_aggregates),
+        "availability_zones":   engine.submit("nova_availability_zones", "nova", nova_availability_zones),
+        "volumes":              engine.submit("cinder_volumes", "cinder", cinder_volumes_all, project_id),
+        "snapshots":            engine.submit("cinder_snapshots", "cinder", cinder_snapshots_all, project_id),
+        "volume_types":         engine.submit("cinder_volume_types", "cinder", cinder_volume_types),
+        "images":               engine.submit("glance_images", "glance", glance_images),
+        "networks":             engine.submit("neutron_networks", "neutron", neutron_list, "networks"),
+        "subnets":              engine.submit("neutron_subnets", "neutron", neutron_list, "subnets"),
+        "ports":                engine.submit("neutron_ports", "neutron", neutron_list, "ports"),
+        "routers":              engine.submit("neutron_routers", "neutron", neutron_list, "routers"),
+        "floatingips":          engine.submit("neutron_floatingips", "neutron", neutron_list, "floatingips"),
+        "security_groups":      engine.submit("neutron_security_groups", "neutron", neutron_list,
+                                              "security-groups"),
+        "security_group_rules": engine.submit("neutron_security_group_rules", "neutron", neutron_list,
+                                              "security-group-rules"),
+    }
+
+    inv = {"domains": f["domains"].result(), "projects": f["projects"].result()}
+
+    # Quotas: three calls per project, fanned out while the lists finish
+    quota_futures = {}
+    for p in inv["projects"]:
+        pid = p.get("id")
+        if not pid:
+            continue
+        for svc_name, svc_fn in QUOTA_FETCHERS:
+            quota_futures[(pid, svc_name)] = engine.submit(f"{svc_name}_quotas", svc_name, svc_fn, pid)
+
+    # Keystone - User Management
+    print("    [KEY] Collecting users and roles across all domains...")
+    inv["users"] = f["users"].result()
+    inv["roles"] = f["roles"].result()
+    inv["role_assignments"] = f["role_assignments"].result()
+    inv["groups"] = f["groups"].result()
+    # If no role assignments were collected, try to infer them
+    if len(inv["role_assignments"]) == 0:
+        print("    [INFO] No role assignments collected, attempting to infer roles...")
+        inv["role_assignments"] = infer_user_roles_from_data(inv["users"], inv["projects"], inv["roles"])
+    print(f"    [OK] Found {len(inv['users'])} users, {len(inv['roles'])} roles, "
+          f"{len(inv['role_assignments'])} role assignments, {len(inv['groups'])} groups")
+
+    # Nova
+    for key in ("servers", "hypervisors", "flavors"):
+        inv[key] = f[key].result()
+    print("    [NOVA] Collecting keypairs, server groups, aggregates, AZs...")
+    inv["keypairs"] = _optional(f["keypairs"], "Keypairs")
+    inv["server_groups"] = _optional(f["server_groups"], "Server groups")
+    inv["aggregates"] = _optional(f["aggregates"], "Aggregates")
+    inv["availability_zones"] = _optional(f["availability_zones"], "Availability zones")
+    print(f"    [OK] Found {len(inv['keypairs'])} keypairs, {len(inv['server_groups'])} server groups, "
+          f"{len(inv['aggregates'])} aggregates, {len(inv['availability_zones'])} AZs")
+
+    # Cinder + Glance
+    inv["volumes"] = f["volumes"].result()
+    inv["snapshots"] = f["snapshots"].result()
+    print("    [CINDER] Collecting volume types...")
+    inv["volume_types"] = _optional(f["volume_types"], "Volume types")
+    print(f"    [OK] Found {len(inv['volume_types'])} volume types")
+    inv["images"] = f["images"].result()
+
+    # Neutron
+    for key in ("networks", "subnets", "ports", "routers", "floatingips"):
+        inv[key] = f[key].result()
+    print("    [NET] Collecting security groups...")
+    inv["security_groups"] = f["security_groups"].result()
+    inv["security_group_rules"] = f["security_group_rules"].result()
+    print(f"    [OK] Found {len(inv['security_groups'])} security groups, "
+          f"{len(inv['security_group_rules'])} rules")
+
+    quotas = {}
+    for key, fut in quota_futures.items():
+        try:
+            quotas[key] = fut.result()
+        except Exception:
+            pass  # per-project quota failures were always skipped silently
+    inv["quotas"] = quotas
+    print(f"    [OK] Fetched quotas for {len({pid for pid, _ in quotas})} projects")
+    return inv
+
+
 # ------------------------------------------------------------------
 # Data munging / enrichment for project + tenant info
 # ------------------------------------------------------------------
@@ -598,82 +729,30 @@ def main():
     project_id = body["token"]["project"]["id"]
 
     print("[2] Inventory")
-
-    # Keystone - Core Resources
-    domains  = list_domains_all(session)
-    projects = list_projects_all(session)
-    
-    # Keystone - User Management (NEW)
-    print("    [KEY] Collecting users and roles across all domains...")
-    users           = get_all_users_multi_domain()
-    roles           = list_roles_all(session)
-    role_assignments = list_role_assignments_all(session)
-    groups          = list_groups_all(session)
-    
-    # If no role assignments were collected, try to infer them
-    if len(role_assignments) == 0:
-        print("    [INFO] No role assignments collected, attempting to infer roles...")
-        role_assignments = infer_user_roles_from_data(users, projects, roles)
-    
-    print(f"    [OK] Found {len(users)} users, {len(roles)} roles, {len(role_assignments)} role assignments, {len(groups)} groups")
-
-    # Nova
-    servers      = nova_servers_all(session)
-    hypervisors  = nova_hypervisors_all(session)
-    flavors      = nova_flavors(session)
-
-    # Nova additional metadata
-    print("    [NOVA] Collecting keypairs, server groups, aggregates, AZs...")
-    keypairs = []
-    server_groups = []
-    aggregates = []
-    availability_zones = []
-    try:
-        keypairs = nova_keypairs(session)
-    except Exception as e:
-        print(f"    [WARN] Keypairs collection failed (non-critical): {e}")
-    try:
-        server_groups = nova_server_groups(session)
-    except Exception as e:
-        print(f"    [WARN] Server groups collection failed (non-critical): {e}")
-    try:
-        aggregates = nova_aggregates(session)
-    except Exception as e:
-        print(f"    [WARN] Aggregates collection failed (non-critical): {e}")
-    try:
-        availability_zones = nova_availability_zones(session)
-    except Exception as e:
-        print(f"    [WARN] Availability zones collection failed (non-critical): {e}")
-    print(f"    [OK] Found {len(keypairs)} keypairs, {len(server_groups)} server groups, {len(aggregates)} aggregates, {len(availability_zones)} AZs")
-
-    # Cinder
-    volumes   = cinder_volumes_all(session, project_id)
-    snapshots = cinder_snapshots_all(session, project_id)
-
-    # Cinder additional metadata
-    print("    [CINDER] Collecting volume types...")
-    volume_types = []
+    engine = CollectionEngine(session, region_id=os.getenv("PF9_REGION_ID", "default"))
     try:
-        volume_types = cinder_volume_types(session)
-    except Exception as e:
-        print(f"    [WARN] Volume types collection failed (non-critical): {e}")
-    print(f"    [OK] Found {len(volume_types)} volume types")
-
-    # Glance
-    images = glance_images(session)
-
-    # Neutron
-    networks    = neutron_list(session, "networks")
-    subnets     = neutron_list(session, "subnets")
-    ports       = neutron_list(session, "ports")
-    routers     = neutron_list(session, "routers")
-    floatingips = neutron_list(session, "floatingips")
-
-    # Security Groups (Neutron)
-    print("    [NET] Collecting security groups...")
-    security_groups = neutron_list(session, "security-groups")
-    security_group_rules = neutron_list(session, "security-group-rules")
-    print(f"    [OK] Found {len(security_groups)} security groups, {len(security_group_rules)} rules")
+        inv = collect_inventory(engine, project_id)
+    except Exception:
+        engine.shutdown(cancel_pending=True)
+        raise
+    finally:
+        engine.shutdown()
+        timing = engine.timing_report()
+        print(engine.format_timing_report(timing))
+        save_timings(timing)
+
+    domains, projects = inv["domains"], inv["projects"]
+    users, roles = inv["users"], inv["roles"]
+    role_assignments, groups = inv["role_assignments"], inv["groups"]
+    servers, hypervisors, flavors = inv["servers"], inv["hypervisors"], inv["flavors"]
+    keypairs, server_groups = inv["keypairs"], inv["server_groups"]
+    aggregates = inv["aggregates"]
+    volumes, snapshots, volume_types = inv["volumes"], inv["snapshots"], inv["volume_types"]
+    images = inv["images"]
+    networks, subnets, ports = inv["networks"], inv["subnets"], inv["ports"]
+    routers, floatingips = inv["routers"], inv["floatingips"]
+    security_groups, security_group_rules = inv["security_groups"], inv["security_group_rules"]
+    project_quotas = inv["quotas"]
 
     # --------------------------------------------------------------
     # Enrich records with project_name + tenant_name/domain_name
@@ -723,31 +802,23 @@ def main():
     quota_export_rows = []
     project_name_map = {p.get('id'): p.get('name', p.get('id', '')) for p in projects}
     try:
-        for p in projects:
-            pid = p.get('id')
-            pname = p.get('name', pid)
-            if not pid:
-                continue
-            for svc_name, svc_fn in [('nova', nova_quotas), ('cinder', cinder_quotas), ('neutron', neutron_quotas)]:
-                try:
-                    qdata = svc_fn(session, pid)
-                    if isinstance(qdata, dict):
-                        for resource, val in qdata.items():
-                            if resource in ('id',):
-                                continue
-                            if isinstance(val, dict):
-                                quota_export_rows.append({
-                                    'project_name': pname, 'project_id': pid, 'service': svc_name,
-                                    'resource': resource, 'limit': val.get('limit', ''),
-                                    'in_use': val.get('in_use', ''), 'reserved': val.get('reserved', ''),
-                                })
-                            else:
-                                quota_export_rows.append({
-                                    'project_name': pname, 'project_id': pid, 'service': svc_name,
-                                    'resource': resource, 'limit': val, 'in_use': '', 'reserved': '',
-                                })
-                except Exception:
-                    pass
+        for (pid, svc_name), qdata in project_quotas.items():
+            pname = project_name_map.get(pid, pid)
+            if isinstance(qdata, dict):
+                for resource, val in qdata.items():
+                    if resource in ('id',):
+                        continue
+                    if isinstance(val, dict):
+                        quota_export_rows.append({
+                            'project_name': pname, 'project_id': pid, 'service': svc_name,
+                            'resource': resource, 'limit': val.get('limit', ''),
+                            'in_use': val.get('in_use', ''), 'reserved': val.get('reserved', ''),
+                        })
+                    else:
+                        quota_export_rows.append({
+                            'project_name': pname, 'project_id': pid, 'service': svc_name,
+                            'resource': resource, 'limit': val, 'in_use': '', 'reserved': '',
+                        })
     except Exception as e:
         print(f"    [WARN] Quota export rows collection failed: {e}")
     print(f"    [OK] Collected {len(quota_export_rows)} quota rows for export")
@@ -889,28 +960,12 @@ def main():
                     except Exception: pass
                 print(f"    [WARN] Volume types DB write failed: {e}")
 
-            # Project quotas (iterate projects)
+            # Project quotas (already fetched concurrently during collection)
             try:
-                for p in projects:
-                    pid = p.get('id')
-                    if not pid:
-                        continue
-                    try:
-                        nq = nova_quotas(session, pid)
-                        upsert_project_quotas(conn, pid, 'nova', nq)
-                        n_quotas += len(nq)
-                    except Exception:
-                        pass
-                    try:
-                        cq = cinder_quotas(session, pid)
-                        upsert_project_quotas(conn, pid, 'cinder', cq)
-                        n_quotas += len(cq)
-                    except Exception:
-                        pass
+                for (pid, svc_name), qdata in project_quotas.items():
                     try:
-                        neq = neutron_quotas(session, pid)
-                        upsert_project_quotas(conn, pid, 'neutron', neq)
-                        n_quotas += len(neq)
+                        upsert_project_quotas(conn, pid, svc_name, qdata)
+                        n_quotas += len(qdata)
                     except Exception:
                         pass
                 print(f"    [OK] Stored quotas for {len(projects)} projects ({n_quotas} quota entries)")
@@ -927,7 +982,8 @@ def main():
                 f"routers={n_routers}, floating_ips={n_fips}, "
                 f"security_groups={n_sgs}, security_group_rules={n_sg_rules}, "
                 f"keypairs={n_keypairs}, server_groups={n_sgroups}, "
-                f"aggregates={n_aggs}, volume_types={n_vtypes}, quota_entries={n_quotas}"
+                f"aggregates={n_aggs}, volume_types={n_vtypes}, quota_entries={n_quotas}, "
+                f"collect_seconds={timing['wall_seconds']}"
             )
             finish_inventory_run(conn, run_id, status="success", notes=notes)
             
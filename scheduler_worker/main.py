@@ -35,37 +35,8 @@ from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 import requests as _requests_mod
-from shared.health_scoring import compute_security_posture_component
-
-# ---------------------------------------------------------------------------
-# Worker observability — Redis metrics (B10.1)
-# ---------------------------------------------------------------------------
-_REDIS_HOST = os.getenv("REDIS_HOST", "redis")
-_REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
-_REDIS_PASSWORD = os.getenv("REDIS_PASSWORD") or None
-_WORKER_NAME = "scheduler_worker"
-_worker_runs_total   = 0
-_worker_errors_total = 0
-
-def _report_worker_metrics(duration_s: float, had_error: bool, frequency_s: int) -> None:
-    global _worker_runs_total, _worker_errors_total
-    _worker_runs_total += 1
-    if had_error:
-        _worker_errors_total += 1
-    try:
-        import redis as _redis
-        r = _redis.Redis(host=_REDIS_HOST, port=_REDIS_PORT, password=_REDIS_PASSWORD, socket_connect_timeout=2)
-        r.hset(f"pf9:worker:{_WORKER_NAME}", mapping={
-            "runs_total":          _worker_runs_total,
-            "errors_total":        _worker_errors_total,
-            "last_run_ts":         _time_module.time(),
-            "last_run_duration_s": round(duration_s, 2),
-            "frequency_s":         frequency_s,
-            "label":               _WORKER_NAME,
-        })
-    except Exception:
-        pass
-
+from shared.health_scoring import compute_tenant_health_scores, load_health_score_weights
+from shared.worker_telemetry import WorkerTelemetry
 
 # ---------------------------------------------------------------------------
 # Configuration from environment
@@ -74,6 +45,10 @@ METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("true", "1",
 METRICS_INTERVAL = int(os.getenv("METRICS_INTERVAL_SECONDS", "60"))
 METRICS_CACHE_PATH = os.getenv("METRICS_CACHE_PATH", "/tmp/cache/metrics_cache.json")
 
+# Heartbeat cycle every METRICS_INTERVAL; the metrics / RVTools / health score
+# loops time their stages independently and are published with the next beat.
+_telemetry = WorkerTelemetry("scheduler_worker", frequency_s=METRICS_INTERVAL)
+
 RVTOOLS_ENABLED = os.getenv("RVTOOLS_ENABLED", "true").lower() in ("true", "1", "yes")
 RVTOOLS_INTERVAL_MINUTES = int(os.getenv("RVTOOLS_INTERVAL_MINUTES", "0"))  # 0 = use RVTOOLS_SCHEDULE_TIME
 RVTOOLS_SCHEDULE_TIME = os.getenv("RVTOOLS_SCHEDULE_TIME", "03:00")         # HH:MM UTC, used when interval=0
@@ -175,6 +150,7 @@ def _get_db_conn():
         user=os.getenv("PF9_DB_USER", os.getenv("POSTGRES_USER", "pf9")),
         password=os.getenv("PF9_DB_PASSWORD", os.getenv("POSTGRES_PASSWORD", "")),
         connect_timeout=10,
+        connection_factory=_telemetry.connection_factory,
     )
 
 
@@ -329,7 +305,8 @@ async def metrics_loop() -> None:
 
             started_at = datetime.now(timezone.utc)
             try:
-                await collector.run_once()
+                with _telemetry.stage("host_metrics", component=region_id or "default"):
+                    await collector.run_once()
                 consecutive_errors[region_id] = 0
                 _write_sync_metric(region_id, started_at, datetime.now(timezone.utc), error=False)
             except Exception as exc:
@@ -716,7 +693,8 @@ async def _run_rvtools_for_all_regions(
     regions = await loop.run_in_executor(executor, load_enabled_regions)
     if not regions:
         log.info("RVTools: no regions in DB – running with env-var credentials")
-        await loop.run_in_executor(executor, _run_rvtools_sync, None)
+        with _telemetry.stage("rvtools", component="default"):
+            await loop.run_in_executor(executor, _run_rvtools_sync, None)
     else:
         log.info("RVTools: running across %d region(s) (max parallel: %d)", len(regions), MAX_PARALLEL_REGIONS)
         sem = asyncio.Semaphore(MAX_PARALLEL_REGIONS)
@@ -726,23 +704,25 @@ async def _run_rvtools_for_all_regions(
                 rname = region["region_name"]
                 log.info("RVTools: [%s] starting", rname)
                 try:
-                    await loop.run_in_executor(executor, _run_rvtools_sync, region)
+                    with _telemetry.stage("rvtools", component=rname):
+                        await loop.run_in_executor(executor, _run_rvtools_sync, region)
                     log.info("RVTools: [%s] completed", rname)
                 except Exception as exc:
                     log.error("RVTools: [%s] failed: %s", rname, exc)
 
         await asyncio.gather(*[_one_region(r) for r in regions])
 
-    # Purge xlsx files that exceed the retention window
-    await loop.run_in_executor(executor, _cleanup_old_reports)
-    # L8: Purge expired password reset tokens
-    await loop.run_in_executor(executor, _cleanup_expired_tokens)
-    # Auto-fail PLANNED / RUNNING restore jobs that have exceeded their timeout
-    await loop.run_in_executor(executor, _timeout_stale_restore_jobs)
-    # Capture daily health snapshot for dashboard sparklines
-    await loop.run_in_executor(executor, _snapshot_health_daily)
-    # Trim unbounded history / operational log tables
-    await loop.run_in_executor(executor, _archive_history_tables)
+    with _telemetry.stage("maintenance"):
+        # Purge xlsx files that exceed the retention window
+        await loop.run_in_executor(executor, _cleanup_old_reports)
+        # L8: Purge expired password reset tokens
+        await loop.run_in_executor(executor, _cleanup_expired_tokens)
+        # Auto-fail PLANNED / RUNNING restore jobs that have exceeded their timeout
+        await loop.run_in_executor(executor, _timeout_stale_restore_jobs)
+        # Capture daily health snapshot for dashboard sparklines
+        await loop.run_in_executor(executor, _snapshot_health_daily)
+        # Trim unbounded history / operational log tables
+        await loop.run_in_executor(executor, _archive_history_tables)
 
 
 # ---------------------------------------------------------------------------
@@ -750,8 +730,13 @@ async def _run_rvtools_for_all_regions(
 # ---------------------------------------------------------------------------
 
 def _compute_all_tenant_health_scores() -> None:
-    """Compute and persist the composite health score for every active project."""
+    """Compute and persist the composite health score for every active project.
+
+    Inputs come from shared.health_scoring in one grouped query each, so the
+    run costs a fixed number of statements however many projects there are.
+    """
     import json
+    from psycopg2.extras import execute_values
 
     conn = None
     try:
@@ -765,308 +750,45 @@ def _compute_all_tenant_health_scores() -> None:
             log.debug("Health scores: no projects found")
             return
 
-        # Load configurable component weights from system_settings
-        _DEFAULT_WEIGHTS = {
-            "snapshot_compliance": 22,
-            "quota_headroom": 18,
-            "drift": 18,
-            "sla_tier": 17,
-            "tickets": 10,
-            "security_posture": 15,
-        }
-        weights = dict(_DEFAULT_WEIGHTS)
-        try:
-            cur.execute("SELECT key, value FROM system_settings WHERE key LIKE 'health_score.weight.%'")
-            for wrow in cur.fetchall():
-                component = wrow[0].replace("health_score.weight.", "")
-                if component in weights:
-                    try:
-                        weights[component] = max(0, int(wrow[1]))
-                    except (ValueError, TypeError):
-                        pass
-        except Exception:
-            pass  # fall back to hardcoded defaults
-
         log.info("Health scores: computing for %d project(s)", len(project_ids))
-        updated = 0
-
-        for project_id in project_ids:
-            try:
-                scores = {}
-                details = {}
-
-                # --- snapshot compliance (0-25) ---
-                cur.execute(
-                    """
-                    SELECT COUNT(*) AS cnt
-                    FROM   snapshot_records sr
-                    JOIN   snapshot_runs    ru ON ru.id = sr.snapshot_run_id
-                    WHERE  sr.project_id = %s
-                      AND  sr.status     = 'success'
-                      AND  ru.started_at >= NOW() - INTERVAL '7 days'
-                    """,
-                    (project_id,),
-                )
-                snap_cnt = (cur.fetchone() or (0,))[0] or 0
-                scores["snapshot_compliance"] = 25 if snap_cnt > 0 else 0
-                details["snapshot_compliance"] = {"recent_successes": int(snap_cnt)}
-
-                # --- quota headroom (0-20) ---
-                cur.execute(
-                    """
-                    SELECT vcpus_used, vcpus_quota, ram_used_mb, ram_quota_mb
-                    FROM   metering_quotas
-                    WHERE  project_id = %s
-                    ORDER BY collected_at DESC LIMIT 1
-                    """,
-                    (project_id,),
-                )
-                row = cur.fetchone()
-                if row and row[1] and row[3]:
-                    cpu_pct = (row[0] or 0) / row[1] * 100
-                    ram_pct = (row[2] or 0) / row[3] * 100
-                    max_pct = max(cpu_pct, ram_pct)
-                    if max_pct < 60:
-                        quota_score = 20
-                    elif max_pct < 80:
-                        quota_score = 15
-                    elif max_pct < 90:
-                        quota_score = 8
-                    else:
-                        quota_score = 0
-                    details["quota_headroom"] = {
-                        "cpu_utilization_pct": round(cpu_pct, 1),
-                        "ram_utilization_pct": round(ram_pct, 1),
-                    }
-                else:
-                    quota_score = 10
-                    details["quota_headroom"] = {"note": "no_quota_data"}
-                scores["quota_headroom"] = quota_score
-
-                # --- drift (0-20) ---
-                cur.execute(
-                    "SELECT COUNT(*) FROM drift_events "
-                    "WHERE project_id = %s AND detected_at >= NOW() - INTERVAL '30 days'",
-                    (project_id,),
-                )
-                drift_cnt = (cur.fetchone() or (0,))[0] or 0
-                if drift_cnt == 0:
-                    drift_score = 20
-                elif drift_cnt <= 2:
-                    drift_score = 15
-                elif drift_cnt <= 5:
-                    drift_score = 8
-                else:
-                    drift_score = 0
-                scores["drift"] = drift_score
-                details["drift"] = {"events_30d": int(drift_cnt)}
-
-                # --- sla_tier (0-20) ---
-                cur.execute(
-                    "SELECT tier FROM sla_commitments "
-                    "WHERE tenant_id = %s AND effective_to IS NULL "
-                    "ORDER BY effective_from DESC LIMIT 1",
-                    (project_id,),
-                )
-                sla_row = cur.fetchone()
-                tier = (sla_row[0] if sla_row else None) or ""
-                sla_score = {"gold": 20, "silver": 15, "bronze": 10}.get(tier.lower(), 5)
-                scores["sla_tier"] = sla_score
-                details["sla_tier"] = {"tier": tier or "none"}
-
-                # --- tickets (0-15) ---
-                cur.execute(
-                    "SELECT priority, COUNT(*) AS cnt FROM support_tickets "
-                    "WHERE project_id = %s AND status NOT IN ('closed','resolved') "
-                    "GROUP BY priority",
-                    (project_id,),
-                )
-                open_tix = {r[0]: int(r[1]) for r in cur.fetchall()}
-                total_open = sum(open_tix.values())
-                if total_open == 0:
-                    ticket_score = 15
-                elif open_tix.get("critical", 0) > 0 or open_tix.get("high", 0) > 0:
-                    ticket_score = 0
-                elif total_open <= 2:
-                    ticket_score = 8
-                else:
-                    ticket_score = 4
-                scores["tickets"] = ticket_score
-                details["tickets"] = {"open_by_priority": open_tix}
-
-                # --- security posture (0-15) ---
-                cur.execute(
-                    """
-                    SELECT
-                        COUNT(DISTINCT u.id) AS total_users,
-                        COUNT(DISTINCT u.id) FILTER (WHERE um.is_enabled IS TRUE) AS mfa_enabled_users
-                    FROM role_assignments ra
-                    JOIN users u ON u.id = ra.user_id
-                    LEFT JOIN user_mfa um ON um.username = u.name
-                    WHERE ra.project_id = %s
-                      AND ra.user_id IS NOT NULL
-                    """,
-                    (project_id,),
-                )
-                mfa_row = cur.fetchone() or (0, 0)
-
-                cur.execute(
-                    """
-                    SELECT COUNT(DISTINCT s.id) AS exposed_vm_count
-                    FROM servers s
-                    JOIN ports p ON p.device_id = s.id
-                    JOIN security_group_rules sgr
-                      ON p.raw_json::jsonb->'security_groups' ? sgr.security_group_id
-                    WHERE s.project_id = %s
-                      AND sgr.direction = 'ingress'
-                      AND COALESCE(sgr.remote_ip_prefix, '0.0.0.0/0') IN ('0.0.0.0/0', '::/0')
-                      AND (
-                            sgr.protocol IS NULL OR LOWER(sgr.protocol) = 'tcp'
-                          )
-                      AND (
-                            (COALESCE(sgr.port_range_min, 22) <= 22 AND COALESCE(sgr.port_range_max, 22) >= 22)
-                            OR
-                            (COALESCE(sgr.port_range_min, 3389) <= 3389 AND COALESCE(sgr.port_range_max, 3389) >= 3389)
-                          )
-                    """,
-                    (project_id,),
-                )
-                exposed_row = cur.fetchone() or (0,)
-
-                cur.execute(
-                    """
-                    SELECT
-                        COUNT(*) AS total_vm_count,
-                        COUNT(*) FILTER (
-                            WHERE COALESCE(i.updated_at, i.created_at) < NOW() - INTERVAL '180 days'
-                        ) AS stale_vm_count
-                    FROM servers s
-                    LEFT JOIN images i ON i.id = s.image_id
-                    WHERE s.project_id = %s
-                    """,
-                    (project_id,),
-                )
-                image_row = cur.fetchone() or (0, 0)
-
-                security_component = compute_security_posture_component(
-                    mfa_enabled_users=(mfa_row[1] or 0),
-                    mfa_total_users=(mfa_row[0] or 0),
-                    exposed_vm_count=(exposed_row[0] or 0),
-                    stale_vm_count=(image_row[1] or 0),
-                    total_vm_count=(image_row[0] or 0),
-                )
-                scores["security_posture"] = security_component["score"]
-                details["security_posture"] = security_component["details"]
-
-                # Apply configured weights (scale proportionally to each default max)
-                def _scale(raw, default_max, cfg_weight):
-                    return round(raw / default_max * cfg_weight) if default_max else 0
-
-                scaled = {
-                    "snapshot_compliance": _scale(scores["snapshot_compliance"], _DEFAULT_WEIGHTS["snapshot_compliance"], weights["snapshot_compliance"]),
-                    "quota_headroom":      _scale(scores["quota_headroom"],      _DEFAULT_WEIGHTS["quota_headroom"],      weights["quota_headroom"]),
-                    "drift":               _scale(scores["drift"],               _DEFAULT_WEIGHTS["drift"],               weights["drift"]),
-                    "sla_tier":            _scale(scores["sla_tier"],            _DEFAULT_WEIGHTS["sla_tier"],            weights["sla_tier"]),
-                    "tickets":             _scale(scores["tickets"],             _DEFAULT_WEIGHTS["tickets"],             weights["tickets"]),
-                    "security_posture":    _scale(scores["security_posture"],    _DEFAULT_WEIGHTS["security_posture"],    weights["security_posture"]),
-                }
-                total_score = sum(scaled.values())
+        results = compute_tenant_health_scores(
+            conn, project_ids, load_health_score_weights(conn),
+        )
 
-                cur.execute(
-                    """
-                    INSERT INTO tenant_health_scores
-                        (project_id, computed_at, score,
-                         snapshot_compliance, quota_headroom, drift, sla_tier, tickets, security_posture,
-                         details)
-                    VALUES (%s, NOW(), %s, %s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (project_id, computed_at) DO NOTHING
-                    """,
-                    (
-                        project_id, total_score,
-                        scaled["snapshot_compliance"], scaled["quota_headroom"],
-                        scaled["drift"], scaled["sla_tier"], scaled["tickets"], scaled["security_posture"],
-                        json.dumps(details),
-                    ),
+        execute_values(
+            cur,
+            """
+            INSERT INTO tenant_health_scores
+                (project_id, computed_at, score,
+                 snapshot_compliance, quota_headroom, drift, sla_tier, tickets, security_posture,
+                 details)
+            VALUES %s
+            ON CONFLICT (project_id, computed_at) DO NOTHING
+            """,
+            [
+                (
+                    project_id, r["score"],
+                    r["snapshot_compliance"], r["quota_headroom"],
+                    r["drift"], r["sla_tier"], r["tickets"], r["security_posture"],
+                    json.dumps(r["details"]),
                 )
-                conn.commit()
-                updated += 1
-
-                # --- Alert on low scores ---
-                if total_score < 60:
-                    alert_type = "health_score_critical" if total_score < 40 else "health_score_low"
-                    alert_severity = "critical" if total_score < 40 else "medium"
-                    # Only create a new insight if there isn't an open one already
-                    cur.execute(
-                        "SELECT 1 FROM operational_insights "
-                        "WHERE type = %s AND entity_id = %s AND status = 'open' LIMIT 1",
-                        (alert_type, project_id),
-                    )
-                    if not cur.fetchone():
-                        cur.execute(
-                            """
-                            INSERT INTO operational_insights
-                                (type, severity, entity_type, entity_id, title, message, metadata)
-                            VALUES (%s, %s, 'project', %s,
-                                    %s,
-                                    'Tenant health score is ' || %s::text || '/100',
-                                    %s::jsonb)
-                            """,
-                            (
-                                alert_type, alert_severity, project_id,
-                                "Critical tenant health score" if total_score < 40 else "Low tenant health score",
-                                total_score,
-                                json.dumps({"score": total_score, "components": scaled}),
-                            ),
-                        )
-                        conn.commit()
-
-                # --- Auto-resolve insights when health score recovers ---
-                # Hysteresis: resolution thresholds are above trigger thresholds
-                # to prevent flapping (critical triggers at <40, resolves at >=45;
-                # low triggers at <60, resolves at >=65).
-                for rtype, recovery_threshold in [
-                    ("health_score_critical", 45),
-                    ("health_score_low", 65),
-                ]:
-                    if total_score >= recovery_threshold:
-                        cur.execute(
-                            """
-                            UPDATE operational_insights
-                               SET status      = 'resolved',
-                                   resolved_at = NOW(),
-                                   metadata    = metadata || %s::jsonb
-                             WHERE type        = %s
-                               AND entity_type = 'project'
-                               AND entity_id   = %s
-                               AND status IN ('open', 'acknowledged', 'snoozed')
-                            """,
-                            (
-                                json.dumps({
-                                    "resolved_by": "auto",
-                                    "resolution_note": (
-                                        f"Health score recovered to {total_score}/100"
-                                    ),
-                                }),
-                                rtype,
-                                project_id,
-                            ),
-                        )
-                        if cur.rowcount:
-                            conn.commit()
-                            log.info(
-                                "Health scores: auto-resolved %s insight for "
-                                "project=%s (score=%d)",
-                                rtype, project_id, total_score,
-                            )
-
-            except Exception as exc:
-                log.warning("Health scores: failed for project %s: %s", project_id, exc)
-                try:
-                    conn.rollback()
-                except Exception:
-                    pass
+                for project_id, r in results.items()
+            ],
+            template="(%s, NOW(), %s, %s, %s, %s, %s, %s, %s, %s)",
+            page_size=500,
+        )
+        conn.commit()
+        log.info("Health scores: updated %d/%d project(s)", len(results), len(project_ids))
 
-        log.info("Health scores: updated %d/%d project(s)", updated, len(project_ids))
+        try:
+            _alert_low_health_scores(conn, results)
+            _auto_resolve_health_scores(conn, results)
+        except Exception as exc:
+            log.warning("Health scores: insight update failed: %s", exc)
+            try:
+                conn.rollback()
+            except Exception:
+                pass
 
     except Exception as exc:
         log.error("Health scores: batch failed: %s", exc)
@@ -1078,6 +800,95 @@ def _compute_all_tenant_health_scores() -> None:
                 pass
 
 
+def _alert_low_health_scores(conn, results: dict) -> None:
+    """Open a health_score_low / _critical insight for projects scoring under 60.
+
+    Projects that already have a live insight of the same type keep it.
+    """
+    import json
+    from psycopg2.extras import execute_values
+
+    rows = []
+    for project_id, r in results.items():
+        total_score = r["score"]
+        if total_score >= 60:
+            continue
+        components = {k: v for k, v in r.items() if k not in ("score", "details")}
+        rows.append((
+            "health_score_critical" if total_score < 40 else "health_score_low",
+            "critical" if total_score < 40 else "medium",
+            project_id,
+            "Critical tenant health score" if total_score < 40 else "Low tenant health score",
+            total_score,
+            json.dumps({"score": total_score, "components": components}),
+        ))
+    if not rows:
+        return
+    with conn.cursor() as cur:
+        execute_values(
+            cur,
+            """
+            INSERT INTO operational_insights
+                (type, severity, entity_type, entity_id, title, message, metadata)
+            VALUES %s
+            ON CONFLICT (type, entity_type, entity_id)
+                WHERE status IN ('open','acknowledged','snoozed')
+            DO NOTHING
+            """,
+            rows,
+            template=(
+                "(%s, %s, 'project', %s, %s, "
+                "'Tenant health score is ' || %s::text || '/100', %s::jsonb)"
+            ),
+            page_size=500,
+        )
+    conn.commit()
+
+
+def _auto_resolve_health_scores(conn, results: dict) -> None:
+    """Resolve health score insights for projects whose score has recovered.
+
+    Hysteresis: resolution thresholds are above trigger thresholds to prevent
+    flapping (critical triggers at <40, resolves at >=45; low triggers at <60,
+    resolves at >=65).  One UPDATE per insight type covers every project.
+    """
+    with conn.cursor() as cur:
+        for rtype, recovery_threshold in [
+            ("health_score_critical", 45),
+            ("health_score_low", 65),
+        ]:
+            recovered = {
+                project_id: r["score"] for project_id, r in results.items()
+                if r["score"] >= recovery_threshold
+            }
+            if not recovered:
+                continue
+            cur.execute(
+                """
+                UPDATE operational_insights oi
+                   SET status      = 'resolved',
+                       resolved_at = NOW(),
+                       metadata    = oi.metadata || jsonb_build_object(
+                           'resolved_by', 'auto',
+                           'resolution_note',
+                           'Health score recovered to ' || s.score::text || '/100')
+                  FROM unnest(%s::text[], %s::int[]) AS s(project_id, score)
+                 WHERE oi.type        = %s
+                   AND oi.entity_type = 'project'
+                   AND oi.entity_id   = s.project_id
+                   AND oi.status IN ('open', 'acknowledged', 'snoozed')
+                RETURNING oi.entity_id
+                """,
+                (list(recovered), list(recovered.values()), rtype),
+            )
+            for (project_id,) in cur.fetchall():
+                log.info(
+                    "Health scores: auto-resolved %s insight for project=%s (score=%d)",
+                    rtype, project_id, recovered[project_id],
+                )
+    conn.commit()
+
+
 async def health_score_loop() -> None:
     """Compute tenant health scores every HEALTH_SCORE_INTERVAL seconds."""
     log.info(
@@ -1092,7 +903,8 @@ async def health_score_loop() -> None:
             t0 = _time_module.time()
             _touch_alive()
             try:
-                await loop.run_in_executor(executor, _compute_all_tenant_health_scores)
+                with _telemetry.stage("health_scores"):
+                    await loop.run_in_executor(executor, _compute_all_tenant_health_scores)
             except Exception as exc:
                 log.error("Health score loop error: %s", exc)
             elapsed = _time_module.time() - t0
@@ -1118,7 +930,8 @@ async def async_main() -> None:
         while _running:
             _t0 = _time_module.time()
             _hb_runs += 1
-            _report_worker_metrics(0.0, False, METRICS_INTERVAL)
+            with _telemetry.cycle():
+                pass
             for _ in range(METRICS_INTERVAL):
                 if not _running:
                     break
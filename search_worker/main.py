@@ -7,13 +7,17 @@ and trigram similarity.
 
 Runs on a configurable interval (default: 5 minutes).
 Each doc_type is indexed independently with its own watermark
-tracked in search_indexer_state.
+tracked in search_indexer_state.  Source rows are streamed through
+server-side cursors and committed in chunks, and independent doc types
+are indexed in parallel (SEARCH_INDEX_WORKERS).
 """
 
 import json
 import logging
 import os
+import queue
 import signal
+import threading
 import time
 from datetime import datetime, timezone
 from typing import Optional
@@ -22,6 +26,8 @@ import psycopg2
 import psycopg2.extras
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
+from shared.worker_telemetry import WorkerTelemetry
+
 # ── Secret helper — same pattern as ldap_sync_worker ─────────
 def _read_secret(name: str, env_var: str, default: str = "") -> str:
     """Priority: /run/secrets/<name> → env var → default."""
@@ -44,33 +50,13 @@ DB_NAME = os.getenv("DB_NAME", "pf9_mgmt")
 DB_USER = os.getenv("DB_USER", "pf9")
 DB_PASS = _read_secret("db_password", env_var="DB_PASS") or os.getenv("POSTGRES_PASSWORD", "")
 INDEX_INTERVAL = int(os.getenv("SEARCH_INDEX_INTERVAL", "300"))  # seconds
+# Doc types indexed in parallel; each worker holds two DB connections.
+INDEX_WORKERS = int(os.getenv("SEARCH_INDEX_WORKERS", "4"))
+# Rows streamed, upserted and committed (with the watermark) per chunk.
+INDEX_CHUNK_SIZE = int(os.getenv("SEARCH_INDEX_CHUNK_SIZE", "2000"))
 
-# ── Worker observability — Redis metrics (B10.1) ──────────────────────────
-_REDIS_HOST = os.getenv("REDIS_HOST", "redis")
-_REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
-_REDIS_PASSWORD = os.getenv("REDIS_PASSWORD") or None
-_WORKER_NAME = "search_worker"
-_worker_runs_total   = 0
-_worker_errors_total = 0
-
-def _report_worker_metrics(duration_s: float, had_error: bool, frequency_s: int) -> None:
-    global _worker_runs_total, _worker_errors_total
-    _worker_runs_total += 1
-    if had_error:
-        _worker_errors_total += 1
-    try:
-        import redis as _redis
-        r = _redis.Redis(host=_REDIS_HOST, port=_REDIS_PORT, password=_REDIS_PASSWORD, socket_connect_timeout=2)
-        r.hset(f"pf9:worker:{_WORKER_NAME}", mapping={
-            "runs_total":          _worker_runs_total,
-            "errors_total":        _worker_errors_total,
-            "last_run_ts":         time.time(),
-            "last_run_duration_s": round(duration_s, 2),
-            "frequency_s":         frequency_s,
-            "label":               _WORKER_NAME,
-        })
-    except Exception:
-        pass
+# ── Worker observability — per-doc-type timings and heartbeat (/worker-metrics)
+_telemetry = WorkerTelemetry("search_worker", frequency_s=INDEX_INTERVAL)
 
 logging.basicConfig(
     level=logging.INFO,
@@ -113,6 +99,7 @@ def get_conn():
     return psycopg2.connect(
         host=DB_HOST, port=DB_PORT, dbname=DB_NAME,
         user=DB_USER, password=DB_PASS,
+        connection_factory=_telemetry.connection_factory,
     )
 
 
@@ -1247,7 +1234,7 @@ UPSERT_SQL = """
     INSERT INTO search_documents
         (doc_type, tenant_id, tenant_name, domain_id, domain_name,
          resource_id, resource_name, title, body_text, ts, metadata)
-    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    VALUES %s
     ON CONFLICT (doc_type, resource_id, ts)
     DO UPDATE SET
         tenant_name  = EXCLUDED.tenant_name,
@@ -1258,124 +1245,271 @@ UPSERT_SQL = """
         metadata     = EXCLUDED.metadata
 """
 
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
 
-def index_doc_type(conn, doc_type: str, query: str, row_to_doc, batch_size: int = 500):
-    """Index one doc_type incrementally."""
+
+# ── Peak RSS (logged once per indexing cycle) ───────────────
+
+def _reset_peak_rss() -> None:
+    """Reset the kernel's RSS high-water mark so VmHWM covers one cycle.
+
+    VmHWM is process-wide and doc types are indexed in parallel, so the
+    figure is only meaningful for the cycle as a whole.  Needs Linux >= 4.0;
+    elsewhere the peak is measured since process start.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as fh:
+            fh.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_kb() -> Optional[int]:
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        return int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+    except Exception:
+        return None
+
+
+# ── Chunk helpers ────────────────────────────────────────────
+
+def _doc_values(doc_type: str, row_to_doc, rows):
+    """Build upsert tuples for one chunk of source rows.
+
+    Returns ``(values, timestamps)``.  Rows whose builder fails are skipped.
+    Tuples are de-duplicated on the upsert key (last row wins): a multi-row
+    ``ON CONFLICT DO UPDATE`` may not touch the same row twice.
+    """
+    values = {}
+    stamps = []
+    for row in rows:
+        try:
+            doc = row_to_doc(row)
+            doc_ts = doc.get("ts") or datetime.now(timezone.utc)
+            values[(doc["resource_id"], doc_ts)] = (
+                doc_type,
+                doc.get("tenant_id"),
+                doc.get("tenant_name", ""),
+                doc.get("domain_id"),
+                doc.get("domain_name", ""),
+                doc["resource_id"],
+                doc.get("resource_name", ""),
+                doc["title"],
+                doc.get("body_text", ""),
+                doc_ts,
+                json.dumps(doc.get("metadata", {})),
+            )
+        except Exception as e:
+            log.warning("Skipping row in %s: %s", doc_type, e)
+            continue
+        stamps.append(doc_ts)
+    return list(values.values()), stamps
+
+
+def _chunk_watermark(watermark: datetime, stamps, final: bool) -> datetime:
+    """Watermark that is safe to commit after a chunk.
+
+    Rows arrive ordered by timestamp, so every row older than the chunk's
+    last timestamp has been written.  Rows sharing that last timestamp may
+    continue in the next chunk, so an intermediate chunk stops just short of
+    it and a resumed run re-reads them (the upsert is idempotent).  The
+    final chunk commits its newest timestamp.
+    """
+    stamps = [ts for ts in stamps if isinstance(ts, datetime)]
+    if not stamps:
+        return watermark
+    tail = stamps[-1]
+    for ts in stamps:
+        try:
+            if (final or ts < tail) and ts > watermark:
+                watermark = ts
+        except TypeError:  # naive timestamp column vs aware watermark
+            continue
+    return watermark
+
+
+def index_doc_type(conn, read_conn, doc_type: str, query: str, row_to_doc,
+                   chunk_size: int = INDEX_CHUNK_SIZE):
+    """Index one doc_type incrementally, streaming the source query.
+
+    Rows are read through a server-side (named) cursor on ``read_conn``,
+    ``chunk_size`` at a time, and upserted on ``conn``, which commits each
+    chunk together with its watermark: an interrupted run resumes after the
+    last committed chunk.  The cursor lives in one read-only transaction on
+    its own connection because ``conn`` commits mid-stream, which would close
+    it (and WITH HOLD cursors do not survive PgBouncer transaction pooling).
+
+    A run that starts from the epoch watermark (first run, or after
+    ``POST /search/reindex``) also records its duration and the worker's
+    peak RSS as the doc type's full-reindex stats.
+    """
     start_time = time.time()
+    id_based = doc_type in ID_BASED_TYPES
 
     with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-        # Get watermark
         cur.execute(
             "SELECT last_indexed_at, docs_count FROM search_indexer_state WHERE doc_type = %s",
             (doc_type,)
         )
         state = cur.fetchone()
-        if not state:
-            last_indexed = datetime(1970, 1, 1, tzinfo=timezone.utc)
-        else:
-            last_indexed = state["last_indexed_at"]
-
-        # snapshot_record uses id-based watermark (handled in its query)
-        if doc_type in ID_BASED_TYPES:
-            cur.execute(query)
-        else:
-            cur.execute(query, (last_indexed,))
-
-        rows = cur.fetchall()
-        if not rows:
-            return 0
-
-        # Process in batches
-        indexed = 0
-        latest_ts = last_indexed
-
-        for i in range(0, len(rows), batch_size):
-            batch = rows[i:i + batch_size]
-            values = []
-            for row in batch:
-                try:
-                    doc = row_to_doc(row)
-                    doc_ts = doc.get("ts") or datetime.now(timezone.utc)
-                    values.append((
-                        doc_type,
-                        doc.get("tenant_id"),
-                        doc.get("tenant_name", ""),
-                        doc.get("domain_id"),
-                        doc.get("domain_name", ""),
-                        doc["resource_id"],
-                        doc.get("resource_name", ""),
-                        doc["title"],
-                        doc.get("body_text", ""),
-                        doc_ts,
-                        json.dumps(doc.get("metadata", {})),
-                    ))
-                    if isinstance(doc_ts, datetime) and doc_ts > latest_ts:
-                        latest_ts = doc_ts
-                except Exception as e:
-                    log.warning("Skipping row in %s: %s", doc_type, e)
-                    continue
-
-            if values:
-                psycopg2.extras.execute_batch(cur, UPSERT_SQL, values, page_size=100)
-                indexed += len(values)
-
-        # Update watermark
-        duration_ms = int((time.time() - start_time) * 1000)
+    conn.commit()
+    watermark = state["last_indexed_at"] if state else EPOCH
+    # snapshot_record uses an id watermark stored in docs_count (read by its query)
+    last_id = int(state["docs_count"]) if state and id_based else 0
+    full = last_id == 0 if id_based else watermark <= EPOCH
 
-        if doc_type in ID_BASED_TYPES:
-            # For id-based types, store the max id processed as docs_count
-            cur.execute("""
-                UPDATE search_indexer_state
-                SET docs_count = (SELECT COALESCE(MAX(id), 0) FROM snapshot_records),
-                    last_run_at = NOW(),
-                    last_run_duration_ms = %s
-                WHERE doc_type = %s
-            """, (duration_ms, doc_type))
-        else:
+    indexed = 0
+    interrupted = False
+    try:
+        with read_conn.cursor(name=f"search_idx_{doc_type}",
+                              cursor_factory=psycopg2.extras.RealDictCursor) as src:
+            src.itersize = chunk_size
+            if id_based:
+                src.execute(query)
+            else:
+                src.execute(query, (watermark,))
+
+            rows = src.fetchmany(chunk_size)
+            while rows:
+                # Read one chunk ahead so the last chunk knows it is final.
+                next_rows = src.fetchmany(chunk_size)
+                values, stamps = _doc_values(doc_type, row_to_doc, rows)
+                with conn.cursor() as cur:
+                    if values:
+                        psycopg2.extras.execute_values(cur, UPSERT_SQL, values, page_size=len(values))
+                    if id_based:
+                        last_id = max(last_id, int(rows[-1]["id"]))
+                        cur.execute(
+                            "UPDATE search_indexer_state SET docs_count = %s WHERE doc_type = %s",
+                            (last_id, doc_type),
+                        )
+                    else:
+                        watermark = _chunk_watermark(watermark, stamps, final=not next_rows)
+                        cur.execute("""
+                            UPDATE search_indexer_state
+                            SET last_indexed_at = %s,
+                                docs_count = docs_count + %s
+                            WHERE doc_type = %s
+                        """, (watermark, len(values), doc_type))
+                conn.commit()
+                indexed += len(values)
+                rows = next_rows
+                if rows and _shutdown:
+                    log.info("  %s: stopping after %d documents (shutdown)", doc_type, indexed)
+                    interrupted = True
+                    break
+    finally:
+        read_conn.rollback()
+
+    duration_ms = int((time.time() - start_time) * 1000)
+    with conn.cursor() as cur:
+        cur.execute("""
+            UPDATE search_indexer_state
+            SET last_run_at = NOW(),
+                last_run_duration_ms = %s
+            WHERE doc_type = %s
+        """, (duration_ms, doc_type))
+        if full and not interrupted:
             cur.execute("""
                 UPDATE search_indexer_state
-                SET last_indexed_at = %s,
-                    docs_count = docs_count + %s,
-                    last_run_at = NOW(),
-                    last_run_duration_ms = %s
+                SET full_reindex_at = NOW(),
+                    full_reindex_duration_ms = %s,
+                    full_reindex_docs = %s
                 WHERE doc_type = %s
-            """, (latest_ts, indexed, duration_ms, doc_type))
-
-        conn.commit()
-        return indexed
+            """, (duration_ms, indexed, doc_type))
+    conn.commit()
+    return indexed
 
 
-def run_indexing_cycle():
-    """Run one full indexing cycle across all doc types."""
-    log.info("Starting indexing cycle")
-    total_start = time.time()
-    total_indexed = 0
-
+def _index_worker(jobs: "queue.Queue", counts: dict) -> None:
+    """Drain ``jobs`` on this thread's own writer/reader connection pair."""
     try:
         conn = get_conn_with_cb()
-        indexers = _build_indexers()
+    except Exception as e:
+        log.error("Indexing worker could not connect: %s", e)
+        return
+    try:
+        read_conn = get_conn_with_cb()
+        read_conn.set_session(readonly=True)
+    except Exception as e:
+        log.error("Indexing worker could not connect: %s", e)
+        conn.close()
+        return
 
-        for doc_type, query, row_to_doc in indexers:
+    try:
+        while not _shutdown:
+            try:
+                doc_type, query, row_to_doc = jobs.get_nowait()
+            except queue.Empty:
+                break
             try:
-                count = index_doc_type(conn, doc_type, query, row_to_doc)
+                with _telemetry.stage("index", component=doc_type):
+                    count = index_doc_type(conn, read_conn, doc_type, query, row_to_doc)
                 if count > 0:
                     log.info("  %s: indexed %d documents", doc_type, count)
-                total_indexed += count
+                counts[doc_type] = count
             except Exception as e:
                 log.error("  %s: indexing failed: %s", doc_type, e)
-                conn.rollback()
+                if not conn.closed:
+                    conn.rollback()
+    finally:
+        conn.close()
+        read_conn.close()
 
-        # Remove search docs for resources that no longer exist
-        stale_removed = cleanup_stale_documents(conn)
 
-        conn.close()
+def run_indexing_cycle():
+    """Run one full indexing cycle across all doc types.
+
+    Every doc type reads its own source tables and writes only its own
+    search_documents rows and watermark, so they are indexed in parallel by
+    ``SEARCH_INDEX_WORKERS`` threads, each with its own connections.  Stale
+    cleanup runs once all of them have finished.
+    """
+    indexers = _build_indexers()
+    n_workers = max(1, min(INDEX_WORKERS, len(indexers)))
+    log.info("Starting indexing cycle (%d workers, chunk size %d)", n_workers, INDEX_CHUNK_SIZE)
+    total_start = time.time()
+    _reset_peak_rss()
+
+    jobs: "queue.Queue" = queue.Queue()
+    for indexer in indexers:
+        jobs.put(indexer)
+    counts: dict = {}
+    workers = [
+        threading.Thread(target=_index_worker, args=(jobs, counts), name=f"indexer-{n}", daemon=True)
+        for n in range(n_workers)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    total_indexed = sum(counts.values())
+    if not jobs.empty() and not _shutdown:
+        log.error("Indexing cycle incomplete: %d doc types not indexed", jobs.qsize())
+
+    try:
+        conn = get_conn_with_cb()
+        try:
+            # Remove search docs for resources that no longer exist
+            with _telemetry.stage("cleanup"):
+                stale_removed = cleanup_stale_documents(conn)
+        finally:
+            conn.close()
     except Exception as e:
-        log.error("Indexing cycle failed: %s", e)
+        log.error("Stale cleanup failed: %s", e)
         stale_removed = 0
 
     duration = time.time() - total_start
-    log.info("Indexing cycle complete: %d indexed, %d stale removed in %.1fs",
-             total_indexed, stale_removed, duration)
+    log.info("Indexing cycle complete: %d indexed, %d stale removed in %.1fs (peak RSS %s kB)",
+             total_indexed, stale_removed, duration, _peak_rss_kb())
     return total_indexed
 
 
@@ -1399,20 +1533,19 @@ def main():
         return
 
     # Initial full index
-    run_indexing_cycle()
+    with _telemetry.cycle():
+        run_indexing_cycle()
 
     # Periodic incremental indexing
     last_run = time.time()
     while not _shutdown:
         now = time.time()
         if now - last_run >= INDEX_INTERVAL:
-            _t0 = time.time()
-            _err = False
-            try:
-                run_indexing_cycle()
-            except Exception:
-                _err = True
-            _report_worker_metrics(time.time() - _t0, _err, INDEX_INTERVAL)
+            with _telemetry.cycle():
+                try:
+                    run_indexing_cycle()
+                except Exception:
+                    _telemetry.fail()
             last_run = time.time()
         _touch_alive()  # heartbeat — liveness probe checks /tmp/alive mtime
         time.sleep(min(30, INDEX_INTERVAL))
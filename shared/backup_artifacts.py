@@ -0,0 +1,113 @@
+"""
+shared/backup_artifacts.py — On-disk layout of database backup artifacts.
+
+A database backup is either
+
+  * a single gzip-compressed SQL script (``pf9_mgmt_<stamp>.sql.gz``), whose
+    integrity hash is the SHA-256 of the file, or
+  * a pg_dump directory-format dump (``pf9_mgmt_<stamp>.dump/``) holding
+    ``toc.dat``, one compressed data file per table and a ``SHA256SUMS``
+    manifest; its integrity hash is the SHA-256 of the manifest.
+
+The backup worker writes both; the worker's retention and restore and the
+API's restore/delete routes use these helpers so they handle either layout.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import hashlib
+import os
+import shutil
+
+MANIFEST_NAME = "SHA256SUMS"
+
+_CHUNK = 1 << 20
+
+
+def is_directory_dump(path: str) -> bool:
+    return os.path.isdir(path)
+
+
+def file_sha256(path: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(_CHUNK), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def write_manifest(dump_dir: str, hashes: dict[str, str]) -> str:
+    """Write ``SHA256SUMS`` (sha256sum format) for *hashes* and return its SHA-256."""
+    body = "".join(f"{digest}  {name}\n" for name, digest in sorted(hashes.items()))
+    path = os.path.join(dump_dir, MANIFEST_NAME)
+    with open(path, "w") as fh:
+        fh.write(body)
+    os.chmod(path, 0o600)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def read_manifest(dump_dir: str) -> dict[str, str]:
+    hashes = {}
+    with open(os.path.join(dump_dir, MANIFEST_NAME)) as fh:
+        for line in fh:
+            digest, _, name = line.rstrip("\n").partition("  ")
+            if name:
+                hashes[name] = digest
+    return hashes
+
+
+def artifact_sha256(path: str) -> str:
+    """
+    Integrity hash of a backup artifact, comparable to backup_history.integrity_hash.
+
+    For a directory dump every file listed in the manifest is re-hashed
+    first; a missing or modified file raises ValueError.
+    """
+    if not is_directory_dump(path):
+        return file_sha256(path)
+    for name, digest in read_manifest(path).items():
+        member = os.path.join(path, name)
+        if not os.path.isfile(member):
+            raise ValueError(f"{name} is missing from {path}")
+        if file_sha256(member) != digest:
+            raise ValueError(f"{name} does not match {MANIFEST_NAME}")
+    return file_sha256(os.path.join(path, MANIFEST_NAME))
+
+
+def artifact_size(path: str) -> int:
+    if not is_directory_dump(path):
+        return os.path.getsize(path)
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path)
+        for name in names
+    )
+
+
+def artifact_exists(path: str) -> bool:
+    return os.path.isfile(path) or is_directory_dump(path)
+
+
+def remove_artifact(path: str, base: str) -> None:
+    """
+    Delete a backup file or directory dump under *base* (OSError propagates).
+
+    Refuses (ValueError) anything outside *base*, *base* itself, and any
+    directory other than a ``pf9_mgmt_*.dump`` holding ``toc.dat`` directly
+    under *base*, so a bad file_path cannot remove the backup tree.
+    """
+    base = os.path.abspath(base)
+    path = os.path.abspath(path)
+    if not path.startswith(base + os.sep):
+        raise ValueError(f"{path} is not inside {base}")
+    if not is_directory_dump(path):
+        os.remove(path)
+        return
+    if (
+        os.path.dirname(path) != base
+        or not fnmatch.fnmatch(os.path.basename(path), "pf9_mgmt_*.dump")
+        or not os.path.isfile(os.path.join(path, "toc.dat"))
+    ):
+        raise ValueError(f"{path} is not a directory dump")
+    shutil.rmtree(path)
@@ -67,3 +67,303 @@ def compute_security_posture_component(
             },
         },
     }
+
+
+# ---------------------------------------------------------------------------
+# Tenant health score engine
+# ---------------------------------------------------------------------------
+# Used by the scheduler worker for every project and by the API's
+# /recalculate route for one.  Each input is gathered for all requested
+# projects in one grouped statement, so a batch costs the same number of
+# queries whatever its size.
+
+DEFAULT_WEIGHTS: dict[str, int] = {
+    "snapshot_compliance": 22,
+    "quota_headroom": 18,
+    "drift": 18,
+    "sla_tier": 17,
+    "tickets": 10,
+    "security_posture": 15,
+}
+
+_SLA_TIER_SCORES = {"gold": 20, "silver": 15, "bronze": 10}
+
+_SNAPSHOTS_SQL = """
+    SELECT sr.project_id, COUNT(*)
+    FROM   snapshot_records sr
+    JOIN   snapshot_runs    ru ON ru.id = sr.snapshot_run_id
+    WHERE  sr.project_id = ANY(%s)
+      AND  sr.status     = 'success'
+      AND  ru.started_at >= NOW() - INTERVAL '7 days'
+    GROUP BY sr.project_id
+"""
+
+# Latest metering_quotas row per project, one index probe each.
+_QUOTAS_SQL = """
+    SELECT p.id, q.vcpus_used, q.vcpus_quota, q.ram_used_mb, q.ram_quota_mb
+    FROM   unnest(%s::text[]) AS p(id)
+    CROSS JOIN LATERAL (
+        SELECT vcpus_used, vcpus_quota, ram_used_mb, ram_quota_mb
+        FROM   metering_quotas
+        WHERE  project_id = p.id
+        ORDER BY collected_at DESC
+        LIMIT 1
+    ) q
+"""
+
+_DRIFT_SQL = """
+    SELECT project_id, COUNT(*)
+    FROM   drift_events
+    WHERE  project_id = ANY(%s)
+      AND  detected_at >= NOW() - INTERVAL '30 days'
+    GROUP BY project_id
+"""
+
+_SLA_SQL = """
+    SELECT DISTINCT ON (tenant_id) tenant_id, tier
+    FROM   sla_commitments
+    WHERE  tenant_id = ANY(%s)
+      AND  effective_to IS NULL
+    ORDER BY tenant_id, effective_from DESC
+"""
+
+_TICKETS_SQL = """
+    SELECT project_id, priority, COUNT(*)
+    FROM   support_tickets
+    WHERE  project_id = ANY(%s)
+      AND  status NOT IN ('closed', 'resolved')
+    GROUP BY project_id, priority
+"""
+
+_MFA_SQL = """
+    SELECT
+        ra.project_id,
+        COUNT(DISTINCT u.id) AS total_users,
+        COUNT(DISTINCT u.id) FILTER (WHERE um.is_enabled IS TRUE) AS mfa_enabled_users
+    FROM role_assignments ra
+    JOIN users u ON u.id = ra.user_id
+    LEFT JOIN user_mfa um ON um.username = u.name
+    WHERE ra.project_id = ANY(%s)
+      AND ra.user_id IS NOT NULL
+    GROUP BY ra.project_id
+"""
+
+# VMs reachable on SSH/RDP from anywhere through a security group on one of their ports.
+_EXPOSED_SQL = """
+    SELECT s.project_id, COUNT(DISTINCT s.id) AS exposed_vm_count
+    FROM servers s
+    JOIN ports p ON p.device_id = s.id
+    JOIN security_group_rules sgr
+      ON p.raw_json::jsonb->'security_groups' ? sgr.security_group_id
+    WHERE s.project_id = ANY(%s)
+      AND sgr.direction = 'ingress'
+      AND COALESCE(sgr.remote_ip_prefix, '0.0.0.0/0') IN ('0.0.0.0/0', '::/0')
+      AND (
+            sgr.protocol IS NULL OR LOWER(sgr.protocol) = 'tcp'
+          )
+      AND (
+            (COALESCE(sgr.port_range_min, 22) <= 22 AND COALESCE(sgr.port_range_max, 22) >= 22)
+            OR
+            (COALESCE(sgr.port_range_min, 3389) <= 3389 AND COALESCE(sgr.port_range_max, 3389) >= 3389)
+          )
+    GROUP BY s.project_id
+"""
+
+_IMAGES_SQL = """
+    SELECT
+        s.project_id,
+        COUNT(*) AS total_vm_count,
+        COUNT(*) FILTER (
+            WHERE COALESCE(i.updated_at, i.created_at) < NOW() - INTERVAL '180 days'
+        ) AS stale_vm_count
+    FROM servers s
+    LEFT JOIN images i ON i.id = s.image_id
+    WHERE s.project_id = ANY(%s)
+    GROUP BY s.project_id
+"""
+
+
+def load_health_score_weights(conn) -> dict[str, int]:
+    """Component weights from system_settings (falls back to DEFAULT_WEIGHTS)."""
+    weights = dict(DEFAULT_WEIGHTS)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT key, value FROM system_settings WHERE key LIKE 'health_score.weight.%'"
+            )
+            rows = cur.fetchall()
+    except Exception:
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        return weights  # always fall back to defaults
+    for row in rows:
+        key, value = (row["key"], row["value"]) if isinstance(row, dict) else row
+        component = key.replace("health_score.weight.", "")
+        if component in weights:
+            try:
+                weights[component] = max(0, int(value))
+            except (ValueError, TypeError):
+                pass
+    return weights
+
+
+def scale_component(raw_score: int, default_max: int, configured_weight: int) -> int:
+    """Scale a component's raw score proportionally to its configured weight."""
+    if default_max == 0:
+        return 0
+    return round(raw_score / default_max * configured_weight)
+
+
+def gather_health_inputs(conn, project_ids: list[str]) -> dict[str, dict[str, Any]]:
+    """
+    Fetch every health score input for *project_ids*, one grouped query per
+    input.  Projects without rows for an input get the empty value.
+    """
+    inputs: dict[str, dict[str, Any]] = {
+        pid: {
+            "snapshot_successes": 0,
+            "quota": None,
+            "drift_events": 0,
+            "sla_tier": None,
+            "open_tickets": {},
+            "mfa_total_users": 0,
+            "mfa_enabled_users": 0,
+            "exposed_vm_count": 0,
+            "total_vm_count": 0,
+            "stale_vm_count": 0,
+        }
+        for pid in project_ids
+    }
+    if not inputs:
+        return inputs
+    ids = list(inputs)
+
+    with conn.cursor() as cur:
+
+        def rows(sql: str) -> list:
+            cur.execute(sql, (ids,))
+            return [tuple(r.values()) if isinstance(r, dict) else r for r in cur.fetchall()]
+
+        for pid, cnt in rows(_SNAPSHOTS_SQL):
+            inputs[pid]["snapshot_successes"] = int(cnt or 0)
+        for pid, vcpus_used, vcpus_quota, ram_used_mb, ram_quota_mb in rows(_QUOTAS_SQL):
+            inputs[pid]["quota"] = (vcpus_used, vcpus_quota, ram_used_mb, ram_quota_mb)
+        for pid, cnt in rows(_DRIFT_SQL):
+            inputs[pid]["drift_events"] = int(cnt or 0)
+        for pid, tier in rows(_SLA_SQL):
+            inputs[pid]["sla_tier"] = tier
+        for pid, priority, cnt in rows(_TICKETS_SQL):
+            inputs[pid]["open_tickets"][priority] = int(cnt)
+        for pid, total_users, mfa_enabled in rows(_MFA_SQL):
+            inputs[pid]["mfa_total_users"] = total_users or 0
+            inputs[pid]["mfa_enabled_users"] = mfa_enabled or 0
+        for pid, exposed in rows(_EXPOSED_SQL):
+            inputs[pid]["exposed_vm_count"] = exposed or 0
+        for pid, total_vms, stale_vms in rows(_IMAGES_SQL):
+            inputs[pid]["total_vm_count"] = total_vms or 0
+            inputs[pid]["stale_vm_count"] = stale_vms or 0
+    return inputs
+
+
+def score_tenant(inputs: dict[str, Any], weights: dict[str, int] | None = None) -> dict[str, Any]:
+    """
+    Score one project from its gather_health_inputs() entry.
+
+    Returns the weighted component scores, their sum as ``score`` and the
+    per-component ``details`` stored in tenant_health_scores.
+    """
+    if weights is None:
+        weights = DEFAULT_WEIGHTS
+    scores: dict[str, int] = {}
+    details: dict[str, Any] = {}
+
+    # 1. Snapshot compliance (0-25)
+    snap_cnt = inputs["snapshot_successes"]
+    scores["snapshot_compliance"] = 25 if snap_cnt > 0 else 0
+    details["snapshot_compliance"] = {"recent_successes": snap_cnt, "window_days": 7}
+
+    # 2. Quota headroom (0-20)
+    quota = inputs["quota"]
+    if quota and quota[1] and quota[3]:
+        cpu_pct = (quota[0] or 0) / quota[1] * 100
+        ram_pct = (quota[2] or 0) / quota[3] * 100
+        max_pct = max(cpu_pct, ram_pct)
+        if max_pct < 60:
+            scores["quota_headroom"] = 20
+        elif max_pct < 80:
+            scores["quota_headroom"] = 15
+        elif max_pct < 90:
+            scores["quota_headroom"] = 8
+        else:
+            scores["quota_headroom"] = 0
+        details["quota_headroom"] = {
+            "cpu_utilization_pct": round(cpu_pct, 1),
+            "ram_utilization_pct": round(ram_pct, 1),
+        }
+    else:
+        scores["quota_headroom"] = 10  # no data → neutral score
+        details["quota_headroom"] = {"note": "no_quota_data"}
+
+    # 3. Drift (0-20)
+    drift_cnt = inputs["drift_events"]
+    if drift_cnt == 0:
+        scores["drift"] = 20
+    elif drift_cnt <= 2:
+        scores["drift"] = 15
+    elif drift_cnt <= 5:
+        scores["drift"] = 8
+    else:
+        scores["drift"] = 0
+    details["drift"] = {"events_30d": drift_cnt}
+
+    # 4. SLA tier (0-20)
+    tier = inputs["sla_tier"]
+    scores["sla_tier"] = _SLA_TIER_SCORES.get((tier or "").lower(), 5)
+    details["sla_tier"] = {"tier": tier or "none"}
+
+    # 5. Tickets (0-15)
+    open_tickets = dict(inputs["open_tickets"])
+    total_open = sum(open_tickets.values())
+    if total_open == 0:
+        scores["tickets"] = 15
+    elif open_tickets.get("critical", 0) > 0 or open_tickets.get("high", 0) > 0:
+        scores["tickets"] = 0
+    elif total_open <= 2:
+        scores["tickets"] = 8
+    else:
+        scores["tickets"] = 4
+    details["tickets"] = {"open_by_priority": open_tickets}
+
+    # 6. Security posture (0-15)
+    security = compute_security_posture_component(
+        mfa_enabled_users=inputs["mfa_enabled_users"],
+        mfa_total_users=inputs["mfa_total_users"],
+        exposed_vm_count=inputs["exposed_vm_count"],
+        stale_vm_count=inputs["stale_vm_count"],
+        total_vm_count=inputs["total_vm_count"],
+    )
+    scores["security_posture"] = security["score"]
+    details["security_posture"] = security["details"]
+
+    # Apply configured weights (scale proportionally to each component's default max)
+    result: dict[str, Any] = {
+        name: scale_component(scores[name], DEFAULT_WEIGHTS[name], weights[name])
+        for name in DEFAULT_WEIGHTS
+    }
+    result["score"] = sum(result.values())
+    result["details"] = details
+    return result
+
+
+def compute_tenant_health_scores(
+    conn, project_ids: list[str], weights: dict[str, int] | None = None,
+) -> dict[str, dict[str, Any]]:
+    """Score every project in *project_ids*: {project_id: score_tenant() result}."""
+    if weights is None:
+        weights = load_health_score_weights(conn)
+    return {
+        pid: score_tenant(inputs, weights)
+        for pid, inputs in gather_health_inputs(conn, project_ids).items()
+    }
@@ -0,0 +1,341 @@
+"""
+Single-pass parser for the Prometheus text exposition format, limited to the
+node_exporter and libvirt exporter families pf9-mngt consumes.
+
+``host_metrics_collector.py`` and ``monitoring/prometheus_client.py`` used to
+split each payload into lines and re-scan every line with ``str.find`` for
+every label they needed, in two passes for libvirt.  Dense hypervisors return
+multi-MB libvirt payloads every minute, so this module instead:
+
+  * compiles one regex per exporter that only matches sample lines of the
+    wanted families — comments, ``# HELP``/``# TYPE`` and every other family
+    are skipped inside the regex engine without creating Python objects;
+  * reads only the label a family needs (domain, mode, device, …); the full
+    block is parsed, escapes included, only for ``libvirt_domain_info_meta``;
+  * folds samples straight into compact ``__slots__`` records.
+
+The records hold raw exporter values (bytes, seconds); unit conversion and
+CPU deltas stay with the callers, which have different output models.
+"""
+
+import os
+import re
+from typing import Dict, Iterable, Iterator, List, Match, NamedTuple, Optional, Tuple
+
+# NIC prefixes excluded when summing host network throughput: loopback,
+# bridges, tap/veth devices, Docker/OVS internals and overlay tunnels.
+EXCLUDED_NIC_PREFIXES = (
+    'lo', 'virbr', 'tap', 'vnet', 'veth', 'br-', 'docker',
+    'ovs', 'dummy', 'tunl', 'tun', 'sit', 'gre', 'flannel',
+    'cali', 'cilium', 'weave',
+)
+
+_LABEL_RE = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="([^"\\]*(?:\\.[^"\\]*)*)"')
+_ESCAPES = {'\\\\': '\\', '\\"': '"', '\\n': '\n'}
+_ESCAPE_RE = re.compile(r'\\[\\"n]')
+
+
+class Sample(NamedTuple):
+    name: str
+    labels: Dict[str, str]
+    value: float
+
+
+class FamilyPattern:
+    """Sample-line matcher for a fixed set of metric families.
+
+    The regex is anchored on the newline *before* a line rather than on
+    ``^`` with MULTILINE: a pattern that starts with a literal lets the
+    regex engine jump between candidate positions instead of testing every
+    character, which is most of the cost on large payloads.  The first line
+    has no preceding newline and is matched separately.
+    """
+
+    __slots__ = ("_head", "_body")
+
+    def __init__(self, regex: str) -> None:
+        self._head = re.compile(regex)
+        self._body = re.compile('\n' + regex)
+
+    def finditer(self, text: str) -> Iterator[Match]:
+        head = self._head.match(text)
+        if head is not None:
+            yield head
+        yield from self._body.finditer(text)
+
+    def findall(self, text: str) -> List[Tuple[str, ...]]:
+        """Groups of every match (two or more groups), collected in C."""
+        head = self._head.match(text)
+        found = self._body.findall(text)
+        if head is not None:
+            found.insert(0, head.groups())
+        return found
+
+
+def _family_alternation(families: Iterable[str]) -> str:
+    """``prefix(?:suffix|…)`` with the families' common prefix as a literal."""
+    families = sorted(set(families), key=len, reverse=True)
+    prefix = os.path.commonprefix(families)
+    return '%s(?:%s)' % (re.escape(prefix), '|'.join(re.escape(f[len(prefix):]) for f in families))
+
+
+def compile_families(families: Iterable[str]) -> FamilyPattern:
+    """Matcher for sample lines of ``families`` only.
+
+    Groups: metric name, raw label block (None without labels), value.
+    """
+    return FamilyPattern(r'(%s)(?:\{([^\n]*)\})?[ \t]+(\S+)' % _family_alternation(families))
+
+
+def parse_labels(raw: Optional[str]) -> Dict[str, str]:
+    """``a="1",b="x\\"y"`` → ``{"a": "1", "b": 'x"y'}``."""
+    if not raw:
+        return {}
+    labels = dict(_LABEL_RE.findall(raw))
+    if '\\' in raw:
+        for key, value in labels.items():
+            if '\\' in value:
+                labels[key] = _ESCAPE_RE.sub(lambda m: _ESCAPES[m.group()], value)
+    return labels
+
+
+def label_value(raw: Optional[str], key: str) -> Optional[str]:
+    """Value of one label from a raw label block, without parsing the rest.
+
+    Quotes inside values are escaped, so an unescaped ``key="`` after ``,``
+    starts a label — unless a value itself ends in ``,key=``, which no
+    exporter we scrape emits.  Values containing escapes fall back to
+    ``parse_labels``.
+    """
+    if not raw:
+        return None
+    needle = key + '="'
+    idx = raw.find(needle)
+    while idx > 0 and raw[idx - 1] not in ', ':
+        idx = raw.find(needle, idx + 1)
+    if idx < 0:
+        return None
+    start = idx + len(needle)
+    end = raw.find('"', start)
+    value = raw[start:end]
+    if end < 0 or '\\' in value:
+        return parse_labels(raw).get(key)
+    return value
+
+
+def iter_samples(text: str, pattern: FamilyPattern) -> Iterator[Sample]:
+    """Samples of the families ``pattern`` was compiled for, in payload order.
+
+    Lines whose value is not a float are skipped.
+    """
+    for match in pattern.finditer(text):
+        name, raw, value = match.groups()
+        try:
+            yield Sample(name, parse_labels(raw), float(value))
+        except ValueError:
+            continue
+
+
+def is_physical_nic(device: Optional[str]) -> bool:
+    return bool(device) and not device.startswith(EXCLUDED_NIC_PREFIXES)
+
+
+# ── node_exporter ─────────────────────────────────────────────────────────
+
+class NodeSample:
+    """Aggregated node_exporter values of one scrape (raw units).
+
+    ``mem_*`` and ``root_fs_*`` are None when the exporter did not report
+    them; the network counters only include physical NICs.
+    """
+
+    __slots__ = (
+        "cpu_mode_seconds", "mem_total_bytes", "mem_available_bytes",
+        "root_fs_size_bytes", "root_fs_avail_bytes",
+        "network_rx_bytes", "network_tx_bytes",
+    )
+
+    def __init__(self) -> None:
+        self.cpu_mode_seconds: Dict[str, float] = {}
+        self.mem_total_bytes: Optional[float] = None
+        self.mem_available_bytes: Optional[float] = None
+        self.root_fs_size_bytes: Optional[float] = None
+        self.root_fs_avail_bytes: Optional[float] = None
+        self.network_rx_bytes = 0.0
+        self.network_tx_bytes = 0.0
+
+    @property
+    def cpu_total_seconds(self) -> float:
+        return sum(self.cpu_mode_seconds.values())
+
+    @property
+    def cpu_idle_seconds(self) -> float:
+        return self.cpu_mode_seconds.get('idle', 0.0)
+
+
+_NODE_FAMILIES = (
+    'node_cpu_seconds_total',
+    'node_memory_MemTotal_bytes',
+    'node_memory_MemAvailable_bytes',
+    'node_filesystem_size_bytes',
+    'node_filesystem_avail_bytes',
+    'node_network_receive_bytes_total',
+    'node_network_transmit_bytes_total',
+)
+# node_cpu_seconds_total is one line per CPU and mode — most of a large
+# host's payload.  Lines with the exporter's own ``{cpu="N",mode="…"}``
+# label block are collected as (mode, value) pairs by one findall; _NODE_RE
+# skips them and handles every other line of the families.
+_NODE_CPU_LINE = r'node_cpu_seconds_total\{cpu="[^"\\\n]*",mode="([^"\\\n]*)"\}[ \t]+(\S+)'
+_NODE_CPU_RE = FamilyPattern(_NODE_CPU_LINE)
+_NODE_RE = FamilyPattern(
+    r'(?!node_cpu_seconds_total\{cpu="[^"\\\n]*",mode="[^"\\\n]*"\}[ \t])'
+    r'(%s)(?:\{([^\n]*)\})?[ \t]+(\S+)' % _family_alternation(_NODE_FAMILIES)
+)
+
+
+def parse_node_exporter(text: str) -> NodeSample:
+    """Fold a node_exporter payload into a NodeSample."""
+    node = NodeSample()
+    cpu = node.cpu_mode_seconds
+    for mode, value in _NODE_CPU_RE.findall(text):
+        try:
+            cpu[mode] = cpu.get(mode, 0.0) + float(value)
+        except ValueError:
+            continue
+    for match in _NODE_RE.finditer(text):
+        name, raw, value = match.groups()
+        try:
+            value = float(value)
+        except ValueError:
+            continue
+        if name == 'node_cpu_seconds_total':
+            mode = label_value(raw, 'mode') or ''
+            cpu[mode] = cpu.get(mode, 0.0) + value
+        elif name == 'node_network_receive_bytes_total':
+            if is_physical_nic(label_value(raw, 'device')):
+                node.network_rx_bytes += value
+        elif name == 'node_network_transmit_bytes_total':
+            if is_physical_nic(label_value(raw, 'device')):
+                node.network_tx_bytes += value
+        elif name == 'node_memory_MemTotal_bytes':
+            node.mem_total_bytes = value
+        elif name == 'node_memory_MemAvailable_bytes':
+            node.mem_available_bytes = value
+        elif label_value(raw, 'mountpoint') == '/':
+            if name == 'node_filesystem_size_bytes':
+                node.root_fs_size_bytes = value
+            else:
+                node.root_fs_avail_bytes = value
+    return node
+
+
+# ── libvirt exporter ──────────────────────────────────────────────────────
+
+class DomainSample:
+    """Aggregated libvirt exporter values of one domain (raw units).
+
+    ``meta`` holds the labels of ``libvirt_domain_info_meta`` (instance_name,
+    project_name, user_name, flavor, …); ``block_*`` map target_device →
+    bytes.  ``memory_used_percent`` is None when the exporter lacks
+    ``libvirt_domain_memory_stats_used_percent`` for the domain.
+    """
+
+    __slots__ = (
+        "domain", "meta", "active", "vcpu_time_seconds", "vcpu_count",
+        "cpu_time_seconds", "memory_usage_bytes", "memory_max_bytes",
+        "memory_used_percent", "network_rx_bytes", "network_tx_bytes",
+        "block_read_bytes", "block_write_bytes",
+        "block_capacity", "block_allocation", "block_physical",
+    )
+
+    def __init__(self, domain: str) -> None:
+        self.domain = domain
+        self.meta: Dict[str, str] = {}
+        self.active = False
+        self.vcpu_time_seconds = 0.0
+        self.vcpu_count: Optional[int] = None
+        self.cpu_time_seconds: Optional[float] = None
+        self.memory_usage_bytes: Optional[float] = None
+        self.memory_max_bytes: Optional[float] = None
+        self.memory_used_percent: Optional[float] = None
+        self.network_rx_bytes = 0.0
+        self.network_tx_bytes = 0.0
+        self.block_read_bytes = 0.0
+        self.block_write_bytes = 0.0
+        self.block_capacity: Dict[str, float] = {}
+        self.block_allocation: Dict[str, float] = {}
+        self.block_physical: Dict[str, float] = {}
+
+    @property
+    def cpu_seconds(self) -> float:
+        """Per-vCPU time summed; whole-domain CPU time when that is missing."""
+        return self.vcpu_time_seconds or self.cpu_time_seconds or 0.0
+
+
+# family → (kind, DomainSample attribute)
+_LIBVIRT_FIELDS = {
+    'libvirt_domain_vcpu_time_seconds_total': ('sum', 'vcpu_time_seconds'),
+    'libvirt_domain_interface_stats_receive_bytes_total': ('sum', 'network_rx_bytes'),
+    'libvirt_domain_interface_stats_transmit_bytes_total': ('sum', 'network_tx_bytes'),
+    'libvirt_domain_block_stats_read_bytes_total': ('sum', 'block_read_bytes'),
+    'libvirt_domain_block_stats_write_bytes_total': ('sum', 'block_write_bytes'),
+    'libvirt_domain_info_cpu_time_seconds_total': ('set', 'cpu_time_seconds'),
+    'libvirt_domain_info_memory_usage_bytes': ('set', 'memory_usage_bytes'),
+    'libvirt_domain_info_maximum_memory_bytes': ('set', 'memory_max_bytes'),
+    'libvirt_domain_memory_stats_used_percent': ('set', 'memory_used_percent'),
+    'libvirt_domain_block_stats_capacity_bytes': ('device', 'block_capacity'),
+    'libvirt_domain_block_stats_allocation': ('device', 'block_allocation'),
+    'libvirt_domain_block_stats_physicalsize_bytes': ('device', 'block_physical'),
+    'libvirt_domain_info_virtual_cpus': ('vcpus', None),
+    'libvirt_domain_info_meta': ('meta', None),
+}
+# Like compile_families(), but libvirt exporter puts ``domain`` first in every
+# label block, so it is captured directly (group 2) when it has no escapes.
+_LIBVIRT_RE = FamilyPattern(
+    r'(%s)\{(?:domain="([^"\\\n]*)"(?=[,}]))?([^\n]*)\}[ \t]+(\S+)'
+    % _family_alternation(_LIBVIRT_FIELDS)
+)
+
+
+def parse_libvirt_exporter(text: str, active_only: bool = True) -> Dict[str, DomainSample]:
+    """Fold a libvirt exporter payload into ``{domain: DomainSample}``.
+
+    Families are emitted in alphabetical order, so block stats arrive before
+    ``libvirt_domain_info_meta``; samples are accumulated for every domain and
+    inactive ones (meta value != 1, or no meta at all) are dropped at the end
+    unless ``active_only`` is False.  Dict order follows the meta lines.
+    """
+    domains: Dict[str, DomainSample] = {}
+    order = []
+    for match in _LIBVIRT_RE.finditer(text):
+        name, domain, rest, value = match.groups()
+        try:
+            value = float(value)
+        except ValueError:
+            continue
+        if domain is None:
+            domain = label_value(rest, 'domain')
+            if not domain:
+                continue
+        dom = domains.get(domain)
+        if dom is None:
+            dom = domains[domain] = DomainSample(domain)
+
+        kind, field = _LIBVIRT_FIELDS[name]
+        if kind == 'sum':
+            setattr(dom, field, getattr(dom, field) + value)
+        elif kind == 'set':
+            setattr(dom, field, value)
+        elif kind == 'device':
+            getattr(dom, field)[label_value(rest, 'target_device') or 'unknown'] = value
+        elif kind == 'vcpus':
+            dom.vcpu_count = int(value)
+        else:
+            dom.meta = parse_labels(text[match.end(1) + 1:match.end(3)])
+            dom.active = value == 1
+            order.append(domain)
+
+    if not active_only:
+        return domains
+    return {d: domains[d] for d in dict.fromkeys(order) if domains[d].active}
@@ -0,0 +1,384 @@
+"""
+shared/worker_telemetry.py — Per-cycle instrumentation for the background workers.
+
+Every worker used to carry its own ``_report_worker_metrics``, which opened
+a new Redis client each cycle and stored only run/error counts and the last
+duration, and ``GET /worker-metrics`` found the workers with
+``KEYS pf9:worker:*``.  This module replaces those copies:
+
+  * stage timers with histograms, optionally broken down by component
+    (engine, collector, doc type, …);
+  * DB statements executed per cycle, counted by the psycopg2
+    ``connection_factory`` below;
+  * queue lag gauges (age of the oldest pending job/event);
+  * one Redis client per process, one pipelined write per cycle, and a
+    ``pf9:workers`` set the API reads instead of scanning keys.
+
+Usage:
+    from shared.worker_telemetry import WorkerTelemetry
+
+    telemetry = WorkerTelemetry("sla_worker", frequency_s=POLL_INTERVAL)
+    conn = psycopg2.connect(..., connection_factory=telemetry.connection_factory)
+
+    with telemetry.cycle():
+        with telemetry.stage("compute_month"):
+            ...
+        for engine in engines:
+            with telemetry.stage("engine", component=engine.__name__):
+                ...
+        telemetry.set_lag("restore_jobs", oldest_pending_age_s)
+
+Redis layout (all written by ``cycle()`` on exit):
+    pf9:workers                  SET of worker names
+    pf9:worker:<name>            HASH runs/errors/last run (the original fields)
+                                 plus db_queries_total / db_queries_last_cycle
+    pf9:worker:<name>:hist       HASH histogram counters "<metric>|<stage>|<component>|<le>"
+    pf9:worker:<name>:gauges     HASH "lag|<queue>" → seconds
+
+``render_prometheus`` turns that back into the text exposition format.
+"""
+
+import bisect
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import psycopg2.extensions as _pg_ext
+except ImportError:  # the API renders metrics without needing psycopg2 here
+    _pg_ext = None
+
+log = logging.getLogger(__name__)
+
+REGISTRY_KEY = "pf9:workers"
+KEY_PREFIX = "pf9:worker:"
+
+# Seconds.  Workers range from sub-second polls to hour-long backups.
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600,
+)
+
+_CYCLE = "cycle"
+_STAGE = "stage"
+
+
+# ---------------------------------------------------------------------------
+# DB statement counting
+# ---------------------------------------------------------------------------
+
+_query_lock = threading.Lock()
+_queries_total = 0
+
+
+def _count_query(n: int = 1) -> None:
+    global _queries_total
+    with _query_lock:
+        _queries_total += n
+
+
+def queries_total() -> int:
+    """Statements executed through counting connections in this process."""
+    return _queries_total
+
+
+if isinstance(getattr(_pg_ext, "connection", None), type):
+    _counting_cursors: Dict[type, type] = {}
+
+    def _counting_cursor(base: type) -> type:
+        """A subclass of cursor class ``base`` whose execute methods are counted."""
+        cls = _counting_cursors.get(base)
+        if cls is None:
+            def execute(self, query, vars=None):
+                _count_query()
+                return base.execute(self, query, vars)
+
+            def executemany(self, query, vars_list):
+                _count_query()
+                return base.executemany(self, query, vars_list)
+
+            def callproc(self, procname, parameters=None):
+                _count_query()
+                return base.callproc(self, procname, parameters)
+
+            cls = type(f"Counting{base.__name__}", (base,), {
+                "execute": execute, "executemany": executemany, "callproc": callproc,
+            })
+            _counting_cursors[base] = cls
+        return cls
+
+    class CountingConnection(_pg_ext.connection):
+        """psycopg2 connection whose cursors (any cursor_factory) count statements."""
+
+        def cursor(self, *args, **kwargs):
+            if len(args) > 1:  # cursor(name, cursor_factory, ...)
+                kwargs["cursor_factory"], args = args[1], args[:1] + args[2:]
+            factory = kwargs.get("cursor_factory") or self.cursor_factory or _pg_ext.cursor
+            kwargs["cursor_factory"] = _counting_cursor(factory)
+            return super().cursor(*args, **kwargs)
+else:
+    CountingConnection = None
+
+
+# ---------------------------------------------------------------------------
+# Per-cycle recording
+# ---------------------------------------------------------------------------
+
+def _clean(value: Optional[str]) -> str:
+    return (value or "").replace("|", "_")
+
+
+class _CycleRecord:
+    """Observations gathered during one cycle; thread-safe for worker pools."""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.hist: Dict[str, float] = {}
+        self.lags: Dict[str, float] = {}
+        self.had_error = False
+
+    def observe(self, metric: str, stage: str, component: str, seconds: float) -> None:
+        prefix = f"{metric}|{_clean(stage)}|{_clean(component)}|"
+        first = bisect.bisect_left(self.buckets, seconds)
+        with self.lock:
+            # Every bucket is written (0 below the value) so each series is complete
+            for i, le in enumerate(self.buckets):
+                self.hist[f"{prefix}{le:g}"] = self.hist.get(f"{prefix}{le:g}", 0) + (i >= first)
+            self.hist[f"{prefix}+Inf"] = self.hist.get(f"{prefix}+Inf", 0) + 1
+            self.hist[f"{prefix}sum"] = self.hist.get(f"{prefix}sum", 0.0) + seconds
+
+    def merge(self, other: "_CycleRecord") -> None:
+        with other.lock:
+            hist, lags = dict(other.hist), dict(other.lags)
+        with self.lock:
+            for field, value in hist.items():
+                self.hist[field] = self.hist.get(field, 0) + value
+            for queue, value in lags.items():
+                self.lags.setdefault(queue, value)
+
+
+class WorkerTelemetry:
+    """
+    Instrumentation for one worker process.  ``redis_factory`` returns a
+    Redis client (default: REDIS_HOST / REDIS_PORT / REDIS_PASSWORD); it is
+    called once and the client reused.  Publishing never raises — a worker
+    must not fail a cycle because Redis is down.
+    """
+
+    def __init__(self, worker: str, frequency_s: float,
+                 redis_factory: Optional[Callable[[], Any]] = None,
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.worker = worker
+        self.frequency_s = frequency_s
+        self.buckets = tuple(sorted(buckets))
+        self._redis_factory = redis_factory or _default_redis
+        self._redis = None
+        self._redis_lock = threading.Lock()
+        self._current: Optional[_CycleRecord] = None
+        # Stages timed while no cycle is open (async workers whose loops run
+        # independently of the heartbeat cycle) are published with the next one.
+        self._pending = _CycleRecord(self.buckets)
+        self.connection_factory = CountingConnection
+
+    # -- recording ----------------------------------------------------------
+
+    @contextmanager
+    def cycle(self, frequency_s: Optional[float] = None) -> Iterator[_CycleRecord]:
+        """Time one loop iteration; publish on exit.  An exception marks it failed."""
+        record = _CycleRecord(self.buckets)
+        self._current = record
+        queries_before = _queries_total
+        started = time.monotonic()
+        try:
+            yield record
+        except BaseException:
+            record.had_error = True
+            raise
+        finally:
+            duration = time.monotonic() - started
+            record.observe(_CYCLE, "", "", duration)
+            self._current = None
+            pending, self._pending = self._pending, _CycleRecord(self.buckets)
+            record.merge(pending)
+            self._publish(record, duration, _queries_total - queries_before,
+                          self.frequency_s if frequency_s is None else frequency_s)
+
+    def fail(self) -> None:
+        """Mark the current cycle failed without raising (errors handled in-loop)."""
+        if self._current is not None:
+            self._current.had_error = True
+
+    @contextmanager
+    def stage(self, name: str, component: Optional[str] = None) -> Iterator[None]:
+        """Time a stage of the current cycle (or of the next one, outside a cycle)."""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(name, time.monotonic() - started, component)
+
+    def observe(self, name: str, seconds: float, component: Optional[str] = None) -> None:
+        """Record a stage duration measured elsewhere."""
+        (self._current or self._pending).observe(_STAGE, name, component or "", seconds)
+
+    def set_lag(self, queue: str, seconds: Optional[float]) -> None:
+        """Age in seconds of the oldest item waiting in ``queue`` (0 when empty)."""
+        record = self._current or self._pending
+        with record.lock:
+            record.lags[_clean(queue)] = max(0.0, float(seconds or 0.0))
+
+    # -- publishing ---------------------------------------------------------
+
+    def _client(self):
+        with self._redis_lock:
+            if self._redis is None:
+                self._redis = self._redis_factory()
+            return self._redis
+
+    def _publish(self, record: _CycleRecord, duration: float, queries: int,
+                 frequency_s: float) -> None:
+        key = f"{KEY_PREFIX}{self.worker}"
+        try:
+            client = self._client()
+            pipe = client.pipeline(transaction=False)
+            pipe.sadd(REGISTRY_KEY, self.worker)
+            pipe.hincrby(key, "runs_total", 1)
+            pipe.hincrby(key, "errors_total", 1 if record.had_error else 0)
+            pipe.hincrby(key, "db_queries_total", queries)
+            pipe.hset(key, mapping={
+                "last_run_ts":           time.time(),
+                "last_run_duration_s":   round(duration, 3),
+                "frequency_s":           frequency_s,
+                "db_queries_last_cycle": queries,
+                "label":                 self.worker,
+            })
+            for field, value in record.hist.items():
+                if field.endswith("|sum"):
+                    pipe.hincrbyfloat(f"{key}:hist", field, value)
+                else:
+                    pipe.hincrby(f"{key}:hist", field, int(value))
+            if record.lags:
+                pipe.hset(f"{key}:gauges", mapping={f"lag|{q}": v for q, v in record.lags.items()})
+            pipe.execute()
+        except Exception as exc:
+            log.debug("Worker telemetry for %s not published: %s", self.worker, exc)
+            with self._redis_lock:
+                self._redis = None  # rebuilt on the next cycle
+
+
+def _default_redis():
+    import redis
+    return redis.Redis(
+        host=os.getenv("REDIS_HOST", "redis"),
+        port=int(os.getenv("REDIS_PORT", "6379")),
+        password=os.getenv("REDIS_PASSWORD") or None,
+        socket_connect_timeout=2,
+        socket_timeout=2,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Prometheus exposition
+# ---------------------------------------------------------------------------
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items() if v != "")
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+def _le_key(le: str) -> float:
+    return float("inf") if le == "+Inf" else float(le)
+
+
+# Metric families in output order: (type, help).  The first four are the
+# original /worker-metrics families and are always emitted.
+_FAMILIES = {
+    "worker_runs_total": ("counter", "Total number of completed worker loop iterations"),
+    "worker_errors_total": ("counter", "Total number of worker loop iterations with errors"),
+    "worker_up": ("gauge", "1 if worker ran recently, 0 if stale or never run"),
+    "worker_last_run_duration_seconds": ("gauge", "Duration of last worker loop iteration"),
+    "worker_db_queries_total": ("counter", "SQL statements executed by the worker"),
+    "worker_db_queries_last_cycle": ("gauge", "SQL statements executed in the last loop iteration"),
+    "worker_cycle_duration_seconds": ("histogram", "Duration of worker loop iterations"),
+    "worker_stage_duration_seconds": ("histogram", "Duration of named stages within a worker loop iteration"),
+    "worker_queue_lag_seconds": ("gauge", "Age of the oldest item waiting in a worker queue"),
+}
+_ALWAYS = ("worker_runs_total", "worker_errors_total", "worker_up", "worker_last_run_duration_seconds")
+
+
+def render_prometheus(client, now: Optional[float] = None) -> str:
+    """
+    Prometheus text for every worker in ``pf9:workers``.  A worker is
+    ``worker_up 0`` once it has not finished a cycle for 2× its frequency.
+    With ``client=None`` (Redis unavailable) only the empty families are emitted.
+    """
+    now = time.time() if now is None else now
+    workers = sorted(_text(w) for w in client.smembers(REGISTRY_KEY)) if client is not None else []
+    results: List[Dict] = []
+    if workers:
+        pipe = client.pipeline(transaction=False)
+        for name in workers:
+            key = f"{KEY_PREFIX}{name}"
+            pipe.hgetall(key)
+            pipe.hgetall(f"{key}:hist")
+            pipe.hgetall(f"{key}:gauges")
+        results = pipe.execute()
+
+    samples: Dict[str, List[str]] = {metric: [] for metric in _FAMILIES}
+    for i, name in enumerate(workers):
+        main, hist, gauges = ({_text(k): _text(v) for k, v in h.items()}
+                              for h in results[3 * i:3 * i + 3])
+        if not main:
+            continue
+        worker = _labels(worker=name)
+        last_ts = float(main.get("last_run_ts") or 0)
+        freq = float(main.get("frequency_s") or 60)
+        up = 1 if last_ts > 0 and (now - last_ts) <= 2 * freq else 0
+        samples["worker_runs_total"].append(f"worker_runs_total{{{worker}}} {int(main.get('runs_total') or 0)}")
+        samples["worker_errors_total"].append(f"worker_errors_total{{{worker}}} {int(main.get('errors_total') or 0)}")
+        samples["worker_up"].append(f"worker_up{{{worker}}} {up}")
+        samples["worker_last_run_duration_seconds"].append(
+            f"worker_last_run_duration_seconds{{{worker}}} {float(main.get('last_run_duration_s') or 0):.3f}")
+        samples["worker_db_queries_total"].append(
+            f"worker_db_queries_total{{{worker}}} {int(main.get('db_queries_total') or 0)}")
+        samples["worker_db_queries_last_cycle"].append(
+            f"worker_db_queries_last_cycle{{{worker}}} {int(main.get('db_queries_last_cycle') or 0)}")
+
+        series: Dict[Tuple[str, str, str], Dict[str, str]] = {}
+        for field, value in hist.items():
+            parts = field.split("|")
+            if len(parts) == 4:
+                series.setdefault((parts[0], parts[1], parts[2]), {})[parts[3]] = value
+        for (metric, stage, component), values in sorted(series.items()):
+            family = "worker_cycle_duration_seconds" if metric == _CYCLE else "worker_stage_duration_seconds"
+            labels = _labels(worker=name, stage=stage, component=component)
+            out = samples[family]
+            for le in sorted((k for k in values if k != "sum"), key=_le_key):
+                out.append(f'{family}_bucket{{{labels}{"," if labels else ""}le="{le}"}} {int(float(values[le]))}')
+            out.append(f"{family}_sum{{{labels}}} {float(values.get('sum') or 0):.6f}")
+            out.append(f"{family}_count{{{labels}}} {int(float(values.get('+Inf') or 0))}")
+
+        for field, value in sorted(gauges.items()):
+            kind, _, queue = field.partition("|")
+            if kind == "lag":
+                samples["worker_queue_lag_seconds"].append(
+                    f"worker_queue_lag_seconds{{{_labels(worker=name, queue=queue)}}} {float(value):.3f}")
+
+    lines: List[str] = []
+    for metric, (kind, help_text) in _FAMILIES.items():
+        if samples[metric] or metric in _ALWAYS:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            lines.extend(samples[metric])
+    lines.append("")
+    return "\n".join(lines)
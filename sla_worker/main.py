@@ -18,12 +18,23 @@ Data sources
 KPIs are written to sla_compliance_monthly and at-risk/breach insights are
 written to operational_insights (type='sla_risk').
 
+All tenants are computed together: month-to-date partial aggregates per tenant
+and day live in sla_kpi_daily, and each cycle only recomputes the days touched
+by rows changed since the tenant's watermark in sla_kpi_watermarks.  The first
+cycle of a month rebuilds the month that just closed once from the source
+tables.
+
 Run cadence
 -----------
 Configurable via SLA_POLL_INTERVAL (seconds). Default: 14400 (4 h).
-Full monthly recompute runs every cycle; it is cheap (aggregations on small tables).
+
+Backfill
+--------
+    python main.py backfill --months 6         # the six months before this one
+    python main.py backfill --month 2026-03    # specific months (repeatable)
 """
 
+import argparse
 import datetime
 import logging
 import os
@@ -36,36 +47,7 @@ import psycopg2
 import psycopg2.extras
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
-# ---------------------------------------------------------------------------
-# Worker observability — Redis metrics
-# ---------------------------------------------------------------------------
-_REDIS_HOST  = os.getenv("REDIS_HOST", "redis")
-_REDIS_PORT  = int(os.getenv("REDIS_PORT", "6379"))
-_REDIS_PASSWORD = os.getenv("REDIS_PASSWORD") or None
-_WORKER_NAME = "sla_worker"
-_worker_runs_total   = 0
-_worker_errors_total = 0
-
-
-def _report_worker_metrics(duration_s: float, had_error: bool, frequency_s: int) -> None:
-    global _worker_runs_total, _worker_errors_total
-    _worker_runs_total += 1
-    if had_error:
-        _worker_errors_total += 1
-    try:
-        import redis as _redis
-        r = _redis.Redis(host=_REDIS_HOST, port=_REDIS_PORT, password=_REDIS_PASSWORD, socket_connect_timeout=2)
-        r.hset(f"pf9:worker:{_WORKER_NAME}", mapping={
-            "runs_total":          _worker_runs_total,
-            "errors_total":        _worker_errors_total,
-            "last_run_ts":         time.time(),
-            "last_run_duration_s": round(duration_s, 2),
-            "frequency_s":         frequency_s,
-            "label":               _WORKER_NAME,
-        })
-    except Exception:
-        pass
-
+from shared.worker_telemetry import WorkerTelemetry
 
 # ---------------------------------------------------------------------------
 def _read_secret(name: str, env_var: str, default: str = "") -> str:
@@ -90,6 +72,12 @@ DB_NAME       = os.getenv("DB_NAME", "pf9_mgmt")
 DB_USER       = os.getenv("DB_USER", "pf9")
 DB_PASS       = _read_secret("db_password", "DB_PASS") or os.getenv("POSTGRES_PASSWORD", "")
 POLL_INTERVAL = int(os.getenv("SLA_POLL_INTERVAL", "14400"))  # seconds
+# Each watermark trails the DB clock by this much so rows committed by
+# transactions still open when a cycle starts are not skipped.
+WATERMARK_LAG_SECONDS = int(os.getenv("SLA_WATERMARK_LAG_SECONDS", "300"))
+
+# Stage timings, DB statement counts and heartbeat for GET /worker-metrics
+_telemetry = WorkerTelemetry("sla_worker", frequency_s=POLL_INTERVAL)
 
 # ---------------------------------------------------------------------------
 # Logging
@@ -130,6 +118,7 @@ def get_conn():
     return psycopg2.connect(
         host=DB_HOST, port=DB_PORT, dbname=DB_NAME,
         user=DB_USER, password=DB_PASS,
+        connection_factory=_telemetry.connection_factory,
     )
 
 
@@ -162,157 +151,261 @@ def get_conn_with_cb():
 
 
 # ---------------------------------------------------------------------------
-# KPI computation helpers
+# KPI computation — set-based, with month-to-date daily partials
 # ---------------------------------------------------------------------------
+# KPIs are built from per-(tenant, day) partial aggregates kept in
+# sla_kpi_daily: worst restore / snapshot gap, sums and counts for the ticket
+# averages, good and total snapshots.  Each cycle finds the days touched by
+# rows changed since the tenant's watermark (sla_kpi_watermarks), recomputes
+# just those days for all tenants in one grouped query per source, and rolls
+# the month up from the partials in one more.  Days are attributed the same
+# way the month was before (snapshot/ticket created_at, restore started_at).
+# Snapshots are matched on changed_at, which a trigger sets from the DB clock
+# when the collector inserts a row or changes a field the KPIs read; their
+# updated_at is OpenStack's clock and can predate ingestion by hours.
+# A snapshot's RPO gap is measured from the previous good snapshot of its
+# volume, which may be on an earlier day, so a changed snapshot also dirties
+# the day of the next good snapshot of that volume.  Deleted source rows
+# leave no trace to detect; the month converges on a from-scratch
+# computation when _finalize_previous_month rebuilds it after it closes.
+
+_DIRTY_DAYS_SQL = """
+    WITH wm AS (
+        SELECT * FROM unnest(%(tenants)s::text[], %(since)s::timestamptz[])
+            AS w(tenant_id, since)
+    ), changed_snaps AS (
+        SELECT s.project_id, s.volume_id, s.created_at
+        FROM snapshots s JOIN wm ON wm.tenant_id = s.project_id
+        WHERE s.created_at >= %(start)s AND s.created_at < %(end)s
+          AND s.changed_at > wm.since
+    )
+    SELECT project_id AS tenant_id, created_at::date AS day
+    FROM changed_snaps
+    UNION
+    SELECT nxt.project_id, nxt.created_at::date
+    FROM changed_snaps c
+    CROSS JOIN LATERAL (
+        SELECT n.project_id, n.created_at
+        FROM snapshots n
+        WHERE n.volume_id = c.volume_id
+          AND n.created_at > c.created_at AND n.created_at < %(end)s
+          AND n.status IN ('available', 'active')
+        ORDER BY n.created_at
+        LIMIT 1
+    ) nxt
+    WHERE nxt.project_id = ANY(%(tenants)s)
+    UNION
+    SELECT t.project_id, t.created_at::date
+    FROM support_tickets t JOIN wm ON wm.tenant_id = t.project_id
+    WHERE t.created_at >= %(start)s AND t.created_at < %(end)s
+      AND t.updated_at > wm.since
+    UNION
+    SELECT r.project_id, r.started_at::date
+    FROM restore_jobs r JOIN wm ON wm.tenant_id = r.project_id
+    WHERE r.started_at >= %(start)s AND r.started_at < %(end)s
+      AND r.status = 'SUCCEEDED'
+      AND r.finished_at > wm.since
+"""
 
-def _compute_uptime_pct(conn, project_id: str, month_start: datetime.date,
-                         month_end: datetime.date) -> Optional[float]:
-    """
-    Uptime proxy: active_servers / total_servers from v_tenant_health.
-    Phase 0 limitation — in future phases, health snapshots stored over time
-    will enable proper time-weighted uptime calculation.
-    """
-    try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT active_servers, total_servers
-                FROM v_tenant_health
-                WHERE project_id = %s
-            """, (project_id,))
-            row = cur.fetchone()
-        if not row or not row[1]:
-            return None
-        active, total = row
-        return round(float(active) / float(total) * 100, 3)
-    except Exception as exc:
-        log.debug("uptime query failed for %s: %s", project_id, exc)
-        return None
+# The (tenant, day) filter: %(all_days)s = TRUE recomputes every day of the
+# month for %(tenants)s, otherwise only the pairs in %(day_tenants)s/%(days)s.
+_DAY_FILTER = """
+    (%(all_days)s OR ({tenant_col}, {day_expr}) IN (
+        SELECT * FROM unnest(%(day_tenants)s::text[], %(days)s::date[])))
+"""
 
+_SNAPSHOT_PARTIALS_SQL = """
+    WITH month_snaps AS (
+        SELECT project_id, volume_id, created_at,
+               status IN ('available', 'active') AS good
+        FROM snapshots
+        WHERE project_id = ANY(%(tenants)s)
+          AND created_at >= %(start)s AND created_at < %(end)s
+    ), gaps AS (
+        SELECT project_id, created_at, good,
+               CASE WHEN good THEN created_at - LAG(created_at) OVER (
+                   PARTITION BY volume_id, good ORDER BY created_at) END AS gap
+        FROM month_snaps
+    )
+    SELECT project_id AS tenant_id, created_at::date AS day,
+           MAX(EXTRACT(EPOCH FROM gap) / 3600.0) AS rpo_max_hours,
+           COUNT(*) FILTER (WHERE good)          AS backups_good,
+           COUNT(*)                              AS backups_total
+    FROM gaps
+    WHERE """ + _DAY_FILTER.format(tenant_col="project_id", day_expr="created_at::date") + """
+    GROUP BY 1, 2
+"""
 
-def _compute_rto_worst(conn, project_id: str, month_start: datetime.date,
-                        month_end: datetime.date) -> Optional[float]:
-    """Worst single completed restore duration (hours) for the month."""
-    try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT MAX(EXTRACT(EPOCH FROM (finished_at - started_at)) / 3600.0)
-                FROM restore_jobs
-                WHERE project_id = %s
-                  AND status = 'SUCCEEDED'
-                  AND started_at >= %s
-                  AND started_at <  %s
-                  AND finished_at IS NOT NULL
-                  AND started_at  IS NOT NULL
-            """, (project_id, month_start, month_end))
-            row = cur.fetchone()
-        val = row[0] if row else None
-        return round(float(val), 2) if val is not None else None
-    except Exception as exc:
-        log.debug("rto query failed for %s: %s", project_id, exc)
-        return None
+_TICKET_PARTIALS_SQL = """
+    SELECT project_id AS tenant_id, created_at::date AS day,
+           SUM(EXTRACT(EPOCH FROM (first_response_at - created_at)) / 3600.0)
+               FILTER (WHERE first_response_at IS NOT NULL)          AS mtta_sum_hours,
+           COUNT(*) FILTER (WHERE first_response_at IS NOT NULL)      AS mtta_count,
+           SUM(EXTRACT(EPOCH FROM (resolved_at - created_at)) / 3600.0)
+               FILTER (WHERE resolved_at IS NOT NULL
+                         AND status IN ('resolved', 'closed'))        AS mttr_sum_hours,
+           COUNT(*) FILTER (WHERE resolved_at IS NOT NULL
+                              AND status IN ('resolved', 'closed'))   AS mttr_count
+    FROM support_tickets
+    WHERE project_id = ANY(%(tenants)s)
+      AND created_at >= %(start)s AND created_at < %(end)s
+      AND """ + _DAY_FILTER.format(tenant_col="project_id", day_expr="created_at::date") + """
+    GROUP BY 1, 2
+"""
 
+_RESTORE_PARTIALS_SQL = """
+    SELECT project_id AS tenant_id, started_at::date AS day,
+           MAX(EXTRACT(EPOCH FROM (finished_at - started_at)) / 3600.0) AS rto_max_hours
+    FROM restore_jobs
+    WHERE project_id = ANY(%(tenants)s)
+      AND status = 'SUCCEEDED'
+      AND started_at >= %(start)s AND started_at < %(end)s
+      AND finished_at IS NOT NULL
+      AND """ + _DAY_FILTER.format(tenant_col="project_id", day_expr="started_at::date") + """
+    GROUP BY 1, 2
+"""
 
-def _compute_rpo_worst(conn, project_id: str, month_start: datetime.date,
-                        month_end: datetime.date) -> Optional[float]:
-    """
-    Worst RPO (hours): maximum gap between consecutive completed snapshots
-    across all VMs in the project, within the month.
-    """
-    try:
-        with conn.cursor() as cur:
-            # Find all successful snapshots for volumes belonging to VMs in this project,
-            # ordered by volume + time. Compute inter-snapshot gap per volume.
-            cur.execute("""
-                WITH ordered AS (
-                    SELECT
-                        s.volume_id,
-                        s.created_at,
-                        LAG(s.created_at) OVER (
-                            PARTITION BY s.volume_id ORDER BY s.created_at
-                        ) AS prev_snap
-                    FROM snapshots s
-                    WHERE s.project_id = %s
-                      AND s.status IN ('available', 'active')
-                      AND s.created_at >= %s
-                      AND s.created_at <  %s
-                )
-                SELECT MAX(EXTRACT(EPOCH FROM (created_at - prev_snap)) / 3600.0)
-                FROM ordered
-                WHERE prev_snap IS NOT NULL
-            """, (project_id, month_start, month_end))
-            row = cur.fetchone()
-        val = row[0] if row else None
-        return round(float(val), 2) if val is not None else None
-    except Exception as exc:
-        log.debug("rpo query failed for %s: %s", project_id, exc)
-        return None
+_PARTIAL_COLUMNS = (
+    "rto_max_hours", "rpo_max_hours", "mtta_sum_hours", "mtta_count",
+    "mttr_sum_hours", "mttr_count", "backups_good", "backups_total",
+)
+# Counters are NOT NULL in sla_kpi_daily; the worst-case/sum columns stay NULL.
+_PARTIAL_DEFAULTS = {"mtta_count": 0, "mttr_count": 0, "backups_good": 0, "backups_total": 0}
 
 
-def _compute_mtta(conn, project_id: str, month_start: datetime.date,
-                   month_end: datetime.date) -> Optional[float]:
-    """Average time-to-first-response (hours) for tickets in the month."""
-    try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT AVG(EXTRACT(EPOCH FROM (first_response_at - created_at)) / 3600.0)
-                FROM support_tickets
-                WHERE project_id = %s
-                  AND created_at >= %s
-                  AND created_at <  %s
-                  AND first_response_at IS NOT NULL
-            """, (project_id, month_start, month_end))
-            row = cur.fetchone()
-        val = row[0] if row else None
-        return round(float(val), 2) if val is not None else None
-    except Exception as exc:
-        log.debug("mtta query failed for %s: %s", project_id, exc)
-        return None
+def _month_bounds(day: datetime.date) -> tuple[datetime.date, datetime.date]:
+    """(first day of the month, first day of the next month)."""
+    month_start = day.replace(day=1)
+    if month_start.month == 12:
+        return month_start, datetime.date(month_start.year + 1, 1, 1)
+    return month_start, month_start.replace(month=month_start.month + 1)
 
 
-def _compute_mttr(conn, project_id: str, month_start: datetime.date,
-                   month_end: datetime.date) -> Optional[float]:
-    """Average time-to-resolve (hours) for tickets closed in the month."""
-    try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT AVG(EXTRACT(EPOCH FROM (resolved_at - created_at)) / 3600.0)
-                FROM support_tickets
-                WHERE project_id = %s
-                  AND created_at >= %s
-                  AND created_at <  %s
-                  AND resolved_at IS NOT NULL
-                  AND status IN ('resolved', 'closed')
-            """, (project_id, month_start, month_end))
-            row = cur.fetchone()
-        val = row[0] if row else None
-        return round(float(val), 2) if val is not None else None
-    except Exception as exc:
-        log.debug("mttr query failed for %s: %s", project_id, exc)
-        return None
+def _load_watermarks(conn, tenants: List[str],
+                     month_start: datetime.date) -> Dict[str, datetime.datetime]:
+    """{tenant_id: watermark} for tenants whose partials for the month exist."""
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT tenant_id, watermark FROM sla_kpi_watermarks
+            WHERE month = %s AND tenant_id = ANY(%s)
+        """, (month_start, tenants))
+        return {r[0]: r[1] for r in cur.fetchall()}
+
+
+def _dirty_days(conn, watermarks: Dict[str, datetime.datetime],
+                month_start: datetime.date, month_end: datetime.date,
+                ) -> List[tuple[str, datetime.date]]:
+    """(tenant, day) pairs with source rows changed since the tenant's watermark."""
+    if not watermarks:
+        return []
+    tenants = list(watermarks)
+    with conn.cursor() as cur:
+        cur.execute(_DIRTY_DAYS_SQL, {
+            "tenants": tenants, "since": [watermarks[t] for t in tenants],
+            "start": month_start, "end": month_end,
+        })
+        return [(r[0], r[1]) for r in cur.fetchall()]
+
 
+def _refresh_daily_partials(conn, month_start: datetime.date, month_end: datetime.date,
+                            full_tenants: List[str],
+                            dirty: List[tuple[str, datetime.date]]) -> int:
+    """Recompute sla_kpi_daily for every day of *full_tenants* and for the *dirty* pairs.
+
+    Returns the number of (tenant, day) rows written.  Runs the three grouped
+    source queries at most twice (full and dirty scope), whatever the number
+    of tenants.
+    """
+    partials: Dict[tuple[str, datetime.date], Dict[str, Any]] = {}
+    scopes = []
+    if full_tenants:
+        scopes.append({"tenants": full_tenants, "all_days": True,
+                       "day_tenants": [], "days": []})
+    if dirty:
+        scopes.append({"tenants": sorted({t for t, _ in dirty}), "all_days": False,
+                       "day_tenants": [t for t, _ in dirty], "days": [d for _, d in dirty]})
+        for key in dirty:
+            partials.setdefault(key, {})  # a day that lost all its rows is rewritten empty
 
-def _compute_backup_success_pct(conn, project_id: str, month_start: datetime.date,
-                                  month_end: datetime.date) -> Optional[float]:
-    """Percentage of snapshots that completed successfully in the month."""
+    with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+        for scope in scopes:
+            params = dict(scope, start=month_start, end=month_end)
+            for sql in (_SNAPSHOT_PARTIALS_SQL, _TICKET_PARTIALS_SQL, _RESTORE_PARTIALS_SQL):
+                cur.execute(sql, params)
+                for row in cur.fetchall():
+                    key = (row.pop("tenant_id"), row.pop("day"))
+                    partials.setdefault(key, {}).update(row)
+
+        if full_tenants:
+            cur.execute("""
+                DELETE FROM sla_kpi_daily
+                WHERE tenant_id = ANY(%s) AND day >= %s AND day < %s
+            """, (full_tenants, month_start, month_end))
+        if partials:
+            psycopg2.extras.execute_values(cur, f"""
+                INSERT INTO sla_kpi_daily (tenant_id, day, {", ".join(_PARTIAL_COLUMNS)})
+                VALUES %s
+                ON CONFLICT (tenant_id, day) DO UPDATE SET
+                    {", ".join(f"{c} = EXCLUDED.{c}" for c in _PARTIAL_COLUMNS)},
+                    computed_at = NOW()
+            """, [
+                (tenant, day, *(vals.get(c, _PARTIAL_DEFAULTS.get(c)) for c in _PARTIAL_COLUMNS))
+                for (tenant, day), vals in partials.items()
+            ], page_size=1000)
+    return len(partials)
+
+
+def _rollup_month(conn, tenants: List[str], month_start: datetime.date,
+                  month_end: datetime.date) -> Dict[str, Dict[str, Any]]:
+    """Fold the daily partials into monthly KPIs for every tenant in one query."""
+    with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+        cur.execute("""
+            SELECT tenant_id,
+                   MAX(rto_max_hours)                                 AS rto_worst_hours,
+                   MAX(rpo_max_hours)                                 AS rpo_worst_hours,
+                   SUM(mtta_sum_hours) / NULLIF(SUM(mtta_count), 0)   AS mtta_avg_hours,
+                   SUM(mttr_sum_hours) / NULLIF(SUM(mttr_count), 0)   AS mttr_avg_hours,
+                   100.0 * SUM(backups_good) / NULLIF(SUM(backups_total), 0)
+                                                                      AS backup_success_pct
+            FROM sla_kpi_daily
+            WHERE tenant_id = ANY(%s) AND day >= %s AND day < %s
+            GROUP BY tenant_id
+        """, (tenants, month_start, month_end))
+        rows = {r["tenant_id"]: r for r in cur.fetchall()}
+
+    kpis: Dict[str, Dict[str, Any]] = {}
+    for tenant in tenants:
+        row = rows.get(tenant, {})
+        kpis[tenant] = {
+            field: round(float(row[field]), 2) if row.get(field) is not None else None
+            for field in ("rto_worst_hours", "rpo_worst_hours", "mtta_avg_hours",
+                          "mttr_avg_hours", "backup_success_pct")
+        }
+    return kpis
+
+
+def _compute_uptime_pct(conn, tenants: List[str]) -> Dict[str, Optional[float]]:
+    """
+    Uptime proxy: active_servers / total_servers from v_tenant_health.
+    Phase 0 limitation — in future phases, health snapshots stored over time
+    will enable proper time-weighted uptime calculation.
+    """
     try:
         with conn.cursor() as cur:
             cur.execute("""
-                SELECT
-                    COUNT(*) FILTER (WHERE status IN ('available','active')) AS good,
-                    COUNT(*) AS total
-                FROM snapshots
-                WHERE project_id = %s
-                  AND created_at >= %s
-                  AND created_at <  %s
-            """, (project_id, month_start, month_end))
-            row = cur.fetchone()
-        if not row or not row[1]:
-            return None
-        good, total = row
-        return round(float(good) / float(total) * 100, 2)
+                SELECT project_id, active_servers, total_servers
+                FROM v_tenant_health
+                WHERE project_id = ANY(%s)
+            """, (tenants,))
+            rows = cur.fetchall()
     except Exception as exc:
-        log.debug("backup_success query failed for %s: %s", project_id, exc)
-        return None
+        log.debug("uptime query failed: %s", exc)
+        conn.rollback()
+        return {}
+    return {
+        project_id: round(float(active) / float(total) * 100, 3)
+        for project_id, active, total in rows if total
+    }
 
 
 def _compute_migrations_completed(conn, month_start: datetime.date,
@@ -336,6 +429,7 @@ def _compute_migrations_completed(conn, month_start: datetime.date,
         return int(row[0]) if row and row[0] else 0
     except Exception as exc:
         log.debug("migrations_completed query failed: %s", exc)
+        conn.rollback()
         return 0
 
 
@@ -438,81 +532,173 @@ def _upsert_sla_insight(conn, project_id: str, project_name: str,
 
 
 # ---------------------------------------------------------------------------
-# Core: process one tenant for one month
+# Core: compute one month for all tenants
 # ---------------------------------------------------------------------------
 
-def _process_tenant_month(conn, project_id: str, project_name: str,
-                            commitment: Dict[str, Any], today: datetime.date) -> None:
-    month_start = today.replace(day=1)
-    # First day of next month
-    if month_start.month == 12:
-        month_end = datetime.date(month_start.year + 1, 1, 1)
-    else:
-        month_end = month_start.replace(month=month_start.month + 1)
+def _load_commitments(conn, month_start: datetime.date, month_end: datetime.date,
+                      current: bool) -> List[Dict[str, Any]]:
+    """Commitments to score: the open ones, or for a past month the latest one
+    in effect during that month."""
+    where = ("sc.effective_to IS NULL" if current else
+             "sc.effective_from < %(end)s AND (sc.effective_to IS NULL OR sc.effective_to >= %(start)s)")
+    with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+        cur.execute(f"""
+            SELECT DISTINCT ON (sc.tenant_id)
+                   sc.tenant_id,
+                   p.name AS project_name,
+                   sc.tier,
+                   sc.uptime_pct,
+                   sc.rto_hours,
+                   sc.rpo_hours,
+                   sc.mtta_hours,
+                   sc.mttr_hours,
+                   sc.backup_freq_hours
+            FROM sla_commitments sc
+            JOIN projects p ON p.id = sc.tenant_id
+            WHERE {where}
+            ORDER BY sc.tenant_id, sc.effective_from DESC
+        """, {"start": month_start, "end": month_end})
+        return [dict(r) for r in cur.fetchall()]
+
+
+def compute_month(conn, month_start: datetime.date, today: datetime.date,
+                  commitments: List[Dict[str, Any]], incremental: bool = True,
+                  live: bool = True) -> int:
+    """Compute sla_compliance_monthly for every tenant in *commitments* for one month.
+
+    incremental: reuse the daily partials of tenants that have a watermark and
+                 only recompute days with changed rows; otherwise rebuild the
+                 whole month.
+    live:        the month is in progress — take uptime from v_tenant_health and
+                 raise sla_risk insights.  For a closed month the stored uptime
+                 is kept and no insights are written.
+
+    Everything is written in one transaction.  Returns the number of tenants.
+    """
+    if not commitments:
+        return 0
+    month_start, month_end = _month_bounds(month_start)
     days_in_month = (month_end - month_start).days
+    tenants = [c["tenant_id"] for c in commitments]
 
-    kpis = {
-        "uptime_actual_pct": _compute_uptime_pct(conn, project_id, month_start, month_end),
-        "rto_worst_hours":   _compute_rto_worst(conn, project_id, month_start, month_end),
-        "rpo_worst_hours":   _compute_rpo_worst(conn, project_id, month_start, month_end),
-        "mtta_avg_hours":    _compute_mtta(conn, project_id, month_start, month_end),
-        "mttr_avg_hours":    _compute_mttr(conn, project_id, month_start, month_end),
-        "backup_success_pct": _compute_backup_success_pct(conn, project_id, month_start, month_end),
-    }
-    migrations_completed = _compute_migrations_completed(conn, month_start, month_end)
+    with conn.cursor() as cur:
+        # Rows changed while this cycle runs are picked up again next time.
+        cur.execute("SELECT NOW() - make_interval(secs => %s)", (WATERMARK_LAG_SECONDS,))
+        new_watermark = cur.fetchone()[0]
 
-    breach_fields, at_risk_fields = _detect_breaches(
-        kpis, commitment, days_in_month, today, month_start
-    )
+    with _telemetry.stage("uptime"):
+        if live:
+            uptime = _compute_uptime_pct(conn, tenants)
+        else:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT tenant_id, uptime_actual_pct FROM sla_compliance_monthly
+                    WHERE month = %s AND region_id = '' AND tenant_id = ANY(%s)
+                """, (month_start, tenants))
+                uptime = {t: float(u) if u is not None else None for t, u in cur.fetchall()}
+        migrations_completed = _compute_migrations_completed(conn, month_start, month_end)
+
+    with _telemetry.stage("daily_partials"):
+        watermarks = _load_watermarks(conn, tenants, month_start) if incremental else {}
+        full_tenants = [t for t in tenants if t not in watermarks]
+        dirty = _dirty_days(conn, watermarks, month_start, month_end)
+        written = _refresh_daily_partials(conn, month_start, month_end, full_tenants, dirty)
+    with _telemetry.stage("rollup"):
+        kpis_by_tenant = _rollup_month(conn, tenants, month_start, month_end)
+    log.info("SLA %s: %d tenant(s), %d rebuilt, %d changed day(s) — %d partial row(s) written",
+             month_start.strftime("%Y-%m"), len(tenants), len(full_tenants), len(dirty), written)
+
+    rows = []
+    insights = []
+    for commitment in commitments:
+        tenant = commitment["tenant_id"]
+        kpis = dict(kpis_by_tenant[tenant], uptime_actual_pct=uptime.get(tenant))
+        breach_fields, at_risk_fields = _detect_breaches(
+            kpis, commitment, days_in_month, today, month_start
+        )
+        rows.append((
+            tenant, month_start,
+            kpis["uptime_actual_pct"], kpis["rto_worst_hours"], kpis["rpo_worst_hours"],
+            kpis["mtta_avg_hours"], kpis["mttr_avg_hours"], kpis["backup_success_pct"],
+            migrations_completed, breach_fields, at_risk_fields,
+        ))
+        if live and (breach_fields or at_risk_fields):
+            insights.append((tenant, commitment["project_name"] or tenant,
+                             breach_fields, at_risk_fields))
 
     # Write/update monthly rollup
-    try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                INSERT INTO sla_compliance_monthly
-                    (tenant_id, month, region_id,
-                     uptime_actual_pct, rto_worst_hours, rpo_worst_hours,
-                     mtta_avg_hours, mttr_avg_hours, backup_success_pct,
-                     migrations_completed,
-                     breach_fields, at_risk_fields, computed_at)
-                VALUES
-                    (%s, %s, '',
-                     %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
-                ON CONFLICT (tenant_id, month, region_id)
-                DO UPDATE SET
-                    uptime_actual_pct = EXCLUDED.uptime_actual_pct,
-                    rto_worst_hours   = EXCLUDED.rto_worst_hours,
-                    rpo_worst_hours   = EXCLUDED.rpo_worst_hours,
-                    mtta_avg_hours    = EXCLUDED.mtta_avg_hours,
-                    mttr_avg_hours    = EXCLUDED.mttr_avg_hours,
-                    backup_success_pct= EXCLUDED.backup_success_pct,
-                    migrations_completed = EXCLUDED.migrations_completed,
-                    breach_fields     = EXCLUDED.breach_fields,
-                    at_risk_fields    = EXCLUDED.at_risk_fields,
-                    computed_at       = NOW()
-            """, (
-                project_id, month_start,
-                kpis["uptime_actual_pct"],
-                kpis["rto_worst_hours"],
-                kpis["rpo_worst_hours"],
-                kpis["mtta_avg_hours"],
-                kpis["mttr_avg_hours"],
-                kpis["backup_success_pct"],
-                migrations_completed,
-                breach_fields,
-                at_risk_fields,
-            ))
-        conn.commit()
-    except Exception as exc:
-        log.warning("Could not write sla_compliance_monthly for %s: %s", project_id, exc)
-        try:
-            conn.rollback()
-        except Exception:
-            pass
-        return
-
-    _upsert_sla_insight(conn, project_id, project_name,
-                         breach_fields, at_risk_fields, month_start)
+    with _telemetry.stage("write"), conn.cursor() as cur:
+        psycopg2.extras.execute_values(cur, """
+            INSERT INTO sla_compliance_monthly
+                (tenant_id, month, region_id,
+                 uptime_actual_pct, rto_worst_hours, rpo_worst_hours,
+                 mtta_avg_hours, mttr_avg_hours, backup_success_pct,
+                 migrations_completed,
+                 breach_fields, at_risk_fields, computed_at)
+            VALUES %s
+            ON CONFLICT (tenant_id, month, region_id)
+            DO UPDATE SET
+                uptime_actual_pct = EXCLUDED.uptime_actual_pct,
+                rto_worst_hours   = EXCLUDED.rto_worst_hours,
+                rpo_worst_hours   = EXCLUDED.rpo_worst_hours,
+                mtta_avg_hours    = EXCLUDED.mtta_avg_hours,
+                mttr_avg_hours    = EXCLUDED.mttr_avg_hours,
+                backup_success_pct= EXCLUDED.backup_success_pct,
+                migrations_completed = EXCLUDED.migrations_completed,
+                breach_fields     = EXCLUDED.breach_fields,
+                at_risk_fields    = EXCLUDED.at_risk_fields,
+                computed_at       = NOW()
+        """, rows, template="(%s, %s, '', %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())",
+            page_size=1000)
+        psycopg2.extras.execute_values(cur, """
+            INSERT INTO sla_kpi_watermarks (tenant_id, month, watermark, finalized)
+            VALUES %s
+            ON CONFLICT (tenant_id, month) DO UPDATE SET
+                watermark = EXCLUDED.watermark,
+                finalized = EXCLUDED.finalized,
+                updated_at = NOW()
+        """, [(t, month_start, new_watermark, not live) for t in tenants])
+    conn.commit()
+
+    with _telemetry.stage("insights"):
+        for tenant, project_name, breach_fields, at_risk_fields in insights:
+            try:
+                _upsert_sla_insight(conn, tenant, project_name,
+                                    breach_fields, at_risk_fields, month_start)
+            except Exception as exc:
+                log.warning("Could not write SLA insight for tenant %s: %s", tenant, exc)
+                conn.rollback()
+    return len(tenants)
+
+
+def _finalize_previous_month(conn, month_start: datetime.date) -> None:
+    """Rebuild last month once after it closes.
+
+    The last in-month cycle can be up to SLA_POLL_INTERVAL before midnight,
+    and rows deleted since do not show up as changes; a full rebuild from the
+    source tables settles the month.
+    """
+    prev_start, _ = _month_bounds(month_start - datetime.timedelta(days=1))
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT 1 FROM sla_kpi_watermarks
+            WHERE month = %s AND NOT finalized LIMIT 1
+        """, (prev_start,))
+        pending = cur.fetchone() is not None
+    if pending:
+        log.info("Finalizing SLA KPIs for %s", prev_start.strftime("%Y-%m"))
+        backfill(conn, [prev_start])
+
+
+def backfill(conn, months: List[datetime.date]) -> None:
+    """Rebuild closed months from the source tables (idempotent)."""
+    for month in months:
+        month_start, month_end = _month_bounds(month)
+        commitments = _load_commitments(conn, month_start, month_end, current=False)
+        last_day = month_end - datetime.timedelta(days=1)
+        n = compute_month(conn, month_start, last_day, commitments,
+                          incremental=False, live=False)
+        log.info("Backfilled SLA KPIs for %s: %d tenant(s)", month_start.strftime("%Y-%m"), n)
 
 
 # ---------------------------------------------------------------------------
@@ -521,33 +707,59 @@ def _process_tenant_month(conn, project_id: str, project_name: str,
 
 def run_once(conn) -> None:
     today = datetime.date.today()
+    month_start, month_end = _month_bounds(today)
+    try:
+        with _telemetry.stage("finalize_previous_month"):
+            _finalize_previous_month(conn, month_start)
+    except Exception as exc:
+        log.warning("Could not finalize previous month: %s", exc)
+        conn.rollback()
+
     # Load all tenants that have an active SLA commitment
-    with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-        cur.execute("""
-            SELECT sc.tenant_id,
-                   p.name AS project_name,
-                   sc.tier,
-                   sc.uptime_pct,
-                   sc.rto_hours,
-                   sc.rpo_hours,
-                   sc.mtta_hours,
-                   sc.mttr_hours,
-                   sc.backup_freq_hours
-            FROM sla_commitments sc
-            JOIN projects p ON p.id = sc.tenant_id
-            WHERE sc.effective_to IS NULL
-        """)
-        rows = cur.fetchall()
-
-    log.info("Processing SLA compliance for %d tenant(s)", len(rows))
-    for row in rows:
-        project_id   = row["tenant_id"]
-        project_name = row["project_name"] or project_id
-        commitment   = dict(row)
+    commitments = _load_commitments(conn, month_start, month_end, current=True)
+    log.info("Processing SLA compliance for %d tenant(s)", len(commitments))
+    try:
+        compute_month(conn, month_start, today, commitments)
+        return
+    except Exception as exc:
+        log.warning("Batched SLA computation for %s failed (%s) — retrying per tenant",
+                    month_start.strftime("%Y-%m"), exc)
+        conn.rollback()
+    # One tenant's bad data must not hold back the others.
+    for commitment in commitments:
         try:
-            _process_tenant_month(conn, project_id, project_name, commitment, today)
+            compute_month(conn, month_start, today, [commitment])
         except Exception as exc:
-            log.warning("Error processing tenant %s: %s", project_id, exc)
+            log.warning("Error processing tenant %s: %s", commitment["tenant_id"], exc)
+            conn.rollback()
+
+
+def _parse_month(value: str) -> datetime.date:
+    try:
+        return datetime.datetime.strptime(value, "%Y-%m").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM, got {value!r}")
+
+
+def _backfill_cli(args) -> None:
+    today = datetime.date.today()
+    current, _ = _month_bounds(today)
+    if args.month:
+        months = sorted(set(args.month))
+    else:
+        months = []
+        m = current
+        for _ in range(args.months):
+            m, _ = _month_bounds(m - datetime.timedelta(days=1))
+            months.append(m)
+        months.reverse()
+    if current in months:
+        raise SystemExit("The current month is computed by the worker loop; backfill closed months only.")
+    conn = get_conn()
+    try:
+        backfill(conn, months)
+    finally:
+        conn.close()
 
 
 def main():
@@ -565,25 +777,24 @@ def main():
     while not _shutdown:
         conn = None
         t0 = time.time()
-        had_error = False
-        try:
-            conn = get_conn_with_cb()
-            run_once(conn)
-            # Liveness probe
-            with open("/tmp/alive", "w") as fh:
-                fh.write(str(time.time()))
-        except Exception as exc:
-            had_error = True
-            log.error("SLA worker cycle failed: %s", exc)
-        finally:
-            if conn:
-                try:
-                    conn.close()
-                except Exception:
-                    pass
+        with _telemetry.cycle():
+            try:
+                conn = get_conn_with_cb()
+                run_once(conn)
+                # Liveness probe
+                with open("/tmp/alive", "w") as fh:
+                    fh.write(str(time.time()))
+            except Exception as exc:
+                _telemetry.fail()
+                log.error("SLA worker cycle failed: %s", exc)
+            finally:
+                if conn:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
 
         duration = time.time() - t0
-        _report_worker_metrics(duration, had_error, POLL_INTERVAL)
         log.info("Cycle complete in %.1fs — sleeping %ds", duration, POLL_INTERVAL)
 
         # Sleep in small chunks so SIGTERM is handled promptly
@@ -596,4 +807,15 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="PF9 SLA Compliance Worker")
+    sub = parser.add_subparsers(dest="command")
+    bf = sub.add_parser("backfill", help="Rebuild KPIs for closed months and exit")
+    bf.add_argument("--months", type=int, default=6,
+                    help="number of months before the current one (default: 6)")
+    bf.add_argument("--month", type=_parse_month, action="append",
+                    help="a specific month as YYYY-MM (repeatable; overrides --months)")
+    args = parser.parse_args()
+    if args.command == "backfill":
+        _backfill_cli(args)
+    else:
+        main()
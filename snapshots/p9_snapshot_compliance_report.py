@@ -1,6 +1,7 @@
 import ast
 import json
 import os
+import time
 from datetime import datetime, timezone
 
 import pandas as pd
@@ -11,9 +12,11 @@ from psycopg2.extras import execute_values
 """
 p9_snapshot_compliance_report.py
 
-Builds a snapshot compliance report from a pf9_rvtools Excel export.
+Builds a snapshot compliance report from the inventory tables in the
+management DB (default), or from a pf9_rvtools Excel export (--source xlsx).
 
-Expected sheets in pf9_rvtools workbook (as produced by pf9_rvtools.py):
+Both sources are loaded into the same frames, shaped like the sheets of a
+pf9_rvtools workbook (as produced by pf9_rvtools.py):
   - Volumes
   - Snapshots
   - Tenants
@@ -51,6 +54,10 @@ Metadata conventions on Volumes sheet:
 Snapshot/volume mapping:
   - A snapshot row must have a "volume_id" that matches Volumes.id
   - Snapshot metadata may contain "policy" and "created_by".
+
+The latest snapshot of every volume is found with one sort and one groupby
+over the whole Snapshots frame and joined onto the volumes; the tenant,
+domain and policy summaries are groupby aggregations of the joined frame.
 """
 
 
@@ -148,15 +155,135 @@ def get_db_connection():
     )
 
 
-def write_compliance_to_db(vol_comp: pd.DataFrame, input_file: str, output_file: str, sla_days: int):
+def _query_frame(cur, sql: str, params=None) -> pd.DataFrame:
+    cur.execute(sql, params)
+    return pd.DataFrame.from_records(
+        cur.fetchall(), columns=[d[0] for d in cur.description]
+    )
+
+
+# Attached server of a volume; server_id is only set by newer collectors.
+_VOLUME_VM_ID = "COALESCE(v.server_id, v.raw_json->'attachments'->0->>'server_id')"
+
+
+def load_db_data(conn, region_id: str | None = None):
+    """
+    Load volumes, snapshots, projects and domains from the inventory tables
+    into frames shaped like the pf9_rvtools sheets (see load_rvtools_data).
+
+    Volumes also carry vm_id / vm_name of the attached server.  With
+    region_id, volumes and snapshots are limited to that region.
+    """
+    params = {"region_id": region_id}
+    with conn.cursor() as cur:
+        volumes = _query_frame(cur, f"""
+            SELECT v.id, v.name, v.size_gb AS size, v.status, v.bootable,
+                   v.project_id AS "os-vol-tenant-attr:tenant_id",
+                   v.raw_json->'metadata' AS metadata,
+                   {_VOLUME_VM_ID} AS vm_id,
+                   srv.name AS vm_name
+            FROM volumes v
+            LEFT JOIN servers srv ON srv.id = {_VOLUME_VM_ID}
+            {"WHERE v.region_id = %(region_id)s" if region_id else ""}
+        """, params)
+        snapshots = _query_frame(cur, f"""
+            SELECT s.id, s.name, s.volume_id, s.size_gb AS size, s.status,
+                   s.created_at, s.raw_json->'metadata' AS metadata
+            FROM snapshots s
+            WHERE s.volume_id IS NOT NULL
+            {"AND s.region_id = %(region_id)s" if region_id else ""}
+        """, params)
+        tenants = _query_frame(cur, "SELECT id, name, domain_id FROM projects")
+        domains = _query_frame(cur, "SELECT id, name FROM domains")
+    return {
+        "volumes": volumes,
+        "snapshots": snapshots,
+        "tenants": tenants,
+        "domains": domains,
+    }
+
+
+def build_compliance_details(vol_comp: pd.DataFrame, report_id: int,
+                             projects: pd.DataFrame, volumes: pd.DataFrame):
+    """
+    Rows for compliance_details: one per volume × policy, with tenant/domain
+    and VM names taken from the DB lookups where present.
+
+    projects: project_id, project_name, domain_id, domain_name
+    volumes:  volume_id, volume_name, vm_id, vm_name, metadata
+    """
+    if vol_comp.empty:
+        return []
+
+    df = vol_comp.join(
+        projects.set_index("project_id").add_suffix("_db"), on="project_id"
+    ).join(
+        volumes.set_index("volume_id").add_suffix("_db"), on="volume_id"
+    )
+
+    def prefer(db_col, frame_col):
+        # DB value first, the report's own column as fallback ("" counts as missing)
+        fallback = df[frame_col].mask(df[frame_col].astype(str).str.strip().str.lower().isin(("", "nan")))
+        return df[db_col].mask(df[db_col] == "").combine_first(fallback)
+
+    # Split comma-separated policies into individual rows
+    policy_name = df["policy"].map(
+        lambda s: [p.strip() for p in str(s).split(",") if p.strip()] if pd.notna(s) else []
+    ).map(lambda policies: policies or ["unknown"])
+    df = df.assign(
+        volume_name=prefer("volume_name_db", "volume_name"),
+        tenant_id=prefer("domain_id_db", "domain_id"),
+        tenant_name=prefer("domain_name_db", "domain_name"),
+        project_name=prefer("project_name_db", "project_name"),
+        vm_id=prefer("vm_id_db", "vm_id"),
+        vm_name=prefer("vm_name_db", "vm_name"),
+        policy_name=policy_name,
+    ).explode("policy_name")
+
+    # Per-policy retention from volume metadata
+    retention = []
+    for meta, policy in zip(df["metadata_db"].map(parse_metadata_field), df["policy_name"]):
+        try:
+            retention.append(int(meta.get(f"retention_{policy}", 0)))
+        except (TypeError, ValueError):
+            retention.append(0)
+
+    out = pd.DataFrame({
+        "report_id": report_id,
+        "volume_id": df["volume_id"],
+        "volume_name": df["volume_name"],
+        "tenant_id": df["tenant_id"],
+        "tenant_name": df["tenant_name"],
+        "project_id": df["project_id"],
+        "project_name": df["project_name"],
+        "domain_id": df["tenant_id"],
+        "domain_name": df["tenant_name"],
+        "vm_id": df["vm_id"],
+        "vm_name": df["vm_name"],
+        "policy_name": df["policy_name"],
+        "retention": retention,
+        "last_snapshot_at": df["last_snapshot_at"],
+        "days_since": df["last_snapshot_age_days"],
+        "is_compliant": df["is_compliant"].fillna(False).astype(bool),
+        "compliance_status": df["status"] if "status" in df.columns else "Unknown",
+    })
+    out = out.astype(object).where(out.notna(), None)
+    return list(out.itertuples(index=False, name=None))
+
+
+def write_compliance_to_db(vol_comp: pd.DataFrame, input_file: str, output_file: str,
+                           sla_days: int, conn=None):
     """Write compliance report data to database tables.
 
     Creates one row per volume × policy (splitting the comma-separated
     policy string from the DataFrame).  Resolves tenant/domain and VM
     names from the DB so that compliance_details is fully populated.
+    Uses conn when given (left open), otherwise opens its own connection.
     """
+    own_conn = conn is None
     try:
-        conn = get_db_connection()
+        if own_conn:
+            conn = get_db_connection()
         cur = conn.cursor()
 
         # Count compliant vs non-compliant
@@ -174,144 +301,25 @@ def write_compliance_to_db(vol_comp: pd.DataFrame, input_file: str, output_file:
 
         report_id = cur.fetchone()[0]
 
-        # ---- Build lookup maps from DB for enrichment ----------------------
-        # project_id → (project_name, domain_id, domain_name)
-        project_map = {}
-        try:
-            cur.execute("""
-                SELECT p.id, p.name AS project_name,
+        details = []
+        if not vol_comp.empty:
+            # ---- Lookup frames from DB for enrichment ----------------------
+            projects = _query_frame(cur, """
+                SELECT p.id AS project_id, p.name AS project_name,
                        p.domain_id, d.name AS domain_name
                 FROM projects p
                 LEFT JOIN domains d ON d.id = p.domain_id
             """)
-            for prow in cur.fetchall():
-                project_map[prow[0]] = {
-                    "project_name": prow[1],
-                    "domain_id": prow[2],
-                    "domain_name": prow[3],
-                }
-        except Exception:
-            pass
-
-        # volume_id → (volume_name, vm_id, vm_name) from volumes + servers
-        volume_enrichment = {}
-        try:
-            cur.execute("""
-                SELECT v.id,
-                       v.name AS volume_name,
-                       v.raw_json->'attachments'->0->>'server_id' AS vm_id,
+            volumes = _query_frame(cur, f"""
+                SELECT v.id AS volume_id,
+                       NULLIF(v.name, '') AS volume_name,
+                       {_VOLUME_VM_ID} AS vm_id,
                        srv.name AS vm_name,
                        v.raw_json->'metadata' AS metadata
                 FROM volumes v
-                LEFT JOIN servers srv
-                    ON srv.id = v.raw_json->'attachments'->0->>'server_id'
+                LEFT JOIN servers srv ON srv.id = {_VOLUME_VM_ID}
             """)
-            for vrow in cur.fetchall():
-                volume_enrichment[vrow[0]] = {
-                    "volume_name": vrow[1] if vrow[1] else None,
-                    "vm_id": vrow[2],
-                    "vm_name": vrow[3],
-                    "metadata": vrow[4] if vrow[4] else {},
-                }
-        except Exception:
-            pass
-
-        # ---- Prepare compliance detail rows --------------------------------
-        if not vol_comp.empty:
-            details = []
-            for _, row in vol_comp.iterrows():
-                volume_id = row.get("volume_id")
-                project_id = row.get("project_id")
-
-                # Resolve names from DB lookups
-                vol_info = volume_enrichment.get(volume_id, {})
-                proj_info = project_map.get(project_id, {})
-
-                # Volume name: prefer DB name, fall back to DataFrame, skip NaN
-                raw_vol_name = row.get("volume_name")
-                if pd.isna(raw_vol_name) or str(raw_vol_name).strip().lower() in ("nan", ""):
-                    raw_vol_name = None
-                vol_name = vol_info.get("volume_name") or raw_vol_name
-
-                # Tenant = domain (project→domain)
-                tenant_id = proj_info.get("domain_id") or row.get("domain_id")
-                tenant_name = proj_info.get("domain_name") or row.get("domain_name")
-                if pd.isna(tenant_name):
-                    tenant_name = None
-
-                # Project name
-                project_name = proj_info.get("project_name") or row.get("project_name")
-                if pd.isna(project_name):
-                    project_name = None
-
-                # Domain
-                domain_id = proj_info.get("domain_id") or row.get("domain_id")
-                if pd.isna(domain_id):
-                    domain_id = None
-                domain_name = proj_info.get("domain_name") or row.get("domain_name")
-                if pd.isna(domain_name):
-                    domain_name = None
-
-                # VM info
-                vm_id = vol_info.get("vm_id") or (row.get("vm_id") if pd.notna(row.get("vm_id")) else None)
-                vm_name = vol_info.get("vm_name") or (row.get("vm_name") if pd.notna(row.get("vm_name")) else None)
-
-                # Last snapshot
-                last_snapshot_at = None
-                if pd.notna(row.get("last_snapshot_at")):
-                    last_snapshot_at = row["last_snapshot_at"]
-
-                days_since = None
-                if pd.notna(row.get("days_since_last_snapshot")):
-                    days_since = float(row["days_since_last_snapshot"])
-                elif pd.notna(row.get("last_snapshot_age_days")):
-                    days_since = float(row["last_snapshot_age_days"])
-
-                is_compliant = bool(row.get("is_compliant", False))
-                compliance_status = row.get("status", "Unknown")
-                if pd.isna(compliance_status):
-                    compliance_status = "Compliant" if is_compliant else "Missing"
-
-                # Split comma-separated policies into individual rows
-                policies_str = str(row.get("policy", "")) if pd.notna(row.get("policy")) else ""
-                policies = [p.strip() for p in policies_str.split(",") if p.strip()]
-                if not policies:
-                    policies = ["unknown"]
-
-                # Get per-policy retention from volume metadata
-                vol_metadata = vol_info.get("metadata", {})
-                if isinstance(vol_metadata, str):
-                    try:
-                        vol_metadata = json.loads(vol_metadata)
-                    except Exception:
-                        vol_metadata = {}
-
-                for policy_name in policies:
-                    ret_key = f"retention_{policy_name}"
-                    try:
-                        retention = int(vol_metadata.get(ret_key, 0))
-                    except (TypeError, ValueError):
-                        retention = 0
-
-                    details.append((
-                        report_id,
-                        volume_id,
-                        vol_name,
-                        tenant_id,
-                        tenant_name,
-                        project_id,
-                        project_name,
-                        domain_id,
-                        domain_name,
-                        vm_id,
-                        vm_name,
-                        policy_name,
-                        retention,
-                        last_snapshot_at,
-                        days_since,
-                        is_compliant,
-                        compliance_status,
-                    ))
+            details = build_compliance_details(vol_comp, report_id, projects, volumes)
 
             # Bulk insert compliance details
             execute_values(cur, """
@@ -320,18 +328,22 @@ def write_compliance_to_db(vol_comp: pd.DataFrame, input_file: str, output_file:
                  domain_id, domain_name, vm_id, vm_name, policy_name, retention_days, last_snapshot_at,
                  days_since_snapshot, is_compliant, compliance_status)
                 VALUES %s
-            """, details)
+            """, details, page_size=1000)
 
         conn.commit()
         cur.close()
-        conn.close()
 
-        print(f"✅ Compliance data written to database (report ID: {report_id}, {len(details) if not vol_comp.empty else 0} detail rows)")
+        print(f"✅ Compliance data written to database (report ID: {report_id}, {len(details)} detail rows)")
         return report_id
-        
+
     except Exception as e:
         print(f"⚠️  Failed to write to database: {e}")
+        if conn is not None and not own_conn:
+            conn.rollback()
         return None
+    finally:
+        if own_conn and conn is not None:
+            conn.close()
 
 
 def get_retention_for_policy(meta: dict, policy_name: str, default: int = 7) -> int:
@@ -380,41 +392,105 @@ def load_rvtools_data(path: str):
     return data
 
 
-def find_latest_snapshot_for_volume(snapshots_df: pd.DataFrame, volume_id: str):
-    """
-    Return (last_snapshot_at, last_snap_row, total_snaps_for_volume)
-    where last_snapshot_at is a timezone-naive datetime (UTC), or None.
-    """
-    if snapshots_df.empty:
-        return None, None, 0
+def _column(df: pd.DataFrame, name: str) -> pd.Series:
+    if name in df.columns:
+        return df[name]
+    return pd.Series(None, index=df.index, dtype=object)
+
+
+def _first_present(df: pd.DataFrame, names) -> pd.Series:
+    """Row-wise first non-empty value across the columns in *names*."""
+    out = pd.Series(None, index=df.index, dtype=object)
+    for name in names:
+        col = _column(df, name)
+        out = out.combine_first(col.mask(col == ""))
+    return out
 
-    snaps = snapshots_df[snapshots_df["volume_id"] == volume_id]
-    if snaps.empty:
-        return None, None, 0
 
-    snaps = snaps.copy()
-    # Normalize created_at column
-    if "created_at" in snaps.columns:
-        snaps["created_at"] = pd.to_datetime(
-            snaps["created_at"], utc=True, errors="coerce"
+def _project_lookup(tenants_df: pd.DataFrame, domains_df: pd.DataFrame) -> pd.DataFrame:
+    """project_id -> project_name, domain_id, domain_name (one row per project)."""
+    columns = ["project_name", "domain_id", "domain_name"]
+    if tenants_df.empty:
+        return pd.DataFrame(columns=columns)
+
+    proj = pd.DataFrame({
+        "project_id": _first_present(tenants_df, ["project_id", "id"]),
+        "project_name": _first_present(tenants_df, ["project_name", "name"]),
+        "domain_id": _column(tenants_df, "domain_id"),
+    })
+    proj = proj[proj["project_id"].notna()].drop_duplicates("project_id", keep="last")
+
+    if not domains_df.empty and {"id", "name"} <= set(domains_df.columns):
+        domain_names = (
+            domains_df[domains_df["id"].notna()]
+            .drop_duplicates("id", keep="last")
+            .set_index("id")["name"]
         )
+        proj["domain_name"] = proj["domain_id"].map(domain_names)
     else:
-        snaps["created_at"] = pd.NaT
+        proj["domain_name"] = None
+    return proj.set_index("project_id")[columns]
 
-    snaps = snaps.dropna(subset=["created_at"])
-    if snaps.empty:
-        return None, None, 0
 
-    snaps = snaps.sort_values("created_at", ascending=False)
-    last_row = snaps.iloc[0]
-    last_dt_utc = last_row["created_at"]
-    if pd.isna(last_dt_utc):
-        last_dt_utc = None
-    else:
-        # Convert to timezone-naive for Excel compatibility
-        last_dt_utc = last_dt_utc.to_pydatetime().replace(tzinfo=None)
+def _volume_frame(data: dict):
+    """
+    Per-volume identity, tenant/domain and snapshot settings shared by the
+    VolumeSnapshotCompliance and AllVolumes sheets.
 
-    return last_dt_utc, last_row, len(snaps)
+    Returns (frame, parsed metadata, policy lists), all on the volumes index.
+    """
+    volumes_df = data["volumes"]
+    proj = _project_lookup(data["tenants"], data["domains"])
+
+    project_id = _first_present(volumes_df, ["os-vol-tenant-attr:tenant_id", "project_id"])
+    meta = _column(volumes_df, "metadata").map(parse_metadata_field)
+    policies = meta.map(parse_policies_from_metadata)
+
+    frame = pd.DataFrame({
+        "domain_name": project_id.map(proj["domain_name"]),
+        "project_name": project_id.map(proj["project_name"]),
+        "project_id": project_id,
+        "volume_id": _column(volumes_df, "id"),
+        "volume_name": _column(volumes_df, "name"),
+        "volume_size_gb": _column(volumes_df, "size"),
+        "volume_status": _column(volumes_df, "status"),
+        "bootable": _column(volumes_df, "bootable"),
+        "auto_snapshot": meta.map(lambda m: normalize_bool(m.get("auto_snapshot"))).astype(bool),
+        "policy": policies.map(",".join),
+        "domain_id": project_id.map(proj["domain_id"]),
+    })
+    return frame, meta, policies
+
+
+def latest_snapshots(snapshots_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per volume_id with its newest snapshot:
+      last_snapshot_at (timezone-naive UTC), snapshots_count,
+      last_snapshot_policy, last_snapshot_created_by
+
+    Snapshots without a parseable created_at are not counted.
+    """
+    columns = ["last_snapshot_at", "snapshots_count",
+               "last_snapshot_policy", "last_snapshot_created_by"]
+    if snapshots_df.empty or not {"volume_id", "created_at"} <= set(snapshots_df.columns):
+        return pd.DataFrame(columns=columns, index=pd.Index([], name="volume_id"))
+
+    snaps = pd.DataFrame({
+        "volume_id": snapshots_df["volume_id"],
+        "created_at": pd.to_datetime(snapshots_df["created_at"], utc=True, errors="coerce"),
+        "metadata": _column(snapshots_df, "metadata"),
+    }).dropna(subset=["volume_id", "created_at"])
+    snaps = snaps.sort_values("created_at", ascending=False, kind="stable")
+
+    latest = snaps.drop_duplicates("volume_id").set_index("volume_id")
+    snap_meta = latest["metadata"].map(parse_metadata_field)
+    return pd.DataFrame({
+        # Timezone-naive for Excel compatibility
+        "last_snapshot_at": latest["created_at"].dt.tz_localize(None),
+        "snapshots_count": snaps.groupby("volume_id").size(),
+        "last_snapshot_policy": snap_meta.map(lambda m: m.get("policy") or m.get("snapshot_policy")),
+        "last_snapshot_created_by": snap_meta.map(lambda m: m.get("created_by")),
+    }, columns=columns)
 
 
 def build_snapshot_details_sheet(
@@ -445,47 +521,12 @@ def build_snapshot_details_sheet(
         vols_small, on="volume_id", how="left", suffixes=("", "_vol")
     )
 
-    # Add tenant/project name
-    proj_map = {}
-    if not tenants_df.empty:
-        if "project_id" in tenants_df.columns:
-            pid_col = "project_id"
-        elif "id" in tenants_df.columns:
-            pid_col = "id"
-        else:
-            pid_col = None
-
-        if pid_col:
-            for _, row in tenants_df.iterrows():
-                pid = row.get(pid_col)
-                pname = row.get("project_name") or row.get("name")
-                if pid:
-                    proj_map[pid] = pname
-
-    snap_enriched["project_name"] = snap_enriched["project_id"].map(proj_map)
-
-    # Add domain name
-    domain_map = {}
-    if not domains_df.empty:
-        for _, row in domains_df.iterrows():
-            did = row.get("id")
-            dname = row.get("name")
-            if did:
-                domain_map[did] = dname
-
+    # Add tenant/project and domain name
+    proj = _project_lookup(tenants_df, domains_df)
+    snap_enriched["project_name"] = snap_enriched["project_id"].map(proj["project_name"])
     if not tenants_df.empty:
-        # we assume Tenants sheet has project_id -> domain_id
-        proj_domain_map = {}
-        for _, row in tenants_df.iterrows():
-            pid = row.get("project_id") or row.get("id")
-            did = row.get("domain_id")
-            if pid and did:
-                proj_domain_map[pid] = did
-
-        snap_enriched["domain_id"] = snap_enriched["project_id"].map(
-            proj_domain_map
-        )
-        snap_enriched["domain_name"] = snap_enriched["domain_id"].map(domain_map)
+        snap_enriched["domain_id"] = snap_enriched["project_id"].map(proj["domain_id"])
+        snap_enriched["domain_name"] = snap_enriched["project_id"].map(proj["domain_name"])
     else:
         snap_enriched["domain_id"] = None
         snap_enriched["domain_name"] = None
@@ -502,6 +543,7 @@ def build_snapshot_details_sheet(
 def build_volume_compliance(
     data: dict,
     sla_default_days: int = 2,
+    now: datetime | None = None,
 ):
     """
     Build the main VolumeSnapshotCompliance dataframe.
@@ -511,126 +553,46 @@ def build_volume_compliance(
       - volume metadata (auto_snapshot, snapshot_policies, retention, etc.)
       - last snapshot info (timestamp, age in days, policy if present)
       - is_compliant flag
-    """
-    volumes_df = data["volumes"].copy()
-    snapshots_df = data["snapshots"].copy()
-    tenants_df = data["tenants"].copy()
-    domains_df = data["domains"].copy()
 
-    if volumes_df.empty:
+    now is a timezone-naive UTC datetime (default: current time).
+    """
+    if data["volumes"].empty:
         return pd.DataFrame()
 
-    # Build project -> domain & tenant maps
-    proj_to_tenant = {}
-    proj_to_domain = {}
-    if not tenants_df.empty:
-        for _, row in tenants_df.iterrows():
-            pid = row.get("project_id") or row.get("id")
-            pname = row.get("project_name") or row.get("name")
-            did = row.get("domain_id")
-            if pid:
-                proj_to_tenant[pid] = pname
-                proj_to_domain[pid] = did
-
-    domain_id_to_name = {}
-    if not domains_df.empty:
-        for _, row in domains_df.iterrows():
-            did = row.get("id")
-            dname = row.get("name")
-            if did:
-                domain_id_to_name[did] = dname
-
-    rows = []
-    now_utc = datetime.now(timezone.utc).replace(tzinfo=None)
-
-    # Pre-normalize snapshots timestamps
-    if not snapshots_df.empty and "created_at" in snapshots_df.columns:
-        snapshots_df["created_at"] = pd.to_datetime(
-            snapshots_df["created_at"], utc=True, errors="coerce"
-        )
+    df, meta, policies = _volume_frame(data)
+    now_utc = now or datetime.now(timezone.utc).replace(tzinfo=None)
 
-    for _, v in volumes_df.iterrows():
-        vol_id = v.get("id")
-        vol_name = v.get("name")
-        vol_size = v.get("size")
-        vol_status = v.get("status")
-        vol_bootable = v.get("bootable")
-
-        # Tenant / domain info
-        project_id = v.get("os-vol-tenant-attr:tenant_id") or v.get("project_id")
-        project_name = proj_to_tenant.get(project_id)
-        domain_id = proj_to_domain.get(project_id)
-        domain_name = domain_id_to_name.get(domain_id)
-
-        # Parse metadata
-        meta_raw = v.get("metadata")
-        meta = parse_metadata_field(meta_raw)
-        auto_snap = normalize_bool(meta.get("auto_snapshot"))
-
-        policies = parse_policies_from_metadata(meta)
-        policies_str = ",".join(policies)
+    def sla_for(m):
         # For SLA we use either sla_days metadata or default
-        sla_days_raw = meta.get("sla_days")
+        raw = m.get("sla_days")
         try:
-            sla_days = int(str(sla_days_raw)) if sla_days_raw is not None else sla_default_days
+            return int(str(raw)) if raw is not None else sla_default_days
         except Exception:
-            sla_days = sla_default_days
-
-        # Last snapshot for this volume
-        last_snap_at, last_snap_row, total_snaps = find_latest_snapshot_for_volume(
-            snapshots_df, vol_id
-        )
-
-        if last_snap_at is not None:
-            age_days = (now_utc - last_snap_at).total_seconds() / 86400.0
-        else:
-            age_days = None
-
-        # Determine policy of the last snapshot (if metadata present)
-        last_policy = None
-        last_created_by = None
-        if last_snap_row is not None:
-            snap_meta_raw = last_snap_row.get("metadata")
-            snap_meta = parse_metadata_field(snap_meta_raw)
-            last_policy = snap_meta.get("policy") or snap_meta.get("snapshot_policy")
-            last_created_by = snap_meta.get("created_by")
-
-        # Compliance logic
-        if not auto_snap:
-            is_compliant = False
-        elif not policies:
-            is_compliant = False
-        elif last_snap_at is None:
-            is_compliant = False
-        else:
-            # Check age
-            is_compliant = age_days is not None and age_days <= sla_days
-
-        rows.append(
-            {
-                "domain_name": domain_name,
-                "project_name": project_name,
-                "project_id": project_id,
-                "volume_id": vol_id,
-                "volume_name": vol_name,
-                "volume_size_gb": vol_size,
-                "volume_status": vol_status,
-                "bootable": vol_bootable,
-                "auto_snapshot": auto_snap,
-                "policy": policies_str,
-                "policy_type": determine_policy_type(policies),
-                "sla_days": sla_days,
-                "last_snapshot_at": last_snap_at,
-                "last_snapshot_age_days": age_days,
-                "snapshots_count": total_snaps,
-                "last_snapshot_policy": last_policy,
-                "last_snapshot_created_by": last_created_by,
-                "is_compliant": bool(is_compliant),
-            }
-        )
+            return sla_default_days
+
+    df = df.join(latest_snapshots(data["snapshots"]), on="volume_id")
+    df["last_snapshot_at"] = pd.to_datetime(df["last_snapshot_at"])
+    df["snapshots_count"] = df["snapshots_count"].fillna(0).astype(int)
+    df["sla_days"] = meta.map(sla_for)
+    df["last_snapshot_age_days"] = (now_utc - df["last_snapshot_at"]).dt.total_seconds() / 86400.0
+    df["policy_type"] = policies.map(determine_policy_type)
+
+    # Compliance logic: auto_snapshot on, a policy set, a snapshot within the SLA
+    df["is_compliant"] = (
+        df["auto_snapshot"]
+        & policies.map(bool)
+        & df["last_snapshot_age_days"].le(df["sla_days"])
+    )
+    df["vm_id"] = _column(data["volumes"], "vm_id")
+    df["vm_name"] = _column(data["volumes"], "vm_name")
 
-    df = pd.DataFrame(rows)
-    return df
+    return df[[
+        "domain_name", "project_name", "project_id", "volume_id", "volume_name",
+        "volume_size_gb", "volume_status", "bootable", "auto_snapshot", "policy",
+        "policy_type", "sla_days", "last_snapshot_at", "last_snapshot_age_days",
+        "snapshots_count", "last_snapshot_policy", "last_snapshot_created_by",
+        "is_compliant", "domain_id", "vm_id", "vm_name",
+    ]]
 
 
 def determine_policy_type(policies: list[str]):
@@ -663,6 +625,18 @@ def determine_policy_type(policies: list[str]):
     return ",".join(policies)
 
 
+def _summarize(vol_comp: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    out = (
+        vol_comp.groupby(keys, dropna=False)["is_compliant"]
+        .agg(total_volumes="size", compliant_volumes="sum")
+        .reset_index()
+    )
+    out["compliant_volumes"] = out["compliant_volumes"].astype(int)
+    out["non_compliant_volumes"] = out["total_volumes"] - out["compliant_volumes"]
+    out["compliance_ratio"] = out["compliant_volumes"] / out["total_volumes"]
+    return out.sort_values(keys, ignore_index=True)
+
+
 def build_tenant_compliance_summary(vol_comp: pd.DataFrame):
     """
     Summarize compliance at tenant (project) level.
@@ -675,33 +649,7 @@ def build_tenant_compliance_summary(vol_comp: pd.DataFrame):
     """
     if vol_comp.empty:
         return pd.DataFrame()
-
-    grp = vol_comp.groupby(
-        ["domain_name", "project_name", "project_id"], dropna=False
-    )
-
-    rows = []
-    for (domain, project, pid), df in grp:
-        total = len(df)
-        compliant = int(df["is_compliant"].sum())
-        non_compliant = total - compliant
-        ratio = compliant / total if total else 0.0
-
-        rows.append(
-            {
-                "domain_name": domain,
-                "project_name": project,
-                "project_id": pid,
-                "total_volumes": total,
-                "compliant_volumes": compliant,
-                "non_compliant_volumes": non_compliant,
-                "compliance_ratio": ratio,
-            }
-        )
-
-    return pd.DataFrame(rows).sort_values(
-        ["domain_name", "project_name", "project_id"]
-    )
+    return _summarize(vol_comp, ["domain_name", "project_name", "project_id"])
 
 
 def build_domain_compliance_summary(vol_comp: pd.DataFrame):
@@ -710,27 +658,7 @@ def build_domain_compliance_summary(vol_comp: pd.DataFrame):
     """
     if vol_comp.empty:
         return pd.DataFrame()
-
-    grp = vol_comp.groupby(["domain_name"], dropna=False)
-
-    rows = []
-    for domain, df in grp:
-        total = len(df)
-        compliant = int(df["is_compliant"].sum())
-        non_compliant = total - compliant
-        ratio = compliant / total if total else 0.0
-
-        rows.append(
-            {
-                "domain_name": domain,
-                "total_volumes": total,
-                "compliant_volumes": compliant,
-                "non_compliant_volumes": non_compliant,
-                "compliance_ratio": ratio,
-            }
-        )
-
-    return pd.DataFrame(rows).sort_values(["domain_name"])
+    return _summarize(vol_comp, ["domain_name"])
 
 
 def build_policy_compliance_summary(vol_comp: pd.DataFrame):
@@ -742,36 +670,15 @@ def build_policy_compliance_summary(vol_comp: pd.DataFrame):
     if vol_comp.empty:
         return pd.DataFrame()
 
-    df = vol_comp.copy()
-    df["policy_list"] = df["policy"].fillna("").apply(
-        lambda s: [p.strip() for p in str(s).split(",") if p.strip()]
-    )
-
-    df = df.explode("policy_list")
-    df = df[df["policy_list"].notna() & (df["policy_list"] != "")]
+    df = vol_comp[["policy", "is_compliant"]].assign(
+        policy=vol_comp["policy"].fillna("").map(
+            lambda s: [p.strip() for p in str(s).split(",") if p.strip()]
+        )
+    ).explode("policy")
+    df = df[df["policy"].notna()]
     if df.empty:
         return pd.DataFrame()
-
-    grp = df.groupby("policy_list")
-
-    rows = []
-    for policy, g in grp:
-        total = len(g)
-        compliant = int(g["is_compliant"].sum())
-        non_compliant = total - compliant
-        ratio = compliant / total if total else 0.0
-
-        rows.append(
-            {
-                "policy": policy,
-                "total_volumes": total,
-                "compliant_volumes": compliant,
-                "non_compliant_volumes": non_compliant,
-                "compliance_ratio": ratio,
-            }
-        )
-
-    return pd.DataFrame(rows).sort_values(["policy"])
+    return _summarize(df, ["policy"])
 
 
 def build_all_volumes_sheet(data: dict):
@@ -779,158 +686,140 @@ def build_all_volumes_sheet(data: dict):
     Build a generic AllVolumes sheet for reference (all volumes, even
     if auto_snapshot is not enabled).
     """
-    volumes_df = data["volumes"].copy()
-    tenants_df = data["tenants"].copy()
-    domains_df = data["domains"].copy()
-
-    if volumes_df.empty:
+    if data["volumes"].empty:
         return pd.DataFrame()
 
-    # Build project -> tenant / domain
-    proj_to_tenant = {}
-    proj_to_domain = {}
-    if not tenants_df.empty:
-        for _, row in tenants_df.iterrows():
-            pid = row.get("project_id") or row.get("id")
-            pname = row.get("project_name") or row.get("name")
-            did = row.get("domain_id")
-            if pid:
-                proj_to_tenant[pid] = pname
-                proj_to_domain[pid] = did
-
-    domain_id_to_name = {}
-    if not domains_df.empty:
-        for _, row in domains_df.iterrows():
-            did = row.get("id")
-            dname = row.get("name")
-            if did:
-                domain_id_to_name[did] = dname
-
-    rows = []
-    for _, v in volumes_df.iterrows():
-        vol_id = v.get("id")
-        vol_name = v.get("name")
-        vol_size = v.get("size")
-        vol_status = v.get("status")
-        vol_bootable = v.get("bootable")
-        project_id = v.get("os-vol-tenant-attr:tenant_id") or v.get("project_id")
-        project_name = proj_to_tenant.get(project_id)
-        domain_id = proj_to_domain.get(project_id)
-        domain_name = domain_id_to_name.get(domain_id)
-
-        meta = parse_metadata_field(v.get("metadata"))
-        auto_snap = normalize_bool(meta.get("auto_snapshot"))
-        policies = parse_policies_from_metadata(meta)
-        policies_str = ",".join(policies)
-
-        rows.append(
-            {
-                "domain_name": domain_name,
-                "project_name": project_name,
-                "project_id": project_id,
-                "volume_id": vol_id,
-                "volume_name": vol_name,
-                "volume_size_gb": vol_size,
-                "volume_status": vol_status,
-                "bootable": vol_bootable,
-                "auto_snapshot": auto_snap,
-                "policy": policies_str,
-                "raw_metadata": v.get("metadata"),
-            }
-        )
+    df, _meta, _policies = _volume_frame(data)
+    df["raw_metadata"] = _column(data["volumes"], "metadata")
+    return df.drop(columns=["domain_id"])
 
-    return pd.DataFrame(rows)
-
-
-def main(input_path: str | None = None, output_path: str | None = None):
-    if input_path is None:
-        # If not provided, pick the latest pf9_rvtools_*.xlsx from the
-        # default report directory /mnt/reports (which maps to C:\Reports\Platform9).
-        default_dir = "/mnt/reports"
-        search_dir = default_dir if os.path.isdir(default_dir) else "."
-        latest = None
-        latest_mtime = None
-        for name in os.listdir(search_dir):
-            if not name.lower().endswith(".xlsx"):
-                continue
-            if not name.startswith("p9_rvtools_"):
-                continue
-            path = os.path.join(search_dir, name)
-            try:
-                mtime = os.path.getmtime(path)
-            except OSError:
-                continue
-            if latest is None or mtime > latest_mtime:
-                latest = path
-                latest_mtime = mtime
-
-        if latest is None:
-            raise SystemExit(
-                "No pf9_rvtools_*.xlsx found. Please specify --input or place a report in "
-                f"{search_dir}."
-            )
-
-        input_path = latest
-
-    if output_path is None:
-        base_dir = os.path.dirname(os.path.abspath(input_path))
-        ts = datetime.now(timezone.utc).strftime("%Y-%m-%d_%H%M%SZ")
-        output_path = os.path.join(
-            base_dir, f"snapshot_compliance_{ts}.xlsx"
-        )
 
-    print(f"Input : {input_path}")
-    print(f"Output: {output_path}")
+def _excel_safe(df: pd.DataFrame) -> pd.DataFrame:
+    """JSON-encode dict/list cells (JSONB columns from the DB); openpyxl cannot write them."""
+    for col in df.columns[df.dtypes == object]:
+        nested = df[col].map(lambda v: isinstance(v, (dict, list)))
+        if nested.any():
+            df[col] = df[col].where(~nested, df[col][nested].map(json.dumps))
+    return df
 
-    data = load_rvtools_data(input_path)
-    vol_comp = build_volume_compliance(data)
-    tenant_summary = build_tenant_compliance_summary(vol_comp)
-    domain_summary = build_domain_compliance_summary(vol_comp)
-    policy_summary = build_policy_compliance_summary(vol_comp)
-    snapshot_details = build_snapshot_details_sheet(
-        data["snapshots"], data["volumes"], data["tenants"], data["domains"]
-    )
-    all_volumes = build_all_volumes_sheet(data)
 
-    # Ensure all datetime columns are timezone-naive for Excel
-    if not vol_comp.empty and "last_snapshot_at" in vol_comp.columns:
-        vol_comp["last_snapshot_at"] = pd.to_datetime(
-            vol_comp["last_snapshot_at"], errors="coerce"
-        ).dt.tz_localize(None)
+def _latest_rvtools_export() -> str:
+    # Pick the latest pf9_rvtools_*.xlsx from the default report directory
+    # /mnt/reports (which maps to C:\Reports\Platform9).
+    default_dir = "/mnt/reports"
+    search_dir = default_dir if os.path.isdir(default_dir) else "."
+    latest = None
+    latest_mtime = None
+    for name in os.listdir(search_dir):
+        if not name.lower().endswith(".xlsx"):
+            continue
+        if not name.startswith("p9_rvtools_"):
+            continue
+        path = os.path.join(search_dir, name)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            continue
+        if latest is None or mtime > latest_mtime:
+            latest = path
+            latest_mtime = mtime
+
+    if latest is None:
+        raise SystemExit(
+            "No pf9_rvtools_*.xlsx found. Please specify --input or place a report in "
+            f"{search_dir}."
+        )
+    return latest
 
-    if not snapshot_details.empty and "created_at" in snapshot_details.columns:
-        snapshot_details["created_at"] = pd.to_datetime(
-            snapshot_details["created_at"], errors="coerce"
-        ).dt.tz_localize(None)
 
-    with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
-        vol_comp.to_excel(writer, "VolumeSnapshotCompliance", index=False)
-        tenant_summary.to_excel(writer, "TenantComplianceSummary", index=False)
-        domain_summary.to_excel(writer, "DomainComplianceSummary", index=False)
-        policy_summary.to_excel(writer, "PolicyComplianceSummary", index=False)
-        snapshot_details.to_excel(writer, "SnapshotDetails", index=False)
-        all_volumes.to_excel(writer, "AllVolumes", index=False)
+def main(
+    input_path: str | None = None,
+    output_path: str | None = None,
+    source: str = "db",
+    sla_days: int | None = None,
+    region_id: str | None = None,
+):
+    if sla_days is None:
+        sla_days = int(os.getenv("COMPLIANCE_REPORT_SLA_DAYS", "2"))
+
+    conn = None
+    try:
+        t0 = time.perf_counter()
+        if source == "db":
+            conn = get_db_connection()
+            data = load_db_data(conn, region_id)
+            input_label = f"db:{region_id}" if region_id else "db"
+            base_dir = "/mnt/reports" if os.path.isdir("/mnt/reports") else "."
+        else:
+            if input_path is None:
+                input_path = _latest_rvtools_export()
+            data = load_rvtools_data(input_path)
+            input_label = input_path
+            base_dir = os.path.dirname(os.path.abspath(input_path))
+
+        if output_path is None:
+            ts = datetime.now(timezone.utc).strftime("%Y-%m-%d_%H%M%SZ")
+            suffix = f"{region_id}_{ts}" if region_id else ts
+            output_path = os.path.join(base_dir, f"snapshot_compliance_{suffix}.xlsx")
+
+        print(f"Input : {input_label}")
+        print(f"Output: {output_path}")
+        print(f"Loaded {len(data['volumes'])} volumes, {len(data['snapshots'])} snapshots "
+              f"in {time.perf_counter() - t0:.1f}s")
+
+        t0 = time.perf_counter()
+        vol_comp = build_volume_compliance(data, sla_default_days=sla_days)
+        tenant_summary = build_tenant_compliance_summary(vol_comp)
+        domain_summary = build_domain_compliance_summary(vol_comp)
+        policy_summary = build_policy_compliance_summary(vol_comp)
+        snapshot_details = build_snapshot_details_sheet(
+            data["snapshots"], data["volumes"], data["tenants"], data["domains"]
+        )
+        all_volumes = build_all_volumes_sheet(data)
+        print(f"Computed compliance in {time.perf_counter() - t0:.1f}s")
+
+        with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
+            sheets = {
+                "VolumeSnapshotCompliance": vol_comp,
+                "TenantComplianceSummary": tenant_summary,
+                "DomainComplianceSummary": domain_summary,
+                "PolicyComplianceSummary": policy_summary,
+                "SnapshotDetails": snapshot_details,
+                "AllVolumes": all_volumes,
+            }
+            for sheet_name, frame in sheets.items():
+                _excel_safe(frame).to_excel(writer, sheet_name=sheet_name, index=False)
+
+        print("Done.")
 
-    print("Done.")
-    
-    # Write compliance data to database
-    sla_days = int(os.getenv("COMPLIANCE_REPORT_SLA_DAYS", "2"))
-    write_compliance_to_db(vol_comp, input_path, output_path, sla_days)
+        # Write compliance data to database
+        write_compliance_to_db(vol_comp, input_label, output_path, sla_days, conn=conn)
+    finally:
+        if conn is not None:
+            conn.close()
 
 
 def _cli():
     import argparse
 
     parser = argparse.ArgumentParser(
-        description="Build snapshot compliance report from pf9_rvtools Excel output."
+        description="Build snapshot compliance report from the inventory DB or a pf9_rvtools export."
+    )
+    parser.add_argument(
+        "--source",
+        choices=("db", "xlsx"),
+        default=None,
+        help="Read volumes/snapshots from the DB (default) or from a pf9_rvtools workbook "
+             "(default when --input is given).",
     )
     parser.add_argument(
         "--input",
         "-i",
         default=None,
         help=(
-            "Path to pf9_rvtools_*.xlsx. If omitted, the script will pick the "
-            "latest pf9_rvtools_*.xlsx from C:\\Reports\\Platform9 (or current dir)."
+            "Path to pf9_rvtools_*.xlsx (implies --source xlsx). With --source xlsx and no "
+            "--input, the latest pf9_rvtools_*.xlsx from C:\\Reports\\Platform9 (or current "
+            "dir) is used."
         ),
     )
     parser.add_argument(
@@ -939,13 +828,27 @@ def _cli():
         default=None,
         help=(
             "Output Excel path. If omitted, a timestamped snapshot_compliance_*.xlsx "
-            "will be created next to the input file."
+            "is created in the reports directory (or next to the input file)."
         ),
     )
+    parser.add_argument(
+        "--sla-days",
+        type=int,
+        default=None,
+        help="Default SLA in days for volumes without sla_days metadata "
+             "(default: COMPLIANCE_REPORT_SLA_DAYS or 2).",
+    )
+    parser.add_argument(
+        "--region-id",
+        default=None,
+        help="Only report volumes and snapshots of this region (DB source).",
+    )
 
     args = parser.parse_args()
-    main(args.input, args.output)
+    source = args.source or ("xlsx" if args.input else "db")
+    main(args.input, args.output, source=source, sla_days=args.sla_days,
+         region_id=args.region_id)
 
 
 if __name__ == "__main__":
-    main()
+    _cli()
@@ -1,8 +1,14 @@
+import importlib.util
+import signal
 import socket
 import os
+import sys
+from unittest.mock import patch
 
 import pytest
 
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 
 def pytest_configure(config):
     config.addinivalue_line(
@@ -40,3 +46,22 @@ def tenant_direct_available() -> bool:
     host = url.split("://")[-1].split("/")[0].split(":")[0]
     port_str = url.split("://")[-1].split("/")[0].split(":")[1] if ":" in url.split("://")[-1].split("/")[0] else "8010"
     return _is_port_open(host, int(port_str))
+
+
+def load_worker(path: str, name: str, stubs: dict = None):
+    """Import a worker script (*path* relative to the repo root) as module *name*.
+
+    Workers install SIGINT/SIGTERM handlers at import; pytest's are put back.
+    *stubs* are placed in sys.modules for the import only, so stubs other
+    tests install are untouched.
+    """
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, path))
+    module = importlib.util.module_from_spec(spec)
+    handlers = {sig: signal.getsignal(sig) for sig in (signal.SIGINT, signal.SIGTERM)}
+    try:
+        with patch.dict(sys.modules, stubs or {}):
+            spec.loader.exec_module(module)
+    finally:
+        for sig, handler in handlers.items():
+            signal.signal(sig, handler)
+    return module
@@ -0,0 +1,202 @@
+"""
+tests/test_api_cache.py — two-tier cache (L1 LRU + Redis) and single-flight
+in api/cache.py.
+
+Other test modules replace ``cache`` in sys.modules with a stub, so the real
+module is loaded from its file under a private name.  Redis is replaced by a
+small in-memory fake; no server is needed.
+"""
+import importlib.util
+import os
+import threading
+import time
+
+import pytest
+
+_CACHE_PATH = os.path.join(os.path.dirname(__file__), "..", "api", "cache.py")
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+        self.gets = 0
+        self.lock = threading.Lock()
+
+    def _alive(self, key):
+        exp = self.expires.get(key)
+        if exp is not None and exp <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def ping(self):
+        return True
+
+    def get(self, key):
+        with self.lock:
+            self.gets += 1
+            return self.data.get(key) if self._alive(key) else None
+
+    def setex(self, key, ttl, value):
+        with self.lock:
+            self.data[key] = value
+            self.expires[key] = time.monotonic() + ttl
+
+    def set(self, key, value, nx=False, px=None):
+        with self.lock:
+            if nx and self._alive(key):
+                return None
+            self.data[key] = str(value)
+            if px:
+                self.expires[key] = time.monotonic() + px / 1000
+            return True
+
+    def exists(self, key):
+        with self.lock:
+            return int(self._alive(key))
+
+    def delete(self, key):
+        with self.lock:
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+
+
+@pytest.fixture()
+def cache_mod(monkeypatch):
+    monkeypatch.setenv("CACHE_ENABLED", "true")
+    monkeypatch.setenv("CACHE_L1_MAX_ENTRIES", "3")
+    monkeypatch.setenv("CACHE_STALE_SECONDS", "30")
+    spec = importlib.util.spec_from_file_location("_api_cache_under_test", _CACHE_PATH)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    redis = _FakeRedis()
+    monkeypatch.setattr(mod, "_get_client", lambda: redis)
+    mod.fake_redis = redis
+    return mod
+
+
+class _Client:
+    region_id = "r1"
+
+    def __init__(self, cache_mod, ttl=60, delay=0.0):
+        self.calls = 0
+        self.lock = threading.Lock()
+        owner = self
+
+        @cache_mod.cached(ttl=ttl, key_prefix="test:servers")
+        def list_servers(self, project_id=None):
+            with owner.lock:
+                owner.calls += 1
+                n = owner.calls
+            time.sleep(delay)
+            return [{"id": f"vm-{n}", "project_id": project_id}]
+
+        self.list_servers = list_servers.__get__(self)
+        self.invalidate = list_servers.invalidate
+
+
+def test_l1_hit_skips_redis_and_returns_a_copy(cache_mod):
+    c = _Client(cache_mod)
+    first = c.list_servers("p1")
+    gets = cache_mod.fake_redis.gets
+    second = c.list_servers("p1")
+    assert second == first and c.calls == 1
+    assert cache_mod.fake_redis.gets == gets          # served from L1
+    second[0]["id"] = "mutated"
+    assert c.list_servers("p1")[0]["id"] == "vm-1"    # callers get independent copies
+    stats = cache_mod.cache_stats()
+    assert stats["misses"] == 1 and stats["l1_hits"] == 2
+
+
+def test_l2_hit_populates_l1(cache_mod):
+    c = _Client(cache_mod)
+    c.list_servers("p1")
+    cache_mod._l1.clear()                             # e.g. another worker
+    assert c.list_servers("p1")[0]["id"] == "vm-1"
+    assert c.calls == 1
+    assert cache_mod.cache_stats()["l2_hits"] == 1
+
+
+def test_l1_is_bounded_lru(cache_mod):
+    c = _Client(cache_mod)
+    for pid in ("a", "b", "c", "d"):
+        c.list_servers(pid)
+    assert len(cache_mod._l1) == 3
+
+
+def test_concurrent_misses_are_coalesced(cache_mod):
+    c = _Client(cache_mod, delay=0.1)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(c.list_servers("p1"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert c.calls == 1
+    assert all(r == results[0] for r in results)
+    assert cache_mod.cache_stats()["coalesced"] == 7
+
+
+def test_expired_key_is_served_stale_while_one_caller_refreshes(cache_mod, monkeypatch):
+    c = _Client(cache_mod, ttl=60, delay=0.1)
+    c.list_servers("p1")
+    # Expire both tiers' freshness but keep the stale window.
+    key = next(iter(cache_mod._l1._data))
+    raw, _, stale_until = cache_mod._l1._data[key]
+    cache_mod._l1._data[key] = (raw, time.monotonic() - 1, stale_until)
+    real_time = time.time
+    monkeypatch.setattr(cache_mod.time, "time", lambda: real_time() + 120)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(c.list_servers("p1")[0]["id"])) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert c.calls == 2                                # exactly one refresh
+    assert results.count("vm-2") == 1
+    assert results.count("vm-1") == 4
+    assert cache_mod.cache_stats()["stale_served"] == 4
+
+
+def test_other_worker_holding_lock_is_waited_for(cache_mod):
+    c = _Client(cache_mod)
+    c.list_servers("p1")
+    key = next(iter(cache_mod._l1._data))
+    cache_mod._l1.clear()
+    redis = cache_mod.fake_redis
+    redis.delete(key)
+    redis.set(f"{key}:lock", 999, nx=True, px=5000)
+
+    def other_worker():
+        time.sleep(0.1)
+        redis.setex(key, 60, '{"__pf9c": 1, "exp": %f, "v": [{"id": "vm-other"}]}' % (time.time() + 60))
+        redis.delete(f"{key}:lock")
+
+    threading.Thread(target=other_worker).start()
+    assert c.list_servers("p1") == [{"id": "vm-other"}]
+    assert c.calls == 1
+
+
+def test_invalidate_clears_both_tiers(cache_mod):
+    c = _Client(cache_mod)
+    c.list_servers("p1")
+    c.invalidate(c, "p1")
+    assert c.list_servers("p1")[0]["id"] == "vm-2"
+
+
+def test_legacy_plain_redis_value_is_accepted(cache_mod):
+    c = _Client(cache_mod)
+    key = cache_mod._cache_key("test:servers", (c, "p1"), {})
+    cache_mod.fake_redis.setex(key, 60, '[{"id": "legacy"}]')
+    assert c.list_servers("p1") == [{"id": "legacy"}]
+    assert c.calls == 0
+
+
+def test_works_without_redis(cache_mod, monkeypatch):
+    monkeypatch.setattr(cache_mod, "_get_client", lambda: None)
+    c = _Client(cache_mod)
+    c.list_servers("p1")
+    c.list_servers("p1")
+    assert c.calls == 1
@@ -169,3 +169,154 @@ class TestTouchAlive:
         monkeypatch.setattr(_bw, "_ALIVE_FILE", "/nonexistent_dir/alive")
         # Should not raise
         _bw._touch_alive()
+
+
+# ---------------------------------------------------------------------------
+# Tests: single-pass verification and directory dumps
+# ---------------------------------------------------------------------------
+import gzip as _gzip  # noqa: E402
+import hashlib  # noqa: E402
+import zlib  # noqa: E402
+
+from shared import backup_artifacts  # noqa: E402
+
+_SQL = b"--\n-- PostgreSQL database dump\n--\n\nSET statement_timeout = 0;\n" + b"x" * 5000
+
+
+class TestGzipCheck:
+    def test_complete_stream_keeps_head(self):
+        data = _gzip.compress(_SQL)
+        check = _bw._GzipCheck()
+        for i in range(0, len(data), 7):
+            check.feed(data[i:i + 7])
+        assert check.complete
+        assert check.head == _SQL[:4096]
+
+    def test_concatenated_members_are_accepted(self):
+        check = _bw._GzipCheck()
+        check.feed(_gzip.compress(b"-- a\n") + _gzip.compress(b"-- b\n"))
+        assert check.complete and check.head == b"-- a\n-- b\n"
+
+    def test_truncated_stream_is_incomplete(self):
+        check = _bw._GzipCheck()
+        check.feed(_gzip.compress(_SQL)[:-6])
+        assert not check.complete
+
+    def test_corrupt_stream_raises(self):
+        data = bytearray(_gzip.compress(_SQL))
+        data[-8] ^= 0xFF  # CRC-32 trailer
+        with pytest.raises(zlib.error):
+            _bw._GzipCheck().feed(bytes(data))
+
+
+class TestDumpPlain:
+    def _dump(self, script, tmp_path, monkeypatch):
+        monkeypatch.setattr(_bw, "_compressor_cmd", lambda: ["gzip"])
+        target = tmp_path / "out.sql.gz"
+        return target, _bw._dump_plain([sys.executable, "-c", script], os.environ.copy(), str(target))
+
+    def test_hash_and_integrity_come_from_the_write_pass(self, tmp_path, monkeypatch):
+        target, (sha256, (status, notes)) = self._dump(
+            "import sys; sys.stdout.write('-- PostgreSQL database dump\\n' + 'x' * 5000)",
+            tmp_path, monkeypatch)
+        assert sha256 == hashlib.sha256(target.read_bytes()).hexdigest()
+        assert status == "valid" and "PostgreSQL database dump" in notes
+        assert _gzip.decompress(target.read_bytes()).startswith(b"-- PostgreSQL")
+        assert oct(target.stat().st_mode & 0o777) == "0o600"
+
+    def test_non_sql_output_is_flagged_invalid(self, tmp_path, monkeypatch):
+        _, (_, (status, notes)) = self._dump("print('not a dump')", tmp_path, monkeypatch)
+        assert status == "invalid" and "does not look like" in notes
+
+    def test_failed_pg_dump_raises(self, tmp_path, monkeypatch):
+        with pytest.raises(RuntimeError, match="pg_dump rc=3"):
+            self._dump("import sys; sys.exit(3)", tmp_path, monkeypatch)
+
+
+def _directory_dump(tmp_path):
+    dump_dir = tmp_path / "pf9_mgmt_20260101_000000.dump"
+    dump_dir.mkdir()
+    (dump_dir / "toc.dat").write_bytes(b"PGDMP" + b"\x00" * 100)
+    (dump_dir / "4001.dat.gz").write_bytes(_gzip.compress(b"1\tacme\n" * 200))
+    (dump_dir / "4002.dat.gz").write_bytes(_gzip.compress(b"2\tglobex\n" * 200))
+    return dump_dir
+
+
+class TestDirectoryDump:
+    def test_verify_writes_manifest_matching_artifact_hash(self, tmp_path):
+        dump_dir = _directory_dump(tmp_path)
+        manifest_hash, (status, notes) = _bw._verify_directory_dump(str(dump_dir))
+        assert status == "valid" and notes.startswith("3 files OK")
+        assert set(backup_artifacts.read_manifest(str(dump_dir))) == {
+            "toc.dat", "4001.dat.gz", "4002.dat.gz"}
+        assert backup_artifacts.artifact_sha256(str(dump_dir)) == manifest_hash
+
+    def test_tampered_member_fails_artifact_hash(self, tmp_path):
+        dump_dir = _directory_dump(tmp_path)
+        _bw._verify_directory_dump(str(dump_dir))
+        (dump_dir / "4002.dat.gz").write_bytes(_gzip.compress(b"tampered"))
+        with pytest.raises(ValueError, match="4002.dat.gz"):
+            backup_artifacts.artifact_sha256(str(dump_dir))
+
+    def test_truncated_member_is_flagged_invalid(self, tmp_path):
+        dump_dir = _directory_dump(tmp_path)
+        data = (dump_dir / "4001.dat.gz").read_bytes()
+        (dump_dir / "4001.dat.gz").write_bytes(data[:-10])
+        _, (status, notes) = _bw._verify_directory_dump(str(dump_dir))
+        assert status == "invalid" and "4001.dat.gz" in notes
+
+    def test_restore_uses_parallel_pg_restore(self, tmp_path, monkeypatch):
+        dump_dir = _directory_dump(tmp_path)
+        updates, runs = [], []
+        monkeypatch.setattr(_bw, "_update_job", lambda conn, job_id, **f: updates.append(f))
+        monkeypatch.setattr(_bw.subprocess, "run", lambda cmd, **kw: runs.append(cmd) or
+                            types.SimpleNamespace(returncode=0, stderr=b""))
+        assert _bw._run_restore(MagicMock(), 7, str(dump_dir)) is True
+        assert runs[0][0] == "pg_restore" and runs[0][-1] == str(dump_dir)
+        assert runs[0][runs[0].index("-j") + 1] == str(_bw.BACKUP_JOBS)
+        assert updates[-1]["status"] == "completed"
+
+    def _retention(self, tmp_path, monkeypatch, paths):
+        monkeypatch.setattr(_bw, "BACKUP_PATH", str(tmp_path))
+        monkeypatch.setattr(_bw, "_fetch_config",
+                            lambda conn: {"retention_count": 0, "retention_days": 30})
+        monkeypatch.setattr(_bw.psycopg2, "extras", _psycopg2_extras_stub, raising=False)
+        conn = MagicMock()
+        cur = conn.cursor.return_value.__enter__.return_value
+        now = datetime.datetime.utcnow()
+        cur.fetchall.return_value = [
+            {"id": i, "file_path": str(p), "created_at": now} for i, p in enumerate(paths)
+        ]
+        _bw._enforce_retention(conn, "database")
+
+    def test_retention_removes_directory_dumps(self, tmp_path, monkeypatch):
+        dump_dir = _directory_dump(tmp_path)
+        old_file = tmp_path / "pf9_mgmt_20250101_000000.sql.gz"
+        old_file.write_bytes(b"x")
+        self._retention(tmp_path, monkeypatch, [dump_dir, old_file])
+        assert not dump_dir.exists() and not old_file.exists()
+
+    def test_retention_never_removes_the_backup_tree(self, tmp_path, monkeypatch):
+        _directory_dump(tmp_path)
+        ldap_dir = tmp_path / "ldap"
+        ldap_dir.mkdir()
+        (ldap_dir / "pf9_ldap_20260101_000000.ldif.gz").write_bytes(b"x")
+        not_a_dump = tmp_path / "pf9_mgmt_20260102_000000.dump"
+        not_a_dump.mkdir()
+        (not_a_dump / "keep").write_bytes(b"x")
+        self._retention(tmp_path, monkeypatch, [tmp_path, ldap_dir, not_a_dump])
+        assert (ldap_dir / "pf9_ldap_20260101_000000.ldif.gz").exists()
+        assert (not_a_dump / "keep").exists()
+        assert (tmp_path / "pf9_mgmt_20260101_000000.dump" / "toc.dat").exists()
+
+    def test_remove_artifact_refuses_paths_outside_the_layout(self, tmp_path):
+        base = tmp_path / "backups"
+        nested = base / "ldap" / "pf9_mgmt_20260101_000000.dump"
+        nested.mkdir(parents=True)
+        (nested / "toc.dat").write_bytes(b"PGDMP")
+        outside = tmp_path / "elsewhere.sql.gz"
+        outside.write_bytes(b"x")
+        for path in (base, base / "ldap", nested, outside, base / ".." / "elsewhere.sql.gz"):
+            with pytest.raises(ValueError):
+                backup_artifacts.remove_artifact(str(path), str(base))
+        assert nested.exists() and outside.exists()
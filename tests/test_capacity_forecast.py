@@ -0,0 +1,110 @@
+"""Tests for the batched fitters in intelligence_worker/engines/forecast.py."""
+import math
+import sys
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "intelligence_worker"))
+
+from engines.forecast import (  # noqa: E402
+    confidence,
+    days_to_pct,
+    fit_holt,
+    fit_linear,
+    fit_theil_sen,
+    last_valid,
+    pack_series,
+)
+
+DAY = 86400.0
+
+
+def _reference_ols(xs, ys):
+    """The per-series least squares the engine used before batching."""
+    n = len(xs)
+    sx, sy = sum(xs), sum(ys)
+    sxy = sum(x * y for x, y in zip(xs, ys))
+    sxx = sum(x * x for x in xs)
+    slope = (n * sxy - sx * sy) / (n * sxx - sx * sx)
+    intercept = (sy - slope * sx) / n
+    y_mean = sy / n
+    ss_tot = sum((y - y_mean) ** 2 for y in ys)
+    ss_res = sum((y - (slope * x + intercept)) ** 2 for x, y in zip(xs, ys))
+    return slope, intercept, max(0.0, 1.0 - ss_res / ss_tot)
+
+
+def test_pack_drops_missing_values_and_rebases_time():
+    X, Y = pack_series([
+        ([10 * DAY, 11 * DAY, 12 * DAY], [None, 5, 7]),
+        ([0.0], [1]),
+        ([], []),
+    ])
+    assert X.shape == (3, 3)
+    assert list(X[0, :2]) == [0.0, 1.0] and math.isnan(X[0, 2])
+    assert list(Y[0, :2]) == [5.0, 7.0]
+    assert list(last_valid(Y)[:2]) == [7.0, 1.0] and math.isnan(last_valid(Y)[2])
+    _, Y0 = pack_series([([0.0, DAY], [None, 3])], fill=0.0)
+    assert list(Y0[0]) == [0.0, 3.0]
+
+
+def test_linear_matches_per_series_least_squares():
+    rng = np.random.default_rng(7)
+    series, expected = [], []
+    for k in range(20):
+        n = 7 + k
+        xs = np.sort(rng.uniform(0, 14, n))
+        ys = 3.0 * k * xs + 100 + rng.normal(0, 2, n)
+        series.append((list(xs * DAY), list(ys)))
+        expected.append(_reference_ols(list(xs - xs[0]), list(ys)))
+    fit = fit_linear(*pack_series(series))
+    for i, (slope, intercept, r2) in enumerate(expected):
+        assert fit.slope[i] == pytest.approx(slope, rel=1e-9, abs=1e-9)
+        assert fit.intercept[i] == pytest.approx(intercept, rel=1e-9, abs=1e-9)
+        assert fit.r2[i] == pytest.approx(r2, abs=1e-9)
+        assert fit.slope_lo[i] <= fit.slope[i] <= fit.slope_hi[i]
+    assert list(fit.n) == [7 + k for k in range(20)]
+
+
+def test_degenerate_series():
+    X, Y = pack_series([([0.0], [5]), ([0.0, DAY, 2 * DAY], [4, 4, 4]), ([0.0, DAY], [1, 3])])
+    fit = fit_linear(X, Y)
+    assert (fit.slope[0], fit.intercept[0], fit.r2[0]) == (0.0, 5.0, 0.0)
+    assert (fit.slope[1], fit.r2[1]) == (0.0, 1.0)
+    assert fit.slope[2] == pytest.approx(2.0)
+    # No interval below three points
+    assert math.isnan(fit.slope_lo[0]) and math.isnan(fit.slope_hi[2])
+
+
+def test_theil_sen_ignores_outliers_and_subsamples_long_series():
+    xs = np.arange(200) / 10.0
+    ys = 2.0 * xs + 50
+    ys[[20, 90, 150]] = [500, -300, 900]  # spikes
+    fit_ts = fit_theil_sen(*pack_series([(list(xs * DAY), list(ys))]), max_points=64)
+    fit_ols = fit_linear(*pack_series([(list(xs * DAY), list(ys))]))
+    assert fit_ts.slope[0] == pytest.approx(2.0, abs=1e-9)
+    assert fit_ts.intercept[0] == pytest.approx(50.0, abs=1e-9)
+    assert abs(fit_ols.slope[0] - 2.0) > 0.1
+    assert fit_ts.n[0] == 200
+    assert fit_ts.slope_lo[0] <= 2.0 <= fit_ts.slope_hi[0]
+
+
+def test_holt_follows_recent_growth():
+    # Flat for 10 days, then +5/day for 4 days, sampled every 6 h
+    xs = np.arange(0, 14, 0.25)
+    ys = np.where(xs < 10, 100.0, 100.0 + 5 * (xs - 10))
+    packed = pack_series([(list(xs * DAY), list(ys))])
+    holt, ols = fit_holt(*packed), fit_linear(*packed)
+    assert holt.slope[0] == pytest.approx(5.0, rel=0.05)
+    assert ols.slope[0] < 3.0
+
+
+def test_days_to_pct_and_confidence():
+    days = days_to_pct(np.array([50, 95, 50, 50]), np.array([100, 100, 0, 100]),
+                       np.array([2.0, 1.0, 1.0, -1.0]))
+    assert days[0] == pytest.approx(20.0)
+    assert days[1] == 0.0
+    assert math.isnan(days[2]) and math.isnan(days[3])
+    assert list(confidence(np.array([15, 60]), np.array([0.5, 0.9]))) == [0.25, 0.9]
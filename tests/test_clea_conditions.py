@@ -232,3 +232,26 @@ class TestConditionMatches:
         assert _condition_matches(
             {"severity": "critical", "entity_type": "host"}, self.META
         ) is False
+
+
+# ===========================================================================
+# _trigger_runbook_for_clea
+# ===========================================================================
+
+def test_auto_trigger_queues_for_the_runbook_pool():
+    import clea_routes
+
+    cur = MagicMock()
+    cur.fetchone.return_value = {"execution_id": "rb-1"}
+    conn = MagicMock()
+    conn.cursor.return_value.__enter__.return_value = cur
+    pool = MagicMock()
+    runbook_routes = _make_stub("runbook_routes", runbook_pool=pool)
+    with patch.dict(sys.modules, {"runbook_routes": runbook_routes}), \
+            patch.object(clea_routes, "get_connection") as get_connection:
+        get_connection.return_value.__enter__.return_value = conn
+        clea_routes._trigger_runbook_for_clea(5, "stuck_vm_remediation", "clea-auto")
+
+    insert_sql = cur.execute.call_args_list[0][0][0]
+    assert "'queued'" in insert_sql and "queued_at" in insert_sql
+    pool.wake.assert_called_once_with()
@@ -115,6 +115,7 @@ def _stub_modules():
     ci = _make_stub("copilot_intents")
     ci.match_intent = MagicMock(return_value=None)
     ci.get_suggestion_chips = MagicMock(return_value={})
+    ci.explain_intent = MagicMock(return_value=[])
     ci._extract_scope = MagicMock(return_value=(None, None))
 
     # copilot_context / copilot_llm stubs — build on ONE module instance each
@@ -0,0 +1,92 @@
+"""
+Tests for the Ops Copilot intent index in api/copilot_intents.py.
+
+Rankings are compared with tests/fixtures/copilot_rankings.json: every
+intent above the threshold, with its score, as ranked by the pre-index matcher
+for each question in tests/fixtures/copilot_questions.txt.
+"""
+import importlib.util
+import json
+import os
+import random
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _load(name, path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module  # dataclasses resolve annotations through sys.modules
+    spec.loader.exec_module(module)
+    return module
+
+
+# Loaded by path: other tests replace "copilot_intents" in sys.modules with a stub.
+ci = _load("copilot_intents_index", os.path.join(ROOT, "api", "copilot_intents.py"))
+
+with open(os.path.join(ROOT, "tests", "fixtures", "copilot_questions.txt"), encoding="utf-8") as _fh:
+    QUESTIONS = [line.strip() for line in _fh if line.strip()]
+with open(os.path.join(ROOT, "tests", "fixtures", "copilot_rankings.json"), encoding="utf-8") as _fh:
+    RANKINGS = json.load(_fh)
+
+
+def _ranking(question):
+    ranked, _scope, _host = ci._rank(question)
+    return [(score, intent.key) for score, intent, _signals in ranked]
+
+
+@pytest.mark.parametrize("question", QUESTIONS)
+def test_ranking_matches_recorded_ranking(question):
+    assert _ranking(question) == [tuple(item) for item in RANKINGS[question]]
+
+
+def _chained_replace(text):
+    for syn, canon in ci._SYNONYMS.items():
+        text = text.replace(syn, f"{syn} {canon}")
+    return text
+
+
+def test_synonym_expansion_matches_chained_replace():
+    pieces = list(ci._SYNONYMS) + ["ed", "s", "anis", "ation", " ", "x"]
+    rng = random.Random(7)
+    for _ in range(5000):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(1, 6)))
+        assert ci._expand_synonyms(text) == _chained_replace(text), text
+
+
+@pytest.mark.parametrize("pattern, literal", [
+    (r"how many (?:vms|servers)", "how many "),
+    (r"(?:vms?|servers?)\s+with\s+errors?", "error"),
+    (r"(?:list|show|display)?\s*subnets?(?:\s+overview)?", "subnet"),
+    (r"(?:recent|latest|last)\s+logins|who\s+logged\s+in", None),
+    (r"(?:cpu|vcpu)\s+(?:capacity|usage)", None),
+    (r"hosts?\s+(?:down|offline)", "host"),
+])
+def test_required_literal(pattern, literal):
+    assert ci._required_literal(pattern) == literal
+
+
+def test_every_gated_pattern_contains_its_literal():
+    for literal, compiled in ci._INDEX.patterns.items():
+        for _pos, _n, rx in compiled:
+            assert literal is None or literal in rx.pattern
+
+
+class TestSignals:
+    def test_match_reports_what_fired(self):
+        match = ci.match_intent("How many VMs on tenant org1?")
+        assert match.intent_key == "count_vms"
+        assert match.signals["pattern"].startswith("how many")
+        assert "how many vms" in match.signals["keywords"]
+        assert match.signals["scope"] is True
+
+    def test_explain_lists_candidates_best_first(self):
+        candidates = ci.explain_intent("show powered off vms", limit=3)
+        assert 1 <= len(candidates) <= 3
+        assert candidates[0]["intent_key"] == ci.match_intent("show powered off vms").intent_key
+        confidences = [c["confidence"] for c in candidates]
+        assert confidences == sorted(confidences, reverse=True)
+        assert all(c["signals"] for c in candidates)
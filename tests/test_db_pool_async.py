@@ -0,0 +1,181 @@
+"""
+tests/test_db_pool_async.py — off-loop helpers and pool waiting in api/db_pool.py
+
+psycopg2 is stubbed with an in-memory pool whose cursors sleep, so the tests
+can check that async callers keep the event loop free.  db_pool is loaded
+under a private name so the db_pool stubs other tests install are untouched.
+"""
+import asyncio
+import importlib.util
+import inspect
+import os
+import sys
+import threading
+import time
+import types
+from unittest.mock import patch
+
+import pytest
+
+_API_DIR = os.path.join(os.path.dirname(__file__), "..", "api")
+if _API_DIR not in sys.path:
+    sys.path.insert(0, _API_DIR)
+
+
+class _PoolError(Exception):
+    pass
+
+
+class _Cursor:
+    def __init__(self, conn, cursor_factory=None):
+        self.conn = conn
+        self.cursor_factory = cursor_factory
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        time.sleep(self.conn.latency)
+        self.conn.executed.append((sql, params))
+        self.rows = [{"n": 1, "thread": threading.current_thread().name}]
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self):
+        return list(self.rows)
+
+
+class _Conn:
+    latency = 0.0
+
+    def __init__(self):
+        self.executed = []
+        self.commits = 0
+
+    def cursor(self, cursor_factory=None):
+        return _Cursor(self, cursor_factory)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+
+class _FakePool:
+    """Like ThreadedConnectionPool: raises as soon as maxconn are out."""
+
+    def __init__(self, minconn, maxconn, **params):
+        self.maxconn = maxconn
+        self.out = 0
+        self.lock = threading.Lock()
+
+    def getconn(self):
+        with self.lock:
+            if self.out >= self.maxconn:
+                raise _PoolError("connection pool exhausted")
+            self.out += 1
+        return _Conn()
+
+    def putconn(self, conn):
+        with self.lock:
+            self.out -= 1
+
+    def closeall(self):
+        pass
+
+
+_psycopg2 = types.ModuleType("psycopg2")
+_psycopg2.pool = types.SimpleNamespace(ThreadedConnectionPool=_FakePool, PoolError=_PoolError)
+_extras = types.ModuleType("psycopg2.extras")
+_extras.RealDictCursor = object
+_STUBS = {"psycopg2": _psycopg2, "psycopg2.pool": _psycopg2.pool, "psycopg2.extras": _extras}
+
+with patch.dict(sys.modules, _STUBS):
+    _spec = importlib.util.spec_from_file_location(
+        "db_pool_under_test", os.path.join(_API_DIR, "db_pool.py"))
+    db_pool = importlib.util.module_from_spec(_spec)
+    _spec.loader.exec_module(db_pool)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_pool(monkeypatch):
+    monkeypatch.setitem(sys.modules, "psycopg2.extras", _extras)
+    monkeypatch.setattr(db_pool, "_db_params", lambda: {"host": "db", "dbname": "pf9_mgmt"})
+    monkeypatch.setattr(db_pool, "DB_ASYNC_DRIVER", "threads")
+    db_pool.init_pool(1, 2)
+    yield
+    db_pool.close_pool()
+    asyncio.run(db_pool.close_async_pools())
+
+
+def test_get_connection_waits_for_a_free_connection():
+    got = []
+
+    def borrow():
+        with db_pool.get_connection():
+            time.sleep(0.05)
+            got.append(1)
+
+    threads = [threading.Thread(target=borrow) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(got) == 6  # psycopg2's pool alone raises for the 3rd concurrent caller
+
+
+def test_get_connection_times_out_when_pool_stays_exhausted(monkeypatch):
+    monkeypatch.setattr(db_pool, "POOL_WAIT_SECONDS", 0.05)
+    with db_pool.get_connection(), db_pool.get_connection():
+        with pytest.raises(_PoolError):
+            with db_pool.get_connection():
+                pass
+    with db_pool.get_connection():  # slots were all released
+        pass
+
+
+def test_off_loop_runs_handler_on_db_threads_and_keeps_signature():
+    def handler(limit: "int" = 5, name: "str | None" = None):
+        return {"limit": limit, "thread": threading.current_thread().name}
+
+    wrapped = db_pool.off_loop(handler)
+    assert asyncio.iscoroutinefunction(wrapped)
+    params = inspect.signature(wrapped).parameters
+    assert params["limit"].annotation is int and params["limit"].default == 5
+    result = asyncio.run(wrapped(limit=7))
+    assert result["limit"] == 7 and result["thread"].startswith("db")
+
+
+def test_fetch_helpers_keep_the_event_loop_responsive(monkeypatch):
+    monkeypatch.setattr(_Conn, "latency", 0.2)
+    ticks = []
+
+    async def ticker():
+        for _ in range(10):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.02)
+
+    async def main():
+        rows, one, _ = await asyncio.gather(
+            db_pool.fetch_all("SELECT 1"), db_pool.fetch_one("SELECT 1"), ticker())
+        return rows, one
+
+    rows, one = asyncio.run(main())
+    assert rows[0]["n"] == 1 and one["thread"].startswith("db")
+    gaps = [b - a for a, b in zip(ticks, ticks[1:])]
+    assert max(gaps) < 0.15  # a blocking query would stall the ticker for 0.2 s
+
+
+def test_get_async_connection_requires_psycopg_driver():
+    async def use():
+        async with db_pool.get_async_connection():
+            pass
+
+    with pytest.raises(RuntimeError, match="DB_ASYNC_DRIVER=psycopg"):
+        asyncio.run(use())
@@ -0,0 +1,206 @@
+"""Tests for the history write paths in db_writer.py and the drift helpers they share."""
+import re
+import types
+
+from tests.conftest import load_worker
+
+# db_writer only needs these names at import; the tests below never reach
+# psycopg2 (execute_values is replaced per test).
+_extras = types.ModuleType("psycopg2.extras")
+_extras.execute_values = None
+_extras.RealDictCursor = object
+_psycopg2 = types.ModuleType("psycopg2")
+_psycopg2.extras = _extras
+
+db_writer = load_worker("db_writer.py", "db_writer_under_test",
+                        stubs={"psycopg2": _psycopg2, "psycopg2.extras": _extras})
+_collect_drift_changes = db_writer._collect_drift_changes
+_deletion_drift_event = db_writer._deletion_drift_event
+
+_RULES = [
+    {"id": 1, "field_name": "status", "severity": "warning", "description": "Status changed"},
+    {"id": 2, "field_name": "server_id", "severity": "info", "description": "Reattached"},
+]
+
+
+def test_changed_field_emits_event_with_old_and_new_values():
+    events = _collect_drift_changes(
+        "volumes", "vol-1",
+        {"status": "in-use", "server_id": "vm-a", "project_id": "p1"},
+        {"status": "available", "server_id": "vm-a", "name": "data"},
+        _RULES,
+    )
+    assert len(events) == 1
+    ev = events[0]
+    assert ev["rule_id"] == 1
+    assert (ev["old_value"], ev["new_value"]) == ("in-use", "available")
+    assert ev["resource_name"] == "data"
+    assert ev["project_id"] == "p1"
+    assert set(ev) == set(db_writer._DRIFT_EVENT_COLUMNS)
+
+
+def test_first_time_assignment_is_not_drift():
+    events = _collect_drift_changes(
+        "volumes", "vol-1",
+        {"status": "in-use", "server_id": None},
+        {"status": "in-use", "server_id": "vm-a"},
+        _RULES,
+    )
+    assert events == []
+
+
+def test_deletion_event_shape():
+    ev = _deletion_drift_event("ports", "port-9", {"name": "temp-9"}, _RULES[0])
+    assert ev["field_changed"] == "status"
+    assert (ev["old_value"], ev["new_value"]) == ("active", "deleted")
+    assert ev["description"] == "port 'temp-9' was deleted from OpenStack"
+
+
+def test_mode_dispatch(monkeypatch):
+    calls = []
+    monkeypatch.setattr(db_writer, "_upsert_with_history_rowwise", lambda *a: calls.append("row") or 1)
+    monkeypatch.setattr(db_writer, "_upsert_with_history_set_based", lambda *a: calls.append("set") or 1)
+    db_writer._upsert_with_history(None, "servers", [{"id": "x"}], mode="row")
+    db_writer._upsert_with_history(None, "servers", [{"id": "x"}], mode="set")
+    monkeypatch.setattr(db_writer, "HISTORY_WRITE_MODE", "row")
+    db_writer._upsert_with_history(None, "servers", [{"id": "x"}])
+    assert calls == ["row", "set", "row"]
+
+
+
+class _HistoryDB:
+    """
+    A recording cursor over one resource table, its history table and
+    drift_events, answering the statements the set-based path issues.
+    """
+
+    def __init__(self, table, rows, history, rules, history_table_exists=True):
+        self.table = table
+        self.history_table = f"{table}_history"
+        self.rows = {r["id"]: dict(r) for r in rows}
+        self.history = list(history)
+        self.rules = rules
+        self.history_table_exists = history_table_exists
+        self.stage = None
+        self.drift_events = []
+        self.statements = []
+        self._result = []
+        self.connection = self
+
+    # connection / cursor protocol
+    def cursor(self, cursor_factory=None):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def fetchall(self):
+        return self._result
+
+    def execute(self, sql, params=None):
+        sql = " ".join(sql.split())
+        self.statements.append(sql)
+        self._result = []
+        if "FROM drift_rules" in sql:
+            self._result = [dict(r) for r in self.rules]
+        elif sql.startswith(f"SELECT * FROM {self.table} WHERE id = ANY"):
+            self._result = [dict(self.rows[i]) for i in params[0] if i in self.rows]
+        elif sql.startswith("CREATE TEMP TABLE"):
+            if not self.history_table_exists:
+                raise RuntimeError(f'relation "{self.history_table}" does not exist')
+            self.stage = []
+        elif sql.startswith("DROP TABLE"):
+            self.stage = None
+        elif sql.startswith(f"INSERT INTO {self.history_table} "):
+            id_col = f"{self.table[:-1]}_id"
+            written = [s for s in self.stage if not any(
+                h[id_col] == s[id_col] and h["change_hash"] == s["change_hash"]
+                for h in self.history)]
+            self.history.extend(written)
+            self._result = [{id_col: s[id_col]} for s in written]
+        elif "LEFT JOIN unnest" in sql:
+            self._result = [dict(r) for i, r in self.rows.items() if i not in params[0]]
+
+    def execute_values(self, sql, rows, page_size=100):
+        sql = " ".join(sql.split())
+        self.statements.append(sql)
+        target, cols = re.match(r"INSERT INTO (\S+) \(([^)]*)\)", sql).groups()
+        records = [dict(zip(cols.split(", "), row)) for row in rows]
+        if target == self.table:
+            for r in records:
+                self.rows[r["id"]] = {**self.rows.get(r["id"], {}), **r}
+        elif target.startswith("_stage_"):
+            self.stage.extend(records)
+        elif target == "drift_events":
+            self.drift_events.extend(records)
+
+
+_VOLUMES = [
+    {"id": "vol-1", "name": "data", "status": "in-use", "project_id": "p1"},
+    {"id": "vol-2", "name": "spare", "status": "available", "project_id": "p1"},
+    {"id": "vol-gone", "name": "old", "status": "available", "project_id": "p1"},
+]
+
+
+def _set_based(monkeypatch, db, records):
+    tickets = []
+    monkeypatch.setattr(db_writer, "execute_values",
+                        lambda cur, sql, rows, page_size=100: cur.execute_values(sql, rows))
+    monkeypatch.setattr(db_writer, "_auto_ticket_for_drift_event",
+                        lambda conn, event: tickets.append(event["resource_id"]))
+    count = db_writer._upsert_with_history(db, "volumes", records, mode="set")
+    return count, tickets
+
+
+def test_set_based_history_drift_and_deletions(monkeypatch):
+    incoming = [
+        {"id": "vol-1", "name": "data", "status": "available", "project_id": "p1"},   # changed
+        {"id": "vol-2", "name": "spare", "status": "available", "project_id": "p1"},  # unchanged
+        {"id": "vol-3", "name": "new", "status": "available", "project_id": "p1"},    # new
+    ]
+    known = {"volume_id": "vol-2", "change_hash": db_writer._compute_change_hash(incoming[1])}
+    db = _HistoryDB("volumes", _VOLUMES, [known], _RULES)
+
+    count, tickets = _set_based(monkeypatch, db, incoming)
+
+    assert count == 3
+    assert db.rows["vol-1"]["status"] == "available" and "vol-3" in db.rows
+    # Only rows whose change_hash is new reach history, keyed by volume_id
+    assert [h["volume_id"] for h in db.history] == ["vol-2", "vol-1", "vol-3"]
+    assert db.history[1]["change_hash"] == db_writer._compute_change_hash(incoming[0])
+    assert db.stage is None   # staging table dropped
+    # Drift for the changed existing row, then the deletion of the missing one
+    assert [(e["resource_id"], e["field_changed"], e["old_value"], e["new_value"])
+            for e in db.drift_events] == [
+        ("vol-1", "status", "in-use", "available"),
+        ("vol-gone", "status", "active", "deleted"),
+    ]
+    assert tickets == ["vol-1", "vol-gone"]
+    staged = [s for s in db.statements if "_stage_volumes_history" in s]
+    assert staged[:3] == [
+        "DROP TABLE IF EXISTS pg_temp._stage_volumes_history",
+        "CREATE TEMP TABLE _stage_volumes_history ON COMMIT DROP AS "
+        "SELECT volume_id, name, status, project_id, change_hash, recorded_at "
+        "FROM volumes_history WITH NO DATA",
+        "INSERT INTO _stage_volumes_history "
+        "(volume_id, name, status, project_id, change_hash, recorded_at) VALUES %s",
+    ]
+    assert sum("INSERT INTO drift_events" in s for s in db.statements) == 2   # one per batch
+
+
+def test_set_based_missing_history_table_keeps_upsert_and_deletions(monkeypatch):
+    incoming = [{"id": "vol-1", "name": "data", "status": "available", "project_id": "p1"}]
+    db = _HistoryDB("volumes", _VOLUMES, [], _RULES, history_table_exists=False)
+
+    count, tickets = _set_based(monkeypatch, db, incoming)
+
+    assert count == 1
+    assert db.rows["vol-1"]["status"] == "available"
+    assert "ROLLBACK TO SAVEPOINT before_history" in db.statements
+    assert db.history == []
+    # Status drift rode on the history diff and is skipped; deletions still run
+    assert sorted(e["resource_id"] for e in db.drift_events) == ["vol-2", "vol-gone"]
+    assert sorted(tickets) == ["vol-2", "vol-gone"]
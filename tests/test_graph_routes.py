@@ -0,0 +1,266 @@
+"""
+Tests for the graph builders in api/graph_routes.py.
+
+``_build_graph_from_index`` (topology index + one batched badge query) must
+produce the graph ``_build_graph_sql`` (per-node queries) produces over the
+same inventory.  FakeCursor answers both: the full-table loads of
+topology_index and the per-node fetch / expand / badge queries, from the
+tables below.
+"""
+import os
+import re
+import sys
+import types
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
+
+import topology_index as ti  # noqa: E402
+from tests.conftest import load_worker  # noqa: E402
+
+_auth = types.ModuleType("auth")
+_auth.User = dict
+_auth.get_current_user = lambda: {"username": "admin"}
+_auth.require_permission = lambda *_args, **_kwargs: (lambda: {"username": "admin"})
+_db_pool = types.ModuleType("db_pool")
+_db_pool.get_connection = lambda: None
+_db_pool.off_loop = lambda fn: fn
+
+gr = load_worker("api/graph_routes.py", "graph_routes_under_test",
+                 stubs={"auth": _auth, "db_pool": _db_pool})
+
+NOW = datetime.utcnow()
+
+TABLES = {
+    "domains": [{"id": "d1", "name": "default"}, {"id": "d2", "name": "partner"}],
+    "projects": [
+        {"id": "t1", "name": "acme", "domain_id": "d1"},
+        {"id": "t2", "name": "globex", "domain_id": "d2"},
+    ],
+    "hypervisors": [{"id": 8, "hostname": "hv-01", "db_hostname": "hv-01",
+                     "state": "up", "status": "enabled", "resmgr_id": "rm-1",
+                     "vcpus": 64, "vcpus_used": 8}],
+    "host_aggregates": [{"id": 3, "name": "gold", "availability_zone": "az1",
+                         "host_count": 1, "raw_json": {"hosts": ["rm-1"]}}],
+    "images": [{"id": "img1", "name": "ubuntu", "status": "active"}],
+    "servers": [
+        {"id": "vm1", "name": "web", "status": "ACTIVE", "project_id": "t1",
+         "hypervisor_hostname": "hv-01", "image_id": "img1"},
+        {"id": "vm2", "name": "db", "status": "SHUTOFF", "project_id": "t1",
+         "hypervisor_hostname": "hv-01", "image_id": None},
+        {"id": "vm3", "name": "partner-app", "status": "ERROR", "project_id": "t2",
+         "hypervisor_hostname": "hv-01", "image_id": "img1"},
+    ],
+    "volumes": [
+        {"id": "vol1", "name": "data", "status": "in-use", "project_id": "t1", "server_id": "vm1"},
+        {"id": "vol2", "name": "spare", "status": "available", "project_id": "t1", "server_id": None},
+        {"id": "vol3", "name": "logs", "status": "in-use", "project_id": "t2", "server_id": "vm3"},
+    ],
+    "snapshots": [
+        {"id": "s1", "name": "daily", "status": "available", "volume_id": "vol1",
+         "project_id": "t1", "created_at": NOW - timedelta(days=1)},
+        {"id": "s2", "name": "weekly", "status": "available", "volume_id": "vol1",
+         "project_id": "t1", "created_at": NOW - timedelta(days=10)},
+        {"id": "s3", "name": "logs-old", "status": "available", "volume_id": "vol3",
+         "project_id": "t2", "created_at": NOW - timedelta(days=30)},
+        {"id": "s4", "name": "stray", "status": "error", "volume_id": "gone",
+         "project_id": "t1", "created_at": NOW},
+    ],
+    "networks": [
+        {"id": "n1", "name": "lan", "status": "ACTIVE", "project_id": "t1"},
+        {"id": "n2", "name": "partner-lan", "status": "ACTIVE", "project_id": "t2"},
+    ],
+    "subnets": [{"id": "sn1", "name": "lan-v4", "network_id": "n1"}],
+    "ports": [
+        {"id": "p1", "name": "", "status": "ACTIVE", "network_id": "n1", "device_id": "vm1",
+         "device_owner": "compute:nova", "first_ip": "10.0.0.5", "security_groups": ["sg1", "sgx"]},
+        {"id": "p2", "name": "", "status": "ACTIVE", "network_id": "n1", "device_id": "vm2",
+         "device_owner": "compute:nova", "first_ip": "10.0.0.6", "security_groups": ["sg1"]},
+        {"id": "p3", "name": "", "status": "ACTIVE", "network_id": "n1", "device_id": "r1",
+         "device_owner": "network:router_interface", "first_ip": "10.0.0.1",
+         "security_groups": ["sg2"]},
+        {"id": "p4", "name": "", "status": "ACTIVE", "network_id": "n2", "device_id": "vm3",
+         "device_owner": "compute:nova", "first_ip": "10.1.0.5", "security_groups": ["sgx"]},
+    ],
+    "floating_ips": [
+        {"id": "f1", "name": "1.2.3.4", "floating_ip": "1.2.3.4", "status": "ACTIVE",
+         "project_id": "t1", "port_id": "p1"},
+        {"id": "f2", "name": "1.2.3.5", "floating_ip": "1.2.3.5", "status": "DOWN",
+         "project_id": "t1", "port_id": None},
+    ],
+    "security_groups": [
+        {"id": "sg1", "name": "web", "project_id": "t1"},
+        {"id": "sg2", "name": "router", "project_id": "t1"},
+        {"id": "sg3", "name": "unused", "project_id": "t1"},
+        {"id": "sgx", "name": "shared", "project_id": "t2"},
+    ],
+    "drift_events": [
+        {"resource_type": "servers", "resource_id": "vm1", "acknowledged": False},
+        {"resource_type": "volumes", "resource_id": "vol1", "acknowledged": True},
+        {"resource_type": "hypervisors", "resource_id": "8", "acknowledged": False},
+    ],
+    "restore_jobs": [{"restore_point_id": "s1"}],
+}
+
+_NTYPE = {"hypervisors": "host", "snapshots": "snapshot", "ports": "port"}
+
+
+class FakeCursor:
+    """RealDictCursor stand-in answering graph_routes and topology_index SQL."""
+
+    def __init__(self, tables):
+        self.t = tables
+        self.queries = []
+        self._rows = []
+
+    def _row(self, table, row):
+        hidden = ti._PRIVATE_COLUMNS.get(_NTYPE.get(table), ())
+        return {k: v for k, v in row.items() if k not in hidden}
+
+    def _compute_ports(self, **match):
+        return [p for p in self.t["ports"]
+                if p["device_owner"].startswith("compute:")
+                and all(p[k] == v for k, v in match.items())]
+
+    @staticmethod
+    def _distinct(rows):
+        seen, out = set(), []
+        for r in rows:
+            if r["id"] not in seen:
+                seen.add(r["id"])
+                out.append(r)
+        return out
+
+    def _lookup(self, table, column, value):
+        return [dict(r) for r in self.t[table] if str(r.get(column)) == str(value)]
+
+    def _answer(self, sql, p):
+        t = self.t
+        if "UNION" in sql:
+            drift_ids, snapshot_ids = p
+            return ([{"kind": "drift", "resource_type": d["resource_type"],
+                      "resource_id": d["resource_id"]}
+                     for d in t["drift_events"]
+                     if not d["acknowledged"] and d["resource_id"] in drift_ids]
+                    + [{"kind": "restore", "resource_type": None,
+                        "resource_id": r["restore_point_id"]}
+                       for r in t["restore_jobs"] if r["restore_point_id"] in snapshot_ids])
+        if "FROM drift_events" in sql:
+            return [1] * any(d["resource_type"] == p[0] and d["resource_id"] == str(p[1])
+                             and not d["acknowledged"] for d in t["drift_events"])
+        if "FROM restore_jobs" in sql:
+            return self._lookup("restore_jobs", "restore_point_id", p[0])
+        if "MAX(created_at)" in sql:
+            dates = [s["created_at"] for s in t["snapshots"] if s["volume_id"] == p[0]]
+            return [{"latest": max(dates) if dates else None}]
+        if "FROM ports WHERE (raw_json->'security_groups') ?" in sql:
+            return [1] * any(p[0] in port["security_groups"] for port in t["ports"])
+        if "JOIN ports p ON p.network_id = n.id" in sql:   # VM → networks
+            ports = self._compute_ports(device_id=p[0])
+            return self._distinct([self._lookup("networks", "id", port["network_id"])[0]
+                                   for port in ports])
+        if "FROM security_groups sg JOIN ports" in sql:     # VM → security groups
+            ports = self._compute_ports(device_id=p[0])
+            return self._distinct([self._lookup("security_groups", "id", sg)[0]
+                                   for port in ports for sg in port["security_groups"]])
+        if "FROM floating_ips fi JOIN ports" in sql:        # VM → floating IPs
+            return [fip for port in self._compute_ports(device_id=p[0])
+                    for fip in self._lookup("floating_ips", "port_id", port["id"])]
+        if "DISTINCT ON (s.id)" in sql:                     # network → VMs
+            vms = {}
+            for port in self._compute_ports(network_id=p[0]):
+                for vm in self._lookup("servers", "id", port["device_id"]):
+                    vms.setdefault(vm["id"], {**vm, "ip_address": port["first_ip"]})
+            return [vms[k] for k in sorted(vms)]
+        if "JOIN ports p ON p.device_id = s.id" in sql:     # security group → VMs
+            ports = [port for port in self._compute_ports() if p[0] in port["security_groups"]]
+            return self._distinct([vm for port in ports
+                                   for vm in self._lookup("servers", "id", port["device_id"])])
+        if "@> to_jsonb" in sql:                            # host → aggregates
+            return [dict(a) for a in t["host_aggregates"] if p[0] in a["raw_json"]["hosts"]]
+        if "raw_json->'service'->>'host' = %s" in sql:      # aggregate → host
+            return [self._row("hypervisors", h) for h in t["hypervisors"] if h["resmgr_id"] == p[0]]
+        if "FROM hypervisors WHERE hostname = %s" in sql:   # VM → host
+            return [self._row("hypervisors", h) for h in t["hypervisors"]
+                    if h["db_hostname"] == p[0]]
+        m = re.search(r"FROM (\w+)(?: p)? WHERE (?:p\.)?(\w+) = %s", sql)
+        if m:
+            return [self._row(m.group(1), r) for r in self._lookup(m.group(1), m.group(2), p[0])]
+        table = sql.rsplit("FROM ", 1)[1].split()[0]        # topology_index full load
+        return [dict(r) for r in t[table]]
+
+    def execute(self, sql, params=None):
+        self.queries.append(sql)
+        self._rows = self._answer(" ".join(sql.split()), params)
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    def fetchall(self):
+        return list(self._rows)
+
+
+@pytest.fixture(autouse=True)
+def _no_auto_tickets(monkeypatch):
+    monkeypatch.setattr(gr, "_trigger_health_auto_tickets", lambda nodes: None)
+
+
+@pytest.fixture
+def index():
+    return ti.TopologyIndex.load(FakeCursor(TABLES), generation=1)
+
+
+def _both(index, ntype, db_id, depth, domain=None):
+    from_index = gr._build_graph_from_index(FakeCursor(TABLES), index, ntype, db_id, depth, domain)
+    from_sql = gr._build_graph_sql(FakeCursor(TABLES), ntype, db_id, depth, domain)
+    return from_index, from_sql
+
+
+@pytest.mark.parametrize("ntype, db_id, depth, domain", [
+    ("vm", "vm1", 2, None),
+    ("vm", "vm1", 2, "d1"),
+    ("tenant", "t1", 2, None),
+    ("domain", "d1", 3, None),
+    ("network", "n1", 2, None),
+    ("volume", "vol1", 2, None),
+    ("snapshot", "s4", 1, None),
+    ("fip", "f1", 2, None),
+    ("sg", "sgx", 2, None),
+    ("sg", "sgx", 2, "d1"),
+    ("host", "8", 2, None),
+])
+def test_index_graph_matches_per_node_sql(index, ntype, db_id, depth, domain):
+    from_index, from_sql = _both(index, ntype, db_id, depth, domain)
+    assert from_index == from_sql
+
+
+def test_badges_come_from_the_index_and_one_batched_query(index):
+    cur = FakeCursor(TABLES)
+    graph = gr._build_graph_from_index(cur, index, "tenant", "t1", 3, None)
+    badges = {n["id"]: n["badges"] for n in graph["nodes"]}
+    assert badges["vm-vm1"] == ["drift"]
+    assert badges["vm-vm2"] == ["power_off"]
+    assert badges["volume-vol1"] == ["snapshot_protected"]
+    assert badges["volume-vol2"] == ["snapshot_missing", "orphan"]
+    assert badges["snapshot-s1"] == ["restore_source"]
+    assert badges["host-8"] == ["drift"]
+    assert len(cur.queries) == 1 and "UNION" in cur.queries[0]
+
+
+def test_domain_filter_drops_tenants_outside_the_domain(index):
+    unfiltered, _ = _both(index, "sg", "sgx", 2)
+    filtered, _ = _both(index, "sg", "sgx", 2, "d1")
+    assert "tenant-t2" in {n["id"] for n in unfiltered["nodes"]}
+    assert "tenant-t2" not in {n["id"] for n in filtered["nodes"]}
+    assert "vm-vm3" in {n["id"] for n in filtered["nodes"]}   # only the tenant edge is filtered
+
+
+def test_truncation_at_max_nodes_matches(index, monkeypatch):
+    monkeypatch.setattr(gr, "MAX_NODES", 6)
+    monkeypatch.setattr(gr, "LEGACY_MAX_NODES", 6)
+    from_index, from_sql = _both(index, "tenant", "t1", 3)
+    assert from_index["truncated"] is True
+    assert from_index["node_count"] == 6
+    assert from_index == from_sql
@@ -24,3 +24,97 @@ def test_security_posture_penalizes_exposure_and_stale_images():
     assert result["details"]["subscores"]["mfa_coverage"] <= 1
     assert result["details"]["subscores"]["exposed_ports"] == 2
     assert result["details"]["subscores"]["os_recency"] == 0
+
+
+# ---------------------------------------------------------------------------
+# Batch engine
+# ---------------------------------------------------------------------------
+
+from shared.health_scoring import (  # noqa: E402
+    DEFAULT_WEIGHTS,
+    compute_tenant_health_scores,
+    gather_health_inputs,
+)
+
+
+class _Cursor:
+    """Answers each grouped query from canned rows keyed on a table name."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.conn.executed.append((sql, params))
+        self.rows = next((rows for key, rows in self.conn.responses.items() if key in sql), [])
+
+    def fetchall(self):
+        return list(self.rows)
+
+
+class _Conn:
+    def __init__(self, responses):
+        self.responses = responses
+        self.executed = []
+
+    def cursor(self):
+        return _Cursor(self)
+
+
+def _responses():
+    return {
+        "FROM   snapshot_records": [("p1", 3)],
+        "FROM   metering_quotas": [("p1", 70, 100, 100, 1000), ("p2", 5, 0, 10, 100)],
+        "FROM   drift_events": [("p1", 1), ("p2", 9)],
+        "FROM   sla_commitments": [("p1", "Gold")],
+        "FROM   support_tickets": [("p2", "low", 1), ("p2", "high", 2)],
+        "FROM role_assignments": [("p1", 4, 4)],
+        "JOIN security_group_rules": [("p2", 1)],
+        "LEFT JOIN images": [("p1", 2, 0), ("p2", 2, 2)],
+    }
+
+
+def test_engine_queries_once_per_input_for_the_whole_batch():
+    conn = _Conn(_responses())
+    results = compute_tenant_health_scores(conn, ["p1", "p2", "p3"], DEFAULT_WEIGHTS)
+    assert set(results) == {"p1", "p2", "p3"}
+    assert len(conn.executed) == 8
+    assert all(params == (["p1", "p2", "p3"],) for _, params in conn.executed)
+
+
+def test_engine_scores_match_the_component_rules():
+    results = compute_tenant_health_scores(_Conn(_responses()), ["p1", "p2", "p3"], DEFAULT_WEIGHTS)
+    p1, p2, p3 = results["p1"], results["p2"], results["p3"]
+
+    assert p1["details"]["quota_headroom"] == {"cpu_utilization_pct": 70.0,
+                                               "ram_utilization_pct": 10.0}
+    assert p1["details"]["sla_tier"] == {"tier": "Gold"}
+    assert p1["score"] == sum(v for k, v in p1.items() if k not in ("score", "details"))
+
+    # zero quota → neutral, high-priority ticket → 0, no SLA → 5 (scaled)
+    assert p2["details"]["quota_headroom"] == {"note": "no_quota_data"}
+    assert p2["tickets"] == 0 and p2["drift"] == 0
+    assert p2["details"]["tickets"] == {"open_by_priority": {"low": 1, "high": 2}}
+
+    # no rows at all still yields a full result
+    assert p3["details"]["snapshot_compliance"] == {"recent_successes": 0, "window_days": 7}
+    assert p3["snapshot_compliance"] == 0 and p3["drift"] == 20
+
+
+def test_engine_applies_configured_weights():
+    weights = dict(DEFAULT_WEIGHTS, drift=0, tickets=20)
+    result = compute_tenant_health_scores(_Conn({}), ["p1"], weights)["p1"]
+    assert result["drift"] == 0
+    assert result["tickets"] == 30  # no open tickets: raw 15 / 10 × 20
+
+
+def test_gather_with_no_projects_runs_no_queries():
+    conn = _Conn(_responses())
+    assert gather_health_inputs(conn, []) == {}
+    assert conn.executed == []
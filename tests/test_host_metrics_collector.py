@@ -0,0 +1,164 @@
+"""
+tests/test_host_metrics_collector.py — HostMetricsCollector.collect_all_metrics
+against local fake node/libvirt exporters with injected latency.
+
+Each fake host is a separate loopback address (127.0.0.N) serving both
+exporter ports, so the collector's ``http://{host}:{port}`` URLs work as-is.
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+web = pytest.importorskip("aiohttp.web")
+
+import host_metrics_collector  # noqa: E402
+
+NODE_TEXT = """\
+# HELP node_cpu_seconds_total Seconds the CPUs spent in each mode.
+node_cpu_seconds_total{cpu="0",mode="idle"} 900
+node_cpu_seconds_total{cpu="0",mode="user"} 100
+node_memory_MemTotal_bytes 8589934592
+node_memory_MemAvailable_bytes 4294967296
+node_filesystem_size_bytes{device="/dev/sda1",mountpoint="/"} 107374182400
+node_filesystem_avail_bytes{device="/dev/sda1",mountpoint="/"} 53687091200
+node_network_receive_bytes_total{device="eth0"} 1048576
+node_network_transmit_bytes_total{device="eth0"} 2097152
+"""
+
+
+def _libvirt_text(host):
+    return "".join(
+        f'libvirt_domain_info_meta{{domain="{host}-vm{i}",instance_name="vm{i}",'
+        f'project_name="demo",user_name="admin@default",flavor="m1.small"}} 1\n'
+        f'libvirt_domain_info_maximum_memory_bytes{{domain="{host}-vm{i}"}} 2147483648\n'
+        f'libvirt_domain_info_memory_usage_bytes{{domain="{host}-vm{i}"}} 1073741824\n'
+        for i in range(2)
+    )
+
+
+async def _start_exporters(hosts, latency, slow=None):
+    """Serve both exporters on every host address; ``slow`` maps host → latency."""
+    slow = slow or {}
+
+    async def handle(request):
+        host, _, port = request.host.partition(":")
+        await asyncio.sleep(slow.get(host, latency))
+        if int(port) == ports["node"]:
+            return web.Response(text=NODE_TEXT)
+        return web.Response(text=_libvirt_text(host))
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    ports = {}
+    for kind in ("node", "libvirt"):
+        site = web.TCPSite(runner, hosts[0], 0)
+        await site.start()
+        ports[kind] = site._server.sockets[0].getsockname()[1]
+        for host in hosts[1:]:
+            await web.TCPSite(runner, host, ports[kind]).start()
+    return runner, ports
+
+
+def _collector(monkeypatch, tmp_path, hosts, ports, **env):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("PF9_HOSTS", ",".join(hosts))
+    monkeypatch.setenv("PF9_HOST_MAP", ",".join(f"{h}:node-{h.rsplit('.', 1)[1]}" for h in hosts))
+    monkeypatch.setenv("PF9_NODE_EXPORTER_PORT", str(ports["node"]))
+    monkeypatch.setenv("PF9_LIBVIRT_EXPORTER_PORT", str(ports["libvirt"]))
+    monkeypatch.delenv("PF9_REGION_ID", raising=False)
+    monkeypatch.delenv("PF9_DU_FQDN", raising=False)
+    for key, value in env.items():
+        monkeypatch.setenv(key, value)
+    return host_metrics_collector.HostMetricsCollector()
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_hosts_are_scraped_concurrently_and_in_order(monkeypatch, tmp_path):
+    hosts = [f"127.0.0.{i}" for i in range(2, 14)]
+    latency = 0.2
+
+    async def scenario():
+        runner, ports = await _start_exporters(hosts, latency)
+        try:
+            collector = _collector(monkeypatch, tmp_path, hosts, ports, PF9_SCRAPE_CONCURRENCY="4")
+            started = time.monotonic()
+            result = await collector.collect_all_metrics()
+            return collector, result, time.monotonic() - started
+        finally:
+            await runner.cleanup()
+
+    collector, (host_data, vm_data), elapsed = _run(scenario())
+
+    assert [h["ip_address"] for h in host_data] == hosts
+    assert len(vm_data) == 2 * len(hosts)
+    # Serial: 12 hosts × 2 exporters × 0.2 s = 4.8 s; 4-wide with both
+    # exporters in parallel is 3 waves of 0.2 s.
+    assert elapsed < 12 * 2 * latency / 3
+    assert elapsed >= 3 * latency * 0.9
+    cycle = collector.last_cycle
+    assert cycle["concurrency"] == 4
+    assert cycle["timed_out_hosts"] == []
+    assert list(cycle["hosts"]) == hosts
+    timing = cycle["hosts"][hosts[0]]
+    assert timing["host_ok"] and timing["vms"] == 2 and not timing["timed_out"]
+    assert timing["host_seconds"] >= latency * 0.9
+
+
+def test_slow_host_is_cut_at_deadline(monkeypatch, tmp_path):
+    hosts = ["127.0.0.2", "127.0.0.3", "127.0.0.4"]
+
+    async def scenario():
+        runner, ports = await _start_exporters(hosts, 0.01, slow={"127.0.0.3": 2})
+        try:
+            collector = _collector(monkeypatch, tmp_path, hosts, ports,
+                                   PF9_HOST_DEADLINE_SECONDS="0.5")
+            started = time.monotonic()
+            result = await collector.collect_all_metrics()
+            return collector, result, time.monotonic() - started
+        finally:
+            await runner.cleanup()
+
+    collector, (host_data, vm_data), elapsed = _run(scenario())
+
+    assert elapsed < 1.5
+    assert [h["ip_address"] for h in host_data] == ["127.0.0.2", "127.0.0.4"]
+    assert len(vm_data) == 4
+    slow = collector.last_cycle["hosts"]["127.0.0.3"]
+    assert slow["timed_out"] and not slow["host_ok"] and slow["vms"] == 0
+    assert collector.last_cycle["timed_out_hosts"] == ["127.0.0.3"]
+
+
+def test_cycle_timings_land_in_cache_summary(monkeypatch, tmp_path):
+    hosts = ["127.0.0.2", "127.0.0.3"]
+
+    async def scenario():
+        runner, ports = await _start_exporters(hosts, 0.01)
+        try:
+            collector = _collector(monkeypatch, tmp_path, hosts, ports)
+            await collector.run_once()
+            return collector
+        finally:
+            await runner.cleanup()
+
+    collector = _run(scenario())
+
+    with open(tmp_path / collector.cache_file) as f:
+        cache = json.load(f)
+    assert cache["summary"]["total_hosts"] == 2
+    collection = cache["summary"]["collection"]
+    assert collection["concurrency"] == 32
+    assert set(collection["hosts"]) == set(hosts)
+    assert not os.path.exists(tmp_path / f"{collector.cache_file}.tmp")
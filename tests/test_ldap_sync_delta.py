@@ -0,0 +1,232 @@
+"""
+Tests for the ldap_sync_worker paged search, diff planning and full/delta choice.
+
+No directory or database is needed: the LDAP connection is a scripted fake and
+the planner works on preloaded dicts.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("ldap.controls")  # python-ldap, not the repo's ldap/ config dir
+pytest.importorskip("tenacity")
+pytest.importorskip("psycopg2.extras")
+
+from ldap.controls import SimplePagedResultsControl  # noqa: E402
+
+from tests.conftest import load_worker  # noqa: E402
+
+ldap_sync = load_worker("ldap_sync_worker/main.py", "ldap_sync_worker_main")
+
+NOW = datetime(2026, 6, 1, 12, tzinfo=timezone.utc)
+CONFIG_ID = 7
+
+_CFG = {
+    "host": "ad.example.com", "port": 636, "base_dn": "dc=example,dc=com",
+    "user_search_filter": "(objectClass=person)", "user_attr_uid": "sAMAccountName",
+    "user_attr_mail": "mail", "user_attr_fullname": "displayName",
+    "conflict_strategy": "ldap_wins",
+}
+
+
+class _PagedConn:
+    """Serves *pages* one per search_ext call, echoing a cookie until the last."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.cookies = []
+
+    def search_ext(self, base, scope, filterstr, attrlist, serverctrls):
+        self.cookies.append(serverctrls[0].cookie)
+        return len(self.cookies) - 1
+
+    def result3(self, msgid):
+        more = msgid + 1 < len(self.pages)
+        ctrl = SimplePagedResultsControl(True, size=0, cookie=f"page{msgid + 1}".encode() if more else b"")
+        return None, self.pages[msgid], msgid, [ctrl]
+
+
+def _entry(uid, mail="", cn="", groups=(), modified=""):
+    attrs = {"sAMAccountName": [uid.encode()], "mail": [mail.encode()],
+             "displayName": [cn.encode()], "memberOf": [g.encode() for g in groups]}
+    if modified:
+        attrs["modifyTimestamp"] = [modified.encode()]
+    return (f"CN={uid},dc=example,dc=com", attrs)
+
+
+def _role(username, role="viewer", config_id=CONFIG_ID, overridden=False, dept=None, active=True):
+    return {"username": username, "role": role, "sync_config_id": config_id,
+            "locally_overridden": overridden, "is_active": active, "department_id": dept}
+
+
+def _internal(uid, mail, cn):
+    return (f"uid={uid},ou=users", {"cn": [cn.encode()], "mail": [mail.encode()]})
+
+
+class TestPagedSearch:
+    def test_follows_cookie_across_pages_and_skips_references(self):
+        conn = _PagedConn([
+            [_entry("a"), (None, ["ldap://other/dc=x"])],
+            [_entry("b")],
+            [_entry("c")],
+        ])
+        uids = [ldap_sync._attr(attrs, "sAMAccountName")
+                for _dn, attrs in ldap_sync._paged_search(conn, "dc=x", "(x=*)", ["x"], page_size=2)]
+        assert uids == ["a", "b", "c"]
+        assert conn.cookies == ["", b"page1", b"page2"]
+
+
+class TestPlanSync:
+    def _plan(self, entries, internal=None, roles=None, cfg=None, groups=None,
+              depts=None, departments=None):
+        return ldap_sync._plan_sync(
+            entries, cfg or _CFG, CONFIG_ID, internal or {}, roles or {},
+            departments or {}, groups or {}, depts or {},
+        )
+
+    def test_unchanged_users_produce_no_writes(self):
+        plan = self._plan(
+            [_entry("alice", "a@example.com", "Alice")],
+            internal={"alice": _internal("alice", "a@example.com", "Alice")},
+            roles={"alice": _role("alice")},
+        )
+        assert not (plan.creates or plan.ldap_updates or plan.role_updates or plan.dept_updates)
+        assert plan.seen_uids == {"alice"}
+
+    def test_new_changed_and_role_updates(self):
+        groups = {"CN=admins": "admin"}
+        plan = self._plan(
+            [_entry("new", "n@example.com", "New", groups=["CN=admins"]),
+             _entry("Alice", "alice@new.example.com", "Alice"),
+             _entry("bob", "b@example.com", "Bob", groups=["CN=admins"])],
+            internal={"alice": _internal("alice", "a@example.com", "Alice"),
+                      "bob": _internal("bob", "b@example.com", "Bob")},
+            roles={"Alice": _role("Alice"), "bob": _role("bob")},
+            groups=groups,
+        )
+        assert plan.creates == [("new", "n@example.com", "New", "admin")]
+        assert [u for u, _dn, _mods in plan.ldap_updates] == ["Alice"]
+        assert plan.role_updates == [("bob", "admin")]
+
+    def test_local_wins_skips_overridden_user(self):
+        cfg = dict(_CFG, conflict_strategy="local_wins")
+        plan = self._plan(
+            [_entry("alice", "changed@example.com", "Alice", groups=["CN=admins"])],
+            internal={"alice": _internal("alice", "a@example.com", "Alice")},
+            roles={"alice": _role("alice", overridden=True)},
+            cfg=cfg, groups={"CN=admins": "admin"},
+        )
+        assert plan.ldap_updates == [] and plan.role_updates == []
+
+    def test_department_follows_sort_order_and_duplicates_are_ignored(self):
+        depts = {"CN=eng": "Engineering", "CN=ops": "Operations"}
+        plan = self._plan(
+            [_entry("alice", groups=["CN=eng", "CN=ops"], modified="20260101000000Z"),
+             _entry("alice", groups=[], modified="20260102000000Z")],
+            internal={"alice": _internal("alice", "", "alice")},
+            roles={"alice": _role("alice", dept=None)},
+            depts=depts, departments={"Operations": 2, "Engineering": 1},
+        )
+        assert plan.dept_updates == [("alice", 2)]
+        assert plan.max_modified == "20260102000000Z"
+
+
+_DC1 = "CN=NTDS Settings,CN=DC1,CN=Servers,CN=Site,CN=Sites,CN=Configuration,DC=example,DC=com#0a0b"
+_DC2 = "CN=NTDS Settings,CN=DC2,CN=Servers,CN=Site,CN=Sites,CN=Configuration,DC=example,DC=com#0c0d"
+
+
+class _RootDSEConn:
+    def __init__(self, rootdse, ntds=None):
+        self.rootdse = rootdse
+        self.ntds = ntds
+
+    def search_s(self, base, scope, filterstr, attrlist):
+        if base == "":
+            return [("", self.rootdse)]
+        if self.ntds is None:
+            raise ldap_sync.ldap.NO_SUCH_OBJECT({"desc": "No such object"})
+        return [(base, self.ntds)]
+
+
+class TestDirectoryUsn:
+    NTDS = "CN=NTDS Settings,CN=DC1,CN=Servers,CN=Site,CN=Sites,CN=Configuration,DC=example,DC=com"
+
+    def test_usn_with_dc_service_name_and_invocation_id(self):
+        conn = _RootDSEConn({"highestCommittedUSN": [b"4242"], "dsServiceName": [self.NTDS.encode()]},
+                            {"invocationId": [bytes([10, 11])]})
+        assert ldap_sync._directory_usn(conn) == (4242, self.NTDS + "#0a0b")
+
+    def test_unreadable_invocation_id_falls_back_to_service_name(self):
+        conn = _RootDSEConn({"highestCommittedUSN": [b"4242"], "dsServiceName": [self.NTDS.encode()]})
+        assert ldap_sync._directory_usn(conn) == (4242, self.NTDS)
+
+    def test_non_ad_server(self):
+        assert ldap_sync._directory_usn(_RootDSEConn({"namingContexts": [b"dc=x"]})) == (None, None)
+
+
+class TestChooseMode:
+    def _cfg(self, **overrides):
+        cfg = {"last_sync_at": NOW, "sync_watermark": "1000", "sync_watermark_kind": "usn",
+               "sync_watermark_source": _DC1, "sync_fingerprint": "fp",
+               "last_full_sync_at": NOW - timedelta(hours=1)}
+        cfg.update(overrides)
+        return cfg
+
+    @pytest.mark.parametrize("overrides", [
+        {"last_sync_at": None},
+        {"sync_watermark": None},
+        {"sync_watermark_kind": "timestamp"},
+        {"sync_watermark_source": None},          # USN stored before DCs were tracked
+        {"sync_watermark_source": _DC2},
+        {"sync_fingerprint": "old"},
+        {"last_full_sync_at": NOW - timedelta(hours=25)},
+    ])
+    def test_falls_back_to_full(self, overrides):
+        assert ldap_sync._choose_mode(self._cfg(**overrides), "fp", "usn", _DC1, NOW)[0] == "full"
+
+    def test_delta_when_watermark_is_current(self):
+        assert ldap_sync._choose_mode(self._cfg(), "fp", "usn", _DC1, NOW)[0] == "delta"
+
+    def test_timestamp_watermarks_ignore_the_server(self):
+        cfg = self._cfg(sync_watermark_kind="timestamp", sync_watermark_source=None)
+        assert ldap_sync._choose_mode(cfg, "fp", "timestamp", None, NOW)[0] == "delta"
+
+    def test_fingerprint_tracks_mappings(self):
+        a = ldap_sync._config_fingerprint(_CFG, {"CN=g": "viewer"}, {})
+        b = ldap_sync._config_fingerprint(_CFG, {"CN=g": "admin"}, {})
+        assert a != b
+
+
+def test_watermark_filters():
+    assert ldap_sync._watermark_filter("usn", "41") == "(uSNChanged>=42)"
+    assert ldap_sync._watermark_filter("timestamp", "20260101000000Z") == \
+        "(modifyTimestamp>=20260101000000Z)"
+    assert ldap_sync._and_filter("objectClass=user", "(x=1)") == "(&(objectClass=user)(x=1))"
+
+
+def test_deactivate_missing_only_touches_this_configs_active_users():
+    class _Cur:
+        def __init__(self):
+            self.calls = []
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def execute(self, sql, params):
+            self.calls.append(params)
+
+    class _Conn:
+        cur = _Cur()
+
+        def cursor(self):
+            return self.cur
+
+    roles = {"gone": _role("gone"), "kept": _role("kept"),
+             "other": _role("other", config_id=99), "inactive": _role("inactive", active=False)}
+    conn = _Conn()
+    gone = ldap_sync._deactivate_missing(conn, CONFIG_ID, roles, {"kept"})
+    assert gone == ["gone"]
+    assert conn.cur.calls[0] == (["gone"], CONFIG_ID)
@@ -0,0 +1,195 @@
+"""
+Tests for api/log_query.py — the tail-first reader behind /api/logs.
+
+Log files are written to tmp_path in the JSONFormatter layout; results are
+checked against a naive read-everything-and-sort of the same files.
+"""
+import gzip
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+_API_DIR = os.path.join(os.path.dirname(__file__), "..", "api")
+if _API_DIR not in sys.path:
+    sys.path.insert(0, _API_DIR)
+
+import log_query  # noqa: E402
+from log_query import LogFilter, iter_logs, query_logs  # noqa: E402
+
+T0 = datetime(2026, 6, 1, 12, 0, 0)
+LEVELS = ["INFO", "INFO", "DEBUG", "WARNING", "INFO", "ERROR"]
+
+
+def _line(i, logger="pf9_api", level=None):
+    ts = (T0 + timedelta(seconds=i)).isoformat() + "Z"
+    return json.dumps({"timestamp": ts, "level": level or LEVELS[i % len(LEVELS)],
+                       "logger": logger, "message": f"event {i}"}) + "\n"
+
+
+def _write(path, lines, mode="w"):
+    with open(path, mode) as fh:
+        fh.writelines(lines)
+
+
+def _naive(files, flt):
+    out = []
+    for source_file, path in files.items():
+        for p in log_query.rotated_files(path):
+            opener = gzip.open if p.endswith(".gz") else open
+            with opener(p, "rt") as fh:
+                for line in fh:
+                    entry = json.loads(line)
+                    ts = log_query.parse_timestamp(entry["timestamp"])
+                    if flt.matches(entry, ts):
+                        out.append((ts, entry["message"]))
+    return [m for _, m in sorted(out, reverse=True)]
+
+
+@pytest.fixture(autouse=True)
+def small_blocks(monkeypatch):
+    log_query._ChunkIndex._memory.clear()
+    monkeypatch.setattr(log_query, "BLOCK_BYTES", 256)
+    monkeypatch.setattr(log_query, "INDEX_CHUNK_BYTES", 2048)
+
+
+@pytest.fixture
+def logs(tmp_path):
+    api = tmp_path / "pf9_api.log"
+    # rotated: .2 oldest, .1, then the live file
+    _write(f"{api}.2", [_line(i) for i in range(0, 300)])
+    _write(f"{api}.1", [_line(i) for i in range(300, 600)])
+    _write(api, [_line(i) for i in range(600, 900)])
+    worker = tmp_path / "snapshot_worker.log"
+    _write(worker, [_line(i, logger="snapshot_scheduler") for i in range(1, 900, 7)])
+    return {"pf9_api": str(api), "snapshot_worker": str(worker)}
+
+
+def _messages(entries):
+    return [e["message"] for e in entries]
+
+
+class TestQuery:
+    def test_latest_entries_across_files(self, logs):
+        entries, errors = query_logs(logs, LogFilter(), 20)
+        assert errors == []
+        assert _messages(entries) == _naive(logs, LogFilter())[:20]
+        assert {e["source_file"] for e in entries} == {"pf9_api", "snapshot_worker"}
+
+    def test_reads_into_rotated_files(self, logs):
+        entries, _ = query_logs({"pf9_api": logs["pf9_api"]}, LogFilter(), 1000)
+        assert len(entries) == 900
+        assert entries[-1]["message"] == "event 0"
+
+    @pytest.mark.parametrize("flt", [
+        LogFilter(level="error"),
+        LogFilter(source="snapshot_scheduler"),
+        LogFilter(since=datetime(2026, 6, 1, 12, 5, tzinfo=timezone.utc),
+                  until=datetime(2026, 6, 1, 12, 6, 30, tzinfo=timezone.utc)),
+        LogFilter(level="WARNING", since=datetime(2026, 6, 1, 12, 10, 0, 500000, tzinfo=timezone.utc)),
+    ])
+    def test_filters_match_naive_scan(self, logs, flt):
+        entries, _ = query_logs(logs, flt, 1000)
+        assert _messages(entries) == _naive(logs, flt)
+
+    def test_stops_reading_after_limit(self, logs, monkeypatch):
+        reads = []
+        real = log_query._reverse_lines
+
+        def counting(fh, start, end, block_size=256):
+            for line in real(fh, start, end, block_size):
+                reads.append(line)
+                yield line
+
+        monkeypatch.setattr(log_query, "_reverse_lines", counting)
+        query_logs({"pf9_api": logs["pf9_api"]}, LogFilter(), 10)
+        assert len(reads) < 20
+
+    def test_time_range_skips_chunks_outside_range(self, logs, monkeypatch):
+        ranges = []
+        real = log_query._reverse_lines
+
+        def recording(fh, start, end, block_size=256):
+            ranges.append((fh.name, start, end))
+            return real(fh, start, end, block_size)
+
+        monkeypatch.setattr(log_query, "_reverse_lines", recording)
+        flt = LogFilter(since=datetime(2026, 6, 1, 12, 14, tzinfo=timezone.utc))
+        entries, _ = query_logs({"pf9_api": logs["pf9_api"]}, flt, 1000)
+        assert len(entries) == 900 - 840
+        assert {name for name, _, _ in ranges} == {logs["pf9_api"]}
+        assert sum(end - start for _, start, end in ranges) < os.path.getsize(logs["pf9_api"])
+
+    def test_gzipped_rotation(self, tmp_path):
+        api = tmp_path / "pf9_api.log"
+        _write(api, [_line(i) for i in range(10, 20)])
+        with gzip.open(f"{api}.1.gz", "wt") as fh:
+            fh.writelines(_line(i) for i in range(10))
+        entries, _ = query_logs({"pf9_api": str(api)}, LogFilter(level="INFO"), 100)
+        assert _messages(entries) == _naive({"pf9_api": str(api)}, LogFilter(level="INFO"))
+
+    def test_gzipped_non_json_lines_keep_their_place(self, tmp_path):
+        api = tmp_path / "pf9_api.log"
+        _write(api, [_line(10)])
+        with gzip.open(f"{api}.1.gz", "wt") as fh:
+            fh.writelines([_line(0), "Traceback (most recent call last):\n", "\n", _line(1)])
+        entries, _ = query_logs({"pf9_api": str(api)}, LogFilter(), 10)
+        assert [e.get("raw") or e["message"] for e in entries] == [
+            "event 10", "event 1", "Traceback (most recent call last):", "event 0"]
+
+
+class TestLiveFile:
+    def test_partial_last_line_is_skipped(self, tmp_path):
+        api = tmp_path / "pf9_api.log"
+        _write(api, [_line(0), _line(1), '{"timestamp": "2026-06-01T12:'])
+        entries, _ = query_logs({"pf9_api": str(api)}, LogFilter(), 10)
+        assert _messages(entries) == ["event 1", "event 0"]
+
+    def test_non_json_lines_only_without_filters(self, tmp_path):
+        api = tmp_path / "pf9_api.log"
+        _write(api, [_line(0), "Traceback (most recent call last):\n", _line(1)])
+        entries, _ = query_logs({"pf9_api": str(api)}, LogFilter(), 10)
+        assert [e.get("raw") for e in entries] == [None, "Traceback (most recent call last):", None]
+        entries, _ = query_logs({"pf9_api": str(api)}, LogFilter(level="INFO"), 10)
+        assert all("raw" not in e for e in entries)
+
+    def test_index_extends_on_append_and_resets_on_rotation(self, tmp_path):
+        api = tmp_path / "pf9_api.log"
+        files = {"pf9_api": str(api)}
+        _write(api, [_line(i) for i in range(100)])
+        flt = LogFilter(level="ERROR")
+        assert len(query_logs(files, flt, 1000)[0]) == len(_naive(files, flt))
+        sidecar = tmp_path / ".pf9_api.log.idx"
+        assert sidecar.exists()
+        size_before = json.loads(sidecar.read_text())["files"]
+
+        _write(api, [_line(i) for i in range(100, 200)], mode="a")
+        assert _messages(query_logs(files, flt, 1000)[0]) == _naive(files, flt)
+        (entry,) = json.loads(sidecar.read_text())["files"].values()
+        assert entry["size"] == os.path.getsize(api)
+        assert list(size_before) == list(json.loads(sidecar.read_text())["files"])
+
+        os.rename(api, f"{api}.1")
+        _write(api, [_line(i) for i in range(200, 230)])
+        assert _messages(query_logs(files, flt, 1000)[0]) == _naive(files, flt)
+        assert len(json.loads(sidecar.read_text())["files"]) == 2
+
+
+def test_chunk_index_locks_per_sidecar(tmp_path):
+    api, worker = str(tmp_path / "pf9_api.log"), str(tmp_path / "snapshot_worker.log")
+    assert log_query._ChunkIndex(api)._lock is log_query._ChunkIndex(api)._lock
+    assert log_query._ChunkIndex(api)._lock is not log_query._ChunkIndex(worker)._lock
+
+
+def test_iter_logs_reports_unreadable_files(tmp_path):
+    api = tmp_path / "pf9_api.log"
+    _write(api, [_line(0)])
+    os.mkdir(tmp_path / "snapshot_worker.log")  # exists but cannot be opened as a file
+    errors = []
+    entries = list(iter_logs({"pf9_api": str(api),
+                              "snapshot_worker": str(tmp_path / "snapshot_worker.log")},
+                             LogFilter(), errors))
+    assert _messages(entries) == ["event 0"]
+    assert errors and errors[0]["file"] == "snapshot_worker"
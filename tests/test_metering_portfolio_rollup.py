@@ -0,0 +1,203 @@
+"""
+Tests for the metering_worker incremental portfolio rollup, backfill and verify CLI.
+
+The database is a scripted fake cursor; the SQL itself is not executed.
+"""
+import datetime
+import types
+
+import pytest
+
+pytest.importorskip("tenacity")
+
+from tests.conftest import load_worker  # noqa: E402
+
+# Stand-ins for psycopg2 and requests while the worker is imported.
+_psycopg2 = types.ModuleType("psycopg2")
+_psycopg2.OperationalError = type("OperationalError", (Exception,), {})
+_extras = types.ModuleType("psycopg2.extras")
+_extras.RealDictCursor = object
+_extras.execute_batch = None
+_psycopg2.extras = _extras
+_STUBS = {"psycopg2": _psycopg2, "psycopg2.extras": _extras,
+          "requests": types.ModuleType("requests")}
+
+mw = load_worker("metering_worker/main.py", "metering_worker_main", _STUBS)
+
+UTC = datetime.timezone.utc
+JUNE = datetime.date(2026, 6, 1)
+JULY_TS = datetime.datetime(2026, 7, 1, tzinfo=UTC)
+
+
+class _Cur:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.conn.executed.append((sql, params))
+        self.rows = list(self.conn.respond(sql, params))
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self):
+        return list(self.rows)
+
+
+class _Conn:
+    def __init__(self, responses=None):
+        self.responses = responses or {}
+        self.executed = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self, cursor_factory=None):
+        return _Cur(self)
+
+    def respond(self, sql, params):
+        for key, rows in self.responses.items():
+            if key in sql:
+                return rows(params) if callable(rows) else rows
+        return []
+
+    def ran(self, fragment):
+        return [p for s, p in self.executed if fragment in s]
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def upserted(monkeypatch):
+    """Capture the portfolio_metering_monthly upsert batches."""
+    batches = []
+    monkeypatch.setattr(_extras, "execute_batch",
+                        lambda cur, sql, batch, page_size=100: batches.extend(batch))
+    return batches
+
+
+def _tenant(tenant_id, **kw):
+    row = {"tenant_id": tenant_id, "avg_vcpus": 4, "avg_ram_gb": 8, "avg_disk_gb": 40,
+           "peak_vcpus": 6, "peak_ram_gb": 12, "vm_count": 2,
+           "quota_vcpu_limit": None, "quota_vcpu_used": None,
+           "quota_ram_limit_mb": None, "quota_ram_used_mb": None,
+           "quota_storage_limit_gb": None, "quota_storage_used_gb": None,
+           "estimated_cost": None, "currency": "USD"}
+    row.update(kw)
+    return row
+
+
+@pytest.mark.parametrize("day, expected", [
+    (datetime.date(2026, 6, 17), (datetime.datetime(2026, 6, 1, tzinfo=UTC), JULY_TS)),
+    (datetime.date(2026, 12, 31), (datetime.datetime(2026, 12, 1, tzinfo=UTC),
+                                   datetime.datetime(2027, 1, 1, tzinfo=UTC))),
+])
+def test_month_bounds(day, expected):
+    assert mw._month_bounds(day) == expected
+
+
+class TestComputeMonthly:
+    def test_open_month_refreshes_hours_since_watermark(self, upserted):
+        wm = datetime.datetime(2026, 6, 10, 8, 55, tzinfo=UTC)
+        new_wm = datetime.datetime(2026, 6, 10, 9, 55, tzinfo=UTC)
+        hours = [datetime.datetime(2026, 6, 10, 8, tzinfo=UTC),
+                 datetime.datetime(2026, 6, 10, 9, tzinfo=UTC)]
+        conn = _Conn({
+            "FROM portfolio_metering_watermarks": [{"watermark": wm, "finalized": False}],
+            "make_interval": [{"watermark": new_wm}],
+            "SELECT DISTINCT date_trunc": [{"hour": h} for h in hours],
+            "FROM portfolio_metering_hourly ph": [_tenant("t1")],
+        })
+        assert mw.compute_portfolio_metering_monthly(conn, datetime.date(2026, 6, 17)) == 1
+
+        assert conn.ran("SELECT DISTINCT date_trunc")[0]["since"] == wm
+        assert conn.ran("INSERT INTO portfolio_metering_hourly") == [{"hours": hours}]
+        rollup = [sql for sql, _ in conn.executed if "monthly AS" in sql]
+        assert len(rollup) == 1 and "metering_resources mr" not in rollup[0]
+        assert upserted[0]["month"] == JUNE and upserted[0]["estimated_cost"] == 0
+        assert conn.ran("INSERT INTO portfolio_metering_watermarks") == [(JUNE, new_wm, False)]
+        assert conn.ran("DELETE FROM portfolio_metering_hourly WHERE hour >=") == []
+        assert conn.commits == 1
+
+    def test_first_run_has_no_watermark_and_no_new_hours_skips_refresh(self, upserted):
+        conn = _Conn({"make_interval": [{"watermark": datetime.datetime(2026, 6, 2, tzinfo=UTC)}]})
+        assert mw.compute_portfolio_metering_monthly(conn, JUNE) == 0
+        assert conn.ran("SELECT DISTINCT date_trunc")[0]["since"] is None
+        assert conn.ran("INSERT INTO portfolio_metering_hourly") == []
+        assert len(conn.ran("INSERT INTO portfolio_metering_watermarks")) == 1
+
+    def test_closed_month_is_finalized_and_partials_dropped(self, upserted):
+        conn = _Conn({
+            "FROM portfolio_metering_watermarks": [
+                {"watermark": datetime.datetime(2026, 6, 30, 23, tzinfo=UTC), "finalized": False}],
+            "make_interval": [{"watermark": datetime.datetime(2026, 7, 1, 0, 10, tzinfo=UTC)}],
+        })
+        mw.compute_portfolio_metering_monthly(conn, JUNE)
+        assert conn.ran("INSERT INTO portfolio_metering_watermarks") == [(JUNE, JULY_TS, True)]
+        assert conn.ran("DELETE FROM portfolio_metering_hourly WHERE hour >=") == [
+            mw._month_bounds(JUNE)]
+
+    def test_finalized_month_is_frozen(self, upserted):
+        conn = _Conn({"FROM portfolio_metering_watermarks": [
+            {"watermark": JULY_TS, "finalized": True}]})
+        assert mw.compute_portfolio_metering_monthly(conn, JUNE) == 0
+        assert len(conn.executed) == 1 and upserted == []
+        assert conn.commits == 0
+
+
+class TestBackfill:
+    def test_skips_finalized_months(self, monkeypatch):
+        today = datetime.date.today().replace(day=1)
+        prev = (today - datetime.timedelta(days=1)).replace(day=1)
+        seen = []
+        monkeypatch.setattr(mw, "recompute_portfolio_month",
+                            lambda conn, month: seen.append(month) or 1)
+        conn = _Conn({"FROM portfolio_metering_watermarks": [(prev,)]})
+        mw.backfill_portfolio_metering_monthly(conn, months=3)
+        assert len(seen) == 2 and prev not in seen and today not in seen
+
+    def test_cli_refuses_current_month(self, monkeypatch):
+        monkeypatch.setattr(mw, "get_conn", lambda: pytest.fail("should not connect"))
+        with pytest.raises(SystemExit):
+            mw._backfill_cli(types.SimpleNamespace(
+                month=[datetime.date.today().replace(day=1)], months=6))
+
+
+class TestVerify:
+    def _conn(self, partials, full):
+        return _Conn({
+            "SELECT finalized FROM": [{"finalized": False}],
+            "FROM portfolio_metering_hourly ph": partials,
+            "FROM metering_resources mr": full,
+        })
+
+    def test_reports_per_tenant_differences(self, monkeypatch):
+        monkeypatch.setattr(mw, "compute_portfolio_metering_monthly", lambda conn, month: 0)
+        conn = self._conn([_tenant("t1"), _tenant("t2", vm_count=3)],
+                          [_tenant("t1"), _tenant("t2"), _tenant("t3")])
+        assert mw.verify_portfolio_month(conn, JUNE) == [
+            "t2: vm_count partials=3 full=2",
+            "t3: only in the full recompute",
+        ]
+
+    def test_cli_exits_non_zero_on_mismatch(self, monkeypatch):
+        monkeypatch.setattr(mw, "get_conn", lambda: _Conn())
+        monkeypatch.setattr(mw, "verify_portfolio_month", lambda conn, month: ["t1: differs"])
+        with pytest.raises(SystemExit) as exc:
+            mw._verify_cli(types.SimpleNamespace(month=None))
+        assert exc.value.code == 1
+        monkeypatch.setattr(mw, "verify_portfolio_month", lambda conn, month: [])
+        mw._verify_cli(types.SimpleNamespace(month=JUNE))
@@ -0,0 +1,148 @@
+"""
+Tests for concurrent per-region collection in metering_worker.
+
+Connections are fakes and the collectors are replaced by stubs that sleep,
+so the tests check scheduling, region locks and telemetry — not the SQL.
+"""
+import threading
+import time
+import types
+
+import pytest
+
+pytest.importorskip("tenacity")
+
+from shared.worker_telemetry import WorkerTelemetry  # noqa: E402
+from tests.conftest import load_worker  # noqa: E402
+
+# Stand-ins for psycopg2 and requests while the worker is imported.
+_psycopg2 = types.ModuleType("psycopg2")
+_psycopg2.OperationalError = type("OperationalError", (Exception,), {})
+_extras = types.ModuleType("psycopg2.extras")
+_extras.RealDictCursor = object
+_psycopg2.extras = _extras
+_STUBS = {"psycopg2": _psycopg2, "psycopg2.extras": _extras,
+          "requests": types.ModuleType("requests")}
+
+mw = load_worker("metering_worker/main.py", "metering_worker_regions", _STUBS)
+
+COLLECTORS = ("collect_resource_metrics", "collect_snapshot_metrics", "collect_restore_metrics",
+              "collect_quota_usage", "collect_efficiency_scores")
+
+
+class _Cur:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.conn.executed.append((sql, params))
+        self.conn.region_id = params[1]  # the region lock is the only query
+
+    def fetchone(self):
+        return (self.conn.region_id not in self.conn.locked,)
+
+
+class _Conn:
+    def __init__(self, locked):
+        self.locked = locked
+        self.executed = []
+        self.region_id = None
+        self.closed = False
+
+    def cursor(self, cursor_factory=None):
+        return _Cur(self)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    """Fake connections and collectors; collector calls are recorded per region."""
+    state = types.SimpleNamespace(conns=[], calls=[], synced=[], locked=set(),
+                                  delay=0.0, block=None, fail=set())
+    lock = threading.Lock()
+
+    def _get_conn():
+        conn = _Conn(state.locked)
+        with lock:
+            state.conns.append(conn)
+        return conn
+
+    def _collector(name):
+        def collect(conn, region_id):
+            with lock:
+                state.calls.append((name, region_id, threading.current_thread().name))
+            if state.block is not None and region_id == "slow":
+                state.block.wait(5)
+            time.sleep(state.delay)
+            if region_id in state.fail:
+                raise RuntimeError("monitoring unreachable")
+            return 1
+        return collect
+
+    monkeypatch.setattr(mw, "get_conn_with_cb", _get_conn)
+    for name in COLLECTORS:
+        monkeypatch.setattr(mw, name, _collector(name))
+    monkeypatch.setattr(mw, "record_metering_sync",
+                        lambda conn, region_id, s, f, n, errors: state.synced.append((region_id, n, errors)))
+    monkeypatch.setattr(mw, "_region_pool", None)
+    monkeypatch.setattr(mw, "REGION_WORKERS", 4)
+    monkeypatch.setattr(mw, "_telemetry", WorkerTelemetry("metering_worker", 60,
+                                                          redis_factory=lambda: None))
+    yield state
+    if mw._region_pool is not None:
+        mw._region_pool.shutdown(wait=True)
+
+
+def _regions(*ids):
+    return [{"region_id": rid, "region_name": f"name-{rid}"} for rid in ids]
+
+
+def test_regions_are_collected_concurrently_on_their_own_connections(worker):
+    worker.delay = 0.05  # 5 collectors × 50 ms = 250 ms per region
+    with mw._telemetry.cycle() as record:
+        started = time.monotonic()
+        mw.collect_regions(_regions("r1", "r2", "r3", "r4"))
+        elapsed = time.monotonic() - started
+    assert elapsed < 0.6  # one after another would take ~1 s
+    assert sorted(r for r, _, _ in worker.synced) == ["r1", "r2", "r3", "r4"]
+    assert len(worker.conns) == 4 and all(c.closed for c in worker.conns)
+    assert len({t for _, _, t in worker.calls}) > 1
+    region_stages = {k.split("|")[2] for k in record.hist if k.split("|")[1] == "region"}
+    assert region_stages == {"name-r1", "name-r2", "name-r3", "name-r4"}
+
+
+def test_locked_region_is_skipped(worker):
+    worker.locked.add("r2")
+    assert mw.collect_region(_regions("r2")[0]) is False
+    assert worker.calls == [] and worker.synced == []
+    lock_sql, params = worker.conns[0].executed[0]
+    assert "pg_try_advisory_lock" in lock_sql and params == (mw._LOCK_ID, "r2")
+    assert worker.conns[0].closed
+
+
+def test_failing_region_does_not_stop_the_others(worker):
+    worker.fail.add("r1")
+    with mw._telemetry.cycle() as record:
+        mw.collect_regions(_regions("r1", "r2"))
+    assert sorted(worker.synced) == [("r1", 0, 1), ("r2", 1, 0)]
+    assert record.had_error
+
+
+def test_slow_region_does_not_hold_up_the_cycle(worker, monkeypatch):
+    monkeypatch.setattr(mw, "REGION_TIMEOUT_SECONDS", 0.2)
+    worker.block = threading.Event()
+    started = time.monotonic()
+    mw.collect_regions(_regions("slow", "fast"))
+    assert time.monotonic() - started < 1
+    assert [r for r, _, _ in worker.synced] == ["fast"]
+    worker.block.set()
+    mw._region_pool.shutdown(wait=True)
+    assert sorted(r for r, _, _ in worker.synced) == ["fast", "slow"]
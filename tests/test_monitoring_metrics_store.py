@@ -0,0 +1,117 @@
+"""
+tests/test_monitoring_metrics_store.py — monitoring/metrics_store.py snapshot,
+indexes and file-change detection.
+
+The module is loaded from its path because the monitoring service's own
+``prometheus_client`` / ``models`` names would clash with other imports.
+"""
+import importlib.util
+import json
+import os
+import time
+
+import pytest
+
+_PATH = os.path.join(os.path.dirname(__file__), "..", "monitoring", "metrics_store.py")
+_spec = importlib.util.spec_from_file_location("_monitoring_metrics_store", _PATH)
+ms = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(ms)
+
+
+def _cache(n_vms=6, source="monitoring", with_stats=True):
+    vms = [
+        {"vm_id": f"vm-{i}", "tenant": f"t{i % 2}", "project": f"p{i % 3}", "host": f"h{i % 2}",
+         "cpu_usage_percent": float(i * 10), "memory_usage_percent": 50.0}
+        for i in range(n_vms)
+    ]
+    hosts = [{"hostname": "h0", "cpu_usage_percent": 20.0, "memory_used_mb": 512, "memory_total_mb": 1024},
+             {"hostname": "h1", "cpu_usage_percent": 40.0, "memory_used_mb": 256, "memory_total_mb": 1024}]
+    summary = {"total_vms": n_vms, "total_hosts": 2, "last_update": "2026-01-01T00:00:00"}
+    if with_stats:
+        summary.update(ms.summarize(vms, hosts))
+    return {"vms": vms, "hosts": hosts, "alerts": [], "summary": summary,
+            "timestamp": "2026-01-01T00:00:00", "source": source}
+
+
+def _write(path, data):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as fh:
+        json.dump(data, fh)
+    os.replace(tmp, path)
+
+
+@pytest.fixture()
+def store(tmp_path):
+    return ms.MetricsStore(str(tmp_path / "metrics_cache.json"), stat_interval=0)
+
+
+def _linear(vms, tenant=None, project=None, limit=None):
+    """The filtering main.py used to do on every request."""
+    if tenant:
+        vms = [vm for vm in vms if vm.get("tenant") == tenant]
+    if project:
+        vms = [vm for vm in vms if vm.get("project") == project]
+    return vms[:limit] if limit else vms
+
+
+@pytest.mark.parametrize("tenant,project,limit", [
+    (None, None, None), ("t0", None, None), (None, "p1", None), ("t1", "p2", None),
+    ("t0", "p0", 1), ("nope", None, None), (None, None, 2),
+])
+def test_indexed_filters_match_linear_scan(tenant, project, limit):
+    data = _cache(30)
+    snap = ms.MetricsSnapshot(data, 1)
+    assert snap.filter_vms(tenant, project, limit) == _linear(data["vms"], tenant, project, limit)
+
+
+def test_missing_file_gives_empty_snapshot(store):
+    snap = store.current()
+    assert snap.vms == [] and snap.summary["total_vms"] == 0
+
+
+def test_file_is_parsed_once_until_it_changes(store, monkeypatch):
+    _write(store.path, _cache())
+    loads = []
+    real_load = ms.json.load
+    monkeypatch.setattr(ms.json, "load", lambda fh: loads.append(1) or real_load(fh))
+    first = store.current()
+    for _ in range(20):
+        assert store.current() is first
+    assert len(loads) == 1
+
+    time.sleep(0.01)
+    _write(store.path, _cache(n_vms=3))
+    second = store.current()
+    assert len(second.vms) == 3
+    assert second.version == first.version + 1
+    assert len(first.vms) == 6          # old snapshot is untouched for in-flight readers
+
+
+def test_publish_swaps_without_rereading(store, monkeypatch):
+    data = _cache()
+    _write(store.path, data)
+    monkeypatch.setattr(ms.json, "load", lambda fh: pytest.fail("publish must not re-read the file"))
+    snap = store.publish(data)
+    assert store.current() is snap
+    assert snap.vms_by_host["h1"] == [vm for vm in data["vms"] if vm["host"] == "h1"]
+
+
+def test_corrupt_file_keeps_previous_snapshot(store):
+    _write(store.path, _cache())
+    good = store.current()
+    time.sleep(0.01)
+    with open(store.path, "w") as fh:
+        fh.write('{"vms": [')                  # non-atomic writer caught mid-write
+    assert store.current() is good
+    time.sleep(0.01)
+    _write(store.path, _cache(n_vms=2))
+    assert len(store.current().vms) == 2
+
+
+def test_summary_stats_are_filled_for_count_only_producers():
+    data = _cache(with_stats=False, source="database")
+    snap = ms.MetricsSnapshot(data, 1)
+    assert snap.summary["total_vms"] == 6
+    assert snap.summary["vm_stats"] == ms.summarize(data["vms"], data["hosts"])["vm_stats"]
+    assert snap.summary["host_stats"]["avg_memory"] == 37.5
+    assert "vm_stats" not in data["summary"]     # input dict not mutated
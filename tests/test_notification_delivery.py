@@ -0,0 +1,203 @@
+"""
+Tests for the notification worker's delivery stage.
+
+Covers:
+  - SmtpSessionPool: one login per session, recycling, reconnect on disconnect
+  - DispatchBatch: subscriptions / dedup keys loaded once, results recorded on flush
+  - RateLimiter spacing
+"""
+import importlib.util
+import os
+import smtplib
+import sys
+import types
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+_psycopg2_extras_stub = types.ModuleType("psycopg2.extras")
+_psycopg2_extras_stub.RealDictCursor = MagicMock()
+_psycopg2_extras_stub.Json = MagicMock()
+sys.modules["psycopg2.extras"] = _psycopg2_extras_stub
+sys.modules.setdefault("psycopg2", types.ModuleType("psycopg2"))
+
+_NOTIF_MAIN_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "notifications", "main.py"
+)
+_spec = importlib.util.spec_from_file_location("notifications_main_delivery", _NOTIF_MAIN_PATH)
+notif_main = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(notif_main)
+
+
+_CFG = {
+    "enabled": True, "host": "smtp.example.com", "port": 25, "use_tls": False,
+    "username": "svc", "password": "pw", "from_address": "pf9@example.com",
+    "from_name": "PF9",
+}
+
+
+class _FakeSMTP:
+    instances = []
+    fail_next_send = 0
+
+    def __init__(self, host, port, timeout=None):
+        self.logins = 0
+        self.sent = []
+        self.closed = False
+        _FakeSMTP.instances.append(self)
+
+    def ehlo(self):
+        pass
+
+    def starttls(self, context=None):
+        pass
+
+    def login(self, user, password):
+        self.logins += 1
+
+    def sendmail(self, from_addr, to_addrs, msg):
+        if _FakeSMTP.fail_next_send:
+            _FakeSMTP.fail_next_send -= 1
+            raise smtplib.SMTPServerDisconnected("gone")
+        self.sent.append(to_addrs[0])
+
+    def quit(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_smtp(monkeypatch):
+    _FakeSMTP.instances = []
+    _FakeSMTP.fail_next_send = 0
+    monkeypatch.setattr(notif_main.smtplib, "SMTP", _FakeSMTP)
+    return _FakeSMTP
+
+
+class TestSmtpSessionPool:
+    def test_reuses_one_session_for_many_messages(self, fake_smtp):
+        pool = notif_main.SmtpSessionPool(max_per_connection=100)
+        for i in range(5):
+            pool.send(_CFG, f"user{i}@example.com", "msg")
+        assert len(fake_smtp.instances) == 1
+        assert fake_smtp.instances[0].logins == 1
+        assert len(fake_smtp.instances[0].sent) == 5
+
+    def test_recycles_after_max_messages(self, fake_smtp):
+        pool = notif_main.SmtpSessionPool(max_per_connection=2)
+        for i in range(5):
+            pool.send(_CFG, "a@example.com", "msg")
+        assert len(fake_smtp.instances) == 3
+        assert fake_smtp.instances[0].closed
+
+    def test_reconnects_once_when_server_drops_session(self, fake_smtp):
+        pool = notif_main.SmtpSessionPool()
+        pool.send(_CFG, "a@example.com", "msg")
+        fake_smtp.fail_next_send = 1
+        pool.send(_CFG, "b@example.com", "msg")
+        assert len(fake_smtp.instances) == 2
+        assert fake_smtp.instances[1].sent == ["b@example.com"]
+
+    def test_config_change_opens_new_session(self, fake_smtp):
+        pool = notif_main.SmtpSessionPool()
+        pool.send(_CFG, "a@example.com", "msg")
+        pool.send(dict(_CFG, password="rotated"), "a@example.com", "msg")
+        assert len(fake_smtp.instances) == 2
+
+    def test_close_all_quits_sessions(self, fake_smtp):
+        pool = notif_main.SmtpSessionPool()
+        pool.send(_CFG, "a@example.com", "msg")
+        pool.close_all()
+        assert fake_smtp.instances[0].closed
+
+
+def _batch_conn(prefs, tenant_prefs=(), sent=()):
+    cur = MagicMock()
+    cur.__enter__ = lambda s: s
+    cur.__exit__ = MagicMock(return_value=False)
+    results = [list(prefs)]
+    if tenant_prefs is not None:
+        results.append(list(tenant_prefs))
+    results.append(list(sent))
+    cur.fetchall.side_effect = results
+    conn = MagicMock()
+    conn.cursor.return_value = cur
+    return conn, cur
+
+
+def _event(eid, severity="critical"):
+    return {"event_type": "snapshot_failure", "event_id": eid, "resource_id": eid,
+            "severity": severity, "summary": f"run {eid} failed"}
+
+
+class TestDispatchBatch:
+    def _user(self, name, severity_min="warning"):
+        return {"event_type": "snapshot_failure", "username": name,
+                "email": f"{name}@example.com", "delivery_mode": "immediate",
+                "severity_min": severity_min}
+
+    def test_load_runs_fixed_number_of_queries(self):
+        events = [_event(str(i)) for i in range(50)]
+        sent_key = notif_main._event_dedup_key(events[0])
+        conn, cur = _batch_conn(
+            [self._user("alice"), self._user("bob", "critical")],
+            tenant_prefs=None,
+            sent=[{"dedup_key": sent_key, "tenant": False}],
+        )
+        batch = notif_main.DispatchBatch.load(conn, events, [])
+        assert cur.execute.call_count == 2  # prefs + dedup keys, no tenant events
+        assert sent_key in batch.sent_keys
+        assert [u["username"] for u in batch.subscribers("snapshot_failure", "warning")] == ["alice"]
+
+    def test_dispatch_with_batch_skips_sent_and_records_on_flush(self):
+        events = [_event("1"), _event("2")]
+        conn, _ = _batch_conn(
+            [self._user("alice")], tenant_prefs=None,
+            sent=[{"dedup_key": notif_main._event_dedup_key(events[0]), "tenant": False}],
+        )
+        batch = notif_main.DispatchBatch.load(conn, events, [])
+        with patch.object(notif_main, "render_template", return_value="<html/>"), \
+             patch.object(notif_main, "send_email", return_value=False) as send, \
+             patch.object(notif_main, "log_notification") as log, \
+             patch.object(notif_main, "enqueue_retry") as retry:
+            for event in events + events:
+                notif_main.dispatch_event(conn, event, batch)
+            log.assert_not_called()  # nothing recorded before flush
+            assert batch.flush() == 1
+        send.assert_called_once()
+        assert log.call_args[0][5] == "failed"
+        retry.assert_called_once()
+
+    def test_tenant_events_use_preloaded_prefs(self):
+        tenant_event = {"event_type": "restore_failed", "event_id": "r1", "resource_id": "r1",
+                        "project_id": "p1", "resource_name": "vm1"}
+        pref = {"id": 1, "project_id": "p1", "event_type": "restore_failed",
+                "keystone_user_id": "u1", "channel": "email", "endpoint": "t@example.com",
+                "enabled": True}
+        conn, cur = _batch_conn([], tenant_prefs=[pref], sent=[])
+        batch = notif_main.DispatchBatch.load(conn, [], [tenant_event])
+        assert cur.execute.call_count == 3
+        with patch.object(notif_main, "render_template", return_value="<html/>"), \
+             patch.object(notif_main, "send_email", return_value=True), \
+             patch.object(notif_main, "log_tenant_notification") as log:
+            notif_main.dispatch_tenant_notifications(conn, tenant_event, batch)
+            batch.flush()
+        assert log.call_args[0][5] == "sent"
+
+
+class TestRateLimiter:
+    def test_spaces_calls(self, monkeypatch):
+        slept = []
+        monkeypatch.setattr(notif_main.time, "sleep", slept.append)
+        limiter = notif_main.RateLimiter(per_second=10)
+        for _ in range(3):
+            limiter.wait()
+        assert len(slept) == 2
+        assert all(0 < s <= 0.2 for s in slept)
+
+    def test_zero_rate_is_unlimited(self, monkeypatch):
+        slept = []
+        monkeypatch.setattr(notif_main.time, "sleep", slept.append)
+        limiter = notif_main.RateLimiter(per_second=0)
+        limiter.wait()
+        limiter.wait()
+        assert slept == []
@@ -0,0 +1,235 @@
+"""
+tests/test_p9_collector.py — CollectionEngine + pf9_rvtools.collect_inventory
+against a local fake OpenStack HTTP server with injected latency.
+
+No real cloud, DB or Redis is needed: the server answers Keystone/Nova/
+Cinder/Glance/Neutron list and quota endpoints from memory and records how
+many requests were in flight per service.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+pytest.importorskip("openpyxl")
+pytest.importorskip("psycopg2")
+
+import p9_common  # noqa: E402
+import pf9_rvtools  # noqa: E402
+from p9_collector import CollectionEngine, _parse_service_limits  # noqa: E402
+from shared.circuit_breaker import CircuitBreakerOpenError, RegionCircuitBreaker  # noqa: E402
+
+N_PROJECTS = 40
+LATENCY = 0.03
+
+
+class _FakeCloud:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.peak = {}
+        self.requests = 0
+        self.fail_services = set()
+        # service -> requests that must be in flight together before any is
+        # answered; makes concurrency assertions independent of timing
+        self.rendezvous = {}
+        self._arrived = threading.Condition(self.lock)
+
+    def enter(self, service):
+        with self.lock:
+            self.requests += 1
+            self.in_flight[service] = self.in_flight.get(service, 0) + 1
+            self.peak[service] = max(self.peak.get(service, 0), self.in_flight[service])
+            self._arrived.notify_all()
+            target = self.rendezvous.get(service)
+            if target and not self._arrived.wait_for(lambda: self.peak[service] >= target, 5):
+                self.rendezvous.pop(service)  # never reached: stop holding requests back
+
+    def leave(self, service):
+        with self.lock:
+            self.in_flight[service] -= 1
+
+
+def _payload(path):
+    parts = [p for p in path.split("?")[0].split("/") if p]
+    service = parts[0]
+    leaf = parts[-1]
+    projects = [{"id": f"p{i}", "name": f"proj-{i}", "domain_id": "default"} for i in range(N_PROJECTS)]
+    if service == "keystone":
+        return service, {
+            "domains": {"domains": [{"id": "default", "name": "Default", "enabled": True}]},
+            "projects": {"projects": projects},
+            "users": {"users": [{"id": "u1", "name": "alice", "enabled": True}]},
+            "roles": {"roles": [{"id": "r1", "name": "member"}]},
+            "role_assignments": {"role_assignments": [{"user": {"id": "u1"}, "role": {"id": "r1"}}]},
+            "groups": {"groups": []},
+        }[leaf]
+    if "os-quota-sets" in parts:
+        return service, {"quota_set": {"cores": {"limit": 20, "in_use": 2, "reserved": 0}}}
+    if service == "neutron" and "quotas" in parts:
+        return service, {"quota": {"network": 10, "port": 50}}
+    if service == "nova":
+        key = {"detail": parts[-2], "os-keypairs": "keypairs", "os-server-groups": "server_groups",
+               "os-aggregates": "aggregates"}.get(leaf, leaf)
+        if parts[-2] == "os-availability-zone":
+            return service, {"availabilityZoneInfo": [{"zoneName": "nova"}]}
+        key = {"os-hypervisors": "hypervisors"}.get(key, key)
+        return service, {key: [{"id": f"{key}-1", "name": f"{key}-1"}]}
+    if service == "cinder":
+        key = parts[-2] if leaf == "detail" else {"types": "volume_types"}[leaf]
+        return service, {key: [{"id": f"{key}-1", "name": f"{key}-1"}]}
+    if service == "glance":
+        return service, {"images": [{"id": "img-1", "name": "ubuntu-22.04"}]}
+    key = leaf.replace("-", "_")
+    return service, {key: [{"id": f"{key}-1", "name": f"{key}-1"}]}
+
+
+@pytest.fixture()
+def fake_cloud():
+    cloud = _FakeCloud()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, code, body, headers=None):
+            raw = json.dumps(body).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            base = f"http://127.0.0.1:{self.server.server_port}"
+            catalog = [
+                {"type": "compute", "endpoints": [{"interface": "public", "url": f"{base}/nova"}]},
+                {"type": "network", "endpoints": [{"interface": "public", "url": f"{base}/neutron"}]},
+                {"type": "volumev3", "endpoints": [{"interface": "public", "url": f"{base}/cinder/v3/svc"}]},
+                {"type": "image", "endpoints": [{"interface": "public", "url": f"{base}/glance"}]},
+            ]
+            self._send(201, {"token": {"project": {"id": "svc"}, "catalog": catalog}},
+                       {"X-Subject-Token": "tok"})
+
+        def do_GET(self):
+            service, body = _payload(self.path)
+            cloud.enter(service)
+            try:
+                time.sleep(LATENCY)
+                if service in cloud.fail_services:
+                    self._send(503, {"error": "unavailable"})
+                else:
+                    self._send(200, body)
+            finally:
+                cloud.leave(service)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    saved = dict(p9_common.CFG)
+    p9_common.CFG.update({
+        "KEYSTONE_URL": f"http://127.0.0.1:{server.server_port}/keystone/v3",
+        "USERNAME": "admin", "PASSWORD": "secret", "VERIFY_TLS": False,
+    })
+    try:
+        yield cloud
+    finally:
+        p9_common.CFG.clear()
+        p9_common.CFG.update(saved)
+        server.shutdown()
+
+
+def _engine(session, **kw):
+    kw.setdefault("breaker", RegionCircuitBreaker("test-collector"))
+    return CollectionEngine(session, **kw)
+
+
+def test_parse_service_limits_overrides_defaults():
+    limits = _parse_service_limits("nova=3, neutron=bad,glance=0,extra")
+    assert limits["nova"] == 3
+    assert limits["neutron"] == 8   # malformed value keeps the default
+    assert limits["glance"] == 1    # clamped to at least one
+
+
+def test_collect_inventory_fans_out_quota_calls(fake_cloud):
+    session, _, body, _, _ = p9_common.get_session_best_scope()
+    engine = _engine(session, max_workers=24,
+                     service_limits={"keystone": 4, "nova": 6, "cinder": 4, "glance": 2, "neutron": 6})
+    fake_cloud.rendezvous = {"nova": 6, "neutron": 6, "cinder": 4}
+    with engine:
+        inv = pf9_rvtools.collect_inventory(engine, body["token"]["project"]["id"])
+
+    assert len(inv["projects"]) == N_PROJECTS
+    assert len(inv["quotas"]) == N_PROJECTS * 3
+    assert inv["servers"] and inv["ports"] and inv["images"]
+
+    # Each service reaches its cap of concurrent requests and never exceeds it
+    # (a serial engine would time out at the rendezvous with a peak of 1).
+    assert fake_cloud.peak["nova"] == 6
+    assert fake_cloud.peak["neutron"] == 6
+    assert fake_cloud.peak["cinder"] == 4
+
+    report = engine.timing_report()
+    assert report["endpoints"]["nova_quotas"]["calls"] == N_PROJECTS
+    assert report["endpoints"]["neutron_ports"]["errors"] == 0
+    assert "nova_quotas" in engine.format_timing_report(report)
+
+
+def test_circuit_breaker_fast_fails_unhealthy_region(fake_cloud):
+    session, _, _, _, _ = p9_common.get_session_best_scope()
+    fake_cloud.fail_services.add("neutron")
+    breaker = RegionCircuitBreaker("test-collector-open")
+    with _engine(session, max_workers=1, breaker=breaker) as engine:
+        futures = [engine.submit("neutron_quotas", "neutron", p9_common.neutron_quotas, f"p{i}")
+                   for i in range(breaker.FAILURE_THRESHOLD + 3)]
+        errors = [f.exception() for f in futures]
+    assert breaker.get_status()["state"] == "open"
+    assert any(isinstance(e, CircuitBreakerOpenError) for e in errors)
+    # Fast-failed calls never reached the server.
+    assert fake_cloud.requests == breaker.FAILURE_THRESHOLD
+    assert engine.timing_report()["endpoints"]["neutron_quotas"]["errors"] == len(futures)
+
+
+class _RecordingRedis:
+    def __init__(self):
+        self.data, self.writes = {}, []
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.writes.append(key)
+        self.data[key] = str(value)
+
+    def incr(self, key):
+        self.writes.append(key)
+        self.data[key] = str(int(self.data.get(key) or 0) + 1)
+        return int(self.data[key])
+
+
+def test_circuit_breaker_success_writes_only_on_change():
+    rc = _RecordingRedis()
+    breaker = RegionCircuitBreaker("test-collector-quiet", redis_getter=lambda: rc)
+    for _ in range(3):
+        breaker.record_success()
+    assert rc.writes == []
+
+    breaker.record_failure()
+    breaker.record_success()
+    assert breaker.get_status() == {"state": "closed", "failure_count": 0,
+                                    "open_for_seconds_remaining": None}
+    writes = len(rc.writes)
+    breaker.record_success()
+    assert len(rc.writes) == writes
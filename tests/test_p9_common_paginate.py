@@ -0,0 +1,134 @@
+"""
+tests/test_p9_common_paginate.py — limit/marker paginator with page prefetch.
+
+Uses an in-memory fake session; no network is involved.
+"""
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+requests = pytest.importorskip("requests")
+
+import p9_common  # noqa: E402
+
+
+class _Resp:
+    def __init__(self, body, status=200):
+        self._body = body
+        self.status_code = status
+        self.content = b"x"
+        self.text = str(body)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} error", response=self)
+
+    def json(self):
+        return self._body
+
+
+class _FakeSession:
+    """Serves ``total`` items in limit/marker pages; records request times."""
+
+    def __init__(self, total, latency=0.0, fail_marker=None):
+        self.items = [{"id": f"i{n:04d}"} for n in range(total)]
+        self.latency = latency
+        self.fail_marker = fail_marker
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def get(self, url, params=None, timeout=None):
+        with self.lock:
+            self.calls.append((time.monotonic(), dict(params)))
+        time.sleep(self.latency)
+        marker = params.get("marker")
+        if marker and marker == self.fail_marker:
+            return _Resp({"error": "boom"}, status=500)
+        start = 0
+        if marker:
+            start = next(i for i, it in enumerate(self.items) if it["id"] == marker) + 1
+        return _Resp({"things": self.items[start:start + params["limit"]]})
+
+
+@pytest.fixture(autouse=True)
+def _small_pages(monkeypatch):
+    monkeypatch.setitem(p9_common.CFG, "PAGE_LIMIT", 10)
+
+
+def test_paginate_preserves_order_and_stops_on_short_page():
+    sess = _FakeSession(35)
+    out = p9_common.paginate(sess, "http://x/things", "things", extra_params={"all_tenants": 1})
+    assert [it["id"] for it in out] == [it["id"] for it in sess.items]
+    assert len(sess.calls) == 4
+    assert all(params["all_tenants"] == 1 for _, params in sess.calls)
+
+
+def test_exact_multiple_issues_one_empty_trailing_request():
+    sess = _FakeSession(20)
+    assert len(p9_common.paginate(sess, "http://x/things", "things")) == 20
+    assert len(sess.calls) == 3
+
+
+def test_next_page_is_requested_while_caller_processes_current():
+    sess = _FakeSession(25, latency=0.02)
+    seen_before_next = []
+    for page in p9_common.iter_pages(sess, "http://x/things", "things"):
+        time.sleep(0.05)   # "process" the page
+        seen_before_next.append(len(sess.calls))
+    # While page 1 was being processed the request for page 2 had already gone out.
+    assert seen_before_next[0] == 2
+    # The short last page issues no further request.
+    assert seen_before_next == [2, 3, 3]
+
+
+def test_prefetch_overlaps_fetch_and_processing():
+    def run(prefetch):
+        sess = _FakeSession(60, latency=0.03)
+        started = time.monotonic()
+        for _ in p9_common.iter_pages(sess, "http://x/things", "things", prefetch=prefetch):
+            time.sleep(0.03)
+        return time.monotonic() - started
+
+    assert run(True) < run(False) * 0.8
+
+
+def test_prefetch_threads_are_shared_across_listings():
+    names = set()
+
+    class _Recording(_FakeSession):
+        def get(self, url, params=None, timeout=None):
+            names.add(threading.current_thread().name)
+            return super().get(url, params, timeout)
+
+    for _ in range(5):
+        assert len(p9_common.paginate(_Recording(35), "http://x/things", "things")) == 35
+    prefetch_threads = {n for n in names if n.startswith("pf9-prefetch")}
+    assert prefetch_threads
+    assert len(prefetch_threads) <= p9_common.CFG["PREFETCH_WORKERS"]
+    assert p9_common._prefetch_executor() is p9_common._prefetch_executor()
+
+
+def test_error_on_prefetched_page_propagates():
+    sess = _FakeSession(30, fail_marker="i0019")
+    got = []
+    with pytest.raises(requests.HTTPError):
+        for page in p9_common.iter_pages(sess, "http://x/things", "things"):
+            got.extend(page)
+    assert len(got) == 20
+
+
+def test_abandoning_iteration_does_not_leak_prefetch():
+    sess = _FakeSession(100, latency=0.01)
+    pages = p9_common.iter_pages(sess, "http://x/things", "things")
+    next(pages)
+    pages.close()
+    calls = len(sess.calls)
+    time.sleep(0.05)
+    assert len(sess.calls) == calls <= 2
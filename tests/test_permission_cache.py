@@ -0,0 +1,154 @@
+"""
+tests/test_permission_cache.py — api/permission_cache.PermissionCache.
+
+Pure in-process tests: loaders are plain functions and pub/sub messages are
+fed to handle_message() directly, so no DB or Redis is needed.
+"""
+import json
+import os
+import sys
+
+import pytest
+
+_API_DIR = os.path.join(os.path.dirname(__file__), "..", "api")
+if _API_DIR not in sys.path:
+    sys.path.insert(0, _API_DIR)
+
+from permission_cache import PermissionCache  # noqa: E402
+
+# Mirrors the semantics of the old per-request role_permissions queries.
+_MATRIX = {
+    "viewer": {("servers", "read")},
+    "operator": {("servers", "write"), ("snapshots", "read")},
+    "admin": {("users", "admin")},
+    "superadmin": {("*", "admin")},
+    "deleter": {("servers", "resource_delete")},
+}
+
+
+class _Loaders:
+    def __init__(self):
+        self.matrix_loads = 0
+        self.role_loads = 0
+        self.roles = {"alice": "viewer", "bob": "operator"}
+
+    def matrix(self):
+        self.matrix_loads += 1
+        return {role: set(grants) for role, grants in _MATRIX.items()}
+
+    def role(self, username):
+        self.role_loads += 1
+        return self.roles.get(username, "viewer")
+
+
+@pytest.fixture()
+def loaders():
+    return _Loaders()
+
+
+@pytest.fixture()
+def cache(loaders):
+    return PermissionCache(loaders.matrix, loaders.role, redis_getter=None, ttl=60)
+
+
+@pytest.mark.parametrize("role,resource,permission,expected", [
+    ("viewer", "servers", "read", True),
+    ("viewer", "servers", "write", False),
+    ("operator", "servers", "read", True),        # write implies read
+    ("operator", "snapshots", "write", False),
+    ("admin", "users", "read", True),             # admin implies read/write
+    ("admin", "users", "tenant_delete", True),    # admin implies custom actions
+    ("admin", "servers", "read", False),
+    ("superadmin", "anything", "write", True),    # wildcard resource
+    ("deleter", "servers", "resource_delete", True),
+    ("deleter", "servers", "read", False),
+    ("unknown", "servers", "read", False),
+])
+def test_matrix_semantics(cache, role, resource, permission, expected):
+    assert cache.role_has_permission(role, resource, permission) is expected
+
+
+def test_matrix_and_roles_are_loaded_once(cache, loaders):
+    for _ in range(50):
+        cache.role_has_permission(cache.user_role("alice"), "servers", "read")
+    assert loaders.matrix_loads == 1
+    assert loaders.role_loads == 1
+
+
+def test_user_invalidation_only_drops_that_user(cache, loaders):
+    cache.user_role("alice")
+    cache.user_role("bob")
+    loaders.roles["bob"] = "admin"
+    cache.handle_message(json.dumps({"scope": "user", "username": "bob"}))
+    assert cache.user_role("bob") == "admin"
+    cache.user_role("alice")
+    assert loaders.role_loads == 3
+    cache.role_has_permission("viewer", "servers", "read")
+    assert loaders.matrix_loads == 1
+
+
+def test_permissions_invalidation_reloads_matrix(cache, loaders):
+    assert cache.role_has_permission("viewer", "snapshots", "read") is False
+    cache._load_matrix = lambda: {"viewer": {("servers", "read"), ("snapshots", "read")}}
+    cache.handle_message('{"scope": "permissions"}')
+    assert cache.role_has_permission("viewer", "snapshots", "read") is True
+
+
+def test_malformed_message_flushes_everything(cache, loaders):
+    cache.user_role("alice")
+    cache.role_has_permission("viewer", "servers", "read")
+    cache.handle_message("not json")
+    cache.user_role("alice")
+    cache.role_has_permission("viewer", "servers", "read")
+    assert (loaders.role_loads, loaders.matrix_loads) == (2, 2)
+
+
+def test_load_racing_an_invalidation_is_not_stored(loaders):
+    holder = {}
+
+    def role_loader(username):
+        # The role changes (and is invalidated) while this load is running.
+        holder["cache"].invalidate_local(username)
+        return "stale-role"
+
+    cache = PermissionCache(loaders.matrix, role_loader, ttl=60)
+    holder["cache"] = cache
+    assert cache.user_role("carol") == "stale-role"
+    assert "carol" not in cache._user_roles
+
+
+def test_reload_failure_keeps_previous_matrix(cache, loaders):
+    cache.role_has_permission("viewer", "servers", "read")
+    cache.ttl = 0
+
+    def boom():
+        raise RuntimeError("db down")
+
+    cache._load_matrix = boom
+    assert cache.role_has_permission("viewer", "servers", "read") is True
+
+
+def test_first_load_failure_propagates(loaders):
+    def boom():
+        raise RuntimeError("db down")
+
+    cache = PermissionCache(boom, loaders.role)
+    with pytest.raises(RuntimeError):
+        cache.role_has_permission("viewer", "servers", "read")
+
+
+def test_publish_sends_to_redis_and_invalidates_locally(loaders):
+    published = []
+
+    class _Redis:
+        def publish(self, channel, data):
+            published.append((channel, json.loads(data)))
+
+    cache = PermissionCache(loaders.matrix, loaders.role, redis_getter=_Redis)
+    cache._listener = object()          # don't start the subscriber thread
+    cache.user_role("alice")
+    cache.publish_invalidation("user", "alice")
+    cache.user_role("alice")
+    assert loaders.role_loads == 2
+    assert published[0][0] == "pf9:auth:invalidate"
+    assert published[0][1]["username"] == "alice"
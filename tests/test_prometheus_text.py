@@ -0,0 +1,124 @@
+"""Tests for shared/prometheus_text.py against recorded exporter fixtures."""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from shared.prometheus_text import (  # noqa: E402
+    compile_families,
+    iter_samples,
+    label_value,
+    parse_labels,
+    parse_libvirt_exporter,
+    parse_node_exporter,
+)
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_labels_handle_escapes_and_separators_inside_values():
+    raw = r'a="1",name="db \"primary\", tier-1",path="C:\\tmp",brace="}{"'
+    assert parse_labels(raw) == {"a": "1", "name": 'db "primary", tier-1', "path": r"C:\tmp", "brace": "}{"}
+    assert label_value(raw, "name") == 'db "primary", tier-1'
+    assert label_value(raw, "brace") == "}{"
+    # "a" must not match inside another label name
+    assert label_value('xa="0",a="1"', "a") == "1"
+    assert label_value(raw, "missing") is None
+
+
+def test_iter_samples_skips_comments_other_families_and_bad_values():
+    text = (
+        "# HELP up Whether the target is up.\n"
+        "# TYPE up gauge\n"
+        "up 1\n"
+        'up{job="x"} NaN\n'
+        "upstream_total 5\n"
+        "up{job=\"y\"} not-a-number\n"
+        'up{job="z"} 2 1712000000000\n'
+    )
+    samples = list(iter_samples(text, compile_families(["up"])))
+    assert [(s.name, s.labels.get("job")) for s in samples] == [("up", None), ("up", "x"), ("up", "z")]
+    assert samples[2].value == 2.0
+
+
+def test_node_exporter_fixture():
+    node = parse_node_exporter(_fixture("node_exporter.prom"))
+    assert set(node.cpu_mode_seconds) == {"idle", "iowait", "irq", "nice", "softirq", "steal", "system", "user"}
+    assert 0 < node.cpu_idle_seconds < node.cpu_total_seconds
+    assert node.mem_total_bytes == 2.70355398656e11
+    assert node.mem_available_bytes == 1.4193524736e11
+    # Only the "/" mountpoint, not /boot or /var/lib/nova
+    assert node.root_fs_size_bytes == 1.07e11
+    assert node.root_fs_avail_bytes == 6.1e10
+    assert node.network_rx_bytes > 0 and node.network_tx_bytes > 0
+
+
+def test_node_exporter_nic_filter_and_label_order():
+    text = (
+        'node_network_receive_bytes_total{device="bond0"} 100\n'
+        'node_network_receive_bytes_total{device="tap1234"} 1000\n'
+        'node_network_receive_bytes_total{device="lo"} 1000\n'
+        'node_network_receive_bytes_total{device=""} 1000\n'
+        'node_network_transmit_bytes_total{device="eno1"} 7\n'
+        'node_cpu_seconds_total{cpu="0",mode="idle"} 30\n'
+        'node_cpu_seconds_total{mode="idle",cpu="1"} 10\n'
+        'node_cpu_seconds_total{cpu="1",mode="user"} 10\n'
+    )
+    node = parse_node_exporter(text)
+    assert (node.network_rx_bytes, node.network_tx_bytes) == (100, 7)
+    assert (node.cpu_idle_seconds, node.cpu_total_seconds) == (40, 50)
+    assert node.mem_total_bytes is None and node.root_fs_size_bytes is None
+
+
+def test_node_exporter_cpu_lines_counted_once_including_the_first_line():
+    text = (
+        'node_cpu_seconds_total{cpu="0",mode="idle"} 5\n'
+        'node_cpu_seconds_total{cpu="0",mode="user"} 1e1\n'
+        'node_cpu_seconds_total{cpu="1",mode="idle"} 2 1712000000000\n'
+        'node_cpu_seconds_total{cpu="1",mode="user"} oops\n'
+    )
+    node = parse_node_exporter(text)
+    assert node.cpu_mode_seconds == {"idle": 7.0, "user": 10.0}
+
+
+def test_libvirt_exporter_fixture():
+    domains = parse_libvirt_exporter(_fixture("libvirt_exporter.prom"))
+    # Six domains recorded, one of them shut off (meta value 0)
+    assert len(domains) == 5
+    assert len(parse_libvirt_exporter(_fixture("libvirt_exporter.prom"), active_only=False)) == 6
+    names = [d.meta["instance_name"] for d in domains.values()]
+    assert names == ["web-00", "web-01", "web-02", "web-03", 'db "primary", tier-1']
+
+    dom = domains["instance-000002a1"]
+    assert dom.vcpu_count == 2
+    assert dom.meta["flavor"] == "m1.medium"
+    assert dom.memory_max_bytes == 4 * 2**30
+    assert set(dom.block_capacity) == {"vda", "vdb"}
+    assert set(dom.block_allocation) == set(dom.block_physical) == {"vda", "vdb"}
+    assert dom.block_read_bytes > 0 and dom.network_rx_bytes > 0
+    assert dom.cpu_seconds == dom.vcpu_time_seconds > 0
+
+    # web-02 has no memory_stats_used_percent; web-03 has no per-vCPU times
+    assert domains["instance-000002a2"].memory_used_percent is None
+    web3 = domains["instance-000002a3"]
+    assert web3.vcpu_time_seconds == 0
+    assert web3.cpu_seconds == web3.cpu_time_seconds > 0
+
+
+def test_libvirt_domain_label_not_first():
+    text = (
+        'libvirt_domain_info_virtual_cpus{uuid="u-1",domain="instance-1"} 4\n'
+        'libvirt_domain_info_meta{instance_name="vm",domain="instance-1"} 1\n'
+        'libvirt_domain_info_meta{domain="instance-2"} 1\n'
+    )
+    domains = parse_libvirt_exporter(text)
+    assert list(domains) == ["instance-1", "instance-2"]
+    assert domains["instance-1"].vcpu_count == 4
+    assert domains["instance-1"].meta["instance_name"] == "vm"
@@ -390,3 +390,64 @@ class TestMissingTokenPaths:
                           MagicMock(side_effect=RuntimeError("no DB"))):
             result = auth_mod.verify_token("garbage.token.here")
         assert result is None
+
+
+# ===========================================================================
+# 5.  Per-request auth context (rbac_middleware + get_current_user share it)
+# ===========================================================================
+
+class TestAuthContextMemo:
+    def _request(self, cookie=None):
+        req = MagicMock()
+        req.state = types.SimpleNamespace()
+        req.cookies = {"access_token": cookie} if cookie else {}
+        return req
+
+    def test_token_is_verified_once_per_request(self):
+        import auth as auth_mod
+
+        verify = MagicMock(return_value={"sub": "alice", "role": "viewer"})
+        with patch.object(auth_mod, "_verify_token_payload", verify), \
+             patch.object(auth_mod, "_cached_user_role", return_value="operator"):
+            req = self._request()
+            first = auth_mod.resolve_auth_context(req, "tok")
+            second = auth_mod.resolve_auth_context(req, "tok")
+        assert first is second
+        assert verify.call_count == 1
+        assert first.role == "operator"
+        assert first.token_data.username == "alice"
+
+    def test_rejection_is_memoised_too(self):
+        import auth as auth_mod
+
+        verify = MagicMock(return_value=None)
+        with patch.object(auth_mod, "_verify_token_payload", verify):
+            req = self._request()
+            assert auth_mod.resolve_auth_context(req, "bad") is None
+            assert auth_mod.resolve_auth_context(req, "bad") is None
+        assert verify.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_get_current_user_reuses_middleware_context(self):
+        import auth as auth_mod
+
+        verify = MagicMock(return_value={"sub": "alice", "role": "viewer"})
+        with patch.object(auth_mod, "ENABLE_AUTHENTICATION", True), \
+             patch.object(auth_mod, "_verify_token_payload", verify), \
+             patch.object(auth_mod, "_cached_user_role", return_value="viewer"):
+            req = self._request(cookie="tok")
+            auth_mod.resolve_auth_context(req, "tok")      # rbac_middleware
+            user = await auth_mod.get_current_user(req, credentials=None)
+        assert user.username == "alice"
+        assert verify.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_mfa_pending_token_is_not_a_session(self):
+        import auth as auth_mod
+
+        verify = MagicMock(return_value={"sub": "alice", "mfa_pending": True})
+        with patch.object(auth_mod, "ENABLE_AUTHENTICATION", True), \
+             patch.object(auth_mod, "_verify_token_payload", verify), \
+             patch.object(auth_mod, "_cached_user_role", return_value="viewer"):
+            user = await auth_mod.get_current_user(self._request(cookie="tok"), credentials=None)
+        assert user is None
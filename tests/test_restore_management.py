@@ -50,6 +50,7 @@ _fastapi_stub.Depends = lambda fn: fn
 _fastapi_stub.Header = MagicMock(return_value=None)
 _fastapi_stub.APIRouter = MagicMock(return_value=MagicMock())
 _fastapi_stub.Request = MagicMock
+_fastapi_stub.Query = MagicMock()
 _fastapi_stub.status = types.SimpleNamespace(HTTP_404_NOT_FOUND=404, HTTP_400_BAD_REQUEST=400)
 sys.modules.setdefault("fastapi", _fastapi_stub)
 
@@ -154,3 +155,101 @@ class TestResolveServiceUserPassword:
         monkeypatch.setenv("SNAPSHOT_PASSWORD_KEY", "some-key")
         result = _rm._resolve_service_user_password()
         assert result == "wins"
+
+
+# ---------------------------------------------------------------------------
+# Tests: executor polling back-off and per-project concurrency
+# ---------------------------------------------------------------------------
+class TestPollDelays:
+    def test_doubles_up_to_maximum(self):
+        import itertools
+        delays = list(itertools.islice(_rm._poll_delays(1000, initial=1, maximum=8), 6))
+        assert delays == [1, 2, 4, 8, 8, 8]
+
+    def test_stops_at_timeout(self):
+        assert list(_rm._poll_delays(0)) == []
+
+
+class _FakeExecutor(_rm.RestoreExecutor):
+    """RestoreExecutor with the DB and OpenStack steps replaced by in-memory fakes."""
+
+    def __init__(self, jobs):
+        super().__init__(MagicMock())
+        self.jobs = jobs
+        self.running = {}
+        self.peak = {}
+
+    def _with_conn(self, fn):
+        return fn(None)
+
+    def _load_job(self, conn, job_id):
+        return self.jobs.get(job_id)
+
+    def _claim_job(self, conn, job_id):
+        if self.jobs[job_id]["status"] != "PENDING":
+            return False
+        self.jobs[job_id]["status"] = "RUNNING"
+        return True
+
+    def _load_steps(self, conn, job_id):
+        return [{"id": 1, "step_name": "CREATE_SERVER"}]
+
+    def _update_step_status(self, *a, **kw):
+        pass
+
+    def _heartbeat(self, conn, job_id):
+        pass
+
+    def _complete_job(self, conn, job_id, resources):
+        self.jobs[job_id]["status"] = "SUCCEEDED"
+
+    def _fail_job(self, conn, job_id, reason):
+        self.jobs[job_id]["status"] = "FAILED"
+
+    async def _execute_step(self, session, project_id, plan, step_name, resources, job):
+        import asyncio
+        self.running[project_id] = self.running.get(project_id, 0) + 1
+        self.peak[project_id] = max(self.peak.get(project_id, 0), self.running[project_id])
+        await asyncio.sleep(0.01)
+        self.running[project_id] -= 1
+        return {}
+
+
+class TestRestoreExecutorBatch:
+    def _jobs(self):
+        jobs = {}
+        for i in range(6):
+            project = "p1" if i < 4 else "p2"
+            jobs[f"j{i}"] = {"id": f"j{i}", "status": "PENDING", "project_id": project,
+                             "plan_json": {}, "created_by": "admin"}
+        return jobs
+
+    def test_batch_caps_concurrency_per_project(self, monkeypatch):
+        import asyncio
+        monkeypatch.setattr(_rm, "RESTORE_PROJECT_CONCURRENCY", 2)
+        ex = _FakeExecutor(self._jobs())
+        asyncio.run(ex.execute_batch(list(ex.jobs)))
+        assert all(j["status"] == "SUCCEEDED" for j in ex.jobs.values())
+        assert ex.peak == {"p1": 2, "p2": 2}
+
+    def test_job_canceled_while_waiting_is_not_started(self, monkeypatch):
+        import asyncio
+        jobs = self._jobs()
+        ex = _FakeExecutor(jobs)
+
+        # Hold the only slot so j0 has to wait for it
+        monkeypatch.setattr(_rm, "RESTORE_PROJECT_CONCURRENCY", 1)
+
+        async def run_with_slot_held():
+            slot = ex._project_slots["p1"]
+            await slot.acquire()
+            task = ex.spawn(ex.execute_job("j0"))
+            await asyncio.sleep(0.01)
+            jobs["j0"]["status"] = "CANCELED"
+            slot.release()
+            await task
+
+        asyncio.run(run_with_slot_held())
+        assert jobs["j0"]["status"] == "CANCELED"
+        assert ex.peak == {}
+        assert not ex._tasks
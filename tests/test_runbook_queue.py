@@ -0,0 +1,158 @@
+"""
+tests/test_runbook_queue.py — api/runbook_queue (execution queue + worker pool).
+
+The pool is given a scripted fake connection, so no DB or Redis is needed.
+"""
+import contextlib
+import os
+import sys
+import threading
+
+import pytest
+
+pytest.importorskip("psycopg2")
+
+_API_DIR = os.path.join(os.path.dirname(__file__), "..", "api")
+if _API_DIR not in sys.path:
+    sys.path.insert(0, _API_DIR)
+
+import runbook_queue  # noqa: E402
+from runbook_queue import (  # noqa: E402
+    RunbookCancelled,
+    RunbookWorkerPool,
+    _parse_engine_limits,
+    current_execution_id,
+    report_progress,
+)
+
+
+class _Cursor:
+    def __init__(self, db):
+        self.db = db
+        self._rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.db.statements.append((" ".join(sql.split()), params))
+        self._rows = self.db.respond(" ".join(sql.split()), params)
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    def fetchall(self):
+        return list(self._rows)
+
+
+class _FakeDB:
+    """Answers the queue's statements from an in-memory executions table."""
+
+    def __init__(self, executions):
+        self.executions = executions  # execution_id -> dict
+        self.statements = []
+        self.lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def connect(self):
+        with self.lock:
+            yield self
+
+    def cursor(self, cursor_factory=None):
+        return _Cursor(self)
+
+    def respond(self, sql, params):
+        rows = self.executions.values()
+        if sql.startswith("SELECT runbook_name, COUNT(*)"):
+            counts = {}
+            for r in rows:
+                if r["status"] == "executing" and r.get("worker_id"):
+                    counts[r["runbook_name"]] = counts.get(r["runbook_name"], 0) + 1
+            return [{"runbook_name": k, "running": v} for k, v in counts.items()]
+        if sql.startswith("SELECT execution_id, runbook_name"):
+            saturated = params[0]
+            queued = [r for r in rows if r["status"] == "queued" and r["runbook_name"] not in saturated]
+            return [dict(r) for r in queued[:1]]
+        if sql.startswith("UPDATE runbook_executions SET status = 'executing'"):
+            worker_id, execution_id = params
+            self.executions[execution_id].update(status="executing", worker_id=worker_id)
+            return []
+        if "RETURNING cancel_requested" in sql:
+            row = self.executions[params[1]]
+            return [(row.get("cancel_requested", False),)]
+        if "RETURNING status" in sql:
+            return [(self.executions[params[1]]["status"],)]
+        return []
+
+
+def _execution(eid, name, status="queued"):
+    return {"execution_id": eid, "runbook_name": name, "status": status,
+            "parameters": {}, "dry_run": True, "triggered_by": "alice"}
+
+
+def test_parse_engine_limits_keeps_defaults_and_skips_garbage():
+    limits = _parse_engine_limits("vm_rightsizing=3, bad, dr=x,orphan_resource_cleanup=0")
+    assert limits["vm_rightsizing"] == 3
+    assert limits["orphan_resource_cleanup"] == 1  # clamped to at least 1
+    assert "bad" not in limits and "dr" not in limits
+
+
+def test_claim_respects_per_engine_limit():
+    db = _FakeDB({
+        "a": _execution("a", "orphan_resource_cleanup", "executing"),
+        "b": _execution("b", "orphan_resource_cleanup"),
+        "c": _execution("c", "quota_threshold_check"),
+    })
+    db.executions["a"]["worker_id"] = "other:1"
+    pool = RunbookWorkerPool(lambda *a: None, workers=1, connection_factory=db.connect,
+                             engine_limits={"orphan_resource_cleanup": 1})
+    claimed = pool.claim()
+    assert claimed["execution_id"] == "c"
+    assert db.executions["c"]["status"] == "executing"
+    assert pool.claim() is None  # b stays queued until a finishes
+    assert db.statements[0][0].startswith("SELECT pg_advisory_xact_lock")
+
+
+def test_report_progress_is_noop_outside_the_pool():
+    assert current_execution_id() is None
+    report_progress("scan", 1, 2)  # must not raise
+
+
+def test_run_executes_publishes_and_honours_cancel(monkeypatch):
+    published = []
+    monkeypatch.setattr(runbook_queue, "_publish", published.append)
+    db = _FakeDB({"x": _execution("x", "vm_rightsizing")})
+    seen = {}
+
+    def execute(execution_id, runbook_name, params, dry_run, actor):
+        seen["id"] = current_execution_id()
+        report_progress("step-1", 0, 2, "first")
+        pool.request_cancel(execution_id)
+        with pytest.raises(RunbookCancelled):
+            report_progress("step-2", 1, 2)
+        db.executions[execution_id]["status"] = "cancelled"
+
+    pool = RunbookWorkerPool(execute, workers=1, connection_factory=db.connect)
+    pool._run(pool.claim())
+
+    assert seen["id"] == "x"
+    assert current_execution_id() is None
+    states = [p["state"] for p in published]
+    assert states == ["started", "executing", "cancelled"]
+    assert published[1]["step"] == "step-1" and published[1]["total"] == 2
+
+
+def test_heartbeat_picks_up_cancel_requested():
+    db = _FakeDB({"x": _execution("x", "dr", "executing")})
+    pool = RunbookWorkerPool(lambda *a: None, workers=1, connection_factory=db.connect)
+    job = runbook_queue._Job("x", "dr")
+    pool._jobs["x"] = job
+    pool.heartbeat()
+    assert not job.cancel.is_set()
+    db.executions["x"]["cancel_requested"] = True
+    pool.heartbeat()
+    assert job.cancel.is_set()
+    assert any("stopped responding" in sql for sql, _ in db.statements)
@@ -0,0 +1,53 @@
+"""Logic-only tests for the chunked watermark and upsert helpers in search_worker."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("tenacity")
+pytest.importorskip("psycopg2.extras")
+
+from tests.conftest import load_worker  # noqa: E402
+
+search_worker = load_worker("search_worker/main.py", "search_worker_main")
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _ts(seconds):
+    return T0 + timedelta(seconds=seconds)
+
+
+def test_intermediate_chunk_stops_before_trailing_ties():
+    # The last timestamp may continue in the next chunk; only 1 s is safe.
+    stamps = [_ts(0), _ts(1), _ts(2), _ts(2)]
+    assert search_worker._chunk_watermark(search_worker.EPOCH, stamps, final=False) == _ts(1)
+    assert search_worker._chunk_watermark(search_worker.EPOCH, stamps, final=True) == _ts(2)
+
+
+def test_chunk_of_one_timestamp_keeps_previous_watermark():
+    stamps = [_ts(5)] * 3
+    assert search_worker._chunk_watermark(_ts(4), stamps, final=False) == _ts(4)
+    assert search_worker._chunk_watermark(_ts(4), [], final=True) == _ts(4)
+
+
+def test_naive_timestamps_do_not_move_watermark():
+    naive = datetime(2026, 1, 2)
+    assert search_worker._chunk_watermark(_ts(0), [naive, naive], final=True) == _ts(0)
+
+
+def test_doc_values_dedupes_upsert_key_and_skips_bad_rows():
+    def to_doc(row):
+        if row["id"] == "bad":
+            raise KeyError("name")
+        return {"resource_id": row["id"], "title": row["title"], "ts": row["ts"]}
+
+    rows = [
+        {"id": "a", "title": "first", "ts": _ts(1)},
+        {"id": "bad", "title": "", "ts": _ts(1)},
+        {"id": "a", "title": "second", "ts": _ts(1)},
+        {"id": "b", "title": "b", "ts": _ts(2)},
+    ]
+    values, stamps = search_worker._doc_values("vm", to_doc, rows)
+    assert [(v[5], v[7]) for v in values] == [("a", "second"), ("b", "b")]
+    assert stamps == [_ts(1), _ts(1), _ts(2)]
+    assert values[0][0] == "vm" and values[0][10] == "{}"
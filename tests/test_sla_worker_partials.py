@@ -0,0 +1,215 @@
+"""
+Tests for the sla_worker daily partials, month rollup wiring and backfill CLI.
+
+The database is a scripted fake cursor; the SQL itself is not executed.
+"""
+import datetime
+import types
+
+import pytest
+
+pytest.importorskip("tenacity")
+pytest.importorskip("psycopg2.extras")
+
+from tests.conftest import load_worker  # noqa: E402
+
+sla = load_worker("sla_worker/main.py", "sla_worker_main")
+
+JUNE = datetime.date(2026, 6, 1)
+
+
+class _Cur:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.conn.executed.append((sql, params))
+        self.rows = [dict(r) if isinstance(r, dict) else r for r in self.conn.respond(sql, params)]
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self):
+        return list(self.rows)
+
+
+class _Conn:
+    def __init__(self, responses=None):
+        self.responses = responses or {}
+        self.executed = []
+        self.commits = 0
+
+    def cursor(self, cursor_factory=None):
+        return _Cur(self)
+
+    def respond(self, sql, params):
+        for key, rows in self.responses.items():
+            if key in sql:
+                return rows
+        return []
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def written(monkeypatch):
+    """Capture execute_values calls as {first SQL line: rows}."""
+    calls = {}
+
+    def _execute_values(cur, sql, argslist, template=None, page_size=100):
+        calls[sql.split("(")[0].split()[-1]] = list(argslist)
+
+    monkeypatch.setattr(sla.psycopg2.extras, "execute_values", _execute_values, raising=False)
+    return calls
+
+
+@pytest.mark.parametrize("day, expected", [
+    (datetime.date(2026, 6, 17), (JUNE, datetime.date(2026, 7, 1))),
+    (datetime.date(2026, 12, 31), (datetime.date(2026, 12, 1), datetime.date(2027, 1, 1))),
+])
+def test_month_bounds(day, expected):
+    assert sla._month_bounds(day) == expected
+
+
+class TestRefreshDailyPartials:
+    def test_merges_sources_and_rewrites_emptied_dirty_days(self, written):
+        d1, d2 = datetime.date(2026, 6, 3), datetime.date(2026, 6, 4)
+        conn = _Conn({
+            "FROM snapshots": [
+                {"tenant_id": "t1", "day": d1, "rpo_max_hours": 30.0,
+                 "backups_good": 2, "backups_total": 3},
+            ],
+            "FROM support_tickets": [
+                {"tenant_id": "t1", "day": d1, "mtta_sum_hours": 0.0, "mtta_count": 1,
+                 "mttr_sum_hours": None, "mttr_count": 0},
+            ],
+        })
+        n = sla._refresh_daily_partials(conn, JUNE, datetime.date(2026, 7, 1),
+                                        ["t1"], [("t2", d2)])
+        rows = {(r[0], r[1]): r[2:] for r in written["sla_kpi_daily"]}
+        assert n == 2
+        t1 = dict(zip(sla._PARTIAL_COLUMNS, rows[("t1", d1)]))
+        assert t1["rpo_max_hours"] == 30.0 and t1["backups_total"] == 3
+        assert t1["mtta_sum_hours"] == 0.0 and t1["rto_max_hours"] is None
+        t2 = dict(zip(sla._PARTIAL_COLUMNS, rows[("t2", d2)]))
+        assert t2["backups_total"] == 0 and t2["mtta_count"] == 0 and t2["rpo_max_hours"] is None
+        deletes = [p for s, p in conn.executed if "DELETE FROM sla_kpi_daily" in s]
+        assert deletes == [(["t1"], JUNE, datetime.date(2026, 7, 1))]
+
+    def test_runs_source_queries_once_per_scope(self, written):
+        conn = _Conn()
+        sla._refresh_daily_partials(conn, JUNE, datetime.date(2026, 7, 1),
+                                    [f"t{i}" for i in range(50)], [])
+        assert len(conn.executed) == 4  # three source queries + one DELETE
+        assert "sla_kpi_daily" not in written
+
+
+class TestComputeMonth:
+    _KPIS = {"rto_worst_hours": None, "rpo_worst_hours": 30.0, "mtta_avg_hours": None,
+             "mttr_avg_hours": None, "backup_success_pct": 50.0}
+
+    @pytest.fixture
+    def patched(self, monkeypatch, written):
+        calls = types.SimpleNamespace(refresh=None, insights=[])
+        monkeypatch.setattr(sla, "_compute_uptime_pct", lambda conn, tenants: {"t1": 99.0})
+        monkeypatch.setattr(sla, "_compute_migrations_completed", lambda *a: 0)
+        monkeypatch.setattr(sla, "_load_watermarks", lambda conn, tenants, m: {"t1": "wm"})
+        monkeypatch.setattr(sla, "_dirty_days", lambda conn, wm, s, e: [("t1", JUNE)])
+
+        def _refresh(conn, start, end, full, dirty):
+            calls.refresh = (full, dirty)
+            return len(dirty)
+
+        monkeypatch.setattr(sla, "_refresh_daily_partials", _refresh)
+        monkeypatch.setattr(sla, "_rollup_month",
+                            lambda conn, tenants, s, e: {t: dict(self._KPIS) for t in tenants})
+        monkeypatch.setattr(sla, "_upsert_sla_insight",
+                            lambda conn, tenant, *a: calls.insights.append(tenant))
+        calls.written = written
+        return calls
+
+    def _commitments(self):
+        return [{"tenant_id": t, "project_name": t, "tier": "gold", "uptime_pct": None,
+                 "rto_hours": None, "rpo_hours": 24, "mtta_hours": None, "mttr_hours": None,
+                 "backup_freq_hours": None} for t in ("t1", "t2")]
+
+    def test_live_month_is_incremental_and_raises_insights(self, patched):
+        conn = _Conn({"SELECT NOW()": [("now",)]})
+        n = sla.compute_month(conn, JUNE, datetime.date(2026, 6, 10), self._commitments())
+        assert n == 2
+        assert patched.refresh == (["t2"], [("t1", JUNE)])
+        assert [r[0] for r in patched.written["sla_compliance_monthly"]] == ["t1", "t2"]
+        assert patched.written["sla_kpi_watermarks"] == [
+            ("t1", JUNE, "now", False), ("t2", JUNE, "now", False)]
+        assert sorted(patched.insights) == ["t1", "t2"]
+        assert conn.commits == 1
+
+    def test_closed_month_rebuilds_and_keeps_stored_uptime(self, patched):
+        conn = _Conn({"SELECT NOW()": [("now",)],
+                      "uptime_actual_pct FROM sla_compliance_monthly": [("t1", 98.5)]})
+        sla.compute_month(conn, JUNE, datetime.date(2026, 6, 30), self._commitments(),
+                          incremental=False, live=False)
+        assert patched.refresh[0] == ["t1", "t2"]
+        monthly = {r[0]: r for r in patched.written["sla_compliance_monthly"]}
+        assert monthly["t1"][2] == 98.5 and monthly["t2"][2] is None
+        assert all(r[3] is True for r in patched.written["sla_kpi_watermarks"])
+        assert patched.insights == []
+
+    def test_no_commitments_writes_nothing(self, patched):
+        conn = _Conn()
+        assert sla.compute_month(conn, JUNE, JUNE, []) == 0
+        assert conn.executed == [] and conn.commits == 0
+
+
+class TestRunOnce:
+    def test_bad_tenant_does_not_block_the_others(self, monkeypatch):
+        commitments = [{"tenant_id": t} for t in ("t1", "bad", "t3")]
+        computed = []
+
+        def _compute(conn, month_start, today, batch):
+            if any(c["tenant_id"] == "bad" for c in batch):
+                raise ValueError("bad data")
+            computed.extend(c["tenant_id"] for c in batch)
+            return len(batch)
+
+        monkeypatch.setattr(sla, "_finalize_previous_month", lambda conn, m: None)
+        monkeypatch.setattr(sla, "_load_commitments", lambda *a, **kw: commitments)
+        monkeypatch.setattr(sla, "compute_month", _compute)
+        sla.run_once(_Conn())
+        assert computed == ["t1", "t3"]
+
+
+class TestBackfillCli:
+    def test_months_counts_back_from_previous_month(self, monkeypatch):
+        seen = []
+        monkeypatch.setattr(sla, "get_conn", lambda: _Conn())
+        monkeypatch.setattr(sla, "backfill", lambda conn, months: seen.extend(months))
+        sla._backfill_cli(types.SimpleNamespace(month=None, months=3))
+        current, _ = sla._month_bounds(datetime.date.today())
+        assert len(seen) == 3 and seen == sorted(seen)
+        assert sla._month_bounds(seen[-1])[1] == current
+
+    def test_refuses_current_month(self, monkeypatch):
+        monkeypatch.setattr(sla, "get_conn", lambda: pytest.fail("should not connect"))
+        current, _ = sla._month_bounds(datetime.date.today())
+        with pytest.raises(SystemExit):
+            sla._backfill_cli(types.SimpleNamespace(month=[current], months=6))
+
+    def test_parse_month(self):
+        assert sla._parse_month("2026-03") == datetime.date(2026, 3, 1)
+        with pytest.raises(Exception):
+            sla._parse_month("March")
@@ -0,0 +1,187 @@
+"""
+Tests for the snapshot compliance report engine (snapshots/p9_snapshot_compliance_report.py).
+
+Covers:
+  - latest_snapshots: newest row per volume, counts, unparseable timestamps
+  - build_volume_compliance: compliance rules and tenant/domain resolution
+  - summaries, compliance_details rows and the DB loader's region filter
+"""
+import importlib.util
+import json
+import os
+import sys
+import types
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+# The report only needs psycopg2 for connect() / execute_values, which the
+# tests never reach; stub it for the import.
+_psycopg2_stub = types.ModuleType("psycopg2")
+_psycopg2_extras_stub = types.ModuleType("psycopg2.extras")
+_psycopg2_extras_stub.execute_values = MagicMock()
+_psycopg2_stub.extras = _psycopg2_extras_stub
+
+_spec = importlib.util.spec_from_file_location(
+    "snapshot_compliance_report",
+    os.path.join(os.path.dirname(__file__), "..", "snapshots", "p9_snapshot_compliance_report.py"),
+)
+report = importlib.util.module_from_spec(_spec)
+with patch.dict(sys.modules, {"psycopg2": _psycopg2_stub, "psycopg2.extras": _psycopg2_extras_stub}):
+    _spec.loader.exec_module(report)
+
+NOW = datetime(2026, 6, 10, 12)
+
+
+def _meta(auto="true", policies="daily_5", **extra):
+    return json.dumps({"auto_snapshot": auto, "snapshot_policies": policies, **extra})
+
+
+def _data(volumes, snapshots=()):
+    return {
+        "volumes": pd.DataFrame(
+            volumes, columns=["id", "name", "size", "os-vol-tenant-attr:tenant_id", "metadata"]
+        ),
+        "snapshots": pd.DataFrame(snapshots, columns=["id", "volume_id", "created_at", "metadata"]),
+        "tenants": pd.DataFrame({"id": ["p1", "p2"], "name": ["proj1", "proj2"],
+                                 "domain_id": ["d1", "d2"]}),
+        "domains": pd.DataFrame({"id": ["d1", "d2"], "name": ["dom1", "dom2"]}),
+    }
+
+
+def _ago(hours):
+    return (NOW - timedelta(hours=hours)).isoformat() + "Z"
+
+
+class TestLatestSnapshots:
+    def test_newest_row_and_count_per_volume(self):
+        snaps = pd.DataFrame({
+            "volume_id": ["v1", "v1", "v2", "v1", None],
+            "created_at": [_ago(30), _ago(2), _ago(5), "not a date", _ago(1)],
+            "metadata": ["", json.dumps({"policy": "daily_5", "created_by": "auto"}), None, "", ""],
+        })
+        latest = report.latest_snapshots(snaps)
+        assert latest.loc["v1", "snapshots_count"] == 2
+        assert latest.loc["v1", "last_snapshot_at"] == NOW - timedelta(hours=2)
+        assert latest.loc["v1", "last_snapshot_policy"] == "daily_5"
+        assert latest.loc["v1", "last_snapshot_created_by"] == "auto"
+        assert latest.loc["v2", "snapshots_count"] == 1
+        assert set(latest.index) == {"v1", "v2"}
+
+    def test_empty_frame(self):
+        latest = report.latest_snapshots(pd.DataFrame())
+        assert latest.empty and "snapshots_count" in latest.columns
+
+
+class TestBuildVolumeCompliance:
+    def test_compliance_rules(self):
+        data = _data(
+            [
+                ("ok", "a", 10, "p1", _meta()),
+                ("stale", "b", 10, "p1", _meta()),
+                ("stale-but-sla", "c", 10, "p2", _meta(sla_days="3")),
+                ("auto-off", "d", 10, "p2", _meta(auto="false")),
+                ("no-policy", "e", 10, "p2", _meta(policies="")),
+                ("never", "f", 10, "p9", _meta()),
+            ],
+            [
+                ("s1", "ok", _ago(5), ""),
+                ("s2", "stale", _ago(60), ""),
+                ("s3", "stale-but-sla", _ago(60), ""),
+                ("s4", "auto-off", _ago(1), ""),
+                ("s5", "no-policy", _ago(1), ""),
+            ],
+        )
+        df = report.build_volume_compliance(data, sla_default_days=2, now=NOW).set_index("volume_id")
+        assert df["is_compliant"].to_dict() == {
+            "ok": True, "stale": False, "stale-but-sla": True,
+            "auto-off": False, "no-policy": False, "never": False,
+        }
+        assert df.loc["ok", "last_snapshot_age_days"] == pytest.approx(5 / 24)
+        assert df.loc["never", "snapshots_count"] == 0
+        assert pd.isna(df.loc["never", "last_snapshot_at"])
+        assert df.loc["stale-but-sla", ["project_name", "domain_name", "domain_id"]].tolist() == \
+            ["proj2", "dom2", "d2"]
+        assert pd.isna(df.loc["never", "domain_name"])
+
+    def test_summaries(self):
+        data = _data(
+            [("v1", "a", 10, "p1", _meta(policies="daily_5,monthly_1st")),
+             ("v2", "b", 10, "p1", _meta()),
+             ("v3", "c", 10, "p2", _meta(policies=""))],
+            [("s1", "v1", _ago(1), "")],
+        )
+        vol_comp = report.build_volume_compliance(data, now=NOW)
+
+        tenants = report.build_tenant_compliance_summary(vol_comp)
+        assert tenants[["project_id", "total_volumes", "compliant_volumes"]].values.tolist() == \
+            [["p1", 2, 1], ["p2", 1, 0]]
+        domains = report.build_domain_compliance_summary(vol_comp)
+        assert domains["domain_name"].tolist() == ["dom1", "dom2"]
+        assert domains["compliance_ratio"].tolist() == [0.5, 0.0]
+        policies = report.build_policy_compliance_summary(vol_comp)
+        assert policies[["policy", "total_volumes", "compliant_volumes"]].values.tolist() == \
+            [["daily_5", 2, 1], ["monthly_1st", 1, 1]]
+
+
+def test_compliance_details_split_policies_and_prefer_db_names():
+    data = _data([("v1", "frame-name", 10, "p1", _meta(policies="daily_5,monthly_1st")),
+                  ("v2", None, 10, "p2", _meta(policies=""))],
+                 [("s1", "v1", _ago(1), "")])
+    vol_comp = report.build_volume_compliance(data, now=NOW)
+    projects = pd.DataFrame([("p1", "proj1-db", "d1", "dom1-db")],
+                            columns=["project_id", "project_name", "domain_id", "domain_name"])
+    volumes = pd.DataFrame([("v1", "db-name", "srv1", "vm1", {"retention_daily_5": "5"})],
+                           columns=["volume_id", "volume_name", "vm_id", "vm_name", "metadata"])
+    rows = report.build_compliance_details(vol_comp, 9, projects, volumes)
+    by_policy = {(r[1], r[11]): r for r in rows}
+    assert set(by_policy) == {("v1", "daily_5"), ("v1", "monthly_1st"), ("v2", "unknown")}
+    r = by_policy[("v1", "daily_5")]
+    assert r[:11] == (9, "v1", "db-name", "d1", "dom1-db", "p1", "proj1-db",
+                      "d1", "dom1-db", "srv1", "vm1")
+    assert r[12] == 5 and r[15] is True
+    assert by_policy[("v1", "monthly_1st")][12] == 0
+    v2 = by_policy[("v2", "unknown")]
+    assert v2[2] is None and v2[4] == "dom2" and v2[13] is None and v2[15] is False
+
+
+def test_load_db_data_filters_region():
+    class _Cur:
+        def __init__(self):
+            self.calls = []
+            self.description = [("id",)]
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def execute(self, sql, params=None):
+            self.calls.append((sql, params))
+
+        def fetchall(self):
+            return []
+
+    class _Conn:
+        cur = _Cur()
+
+        def cursor(self):
+            return self.cur
+
+    conn = _Conn()
+    data = report.load_db_data(conn, region_id="r1")
+    assert set(data) == {"volumes", "snapshots", "tenants", "domains"}
+    volume_sql, params = conn.cur.calls[0]
+    assert "v.region_id = %(region_id)s" in volume_sql and params == {"region_id": "r1"}
+    assert "s.region_id = %(region_id)s" in conn.cur.calls[1][0]
+
+
+def test_excel_safe_encodes_jsonb_cells():
+    df = pd.DataFrame({"metadata": [{"a": 1}, None, "text"], "n": [1, 2, 3]})
+    out = report._excel_safe(df)
+    assert out["metadata"].tolist()[0] == '{"a": 1}'
+    assert out["metadata"].tolist()[2] == "text"
@@ -0,0 +1,188 @@
+"""Tests for api/topology_index.py built from an in-memory inventory."""
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
+
+import topology_index as ti  # noqa: E402
+
+NOW = datetime(2026, 6, 1)
+
+TABLES = {
+    "domains": [{"id": "d1", "name": "default"}],
+    "projects": [{"id": "t1", "name": "acme", "domain_id": "d1"}],
+    "hypervisors": [{"id": 8, "hostname": "hv-01", "db_hostname": "hv-01.local",
+                     "state": "up", "status": "enabled", "resmgr_id": "rm-1",
+                     "vcpus": 64, "vcpus_used": 8}],
+    "host_aggregates": [{"id": 3, "name": "gold", "availability_zone": "az1",
+                         "host_count": 1, "raw_json": {"hosts": ["rm-1"]}}],
+    "images": [{"id": "img1", "name": "ubuntu", "status": "active"}],
+    "servers": [
+        {"id": "vm1", "name": "web", "status": "ACTIVE", "project_id": "t1",
+         "hypervisor_hostname": "hv-01.local", "image_id": "img1"},
+        {"id": "vm2", "name": "db", "status": "SHUTOFF", "project_id": "t1",
+         "hypervisor_hostname": "hv-01", "image_id": None},
+    ],
+    "volumes": [
+        {"id": "vol1", "name": "data", "status": "in-use", "project_id": "t1", "server_id": "vm1"},
+        {"id": "vol2", "name": "spare", "status": "available", "project_id": "t1", "server_id": None},
+    ],
+    "snapshots": [
+        {"id": "s1", "name": "a", "status": "available", "volume_id": "vol1",
+         "project_id": "t1", "created_at": NOW - timedelta(days=10)},
+        {"id": "s2", "name": "b", "status": "available", "volume_id": "vol1",
+         "project_id": "t1", "created_at": NOW - timedelta(days=1)},
+        {"id": "s3", "name": "c", "status": "available", "volume_id": "gone",
+         "project_id": "t1", "created_at": NOW},
+    ],
+    "networks": [{"id": "n1", "name": "lan", "status": "ACTIVE", "project_id": "t1"}],
+    "subnets": [{"id": "sn1", "name": "lan-v4", "network_id": "n1"}],
+    "ports": [
+        {"id": "p1", "name": "", "status": "ACTIVE", "network_id": "n1", "device_id": "vm1",
+         "device_owner": "compute:nova", "first_ip": "10.0.0.5", "security_groups": ["sg1"]},
+        {"id": "p2", "name": "", "status": "ACTIVE", "network_id": "n1", "device_id": "vm1",
+         "device_owner": "compute:nova", "first_ip": "10.0.0.6", "security_groups": ["sg1"]},
+        {"id": "p3", "name": "", "status": "ACTIVE", "network_id": "n1", "device_id": "r1",
+         "device_owner": "network:router_interface", "first_ip": "10.0.0.1",
+         "security_groups": ["sg2"]},
+    ],
+    "floating_ips": [
+        {"id": "f1", "name": "1.2.3.4", "floating_ip": "1.2.3.4", "status": "ACTIVE",
+         "project_id": "t1", "port_id": "p1"},
+    ],
+    "security_groups": [
+        {"id": "sg1", "name": "web", "project_id": "t1"},
+        {"id": "sg2", "name": "router", "project_id": "t1"},
+        {"id": "sg3", "name": "unused", "project_id": "t1"},
+    ],
+}
+
+
+class FakeCursor:
+    def __init__(self, tables, run_id=1):
+        self.tables = tables
+        self.run_id = run_id
+        self.queries = []
+        self._rows = []
+
+    def execute(self, sql, params=None):
+        self.queries.append(sql)
+        if "inventory_runs" in sql:
+            self._rows = [{"run_id": self.run_id}]
+        elif "SAVEPOINT" in sql:
+            self._rows = []
+        else:
+            table = sql.rsplit("FROM ", 1)[1].split()[0]
+            self._rows = [dict(r) for r in self.tables[table]]
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    def fetchall(self):
+        return list(self._rows)
+
+
+@pytest.fixture
+def index():
+    return ti.TopologyIndex.load(FakeCursor(TABLES), generation=1)
+
+
+@pytest.fixture(autouse=True)
+def _reset_singleton(monkeypatch):
+    monkeypatch.setattr(ti, "_index", None)
+    monkeypatch.setattr(ti, "_invalidated", False)
+    monkeypatch.setattr(ti, "ENABLED", True)
+
+
+def _edges(index, ntype, db_id):
+    i = index.slot(ntype, db_id)
+    return [(index.ntypes[j], index.rows[j]["id"], label, extra)
+            for j, label, extra in index.neighbors(i)]
+
+
+def test_vm_edges_follow_expander_order(index):
+    assert _edges(index, "vm", "vm1") == [
+        ("tenant", "t1", "belongs to", None),
+        ("volume", "vol1", "has volume", None),
+        ("network", "n1", "connected to", None),   # two ports, one edge
+        ("sg", "sg1", "member of", None),
+        ("fip", "f1", "has floating IP", None),
+        ("host", 8, "runs on", None),              # matched on the hypervisors.hostname column
+        ("image", "img1", "uses image", None),
+    ]
+
+
+def test_network_vm_edge_carries_first_ip_and_skips_non_compute_ports(index):
+    assert _edges(index, "network", "n1") == [
+        ("tenant", "t1", "belongs to", None),
+        ("subnet", "sn1", "has subnet", None),
+        ("vm", "vm1", "hosts VM", {"ip_address": "10.0.0.5"}),
+    ]
+
+
+def test_host_and_aggregate_edges(index):
+    # host → VMs matches the coalesced hostname, as _expand_host does
+    assert _edges(index, "host", "8") == [
+        ("vm", "vm2", "runs VM", None),
+        ("aggregate", 3, "member of", None),
+    ]
+    assert _edges(index, "aggregate", "3") == [("host", 8, "member", None)]
+
+
+def test_private_columns_are_not_in_node_rows(index):
+    assert "db_hostname" not in index.rows[index.slot("host", 8)]
+    port = index.rows[index.slot("port", "p1")]
+    assert "security_groups" not in port and "first_ip" not in port
+
+
+def test_badge_inputs(index):
+    assert index.latest_snapshot["vol1"] == NOW - timedelta(days=1)
+    assert "vol2" not in index.latest_snapshot
+    assert index.sgs_in_use == {"sg1", "sg2"}   # any port, compute or not
+    assert index.slot("volume", "gone") is None
+
+
+def test_csr_arrays_are_consistent(index):
+    assert len(index.offsets) == index.node_count + 1
+    assert index.offsets[-1] == index.edge_count == len(index.labels)
+
+
+def test_get_index_rebuilds_only_after_a_new_inventory_run():
+    cur = FakeCursor(TABLES, run_id=5)
+    first = ti.get_index(cur)
+    assert first.generation == 5
+    built = len(cur.queries)
+    assert ti.get_index(cur) is first
+    assert len(cur.queries) == built + 1     # just the generation check
+
+    cur.run_id = 6
+    second = ti.get_index(cur)
+    assert second is not first and second.generation == 6
+
+
+def test_invalidate_and_max_age_force_a_rebuild(monkeypatch):
+    cur = FakeCursor(TABLES)
+    first = ti.get_index(cur)
+    ti.invalidate()
+    second = ti.get_index(cur)
+    assert second is not first
+    monkeypatch.setattr(ti, "MAX_AGE_SECONDS", 0)
+    assert ti.get_index(cur) is not second
+
+
+def test_failed_build_keeps_serving_the_previous_index():
+    cur = FakeCursor(TABLES)
+    first = ti.get_index(cur)
+    broken = dict(TABLES)
+    del broken["host_aggregates"]
+    cur.tables, cur.run_id = broken, 2
+    assert ti.get_index(cur) is first
+    assert "ROLLBACK TO SAVEPOINT topology_index" in cur.queries
+
+
+def test_disabled_index_returns_none(monkeypatch):
+    monkeypatch.setattr(ti, "ENABLED", False)
+    assert ti.get_index(FakeCursor(TABLES)) is None
@@ -0,0 +1,210 @@
+"""Tests for shared/worker_telemetry.py against an in-memory Redis."""
+import os
+import sys
+import threading
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from shared import worker_telemetry as wt  # noqa: E402
+
+
+class FakeRedis:
+    """The hash/set subset the telemetry uses; pipelines apply on execute()."""
+
+    def __init__(self):
+        self.sets = {}
+        self.hashes = {}
+        self.pipelines = 0
+        self.fail = False
+
+    def smembers(self, key):
+        return {m.encode() for m in self.sets.get(key, set())}
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.ops = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.ops.append((name, args, kwargs))
+        return queue
+
+    def execute(self):
+        r = self.redis
+        if r.fail:
+            raise ConnectionError("redis down")
+        r.pipelines += 1
+        out = []
+        for name, args, kwargs in self.ops:
+            if name == "sadd":
+                r.sets.setdefault(args[0], set()).add(args[1])
+            elif name in ("hincrby", "hincrbyfloat"):
+                h = r.hashes.setdefault(args[0], {})
+                h[args[1]] = h.get(args[1], 0) + args[2]
+            elif name == "hset":
+                r.hashes.setdefault(args[0], {}).update(kwargs["mapping"])
+            elif name == "hgetall":
+                out.append({k.encode(): str(v).encode() for k, v in r.hashes.get(args[0], {}).items()})
+        return out
+
+
+@pytest.fixture
+def redis():
+    return FakeRedis()
+
+
+def _telemetry(redis, **kwargs):
+    return wt.WorkerTelemetry("test_worker", frequency_s=60, redis_factory=lambda: redis,
+                              buckets=(0.1, 1, 10), **kwargs)
+
+
+def _samples(text, name):
+    """(labels, value) of every ``name{labels} value`` line."""
+    out = []
+    for line in text.splitlines():
+        if line.startswith(name + "{"):
+            labels, _, value = line[len(name) + 1:].rpartition("} ")
+            out.append((labels, float(value)))
+    return out
+
+
+def test_cycle_publishes_counters_and_registry_in_one_pipeline(redis):
+    t = _telemetry(redis)
+    with t.cycle():
+        pass
+    with t.cycle():
+        t.fail()
+    main = redis.hashes["pf9:worker:test_worker"]
+    assert redis.sets[wt.REGISTRY_KEY] == {"test_worker"}
+    assert main["runs_total"] == 2 and main["errors_total"] == 1
+    assert main["frequency_s"] == 60 and main["label"] == "test_worker"
+    assert redis.pipelines == 2
+
+
+def test_exception_marks_cycle_failed_and_propagates(redis):
+    t = _telemetry(redis)
+    with pytest.raises(RuntimeError):
+        with t.cycle():
+            raise RuntimeError("boom")
+    assert redis.hashes["pf9:worker:test_worker"]["errors_total"] == 1
+
+
+def test_stage_buckets_are_cumulative(redis, monkeypatch):
+    t = _telemetry(redis)
+    clock = iter([0.0, 0.0, 0.5, 0.5, 5.5, 6.0])
+    monkeypatch.setattr(wt.time, "monotonic", lambda: next(clock))
+    with t.cycle():
+        with t.stage("engine", component="Drift"):
+            pass
+        with t.stage("engine", component="Drift"):
+            pass
+    hist = redis.hashes["pf9:worker:test_worker:hist"]
+    assert hist["stage|engine|Drift|0.1"] == 0
+    assert hist["stage|engine|Drift|1"] == 1
+    assert hist["stage|engine|Drift|10"] == 2
+    assert hist["stage|engine|Drift|+Inf"] == 2
+    assert hist["stage|engine|Drift|sum"] == pytest.approx(5.5)
+    assert hist["cycle|||10"] == 1 and hist["cycle|||sum"] == pytest.approx(6.0)
+
+
+def test_stages_outside_a_cycle_publish_with_the_next_one(redis):
+    t = _telemetry(redis)
+    t.observe("rvtools", 2.0, component="region-a")
+    t.set_lag("jobs", 12)
+    assert redis.pipelines == 0
+    with t.cycle():
+        pass
+    assert redis.hashes["pf9:worker:test_worker:hist"]["stage|rvtools|region-a|+Inf"] == 1
+    assert redis.hashes["pf9:worker:test_worker:gauges"] == {"lag|jobs": 12.0}
+    with t.cycle():
+        pass
+    assert redis.hashes["pf9:worker:test_worker:hist"]["stage|rvtools|region-a|+Inf"] == 1
+
+
+def test_stages_from_worker_threads_are_all_recorded(redis):
+    t = _telemetry(redis)
+
+    def work():
+        for _ in range(200):
+            t.observe("index", 0.01, component="vms")
+
+    with t.cycle():
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+    assert redis.hashes["pf9:worker:test_worker:hist"]["stage|index|vms|+Inf"] == 800
+
+
+def test_redis_failure_is_swallowed_and_client_rebuilt():
+    calls = []
+
+    def factory():
+        calls.append(1)
+        r = FakeRedis()
+        r.fail = len(calls) == 1
+        return r
+
+    t = wt.WorkerTelemetry("w", frequency_s=30, redis_factory=factory)
+    with t.cycle():
+        pass
+    with t.cycle():
+        pass
+    assert len(calls) == 2
+
+
+def test_db_statements_counted_per_cycle(redis, monkeypatch):
+    t = _telemetry(redis)
+    with t.cycle():
+        wt._count_query(3)
+    main = redis.hashes["pf9:worker:test_worker"]
+    assert main["db_queries_last_cycle"] == 3 and main["db_queries_total"] == 3
+
+
+def test_render_prometheus_families(redis):
+    t = _telemetry(redis)
+    with t.cycle():
+        t.observe("collector", 0.5, component="quotas")
+        t.set_lag("backup_jobs", 42)
+    text = wt.render_prometheus(redis, now=redis.hashes["pf9:worker:test_worker"]["last_run_ts"] + 1)
+
+    assert _samples(text, "worker_up") == [('worker="test_worker"', 1.0)]
+    assert _samples(text, "worker_runs_total") == [('worker="test_worker"', 1.0)]
+    assert _samples(text, "worker_queue_lag_seconds") == \
+        [('worker="test_worker",queue="backup_jobs"', 42.0)]
+    buckets = _samples(text, "worker_stage_duration_seconds_bucket")
+    assert buckets == [
+        ('worker="test_worker",stage="collector",component="quotas",le="0.1"', 0.0),
+        ('worker="test_worker",stage="collector",component="quotas",le="1"', 1.0),
+        ('worker="test_worker",stage="collector",component="quotas",le="10"', 1.0),
+        ('worker="test_worker",stage="collector",component="quotas",le="+Inf"', 1.0),
+    ]
+    assert _samples(text, "worker_cycle_duration_seconds_count") == [('worker="test_worker"', 1.0)]
+    assert "# TYPE worker_stage_duration_seconds histogram" in text
+
+
+def test_render_marks_stale_worker_down(redis):
+    t = _telemetry(redis)
+    with t.cycle():
+        pass
+    last = redis.hashes["pf9:worker:test_worker"]["last_run_ts"]
+    text = wt.render_prometheus(redis, now=last + 121)
+    assert _samples(text, "worker_up") == [('worker="test_worker"', 0.0)]
+
+
+def test_render_without_redis_keeps_original_families():
+    text = wt.render_prometheus(None)
+    for family in ("worker_runs_total", "worker_errors_total", "worker_up",
+                   "worker_last_run_duration_seconds"):
+        assert f"# TYPE {family} " in text
+    assert "worker_stage_duration_seconds" not in text